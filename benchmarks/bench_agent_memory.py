@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark de AgentMemory.record_execution
+
+Compare, pour N exécutions (avec update_state + add_pattern comme les agents
+de département):
+- stockage historique: load() du JSON complet, ajout, troncature à 100,
+  métriques recalculées, save() complet avec indent=2, à chaque appel
+- stockage SQLite: une ligne par exécution, métriques en agrégats,
+  écriture différée par lots
+
+Usage:
+    python benchmarks/bench_agent_memory.py [--executions 10000] [--batch-size 50]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cortex.core.agent_memory import AgentMemory
+
+
+class LegacyAgentMemory:
+    """Comportement d'origine de AgentMemory (read-modify-write du JSON complet)"""
+
+    def __init__(self, memory_path: Path):
+        self.memory_path = memory_path
+        self.save({"execution_history": [], "learned_patterns": {}, "state": {}, "notes": [],
+                   "performance_metrics": {"total_executions": 0, "successful_executions": 0,
+                                           "failed_executions": 0, "avg_execution_time": 0.0,
+                                           "total_cost": 0.0}})
+
+    def load(self):
+        with open(self.memory_path, 'r') as f:
+            return json.load(f)
+
+    def save(self, memory):
+        memory['last_updated'] = datetime.now().isoformat()
+        with open(self.memory_path, 'w') as f:
+            json.dump(memory, f, indent=2)
+
+    def record_execution(self, request, result, duration, cost=0.0):
+        memory = self.load()
+        memory['execution_history'].append({
+            'timestamp': datetime.now().isoformat(), 'request': request[:200],
+            'success': result.get('success', False), 'duration': duration, 'cost': cost,
+            'result_summary': str(result)[:500]
+        })
+        memory['execution_history'] = memory['execution_history'][-100:]
+        metrics = memory['performance_metrics']
+        metrics['total_executions'] += 1
+        metrics['successful_executions' if result.get('success') else 'failed_executions'] += 1
+        n = metrics['total_executions']
+        metrics['avg_execution_time'] = (metrics['avg_execution_time'] * (n - 1) + duration) / n
+        metrics['total_cost'] += cost
+        self.save(memory)
+
+    def update_state(self, updates):
+        memory = self.load()
+        memory['state'].update(updates)
+        self.save(memory)
+
+    def add_pattern(self, name, data):
+        memory = self.load()
+        pattern = memory['learned_patterns'].setdefault(
+            name, {'first_detected': datetime.now().isoformat(), 'occurrences': 0, 'data': []})
+        pattern['occurrences'] += 1
+        pattern['data'] = (pattern['data'] + [{'timestamp': datetime.now().isoformat(), 'data': data}])[-50:]
+        self.save(memory)
+
+    def get_metrics(self):
+        return self.load()['performance_metrics']
+
+    def flush(self):
+        pass
+
+
+def run(memory, executions: int):
+    latencies = []
+    start = time.perf_counter()
+    for i in range(executions):
+        t0 = time.perf_counter()
+        result = {'success': i % 10 != 0, 'actions_executed': i % 7, 'report': "ok " * 40}
+        memory.record_execution(f"Execute plan {i}", result, duration=0.25, cost=0.001)
+        memory.update_state({'last_plan_id': f"ADR-{i}", 'active': True})
+        if i % 5 == 0:
+            memory.add_pattern('frequent_file_type', {'file_type': '.py', 'index': i})
+        latencies.append(time.perf_counter() - t0)
+    memory.flush()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return elapsed, statistics.median(latencies) * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--executions", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=50, help="Write-behind batch size")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    legacy = LegacyAgentMemory(workdir / "memory.json")
+    memory = AgentMemory("bench", "agent", db_path=str(workdir / "agent_memory.db"),
+                         flush_batch_size=args.batch_size)
+    unbuffered = AgentMemory("bench", "unbuffered", db_path=str(workdir / "agent_memory.db"),
+                             flush_batch_size=1)
+
+    print(f"{args.executions} executions (record_execution + update_state, add_pattern 1/5)")
+    results = [
+        ("legacy JSON rewrite", run(legacy, args.executions)),
+        ("SQLite, write-through", run(unbuffered, args.executions)),
+        (f"SQLite, write-behind x{args.batch_size}", run(memory, args.executions)),
+    ]
+    baseline = results[0][1][0]
+    for label, (elapsed, p50, p99) in results:
+        print(f"  {label:<28} {elapsed:7.2f}s  p50 {p50:8.1f}us  p99 {p99:8.1f}us  "
+              f"({baseline / elapsed:.0f}x)")
+
+    assert legacy.get_metrics()['total_executions'] == memory.get_metrics()['total_executions']
+    start = time.perf_counter()
+    for _ in range(1000):
+        memory.get_metrics()
+    print(f"\n  get_metrics (cached): {(time.perf_counter() - start) * 1000:.1f}us per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark de charge de l'AsyncLLMClient
+
+Lance un provider factice local (latence fixe par requête) puis envoie
+N requêtes simultanées pour N ∈ {50, 100, 250, 500}:
+- Baseline: LLMClient.complete séquentiel (sur un échantillon)
+- Async: AsyncLLMClient.complete_many avec concurrence bornée
+
+Mesure le débit, la latence p50/p95 par requête et la concurrence
+réellement observée côté serveur.
+
+Usage:
+    python benchmarks/bench_async_llm.py [--latency 0.1] [--max-concurrency 64]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openai import OpenAI
+
+from cortex.core.async_llm_client import AsyncLLMClient
+from cortex.core.llm_client import LLMClient, ModelTier
+from tests.fake_provider import FakeProvider
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def make_request(i: int):
+    return {
+        "messages": [{"role": "user", "content": f"Benchmark request {i}"}],
+        "tier": ModelTier.DEEPSEEK,
+        "max_tokens": 50
+    }
+
+
+async def run_async(client: AsyncLLMClient, n: int):
+    latencies = []
+
+    async def timed(i):
+        start = time.perf_counter()
+        await client.complete(**make_request(i))
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(i) for i in range(n)))
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AsyncLLMClient load benchmark")
+    parser.add_argument("--latency", type=float, default=0.1, help="Latence du provider factice (s)")
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--sizes", default="50,100,250,500")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    with FakeProvider(text="benchmark response", latency=args.latency) as provider:
+        base = LLMClient(use_cache=False)
+        base.deepseek_client = OpenAI(api_key="test", base_url=provider.openai_url, max_retries=0)
+
+        # Baseline séquentielle sur un échantillon
+        sample = 20
+        start = time.perf_counter()
+        for i in range(sample):
+            base.complete(**make_request(i))
+        sync_rps = sample / (time.perf_counter() - start)
+        print(f"Sync baseline: {sync_rps:.1f} req/s (latence provider {args.latency*1000:.0f}ms)\n")
+
+        print(f"{'requests':>9} {'time':>8} {'req/s':>8} {'speedup':>8} {'p50':>8} {'p95':>8} {'in flight':>10}")
+        for n in sizes:
+            provider.max_in_flight = 0
+            client = AsyncLLMClient(base, limits={"deepseek": {
+                "max_concurrency": args.max_concurrency, "rpm": 0, "tpm": 0
+            }})
+            elapsed, latencies = asyncio.run(run_async(client, n))
+            rps = n / elapsed
+            print(f"{n:>9} {elapsed:>7.2f}s {rps:>8.1f} {rps / sync_rps:>7.1f}x "
+                  f"{percentile(latencies, 0.5)*1000:>6.0f}ms {percentile(latencies, 0.95)*1000:>6.0f}ms "
+                  f"{provider.max_in_flight:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark du mode batch: appels un par un vs file + BatchWorker
+
+Contre un provider local factice (latence fixe par appel):
+- baseline: LLMClient.complete séquentiel, plein tarif (chemin interactif actuel)
+- batch API: nano/claude soumis en batches provider (tarif remisé)
+- direct: concurrence bornée (deepseek, ou Batch API indisponible)
+
+Usage:
+    python benchmarks/bench_batch.py [--requests 500] [--latency 0.02] [--concurrency 16]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openai import OpenAI
+from anthropic import Anthropic
+
+from cortex.core.llm_client import LLMClient
+from cortex.core.model_router import ModelTier
+from cortex.core.batch_processor import BatchQueue, BatchWorker
+from tests.fake_provider import FakeProvider
+
+
+def make_client(provider) -> LLMClient:
+    client = LLMClient(use_cache=False)
+    client.openai_client = OpenAI(api_key="bench", base_url=provider.openai_url, max_retries=0)
+    client.deepseek_client = OpenAI(api_key="bench", base_url=provider.openai_url, max_retries=0)
+    client.anthropic_client = Anthropic(api_key="bench", base_url=provider.anthropic_url, max_retries=0, timeout=60)
+    return client
+
+
+def requests_for(count: int):
+    return [{"prompt": f"Summarize scraped page {i}", "tier": "nano"} for i in range(count)]
+
+
+def run_worker(provider, count: int, concurrency: int, use_provider_batches: bool):
+    queue = BatchQueue(db_path=str(Path(tempfile.mkdtemp()) / "batch.db"))
+    batch_id = queue.submit(requests_for(count))
+    worker = BatchWorker(queue, make_client(provider), use_provider_batches=use_provider_batches,
+                         max_concurrency=concurrency, poll_interval=0.05)
+    start = time.perf_counter()
+    report = worker.run(timeout=600)
+    elapsed = time.perf_counter() - start
+    status = queue.status(batch_id)
+    assert status["completed"] == count, (status, report)
+    return elapsed, status["cost"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.02, help="Provider latency per call (seconds)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    with FakeProvider(text="Short summary of the page.", latency=args.latency, tokens_input=800) as provider:
+        client = make_client(provider)
+        start = time.perf_counter()
+        baseline_cost = 0.0
+        for request in requests_for(args.requests):
+            response = client.complete([{"role": "user", "content": request["prompt"]}], tier=ModelTier.NANO)
+            baseline_cost += response.cost
+        baseline = time.perf_counter() - start
+
+        direct, direct_cost = run_worker(provider, args.requests, args.concurrency, use_provider_batches=False)
+        batched, batched_cost = run_worker(provider, args.requests, args.concurrency, use_provider_batches=True)
+
+    print(f"{args.requests} nano requests, {args.latency * 1000:.0f}ms provider latency")
+    print(f"  {'sequential complete()':<28} {baseline:7.2f}s  ${baseline_cost:.4f}")
+    print(f"  {f'direct x{args.concurrency}':<28} {direct:7.2f}s  ${direct_cost:.4f}  "
+          f"({baseline / direct:.1f}x faster)")
+    print(f"  {'provider batch API':<28} {batched:7.2f}s  ${batched_cost:.4f}  "
+          f"({1 - batched_cost / baseline_cost:.0%} cheaper, 1 upload + polling)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark de la génération des clés de cache
+
+Conversations de type tool calling (résultats d'outils de ~2 KB) de
+10, 100 et 1000 messages. Compare:
+- legacy: json.dumps(messages, sort_keys=True) + SHA-256 à chaque appel
+- cold: empreintes chaînées, aucun message mémoïsé (premier appel)
+- append: la conversation reçoit un nouveau message, puis get + set (2 clés),
+  comme une itération de ToolExecutor.execute_with_tools
+
+Usage:
+    python benchmarks/bench_cache_key.py [--sizes 10,100,1000]
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cortex.cache.message_hash import PrefixHasher
+
+
+def legacy_key(messages, model_tier):
+    messages_str = json.dumps(messages, sort_keys=True)
+    return hashlib.sha256(f"{messages_str}:{model_tier}".encode()).hexdigest()
+
+
+def chained_key(hasher, messages, model_tier):
+    return hashlib.sha256(hasher.digest(messages) + model_tier.encode()).hexdigest()
+
+
+def make_message(i: int):
+    if i == 0:
+        return {"role": "system", "content": "You are a coding assistant with tools. " * 20}
+    if i % 2:
+        return {"role": "assistant", "content": "", "tool_calls": [{
+            "id": f"call_{i}", "type": "function",
+            "function": {"name": "read_file", "arguments": json.dumps({"path": f"src/module_{i}.py"})}
+        }]}
+    return {"role": "tool", "tool_call_id": f"call_{i - 1}", "content": f"line {i}: " + "x = compute(y) " * 140}
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache key generation microbenchmark")
+    parser.add_argument("--sizes", default="10,100,1000")
+    args = parser.parse_args()
+
+    print(f"{'messages':>9} {'size':>9} {'legacy':>10} {'cold':>10} {'append':>10} {'speedup':>9}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        messages = [make_message(i) for i in range(n)]
+        size_kb = len(json.dumps(messages)) / 1024
+        repeat = max(5, 2000 // n)
+
+        legacy_ms = timed(lambda: legacy_key(messages, "deepseek"), repeat) * 2
+
+        def cold():
+            chained_key(PrefixHasher(), messages, "deepseek")
+        cold_ms = timed(cold, repeat)
+
+        # Itération de la boucle d'outils: nouvelle liste = conversation + 1 message
+        hasher = PrefixHasher()
+        chained_key(hasher, messages, "deepseek")
+        new_messages = iter([make_message(n + i) for i in range(repeat)])
+
+        def append_iteration():
+            current = messages + [next(new_messages)]
+            chained_key(hasher, current, "deepseek")  # get
+            chained_key(hasher, current, "deepseek")  # set
+        append_ms = timed(append_iteration, repeat)
+
+        print(f"{n:>9} {size_kb:>7.0f}KB {legacy_ms:>8.3f}ms {cold_ms:>8.3f}ms "
+              f"{append_ms:>8.3f}ms {legacy_ms / append_ms:>8.1f}x")
+
+    print("\nlegacy/append: coût d'une itération get + set (2 clés)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la détection de clones (CloneDetector) sur un arbre synthétique
+
+Génère --files fichiers Python de --functions fonctions chacun. Une partie des
+fonctions appartient à des familles de clones plantées (copies renommées,
+constantes changées, une instruction ajoutée ou remplacée); le reste est unique.
+
+Mesure:
+- sync à froid (empreintes en pool de processus), sync sans changement,
+  sync après modification de 1% des fichiers
+- find_clones: paires candidates LSH vs toutes les paires, temps total
+- rappel / précision des paires plantées (Jaccard exact >= seuil)
+
+Usage:
+    python benchmarks/bench_clone_detector.py [--files 10000] [--functions 3]
+                                              [--clone-ratio 0.1] [--workers 0]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cortex.core.clone_detector import CloneDetector
+
+STATEMENTS = [
+    "{a} = {b}.get({s}, {n})",
+    "if {a} is None:\n        {a} = []",
+    "for {c} in {b}:\n        {a}.append({c} * {n})",
+    "{a} = sorted({b}, key=len)",
+    "while len({a}) > {n}:\n        {a}.pop()",
+    "try:\n        {a} = int({b})\n    except ValueError:\n        {a} = {n}",
+    "{a} = [{c} for {c} in {b} if {c}]",
+    "with open({b}) as {c}:\n        {a} = {c}.read()",
+    "{a} = {{{s}: {b}, {s}: {n}}}",
+    "assert isinstance({a}, dict), {s}",
+    "{a} += {b}.count({s})",
+    "{a} = {b}.strip().split({s})",
+    "if not {a}:\n        return {n}",
+    "{a} = max({b}, default={n})",
+    "{a}.update({b})",
+    "{a} = {b}[{n}:] + {b}[:{n}]",
+]
+NAMES = ["data", "items", "result", "value", "cache", "rows", "entry", "total", "buf", "node", "text", "keys"]
+
+
+def render(name: str, statements, rng: random.Random) -> str:
+    args = rng.sample(NAMES, 3)
+    lines = [f"def {name}({', '.join(args)}):"]
+    for statement in statements:
+        a, b, c = rng.sample(NAMES, 3)
+        lines.append("    " + statement.format(a=a, b=b, c=c, n=rng.randint(0, 99), s=repr(rng.choice(NAMES))))
+    lines.append(f"    return {args[0]}")
+    return "\n".join(lines) + "\n"
+
+
+def generate(root: Path, files: int, functions: int, clone_ratio: float, rng: random.Random):
+    """Arbre synthétique; rend les familles plantées {famille: [(chemin, nom)]}"""
+    total = files * functions
+    family_count = int(total * clone_ratio / 3)
+    slots = rng.sample(range(total), family_count * 3)
+    planted = {}
+    bodies = {}
+    for family in range(family_count):
+        base = [rng.choice(STATEMENTS) for _ in range(rng.randint(10, 16))]
+        for copy, slot in enumerate(slots[family * 3:family * 3 + 3]):
+            variant = list(base)
+            if copy == 1:
+                variant.insert(rng.randrange(len(variant)), rng.choice(STATEMENTS))
+            elif copy == 2:
+                variant[rng.randrange(len(variant))] = rng.choice(STATEMENTS)
+            bodies[slot] = (family, variant)
+
+    for f in range(files):
+        path = root / "cortex" / f"pkg{f % 100}" / f"module_{f}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        parts = []
+        for k in range(functions):
+            slot = f * functions + k
+            name = f"fn_{slot}"
+            if slot in bodies:
+                family, statements = bodies[slot]
+                planted.setdefault(family, []).append((path.relative_to(root).as_posix(), name))
+            else:
+                statements = [rng.choice(STATEMENTS) for _ in range(rng.randint(10, 16))]
+            parts.append(render(name, statements, rng))
+        path.write_text("\n\n".join(parts))
+    return planted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--functions", type=int, default=3, help="Functions per file")
+    parser.add_argument("--clone-ratio", type=float, default=0.1, help="Share of functions in planted families")
+    parser.add_argument("--min-similarity", type=float, default=0.8)
+    parser.add_argument("--workers", type=int, default=0, help="Fingerprint processes (0 = CPU count)")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    root = Path(tempfile.mkdtemp())
+    start = time.perf_counter()
+    planted = generate(root, args.files, args.functions, args.clone_ratio, rng)
+    print(f"Generated {args.files} files / {args.files * args.functions} functions, "
+          f"{len(planted)} planted families in {time.perf_counter() - start:.1f}s")
+
+    detector = CloneDetector(root=root, roots=["cortex"], db_path=str(root / "clone_index.db"),
+                             workers=args.workers or None)
+
+    def timed_sync(label: str):
+        start = time.perf_counter()
+        report = detector.sync()
+        print(f"  {label:<24} {(time.perf_counter() - start) * 1000:9.0f}ms  "
+              f"({report.files_changed} files re-fingerprinted, {report.functions_indexed} functions)")
+
+    print("\nSync")
+    timed_sync("cold")
+    timed_sync("no change")
+    for path in rng.sample(sorted((root / "cortex").rglob("*.py")), max(1, args.files // 100)):
+        path.write_text(path.read_text() + "\n\ndef added_helper(x):\n    return x\n")
+    timed_sync("1% files modified")
+
+    print("\nfind_clones")
+    index = detector._load_index()
+    start = time.perf_counter()
+    candidates = detector._candidate_pairs(index.signatures)
+    lsh_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    clusters = detector.find_clones(min_similarity=args.min_similarity, sync=False)
+    find_ms = (time.perf_counter() - start) * 1000
+    n = len(index.ids)
+    print(f"  LSH candidates           {len(candidates):9d} of {n * (n - 1) // 2} pairs "
+          f"({len(candidates) / max(1, n * (n - 1) // 2):.2e}) in {lsh_ms:.0f}ms")
+    print(f"  find_clones              {find_ms:9.0f}ms  ({len(clusters)} clusters)")
+
+    # Rappel: paires plantées au-dessus du seuil (Jaccard exact) retrouvées dans un même cluster
+    symbol_ids = dict(detector.db.fetchall("SELECT path || ':' || symbol, id FROM clone_functions"))
+    detector._load_fingerprints(index, index.ids)
+    cluster_of = {}
+    for number, cluster in enumerate(clusters):
+        for member in cluster.members:
+            cluster_of[(member["path"], member["symbol"].split(":")[1])] = number
+    expected = found = 0
+    for members in planted.values():
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                a = index.fingerprints[symbol_ids[members[i][0] + ":" + _symbol(members[i])]]
+                b = index.fingerprints[symbol_ids[members[j][0] + ":" + _symbol(members[j])]]
+                if len(a & b) / len(a | b) >= args.min_similarity:
+                    expected += 1
+                    found += cluster_of.get(members[i], -1) == cluster_of.get(members[j], -2)
+    family_of = {member: family for family, members in planted.items() for member in members}
+    clustered = sum(len(c.members) for c in clusters)
+    pure = sum(len(c.members) for c in clusters
+               if len({family_of.get((m["path"], m["symbol"].split(":")[1])) for m in c.members}) == 1
+               and (c.members[0]["path"], c.members[0]["symbol"].split(":")[1]) in family_of)
+    print(f"  recall                   {found / max(1, expected):9.1%}  "
+          f"({found}/{expected} planted pairs with Jaccard >= {args.min_similarity})")
+    print(f"  precision                {pure / max(1, clustered):9.1%}  "
+          f"(clustered functions in a cluster of one planted family)")
+
+
+def _symbol(member) -> str:
+    path, name = member
+    return path[:-3].replace("/", ".") + ":" + name
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark du découpage du code pour la knowledge base (sur ce dépôt)
+
+Compare l'ancien découpage par lignes "class "/"def " (tronqué à 2000
+caractères) au découpage AST par symbole:
+- build: temps de découpage (AST en série et en pool de processus) + encodage
+- retrieval: requêtes = première ligne de docstring de méthodes; un
+  résultat est pertinent s'il contient la source complète de la méthode.
+  On mesure hit@1, hit@5, MRR et les tokens ramenés par le top-5.
+
+Usage:
+    python benchmarks/bench_code_chunker.py [--queries 300] [--workers 4] [--max-tokens 512]
+"""
+
+import argparse
+import ast
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cortex.core.code_chunker import chunk_python_job
+from cortex.core.embeddings import Embedder, HashingBackend
+from cortex.core.token_counter import count_tokens, is_exact
+
+ROOT = Path(__file__).parent.parent
+
+
+def python_files():
+    files = []
+    for path in sorted(ROOT.rglob("*.py")):
+        relative = path.relative_to(ROOT)
+        if any(part.startswith('.') or part == '__pycache__' for part in relative.parts):
+            continue
+        files.append((relative.as_posix(), path.read_text(encoding="utf-8")))
+    return files
+
+
+def legacy_chunks(content):
+    """Ancien ProjectKnowledgeBase._chunk_python_file (contenu seulement)"""
+    chunks, current = [], []
+    for line in content.split('\n'):
+        stripped = line.strip()
+        if stripped.startswith('class ') or (stripped.startswith('def ') and not line.startswith(' ')):
+            if current:
+                chunks.append('\n'.join(current)[:2000])
+            current = [line]
+        elif current:
+            current.append(line)
+    if current:
+        chunks.append('\n'.join(current)[:2000])
+    return chunks
+
+
+def method_queries(files, n, seed=0):
+    """(requête, source de la méthode) pour des méthodes documentées"""
+    queries = []
+    for _, content in files:
+        try:
+            tree = ast.parse(content)
+        except SyntaxError:
+            continue
+        lines = content.splitlines()
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.ClassDef):
+                continue
+            for child in node.body:
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    docstring = ast.get_docstring(child)
+                    if docstring and len(docstring.split("\n")[0]) > 15:
+                        source = "\n".join(lines[child.lineno - 1:child.end_lineno])
+                        queries.append((f"{node.name} {docstring.split(chr(10))[0]}", source))
+    random.Random(seed).shuffle(queries)
+    return queries[:n]
+
+
+def evaluate(name, texts, queries, embedder, build_seconds):
+    t = time.perf_counter()
+    matrix = embedder.embed_many(texts)
+    embed_seconds = time.perf_counter() - t
+    query_vectors = embedder.embed_many([q for q, _ in queries])
+    tokens = [count_tokens(text) for text in texts]
+
+    hit1 = hit5 = mrr = 0.0
+    returned_tokens = 0
+    for vector, (_, source) in zip(query_vectors, queries):
+        top = np.argsort(-(matrix @ vector))[:5]
+        returned_tokens += sum(tokens[i] for i in top)
+        for rank, i in enumerate(top, 1):
+            if source in texts[i]:
+                hit1 += rank == 1
+                hit5 += 1
+                mrr += 1 / rank
+                break
+
+    n = len(queries)
+    print(f"{name:<14} {len(texts):>7} {build_seconds:>8.2f}s {embed_seconds:>8.2f}s "
+          f"{hit1 / n:>6.1%} {hit5 / n:>6.1%} {mrr / n:>6.3f} {returned_tokens / n:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Code chunker benchmark")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-tokens", type=int, default=512)
+    args = parser.parse_args()
+
+    files = python_files()
+    queries = method_queries(files, args.queries)
+    print(f"{len(files)} Python files, {len(queries)} queries, "
+          f"tokenizer: {'tiktoken' if is_exact() else 'len//4 fallback'}\n")
+
+    t = time.perf_counter()
+    legacy = [chunk for _, content in files for chunk in legacy_chunks(content)]
+    legacy_seconds = time.perf_counter() - t
+
+    jobs = [(content, relative, args.max_tokens) for relative, content in files]
+    t = time.perf_counter()
+    serial = [chunk for job in jobs for chunk in chunk_python_job(job)]
+    serial_seconds = time.perf_counter() - t
+
+    t = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        pooled = [chunk for chunks in pool.map(chunk_python_job, jobs, chunksize=16) for chunk in chunks]
+    pool_seconds = time.perf_counter() - t
+    assert [c.symbol for c in pooled] == [c.symbol for c in serial]
+
+    print(f"AST chunking: serial {serial_seconds:.2f}s, pool({args.workers}) {pool_seconds:.2f}s\n")
+    print(f"{'chunker':<14} {'chunks':>7} {'chunk':>9} {'embed':>9} {'hit@1':>6} {'hit@5':>6} {'MRR':>6} {'top5 tok':>9}")
+
+    evaluate("lines (legacy)", legacy, queries, Embedder(HashingBackend(512)), legacy_seconds)
+    evaluate("ast", [c.content for c in serial], queries, Embedder(HashingBackend(512)), serial_seconds)
+
+
+if __name__ == "__main__":
+    main()
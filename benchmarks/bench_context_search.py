@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la recherche dans le cache de contextes (ContextManager)
+
+Compare, pour 1k, 10k et 100k contextes:
+- legacy: boucle Python sur chaque CachedContext + cosine_similarity
+- store: ContextStore (matrice mmap pré-normalisée, matvec + argpartition)
+- insert: réécriture complète du JSON (legacy) vs ajout seul (store)
+
+Usage:
+    python benchmarks/bench_context_search.py [--sizes 1000,10000,100000] [--dimensions 11]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cortex.core.context_manager import ContextManager, CachedContext
+from cortex.core.context_store import ContextStore
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def legacy_search(manager, cache, query_embedding, top_k=3, threshold=0.5):
+    results = []
+    for cached_ctx in cache:
+        similarity = manager.cosine_similarity(query_embedding, cached_ctx.embedding)
+        if similarity >= threshold:
+            results.append((cached_ctx, similarity))
+    results.sort(key=lambda x: x[1], reverse=True)
+    return results[:top_k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Context cache search benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--dimensions", type=int, default=0,
+                        help="Embedding dimensions (default: ContextManager.create_embedding)")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    manager = ContextManager(None, tempfile.mkdtemp())
+    dimensions = args.dimensions or len(manager.create_embedding(""))
+    rng = np.random.default_rng(0)
+    print(f"dimensions: {dimensions}\n")
+
+    print(f"{'contexts':>9} {'legacy p50':>11} {'store p50':>10} {'store p99':>10} "
+          f"{'speedup':>8} {'json insert':>12} {'append':>9}")
+
+    for n in (int(s) for s in args.sizes.split(",")):
+        vectors = np.abs(rng.standard_normal((n, dimensions))).astype(np.float32)
+        queries = np.abs(rng.standard_normal((args.queries, dimensions))).astype(np.float32)
+
+        store = ContextStore(tempfile.mkdtemp(), dimensions=dimensions, max_entries=n * 2)
+        batch = 10000
+        for start in range(0, n, batch):
+            store.add_many([
+                {"id": f"ctx_{i}", "content": f"context {i}", "embedding": vectors[i], "metadata": {}}
+                for i in range(start, min(n, start + batch))
+            ])
+
+        store_ms = []
+        for query in queries:
+            t = time.perf_counter()
+            store.search(query, top_k=3, threshold=0.5)
+            store_ms.append((time.perf_counter() - t) * 1000)
+
+        cache = [
+            CachedContext(id=f"ctx_{i}", content=f"context {i}", embedding=vectors[i].tolist(),
+                          metadata={}, created_at="", usage_count=0)
+            for i in range(n)
+        ]
+        legacy_ms = []
+        for query in queries[:max(3, 20000 // n)]:
+            t = time.perf_counter()
+            legacy_search(manager, cache, query.tolist())
+            legacy_ms.append((time.perf_counter() - t) * 1000)
+
+        # Insertion: le legacy réécrit tout le JSON (embeddings inclus)
+        json_path = Path(tempfile.mkdtemp()) / "context_cache.json"
+        t = time.perf_counter()
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"contexts": [vars(ctx) for ctx in cache]}, f, indent=2)
+        json_ms = (time.perf_counter() - t) * 1000
+
+        append_ms = []
+        for i in range(50):
+            t = time.perf_counter()
+            store.add(f"new_{i}", "new context", queries[i % len(queries)])
+            append_ms.append((time.perf_counter() - t) * 1000)
+
+        legacy_p50 = statistics.median(legacy_ms)
+        store_p50 = statistics.median(store_ms)
+        print(f"{n:>9} {legacy_p50:>9.2f}ms {store_p50:>8.3f}ms {percentile(store_ms, 0.99):>8.3f}ms "
+              f"{legacy_p50 / store_p50:>7.0f}x {json_ms:>10.1f}ms {statistics.median(append_ms):>7.3f}ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
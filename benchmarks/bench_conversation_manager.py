@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark de ConversationManager.add_message sur un long historique
+
+Compare:
+- stockage historique: recomptage de tous les tokens, résumés synchrones
+  (section puis global relu en entier), réécriture du JSON complet à chaque message
+- journal JSONL en ajout seul, tokens en cache, résumés dans un thread de fond
+
+Le LLM est simulé (latence fixe par appel). Pré-remplit N messages puis mesure
+la latence de chaque add_message suivant.
+
+Usage:
+    python benchmarks/bench_conversation_manager.py [--sizes 1000 10000] [--adds 200] [--latency 0.3]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cortex.core.conversation_manager import ConversationManager
+from cortex.core.token_counter import count_tokens
+
+
+class FakeLLM:
+    """LLM simulé: latence fixe, résumé court"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def complete(self, messages, **kwargs):
+        time.sleep(self.latency)
+        self.calls += 1
+        return SimpleNamespace(content=f"summary {self.calls}: " + "key decision " * 40)
+
+
+class LegacyConversationStore:
+    """Comportement d'origine de ConversationManager (pour comparaison)"""
+
+    SECTION_TOKEN_THRESHOLD = ConversationManager.SECTION_TOKEN_THRESHOLD
+    GLOBAL_TOKEN_THRESHOLD = ConversationManager.GLOBAL_TOKEN_THRESHOLD
+
+    def __init__(self, llm_client, storage_path: str):
+        self.llm_client = llm_client
+        self.storage_path = Path(storage_path)
+        self.sections = []
+        self.current = {"messages": [], "summary": None, "token_count": 0}
+        self.global_summary = None
+
+    def _tokens(self, messages):
+        return sum(count_tokens(m["content"]) for m in messages)
+
+    def add_message(self, role: str, content: str, save: bool = True):
+        self.current["messages"].append({"role": role, "content": content})
+        self.current["token_count"] = self._tokens(self.current["messages"])
+
+        if self.current["token_count"] >= self.SECTION_TOKEN_THRESHOLD:
+            text = "\n\n".join(f"{m['role'].upper()}: {m['content']}" for m in self.current["messages"])
+            self.current["summary"] = self.llm_client.complete([{"role": "user", "content": text}]).content
+            self.sections.append(self.current)
+            self.current = {"messages": [], "summary": None, "token_count": 0}
+
+        total = sum(s["token_count"] for s in self.sections) + self.current["token_count"]
+        if total >= self.GLOBAL_TOKEN_THRESHOLD and self.sections:
+            summaries = "\n\n---\n\n".join(s["summary"] for s in self.sections)
+            summary = self.llm_client.complete([{"role": "user", "content": summaries}]).content
+            # Le résumé global d'origine est concaténé à chaque cycle
+            self.global_summary = f"{self.global_summary}\n\n---NOUVEAU CYCLE---\n\n{summary}" \
+                if self.global_summary else summary
+            self.sections = []
+
+        if save:
+            self.save()
+
+    def save(self):
+        with open(self.storage_path, "w", encoding="utf-8") as f:
+            json.dump({"sections": self.sections, "current_section": self.current,
+                       "global_summary": self.global_summary}, f, indent=2, ensure_ascii=False)
+
+
+def message(i: int) -> str:
+    return f"Message {i}: please refactor the handler and keep retries idempotent. " + "context " * 20
+
+
+def measure(store, prefill: int, adds: int):
+    """Pré-remplit l'historique puis mesure chaque add_message"""
+    for i in range(prefill):
+        store.add_message("user" if i % 2 == 0 else "assistant", message(i), **(
+            {"save": False} if isinstance(store, LegacyConversationStore) else {}))
+    if isinstance(store, LegacyConversationStore):
+        store.save()
+    else:
+        store.wait_for_summaries()
+
+    latencies = []
+    for i in range(prefill, prefill + adds):
+        start = time.perf_counter()
+        store.add_message("user" if i % 2 == 0 else "assistant", message(i))
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "max": latencies[-1] * 1000,
+        "total": sum(latencies),
+    }
+
+
+def report(label: str, stats):
+    print(f"  {label:<28} p50 {stats['p50']:8.3f}ms  p99 {stats['p99']:8.2f}ms  "
+          f"max {stats['max']:8.2f}ms  total {stats['total']:6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--adds", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3, help="Simulated LLM latency (seconds)")
+    args = parser.parse_args()
+
+    print(f"add_message latency over {args.adds} adds, LLM latency {args.latency * 1000:.0f}ms")
+    for size in args.sizes:
+        workdir = Path(tempfile.mkdtemp())
+        print(f"\n{size} messages of history")
+
+        legacy = measure(LegacyConversationStore(FakeLLM(args.latency), str(workdir / "legacy.json")),
+                         size, args.adds)
+        report("legacy (JSON rewrite, sync)", legacy)
+
+        manager = ConversationManager(FakeLLM(args.latency), storage_path=str(workdir / "history.jsonl"))
+        current = measure(manager, size, args.adds)
+        manager.close()
+        report("append-only log, background", current)
+        print(f"  p99 speedup: {legacy['p99'] / current['p99']:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
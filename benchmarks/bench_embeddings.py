@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Débit de l'encodeur d'embeddings (textes/seconde)
+
+Pour chaque backend disponible et chaque taille de lot:
+- cold: aucun texte mémoïsé, tout passe par le backend
+- disk: nouveau processus simulé, textes servis par le mémo SQLite
+- memory: textes servis par le LRU en mémoire
+
+Usage:
+    python benchmarks/bench_embeddings.py [--texts 2000] [--batch-sizes 1,8,32,128]
+                                          [--backends hashing,onnx,sentence-transformers]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cortex.core.embeddings import Embedder, create_backend
+
+
+WORDS = (
+    "fix bug login authentication token cache user request response database query index "
+    "refactor module function class method test error timeout retry config agent tool "
+    "context embedding vector search result file path parse json yaml async worker queue"
+).split()
+
+
+def make_texts(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 60))) + f" #{i}" for i in range(n)]
+
+
+def throughput(embedder, texts, batch_size):
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        embedder.embed_many(texts[i:i + batch_size], batch_size=batch_size)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding throughput benchmark")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-sizes", default="1,8,32,128")
+    parser.add_argument("--backends", default="hashing,onnx,sentence-transformers")
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+
+    print(f"{'backend':<24} {'batch':>6} {'cold':>12} {'disk memo':>12} {'memory':>12}")
+    for name in args.backends.split(","):
+        try:
+            backend = create_backend(name)
+        except Exception as e:
+            print(f"{name:<24} unavailable ({e.__class__.__name__}: {str(e)[:60]})")
+            continue
+
+        for batch_size in batch_sizes:
+            memo_path = str(Path(tempfile.mkdtemp()) / "embeddings.db")
+
+            cold = Embedder(backend, memo_path=memo_path, memory_entries=args.texts * 2)
+            cold_rate = throughput(cold, texts, batch_size)
+            memory_rate = throughput(cold, texts, batch_size)
+
+            restarted = Embedder(backend, memo_path=memo_path, memory_entries=args.texts * 2)
+            disk_rate = throughput(restarted, texts, batch_size)
+
+            print(f"{backend.name:<24} {batch_size:>6} {cold_rate:>8.0f}/s {disk_rate:>10.0f}/s {memory_rate:>10.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'escalade: séquentielle vs course entre tiers
+
+Provider local factice (tests/fake_provider.py) avec un profil par tier
+(délai du premier token, débit) et un évaluateur déterministe: une réponse
+passe le seuil si le tier est au moins du niveau de difficulté de la tâche.
+Le mélange de tâches est 50% faciles (nano suffit), 30% moyennes
+(deepseek) et 20% difficiles (claude).
+
+Rapporte p50/p95 de latence, coût moyen par tâche et tier final.
+
+Usage:
+    python benchmarks/bench_escalation_race.py [--tasks 30] [--hedge-delay 0.5] [--cost-cap 0.02]
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openai import OpenAI
+from anthropic import Anthropic
+
+from cortex.core.llm_client import LLMClient
+from cortex.core.model_router import ModelTier
+from cortex.agents.base_agent import AgentConfig, BaseAgent
+from tests.fake_provider import FakeProvider
+
+RANK = {"easy": 0, "medium": 1, "hard": 2, "nano": 0, "deepseek": 1, "claude": 2}
+
+# (délai premier token, délai entre mots) en secondes
+PROFILES = {"nano": (0.15, 0.002), "deepseek": (0.35, 0.003), "claude": (0.5, 0.004)}
+ANSWER_WORDS = 150
+EVALUATION_LATENCY = 0.12
+
+
+def request_text(body):
+    parts = [body.get("system", "")] if isinstance(body.get("system"), str) else []
+    for message in body.get("messages", []):
+        content = message.get("content", "")
+        parts.append(content if isinstance(content, str) else json.dumps(content))
+    return "\n".join(parts)
+
+
+def responder(path, body):
+    """Réponse par tier; évaluation: score selon tier vs difficulté"""
+    text = request_text(body)
+    if "quality assessor" in text:
+        difficulty = re.search(r"difficulty=(\w+)", text).group(1)
+        tier = re.search(r"answer from (\w+)", text).group(1)
+        score = 8.0 if RANK[tier] >= RANK[difficulty] else 3.0
+        verdict = {"score": score, "confidence": 0.9, "issues": [], "strengths": [],
+                   "needs_escalation": score < 6, "suggested_tier": None, "suggested_expert": None,
+                   "reasoning": "benchmark"}
+        return {"text": json.dumps(verdict), "latency": EVALUATION_LATENCY, "first_token_delay": 0, "chunk_delay": 0}
+
+    model = body.get("model", "")
+    tier = "claude" if path.endswith("/messages") else ("deepseek" if "deepseek" in model else "nano")
+    first_token, per_word = PROFILES[tier]
+    text = f"answer from {tier} " + " ".join(f"w{i}" for i in range(ANSWER_WORDS))
+    if not body.get("stream"):
+        return {"text": text, "latency": first_token + per_word * ANSWER_WORDS}
+    return {"text": text, "latency": 0, "first_token_delay": first_token, "chunk_delay": per_word}
+
+
+def make_agent(provider, settings):
+    client = LLMClient(use_cache=False)
+    client.openai_client = OpenAI(api_key="test", base_url=provider.openai_url, max_retries=0)
+    client.deepseek_client = OpenAI(api_key="test", base_url=provider.openai_url, max_retries=0)
+    client.anthropic_client = Anthropic(api_key="test", base_url=provider.anthropic_url, max_retries=0, timeout=60)
+    agent = BaseAgent(
+        AgentConfig(name="BenchAgent", role="Benchmark", description="", base_prompt="Answer the task.",
+                    tier_preference=ModelTier.NANO),
+        llm_client=client,
+        print_updates=False
+    )
+    agent.escalation_settings.update(settings)
+    return agent
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs race escalation benchmark")
+    parser.add_argument("--tasks", type=int, default=30)
+    parser.add_argument("--hedge-delay", type=float, default=0.5)
+    parser.add_argument("--cost-cap", type=float, default=0.02)
+    parser.add_argument("--input-tokens", type=int, default=2000, help="prompt tokens billed per call")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    difficulties = rng.choices(["easy", "medium", "hard"], weights=[5, 3, 2], k=args.tasks)
+    settings = {"race_tiers": ["nano", "deepseek"], "hedge_tier": "claude",
+                "hedge_delay_seconds": args.hedge_delay, "race_cost_cap": args.cost_cap}
+
+    print(f"{args.tasks} tasks {dict(Counter(difficulties))}, hedge after {args.hedge_delay}s, "
+          f"cost cap ${args.cost_cap}\n")
+    print(f"{'mode':<11} {'p50':>7} {'p95':>7} {'mean':>7} {'cost/task':>11} {'passed':>7}  final tiers")
+
+    with FakeProvider(responder=responder, tokens_input=args.input_tokens) as provider:
+        for mode in ("sequential", "race"):
+            agent = make_agent(provider, settings)
+            latencies, tiers, passed = [], Counter(), 0
+            for i, difficulty in enumerate(difficulties):
+                start = time.perf_counter()
+                result = agent.execute_with_escalation(
+                    f"Task {i} difficulty={difficulty}", max_tier=ModelTier.CLAUDE,
+                    quality_threshold=6.0, use_tools=False, mode=mode
+                )
+                latencies.append(time.perf_counter() - start)
+                tiers[result.get("final_tier", "failed")] += 1
+                passed += result.get("quality_score", 0) >= 6.0
+            agent.drain_race_attempts(timeout=30)
+
+            print(f"{mode:<11} {statistics.median(latencies):>6.2f}s {percentile(latencies, 0.95):>6.2f}s "
+                  f"{statistics.mean(latencies):>6.2f}s ${agent.total_cost / args.tasks:>10.5f} "
+                  f"{passed:>4}/{args.tasks}  {dict(tiers)}")
+
+
+if __name__ == "__main__":
+    main()
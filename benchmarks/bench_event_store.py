@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark du journal d'événements (EventStore) selon le nombre d'événements
+
+Pour chaque taille (10k → 1M événements), mesure p50/p99 de:
+- append (événement + agrégats horaires et totaux, une transaction)
+- query filtrée (un agent, échecs, 50 derniers)
+- tableau de bord /costs (totaux par tier + dernières 24h par agent)
+- analyze_recent_performance(100)
+
+Compare avec le calcul d'origine d'un tableau de bord multi-sessions:
+relire les session_*.jsonl et agréger en Python, mesuré jusqu'à --legacy-max.
+
+Usage:
+    python benchmarks/bench_event_store.py [--sizes 10000,100000,1000000]
+                                           [--samples 200] [--legacy-max 100000]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cortex.core.cortex_logger import CortexLogger, EventType
+from cortex.core.event_store import EventStore
+
+AGENTS = [f"Agent{i}" for i in range(25)]
+TIERS = ["nano", "deepseek", "claude"]
+TYPES = [EventType.TASK_START, EventType.TASK_COMPLETE, EventType.TASK_FAIL, EventType.TOOL_CALL,
+         EventType.ESCALATION, EventType.ROUTING_OUTCOME]
+
+
+def make_event(i: int, start: datetime, rng: random.Random) -> dict:
+    event_type = rng.choice(TYPES)
+    return {
+        "timestamp": (start + timedelta(seconds=3 * i)).isoformat(),
+        "event_type": event_type.value,
+        "agent": rng.choice(AGENTS),
+        "tier": rng.choice(TIERS),
+        "message": f"event {i}",
+        "cost": rng.uniform(0, 0.01),
+        "latency_ms": rng.uniform(50, 3000),
+        "success": event_type != EventType.TASK_FAIL,
+        "task_id": f"task_{i // 4}",
+        "data": {"error": "Timeout"} if event_type == EventType.TASK_FAIL else {}
+    }
+
+
+def grow(store: EventStore, sessions: Path, target: int, start: datetime, rng: random.Random,
+         next_id: int, write_jsonl: bool, chunk: int = 20000) -> int:
+    while next_id < target:
+        batch = [make_event(i, start, rng) for i in range(next_id, min(target, next_id + chunk))]
+        store.append_many(batch)
+        if write_jsonl:
+            with open(sessions / f"session_{next_id:09d}.jsonl", "w") as f:
+                f.writelines(json.dumps(event) + "\n" for event in batch)
+        next_id += len(batch)
+    return next_id
+
+
+def legacy_dashboard(sessions: Path):
+    """Totaux par tier et par agent en relisant toutes les sessions"""
+    by_tier, by_agent = {}, {}
+    for session_file in sorted(sessions.glob("session_*.jsonl")):
+        with open(session_file) as f:
+            for line in f:
+                event = json.loads(line)
+                by_tier[event["tier"]] = by_tier.get(event["tier"], 0.0) + event["cost"]
+                by_agent[event["agent"]] = by_agent.get(event["agent"], 0.0) + event["cost"]
+    return by_tier, by_agent
+
+
+def timed(fn, samples: int):
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--legacy-max", type=int, default=100000,
+                        help="Largest history re-aggregated from session JSONL files")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    workdir = Path(tempfile.mkdtemp())
+    sessions = workdir / "logs"
+    sessions.mkdir()
+    store = EventStore(str(workdir / "events.db"))
+    logger = CortexLogger(log_dir=workdir / "live", store=store)
+    rng = random.Random(42)
+    start = datetime(2026, 1, 1)
+    stored = 0
+
+    print("Latency by number of stored events, p50 / p99 (ms)")
+    print(f"  {'events':>9}  {'append':>16} {'query':>16} {'/costs':>16} {'analyze(100)':>16} {'legacy /costs':>14}")
+    for size in sizes:
+        load_start = time.perf_counter()
+        stored = grow(store, sessions, size, start, rng, stored, write_jsonl=size <= args.legacy_max)
+        load_s = time.perf_counter() - load_start
+        day_ago = start + timedelta(seconds=3 * stored) - timedelta(hours=24)  # 24h before the newest event
+
+        results = {
+            "query": timed(lambda: store.query(agents=[rng.choice(AGENTS)], success=False, limit=50), args.samples),
+            "costs": timed(lambda: (store.rollup(group_by=("tier",)),
+                                    store.rollup(group_by=("agent",), since=day_ago)),
+                           args.samples),
+            "analyze": timed(lambda: logger.analyze_recent_performance(100), args.samples),
+            "append": timed(lambda: logger.log(EventType.TASK_COMPLETE, rng.choice(AGENTS), "live",
+                                               cost=0.001, tier=rng.choice(TIERS), latency_ms=120.0),
+                            args.samples),
+        }
+        stored += args.samples
+        legacy = "-"
+        if size <= args.legacy_max:
+            legacy_ms = timed(lambda: legacy_dashboard(sessions), 3)[0]
+            legacy = f"{legacy_ms:>12.1f}"
+        print(f"  {size:>9}  "
+              + " ".join(f"{results[k][0]:7.3f} /{results[k][1]:7.3f}" for k in ("append", "query", "costs", "analyze"))
+              + f" {legacy:>14}   (loaded in {load_s:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
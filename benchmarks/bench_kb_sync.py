@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la synchronisation incrémentale de ProjectKnowledgeBase
+
+Sur un projet synthétique de N fichiers Python:
+- initial: première indexation (tout est découpé et encodé)
+- no-op: rien n'a changé (stat seulement)
+- touch: mtime modifié, contenu identique (relecture + empreinte)
+- edit: 1% des fichiers modifiés
+- force: ré-indexation complète (comportement de l'ancien index_project)
+
+Usage:
+    python benchmarks/bench_kb_sync.py [--files 2000] [--functions 8] [--backend hashing]
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cortex.core.embeddings import Embedder, create_backend
+from cortex.core.project_knowledge_base import ProjectKnowledgeBase
+
+
+def make_project(root: Path, files: int, functions: int):
+    for i in range(files):
+        package = root / f"pkg_{i % 20}"
+        package.mkdir(exist_ok=True)
+        body = "\n\n".join(
+            f"def function_{i}_{j}(value):\n    \"\"\"Compute step {j} of module {i}\"\"\"\n"
+            f"    total = value * {j} + {i}\n    return total\n"
+            for j in range(functions)
+        )
+        (package / f"module_{i}.py").write_text(body + "\n")
+
+
+def timed(kb, label, **kwargs):
+    report = kb.sync(**kwargs)
+    print(f"{label:<10} {report.seconds * 1000:>10.1f}ms {report.files_changed:>8} "
+          f"{report.chunks_upserted:>9} {report.chunks_deleted:>8}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge base sync benchmark")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--functions", type=int, default=8)
+    parser.add_argument("--backend", default="hashing")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp())
+    make_project(root, args.files, args.functions)
+    kb = ProjectKnowledgeBase(root, embedder=Embedder(create_backend(args.backend)))
+    print(f"{args.files} files x {args.functions} functions, backend {kb.embed_fn.embedder.name}\n")
+
+    print(f"{'sync':<10} {'time':>12} {'changed':>8} {'upserted':>9} {'deleted':>8}")
+    timed(kb, "initial")
+    timed(kb, "no-op")
+
+    for path in sorted(root.glob("pkg_*/module_*.py"))[:max(1, args.files // 100)]:
+        path.touch()
+    timed(kb, "touch")
+
+    for path in sorted(root.glob("pkg_*/module_*.py"))[:max(1, args.files // 100)]:
+        path.write_text(path.read_text().replace("return total", "return total + 1", 1))
+    timed(kb, "edit")
+
+    timed(kb, "force", force=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark du cache sémantique L2
+
+Rejoue requests.jsonl (un prompt par requête):
+1. Passe "warm": lookup (miss attendu) puis insertion de chaque prompt
+2. Passes "paraphrase": lookup de variantes reformulées (légère / forte)
+3. Passe "unrelated": lookup des corps de requêtes (aucun hit attendu)
+
+Mesure le hit rate, les faux hits et la latence p50/p99 des lookups,
+optionnellement avec un index pré-rempli (--fill) pour simuler la charge.
+
+Usage:
+    python benchmarks/bench_l2_cache.py [requests.jsonl] [--fill 10000]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cortex.cache.semantic_cache import SemanticCache
+
+
+def light_paraphrase(prompt: str) -> str:
+    """Reformulation légère: casse et ponctuation"""
+    return prompt.lower().replace(":", "").replace("`", "").replace(",", "") + "?"
+
+
+def heavy_paraphrase(prompt: str) -> str:
+    """Reformulation plus forte: formule de politesse ajoutée"""
+    return f"Could you please {light_paraphrase(prompt)}"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def timed_lookup(cache, scope, text, latencies):
+    start = time.perf_counter()
+    entry = cache.lookup(scope, text)
+    latencies.append((time.perf_counter() - start) * 1000)
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="L2 semantic cache benchmark")
+    parser.add_argument("requests", nargs="?", default="requests.jsonl")
+    parser.add_argument("--fill", type=int, default=0,
+                        help="Entrées synthétiques à pré-insérer (autre portée)")
+    parser.add_argument("--threshold", type=float, default=0.92)
+    args = parser.parse_args()
+
+    with open(args.requests, encoding="utf-8") as f:
+        requests = [json.loads(line) for line in f if line.strip()]
+
+    scope = "nano:bench"
+    tmpdir = tempfile.mkdtemp(prefix="bench_l2_")
+    cache = SemanticCache(
+        path=tmpdir,
+        max_entries=max(1000, args.fill + len(requests) * 2),
+        similarity_threshold=args.threshold
+    )
+
+    # Pré-remplissage: même tier mais prompt système différent
+    for i in range(args.fill):
+        cache.add("nano:filler", f"synthetic request number {i} about topic {i % 97}",
+                  {"content": f"filler {i}", "tokens": 100, "cost": 0.0001})
+
+    latencies = []
+
+    # Passe 1: warm
+    warm_hits = 0
+    for req in requests:
+        if timed_lookup(cache, scope, req["title"], latencies):
+            warm_hits += 1
+        cache.add(scope, req["title"], {
+            "content": req["request_id"], "tokens": 500, "cost": 0.001
+        })
+
+    # Passe 2: paraphrases
+    para_hits = {"light": 0, "heavy": 0}
+    false_hits = 0
+    for req in requests:
+        for kind, rewrite in (("light", light_paraphrase), ("heavy", heavy_paraphrase)):
+            entry = timed_lookup(cache, scope, rewrite(req["title"]), latencies)
+            if entry:
+                para_hits[kind] += 1
+                if entry["content"] != req["request_id"]:
+                    false_hits += 1
+
+    # Passe 3: requêtes non liées
+    unrelated_hits = 0
+    for req in requests:
+        if timed_lookup(cache, scope, req["body"], latencies):
+            unrelated_hits += 1
+
+    n = len(requests)
+    print("=" * 60)
+    print("L2 SEMANTIC CACHE BENCHMARK")
+    print("=" * 60)
+    print(f"Requests replayed:      {n}")
+    print(f"Index size:             {len(cache)} (fill={args.fill})")
+    print(f"Threshold:              {args.threshold}")
+    print(f"Warm pass hits:         {warm_hits}/{n}")
+    for kind, hits in para_hits.items():
+        print(f"Paraphrase hit rate ({kind}): {hits / n:.1%} ({hits}/{n})")
+    print(f"False hits:             {false_hits}")
+    print(f"Unrelated hits:         {unrelated_hits}/{n}")
+    print(f"Lookup p50:             {percentile(latencies, 0.50):.3f} ms")
+    print(f"Lookup p99:             {percentile(latencies, 0.99):.3f} ms")
+    print(f"Cache stats:            {cache.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
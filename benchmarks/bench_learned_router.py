@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark du routeur appris: entraînement, latence d'inférence, rejeu
+
+Génère un historique synthétique d'escalades (gabarits de tâches par tier,
+avec une part de labels bruités), l'écrit au format CortexLogger, puis
+entraîne sur les 80% les plus anciens et rejoue les 20% restants:
+- heuristiques seules (ModelRouter: patterns + complexité)
+- routeur appris avec repli sur les heuristiques sous le seuil de confiance
+
+Usage:
+    python benchmarks/bench_learned_router.py [--outcomes 5000] [--noise 0.05] [--min-confidence 0.7]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cortex.core.cortex_logger import CortexLogger, EventType
+from cortex.core.learned_router import LearnedRouter, evaluate_router, load_history
+
+
+VERBS = {
+    "nano": ["list", "show", "count", "read", "rename", "print", "get"],
+    "deepseek": ["implement", "refactor", "debug", "write tests for", "find why", "optimize", "migrate"],
+    "claude": ["design", "decide", "choose between", "evaluate tradeoffs of", "plan", "architect"]
+}
+OBJECTS = {
+    "nano": ["the files in {x}", "the {x} config", "open issues for {x}", "the {x} log tail"],
+    "deepseek": ["the {x} module", "the {x} endpoint", "{x} retries", "the {x} parser"],
+    "claude": ["the {x} platform rollout", "a storage engine for {x}", "the {x} service boundaries",
+               "the long-term strategy for {x}"]
+}
+SUBJECTS = ["billing", "auth", "search", "cache", "scheduler", "exporter", "gateway", "inbox",
+            "payments", "reports", "notifications", "uploads"]
+TIERS = ["nano", "deepseek", "claude"]
+COST = {"nano": 0.0002, "deepseek": 0.002, "claude": 0.02}
+
+
+def generate(log_dir: Path, outcomes: int, noise: float, seed: int):
+    rng = random.Random(seed)
+    logger = CortexLogger(log_dir=log_dir)
+    weights = [0.6, 0.3, 0.1]
+    for _ in range(outcomes):
+        tier = rng.choices(TIERS, weights)[0]
+        task = f"{rng.choice(VERBS[tier])} {rng.choice(OBJECTS[tier]).format(x=rng.choice(SUBJECTS))}"
+        if rng.random() < noise:
+            tier = rng.choice(TIERS)
+        attempts = [{"tier": t, "quality_score": 3.0, "cost": COST[t]} for t in TIERS[:TIERS.index(tier)]]
+        attempts.append({"tier": tier, "quality_score": 8.0, "cost": COST[tier]})
+        logger.log(EventType.ROUTING_OUTCOME, "Agent", "outcome",
+                   data={"task": task, "attempts": attempts, "threshold": 6.0},
+                   cost=sum(a["cost"] for a in attempts))
+
+
+def print_report(name, report):
+    print(f"\n  {name}")
+    print(f"    accuracy {report['accuracy']:.1%}, confident {report['coverage']:.0%}")
+    print(f"    escalations {report['replay_escalations']} (history {report['history_escalations']}), "
+          f"over-provisioned {report['over_provisioned']}")
+    print(f"    cost ${report['replay_cost']:.3f} (history ${report['history_cost']:.3f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--outcomes", type=int, default=5000)
+    parser.add_argument("--noise", type=float, default=0.05)
+    parser.add_argument("--min-confidence", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    log_dir = Path(tempfile.mkdtemp())
+    generate(log_dir, args.outcomes, args.noise, args.seed)
+    examples = load_history(log_dir)
+    split = int(len(examples) * 0.8)
+
+    start = time.perf_counter()
+    router = LearnedRouter().fit(examples[:split])
+    train_time = time.perf_counter() - start
+
+    holdout = examples[split:]
+    print(f"Routing outcomes: {len(examples)} ({split} train / {len(holdout)} replayed), noise {args.noise:.0%}")
+    print(f"Training: {train_time:.2f}s, {len(router.weights):,} hashed features")
+
+    heuristics = evaluate_router(None, holdout, args.min_confidence)
+    learned = evaluate_router(router, holdout, args.min_confidence)
+    print_report("Heuristics only (ModelRouter patterns)", heuristics)
+    print_report(f"Learned router (fallback below {args.min_confidence:.0%})", learned)
+    print(f"\n  Escalations avoided vs history: {learned['escalations_avoided']}")
+    print(f"  Inference: {learned['inference_us_p50']:.1f}µs p50, {learned['inference_us_p99']:.1f}µs p99")
+
+
+if __name__ == "__main__":
+    main()
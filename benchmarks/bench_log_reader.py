@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la lecture des journaux par QualityControlAgent
+
+Sur un journal synthétique (1 Go par défaut), compare:
+- lecture d'origine: readlines() du fichier entier pour garder les dernières lignes
+- tail_lines: dernières lignes lues à reculons sur un mmap
+- LogIngestor: premier passage (tout le fichier, puis borné à max_backfill),
+  puis audit suivant après ajout de 1 Mo (seules les nouvelles lignes)
+
+Chaque mesure tourne dans un processus neuf (mémoire max = ru_maxrss).
+
+Usage:
+    python benchmarks/bench_log_reader.py [--size-mb 1024] [--lines 250] [--skip-legacy]
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+LEVELS = ["INFO"] * 14 + ["DEBUG"] * 4 + ["WARNING"] + ["ERROR"]
+AGENTS = ["TriageAgent", "PlannerAgent", "ToolerAgent", "ContextAgent", "QualityControlAgent"]
+
+
+def write_log(path: Path, size_bytes: int, seed: int = 1):
+    """Journal texte synthétique (lignes de 80 à 200 octets)"""
+    rng = random.Random(seed)
+    block = "".join(
+        f"2026-10-16 12:{i % 60:02d}:{i % 57:02d} {rng.choice(LEVELS)} [{rng.choice(AGENTS)}] "
+        f"request {i} handled in {rng.randint(5, 900)} ms " + "x" * rng.randint(0, 110) + "\n"
+        for i in range(20000)
+    ).encode()
+    written = 0
+    with open(path, "ab") as f:
+        while written < size_bytes:
+            chunk = block[:size_bytes - written]
+            f.write(chunk)
+            written += len(chunk)
+        if not chunk.endswith(b"\n"):
+            f.write(b"\n")
+
+
+def run_child(code: str):
+    """Exécute une mesure dans un processus neuf: (résultat, secondes, Mo max)"""
+    wrapper = (
+        "import json, resource, sys, time\n"
+        f"sys.path.insert(0, {str(ROOT)!r})\n"
+        "start = time.perf_counter()\n"
+        f"{code}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024\n"
+        "print(json.dumps([result, elapsed, rss]))"
+    )
+    output = subprocess.run([sys.executable, "-c", wrapper], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--lines", type=int, default=250, help="Recent lines kept (max_lines // 2)")
+    parser.add_argument("--backfill-mb", type=int, default=64)
+    parser.add_argument("--skip-legacy", action="store_true", help="Skip readlines() (needs ~2x the file in RAM)")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    log = workdir / "agents.log"
+    start = time.perf_counter()
+    write_log(log, args.size_mb * 1024 * 1024)
+    size_mb = log.stat().st_size / 1024 / 1024
+    print(f"Synthetic log: {size_mb:.0f} MB written in {time.perf_counter() - start:.1f}s\n")
+
+    rows = []
+    if not args.skip_legacy:
+        rows.append(("readlines()[-n:] (legacy)", run_child(
+            f"with open({str(log)!r}, 'r', encoding='utf-8', errors='ignore') as f:\n"
+            f"    result = len(f.readlines()[-{args.lines}:])"
+        )))
+    rows.append((f"tail_lines({args.lines})", run_child(
+        "from cortex.core.log_reader import tail_lines\n"
+        f"result = len(tail_lines({str(log)!r}, {args.lines}))"
+    )))
+
+    ingest = (
+        "from cortex.core.log_reader import LogIngestor\n"
+        "ingestor = LogIngestor({state!r}, max_backfill_bytes={backfill})\n"
+        f"result = ingestor.ingest({str(log)!r}, 'text')\n"
+        "ingestor.save()"
+    )
+    full_state, capped_state = str(workdir / "full.json"), str(workdir / "capped.json")
+    rows.append(("first audit, whole file", run_child(
+        ingest.format(state=full_state, backfill=log.stat().st_size))))
+    rows.append((f"first audit, last {args.backfill_mb} MB", run_child(
+        ingest.format(state=capped_state, backfill=args.backfill_mb * 1024 * 1024))))
+
+    write_log(log, 1024 * 1024, seed=2)
+    rows.append(("next audit, +1 MB appended", run_child(
+        ingest.format(state=full_state, backfill=log.stat().st_size))))
+    rows.append(("next audit, nothing new", run_child(
+        ingest.format(state=full_state, backfill=log.stat().st_size))))
+
+    print(f"  {'':<32} {'lines':>10} {'time':>10} {'max RSS':>10}")
+    for label, (result, elapsed, rss) in rows:
+        print(f"  {label:<32} {result:>10} {elapsed * 1000:>8.1f}ms {rss:>8.0f}MB")
+
+    with open(full_state) as f:
+        levels = json.load(f)["aggregates"]["levels"]
+    print(f"\n  Aggregated levels: {levels}")
+    log.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark de OptimizationKnowledge selon la taille de l'historique
+
+Pour chaque taille (1k → 1M requêtes historiques), mesure p50/p99 de:
+- record_request (métriques globales mises à jour)
+- find_similar_requests
+- get_optimization_advice
+- global_metrics
+
+Compare avec le stockage d'origine (listes en mémoire, métriques
+recalculées sur tout l'historique, similarité par parcours complet),
+mesuré jusqu'à --legacy-max.
+
+Usage:
+    python benchmarks/bench_optimization_knowledge.py [--sizes 1000,10000,100000,1000000]
+                                                      [--samples 200] [--legacy-max 100000]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cortex.departments.optimization.optimization_knowledge import (
+    OptimizationKnowledge,
+    HistoricalRequest,
+    RequestOutcome,
+)
+
+VERBS = ["add", "fix", "refactor", "migrate", "test", "document", "optimize", "remove", "split", "review"]
+VOCABULARY = [f"term{i}" for i in range(5000)]
+TOOLS = ["pytest", "grep", "git", "code_validator.sh", "code_formatter.sh"]
+
+
+class LegacyOptimizationKnowledge:
+    """Comportement d'origine: listes en mémoire, parcours complets"""
+
+    def __init__(self):
+        self.historical_requests = []
+        self.global_metrics = {}
+
+    def record_request(self, request):
+        self.historical_requests.append(request)
+        total = len(self.historical_requests)
+        successes = sum(1 for r in self.historical_requests if r.outcome == RequestOutcome.SUCCESS)
+        self.global_metrics["total_requests"] = total
+        self.global_metrics["success_rate"] = successes / total
+        self.global_metrics["avg_cost"] = sum(r.cost for r in self.historical_requests) / total
+        self.global_metrics["avg_duration"] = sum(r.duration_seconds for r in self.historical_requests) / total
+
+    def record_requests(self, requests):
+        for request in requests:
+            self.historical_requests.append(request)
+
+    def find_similar_requests(self, request_text, top_k=5):
+        keywords = set(request_text.lower().split())
+        scored = []
+        for hist_req in self.historical_requests:
+            overlap = len(keywords.intersection(set(hist_req.request_text.lower().split())))
+            if overlap > 0:
+                scored.append((overlap, hist_req))
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return [req for _, req in scored[:top_k]]
+
+
+def request_text(rng: random.Random) -> str:
+    # Distribution de Zipf: quelques mots très fréquents, beaucoup de rares
+    words = {VOCABULARY[min(int(rng.paretovariate(1.1)) - 1, len(VOCABULARY) - 1)] for _ in range(6)}
+    return f"{rng.choice(VERBS)} {' '.join(words)}"
+
+
+def make_request(i: int, rng: random.Random) -> HistoricalRequest:
+    return HistoricalRequest(
+        id=f"req_{i}",
+        timestamp=datetime.now(),
+        request_text=request_text(rng),
+        request_type=rng.choice(["code_development", "testing", "documentation"]),
+        outcome=RequestOutcome.SUCCESS if rng.random() < 0.8 else RequestOutcome.FAILURE,
+        workflow_used="CODE_DEVELOPMENT",
+        agents_involved=["CodeWriterAgent"],
+        duration_seconds=rng.uniform(5, 120),
+        cost=rng.uniform(0.001, 0.05),
+        files_modified=[],
+        lines_added=0,
+        lines_removed=0,
+        tools_used=rng.sample(TOOLS, 2),
+        patterns_applied=[],
+        errors_encountered=["timeout"] if rng.random() < 0.1 else []
+    )
+
+
+def grow(knowledge, target: int, rng: random.Random, next_id: int, chunk: int = 10000) -> int:
+    while next_id < target:
+        batch = [make_request(i, rng) for i in range(next_id, min(target, next_id + chunk))]
+        knowledge.record_requests(batch)
+        next_id += len(batch)
+    return next_id
+
+
+def timed(fn, samples: int):
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99)]
+
+
+def measure(knowledge, rng: random.Random, next_id: int, samples: int, legacy: bool):
+    queries = [request_text(rng) for _ in range(samples)]
+    it = iter(queries)
+    results = {
+        "find_similar": timed(lambda: knowledge.find_similar_requests(next(it)), samples),
+    }
+    if not legacy:
+        it = iter(queries)
+        results["advice"] = timed(lambda: knowledge.get_optimization_advice(next(it), "code_development"), samples)
+        results["metrics"] = timed(lambda: knowledge.global_metrics, samples)
+    ids = iter(range(next_id, next_id + samples))
+    results["record"] = timed(lambda: knowledge.record_request(make_request(next(ids), rng)), samples)
+    return results, next_id + samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--legacy-max", type=int, default=100000,
+                        help="Largest history measured with the legacy in-memory implementation")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    rng = random.Random(42)
+    knowledge = OptimizationKnowledge(db_path=str(Path(tempfile.mkdtemp()) / "optimization_knowledge.db"))
+    legacy = LegacyOptimizationKnowledge()
+    stored = legacy_stored = 0
+
+    print("Latency by history size, p50 / p99 (ms)")
+    print(f"  {'size':>9}  {'impl':<7} {'record_request':>18} {'find_similar':>18} {'advice':>18} {'metrics':>16}")
+    for size in sizes:
+        load_start = time.perf_counter()
+        stored = grow(knowledge, size, rng, stored)
+        load_s = time.perf_counter() - load_start
+        results, stored = measure(knowledge, rng, stored, args.samples, legacy=False)
+        print(f"  {size:>9}  {'sqlite':<7} "
+              + " ".join(f"{results[k][0]:8.3f} /{results[k][1]:8.3f}" for k in ("record", "find_similar", "advice"))
+              + f" {results['metrics'][0]:7.3f} /{results['metrics'][1]:7.3f}"
+              + f"   (loaded in {load_s:.1f}s)")
+
+        if size <= args.legacy_max:
+            legacy_stored = grow(legacy, size, rng, legacy_stored)
+            results, legacy_stored = measure(legacy, rng, legacy_stored, min(args.samples, 50), legacy=True)
+            print(f"  {'':>9}  {'legacy':<7} "
+                  + " ".join(f"{results[k][0]:8.3f} /{results[k][1]:8.3f}" for k in ("record", "find_similar")))
+
+
+if __name__ == "__main__":
+    main()
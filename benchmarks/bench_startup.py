@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark du démarrage à froid du CLI (interpréteur neuf → prompt prêt)
+
+Mesure, sur plusieurs lancements:
+- lazy: démarrage actuel (composants construits au premier usage)
+- eager: tous les composants construits au démarrage (coût d'avant)
+
+"to prompt" va du premier import de cortex au prompt prêt (le chiffre
+comparé à STARTUP_TARGET_MS, comme --profile-startup); "process" part du
+lancement de l'interpréteur, donc inclut le démarrage de Python et de site.
+Avec --max-ms, sort en erreur si la médiane lazy "to prompt" dépasse le
+seuil (suivi des régressions en CI).
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 7] [--max-ms 300] [--no-eager]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from cortex.cli.cortex_cli import STARTUP_TARGET_MS
+
+
+def probe(eager: bool):
+    """Un démarrage dans un interpréteur neuf"""
+    code = ("import json, time; start = time.perf_counter(); "
+            "from cortex.cli.cortex_cli import startup_probe; "
+            f"data = startup_probe(start, eager={eager}); data['ready_at'] = time.time(); "
+            "print(json.dumps(data))")
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # Bytecode en cache, comme une installation normale
+    launched = time.time()
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    data["process_ms"] = (data["ready_at"] - launched) * 1000
+    return data
+
+
+def measure(eager: bool, runs: int):
+    probe(eager)  # Échauffement: bytecode et bases SQLite créés
+    samples = [probe(eager) for _ in range(runs)]
+    return {key: statistics.median(s[key] for s in samples)
+            for key in ("import_ms", "init_ms", "startup_ms", "total_ms", "process_ms")}, samples[-1]
+
+
+def report(label: str, stats):
+    print(f"  {label:<8} import {stats['import_ms']:7.1f}  init {stats['init_ms']:7.1f}  "
+          f"startup {stats['startup_ms']:7.1f}  to prompt {stats['total_ms']:7.1f}  "
+          f"process {stats['process_ms']:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help=f"Fail if the median lazy time to prompt exceeds this (target: {STARTUP_TARGET_MS})")
+    parser.add_argument("--no-eager", action="store_true", help="Skip the eager (all components) run")
+    args = parser.parse_args()
+
+    print(f"Cold start to prompt, median of {args.runs} runs (ms)")
+    lazy, last = measure(False, args.runs)
+    report("lazy", lazy)
+    if not args.no_eager:
+        eager, _ = measure(True, args.runs)
+        report("eager", eager)
+        print(f"\n  {eager['total_ms'] / lazy['total_ms']:.1f}x faster to prompt")
+    print(f"  Built before the prompt: {', '.join(last['components']) or 'nothing'}")
+
+    if args.max_ms is not None and lazy["total_ms"] > args.max_ms:
+        print(f"\n✗ Startup regression: {lazy['total_ms']:.0f} ms > {args.max_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
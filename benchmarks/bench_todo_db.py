@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark de charge TodoDB: list_tasks avec lecteurs concurrents
+
+Compare, sur N tâches et R lecteurs concurrents:
+- legacy: une connexion par opération, verify_token et get_user par
+  ligne ouvrent chacun leur connexion (N+1)
+- pool: connexions WAL réutilisées, token en cache, une seule requête JOIN
+
+Usage:
+    python benchmarks/bench_todo_db.py [--tasks 10000] [--readers 50] [--calls 4]
+"""
+
+import argparse
+import statistics
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cortex.core.auth_manager import AuthManager, UserRole
+from cortex.core.model_router import ModelTier
+from cortex.core.todo_db import TodoDB
+
+
+def legacy_list_tasks(auth: AuthManager, todo_path: Path, token: str):
+    """Ancien TodoDB.list_tasks: connexion par opération + get_user par ligne"""
+    import jwt
+    payload = jwt.decode(token, auth.jwt_secret, algorithms=['HS256'])
+    with closing(sqlite3.connect(auth.db_path)) as conn:
+        conn.execute("SELECT id, username, role, is_active FROM users WHERE id = ?", (payload['user_id'],)).fetchone()
+
+    tasks = []
+    with closing(sqlite3.connect(todo_path)) as conn:
+        for row in conn.execute("SELECT * FROM tasks WHERE 1=1 ORDER BY created_at DESC").fetchall():
+            with closing(sqlite3.connect(auth.db_path)) as auth_conn:
+                owner = auth_conn.execute(
+                    "SELECT id, username, role, created_at, last_login FROM users WHERE id = ? AND is_active = 1",
+                    (row[5],)
+                ).fetchone()
+            tasks.append((row[0], owner[1] if owner else f"User#{row[5]}"))
+    return tasks
+
+
+def run_readers(readers, calls, fn):
+    """Lance `readers` threads qui appellent fn `calls` fois; retourne latences (ms) et durée"""
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(readers)
+
+    def reader():
+        barrier.wait()
+        local = []
+        for _ in range(calls):
+            t = time.perf_counter()
+            fn()
+            local.append((time.perf_counter() - t) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - start
+
+
+def report(label, latencies, elapsed, statements):
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<8} {statements:>11} {statistics.median(latencies):>10.1f}ms {p95:>10.1f}ms "
+          f"{len(latencies) / elapsed:>10.1f}/s")
+
+
+def count_statements(connections, fn):
+    statements = []
+    for conn in connections:
+        conn.set_trace_callback(statements.append)
+    fn()
+    for conn in connections:
+        conn.set_trace_callback(None)
+    return len(statements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TodoDB load benchmark")
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--readers", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=4, help="list_tasks calls per reader")
+    parser.add_argument("--legacy-calls", type=int, default=1)
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp())
+    auth = AuthManager(str(directory / "auth.db"))
+    todo = TodoDB(str(directory / "todo_pool.db"), auth)
+    for i in range(5):
+        auth.register_user(f"dev{i}", "password", UserRole.DEVELOPER)
+    tokens = [auth.login(f"dev{i}", "password")["token"] for i in range(5)]
+
+    for i in range(args.tasks):
+        todo.add_task(tokens[i % 5], f"task {i}", "context", ModelTier.NANO)
+    print(f"{args.tasks} tasks, {args.readers} concurrent readers\n")
+
+    token = tokens[0]
+    print(f"{'backend':<8} {'statements':>11} {'p50':>12} {'p95':>12} {'throughput':>12}")
+
+    # Les instructions SQL des connexions legacy ne sont pas traçables: 1 SELECT + 1 par ligne + verify
+    latencies, elapsed = run_readers(
+        args.readers, args.legacy_calls, lambda: legacy_list_tasks(auth, todo.db_path, token)
+    )
+    report("legacy", latencies, elapsed, args.tasks + 2)
+
+    todo.list_tasks(token)
+    statements = count_statements([todo.db.connection(), auth.db.connection()], lambda: todo.list_tasks(token))
+    latencies, elapsed = run_readers(args.readers, args.calls, lambda: todo.list_tasks(token))
+    report("pool", latencies, elapsed, statements)
+    print(f"\nconnections opened: todo {todo.db.connections_opened}, auth {auth.db.connections_opened}; "
+          f"token cache hits {auth.token_cache_hits}")
+
+
+if __name__ == "__main__":
+    main()
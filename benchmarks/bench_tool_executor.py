@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark des tool calls d'un tour LLM: exécution série vs parallèle
+
+Simule un tour où le modèle demande plusieurs web_fetch/read_file
+indépendants (latences I/O tirées au hasard) et mesure la latence du
+tour avec max_parallel=1 (ancien comportement) et avec le pool.
+
+Usage:
+    python benchmarks/bench_tool_executor.py [--calls 6] [--turns 5] [--max-latency 0.4]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cortex.core.llm_client import ToolCall
+from cortex.tools.standard_tool import StandardTool
+from cortex.tools.tool_executor import ToolExecutor
+
+
+class NoLLM:
+    """Le benchmark n'appelle que execute_tool_calls"""
+
+
+def io_tool(name, read_only):
+    def run(latency: float = 0.1):
+        time.sleep(latency)
+        return {"success": True, "data": f"{name} after {latency:.2f}s"}
+
+    return StandardTool(
+        name=name,
+        description=name,
+        parameters={"type": "object", "properties": {"latency": {"type": "number"}}, "required": []},
+        function=run,
+        read_only=read_only
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel tool calls benchmark")
+    parser.add_argument("--calls", type=int, default=6, help="tool calls per turn")
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--max-latency", type=float, default=0.4)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    turns = []
+    for turn in range(args.turns):
+        turns.append([
+            ToolCall(id=f"t{turn}c{i}", name=rng.choice(["web_fetch", "read_file"]),
+                     arguments={"latency": rng.uniform(0.02, args.max_latency)})
+            for i in range(args.calls)
+        ])
+
+    print(f"{args.turns} turns × {args.calls} independent calls\n")
+    print(f"{'mode':<10} {'mean turn':>10} {'slowest tool':>13} {'sum of tools':>13}")
+    for label, max_parallel in (("serial", 1), ("parallel", 8)):
+        executor = ToolExecutor(NoLLM(), max_parallel=max_parallel)
+        executor.register_tools([io_tool("web_fetch", True), io_tool("read_file", True)])
+        durations = []
+        for calls in turns:
+            start = time.perf_counter()
+            results = executor.execute_tool_calls(calls)
+            durations.append(time.perf_counter() - start)
+            assert [r.tool_call_id for r in results] == [c.id for c in calls]
+        executor.close()
+
+        slowest = statistics.mean(max(c.arguments["latency"] for c in calls) for calls in turns)
+        total = statistics.mean(sum(c.arguments["latency"] for c in calls) for calls in turns)
+        print(f"{label:<10} {statistics.mean(durations) * 1000:>8.0f}ms {slowest * 1000:>11.0f}ms {total * 1000:>11.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,20 @@ Base Agent - Classe de base pour tous les agents du Cortex
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass, field
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+import functools
 import json
+import random
+import threading
+import time
 
+from cortex.core.config_loader import get_config
+from cortex.core.cortex_logger import EventType, get_logger
 from cortex.core.llm_client import LLMClient, LLMResponse
+from cortex.core.prompt_cache import agent_scope, volatile
 from cortex.core.model_router import ModelRouter, ModelTier
 from cortex.core.quality_evaluator import QualityEvaluator, QualityAssessment
+from cortex.core.token_counter import count_tokens
 from cortex.tools.standard_tool import StandardTool
 from cortex.tools.tool_executor import ToolExecutor
 
@@ -58,6 +67,19 @@ class AgentMemory:
         return "\n".join(context_parts) if context_parts else "No prior context"
 
 
+class _RaceCancelled(Exception):
+    """Interrompt une tentative de course perdue (fermeture du stream)"""
+
+
+def _agent_scoped(method):
+    """Attribue les appels LLM de la méthode à l'agent (statistiques de cache)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with agent_scope(self.config.name):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 @dataclass
 class AgentConfig:
     """Configuration d'un agent"""
@@ -99,6 +121,8 @@ class BaseAgent:
         # Clients
         self.llm_client = llm_client or LLMClient()
         self.model_router = model_router or ModelRouter()
+        self.routing_exploration = get_config().get("agents.learned_routing.exploration_rate", 0.05)
+        self._exploration_rng = random.Random()
 
         # Tools
         self.tool_executor = ToolExecutor(self.llm_client)
@@ -124,6 +148,22 @@ class BaseAgent:
         # Contrôle des updates terminal
         self.print_updates = print_updates
 
+        # Escalade: mode et réglages de la course (agents.escalation)
+        self.escalation_settings: Dict[str, Any] = dict(get_config().get("agents.escalation", {}) or {})
+
+        # Tentatives de course perdues encore en vol (coût ajouté à leur fin)
+        self._race_inflight: set = set()
+        self._race_lock = threading.Lock()
+
+    def _add_cost(self, amount: float):
+        """Ajoute au coût total (les tentatives de course l'écrivent depuis leurs threads)"""
+        with self._race_lock:
+            self.total_cost += amount
+
+    def _side_effect_tools(self) -> List[str]:
+        """Tools disponibles qui ne sont pas read_only (non rejouables en parallèle)"""
+        return [name for name, tool in self.available_tools.items() if not tool.read_only]
+
     def register_tool(self, tool: StandardTool):
         """Enregistre un tool disponible pour cet agent"""
         self.available_tools[tool.name] = tool
@@ -166,6 +206,7 @@ class BaseAgent:
         symbol = symbols.get(level, "•")
         print(f"{symbol} [{self.config.name}] {message}")
 
+    @_agent_scoped
     def execute(
         self,
         task: str,
@@ -225,7 +266,7 @@ class BaseAgent:
                 )
 
             # Mettre à jour les stats
-            self.total_cost += response.cost
+            self._add_cost(response.cost)
 
             # Sauvegarder en mémoire
             self.memory.add_to_short_term({
@@ -329,7 +370,7 @@ class BaseAgent:
 
         # Mettre à jour nos stats
         if result.get("success"):
-            self.total_cost += result.get("cost", 0)
+            self._add_cost(result.get("cost", 0))
             self._print_update(f"Delegation to {agent.config.name} succeeded", level="success")
         else:
             self._print_update(f"Delegation to {agent.config.name} failed", level="error")
@@ -342,24 +383,22 @@ class BaseAgent:
         context: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, str]]:
         """Construit les messages pour le LLM"""
-        # System prompt avec mémoire
-        memory_context = self.memory.get_context()
-
+        # System prompt statique (préfixe cacheable par le provider)
         system_prompt = f"""{self.config.base_prompt}
 
 Your role: {self.config.role}
 Your name: {self.config.name}
 
-{memory_context}
-
 Core Principles (applies to ALL agents):
 - Always seek the cheapest solution that works
 - Be concise and efficient
 - Maximize value per token - every token costs money
 """
 
+        # La mémoire change à chaque tâche: placée après le préfixe stable
         messages = [
-            {"role": "system", "content": system_prompt}
+            {"role": "system", "content": system_prompt},
+            volatile({"role": "system", "content": f"Agent memory:\n{self.memory.get_context()}"})
         ]
 
         # Ajouter le contexte si fourni
@@ -471,6 +510,7 @@ Core Principles (applies to ALL agents):
 
         return result
 
+    @_agent_scoped
     def execute_with_escalation(
         self,
         task: str,
@@ -479,17 +519,25 @@ Core Principles (applies to ALL agents):
         quality_threshold: float = 6.0,
         context: Optional[Dict[str, Any]] = None,
         use_tools: bool = True,
-        verbose: bool = False
+        verbose: bool = False,
+        mode: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Exécute avec escalade automatique vers tiers supérieurs si nécessaire
 
         Stratégie:
-        1. Essaie avec le tier préféré de l'agent (ou NANO par défaut)
+        1. Essaie avec le tier préféré de l'agent (ou NANO par défaut),
+           relevé au tier prédit par le routeur appris s'il est confiant
         2. Évalue la qualité via LLM
         3. Si insuffisant (< quality_threshold), escalade au tier supérieur
         4. Si max_tier atteint et toujours insuffisant, délègue à un expert
 
+        Le mode "race" remplace les étapes 1-3 par une course entre tiers
+        (voir _execute_race). Les tentatives de course ne peuvent appeler
+        que des tools read_only: avec des tools à effets de bord (écriture,
+        git_push, pip_install...), l'escalade reste séquentielle pour qu'ils
+        ne s'exécutent qu'une fois.
+
         Args:
             task: Tâche à exécuter
             max_tier: Tier maximum avant délégation à expert
@@ -498,13 +546,40 @@ Core Principles (applies to ALL agents):
             context: Contexte additionnel
             use_tools: Utiliser les tools disponibles
             verbose: Mode verbose
+            mode: "sequential" ou "race" (défaut: escalation_settings["mode"])
 
         Returns:
             Résultat avec escalation_history et quality_score
         """
+        mode = mode or self.escalation_settings.get("mode", "sequential")
+        if mode == "race" and use_tools and self._side_effect_tools():
+            if verbose:
+                print(f"[{self.config.name}] Race disabled, side-effect tools: "
+                      f"{', '.join(self._side_effect_tools())}")
+            mode = "sequential"
+        if mode == "race":
+            result = self._execute_race(task, max_tier, quality_threshold, context, use_tools, verbose)
+        else:
+            result = self._execute_sequential(
+                task, max_tier, max_attempts, quality_threshold, context, use_tools, verbose
+            )
+        self._record_routing_outcome(task, quality_threshold, result)
+        return result
+
+    def _execute_sequential(
+        self,
+        task: str,
+        max_tier: ModelTier,
+        max_attempts: int,
+        quality_threshold: float,
+        context: Optional[Dict[str, Any]],
+        use_tools: bool,
+        verbose: bool
+    ) -> Dict[str, Any]:
+        """Escalade séquentielle: un tier à la fois, du tier de départ vers max_tier"""
         escalation_history = []
         total_cost = 0.0
-        current_tier = self.config.tier_preference
+        current_tier = self._starting_tier(task, max_tier)
         best_result = None
         best_quality = 0.0
 
@@ -541,7 +616,7 @@ Core Principles (applies to ALL agents):
 
                 execution_cost = response.cost
                 total_cost += execution_cost
-                self.total_cost += execution_cost
+                self._add_cost(execution_cost)
 
                 if verbose:
                     print(f"[{self.config.name}] Execution cost: ${execution_cost:.6f}")
@@ -557,7 +632,7 @@ Core Principles (applies to ALL agents):
                 )
 
                 total_cost += assessment.cost
-                self.total_cost += assessment.cost
+                self._add_cost(assessment.cost)
 
                 # Enregistrer dans l'historique
                 escalation_history.append({
@@ -710,6 +785,312 @@ Core Principles (applies to ALL agents):
             "total_cost": total_cost
         }
 
+    def _execute_race(
+        self,
+        task: str,
+        max_tier: ModelTier,
+        quality_threshold: float,
+        context: Optional[Dict[str, Any]],
+        use_tools: bool,
+        verbose: bool
+    ) -> Dict[str, Any]:
+        """
+        Escalade en course: les tiers bon marché et intermédiaire partent ensemble
+
+        - Chaque tentative est évaluée dès sa fin (QualityEvaluator)
+        - Hedge: si aucune réponse n'a passé le seuil après hedge_delay_seconds
+          (ou si toutes les tentatives ont échoué avant), le tier du hedge part
+        - La première réponse au-dessus du seuil gagne; les autres streams
+          sont fermés au fragment suivant et leur évaluation est évitée
+        - Plafond: au-delà du premier tier, une tentative ne part que si son
+          coût estimé tient dans race_cost_cap (dépense supplémentaire max)
+
+        Returns:
+            Même format que le mode séquentiel (+ race_cancelled, race_skipped)
+        """
+        settings = self.escalation_settings
+        tiers = [
+            tier for tier in (ModelTier(t) for t in settings.get("race_tiers", ["nano", "deepseek"]))
+            if self._is_tier_within_limit(tier, max_tier)
+        ] or [self.config.tier_preference]
+        hedge_delay = settings.get("hedge_delay_seconds", 3.0)
+        hedge_tier = ModelTier(settings.get("hedge_tier", "claude"))
+        if hedge_delay is None or hedge_tier in tiers or not self._is_tier_within_limit(hedge_tier, max_tier):
+            hedge_tier = None
+        cost_cap = settings.get("race_cost_cap", 0.02)
+        expected_output = settings.get("expected_output_tokens", 1000)
+
+        messages = self._build_messages(task, context)
+        budget = {"extra": cost_cap}
+        cancel = threading.Event()
+        start = time.perf_counter()
+        pool = ThreadPoolExecutor(max_workers=len(tiers) + 1, thread_name_prefix="race")
+        running: Dict[Future, ModelTier] = {}
+        skipped: List[str] = []
+
+        if verbose:
+            print(f"\n[{self.config.name}] ═══ RACE ESCALATION ═══")
+            print(f"[{self.config.name}] Racing: {', '.join(t.value for t in tiers)}"
+                  + (f" | hedge {hedge_tier.value} after {hedge_delay}s" if hedge_tier else ""))
+
+        def launch(tier: ModelTier, first: bool = False):
+            if not first:
+                estimate = self.llm_client._estimate_cost(messages, tier, expected_output)
+                if estimate > budget["extra"]:
+                    skipped.append(tier.value)
+                    if verbose:
+                        print(f"[{self.config.name}] Skipping {tier.value}: ${estimate:.4f} exceeds cost cap")
+                    return
+                budget["extra"] -= estimate
+            future = pool.submit(
+                self._race_attempt, tier, messages, task, quality_threshold, use_tools, cancel, start
+            )
+            running[future] = tier
+
+        for i, tier in enumerate(tiers):
+            launch(tier, first=(i == 0))
+
+        attempts: List[Dict[str, Any]] = []
+        winner = None
+        while running and winner is None:
+            timeout = None
+            if hedge_tier is not None:
+                timeout = max(0.0, hedge_delay - (time.perf_counter() - start))
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in sorted(done, key=lambda f: tiers.index(running[f]) if running[f] in tiers else len(tiers)):
+                running.pop(future)
+                outcome = future.result()
+                attempts.append(outcome)
+                if winner is None and outcome.get("quality_score", 0.0) >= quality_threshold:
+                    winner = outcome
+
+            # Hedge: délai écoulé sans gagnant, ou plus rien en course
+            if winner is None and hedge_tier is not None and (not done or not running):
+                if verbose:
+                    print(f"[{self.config.name}] Hedging to {hedge_tier.value}")
+                launch(hedge_tier)
+                hedge_tier = None
+
+        # Annuler les perdants: leur coût est compté quand leur stream se ferme
+        cancel.set()
+        cancelled = [tier.value for tier in running.values()]
+        with self._race_lock:
+            self._race_inflight.update(running)
+        for future in running:
+            future.add_done_callback(self._settle_race_attempt)
+        pool.shutdown(wait=False)
+
+        total_cost = sum(a["execution_cost"] + a.get("evaluation_cost", 0.0) for a in attempts)
+        self._add_cost(total_cost)
+        escalation_history = [
+            {key: value for key, value in a.items() if key not in ("response", "assessment")}
+            for a in attempts
+        ]
+
+        scored = [a for a in attempts if "quality_score" in a]
+        best = winner or max(scored, key=lambda a: a["quality_score"], default=None)
+        if best is None:
+            return {
+                "success": False,
+                "error": "All race attempts failed",
+                "agent": self.config.name,
+                "escalation_history": escalation_history,
+                "total_cost": total_cost,
+                "race_cancelled": cancelled,
+                "race_skipped": skipped
+            }
+
+        response = best["response"]
+        assessment = best["assessment"]
+        self.memory.add_to_short_term({
+            "task": task,
+            "summary": response.content[:100],
+            "cost": total_cost,
+            "tier": best["tier"],
+            "escalated": best["tier"] != tiers[0].value,
+            "quality_score": assessment.score
+        })
+
+        result = {
+            "success": True,
+            "data": response.content,
+            "agent": self.config.name,
+            "role": self.config.role,
+            "tier": best["tier"],
+            "tokens_input": response.tokens_input,
+            "tokens_output": response.tokens_output,
+            "tool_calls": len(response.tool_calls) if response.tool_calls else 0,
+            "cost": total_cost,
+            "total_cost": total_cost,
+            "final_tier": best["tier"],
+            "quality_score": assessment.score,
+            "quality_confidence": assessment.confidence,
+            "escalation_history": escalation_history,
+            "escalated": best["tier"] != tiers[0].value,
+            "attempts": len(attempts),
+            "mode": "race",
+            "latency": time.perf_counter() - start,
+            "race_cancelled": cancelled,
+            "race_skipped": skipped
+        }
+        if winner is None:
+            result["warning"] = (f"Quality threshold ({quality_threshold}) not met. "
+                                 f"Best score: {assessment.score:.1f}")
+        return result
+
+    def _race_attempt(
+        self,
+        tier: ModelTier,
+        messages: List[Dict[str, Any]],
+        task: str,
+        quality_threshold: float,
+        use_tools: bool,
+        cancel: threading.Event,
+        race_start: float
+    ) -> Dict[str, Any]:
+        """
+        Une tentative de course: génération streamée (interruptible) puis évaluation
+
+        Seuls les tools read_only sont proposés. L'annulation est vérifiée à
+        chaque fragment et entre les itérations de tools (un tour sans texte
+        ne relance ni tools ni appel LLM une fois la course décidée).
+        """
+        streamed: List[str] = []
+
+        def check_cancel():
+            if cancel.is_set():
+                raise _RaceCancelled()
+
+        def on_text(text: str):
+            check_cancel()
+            streamed.append(text)
+
+        tools = [tool for tool in self.available_tools.values() if tool.read_only] if use_tools else []
+
+        attempt = {"tier": tier.value, "started_at": round(time.perf_counter() - race_start, 3)}
+        try:
+            with agent_scope(self.config.name):
+                if tools:
+                    response = self.tool_executor.execute_with_tools(
+                        messages=messages,
+                        tier=tier,
+                        tools=tools,
+                        temperature=1.0,
+                        on_text=on_text,
+                        checkpoint=check_cancel
+                    )
+                else:
+                    response = None
+                    stream = self.llm_client.stream(messages=messages, tier=tier, temperature=1.0)
+                    try:
+                        for delta in stream:
+                            if delta.type == "text" and delta.text:
+                                on_text(delta.text)
+                            elif delta.type == "done":
+                                response = delta.response
+                    finally:
+                        stream.close()
+        except _RaceCancelled:
+            # Coût partiel estimé: prompt + fragments reçus avant la fermeture
+            partial_cost = self.llm_client._calculate_cost(
+                tier.value,
+                sum(count_tokens(str(m.get("content", ""))) for m in messages),
+                count_tokens("".join(streamed))
+            )
+            return {**attempt, "cancelled": True, "execution_cost": partial_cost}
+        except Exception as e:
+            return {**attempt, "error": str(e), "execution_cost": 0.0}
+
+        attempt["execution_cost"] = response.cost
+        if cancel.is_set():
+            # Course déjà gagnée: inutile de payer l'évaluation
+            return {**attempt, "cancelled": True}
+
+        assessment = self.quality_evaluator.evaluate(
+            task=task,
+            response=response.content or "",
+            tier_used=tier,
+            quality_threshold=quality_threshold
+        )
+        return {
+            **attempt,
+            "quality_score": assessment.score,
+            "confidence": assessment.confidence,
+            "evaluation_cost": assessment.cost,
+            "issues": assessment.issues,
+            "strengths": assessment.strengths,
+            "finished_at": round(time.perf_counter() - race_start, 3),
+            "response": response,
+            "assessment": assessment
+        }
+
+    def _settle_race_attempt(self, future: Future):
+        """Ajoute le coût d'une tentative perdue quand elle se termine"""
+        outcome = future.result()
+        with self._race_lock:
+            self.total_cost += outcome["execution_cost"] + outcome.get("evaluation_cost", 0.0)
+            self._race_inflight.discard(future)
+
+    def drain_race_attempts(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend la fin des tentatives de course annulées (coûts définitifs)
+
+        Returns:
+            True si toutes sont terminées
+        """
+        with self._race_lock:
+            pending = list(self._race_inflight)
+        _, not_done = wait(pending, timeout=timeout)
+        return not not_done
+
+    def _starting_tier(self, task: str, max_tier: ModelTier) -> ModelTier:
+        """
+        Tier de départ de l'escalade séquentielle
+
+        Le tier préféré de l'agent, relevé (dans la limite de max_tier) au tier
+        prédit par le routeur appris quand celui-ci est confiant: les
+        tentatives vouées à l'échec sont sautées. Avec une probabilité
+        routing_exploration, on démarre un tier plus bas: sans cela un tier
+        relevé ne serait jamais remis en cause (l'escalade ne descend pas).
+        """
+        tier = self.config.tier_preference
+        learned = self.model_router.predict_learned_tier(task)
+        tier_order = [ModelTier.NANO, ModelTier.DEEPSEEK, ModelTier.CLAUDE]
+        if learned and tier in tier_order and max_tier in tier_order:
+            predicted = min(tier_order.index(learned[0]), tier_order.index(max_tier))
+            if predicted > tier_order.index(tier):
+                if self._exploration_rng.random() < self.routing_exploration:
+                    predicted -= 1
+                tier = tier_order[predicted]
+        return tier
+
+    def _record_routing_outcome(self, task: str, quality_threshold: float, result: Dict[str, Any]):
+        """Journalise les tiers essayés et leurs scores (données d'entraînement du routeur appris)"""
+        if not get_config().get("agents.learned_routing.record_outcomes", True):
+            return
+        attempts = [
+            {"tier": a["tier"], "quality_score": a.get("quality_score"), "cost": a.get("execution_cost", 0.0)}
+            for a in result.get("escalation_history", []) if "tier" in a and not a.get("cancelled")
+        ]
+        if not attempts:
+            return
+        passed = result.get("quality_score", 0.0) >= quality_threshold and "warning" not in result
+        get_logger().log(
+            EventType.ROUTING_OUTCOME,
+            self.config.name,
+            f"{attempts[0]['tier']} -> {result.get('final_tier', attempts[-1]['tier'])}",
+            data={
+                "task": task[:2000],
+                "attempts": attempts,
+                "threshold": quality_threshold,
+                "final_tier": result.get("final_tier"),
+                "passed": passed
+            },
+            cost=result.get("total_cost", result.get("cost", 0.0)),
+            success=passed
+        )
+
     def _get_next_tier(self, current_tier: ModelTier) -> Optional[ModelTier]:
         """Retourne le tier supérieur"""
         tier_order = [ModelTier.NANO, ModelTier.DEEPSEEK, ModelTier.CLAUDE]
@@ -824,7 +1205,7 @@ Core Principles (applies to ALL agents):
             )
 
             total_cost += expert_result.get("cost", 0.0)
-            self.total_cost += expert_result.get("cost", 0.0)
+            self._add_cost(expert_result.get("cost", 0.0))
 
             # Enregistrer l'escalade vers l'expert
             escalation_history.append({
@@ -144,26 +144,12 @@ class ContextAgent(ExecutionAgent):
 
     def get_cache_statistics(self) -> Dict[str, Any]:
         """Obtient des statistiques sur le cache de contexte"""
-        cache = self.context_manager.context_cache
-
-        if not cache:
-            return {
-                'total_contexts': 0,
-                'total_usage': 0,
-                'most_used': None
-            }
-
-        total_usage = sum(ctx.usage_count for ctx in cache)
-        most_used = max(cache, key=lambda x: x.usage_count) if cache else None
+        stats = self.context_manager.get_cache_stats()
 
         return {
-            'total_contexts': len(cache),
-            'total_usage': total_usage,
-            'most_used': {
-                'id': most_used.id,
-                'usage_count': most_used.usage_count,
-                'metadata': most_used.metadata
-            } if most_used else None
+            'total_contexts': stats['total_contexts'],
+            'total_usage': stats['total_usage'],
+            'most_used': stats['most_used']
         }
 
     def search_similar_contexts(
@@ -157,7 +157,7 @@ Be proactive and data-driven. Always justify your decisions with metrics.""",
         missing = []
 
         # Analyser les échecs récents
-        recent_logs = self.logger.memory_logs[-50:]
+        recent_logs = self.logger.recent_entries(50)
         failures = [log for log in recent_logs if log.event_type == EventType.TASK_FAIL]
 
         # Patterns de besoins non satisfaits
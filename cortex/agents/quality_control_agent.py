@@ -31,8 +31,14 @@ import json
 from datetime import datetime
 from pathlib import Path
 
+from cortex.core.config_loader import get_config
 from cortex.core.llm_client import LLMClient, ModelTier
 from cortex.core.agent_hierarchy import DecisionAgent, AgentRole, AgentResult, EscalationContext
+from cortex.core.log_reader import LogIngestor, tail_lines
+from cortex.core.cortex_logger import EventType, get_logger
+
+QUALITY_HISTORY_PATH = Path("cortex/data/quality_history.jsonl")
+AGENT_NAME = "QualityControlAgent"  # Agent des évaluations dans le journal d'événements
 
 
 class QualityControlAgent(DecisionAgent):
@@ -48,6 +54,12 @@ class QualityControlAgent(DecisionAgent):
         super().__init__(llm_client, specialization="quality_control")
         self.tier = ModelTier.DEEPSEEK  # Analyse détaillée mais pas critique
 
+        config = get_config()
+        self.log_state_path = Path(config.get(
+            "agents.quality_control.log_state_path", "cortex/data/quality_log_state.json"
+        ))
+        self.max_backfill_bytes = int(config.get("agents.quality_control.max_backfill_mb", 64) * 1024 * 1024)
+
     def can_handle(self, request: str, context: Optional[Dict] = None) -> float:
         """
         Évalue si le QualityControlAgent peut gérer la requête
@@ -235,7 +247,7 @@ class QualityControlAgent(DecisionAgent):
             # Save to optimization queue
             self._save_to_optimization_queue(request_data, total_score, recommendations)
 
-            return {
+            result = {
                 'success': True,
                 'action': 'analyze_request',
                 'total_score': total_score,
@@ -259,6 +271,8 @@ class QualityControlAgent(DecisionAgent):
                 'cost': 0.0,  # QC doesn't use LLM for basic analysis
                 'confidence': 0.85
             }
+            self._append_quality_history({**result, 'request': user_request[:200], 'tier': tier_used})
+            return result
 
         except Exception as e:
             return {
@@ -354,9 +368,23 @@ class QualityControlAgent(DecisionAgent):
             Dict avec métriques
         """
         try:
-            history = self._load_quality_history()
+            store = self._quality_event_store()
+            if store is not None:
+                # Agrégats du journal d'événements: coût constant
+                totals = store.rollup(group_by=(), event_types=[EventType.QUALITY_CHECK.value],
+                                      agents=[AGENT_NAME])
+                recent = [e['score'] for e in reversed(store.query(
+                    event_types=[EventType.QUALITY_CHECK.value], agents=[AGENT_NAME], limit=10
+                )) if e['score'] is not None]
+                total = totals[0]['events'] if totals else 0
+                avg_score_all = totals[0]['avg_score'] if totals else None
+            else:
+                history = self._load_quality_history()
+                total = len(history)
+                recent = [h['total_score'] for h in history[-10:]]
+                avg_score_all = sum(h['total_score'] for h in history) / total if total else None
 
-            if not history:
+            if not total:
                 return {
                     'success': True,
                     'action': 'show_metrics',
@@ -367,11 +395,7 @@ class QualityControlAgent(DecisionAgent):
                 }
 
             # Calculate metrics
-            total = len(history)
-            recent = history[-10:] if len(history) > 10 else history
-
-            avg_score_recent = sum(h['total_score'] for h in recent) / len(recent)
-            avg_score_all = sum(h['total_score'] for h in history) / total
+            avg_score_recent = sum(recent) / len(recent) if recent else avg_score_all
 
             return {
                 'success': True,
@@ -379,7 +403,7 @@ class QualityControlAgent(DecisionAgent):
                 'total_evaluations': total,
                 'avg_score_recent': avg_score_recent,
                 'avg_score_all': avg_score_all,
-                'recent_scores': [h['total_score'] for h in recent],
+                'recent_scores': recent,
                 'cost': 0.0,
                 'confidence': 1.0
             }
@@ -421,7 +445,8 @@ class QualityControlAgent(DecisionAgent):
                     'confidence': 0.0
                 }
 
-            print(f"   ✓ Loaded {logs_data['total_lines']} lines from {len(logs_data['sources'])} sources")
+            print(f"   ✓ Loaded {logs_data['total_lines']} lines from {len(logs_data['sources'])} sources "
+                  f"({logs_data['new_entries']} new entries since last audit)")
             print()
 
             # Step 1: Analyze with DeepSeek
@@ -512,60 +537,84 @@ class QualityControlAgent(DecisionAgent):
         """
         Charge les logs de tous les agents
 
+        Les lignes récentes sont lues à reculons depuis la fin des fichiers;
+        les agrégats ne reçoivent que les entrées écrites depuis le dernier
+        audit (checkpoints en octets dans agents.quality_control.log_state_path).
+
         Args:
             max_lines: Maximum de lignes à charger
 
         Returns:
-            Dict avec logs et métadonnées
+            Dict avec logs, agrégats et métadonnées
         """
         logs = []
         sources = []
+        ingestor = LogIngestor(self.log_state_path, max_backfill_bytes=self.max_backfill_bytes)
+        new_entries = 0
 
-        # 1. Load from cortex logs directory
+        # 1. Load from cortex logs directory (.log texte, session_*.jsonl de CortexLogger)
         logs_dir = Path("cortex/logs")
         if logs_dir.exists():
-            for log_file in sorted(logs_dir.glob("*.log"), key=lambda p: p.stat().st_mtime, reverse=True):
+            log_files = [*logs_dir.glob("*.log"), *logs_dir.glob("*.jsonl")]
+            for log_file in sorted(log_files, key=lambda p: p.stat().st_mtime, reverse=True):
                 try:
-                    with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.readlines()
-                        logs.extend(content[-max_lines//2:])  # Take recent lines
+                    new_entries += ingestor.ingest(log_file, "events" if log_file.suffix == ".jsonl" else "text")
+                    if len(logs) < max_lines:
+                        logs.extend(tail_lines(log_file, max_lines // 2))  # Take recent lines
                         sources.append(str(log_file))
-                        if len(logs) >= max_lines:
-                            break
                 except Exception as e:
                     print(f"   Warning: Could not read {log_file}: {e}")
 
         # 2. Load conversation history as proxy for agent interactions
-        conv_history_file = Path("cortex/data/conversation_history.json")
-        if conv_history_file.exists() and len(logs) < max_lines:
+        conv_history_file = Path("cortex/data/conversation_history.jsonl")
+        if conv_history_file.exists():
             try:
-                with open(conv_history_file, 'r') as f:
-                    conv_data = json.load(f)
+                new_entries += ingestor.ingest(conv_history_file, "conversation")
+                if len(logs) < max_lines:
+                    # Journal JSONL: messages et résumés, une ligne par enregistrement
+                    messages = tail_lines(
+                        conv_history_file, 50, match=lambda line: line.startswith(b'{"type": "message"')
+                    )
                     # Convert to log-like format
-                    for entry in conv_data[-50:]:  # Last 50 conversations
-                        log_entry = f"[{entry.get('timestamp', 'N/A')}] {entry.get('role', 'unknown')}: {entry.get('content', '')[:200]}\n"
+                    for line in messages:  # Last 50 messages
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        log_entry = f"[{entry.get('ts', 'N/A')}] {entry.get('role', 'unknown')}: {entry.get('content', '')[:200]}\n"
                         logs.append(log_entry)
                     sources.append(str(conv_history_file))
             except Exception as e:
                 print(f"   Warning: Could not read conversation history: {e}")
 
         # 3. Load quality history
-        quality_file = Path("cortex/data/quality_history.json")
-        if quality_file.exists() and len(logs) < max_lines:
+        quality_file = self._quality_history_path()
+        if quality_file.exists():
             try:
-                with open(quality_file, 'r') as f:
-                    quality_data = json.load(f)
-                    for entry in quality_data[-20:]:
+                new_entries += ingestor.ingest(quality_file, "quality")
+                if len(logs) < max_lines:
+                    for line in tail_lines(quality_file, 20):
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
                         log_entry = f"[QC] Score: {entry.get('total_score', 0)}/100 - Request: {entry.get('request', '')[:100]}\n"
                         logs.append(log_entry)
                     sources.append(str(quality_file))
             except Exception as e:
                 print(f"   Warning: Could not read quality history: {e}")
 
+        try:
+            ingestor.save()
+        except OSError as e:
+            print(f"   Warning: Could not save log checkpoints: {e}")
+
         return {
             'logs': logs[-max_lines:],  # Limit to max_lines
             'total_lines': len(logs[-max_lines:]),
-            'sources': sources
+            'sources': sources,
+            'new_entries': new_entries,
+            'aggregates': ingestor.aggregates.summary()
         }
 
     def _llm_analyze_logs(self, logs_data: Dict, tier: ModelTier) -> Dict[str, Any]:
@@ -581,11 +630,18 @@ class QualityControlAgent(DecisionAgent):
         """
         # Prepare logs summary
         logs_text = ''.join(logs_data['logs'])
+        aggregates = logs_data.get('aggregates')
+        aggregates_text = ""
+        if aggregates:
+            aggregates_text = (
+                f"AGGREGATES (all {aggregates['entries']} log entries since {aggregates['since']}):\n"
+                f"{json.dumps(aggregates)}\n\n"
+            )
 
         # Build analysis prompt
         prompt = f"""Analyze these Cortex AI system logs and provide a comprehensive quality assessment.
 
-LOGS (last {logs_data['total_lines']} lines):
+{aggregates_text}LOGS (last {logs_data['total_lines']} lines):
 {logs_text[:15000]}  # Limit to avoid token overflow
 
 Please analyze:
@@ -873,7 +929,7 @@ IMPORTANT: Be honest about your confidence. If logs are limited or unclear, set
         if qual < 20:
             # Détecter hallucination d'opération fichier
             response = request_data.get('response', '')
-            tools = request_data.get('tool_calls', [])
+            tool_calls = request_data.get('tool_calls', [])
 
             file_operation_claims = [
                 "j'ai supprimé", "fichier supprimé", "j'ai créé", "fichier créé",
@@ -894,7 +950,7 @@ IMPORTANT: Be honest about your confidence. If logs are limited or unclear, set
             claims_file_operation = any(claim in response_lower for claim in file_operation_claims)
 
             if claims_file_operation:
-                tool_names = [t.get('name', '') for t in tools] if tools else []
+                tool_names = [t.get('name', '') for t in tool_calls] if tool_calls else []
                 used_file_tool = any(tool in tool_names for tool in file_operation_tools)
 
                 if not used_file_tool:
@@ -1029,16 +1085,90 @@ IMPORTANT: Be honest about your confidence. If logs are limited or unclear, set
         except Exception as e:
             print(f"Warning: Could not save to optimization queue: {e}")
 
+    def _quality_history_path(self) -> Path:
+        """Historique qualité JSONL (l'ancien quality_history.json est converti une fois)"""
+        legacy_file = QUALITY_HISTORY_PATH.with_suffix(".json")
+        if legacy_file.exists() and not QUALITY_HISTORY_PATH.exists():
+            try:
+                with open(legacy_file, 'r') as f:
+                    entries = json.load(f)
+                with open(QUALITY_HISTORY_PATH, 'w', encoding='utf-8') as f:
+                    for entry in entries:
+                        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except Exception as e:
+                print(f"Warning: Could not migrate quality history: {e}")
+        return QUALITY_HISTORY_PATH
+
+    def _append_quality_history(self, entry: Dict[str, Any]):
+        """Ajoute une évaluation à l'historique qualité (une ligne JSON) et au journal d'événements"""
+        try:
+            path = self._quality_history_path()
+            self._quality_event_store()  # Reprise de l'historique existant avant l'ajout
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        except Exception as e:
+            print(f"Warning: Could not save quality history: {e}")
+            return
+
+        try:
+            metrics = entry.get('metrics', {})
+            get_logger().log(
+                EventType.QUALITY_CHECK,
+                AGENT_NAME,
+                f"{entry.get('grade', '?')} {entry.get('total_score', 0):.1f}/100",
+                data={'request': entry.get('request'), 'scores': entry.get('scores'), 'metrics': metrics},
+                tier=entry.get('tier'),
+                score=entry.get('total_score')
+            )
+        except Exception as e:
+            print(f"Warning: Could not log quality check: {e}")
+
+    def _quality_event_store(self):
+        """
+        Journal d'événements des évaluations qualité (None s'il est désactivé)
+
+        Au premier appel, l'historique JSONL existant est repris dans le
+        journal s'il n'y contient encore aucune évaluation.
+        """
+        if getattr(self, '_quality_store_checked', False):
+            return get_logger().store
+        self._quality_store_checked = True
+        store = get_logger().store
+        if store is None:
+            return None
+        known = store.rollup(group_by=(), event_types=[EventType.QUALITY_CHECK.value], agents=[AGENT_NAME])
+        if not known:
+            history = self._load_quality_history()
+            if history:
+                store.append_many(
+                    {
+                        'timestamp': h.get('timestamp'),
+                        'event_type': EventType.QUALITY_CHECK.value,
+                        'agent': AGENT_NAME,
+                        'message': f"{h.get('grade', '?')} {h.get('total_score', 0):.1f}/100",
+                        'tier': h.get('tier'),
+                        'score': h.get('total_score')
+                    }
+                    for h in history
+                )
+        return store
+
     def _load_quality_history(self) -> List[Dict]:
         """Charge l'historique de qualité"""
+        history = []
         try:
-            history_file = Path("cortex/data/quality_history.json")
+            history_file = self._quality_history_path()
             if history_file.exists():
-                with open(history_file, 'r') as f:
-                    return json.load(f)
+                with open(history_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            history.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
         except Exception:
             pass
-        return []
+        return history
 
     def _rate_token_efficiency(self, tokens_in: int, tokens_out: int) -> str:
         """Rate token efficiency"""
@@ -11,7 +11,8 @@ Niveaux:
 import hashlib
 import json
 import time
-from typing import Optional, Dict, Any, Tuple
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, List
 from dataclasses import dataclass
 from enum import Enum
 
@@ -26,6 +27,15 @@ try:
 except ImportError:
     redis = None
 
+try:
+    from cortex.cache.semantic_cache import SemanticCache
+except ImportError:
+    SemanticCache = None  # numpy requis pour le tier L2
+
+from cortex.cache.scope import single_turn_query
+from cortex.cache.template_cache import TemplateCache, Rewriter
+from cortex.cache.single_flight import get_single_flight
+from cortex.cache.message_hash import get_prefix_hasher
 from cortex.core.config_loader import get_config
 
 
@@ -46,6 +56,7 @@ class CacheResult:
     tokens_saved: int
     cost_saved: float
     similarity: float  # 0-1
+    cost_spent: float = 0.0  # Coût payé malgré le hit (réécriture L3)
 
 
 class CacheManager:
@@ -54,8 +65,16 @@ class CacheManager:
     Maximise les économies en cherchant du plus rapide au plus lent
     """
 
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = None, embedder=None):
+        """
+        Args:
+            cache_dir: Dossier des tiers L1 (diskcache) et L2 (sous-dossier l2).
+                       Par défaut: chemins de la config (data/cache)
+            embedder: Encodeur du tier L2 (défaut: encodeur partagé)
+        """
         self.config = get_config()
+        self.cache_dir = cache_dir
+        self.embedder = embedder
 
         # Configuration du cache
         self.cache_config = self.config.get("optimization.cache", {})
@@ -99,7 +118,7 @@ class CacheManager:
 
         # Fallback: diskcache (file-based)
         if diskcache:
-            cache_path = self.config.get("databases.cache.path", "data/cache")
+            cache_path = self.cache_dir or self.config.get("databases.cache.path", "data/cache")
             self.l1_cache = diskcache.Cache(cache_path)
             self.l1_backend = "disk"
         else:
@@ -115,9 +134,26 @@ class CacheManager:
             self.l2_cache = None
             return
 
-        # TODO: Implémenter avec ChromaDB
-        # Pour l'instant: désactivé
-        self.l2_cache = None
+        if SemanticCache is None:
+            self.l2_cache = None
+            return
+
+        if self.cache_dir:
+            l2_path = str(Path(self.cache_dir) / "l2")
+        else:
+            l2_path = l2_config.get("path", "data/cache/l2")
+
+        try:
+            self.l2_cache = SemanticCache(
+                path=l2_path,
+                embedder=self.embedder,
+                max_entries=l2_config.get("max_entries", 10000),
+                similarity_threshold=l2_config.get("similarity_threshold", 0.92),
+                ttl_minutes=l2_config.get("ttl_minutes", 24 * 60)
+            )
+        except Exception as e:
+            print(f"Warning: L2 semantic cache disabled: {e}")
+            self.l2_cache = None
 
     def _init_l3_cache(self):
         """Initialise le cache L3 (templates)"""
@@ -127,8 +163,21 @@ class CacheManager:
             self.l3_cache = None
             return
 
-        # Template cache: dict simple pour patterns
-        self.l3_cache = {}
+        self.l3_cache = TemplateCache(
+            max_templates=l3_config.get("max_templates", 2000),
+            min_verified=l3_config.get("min_verified", 1)
+        )
+        self.l3_rewrite_enabled = l3_config.get("nano_rewrite", True)
+
+    def set_l3_rewriter(self, rewriter: Optional[Rewriter]):
+        """
+        Branche la réécriture NANO du tier L3 (fournie par LLMClient)
+
+        Args:
+            rewriter: (réponse, anciens slots, nouveaux slots, requête) → (contenu, coût)
+        """
+        if self.l3_cache is not None and self.l3_rewrite_enabled:
+            self.l3_cache.rewriter = rewriter
 
     def get(
         self,
@@ -159,7 +208,7 @@ class CacheManager:
             return result
 
         # L2: Semantic match (si disponible)
-        if self.l2_cache:
+        if self.l2_cache is not None:
             result = self._check_l2(messages, model_tier)
             if result.hit:
                 self.stats["l2_hits"] += 1
@@ -168,7 +217,7 @@ class CacheManager:
                 return result
 
         # L3: Template match (patterns)
-        if self.l3_cache:
+        if self.l3_cache is not None:
             result = self._check_l3(messages, model_tier)
             if result.hit:
                 self.stats["l3_hits"] += 1
@@ -220,21 +269,36 @@ class CacheManager:
         self._set_l1(cache_key, cache_value)
 
         # L2: Sauvegarder pour recherche sémantique (si disponible)
-        if self.l2_cache:
+        if self.l2_cache is not None:
             self._set_l2(messages, cache_value)
 
         # L3: Extraire et sauvegarder le pattern (si pattern détecté)
-        if self.l3_cache:
+        if self.l3_cache is not None:
             self._set_l3(messages, cache_value)
 
-    def _generate_key(self, messages: list, model_tier: str) -> str:
-        """Génère une clé de cache unique"""
-        # Créer une représentation stable des messages
-        messages_str = json.dumps(messages, sort_keys=True)
-        key_str = f"{messages_str}:{model_tier}"
+    @staticmethod
+    def _generate_key(messages: list, model_tier: str) -> str:
+        """
+        Génère une clé de cache unique (aussi clé de déduplication single-flight)
+
+        Empreintes chaînées par préfixe: seuls les messages jamais vus sont
+        sérialisés, le coût est O(nouveaux messages).
+        """
+        digest = get_prefix_hasher().digest(messages)
+        return hashlib.sha256(digest + model_tier.encode()).hexdigest()
 
-        # Hash pour clé courte
-        return hashlib.sha256(key_str.encode()).hexdigest()
+    def prefix_keys(self, messages: list, model_tier: str) -> List[str]:
+        """
+        Clés de chaque préfixe de la conversation
+
+        prefix_keys(messages, tier)[i] est la clé de messages[:i+1]; la
+        dernière est égale à _generate_key(messages, tier).
+        """
+        suffix = model_tier.encode()
+        return [
+            hashlib.sha256(chain + suffix).hexdigest()
+            for chain in get_prefix_hasher().chain(messages)
+        ]
 
     def _check_l1(self, cache_key: str) -> CacheResult:
         """Vérifie le cache L1 (exact match)"""
@@ -326,23 +390,76 @@ class CacheManager:
 
     def _check_l2(self, messages: list, model_tier: str) -> CacheResult:
         """Vérifie le cache L2 (semantic match)"""
-        # TODO: Implémenter avec ChromaDB
-        return CacheResult(False, CacheLevel.MISS, None, 0, 0.0, 0.0)
+        query = single_turn_query(messages, model_tier)
+        if query is None:
+            return CacheResult(False, CacheLevel.MISS, None, 0, 0.0, 0.0)
+
+        try:
+            scope, text = query
+            entry = self.l2_cache.lookup(scope, text)
+        except Exception:
+            return CacheResult(False, CacheLevel.MISS, None, 0, 0.0, 0.0)
+
+        if entry is None:
+            return CacheResult(False, CacheLevel.MISS, None, 0, 0.0, 0.0)
+
+        return CacheResult(
+            hit=True,
+            level=CacheLevel.L2_SEMANTIC,
+            content=entry["content"],
+            tokens_saved=entry["tokens"],
+            cost_saved=entry["cost"],
+            similarity=entry["similarity"]
+        )
 
     def _set_l2(self, messages: list, value: Dict):
         """Sauvegarde dans le cache L2"""
-        # TODO: Implémenter avec ChromaDB
-        pass
+        query = single_turn_query(messages, value["model_tier"])
+        if query is None or not value.get("content"):
+            return
+
+        try:
+            scope, text = query
+            self.l2_cache.add(scope, text, value)
+        except Exception as e:
+            print(f"L2 cache set error: {e}")
 
     def _check_l3(self, messages: list, model_tier: str) -> CacheResult:
         """Vérifie le cache L3 (template match)"""
-        # TODO: Implémenter pattern matching
-        return CacheResult(False, CacheLevel.MISS, None, 0, 0.0, 0.0)
+        query = single_turn_query(messages, model_tier)
+        if query is None:
+            return CacheResult(False, CacheLevel.MISS, None, 0, 0.0, 0.0)
+
+        try:
+            scope, text = query
+            entry = self.l3_cache.lookup(scope, text)
+        except Exception:
+            return CacheResult(False, CacheLevel.MISS, None, 0, 0.0, 0.0)
+
+        if entry is None:
+            return CacheResult(False, CacheLevel.MISS, None, 0, 0.0, 0.0)
+
+        return CacheResult(
+            hit=True,
+            level=CacheLevel.L3_TEMPLATE,
+            content=entry["content"],
+            tokens_saved=entry["tokens"],
+            cost_saved=entry["cost"],
+            similarity=1.0 if not entry["rewritten"] else 0.0,
+            cost_spent=entry["cost_spent"]
+        )
 
     def _set_l3(self, messages: list, value: Dict):
         """Sauvegarde dans le cache L3"""
-        # TODO: Implémenter template extraction
-        pass
+        query = single_turn_query(messages, value["model_tier"])
+        if query is None or not value.get("content"):
+            return
+
+        try:
+            scope, text = query
+            self.l3_cache.add(scope, text, value)
+        except Exception as e:
+            print(f"L3 cache set error: {e}")
 
     def get_stats(self) -> Dict[str, Any]:
         """Récupère les statistiques du cache"""
@@ -358,13 +475,25 @@ class CacheManager:
             total_hits = self.stats["l1_hits"] + self.stats["l2_hits"] + self.stats["l3_hits"]
             hit_rate = total_hits / total_requests
 
-        return {
+        stats = {
             **self.stats,
             "total_requests": total_requests,
             "hit_rate": hit_rate,
             "backend": self.l1_backend if self.l1_cache is not None else "none"
         }
 
+        if self.l2_cache is not None:
+            stats.update(self.l2_cache.get_stats())
+
+        if self.l3_cache is not None:
+            stats.update(self.l3_cache.get_stats())
+
+        # Appels identiques concurrents dédupliqués (partagé par le processus)
+        stats.update(get_single_flight().get_stats())
+        stats.update(get_prefix_hasher().get_stats())
+
+        return stats
+
     def clear(self):
         """Vide tous les caches"""
         if self.l1_cache is not None:
@@ -375,11 +504,10 @@ class CacheManager:
             else:  # memory
                 self.l1_cache.clear()
 
-        if self.l2_cache:
-            # TODO: Clear L2
-            pass
+        if self.l2_cache is not None:
+            self.l2_cache.clear()
 
-        if self.l3_cache:
+        if self.l3_cache is not None:
             self.l3_cache.clear()
 
 
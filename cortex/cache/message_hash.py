@@ -0,0 +1,155 @@
+"""
+Message Hash - Hachage incrémental chaîné par préfixe des conversations
+
+Sérialiser toute la conversation (json.dumps + SHA-256) à chaque get/set
+du cache coûte O(taille de la conversation): des centaines de KB par
+itération dans une boucle de tool calling.
+
+Ici, chaque message est haché une seule fois, puis les empreintes sont
+chaînées:
+
+    chain[0] = H(digest(m0))
+    chain[i] = H(chain[i-1] || digest(mi))
+
+chain[i] identifie exactement le préfixe m0..mi: la clé d'une conversation
+qui s'allonge ne coûte que les nouveaux messages, et les préfixes sont
+directement comparables (recherche par préfixe commun).
+
+La mémoïsation est indexée par identité du message mais validée par
+contenu: chaque entrée garde un instantané du message (les chaînes telles
+quelles, immuables; une copie des listes et dicts) comparé par égalité
+(en C) à chaque lecture. Une modification sur place, même à longueur
+égale, est donc détectée; une chaîne inchangée (même objet) se compare
+immédiatement. Aucune référence au message lui-même n'est gardée, et la
+mémoïsation est bornée en entrées et en octets.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+
+def _serialize(message: Dict[str, Any]) -> bytes:
+    """Sérialisation stable d'un message"""
+    data = json.dumps(message, sort_keys=True, separators=(",", ":"), default=str)
+    return data.encode("utf-8", errors="surrogatepass")
+
+
+def message_digest(message: Dict[str, Any]) -> bytes:
+    """Empreinte SHA-256 d'un message (sérialisation stable)"""
+    return hashlib.sha256(_serialize(message)).digest()
+
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def _snapshot(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Copie du message comparable par égalité: chaînes partagées, listes et dicts copiés"""
+    return {
+        field: value if isinstance(value, _SCALARS) else copy.deepcopy(value)
+        for field, value in message.items()
+    }
+
+
+class PrefixHasher:
+    """
+    Empreintes chaînées mémoïsées par identité de message, validées par contenu
+
+    La mémoïsation (LRU) est bornée en entrées et en octets sérialisés.
+    """
+
+    def __init__(self, max_entries: int = 50000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # id(message) → (instantané, taille, digest, chaîne précédente, chaîne)
+        self._memo: "OrderedDict[int, Tuple[Dict[str, Any], int, bytes, bytes, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Statistiques
+        self.hashed = 0   # Messages sérialisés et hachés
+        self.reused = 0   # Messages servis par la mémoïsation
+
+    def chain(self, messages: List[Dict[str, Any]]) -> List[bytes]:
+        """
+        Empreintes de chaque préfixe de la conversation
+
+        Args:
+            messages: Liste de messages
+
+        Returns:
+            chain[i] = empreinte (32 octets) du préfixe messages[:i+1]
+        """
+        chains = []
+        previous = b""
+
+        with self._lock:
+            for message in messages:
+                key = id(message)
+                entry = self._memo.get(key)
+
+                if entry is not None and entry[0] == message:
+                    self._memo.move_to_end(key)
+                    digest = entry[2]
+                    self.reused += 1
+                    if entry[3] == previous:
+                        # Même message à la même place dans la chaîne: rien à hacher
+                        previous = entry[4]
+                        chains.append(previous)
+                        continue
+                    snapshot, size = entry[0], entry[1]
+                else:
+                    if entry is not None:
+                        self._bytes -= entry[1]
+                    data = _serialize(message)
+                    digest = hashlib.sha256(data).digest()
+                    snapshot, size = _snapshot(message), len(data)
+                    self.hashed += 1
+
+                current = hashlib.sha256(previous + digest).digest()
+                if entry is None or entry[0] is not snapshot:
+                    self._bytes += size
+                self._memo[key] = (snapshot, size, digest, previous, current)
+                previous = current
+                chains.append(current)
+
+            # Éviction des moins récemment utilisées
+            while self._memo and (len(self._memo) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._memo.popitem(last=False)
+                self._bytes -= evicted[1]
+
+        return chains
+
+    def digest(self, messages: List[Dict[str, Any]]) -> bytes:
+        """Empreinte de la conversation complète"""
+        chains = self.chain(messages)
+        return chains[-1] if chains else hashlib.sha256(b"").digest()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Compteurs de hachage et de réutilisation"""
+        total = self.hashed + self.reused
+        return {
+            "key_messages_hashed": self.hashed,
+            "key_messages_reused": self.reused,
+            "key_memo_entries": len(self._memo),
+            "key_memo_bytes": self._bytes,
+            "key_reuse_rate": self.reused / total if total else 0.0
+        }
+
+    def clear(self):
+        """Vide la mémoïsation"""
+        with self._lock:
+            self._memo.clear()
+            self._bytes = 0
+
+
+# Hasher partagé par les caches et le single-flight du processus
+_prefix_hasher = PrefixHasher()
+
+
+def get_prefix_hasher() -> PrefixHasher:
+    """Retourne le hasher de préfixes du processus"""
+    return _prefix_hasher
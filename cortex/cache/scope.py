@@ -0,0 +1,45 @@
+"""
+Portée des requêtes pour les caches approximatifs (L2/L3)
+
+Les tiers sémantique et template ne s'appliquent qu'aux requêtes
+"single-turn": prompts système + un seul message utilisateur. La portée
+combine le tier du modèle et l'empreinte des prompts système, pour ne
+jamais partager une réponse entre deux agents aux instructions différentes.
+"""
+
+import hashlib
+from typing import Optional, Tuple
+
+
+def single_turn_query(messages: list, model_tier: str) -> Optional[Tuple[str, str]]:
+    """
+    Extrait (scope, texte) d'une requête éligible aux caches L2/L3
+
+    Args:
+        messages: Messages de la requête
+        model_tier: Tier du modèle
+
+    Returns:
+        (scope, texte_utilisateur) ou None si la requête n'est pas single-turn
+    """
+    system_parts = []
+    user_text = None
+
+    for msg in messages:
+        role = msg.get("role")
+        content = msg.get("content")
+        if not isinstance(content, str):
+            return None
+        if role == "system":
+            system_parts.append(content)
+        elif role == "user" and user_text is None:
+            user_text = content
+        else:
+            # Conversation multi-tours: le sens dépend de l'historique
+            return None
+
+    if not user_text or not user_text.strip():
+        return None
+
+    system_digest = hashlib.sha256("\n".join(system_parts).encode()).hexdigest()[:16]
+    return f"{model_tier}:{system_digest}", user_text
@@ -0,0 +1,308 @@
+"""
+Semantic Cache - Tier L2 du CacheManager
+
+Index vectoriel local et compact:
+- Matrice float32 memory-mappée sur disque (une ligne = une entrée)
+- Lignes pré-normalisées: similarité cosinus = un seul produit matrice-vecteur
+- Métadonnées (tier, réponse, tokens, coût, timestamps) dans SQLite
+- Éviction LRU quand la capacité est atteinte, expiration par TTL
+
+Seules les requêtes "single-turn" (messages système + un message utilisateur)
+sont éligibles: le message utilisateur est embeddé (encodeur partagé, voir
+cortex/core/embeddings.py), et la portée de la recherche est le tier du
+modèle + l'empreinte des prompts système.
+
+Garde-fou: deux requêtes qui ne diffèrent que par une entité ou un nombre
+("capitale de la France" / "du Japon", "trois jours" / "sept jours") sont
+très proches pour un embedding sac-de-mots. Un hit exige donc en plus les
+mêmes valeurs de slots (entités, nombres, chemins... du TemplateExtractor L3).
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+import numpy as np
+
+from cortex.cache.scope import single_turn_query
+from cortex.cache.template_cache import TemplateExtractor
+from cortex.core.embeddings import Embedder, get_embedder, hashing_embedding  # noqa: F401 (ré-export)
+
+
+# Nombres écrits en lettres (le TemplateExtractor ne voit que les chiffres)
+_NUMBER_WORDS = re.compile(
+    r"\b(?:zero|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen|fourteen|"
+    r"fifteen|sixteen|seventeen|eighteen|nineteen|twenty|thirty|forty|fifty|sixty|seventy|eighty|"
+    r"ninety|hundred|thousand|million|billion|first|second|third|half|dozen|"
+    r"zéro|un|une|deux|trois|quatre|cinq|six|sept|huit|neuf|dix|onze|douze|treize|quatorze|quinze|"
+    r"seize|vingt|trente|quarante|cinquante|soixante|cent|mille|premier|première|deuxième|troisième|"
+    r"demi|douzaine)\b",
+    re.IGNORECASE
+)
+
+_WORD = re.compile(r"\w+|[^\w\s]")
+
+_extractor = TemplateExtractor()
+
+
+def slot_values(text: str) -> List[str]:
+    """Entités, nombres, chemins... (slots L3) et nombres en lettres d'une requête"""
+    return _extractor.extract(text).slots + _NUMBER_WORDS.findall(text)
+
+
+def _words(text: str) -> str:
+    return " " + " ".join(_WORD.findall(text.lower())) + " "
+
+
+def same_slots(text: str, other: str) -> bool:
+    """
+    Chaque slot d'une requête apparaît (mots entiers, sans casse) dans l'autre
+
+    Symétrique; tolère une casse différente ("python" / "Python") qui
+    change l'extraction des entités sans changer le sens.
+    """
+    words, other_words = _words(text), _words(other)
+    return all(_words(value) in other_words for value in slot_values(text)) \
+        and all(_words(value) in words for value in slot_values(other))
+
+
+class SemanticCache:
+    """
+    Index sémantique L2 (matrice mmap + métadonnées SQLite)
+
+    La recherche est exacte (brute force vectorisée): à 10k entrées × 512
+    dimensions, un produit matrice-vecteur prend moins d'une milliseconde.
+    """
+
+    def __init__(
+        self,
+        path: str = "data/cache/l2",
+        embedder: Optional[Embedder] = None,
+        max_entries: int = 10000,
+        similarity_threshold: float = 0.92,
+        ttl_minutes: float = 24 * 60
+    ):
+        """
+        Args:
+            path: Dossier de l'index (vectors.f32 + entries.db)
+            embedder: Encodeur (défaut: encodeur partagé du processus)
+            max_entries: Capacité (au-delà, éviction LRU)
+            similarity_threshold: Seuil cosinus minimum pour un hit
+            ttl_minutes: Durée de vie d'une entrée
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self.embedder = embedder or get_embedder()
+        self.dimensions = self.embedder.dimensions
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_minutes * 60
+
+        self._lock = threading.Lock()
+
+        # Statistiques de lookup
+        self.lookups = 0
+        self.hits = 0
+        self.slot_mismatches = 0  # Candidats au-dessus du seuil écartés par le garde-fou
+        self._latencies_ms = deque(maxlen=1000)
+
+        self._init_storage()
+
+    def _init_storage(self):
+        """Ouvre (ou crée) la matrice mmap et la table de métadonnées"""
+        vectors_path = self.path / "vectors.f32"
+        shape = (self.max_entries, self.dimensions)
+        expected_size = self.max_entries * self.dimensions * 4
+
+        # Recréer la matrice si la géométrie ou le modèle d'embedding a changé
+        model_path = self.path / "model.txt"
+        same_model = model_path.exists() and model_path.read_text().strip() == self.embedder.name
+        if same_model and vectors_path.exists() and vectors_path.stat().st_size == expected_size:
+            self.vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=shape)
+            reset = False
+        else:
+            self.vectors = np.memmap(vectors_path, dtype=np.float32, mode="w+", shape=shape)
+            model_path.write_text(self.embedder.name)
+            reset = True
+
+        self.db = sqlite3.connect(str(self.path / "entries.db"), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                row INTEGER PRIMARY KEY,
+                scope TEXT NOT NULL,
+                content TEXT NOT NULL,
+                tokens INTEGER NOT NULL,
+                cost REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                query TEXT
+            )
+        """)
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(entries)")]
+        if "query" not in columns:
+            # Index d'avant le garde-fou: requête inconnue, ces entrées ne sont plus servies
+            self.db.execute("ALTER TABLE entries ADD COLUMN query TEXT")
+        if reset:
+            self.db.execute("DELETE FROM entries")
+        self.db.commit()
+
+        # Colonnes en mémoire pour filtrer sans toucher SQLite
+        self._valid = np.zeros(self.max_entries, dtype=bool)
+        self._created = np.zeros(self.max_entries, dtype=np.float64)
+        self._last_access = np.zeros(self.max_entries, dtype=np.float64)
+        self._scope_rows = np.full(self.max_entries, -1, dtype=np.int32)
+        self._scope_ids: Dict[str, int] = {}
+
+        for row, scope, created, last_access in self.db.execute(
+            "SELECT row, scope, created_at, last_access FROM entries"
+        ):
+            if row < self.max_entries:
+                self._valid[row] = True
+                self._created[row] = created
+                self._last_access[row] = last_access
+                self._scope_rows[row] = self._scope_id(scope)
+
+    def _scope_id(self, scope: str) -> int:
+        """Identifiant entier d'une portée (filtrage vectorisé)"""
+        if scope not in self._scope_ids:
+            self._scope_ids[scope] = len(self._scope_ids)
+        return self._scope_ids[scope]
+
+    extract_query = staticmethod(single_turn_query)
+
+    def lookup(self, scope: str, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Cherche l'entrée la plus proche dans la même portée
+
+        Returns:
+            Dict (content, tokens, cost, similarity) ou None
+        """
+        start = time.perf_counter()
+        query = self.embedder.embed(text)
+
+        with self._lock:
+            self.lookups += 1
+            result = None
+
+            now = time.time()
+            scope_id = self._scope_ids.get(scope, -2)
+            rows = np.flatnonzero(
+                self._valid
+                & (self._scope_rows == scope_id)
+                & (now - self._created <= self.ttl_seconds)
+            )
+
+            if rows.size:
+                similarities = self.vectors[rows] @ query
+                above = np.flatnonzero(similarities >= self.similarity_threshold)
+
+                # Du plus proche au moins proche: le premier aux mêmes slots
+                for best in above[np.argsort(-similarities[above], kind="stable")]:
+                    row = int(rows[best])
+                    entry = self.db.execute(
+                        "SELECT content, tokens, cost, query FROM entries WHERE row = ?",
+                        (row,)
+                    ).fetchone()
+                    if entry is None or entry[3] is None or not same_slots(text, entry[3]):
+                        self.slot_mismatches += 1
+                        continue
+                    self._last_access[row] = now
+                    self.db.execute(
+                        "UPDATE entries SET last_access = ? WHERE row = ?",
+                        (now, row)
+                    )
+                    self.db.commit()
+                    self.hits += 1
+                    result = {
+                        "content": entry[0],
+                        "tokens": entry[1],
+                        "cost": entry[2],
+                        "similarity": float(similarities[best])
+                    }
+                    break
+
+        self._latencies_ms.append((time.perf_counter() - start) * 1000)
+        return result
+
+    def add(self, scope: str, text: str, value: Dict[str, Any]):
+        """
+        Ajoute une entrée (écrase la ligne expirée ou la moins récemment utilisée)
+
+        Args:
+            scope: Portée (tier + empreinte système)
+            text: Texte utilisateur à indexer
+            value: Valeur du cache (content, tokens, cost, timestamp)
+        """
+        vector = self.embedder.embed(text)
+        now = time.time()
+
+        with self._lock:
+            row = self._pick_row(now)
+
+            self.vectors[row] = vector
+            self._valid[row] = True
+            self._created[row] = value.get("timestamp", now)
+            self._last_access[row] = now
+            self._scope_rows[row] = self._scope_id(scope)
+
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(row, scope, content, tokens, cost, created_at, last_access, query) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (row, scope, value["content"], value["tokens"], value["cost"],
+                 self._created[row], now, text)
+            )
+            self.db.commit()
+
+    def _pick_row(self, now: float) -> int:
+        """Choisit une ligne libre, sinon expirée, sinon LRU"""
+        free = np.flatnonzero(~self._valid)
+        if free.size:
+            return int(free[0])
+
+        expired = np.flatnonzero(now - self._created > self.ttl_seconds)
+        if expired.size:
+            return int(expired[0])
+
+        return int(np.argmin(self._last_access))
+
+    def __len__(self) -> int:
+        return int(self._valid.sum())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques L2: hit rate et latence de lookup"""
+        latencies = sorted(self._latencies_ms)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+        avg = sum(latencies) / len(latencies) if latencies else 0.0
+
+        return {
+            "l2_entries": len(self),
+            "l2_lookups": self.lookups,
+            "l2_hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "l2_slot_mismatches": self.slot_mismatches,
+            "l2_lookup_ms_avg": avg,
+            "l2_lookup_ms_p99": p99
+        }
+
+    def flush(self):
+        """Force l'écriture de la matrice sur disque"""
+        with self._lock:
+            self.vectors.flush()
+
+    def clear(self):
+        """Vide l'index"""
+        with self._lock:
+            self.vectors[:] = 0
+            self.vectors.flush()
+            self._valid[:] = False
+            self._created[:] = 0
+            self._last_access[:] = 0
+            self._scope_rows[:] = -1
+            self.db.execute("DELETE FROM entries")
+            self.db.commit()
@@ -0,0 +1,124 @@
+"""
+Single-Flight - Déduplication des appels LLM identiques en cours
+
+Quand plusieurs agents envoient le même prompt au même moment, le cache
+rate pour tous: rien n'est stocké avant le retour du premier appel.
+SingleFlight garantit qu'un seul appel provider est exécuté par clé;
+les appels concurrents de même clé attendent son résultat et le partagent
+(ou reçoivent la même exception).
+
+Fonctionne entre threads (do) et entre tâches asyncio (do_async), y compris
+mélangés: le résultat transite par un concurrent.futures.Future.
+
+Limite: un appel synchrone ne doit pas attendre, depuis le thread d'une
+boucle d'événements, un appel async mené sur cette même boucle.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """Groupe d'appels dédupliqués par clé"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+        # Statistiques
+        self.executions = 0  # Appels réellement exécutés
+        self.coalesced = 0   # Appels servis par un appel déjà en cours
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Rejoint l'appel en cours pour la clé, ou en devient le meneur"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            self.executions += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future, result: Any = None, error: BaseException = None):
+        """Publie le résultat; les appels suivants repartiront d'un nouvel appel"""
+        with self._lock:
+            self._calls.pop(key, None)
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Exécute fn() une seule fois pour tous les appelants concurrents de `key`
+
+        Args:
+            key: Clé de déduplication
+            fn: Appel à exécuter (par le meneur seulement)
+
+        Returns:
+            (résultat, partagé) - partagé=True si le résultat vient d'un autre appelant
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+
+        self._finish(key, future, result)
+        return result, False
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Variante async de do(): fn est une fabrique de coroutine
+
+        Returns:
+            (résultat, partagé)
+        """
+        future, leader = self._join(key)
+        if not leader:
+            # shield: l'annulation d'un appelant n'annule pas le résultat partagé
+            return await asyncio.shield(asyncio.wrap_future(future)), True
+
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+
+        self._finish(key, future, result)
+        return result, False
+
+    def in_flight(self) -> int:
+        """Nombre de clés en cours d'exécution"""
+        with self._lock:
+            return len(self._calls)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Compteurs d'appels exécutés et dédupliqués"""
+        total = self.executions + self.coalesced
+        return {
+            "single_flight_executions": self.executions,
+            "single_flight_coalesced": self.coalesced,
+            "single_flight_in_flight": self.in_flight(),
+            "single_flight_coalesce_rate": self.coalesced / total if total else 0.0
+        }
+
+
+# Groupe partagé par tous les clients LLM du processus
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Retourne le groupe single-flight du processus"""
+    return _single_flight
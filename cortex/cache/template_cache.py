@@ -0,0 +1,312 @@
+"""
+Template Cache - Tier L3 du CacheManager
+
+Beaucoup de requêtes ont la même forme et ne diffèrent que par leurs entités
+("météo à Granby", "scrape la source forbes", "ajoute la tâche 12").
+Le TemplateExtractor remplace ces entités par des slots typés:
+
+    "Get the weather in Granby for 3 days"
+    → signature "get the weather in <ent> for <num> days", slots ["Granby", "3"]
+
+La réponse est stockée sous forme de template (valeurs des slots remplacées
+par des marqueurs). Un hit re-remplit les slots avec les nouvelles valeurs.
+
+Garde-fou: un template n'est servi directement qu'après avoir été vérifié,
+c'est-à-dire quand deux observations avec des slots différents ont produit
+la même réponse templatisée, et que cette réponse contient au moins un
+marqueur de slot (une réponse fixe comme "Yes" ou "4" ne prouve pas qu'elle
+vaut pour d'autres valeurs). Sinon, une réécriture NANO (optionnelle)
+adapte la dernière réponse aux nouvelles valeurs.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple, Callable
+
+
+# Ordre important: les URLs contiennent des chemins et des nombres
+_SLOT_PATTERN = re.compile(
+    r"(?P<url>\bhttps?://[^\s\"'<>]+)"
+    r"|(?P<str>\"[^\"\n]{1,200}\"|'[^'\n]{1,200}'|`[^`\n]{1,200}`)"
+    r"|(?P<path>(?:~|\.{1,2})?/?(?:[\w.-]+/)+[\w.-]+"
+    r"|\b[\w-]+\.(?:py|md|json|yaml|yml|txt|js|ts|html|csv|sql|db|log)\b)"
+    r"|(?P<num>\b\d+(?:[.,]\d+)*\b)"
+)
+
+# Entités nommées: suites de mots capitalisés (hors début de phrase)
+_ENTITY_PATTERN = re.compile(r"\b[A-Z][\w-]*(?:\s+[A-Z][\w-]*)*")
+
+_SENTENCE_START = re.compile(r"(?:^|[.!?:]\s*)$")
+
+_MARKER = "{{slot_%d}}"
+_MARKER_PATTERN = re.compile(r"\{\{slot_\d+\}\}")
+
+
+@dataclass
+class Template:
+    """Un template extrait d'une requête"""
+    signature: str
+    text: str  # Texte normalisé avec slots typés
+    slots: List[str]
+
+
+@dataclass
+class TemplateEntry:
+    """Réponse indexée par signature de template"""
+    text: str
+    response_template: str
+    last_response: str
+    last_slots: List[str]
+    tokens: int
+    cost: float
+    observations: int = 1
+    verified: int = 0
+    hits: int = 0
+    rewrites: int = 0
+    created_at: float = 0.0
+
+
+class TemplateExtractor:
+    """Normalise une requête en template + valeurs de slots"""
+
+    def extract(self, text: str) -> Template:
+        """
+        Extrait le template d'un texte
+
+        Args:
+            text: Requête utilisateur
+
+        Returns:
+            Template (signature, texte normalisé, valeurs des slots)
+        """
+        slots: List[str] = []
+
+        def replace_slot(match: re.Match) -> str:
+            slots.append(match.group(0))
+            return f"<{match.lastgroup}>"
+
+        normalized = _SLOT_PATTERN.sub(replace_slot, text.strip())
+
+        # Entités nommées sur le texte restant (les marqueurs sont en minuscules)
+        parts = []
+        entity_slots = []
+        last = 0
+        for match in _ENTITY_PATTERN.finditer(normalized):
+            start = match.start()
+            if _SENTENCE_START.search(normalized[:start]):
+                # Premier mot de phrase: capitalisé par grammaire, pas une entité
+                head = re.match(r"\S+\s*", match.group(0))
+                start += head.end()
+                if start >= match.end():
+                    continue
+            parts.append(normalized[last:start])
+            parts.append("<ent>")
+            entity_slots.append(normalized[start:match.end()])
+            last = match.end()
+        parts.append(normalized[last:])
+        normalized = "".join(parts)
+
+        # Réordonner les slots selon leur position dans le texte final
+        slots = self._merge_slots(normalized, slots, entity_slots)
+
+        canonical = " ".join(normalized.lower().split())
+        signature = hashlib.sha256(canonical.encode()).hexdigest()[:24]
+        return Template(signature=signature, text=canonical, slots=slots)
+
+    @staticmethod
+    def _merge_slots(normalized: str, typed_slots: List[str], entity_slots: List[str]) -> List[str]:
+        """Aligne les valeurs sur l'ordre d'apparition des marqueurs"""
+        typed_iter = iter(typed_slots)
+        entity_iter = iter(entity_slots)
+        ordered = []
+        for marker in re.findall(r"<(url|str|path|num|ent)>", normalized):
+            ordered.append(next(entity_iter) if marker == "ent" else next(typed_iter))
+        return ordered
+
+
+def templatize_response(response: str, slots: List[str]) -> str:
+    """Remplace les valeurs des slots dans une réponse par des marqueurs"""
+    # Plus longues valeurs d'abord ("New York City" avant "New York")
+    order = sorted(range(len(slots)), key=lambda i: len(slots[i]), reverse=True)
+    for i in order:
+        value = slots[i].strip("\"'`")
+        if not value:
+            continue
+        pattern = r"(?<!\w)" + re.escape(value) + r"(?!\w)"
+        response = re.sub(pattern, lambda _: _MARKER % i, response)
+    return response
+
+
+def has_slot_markers(response_template: str) -> bool:
+    """Vrai si au moins une valeur de slot a été remplacée par un marqueur"""
+    return _MARKER_PATTERN.search(response_template) is not None
+
+
+def fill_template(response_template: str, slots: List[str]) -> str:
+    """Re-remplit les marqueurs avec de nouvelles valeurs de slots"""
+    for i, value in enumerate(slots):
+        response_template = response_template.replace(_MARKER % i, value.strip("\"'`"))
+    return response_template
+
+
+# Signature du réécrivain: (réponse, anciens slots, nouveaux slots, requête) → (contenu, coût)
+Rewriter = Callable[[str, List[str], List[str], str], Optional[Tuple[str, float]]]
+
+
+class TemplateCache:
+    """
+    Index L3: portée + signature de template → réponse templatisée
+
+    LRU borné en mémoire, avec compteurs de hits par template.
+    """
+
+    def __init__(
+        self,
+        max_templates: int = 2000,
+        min_verified: int = 1,
+        rewriter: Optional[Rewriter] = None
+    ):
+        """
+        Args:
+            max_templates: Nombre maximum de templates conservés
+            min_verified: Observations concordantes requises avant de servir
+            rewriter: Réécriture NANO pour les templates non vérifiés (optionnel)
+        """
+        self.extractor = TemplateExtractor()
+        self.max_templates = max_templates
+        self.min_verified = min_verified
+        self.rewriter = rewriter
+
+        self._entries: "OrderedDict[str, TemplateEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, scope: str, template: Template) -> str:
+        return f"{scope}:{template.signature}"
+
+    def lookup(self, scope: str, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Cherche un template correspondant et re-remplit ses slots
+
+        Returns:
+            Dict (content, tokens, cost, cost_spent, rewritten) ou None
+        """
+        template = self.extractor.extract(text)
+        if not template.slots:
+            return None  # Pas de slot: le L1 couvre déjà le match exact
+
+        key = self._key(scope, template)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+
+        if entry.verified >= self.min_verified and has_slot_markers(entry.response_template):
+            content = fill_template(entry.response_template, template.slots)
+            with self._lock:
+                entry.hits += 1
+            return {
+                "content": content,
+                "tokens": entry.tokens,
+                "cost": entry.cost,
+                "cost_spent": 0.0,
+                "rewritten": False
+            }
+
+        if self.rewriter is None:
+            return None
+
+        # Template non vérifié: réécriture NANO de la dernière réponse
+        rewritten = self.rewriter(entry.last_response, entry.last_slots, template.slots, text)
+        if not rewritten:
+            return None
+
+        content, rewrite_cost = rewritten
+        with self._lock:
+            entry.hits += 1
+            entry.rewrites += 1
+        return {
+            "content": content,
+            "tokens": entry.tokens,
+            "cost": max(entry.cost - rewrite_cost, 0.0),
+            "cost_spent": rewrite_cost,
+            "rewritten": True
+        }
+
+    def add(self, scope: str, text: str, value: Dict[str, Any]):
+        """
+        Indexe une réponse sous la signature de template de la requête
+
+        Args:
+            scope: Portée (tier + empreinte système)
+            text: Texte utilisateur
+            value: Valeur du cache (content, tokens, cost, timestamp)
+        """
+        template = self.extractor.extract(text)
+        if not template.slots:
+            return
+
+        response = value["content"]
+        response_template = templatize_response(response, template.slots)
+        key = self._key(scope, template)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self._entries[key] = TemplateEntry(
+                    text=template.text,
+                    response_template=response_template,
+                    last_response=response,
+                    last_slots=template.slots,
+                    tokens=value["tokens"],
+                    cost=value["cost"],
+                    created_at=value.get("timestamp", 0.0)
+                )
+                while len(self._entries) > self.max_templates:
+                    self._entries.popitem(last=False)
+                return
+
+            entry.observations += 1
+            if entry.last_slots != template.slots and response_template == entry.response_template:
+                # Même réponse templatisée avec d'autres valeurs: template fiable,
+                # à condition qu'elle dépende des slots (sinon: réécriture seulement)
+                if has_slot_markers(response_template):
+                    entry.verified += 1
+            elif response_template != entry.response_template:
+                # La réponse dépend d'autre chose que des slots: repartir de zéro
+                entry.response_template = response_template
+                entry.verified = 0
+
+            entry.last_response = response
+            entry.last_slots = template.slots
+            entry.tokens = value["tokens"]
+            entry.cost = value["cost"]
+            self._entries.move_to_end(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self, top: int = 5) -> Dict[str, Any]:
+        """Statistiques L3 avec compteurs de hits par template"""
+        with self._lock:
+            entries = list(self._entries.values())
+
+        ranked = sorted(entries, key=lambda e: e.hits, reverse=True)[:top]
+        return {
+            "l3_templates": len(entries),
+            "l3_verified_templates": sum(1 for e in entries if e.verified >= self.min_verified),
+            "l3_rewrites": sum(e.rewrites for e in entries),
+            "l3_top_templates": [
+                {"template": e.text, "hits": e.hits, "observations": e.observations}
+                for e in ranked if e.hits > 0
+            ]
+        }
+
+    def clear(self):
+        """Vide l'index"""
+        with self._lock:
+            self._entries.clear()
@@ -13,8 +13,6 @@ from cortex.cli.terminal_ui import (
     show_help,
 )
 
-from cortex.cli.cortex_cli import CortexCLI
-
 __all__ = [
     "TerminalUI",
     "Color",
@@ -24,3 +22,11 @@ __all__ = [
     "show_help",
     "CortexCLI",
 ]
+
+
+def __getattr__(name):
+    # CortexCLI importé à la demande: "import cortex.cli.terminal_ui" reste léger
+    if name == "CortexCLI":
+        from cortex.cli.cortex_cli import CortexCLI
+        return CortexCLI
+    raise AttributeError(f"module 'cortex.cli' has no attribute '{name}'")
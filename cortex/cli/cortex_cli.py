@@ -12,6 +12,7 @@ Beautiful, colorful, interactive terminal interface with:
 
 import sys
 import os
+import shlex
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
@@ -21,9 +22,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from cortex.cli.terminal_ui import (
     TerminalUI,
     Color,
+    StreamPrinter,
     show_startup_screen,
     show_agent_status,
     show_cost_summary,
+    show_cost_history,
+    show_prompt_cache_report,
     show_help
 )
 from cortex.cli.display_helpers import (
@@ -43,36 +47,11 @@ from cortex.cli.advanced_ui import (
 )
 from cortex.cli.interactive_prompt import InteractivePrompt
 
-# Cortex core components
-from cortex.core.llm_client import LLMClient
-from cortex.core.model_router import ModelRouter
-from cortex.core.prompt_engineer import PromptEngineer
-from cortex.core.tool_filter import ToolFilter
-from cortex.tools.tool_executor import ToolExecutor
-from cortex.tools.builtin_tools import get_all_builtin_tools
-from cortex.tools.web_tools import get_all_web_tools
-from cortex.tools.git_tools import get_all_git_tools
-from cortex.tools.pip_tools import get_all_pip_tools
-from cortex.tools.intelligence_tools import get_all_intelligence_tools
-
-# Cortex agents
-from cortex.agents import (
-    create_triage_agent, create_quick_actions_agent, create_tooler_agent,
-    create_communications_agent, create_planner_agent, create_maintenance_agent,
-    create_harmonization_agent, create_quality_control_agent
-)
-from cortex.agents.context_agent import create_context_agent
-from cortex.agents.smart_router_agent import create_smart_router_agent
-
-# Cortex departments
-from cortex.departments.optimization import OptimizationOrchestrator
-
-# Cortex managers
-from cortex.core.todo_manager_wrapper import create_todo_manager, TaskStatus  # Using TodoDB backend
-from cortex.core.conversation_manager import create_conversation_manager
-from cortex.core.auto_task_manager import AutoTaskManager
-from cortex.core.file_cleanup_manager import FileCleanupManager
-from cortex.tools.task_management_tools import TaskManager
+# Cortex core components (lightweight only: LLMClient, agents, tools and managers
+# are imported by their lazy component factories, on first use)
+from cortex.core.config_loader import get_config
+from cortex.core.prompt_cache import agent_scope, volatile, get_prompt_cache_stats
+from cortex.core.lazy_components import lazy_component, component_timings
 
 
 class CortexCLI:
@@ -93,67 +72,18 @@ class CortexCLI:
         self.interactive_prompt = InteractivePrompt(expand_callback=self._handle_ctrl_e)
         self.last_collapsible_id = None
 
-        # Real LLM components
-        self.llm_client = LLMClient()
-        self.model_router = ModelRouter()
-        self.prompt_engineer = PromptEngineer(self.llm_client)
-        self.tool_filter = ToolFilter()
-        self.tool_executor = ToolExecutor(self.llm_client)
-
-        # Core managers
-        self.todo_manager = create_todo_manager()
-        self.conversation_manager = create_conversation_manager(self.llm_client)
-
-        # Self-management tools
-        self.task_manager = TaskManager()
-        self.auto_task_manager = AutoTaskManager(self.task_manager)
-        self.file_cleanup_manager = FileCleanupManager()
-
-        # Specialized agents
-        self.triage_agent = create_triage_agent(self.llm_client)
-        self.quick_actions_agent = None  # Created after available_tools registered
-        self.tooler_agent = create_tooler_agent(self.llm_client)
-        self.communications_agent = create_communications_agent(self.llm_client)
-        self.planner_agent = create_planner_agent(self.llm_client, self.todo_manager)
-        self.context_agent = create_context_agent(self.llm_client)
-        self.smart_router = create_smart_router_agent(self.llm_client)
-        self.maintenance_agent = create_maintenance_agent(self.llm_client)
-        self.harmonization_agent = create_harmonization_agent(self.llm_client)
-        self.quality_control_agent = create_quality_control_agent(self.llm_client)
-
-        # Optimization department
-        self.optimization_orchestrator = OptimizationOrchestrator()
+        # Agents, managers and tools are lazy components (built on first use, see below)
+
+        # Streaming: afficher la réponse dès le premier token
+        self.stream_responses = get_config().get("cli.display.stream", True)
+
+        # Project knowledge base (créée au premier "kb")
+        self.knowledge_base = None
 
         # Current employee handling requests
         self.current_employee = "Cortex"  # Default employee
         self.employee_stack = []  # Stack for nested employee calls
 
-        # Register built-in tools
-        self.available_tools = get_all_builtin_tools()
-
-        # Register web tools (search, fetch, weather)
-        web_tools = get_all_web_tools()
-        self.available_tools.extend(web_tools)
-
-        # Register git tools (status, add, commit, push, pull, log)
-        git_tools = get_all_git_tools()
-        self.available_tools.extend(git_tools)
-
-        # Register pip tools (install, uninstall, list, show, freeze)
-        pip_tools = get_all_pip_tools()
-        self.available_tools.extend(pip_tools)
-
-        # Register intelligence tools (scrape_xpath, validate_xpath, add_web_source)
-        intelligence_tools = get_all_intelligence_tools()
-        self.available_tools.extend(intelligence_tools)
-
-        # Register all tools with executor
-        for tool in self.available_tools:
-            self.tool_executor.register_tool(tool)
-
-        # Create Quick Actions Agent after tools are registered
-        self.quick_actions_agent = create_quick_actions_agent(self.llm_client, self.available_tools)
-
         # Conversation history for context
         self.conversation_history: List[Dict[str, Any]] = []
 
@@ -175,27 +105,143 @@ class CortexCLI:
         self.total_cost = 0.0
         self.total_tokens = 0
 
+    # ------------------------------------------------------------------
+    # Lazy components: each one (and its imports) is built on first use
+    # ------------------------------------------------------------------
+
+    @lazy_component
+    def llm_client(self):
+        from cortex.core.llm_client import LLMClient
+        return LLMClient()
+
+    @lazy_component
+    def model_router(self):
+        from cortex.core.model_router import ModelRouter
+        return ModelRouter()
+
+    @lazy_component
+    def prompt_engineer(self):
+        from cortex.core.prompt_engineer import PromptEngineer
+        return PromptEngineer(self.llm_client)
+
+    @lazy_component
+    def tool_filter(self):
+        from cortex.core.tool_filter import ToolFilter
+        return ToolFilter()
+
+    @lazy_component
+    def available_tools(self):
+        """Built-in, web, git, pip and intelligence tool groups"""
+        from cortex.tools.builtin_tools import get_all_builtin_tools
+        from cortex.tools.web_tools import get_all_web_tools
+        from cortex.tools.git_tools import get_all_git_tools
+        from cortex.tools.pip_tools import get_all_pip_tools
+        from cortex.tools.intelligence_tools import get_all_intelligence_tools
+
+        tools = get_all_builtin_tools()
+        tools.extend(get_all_web_tools())  # search, fetch, weather
+        tools.extend(get_all_git_tools())  # status, add, commit, push, pull, log
+        tools.extend(get_all_pip_tools())  # install, uninstall, list, show, freeze
+        tools.extend(get_all_intelligence_tools())  # scrape_xpath, validate_xpath, add_web_source
+        return tools
+
+    @lazy_component
+    def tool_executor(self):
+        from cortex.tools.tool_executor import ToolExecutor
+        executor = ToolExecutor(self.llm_client)
+        for tool in self.available_tools:
+            executor.register_tool(tool)
+        return executor
+
+    @lazy_component
+    def todo_manager(self):
+        from cortex.core.todo_manager_wrapper import create_todo_manager  # Using TodoDB backend
+        return create_todo_manager()
+
+    @lazy_component
+    def conversation_manager(self):
+        from cortex.core.conversation_manager import create_conversation_manager
+        return create_conversation_manager(self.llm_client)
+
+    @lazy_component
+    def task_manager(self):
+        from cortex.tools.task_management_tools import TaskManager
+        try:
+            return TaskManager()
+        except FileNotFoundError:
+            # First run: create the TodoDB schema (no need for the todo_manager bcrypt login)
+            from cortex.core.todo_db import create_todo_db
+            create_todo_db()
+            return TaskManager()
+
+    @lazy_component
+    def auto_task_manager(self):
+        from cortex.core.auto_task_manager import AutoTaskManager
+        return AutoTaskManager(self.task_manager)
+
+    @lazy_component
+    def file_cleanup_manager(self):
+        from cortex.core.file_cleanup_manager import FileCleanupManager
+        return FileCleanupManager()
+
+    @lazy_component
+    def triage_agent(self):
+        from cortex.agents import create_triage_agent
+        return create_triage_agent(self.llm_client)
+
+    @lazy_component
+    def quick_actions_agent(self):
+        from cortex.agents import create_quick_actions_agent
+        return create_quick_actions_agent(self.llm_client, self.available_tools)
+
+    @lazy_component
+    def tooler_agent(self):
+        from cortex.agents import create_tooler_agent
+        return create_tooler_agent(self.llm_client)
+
+    @lazy_component
+    def communications_agent(self):
+        from cortex.agents import create_communications_agent
+        return create_communications_agent(self.llm_client)
+
+    @lazy_component
+    def planner_agent(self):
+        from cortex.agents import create_planner_agent
+        return create_planner_agent(self.llm_client, self.todo_manager)
+
+    @lazy_component
+    def context_agent(self):
+        from cortex.agents.context_agent import create_context_agent
+        return create_context_agent(self.llm_client)
+
+    @lazy_component
+    def smart_router(self):
+        from cortex.agents.smart_router_agent import create_smart_router_agent
+        return create_smart_router_agent(self.llm_client)
+
+    @lazy_component
+    def maintenance_agent(self):
+        from cortex.agents import create_maintenance_agent
+        return create_maintenance_agent(self.llm_client)
+
+    @lazy_component
+    def harmonization_agent(self):
+        from cortex.agents import create_harmonization_agent
+        return create_harmonization_agent(self.llm_client)
+
+    @lazy_component
+    def quality_control_agent(self):
+        from cortex.agents import create_quality_control_agent
+        return create_quality_control_agent(self.llm_client)
+
+    @lazy_component
+    def optimization_orchestrator(self):
+        from cortex.departments.optimization import OptimizationOrchestrator
+        return OptimizationOrchestrator()
+
     def run(self):
         """Main CLI loop"""
-        # Show startup screen
-        show_startup_screen(self.ui)
-
-        # Welcome message
-        self.ui.info(f"Welcome to {self.ui.color('Cortex', Color.CYAN, bold=True)}! Type {self.ui.color('help', Color.YELLOW)} for available commands.")
-        self.ui.info(f"You can also type natural language requests directly (e.g., {self.ui.color('create a file test.md', Color.GREEN)})")
-        print()
-
-        # STARTUP: Auto-scan documentation for tasks
-        print(f"{self.ui.color('→', Color.BRIGHT_BLUE)} Analyse de la documentation pour tâches...")
-        print()
-        try:
-            scan_result = self.auto_task_manager.scan_and_create_tasks()
-            if scan_result['success'] and scan_result['tasks_created'] > 0:
-                print(f"  {self.ui.color('✓', Color.GREEN)} {scan_result['tasks_created']} tâche(s) créée(s) depuis la documentation")
-            print()
-        except Exception as e:
-            print(f"  {self.ui.color('⚠️', Color.YELLOW)} Échec du scan: {str(e)[:50]}")
-            print()
+        self.startup()
 
         # Main loop
         while self.running:
@@ -260,6 +306,28 @@ class CortexCLI:
         self.ui.success("Cortex shutdown complete. Goodbye!")
         print()
 
+    def startup(self):
+        """Everything shown before the first prompt (timed by --profile-startup)"""
+        # Show startup screen
+        show_startup_screen(self.ui)
+
+        # Welcome message
+        self.ui.info(f"Welcome to {self.ui.color('Cortex', Color.CYAN, bold=True)}! Type {self.ui.color('help', Color.YELLOW)} for available commands.")
+        self.ui.info(f"You can also type natural language requests directly (e.g., {self.ui.color('create a file test.md', Color.GREEN)})")
+        print()
+
+        # STARTUP: Auto-scan documentation for tasks
+        print(f"{self.ui.color('→', Color.BRIGHT_BLUE)} Analyse de la documentation pour tâches...")
+        print()
+        try:
+            scan_result = self.auto_task_manager.scan_and_create_tasks()
+            if scan_result['success'] and scan_result['tasks_created'] > 0:
+                print(f"  {self.ui.color('✓', Color.GREEN)} {scan_result['tasks_created']} tâche(s) créée(s) depuis la documentation")
+            print()
+        except Exception as e:
+            print(f"  {self.ui.color('⚠️', Color.YELLOW)} Échec du scan: {str(e)[:50]}")
+            print()
+
     def execute_command(self, command: str):
         """Execute a command"""
         parts = command.split(maxsplit=1)
@@ -329,6 +397,24 @@ class CortexCLI:
             else:
                 self.cmd_qc(args)
 
+        elif cmd == "kb":
+            if not args:
+                self.ui.error("Usage: kb <sync [--force]|stats>")
+            else:
+                self.cmd_kb(args)
+
+        elif cmd == "router":
+            if not args:
+                self.ui.error("Usage: router <train|eval|stats>")
+            else:
+                run_router_command(args, self.ui)
+
+        elif cmd == "batch":
+            if not args:
+                self.ui.error(BATCH_USAGE)
+            else:
+                run_batch_command(args, self.ui)
+
         elif cmd == "optimize":
             self.cmd_optimize()
 
@@ -383,12 +469,39 @@ Total Cost: ${sum(self.costs.values()):.6f}
         show_agent_status(self.agents, self.ui)
 
     def cmd_costs(self):
-        """Show cost summary"""
-        if sum(self.costs.values()) == 0:
+        """Show cost summary (this session, then all sessions from the event store rollups)"""
+        from datetime import datetime, timedelta
+        from cortex.core.cortex_logger import get_logger
+
+        store = get_logger().store
+        by_tier = store.rollup(group_by=("tier",)) if store is not None else []
+        if sum(self.costs.values()) == 0 and not by_tier:
             self.ui.warning("No costs recorded yet")
             return
 
-        show_cost_summary(self.costs, self.ui)
+        if sum(self.costs.values()) > 0:
+            show_cost_summary(self.costs, self.ui)
+        if by_tier:
+            by_agent = store.rollup(group_by=("agent",), since=datetime.now() - timedelta(hours=24))
+            show_cost_history(by_tier, by_agent, self.ui)
+        show_prompt_cache_report(get_prompt_cache_stats().report(), self.ui)
+
+    def _record_task_event(self, description: str, tier: str, cost: float, duration: float, model: str = ""):
+        """Log a completed task (tier, cost, latency) to the event store behind CortexLogger"""
+        from cortex.core.cortex_logger import EventType, get_logger
+
+        try:
+            get_logger().log(
+                EventType.TASK_COMPLETE,
+                "CortexCLI",
+                description[:200],
+                data={"model": model},
+                cost=cost,
+                tier=tier,
+                latency_ms=duration * 1000
+            )
+        except Exception as e:
+            self.ui.warning(f"Could not log task event: {e}")
 
     def cmd_task(self, description: str):
         """Execute a task with real LLM and tools"""
@@ -454,6 +567,8 @@ Total Cost: ${sum(self.costs.values()):.6f}
                     quick_cost = quick_result.get('cost', 0.0)
                     self.costs['nano'] += quick_cost
                     self.total_cost += quick_cost
+                    self._record_task_event(description, 'nano', quick_cost, time.time() - start_time,
+                                            quick_result.get('model', 'nano'))
 
                     # Success message
                     self.ui.success(f"✓ Action rapide complétée! Coût: ${quick_cost:.6f} | Modèle: {quick_result.get('model', 'nano')}")
@@ -508,7 +623,8 @@ Total Cost: ${sum(self.costs.values()):.6f}
 
             # Add application context if provided
             if context_result['context']:
-                messages.append({"role": "system", "content": f"APPLICATION CONTEXT:\n{context_result['context']}"})
+                # Volatile: placé après l'historique pour garder le préfixe cacheable
+                messages.append(volatile({"role": "system", "content": f"APPLICATION CONTEXT:\n{context_result['context']}"}))
 
             # Add recent conversation history (last 5 exchanges)
             for exchange in self.conversation_history[-5:]:
@@ -529,15 +645,21 @@ Total Cost: ${sum(self.costs.values()):.6f}
             # Step 4: Execute with filtered tools
             print()
             # Afficher le rôle métier de l'agent (pas le nom du modèle)
+            # En streaming, le spinner s'arrête au premier token reçu
             with LoadingSpinner(f"👤 Task Executor - Exécution ({selection.model_name})") as spinner:
-                response = self.tool_executor.execute_with_tools(
-                    messages=messages,
-                    tier=selection.tier,
-                    tools=filtered_tools,
-                    max_tokens=None,  # Utilise les specs du modèle (128,000 pour nano)
-                    temperature=1.0,
-                    verbose=False  # Disable verbose to not interfere with spinner
-                )
+                stream_printer = StreamPrinter(self.ui, on_first_token=spinner.stop)
+                with agent_scope("TaskExecutor"):
+                    response = self.tool_executor.execute_with_tools(
+                        messages=messages,
+                        tier=selection.tier,
+                        tools=filtered_tools,
+                        max_tokens=None,  # Utilise les specs du modèle (128,000 pour nano)
+                        temperature=1.0,
+                        verbose=False,  # Disable verbose to not interfere with spinner
+                        on_text=stream_printer.write if self.stream_responses else None,
+                        on_tool_turn=stream_printer.tool_turn if self.stream_responses else None
+                    )
+            stream_printer.finish()
 
             # Step 4: Display results
             print()
@@ -551,13 +673,15 @@ Total Cost: ${sum(self.costs.values()):.6f}
             # Display response with styled markdown
             print()
             if response.content and response.content.strip():
-                # Render as markdown with rich styling
-                print(self.ui.color("━" * 80, Color.CYAN))
-                print(f"{self.ui.color('📝 RESPONSE', Color.BRIGHT_CYAN, bold=True)}")
-                print(self.ui.color("━" * 80, Color.CYAN))
-                print()
-                render_markdown(response.content)
-                print()
+                # Déjà affichée fragment par fragment si streamée
+                if not stream_printer.started:
+                    # Render as markdown with rich styling
+                    print(self.ui.color("━" * 80, Color.CYAN))
+                    print(f"{self.ui.color('📝 RESPONSE', Color.BRIGHT_CYAN, bold=True)}")
+                    print(self.ui.color("━" * 80, Color.CYAN))
+                    print()
+                    render_markdown(response.content)
+                    print()
 
                 # Check if TOOLER is needed
                 if "TOOLER_NEEDED:" in response.content:
@@ -674,6 +798,7 @@ Total Cost: ${sum(self.costs.values()):.6f}
 
             # Calculate task duration
             duration = time.time() - start_time
+            self._record_task_event(description, tier_name, response.cost, duration, response.model)
 
             # Run automatic quality control
             self._run_quality_control(
@@ -684,7 +809,8 @@ Total Cost: ${sum(self.costs.values()):.6f}
             )
 
             # Success message
-            self.ui.success(f"✓ Tâche complétée! Coût: ${response.cost:.6f} | Tokens: {response.tokens_input + response.tokens_output}")
+            ttft_info = f" | TTFT: {stream_printer.ttft:.2f}s" if stream_printer.ttft is not None else ""
+            self.ui.success(f"✓ Tâche complétée! Coût: ${response.cost:.6f} | Tokens: {response.tokens_input + response.tokens_output}{ttft_info}")
 
         except Exception as e:
             print()
@@ -1160,6 +1286,8 @@ Total Cost: ${sum(self.costs.values()):.6f}
 
     def cmd_show_todos(self):
         """Show TodoList"""
+        from cortex.core.todo_manager_wrapper import TaskStatus
+
         self.ui.header("📋 TodoList", level=2)
 
         summary = self.todo_manager.get_tasks_summary()
@@ -1193,6 +1321,8 @@ Total Cost: ${sum(self.costs.values()):.6f}
 
     def cmd_execute_next_task(self):
         """Execute next pending task from TodoList"""
+        from cortex.core.todo_manager_wrapper import TaskStatus
+
         # Check if there's a task in progress
         current_task = self.todo_manager.get_current_task()
         if current_task:
@@ -1440,6 +1570,13 @@ Total Cost: ${sum(self.costs.values()):.6f}
             print()
             self.ui.error(f"Harmonization failed: {str(e)[:100]}")
 
+    def cmd_kb(self, args: str):
+        """Run project knowledge base commands"""
+        if self.knowledge_base is None:
+            from cortex.core.project_knowledge_base import ProjectKnowledgeBase
+            self.knowledge_base = ProjectKnowledgeBase(Path.cwd(), use_local_embeddings=True)
+        run_kb_command(self.knowledge_base, args, self.ui)
+
     def cmd_qc(self, args: str):
         """Run quality control commands"""
         sub_cmd = args.split()[0].lower()
@@ -1770,8 +1907,315 @@ Total Cost: ${sum(self.costs.values()):.6f}
             self.ui.error(f"Optimization failed: {str(e)[:100]}")
 
 
+def run_kb_command(knowledge_base, args: str, ui: TerminalUI) -> bool:
+    """
+    Execute a knowledge base command (shared by the REPL and `cortex_cli.py kb ...`)
+
+    Returns:
+        True on success
+    """
+    parts = args.split()
+    sub_cmd = parts[0].lower() if parts else ""
+
+    if sub_cmd == "sync":
+        report = knowledge_base.sync(force="--force" in parts)
+        if report.files_changed or report.files_deleted or report.chunks_deleted:
+            ui.success(
+                f"Knowledge base synced in {report.seconds * 1000:.0f}ms: "
+                f"{report.files_changed} changed, {report.files_deleted} deleted, "
+                f"+{report.chunks_upserted}/-{report.chunks_deleted} chunks"
+            )
+        else:
+            ui.success(f"Knowledge base up to date ({report.files_scanned} files checked in {report.seconds * 1000:.0f}ms)")
+        return True
+
+    if sub_cmd == "stats":
+        stats = knowledge_base.get_stats()
+        print(f"  {ui.color('Chunks:', Color.CYAN)} {stats['total_chunks']}")
+        print(f"  {ui.color('Tokens:', Color.CYAN)} {stats['total_tokens']:,}")
+        print(f"  {ui.color('Embedding cost:', Color.CYAN)} ${stats['embedding_cost']:.4f}")
+        print(f"  {ui.color('Last indexed:', Color.CYAN)} {stats['last_indexed'] or 'never'}")
+        return True
+
+    ui.error("Usage: kb <sync [--force]|stats>")
+    return False
+
+
+def _print_routing_report(report: dict, ui: TerminalUI):
+    """Display a learned-router replay report"""
+    print(f"  {ui.color('Accuracy:', Color.CYAN)} {report['accuracy']:.1%} "
+          f"({report['coverage']:.0%} confident at >= {report['min_confidence']:.0%})")
+    print(f"  {ui.color('Escalations:', Color.CYAN)} {report['history_escalations']} in history, "
+          f"{report['replay_escalations']} replayed ({report['escalations_avoided']} avoided), "
+          f"{report['heuristic_escalations']} with heuristics only")
+    print(f"  {ui.color('Over-provisioned:', Color.CYAN)} {report['over_provisioned']} "
+          f"(heuristics: {report['heuristic_over_provisioned']})")
+    print(f"  {ui.color('Replayed cost:', Color.CYAN)} ${report['replay_cost']:.4f} "
+          f"vs ${report['history_cost']:.4f} in history")
+    print(f"  {ui.color('Inference:', Color.CYAN)} {report['inference_us_p50']:.0f}µs p50, "
+          f"{report['inference_us_p99']:.0f}µs p99")
+
+
+def run_router_command(args: str, ui: TerminalUI) -> bool:
+    """
+    Execute a learned router command (shared by the REPL and `cortex_cli.py router ...`)
+
+    Returns:
+        True on success
+    """
+    from cortex.core import learned_router
+
+    sub_cmd = args.split()[0].lower() if args.split() else ""
+
+    if sub_cmd == "train":
+        report = learned_router.train_from_history()
+        if not report["success"]:
+            ui.error(report["error"])
+            return False
+        ui.success(f"Router trained on {report['train_examples'] + report['holdout_examples']} outcomes "
+                   f"→ {report['model_path']}")
+        print(f"  Holdout ({report['holdout_examples']} most recent outcomes):")
+        _print_routing_report(report, ui)
+        return True
+
+    if sub_cmd == "eval":
+        router = learned_router.get_learned_router()
+        if router is None:
+            ui.error("No trained router model (run: router train)")
+            return False
+        examples = learned_router.load_history()
+        _print_routing_report(learned_router.evaluate_router(router, examples), ui)
+        return True
+
+    if sub_cmd == "stats":
+        router = learned_router.get_learned_router()
+        print(f"  {ui.color('History:', Color.CYAN)} {len(learned_router.load_history())} routing outcomes")
+        if router is None:
+            print(f"  {ui.color('Model:', Color.CYAN)} not trained")
+        else:
+            print(f"  {ui.color('Model:', Color.CYAN)} {router.trained_examples} examples, "
+                  f"{len(router.weights):,} features, trained {router.trained_at}")
+        return True
+
+    ui.error("Usage: router <train|eval|stats>")
+    return False
+
+
+BATCH_USAGE = ("Usage: batch <submit <requests.jsonl> [--tier T] [--name N] [--run]|"
+               "run [--no-wait]|status [batch_id]|results <batch_id> [--output file]>")
+
+
+def _option(parts: list, name: str, default=None):
+    """Value following a --name flag in a split command line"""
+    if name in parts and parts.index(name) + 1 < len(parts):
+        return parts[parts.index(name) + 1]
+    return default
+
+
+def _print_batch_run(report: dict, ui: TerminalUI):
+    """Display a batch worker run report"""
+    ui.success(f"Batch run: {report['completed']} completed, {report['failed']} failed "
+               f"({report['submitted']} via provider batch APIs, {report['direct']} direct)")
+    if report["open_batches"]:
+        ui.info(f"{report['open_batches']} provider batch(es) still running: run `batch run` again later")
+
+
+def run_batch_command(args: str, ui: TerminalUI) -> bool:
+    """
+    Execute a batch queue command (shared by the REPL and `cortex batch ...`)
+
+    Returns:
+        True on success
+    """
+    import json
+    from cortex.core.batch_processor import BatchQueue, BatchWorker
+
+    parts = shlex.split(args)
+    sub_cmd = parts[0].lower() if parts else ""
+    queue = BatchQueue()
+
+    if sub_cmd == "submit" and len(parts) > 1:
+        path = Path(parts[1])
+        if not path.exists():
+            ui.error(f"File not found: {path}")
+            return False
+        try:
+            requests = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+            batch_id = queue.submit(requests, name=_option(parts, "--name", path.stem),
+                                    default_tier=_option(parts, "--tier", "nano"))
+        except ValueError as e:
+            ui.error(f"Invalid batch file: {e}")
+            return False
+        ui.success(f"Batch {batch_id} queued: {len(requests)} requests")
+        if "--run" in parts:
+            _print_batch_run(BatchWorker(queue).run(), ui)
+        return True
+
+    if sub_cmd == "run":
+        _print_batch_run(BatchWorker(queue).run(wait="--no-wait" not in parts), ui)
+        return True
+
+    if sub_cmd == "status":
+        if len(parts) > 1:
+            status = queue.status(parts[1])
+            if not status["total"]:
+                ui.error(f"Unknown batch: {parts[1]}")
+                return False
+            print(f"  {ui.color(parts[1], Color.CYAN)}: {status['completed']}/{status['total']} completed, "
+                  f"{status['failed']} failed, {status['pending'] + status['submitted']} in progress, "
+                  f"${status['cost']:.4f}")
+            return True
+        batches = queue.list_batches()
+        if not batches:
+            ui.info("No batches queued")
+        for batch in batches:
+            print(f"  {ui.color(batch['id'], Color.CYAN)} {batch['name'] or ''}: "
+                  f"{batch['completed']}/{batch['total']} completed, {batch['failed']} failed, "
+                  f"${batch['cost']:.4f} ({batch['created_at'][:16]})")
+        return True
+
+    if sub_cmd == "results" and len(parts) > 1:
+        results = queue.results(parts[1])
+        if not results:
+            ui.error(f"Unknown batch: {parts[1]}")
+            return False
+        lines = [json.dumps(r.to_dict(), ensure_ascii=False) for r in results]
+        output = _option(parts, "--output")
+        if output:
+            Path(output).write_text("\n".join(lines) + "\n", encoding="utf-8")
+            ui.success(f"{len(lines)} results written to {output}")
+        else:
+            print("\n".join(lines))
+        return True
+
+    ui.error(BATCH_USAGE)
+    return False
+
+
+STARTUP_TARGET_MS = 300  # Cold start to prompt
+
+
+def startup_probe(start: float, eager: bool = False) -> Dict[str, Any]:
+    """
+    Time one cold start of the CLI in the current process, up to the first prompt
+
+    Shared by `cortex --profile-startup` and benchmarks/bench_startup.py.
+
+    Args:
+        start: time.perf_counter() taken before importing this module
+        eager: Also build every lazy component (what startup used to cost)
+
+    Returns:
+        Phase durations in ms and the components built before the prompt
+    """
+    import contextlib
+    import io
+    import time
+
+    imported = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        cli = CortexCLI()
+        constructed = time.perf_counter()
+        if eager:
+            for name, attr in vars(CortexCLI).items():
+                if isinstance(attr, lazy_component):
+                    getattr(cli, name)
+        cli.startup()
+        cli.task_manager.get_next_task()
+    ready = time.perf_counter()
+
+    return {
+        "import_ms": (imported - start) * 1000,
+        "init_ms": (constructed - imported) * 1000,
+        "startup_ms": (ready - constructed) * 1000,
+        "total_ms": (ready - start) * 1000,
+        "components": {name: seconds * 1000 for name, seconds in component_timings(cli).items()},
+    }
+
+
+def _parse_importtime(stderr: str) -> Dict[str, float]:
+    """Self import time (ms) per top-level package from `python -X importtime` output"""
+    packages: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # Header line
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(self_us) / 1000
+    return packages
+
+
+def profile_startup(ui: TerminalUI, top: int = 12) -> bool:
+    """
+    Import-time profile of a cold start (`cortex --profile-startup`)
+
+    Runs the startup probe in a fresh interpreter with -X importtime and
+    reports the startup phases, the components built before the prompt
+    and the heaviest imported packages.
+
+    Returns:
+        True if the probe ran
+    """
+    import json
+    import subprocess
+    import time
+
+    code = ("import json, time; start = time.perf_counter(); "
+            "from cortex.cli.cortex_cli import startup_probe; "
+            "print(json.dumps(startup_probe(start)))")
+    launched = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, cwd=os.getcwd())
+    wall_ms = (time.perf_counter() - launched) * 1000
+    if proc.returncode != 0:
+        ui.error("Startup probe failed")
+        print(proc.stderr[-2000:])
+        return False
+    probe = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    ui.header("Startup profile", level=2)
+    print(f"  {ui.color('Import cortex_cli:', Color.CYAN)} {probe['import_ms']:7.1f} ms")
+    print(f"  {ui.color('CortexCLI():', Color.CYAN)}       {probe['init_ms']:7.1f} ms")
+    print(f"  {ui.color('Startup + scan:', Color.CYAN)}    {probe['startup_ms']:7.1f} ms")
+    total_color = Color.GREEN if probe["total_ms"] <= STARTUP_TARGET_MS else Color.YELLOW
+    total = ui.color(f"{probe['total_ms']:7.1f} ms", total_color)
+    print(f"  {ui.color('To prompt:', Color.CYAN)}         {total}  (target {STARTUP_TARGET_MS} ms; "
+          f"process wall time under -X importtime: {wall_ms:.0f} ms)")
+
+    if probe["components"]:
+        print(f"\n  {ui.color('Components built before the prompt:', Color.CYAN)}")
+        for name, ms in probe["components"].items():
+            print(f"    {name:<28} {ms:7.1f} ms")
+
+    print(f"\n  {ui.color('Heaviest imports (self time by package):', Color.CYAN)}")
+    packages = sorted(_parse_importtime(proc.stderr).items(), key=lambda item: -item[1])
+    for package, ms in packages[:top]:
+        print(f"    {package:<28} {ms:7.1f} ms")
+    return True
+
+
 def main():
     """Main entry point"""
+    # Import-time profile of the cold start (no REPL)
+    if "--profile-startup" in sys.argv[1:]:
+        sys.exit(0 if profile_startup(TerminalUI()) else 1)
+
+    # One-shot knowledge base commands: no need to start agents
+    if len(sys.argv) > 1 and sys.argv[1] == "kb":
+        from cortex.core.project_knowledge_base import ProjectKnowledgeBase
+        knowledge_base = ProjectKnowledgeBase(Path.cwd(), use_local_embeddings=True)
+        sys.exit(0 if run_kb_command(knowledge_base, " ".join(sys.argv[2:]), TerminalUI()) else 1)
+
+    # One-shot learned router commands (e.g. a nightly "router train")
+    if len(sys.argv) > 1 and sys.argv[1] == "router":
+        sys.exit(0 if run_router_command(" ".join(sys.argv[2:]), TerminalUI()) else 1)
+
+    # One-shot batch queue commands (overnight jobs: "batch submit ... --run")
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        sys.exit(0 if run_batch_command(" ".join(shlex.quote(a) for a in sys.argv[2:]), TerminalUI()) else 1)
+
     try:
         cli = CortexCLI()
         cli.run()
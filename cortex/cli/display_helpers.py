@@ -12,11 +12,9 @@ import threading
 import time
 from typing import Optional, List
 from rich.console import Console
-from rich.markdown import Markdown
 from rich.spinner import Spinner
 from rich.live import Live
 from rich.panel import Panel
-from rich.syntax import Syntax
 from rich.text import Text
 
 
@@ -102,6 +100,8 @@ class MarkdownRenderer:
             markdown_text: Markdown text to render
             title: Optional title for panel
         """
+        from rich.markdown import Markdown  # markdown-it + pygments: loaded on first render
+
         md = Markdown(markdown_text)
 
         if title:
@@ -119,6 +119,8 @@ class MarkdownRenderer:
             language: Programming language
             line_numbers: Show line numbers
         """
+        from rich.syntax import Syntax
+
         syntax = Syntax(code, language, theme="monokai", line_numbers=line_numbers)
         self.console.print(syntax)
 
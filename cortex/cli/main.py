@@ -405,6 +405,12 @@ def main():
         print("\nPlease run from the project root directory")
         sys.exit(1)
 
+    # Commandes ponctuelles sans REPL (ex: job de nuit "cortex batch run", "cortex kb sync",
+    # "cortex router train", "cortex --profile-startup")
+    if len(sys.argv) > 1 and (sys.argv[1] in ("batch", "kb", "router") or "--profile-startup" in sys.argv[1:]):
+        from cortex.cli.cortex_cli import main as cortex_cli_main
+        cortex_cli_main()
+
     # Lancer le CLI
     cli = CortexCLI()
     cli.run()
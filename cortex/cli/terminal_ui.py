@@ -12,7 +12,7 @@ Provides:
 
 import sys
 import time
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 from enum import Enum
 
 
@@ -224,6 +224,79 @@ class TerminalUI:
             print(f"\n{self.color(text, Color.MAGENTA)}")
 
 
+class StreamPrinter:
+    """
+    Print a streamed LLM response as fragments arrive
+
+    The header is printed on the first fragment, so a spinner can keep
+    running until then (pass its stop method as on_first_token). In a tool
+    loop, pass tool_turn as on_tool_turn: text streamed before a tool call is
+    then closed by a tool marker, and the final answer starts on its own.
+    """
+
+    def __init__(
+        self,
+        ui: Optional[TerminalUI] = None,
+        title: str = "📝 RESPONSE",
+        on_first_token: Optional[Callable[[], None]] = None
+    ):
+        """
+        Args:
+            ui: TerminalUI instance
+            title: Header printed above the response
+            on_first_token: Called once, right before the first fragment is printed
+        """
+        self.ui = ui or TerminalUI()
+        self.title = title
+        self.on_first_token = on_first_token
+        self.started = False
+        self.start_time = time.time()
+        self.first_token_time: Optional[float] = None
+        self.chars = 0
+        self.answer_chars = 0  # Characters streamed since the last tool turn
+
+    def write(self, text: str):
+        """Print one fragment"""
+        if not self.started:
+            self.started = True
+            self.first_token_time = time.time()
+            if self.on_first_token:
+                self.on_first_token()
+            print()
+            print(self.ui.color("━" * 80, Color.CYAN))
+            print(f"{self.ui.color(self.title, Color.BRIGHT_CYAN, bold=True)}")
+            print(self.ui.color("━" * 80, Color.CYAN))
+            print()
+
+        sys.stdout.write(text)
+        sys.stdout.flush()
+        self.chars += len(text)
+        self.answer_chars += len(text)
+
+    def tool_turn(self, tool_calls: List[Any]):
+        """Mark the text streamed so far as a tool-call preamble, not the answer"""
+        if not self.answer_chars:
+            return
+        names = ", ".join(getattr(tc, "name", None) or str(tc) for tc in tool_calls)
+        print()
+        print(self.ui.color(f"🔧 Calling tools: {names}", Color.DIM))
+        print()
+        self.answer_chars = 0
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """Time to first token in seconds (None if nothing was streamed)"""
+        if self.first_token_time is None:
+            return None
+        return self.first_token_time - self.start_time
+
+    def finish(self):
+        """End the streamed block"""
+        if self.started:
+            print()
+            print()
+
+
 # ASCII Logo - Cleaner and more readable
 CORTEX_LOGO = """
    ███╗   ███╗██╗  ██╗███╗   ███╗     ██████╗ ██████╗ ██████╗ ██████╗
@@ -244,13 +317,15 @@ CORTEX_LOGO = """
 CORTEX_TAGLINE = "AI Agent Orchestration System"
 
 
-def show_startup_screen(ui: Optional[TerminalUI] = None, show_system_info: bool = True):
+def show_startup_screen(ui: Optional[TerminalUI] = None, show_system_info: bool = True, animate: bool = False):
     """
     Display beautiful startup screen
 
     Args:
         ui: TerminalUI instance (creates one if None)
         show_system_info: Show system information
+        animate: Play the loading spinners (~1.9s; cosmetic only, the CLI builds
+                 agents and LLM connections on first use)
     """
     if ui is None:
         ui = TerminalUI()
@@ -285,10 +360,11 @@ Initialized: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         print()
 
     # Loading animation
-    ui.spinner("Initializing Cortex systems", duration=0.5)
-    ui.spinner("Loading agent configurations", duration=0.4)
-    ui.spinner("Establishing LLM connections", duration=0.4)
-    ui.spinner("Indexing project knowledge base", duration=0.6)
+    if animate:
+        ui.spinner("Initializing Cortex systems", duration=0.5)
+        ui.spinner("Loading agent configurations", duration=0.4)
+        ui.spinner("Establishing LLM connections", duration=0.4)
+        ui.spinner("Indexing project knowledge base", duration=0.6)
 
     print()
     ui.success("Cortex is ready!")
@@ -393,6 +469,70 @@ def show_cost_summary(costs: Dict[str, float], ui: Optional[TerminalUI] = None):
     print()
 
 
+def show_cost_history(
+    by_tier: List[Dict[str, Any]],
+    by_agent: List[Dict[str, Any]],
+    ui: Optional[TerminalUI] = None
+):
+    """
+    Display costs recorded across sessions (event store rollups)
+
+    Args:
+        by_tier: EventStore.rollup(group_by=("tier",)) output (all time)
+        by_agent: EventStore.rollup(group_by=("agent",), since=...) output
+        ui: TerminalUI instance
+    """
+    if ui is None:
+        ui = TerminalUI()
+
+    def latency(row):
+        return f"{row['avg_latency_ms'] / 1000:.2f}s" if row["avg_latency_ms"] is not None else "-"
+
+    if by_tier:
+        ui.header("All Sessions (by tier)", level=2)
+        rows = [[row["tier"] or "-", str(row["events"]), str(row["failures"]), latency(row), f"${row['cost']:.6f}"]
+                for row in by_tier]
+        print(ui.table(["Tier", "Events", "Failures", "Avg latency", "Cost"], rows))
+        print()
+
+    if by_agent:
+        ui.header("Last 24h (by agent)", level=2)
+        rows = [[row["agent"], str(row["events"]), str(row["failures"]), latency(row), f"${row['cost']:.6f}"]
+                for row in by_agent]
+        print(ui.table(["Agent", "Events", "Failures", "Avg latency", "Cost"], rows))
+        print()
+
+
+def show_prompt_cache_report(report: Dict[str, Dict[str, Any]], ui: Optional[TerminalUI] = None):
+    """
+    Display provider prefix-cache hit ratio per agent
+
+    Args:
+        report: PromptCacheStats.report() output
+        ui: TerminalUI instance
+    """
+    if ui is None:
+        ui = TerminalUI()
+
+    if not report:
+        return
+
+    ui.header("Prompt Cache (provider prefix)", level=2)
+
+    rows = []
+    for agent, usage in report.items():
+        rows.append([
+            agent,
+            str(usage["calls"]),
+            f"{usage['tokens_cached']:,}/{usage['tokens_input']:,}",
+            f"{usage['hit_ratio'] * 100:.1f}%",
+            f"${usage['cost_saved']:.6f}"
+        ])
+
+    print(ui.table(["Agent", "Calls", "Cached tokens", "Hit ratio", "Saved"], rows))
+    print()
+
+
 def show_help(ui: Optional[TerminalUI] = None):
     """Display help information"""
     if ui is None:
@@ -405,6 +545,9 @@ def show_help(ui: Optional[TerminalUI] = None):
         ("task <description>", "Execute a task with LLM and tools"),
         ("agents", "List all available agents"),
         ("costs", "Show cost breakdown"),
+        ("kb sync [--force]", "Re-index changed files in the project knowledge base"),
+        ("router train|eval|stats", "Retrain or evaluate the learned tier router"),
+        ("batch submit|run|status|results", "Queue bulk LLM requests through provider batch APIs"),
         ("history", "Show command history"),
         ("clear-history", "Clear conversation history (fix UTF-8 errors)"),
         ("clear", "Clear the screen"),
@@ -482,7 +625,7 @@ if __name__ == "__main__":
     ui = TerminalUI()
 
     # Startup screen
-    show_startup_screen(ui)
+    show_startup_screen(ui, animate=True)
 
     input("Press Enter to see agent status demo...")
     print()
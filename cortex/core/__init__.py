@@ -3,61 +3,62 @@ Cortex Core - Modules centraux du système
 
 Exports principaux:
 - LLMClient: Client unifié pour tous les LLMs
+- AsyncLLMClient: Appels LLM concurrents (pool, limites par provider)
 - ModelRouter: Routage intelligent par tier
 - AgentHierarchy: Système hiérarchique des agents
 - WorkflowEngine: Orchestrateur central
 - Self-Awareness: Système de conscience des capacités
+
+Les exports sont chargés au premier accès (PEP 562): importer un module
+de cortex.core (ex: config_loader) ne charge plus openai, chromadb et les
+agents, et n'entre plus en cycle avec cortex.departments.
 """
 
-# LLM & Models
-from cortex.core.llm_client import LLMClient, LLMResponse
-from cortex.core.model_router import ModelTier, ModelRouter
-
-# Agent System
-from cortex.core.agent_hierarchy import (
-    AgentRole,
-    BaseAgent,
-    ExecutionAgent,
-    AnalysisAgent,
-    DecisionAgent,
-    CoordinationAgent
-)
-
-# Workflow & Todo
-from cortex.core.workflow_engine import WorkflowEngine, WorkflowStep, WorkflowResult
-from cortex.core.todo_manager import TodoManager, TodoTask
-
-# Self-Awareness System (Phase 4.2)
-from cortex.core.capability_registry import CapabilityRegistry, Capability
-from cortex.core.environment_scanner import EnvironmentScanner, EnvironmentInfo
-from cortex.core.self_introspection_agent import SelfIntrospectionAgent
-
-__all__ = [
+import importlib
+
+_EXPORTS = {
     # LLM & Models
-    'LLMClient',
-    'LLMResponse',
-    'ModelTier',
-    'ModelRouter',
+    'LLMClient': 'cortex.core.llm_client',
+    'LLMResponse': 'cortex.core.llm_client',
+    'AsyncLLMClient': 'cortex.core.async_llm_client',
+    'SyncLLMClient': 'cortex.core.async_llm_client',
+    'ModelTier': 'cortex.core.model_router',
+    'ModelRouter': 'cortex.core.model_router',
 
     # Agent System
-    'AgentRole',
-    'BaseAgent',
-    'ExecutionAgent',
-    'AnalysisAgent',
-    'DecisionAgent',
-    'CoordinationAgent',
+    'AgentRole': 'cortex.core.agent_hierarchy',
+    'BaseAgent': 'cortex.core.agent_hierarchy',
+    'ExecutionAgent': 'cortex.core.agent_hierarchy',
+    'AnalysisAgent': 'cortex.core.agent_hierarchy',
+    'DecisionAgent': 'cortex.core.agent_hierarchy',
+    'CoordinationAgent': 'cortex.core.agent_hierarchy',
 
     # Workflow & Todo
-    'WorkflowEngine',
-    'WorkflowStep',
-    'WorkflowResult',
-    'TodoManager',
-    'TodoTask',
-
-    # Self-Awareness System
-    'CapabilityRegistry',
-    'Capability',
-    'EnvironmentScanner',
-    'EnvironmentInfo',
-    'SelfIntrospectionAgent',
-]
+    'WorkflowEngine': 'cortex.core.workflow_engine',
+    'WorkflowStep': 'cortex.core.workflow_engine',
+    'WorkflowResult': 'cortex.core.workflow_engine',
+    'TodoManager': 'cortex.core.todo_manager',
+    'TodoTask': 'cortex.core.todo_manager',
+
+    # Self-Awareness System (Phase 4.2)
+    'CapabilityRegistry': 'cortex.core.capability_registry',
+    'Capability': 'cortex.core.capability_registry',
+    'EnvironmentScanner': 'cortex.core.environment_scanner',
+    'EnvironmentInfo': 'cortex.core.environment_scanner',
+    'SelfIntrospectionAgent': 'cortex.core.self_introspection_agent',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'cortex.core' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
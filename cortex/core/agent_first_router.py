@@ -15,7 +15,7 @@ from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 
 from cortex.core.llm_client import LLMClient
-from cortex.core.model_router import ModelTier
+from cortex.core.model_router import ModelRouter, ModelTier
 from cortex.core.agent_hierarchy import (
     BaseAgent,
     AgentRole,
@@ -71,14 +71,23 @@ CLASSIFY (0-5):
 OUTPUT (JSON only, max 30 tokens):
 {{"complexity": 0-5, "reasoning": "1 sentence"}}"""
 
-    def __init__(self, llm_client: LLMClient):
+    # Tier prédit par le routeur appris → (complexité, rôle de départ)
+    LEARNED_TIER_MAPPING = {
+        "nano": (RequestComplexity.SIMPLE, AgentRole.AGENT),
+        "deepseek": (RequestComplexity.MODERATE, AgentRole.EXPERT),
+        "claude": (RequestComplexity.CRITICAL, AgentRole.DIRECTEUR)
+    }
+
+    def __init__(self, llm_client: LLMClient, model_router: Optional[ModelRouter] = None):
         """
         Initialize AgentFirst Router
 
         Args:
             llm_client: Client LLM pour classification
+            model_router: Routeur portant le classifieur appris (évite l'appel nano si confiant)
         """
         self.llm_client = llm_client
+        self.model_router = model_router or ModelRouter()
         self.agents: Dict[AgentRole, List[BaseAgent]] = {
             role: [] for role in AgentRole
         }
@@ -170,6 +179,18 @@ OUTPUT (JSON only, max 30 tokens):
         Returns:
             RoutingDecision avec niveau de départ
         """
+        # Routeur appris: pas d'appel LLM si la prédiction est assez sûre
+        learned = self.model_router.predict_learned_tier(request)
+        if learned:
+            tier, confidence = learned
+            complexity, start_role = self.LEARNED_TIER_MAPPING[tier.value]
+            return RoutingDecision(
+                complexity=complexity,
+                start_role=start_role,
+                confidence=confidence,
+                reasoning=f"Learned router: {tier.value} tier"
+            )
+
         prompt = self.CLASSIFICATION_PROMPT.format(request=request)
 
         try:
@@ -1,8 +1,9 @@
 """
 Agent Memory System - Système de mémoire interne pour agents
 
-Chaque agent a sa propre mémoire persistante dans:
-cortex/departments/{department}/agents/{agent_name}/memory.json
+Chaque agent a sa propre mémoire persistante, rangée par agent
+(département/nom) dans une base SQLite partagée:
+cortex/data/agent_memory.db (memory.agent_memory.db_path)
 
 La mémoire stocke:
 - Historique d'exécutions
@@ -12,88 +13,441 @@ La mémoire stocke:
 - État interne
 
 Ce système permet aux agents d'apprendre et d'évoluer.
+
+Stockage:
+- Ajouts en O(1): une ligne par exécution, métriques tenues en agrégats
+  (compteurs, sommes) mis à jour par incréments
+- Écriture différée: les opérations sont gardées en mémoire et écrites
+  par lots (taille du lot, délai max, arrêt du processus)
+- Plusieurs processus: chaque lot est une transaction BEGIN IMMEDIATE
+  (verrou d'écriture du fichier SQLite) et les métriques sont des
+  incréments, jamais des valeurs recalculées puis réécrites
+- Lectures en cache, invalidé quand la base change: PRAGMA data_version
+  pour les autres processus, compteur de génération par base pour ce
+  processus (data_version ne bouge pas pour les commits d'une connexion
+  du pool partagée par plusieurs instances)
+- L'ancien fichier cortex/departments/{department}/agents/{agent_name}/memory.json
+  est importé une fois
 """
 
+import atexit
 import json
+import threading
+import time
+import weakref
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from threading import Lock
 
+from .config_loader import get_config
+from .sqlite_pool import get_sqlite_pool
+
+
+HISTORY_LIMIT = 100  # Exécutions gardées par agent
+PATTERN_DATA_LIMIT = 50  # Occurrences détaillées gardées par pattern
+NOTES_LIMIT = 50
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS agent_metrics (
+        agent TEXT PRIMARY KEY,
+        total_executions INTEGER NOT NULL DEFAULT 0,
+        successful_executions INTEGER NOT NULL DEFAULT 0,
+        failed_executions INTEGER NOT NULL DEFAULT 0,
+        total_duration REAL NOT NULL DEFAULT 0,
+        total_cost REAL NOT NULL DEFAULT 0,
+        last_updated TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS agent_executions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        agent TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        request TEXT,
+        success INTEGER NOT NULL,
+        duration REAL NOT NULL,
+        cost REAL NOT NULL,
+        result_summary TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_agent_executions_agent ON agent_executions(agent, id)",
+    """
+    CREATE TABLE IF NOT EXISTS agent_patterns (
+        agent TEXT NOT NULL,
+        name TEXT NOT NULL,
+        first_detected TEXT NOT NULL,
+        last_detected TEXT NOT NULL,
+        occurrences INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (agent, name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS agent_pattern_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        agent TEXT NOT NULL,
+        name TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        data TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_agent_pattern_data ON agent_pattern_data(agent, name, id)",
+    """
+    CREATE TABLE IF NOT EXISTS agent_state (
+        agent TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT,
+        PRIMARY KEY (agent, key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS agent_notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        agent TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        note TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_agent_notes_agent ON agent_notes(agent, id)",
+]
+
+_init_lock = Lock()
+
+# Génération par base, incrémentée à chaque écriture de ce processus
+_generations: Dict[str, int] = {}
+
+# Instances partagées de get_agent_memory, par (base, agent)
+_instances: Dict[Tuple[str, str], "AgentMemory"] = {}
+
+# Mémoires vivantes du processus, vidées par le thread d'écriture et à l'arrêt
+_live: "weakref.WeakSet[AgentMemory]" = weakref.WeakSet()
+_flusher: Optional[threading.Thread] = None
+
+
+def _flush_all():
+    for memory in list(_live):
+        try:
+            memory.flush()
+        except Exception as e:
+            print(f"Error: Could not flush memory for {memory.agent_name}: {e}")
+
+
+def _flush_loop(interval: float):
+    while True:
+        time.sleep(interval)
+        for memory in list(_live):
+            if memory._due():
+                try:
+                    memory.flush()
+                except Exception as e:
+                    print(f"Error: Could not flush memory for {memory.agent_name}: {e}")
+
+
+atexit.register(_flush_all)
+
 
 class AgentMemory:
     """Système de mémoire persistante pour un agent"""
 
-    def __init__(self, department: str, agent_name: str):
+    def __init__(
+        self,
+        department: str,
+        agent_name: str,
+        db_path: Optional[str] = None,
+        flush_interval: Optional[float] = None,
+        flush_batch_size: Optional[int] = None
+    ):
         """
         Initialize agent memory
 
         Args:
             department: Nom du département (intelligence, maintenance, etc.)
             agent_name: Nom de l'agent (git_watcher, maintenance, etc.)
+            db_path: Base SQLite (défaut: memory.agent_memory.db_path)
+            flush_interval: Délai max (s) avant écriture des opérations en attente
+            flush_batch_size: Opérations en attente déclenchant une écriture (1 = immédiate)
         """
+        config = get_config()
         self.department = department
         self.agent_name = agent_name
-        self.memory_path = Path(
+        self.agent = f"{department}/{agent_name}"
+        self.memory_path = Path(  # Ancien stockage JSON (importé une fois)
             f'cortex/departments/{department}/agents/{agent_name}/memory.json'
         )
+        if db_path is None:
+            db_path = config.get("memory.agent_memory.db_path", "cortex/data/agent_memory.db")
+        self.db = get_sqlite_pool(db_path)
+        self.flush_interval = flush_interval if flush_interval is not None else \
+            config.get("memory.agent_memory.flush_interval_seconds", 2.0)
+        self.flush_batch_size = flush_batch_size if flush_batch_size is not None else \
+            config.get("memory.agent_memory.flush_batch_size", 50)
         self._lock = Lock()
 
-        # Ensure memory file exists
-        if not self.memory_path.exists():
-            self._initialize_memory()
+        self._pending: List[Tuple[str, tuple]] = []
+        self._pending_since = 0.0
+        self._cache: Dict[str, Any] = {}
+        self._cache_version: Optional[Tuple[int, int, int]] = None
+        self._db_key = str(self.db.db_path.resolve())
+
+        self._init_schema()
+        self._ensure_agent()
+
+        _live.add(self)
+        self._start_flusher()
+
+    def _init_schema(self):
+        # Schéma idempotent exécuté à chaque instance: une base supprimée ou
+        # remplacée dans le processus est rouverte, recréée, et les caches
+        # des autres instances invalidés
+        replaced = self.db.reopen_if_replaced()
+        with self.db.transaction() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+        if replaced:
+            self._written()
+
+    def _written(self):
+        """Invalide les caches de toutes les instances du processus sur cette base"""
+        with _init_lock:
+            _generations[self._db_key] = _generations.get(self._db_key, 0) + 1
+        self._cache.clear()
+
+    def _ensure_agent(self):
+        """Crée la ligne de métriques de l'agent; importe l'ancien memory.json la première fois"""
+        with self.db.transaction() as conn:
+            created = conn.execute(
+                "INSERT OR IGNORE INTO agent_metrics (agent, last_updated) VALUES (?, ?)",
+                (self.agent, datetime.now().isoformat())
+            ).rowcount
+            if created and self.memory_path.exists():
+                try:
+                    with open(self.memory_path, 'r') as f:
+                        self._write_memory(conn, json.load(f))
+                except Exception as e:
+                    print(f"Warning: Could not migrate memory for {self.agent_name}: {e}")
+        if created:
+            self._written()
+
+    def _start_flusher(self):
+        global _flusher
+        with _init_lock:
+            if _flusher is None or not _flusher.is_alive():
+                _flusher = threading.Thread(
+                    target=_flush_loop, args=(max(0.05, self.flush_interval / 2),),
+                    daemon=True, name="agent-memory-flush"
+                )
+                _flusher.start()
+
+    # ------------------------------------------------------------ Écriture différée
+
+    def _queue(self, op: str, *args):
+        with self._lock:
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.append((op, args))
+            flush_now = len(self._pending) >= self.flush_batch_size
+        if flush_now:
+            self.flush()
+
+    def _due(self) -> bool:
+        """Des opérations attendent depuis plus de flush_interval"""
+        return bool(self._pending) and time.monotonic() - self._pending_since >= self.flush_interval
+
+    def flush(self) -> bool:
+        """
+        Écrit les opérations en attente en une transaction
 
-    def _initialize_memory(self):
-        """Initialise le fichier mémoire avec le schéma de base"""
-        memory_data = {
-            "version": "1.0.0",
-            "last_updated": datetime.now().isoformat(),
-            "execution_history": [],
-            "learned_patterns": {},
-            "performance_metrics": {
-                "total_executions": 0,
-                "successful_executions": 0,
-                "failed_executions": 0,
-                "avg_execution_time": 0.0,
-                "total_cost": 0.0
-            },
-            "state": {},
-            "notes": []
-        }
+        Une erreur SQLite (base verrouillée, en lecture seule...) n'interrompt
+        pas l'agent: elle est signalée et le lot est réessayé au prochain flush.
 
-        self.memory_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.memory_path, 'w') as f:
-            json.dump(memory_data, f, indent=2)
+        Returns:
+            True si plus rien n'attend d'être écrit
+        """
+        with self._lock:
+            if not self._pending:
+                return True
+            pending, self._pending = self._pending, []
+            try:
+                with self.db.transaction() as conn:
+                    self._apply(conn, pending)
+            except Exception as e:
+                self._pending = pending + self._pending  # Réessayé au prochain flush
+                print(f"Error: Could not save memory for {self.agent_name}: {e}")
+                return False
+            self._written()
+            return True
+
+    def _apply(self, conn, pending: List[Tuple[str, tuple]]):
+        agent = self.agent
+        executions = [args for op, args in pending if op == "execution"]
+        if executions:
+            conn.executemany(
+                "INSERT INTO agent_executions (agent, timestamp, request, success, duration, cost, result_summary) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(agent,) + args for args in executions]
+            )
+            successes = sum(1 for args in executions if args[2])
+            conn.execute(
+                """
+                UPDATE agent_metrics SET
+                    total_executions = total_executions + ?,
+                    successful_executions = successful_executions + ?,
+                    failed_executions = failed_executions + ?,
+                    total_duration = total_duration + ?,
+                    total_cost = total_cost + ?
+                WHERE agent = ?
+                """,
+                (len(executions), successes, len(executions) - successes,
+                 sum(args[3] for args in executions), sum(args[4] for args in executions), agent)
+            )
+            self._trim(conn, "agent_executions", "agent = ?", (agent,), HISTORY_LIMIT)
+
+        patterns = set()
+        for op, args in pending:
+            if op == "pattern":
+                name, timestamp, data = args
+                conn.execute(
+                    """
+                    INSERT INTO agent_patterns (agent, name, first_detected, last_detected, occurrences)
+                    VALUES (?, ?, ?, ?, 1)
+                    ON CONFLICT(agent, name) DO UPDATE SET
+                        occurrences = occurrences + 1, last_detected = excluded.last_detected
+                    """,
+                    (agent, name, timestamp, timestamp)
+                )
+                conn.execute(
+                    "INSERT INTO agent_pattern_data (agent, name, timestamp, data) VALUES (?, ?, ?, ?)",
+                    (agent, name, timestamp, data)
+                )
+                patterns.add(name)
+            elif op == "state":
+                conn.executemany(
+                    "INSERT OR REPLACE INTO agent_state (agent, key, value) VALUES (?, ?, ?)",
+                    [(agent, key, value) for key, value in args[0]]
+                )
+            elif op == "note":
+                conn.execute("INSERT INTO agent_notes (agent, timestamp, note) VALUES (?, ?, ?)", (agent,) + args)
+
+        for name in patterns:
+            self._trim(conn, "agent_pattern_data", "agent = ? AND name = ?", (agent, name), PATTERN_DATA_LIMIT)
+        if any(op == "note" for op, _ in pending):
+            self._trim(conn, "agent_notes", "agent = ?", (agent,), NOTES_LIMIT)
+
+        conn.execute("UPDATE agent_metrics SET last_updated = ? WHERE agent = ?", (datetime.now().isoformat(), agent))
+
+    @staticmethod
+    def _trim(conn, table: str, where: str, params: tuple, keep: int):
+        """Supprime les lignes plus anciennes que les `keep` dernières (index (agent, id))"""
+        conn.execute(
+            f"DELETE FROM {table} WHERE {where} AND id < "
+            f"(SELECT id FROM {table} WHERE {where} ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            params + params + (keep - 1,)
+        )
+
+    # ------------------------------------------------------------ Lectures (cache)
+
+    def _cached(self, key: str, loader):
+        """Lecture mise en cache jusqu'à la prochaine écriture (de ce processus ou d'un autre)"""
+        self.flush()
+        conn = self.db.connection()
+        version = (id(conn), conn.execute("PRAGMA data_version").fetchone()[0], _generations.get(self._db_key, 0))
+        with self._lock:
+            if version != self._cache_version:
+                self._cache.clear()
+                self._cache_version = version
+            if key not in self._cache:
+                self._cache[key] = loader()
+            return self._cache[key]
 
     def load(self) -> Dict[str, Any]:
         """
-        Charge la mémoire depuis le fichier
+        Charge toute la mémoire (format historique de memory.json)
 
         Returns:
             Dict contenant toute la mémoire de l'agent
         """
-        with self._lock:
-            try:
-                with open(self.memory_path, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Warning: Could not load memory for {self.agent_name}: {e}")
-                return self._get_empty_memory()
+        try:
+            memory = self._get_empty_memory()
+            memory['last_updated'] = self._metrics_row()['last_updated']
+            memory['execution_history'] = self.get_recent_executions(HISTORY_LIMIT)
+            memory['learned_patterns'] = self.get_patterns()
+            memory['performance_metrics'] = self.get_metrics()
+            memory['state'] = self.get_state()
+            memory['notes'] = self.db.fetch_dicts(
+                "SELECT timestamp, note FROM agent_notes WHERE agent = ? ORDER BY id", (self.agent,)
+            )
+            return memory
+        except Exception as e:
+            print(f"Warning: Could not load memory for {self.agent_name}: {e}")
+            return self._get_empty_memory()
 
     def save(self, memory_data: Dict[str, Any]):
         """
-        Sauvegarde la mémoire dans le fichier
+        Remplace toute la mémoire de l'agent
 
         Args:
-            memory_data: Données de mémoire à sauvegarder
+            memory_data: Données de mémoire (format historique de memory.json)
         """
-        with self._lock:
-            try:
-                memory_data['last_updated'] = datetime.now().isoformat()
-                with open(self.memory_path, 'w') as f:
-                    json.dump(memory_data, f, indent=2)
-            except Exception as e:
-                print(f"Error: Could not save memory for {self.agent_name}: {e}")
+        self.flush()
+        try:
+            with self.db.transaction() as conn:
+                self._delete_agent(conn)
+                conn.execute("INSERT INTO agent_metrics (agent) VALUES (?)", (self.agent,))
+                self._write_memory(conn, memory_data)
+        except Exception as e:
+            print(f"Error: Could not save memory for {self.agent_name}: {e}")
+        self._written()
+
+    def _write_memory(self, conn, memory_data: Dict[str, Any]):
+        """Écrit un dict au format memory.json (ligne de métriques déjà créée)"""
+        agent = self.agent
+        metrics = memory_data.get('performance_metrics', {})
+        total = metrics.get('total_executions', 0)
+        conn.execute(
+            """
+            UPDATE agent_metrics SET total_executions = ?, successful_executions = ?, failed_executions = ?,
+                total_duration = ?, total_cost = ?, last_updated = ?
+            WHERE agent = ?
+            """,
+            (total, metrics.get('successful_executions', 0), metrics.get('failed_executions', 0),
+             metrics.get('avg_execution_time', 0.0) * total, metrics.get('total_cost', 0.0),
+             memory_data.get('last_updated') or datetime.now().isoformat(), agent)
+        )
+        conn.executemany(
+            "INSERT INTO agent_executions (agent, timestamp, request, success, duration, cost, result_summary) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(agent, e.get('timestamp', ''), e.get('request', ''), int(bool(e.get('success'))),
+              e.get('duration', 0.0), e.get('cost', 0.0), e.get('result_summary', ''))
+             for e in memory_data.get('execution_history', [])[-HISTORY_LIMIT:]]
+        )
+        for name, pattern in memory_data.get('learned_patterns', {}).items():
+            conn.execute(
+                "INSERT INTO agent_patterns (agent, name, first_detected, last_detected, occurrences) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (agent, name, pattern.get('first_detected', ''),
+                 pattern.get('last_detected') or pattern.get('first_detected', ''), pattern.get('occurrences', 0))
+            )
+            conn.executemany(
+                "INSERT INTO agent_pattern_data (agent, name, timestamp, data) VALUES (?, ?, ?, ?)",
+                [(agent, name, d.get('timestamp', ''), json.dumps(d.get('data')))
+                 for d in pattern.get('data', [])[-PATTERN_DATA_LIMIT:]]
+            )
+        conn.executemany(
+            "INSERT INTO agent_state (agent, key, value) VALUES (?, ?, ?)",
+            [(agent, key, json.dumps(value)) for key, value in memory_data.get('state', {}).items()]
+        )
+        conn.executemany(
+            "INSERT INTO agent_notes (agent, timestamp, note) VALUES (?, ?, ?)",
+            [(agent, n.get('timestamp', ''), n.get('note', '')) for n in memory_data.get('notes', [])[-NOTES_LIMIT:]]
+        )
+
+    def _delete_agent(self, conn, tables: Tuple[str, ...] = (
+            "agent_metrics", "agent_executions", "agent_patterns", "agent_pattern_data", "agent_state", "agent_notes")):
+        for table in tables:
+            conn.execute(f"DELETE FROM {table} WHERE agent = ?", (self.agent,))
+
+    # ------------------------------------------------------------ API
 
     def record_execution(
         self,
@@ -111,40 +465,15 @@ class AgentMemory:
             duration: Durée en secondes
             cost: Coût LLM si applicable
         """
-        memory = self.load()
-
-        execution_record = {
-            'timestamp': datetime.now().isoformat(),
-            'request': request[:200],  # Limiter la taille
-            'success': result.get('success', False),
-            'duration': duration,
-            'cost': cost,
-            'result_summary': str(result)[:500]
-        }
-
-        memory['execution_history'].append(execution_record)
-
-        # Limiter l'historique à 100 dernières exécutions
-        if len(memory['execution_history']) > 100:
-            memory['execution_history'] = memory['execution_history'][-100:]
-
-        # Mettre à jour métriques
-        metrics = memory['performance_metrics']
-        metrics['total_executions'] += 1
-
-        if result.get('success', False):
-            metrics['successful_executions'] += 1
-        else:
-            metrics['failed_executions'] += 1
-
-        # Moyenne mobile de la durée
-        n = metrics['total_executions']
-        old_avg = metrics['avg_execution_time']
-        metrics['avg_execution_time'] = (old_avg * (n - 1) + duration) / n
-
-        metrics['total_cost'] += cost
-
-        self.save(memory)
+        self._queue(
+            "execution",
+            datetime.now().isoformat(),
+            request[:200],  # Limiter la taille
+            int(bool(result.get('success', False))),
+            duration,
+            cost,
+            str(result)[:500]
+        )
 
     def add_pattern(self, pattern_name: str, pattern_data: Dict[str, Any]):
         """
@@ -154,28 +483,7 @@ class AgentMemory:
             pattern_name: Nom du pattern (ex: "frequent_error_type")
             pattern_data: Données du pattern détecté
         """
-        memory = self.load()
-
-        if pattern_name not in memory['learned_patterns']:
-            memory['learned_patterns'][pattern_name] = {
-                'first_detected': datetime.now().isoformat(),
-                'occurrences': 0,
-                'data': []
-            }
-
-        pattern = memory['learned_patterns'][pattern_name]
-        pattern['occurrences'] += 1
-        pattern['last_detected'] = datetime.now().isoformat()
-        pattern['data'].append({
-            'timestamp': datetime.now().isoformat(),
-            'data': pattern_data
-        })
-
-        # Limiter les données à 50 occurrences
-        if len(pattern['data']) > 50:
-            pattern['data'] = pattern['data'][-50:]
-
-        self.save(memory)
+        self._queue("pattern", pattern_name, datetime.now().isoformat(), json.dumps(pattern_data, default=str))
 
     def get_pattern(self, pattern_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -187,8 +495,7 @@ class AgentMemory:
         Returns:
             Données du pattern ou None
         """
-        memory = self.load()
-        return memory['learned_patterns'].get(pattern_name)
+        return self.get_patterns().get(pattern_name)
 
     def get_patterns(self) -> Dict[str, Any]:
         """
@@ -197,8 +504,22 @@ class AgentMemory:
         Returns:
             Dict de tous les patterns
         """
-        memory = self.load()
-        return memory['learned_patterns']
+        def load_patterns():
+            patterns = {}
+            for name, first, last, occurrences in self.db.fetchall(
+                "SELECT name, first_detected, last_detected, occurrences FROM agent_patterns WHERE agent = ?",
+                (self.agent,)
+            ):
+                patterns[name] = {'first_detected': first, 'occurrences': occurrences, 'data': [],
+                                  'last_detected': last}
+            for name, timestamp, data in self.db.fetchall(
+                "SELECT name, timestamp, data FROM agent_pattern_data WHERE agent = ? ORDER BY id", (self.agent,)
+            ):
+                if name in patterns:
+                    patterns[name]['data'].append({'timestamp': timestamp, 'data': json.loads(data)})
+            return patterns
+
+        return self._cached("patterns", load_patterns)
 
     def update_state(self, state_updates: Dict[str, Any]):
         """
@@ -207,9 +528,7 @@ class AgentMemory:
         Args:
             state_updates: Dict de clés/valeurs à mettre à jour
         """
-        memory = self.load()
-        memory['state'].update(state_updates)
-        self.save(memory)
+        self._queue("state", [(key, json.dumps(value, default=str)) for key, value in state_updates.items()])
 
     def get_state(self, key: Optional[str] = None) -> Any:
         """
@@ -221,10 +540,14 @@ class AgentMemory:
         Returns:
             Valeur de l'état ou tout l'état
         """
-        memory = self.load()
+        state = self._cached("state", lambda: {
+            k: json.loads(v) for k, v in self.db.fetchall(
+                "SELECT key, value FROM agent_state WHERE agent = ?", (self.agent,)
+            )
+        })
         if key:
-            return memory['state'].get(key)
-        return memory['state']
+            return state.get(key)
+        return state
 
     def add_note(self, note: str):
         """
@@ -233,17 +556,7 @@ class AgentMemory:
         Args:
             note: Note textuelle
         """
-        memory = self.load()
-        memory['notes'].append({
-            'timestamp': datetime.now().isoformat(),
-            'note': note
-        })
-
-        # Limiter à 50 notes
-        if len(memory['notes']) > 50:
-            memory['notes'] = memory['notes'][-50:]
-
-        self.save(memory)
+        self._queue("note", datetime.now().isoformat(), note)
 
     def get_recent_executions(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -255,8 +568,26 @@ class AgentMemory:
         Returns:
             Liste des exécutions récentes
         """
-        memory = self.load()
-        return memory['execution_history'][-limit:]
+        def load_recent():
+            rows = self.db.fetch_dicts(
+                "SELECT timestamp, request, success, duration, cost, result_summary FROM agent_executions "
+                "WHERE agent = ? ORDER BY id DESC LIMIT ?", (self.agent, HISTORY_LIMIT)
+            )
+            for row in rows:
+                row['success'] = bool(row['success'])
+            return rows[::-1]
+
+        executions = self._cached("executions", load_recent)
+        return executions[-limit:] if limit > 0 else []
+
+    def _metrics_row(self) -> Dict[str, Any]:
+        def load_metrics():
+            rows = self.db.fetch_dicts("SELECT * FROM agent_metrics WHERE agent = ?", (self.agent,))
+            return rows[0] if rows else {'total_executions': 0, 'successful_executions': 0,
+                                         'failed_executions': 0, 'total_duration': 0.0,
+                                         'total_cost': 0.0, 'last_updated': None}
+
+        return self._cached("metrics", load_metrics)
 
     def get_metrics(self) -> Dict[str, Any]:
         """
@@ -265,23 +596,39 @@ class AgentMemory:
         Returns:
             Dict des métriques
         """
-        memory = self.load()
-        return memory['performance_metrics']
+        row = self._metrics_row()
+        total = row['total_executions']
+        return {
+            "total_executions": total,
+            "successful_executions": row['successful_executions'],
+            "failed_executions": row['failed_executions'],
+            "avg_execution_time": row['total_duration'] / total if total else 0.0,
+            "total_cost": row['total_cost']
+        }
 
     def clear_history(self):
         """Efface l'historique d'exécutions (garde patterns et état)"""
-        memory = self.load()
-        memory['execution_history'] = []
-        self.save(memory)
+        self.flush()
+        with self.db.transaction() as conn:
+            self._delete_agent(conn, ("agent_executions",))
+        self._written()
 
     def reset(self):
         """Reset complet de la mémoire"""
-        self._initialize_memory()
+        with self._lock:
+            self._pending = []
+        with self.db.transaction() as conn:
+            self._delete_agent(conn)
+            conn.execute(
+                "INSERT INTO agent_metrics (agent, last_updated) VALUES (?, ?)",
+                (self.agent, datetime.now().isoformat())
+            )
+        self._written()
 
     def _get_empty_memory(self) -> Dict[str, Any]:
         """Retourne une mémoire vide"""
         return {
-            "version": "1.0.0",
+            "version": "2.0.0",
             "last_updated": None,
             "execution_history": [],
             "learned_patterns": {},
@@ -305,6 +652,9 @@ def get_agent_memory(department: str, agent_name: str) -> AgentMemory:
     """
     Factory function pour récupérer la mémoire d'un agent
 
+    Une seule instance par agent et par base dans le processus: les agents
+    qui partagent une mémoire partagent aussi ses écritures en attente.
+
     Args:
         department: Nom du département
         agent_name: Nom de l'agent
@@ -312,7 +662,15 @@ def get_agent_memory(department: str, agent_name: str) -> AgentMemory:
     Returns:
         Instance AgentMemory
     """
-    return AgentMemory(department, agent_name)
+    db_path = get_config().get("memory.agent_memory.db_path", "cortex/data/agent_memory.db")
+    key = (str(Path(db_path).resolve()), f"{department}/{agent_name}")
+    with _init_lock:
+        memory = _instances.get(key)
+    if memory is None:
+        memory = AgentMemory(department, agent_name, db_path=db_path)
+        with _init_lock:
+            memory = _instances.setdefault(key, memory)
+    return memory
 
 
 # Test
@@ -0,0 +1,579 @@
+"""
+Async LLM Client - Appels LLM concurrents avec pool de connexions
+
+LLMClient.complete() est bloquant: un workflow qui enchaîne des agents
+sérialise tous ses appels. AsyncLLMClient s'appuie sur les SDK async
+(AsyncOpenAI, AsyncAnthropic) avec, par provider:
+- Un pool de connexions HTTP partagé (keep-alive, taille bornée)
+- Un sémaphore de concurrence dimensionné depuis models.yaml (max_concurrency)
+- Un rate limiting par seaux à jetons (rpm, tpm)
+- Des retries exponentiels avec jitter qui respectent Retry-After
+
+SyncLLMClient est une façade synchrone (même interface que LLMClient)
+qui exécute ces appels sur une boucle d'événements dédiée: les agents
+existants n'ont rien à changer.
+
+Usage:
+    client = AsyncLLMClient()
+    responses = await client.complete_many([
+        {"messages": [...], "tier": ModelTier.NANO},
+        {"messages": [...], "tier": ModelTier.DEEPSEEK},
+    ])
+"""
+
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, asdict
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, List
+
+import httpx
+
+# Imports conditionnels
+try:
+    import openai
+    from openai import AsyncOpenAI
+except ImportError:
+    openai = None
+    AsyncOpenAI = None
+
+try:
+    import anthropic
+    from anthropic import AsyncAnthropic
+except ImportError:
+    anthropic = None
+    AsyncAnthropic = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+from .llm_client import LLMClient, LLMResponse
+from .model_router import ModelTier
+
+
+# Statuts HTTP transitoires (529 = Anthropic overloaded)
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+_CONNECTION_ERRORS = tuple(
+    cls for cls in (
+        getattr(openai, "APIConnectionError", None),
+        getattr(anthropic, "APIConnectionError", None),
+        httpx.TransportError,
+        asyncio.TimeoutError
+    )
+    if cls is not None
+)
+
+# Tier → (clé models.yaml, libellé d'erreur)
+_TIER_PROVIDERS = {
+    ModelTier.NANO: ("nano", "OpenAI"),
+    ModelTier.DEEPSEEK: ("deepseek", "DeepSeek"),
+    ModelTier.CLAUDE: ("claude", "Anthropic"),
+}
+
+
+class TokenBucket:
+    """
+    Seau à jetons async: capacité = débit par minute, recharge continue
+
+    Les appelants sont servis dans l'ordre d'arrivée (verrou tenu pendant
+    l'attente). consume() permet un débit a posteriori qui peut rendre
+    le solde négatif: les appels suivants attendent alors la dette.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.refill_per_second = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """
+        Attend que `amount` jetons soient disponibles puis les retire
+
+        Returns:
+            Temps d'attente en secondes
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+
+                delay = (amount - self.tokens) / self.refill_per_second
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def consume(self, amount: float):
+        """Débite (ou recrédite si négatif) sans attendre"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class RateLimiter:
+    """Limites RPM et TPM d'un provider (0 = illimité)"""
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    async def acquire(self, estimated_tokens: int) -> float:
+        """Réserve une requête et une estimation de ses tokens d'entrée"""
+        waited = 0.0
+        if self.requests:
+            waited += await self.requests.acquire(1)
+        if self.tokens:
+            waited += await self.tokens.acquire(estimated_tokens)
+        return waited
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """Ajuste le seau TPM avec la consommation réelle (entrée + sortie)"""
+        if self.tokens:
+            self.tokens.consume(actual_tokens - estimated_tokens)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Extrait le délai Retry-After (secondes, date HTTP ou retry-after-ms)"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Erreur transitoire (rate limit, surcharge, réseau)?"""
+    if isinstance(error, _CONNECTION_ERRORS):
+        return True
+    return getattr(error, "status_code", None) in _RETRYABLE_STATUS
+
+
+def retry_delay(
+    attempt: int,
+    base: float,
+    cap: float,
+    retry_after: Optional[float] = None
+) -> float:
+    """
+    Délai avant la tentative suivante
+
+    Backoff exponentiel "full jitter" borné par `cap`. Si le serveur impose
+    Retry-After, c'est un minimum (plus un petit jitter pour ne pas relancer
+    toutes les requêtes en rafale au même instant).
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after + random.uniform(0, base))
+    return delay
+
+
+@dataclass
+class ProviderStats:
+    """Compteurs d'un provider"""
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    throttled_seconds: float = 0.0
+    latency_total: float = 0.0
+
+
+class _Provider:
+    """Client async + pool + limites d'un provider, liés à une boucle"""
+
+    def __init__(self, name: str, client, http_client: httpx.AsyncClient, max_concurrency: int, rpm: int, tpm: int):
+        self.name = name
+        self.client = client
+        self.http_client = http_client
+        self.loop = asyncio.get_running_loop()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.limiter = RateLimiter(rpm, tpm)
+        self.paused_until = 0.0  # Retry-After appliqué à tout le provider
+        self.stats = ProviderStats()
+
+
+class AsyncLLMClient:
+    """
+    Client LLM async avec concurrence bornée par provider
+
+    Partage la configuration, le cache et la conversion des messages de
+    LLMClient. Les clients HTTP sont créés paresseusement dans la boucle
+    d'événements courante (une instance peut servir plusieurs asyncio.run
+    successifs: les pools sont recréés si la boucle change).
+    """
+
+    def __init__(
+        self,
+        llm_client: Optional[LLMClient] = None,
+        use_cache: bool = True,
+        limits: Optional[Dict[str, Dict[str, int]]] = None
+    ):
+        """
+        Args:
+            llm_client: LLMClient dont réutiliser clés, config et cache
+            use_cache: Activer le cache (si llm_client n'est pas fourni)
+            limits: Surcharge par tier de max_concurrency / rpm / tpm
+        """
+        self.base = llm_client or LLMClient(use_cache=use_cache)
+        self.config = self.base.config
+        self.models_config = self.base.models_config
+        self.cache = self.base.cache
+        self.limits = limits or {}
+
+        self.max_retries = self.config.get("optimization.async_llm.max_retries", 5)
+        self.retry_base = self.config.get("optimization.async_llm.retry_base_seconds", 0.5)
+        self.retry_max = self.config.get("optimization.async_llm.retry_max_seconds", 30)
+        self.request_timeout = self.config.get("optimization.async_llm.request_timeout", 600)
+        self.keepalive = self.config.get("optimization.async_llm.keepalive_connections", 20)
+
+        self._providers: Dict[str, _Provider] = {}
+
+    def _provider_limits(self, tier_key: str) -> Dict[str, int]:
+        """Limites du provider: models.yaml puis surcharges"""
+        model_config = self.models_config.get(tier_key, {})
+        limits = {
+            "max_concurrency": model_config.get("max_concurrency", 16),
+            "rpm": model_config.get("rpm", 0),
+            "tpm": model_config.get("tpm", 0),
+        }
+        limits.update(self.limits.get(tier_key, {}))
+        return limits
+
+    def _provider(self, tier: ModelTier) -> _Provider:
+        """Provider du tier pour la boucle courante (création paresseuse)"""
+        tier_key, label = _TIER_PROVIDERS[tier]
+        provider = self._providers.get(tier_key)
+        if provider is not None and provider.loop is asyncio.get_running_loop():
+            return provider
+
+        # Clés et URL reprises des clients synchrones
+        sync_client = {
+            ModelTier.NANO: self.base.openai_client,
+            ModelTier.DEEPSEEK: self.base.deepseek_client,
+            ModelTier.CLAUDE: self.base.anthropic_client,
+        }[tier]
+        if sync_client is None:
+            raise RuntimeError(f"{label} client not initialized. Check API key.")
+
+        limits = self._provider_limits(tier_key)
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=limits["max_concurrency"],
+                max_keepalive_connections=min(self.keepalive, limits["max_concurrency"])
+            ),
+            timeout=httpx.Timeout(self.request_timeout, connect=10.0),
+            follow_redirects=True
+        )
+
+        # Les retries sont gérés ici (Retry-After + limites partagées)
+        if tier == ModelTier.CLAUDE:
+            if AsyncAnthropic is None:
+                raise RuntimeError("anthropic package not installed")
+            client = AsyncAnthropic(
+                api_key=sync_client.api_key,
+                base_url=str(sync_client.base_url),
+                http_client=http_client,
+                max_retries=0
+            )
+        else:
+            if AsyncOpenAI is None:
+                raise RuntimeError("openai package not installed")
+            client = AsyncOpenAI(
+                api_key=sync_client.api_key,
+                base_url=str(sync_client.base_url),
+                http_client=http_client,
+                max_retries=0
+            )
+
+        provider = _Provider(
+            label, client, http_client,
+            limits["max_concurrency"], limits["rpm"], limits["tpm"]
+        )
+        self._providers[tier_key] = provider
+        return provider
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        tier: ModelTier,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        tools: Optional[List] = None,
+        tool_choice: str = "auto",
+        **kwargs
+    ) -> LLMResponse:
+        """
+        Génère une complétion (équivalent async de LLMClient.complete)
+
+        Args:
+            messages: Liste de messages au format [{"role": "user", "content": "..."}]
+            tier: Tier du modèle (NANO, DEEPSEEK, CLAUDE)
+            max_tokens: Tokens maximum de sortie (si None, utilise models.yaml)
+            temperature: Température (0-1)
+            tools: Liste d'outils StandardTool disponibles pour le LLM
+            tool_choice: "auto", "none", ou nom spécifique d'outil
+            **kwargs: Paramètres additionnels
+
+        Returns:
+            LLMResponse avec le contenu et les métadonnées
+        """
+        if tier not in _TIER_PROVIDERS:
+            raise ValueError(f"Unknown model tier: {tier}")
+
+        messages = self.base._clean_messages(messages)
+        tier_key, _ = _TIER_PROVIDERS[tier]
+
+        if max_tokens is None:
+            max_tokens = self.models_config.get(tier_key, {}).get("max_tokens", 8192)
+
+        # Le cache touche le disque (et peut réécrire via NANO): hors de la boucle
+        if self.cache:
+            cache_result = await asyncio.to_thread(self.cache.get, messages, tier.value, max_tokens)
+            if cache_result.hit:
+                return LLMResponse(
+                    content=cache_result.content,
+                    model=f"{tier.value} (cached from {cache_result.level.value})",
+                    tokens_input=0,
+                    tokens_output=0,
+                    cost=cache_result.cost_spent,
+                    finish_reason="cached"
+                )
+
+        formatted_tools = None
+        if tools:
+            if tier == ModelTier.CLAUDE:
+                formatted_tools = [tool.to_anthropic_format() for tool in tools]
+            else:
+                formatted_tools = [tool.to_openai_format() for tool in tools]
+
+        # Des requêtes identiques simultanées (threads ou tâches) partagent un appel
+        flight_key = self.base._flight_key(messages, tier, max_tokens, temperature, formatted_tools, tool_choice, kwargs)
+        if flight_key is None:
+            return await self._complete_uncached(messages, tier, max_tokens, temperature, formatted_tools, tool_choice, **kwargs)
+
+        response, shared = await self.base.single_flight.do_async(
+            flight_key,
+            lambda: self._complete_uncached(messages, tier, max_tokens, temperature, formatted_tools, tool_choice, **kwargs)
+        )
+        return self.base._shared_response(response) if shared else response
+
+    async def _complete_uncached(
+        self,
+        messages: List[Dict[str, Any]],
+        tier: ModelTier,
+        max_tokens: int,
+        temperature: float,
+        formatted_tools: Optional[List[Dict]],
+        tool_choice: str,
+        **kwargs
+    ) -> LLMResponse:
+        """Appel provider puis écriture dans le cache (exécuté une fois par vol)"""
+        if tier == ModelTier.NANO:
+            # NANO model requires temperature=1.0
+            temperature = 1.0
+
+        response = await self._call(tier, messages, max_tokens, temperature, formatted_tools, tool_choice, **kwargs)
+
+        if response.finish_reason == "length":
+            print(f"⚠️  WARNING: Response truncated! Output reached max_tokens limit ({max_tokens})")
+
+        if self.cache and not response.tool_calls:
+            await asyncio.to_thread(
+                self.cache.set,
+                messages,
+                tier.value,
+                response.content,
+                response.tokens_input + response.tokens_output,
+                response.cost
+            )
+
+        return response
+
+    async def _call(
+        self,
+        tier: ModelTier,
+        messages: List[Dict[str, Any]],
+        max_tokens: int,
+        temperature: float,
+        tools: Optional[List[Dict]],
+        tool_choice: str,
+        **kwargs
+    ) -> LLMResponse:
+        """Appel provider: limites, sémaphore, retries"""
+        provider = self._provider(tier)
+        tier_key, label = _TIER_PROVIDERS[tier]
+
+        if tier == ModelTier.CLAUDE:
+            params = self.base._anthropic_params(messages, max_tokens, temperature, tools, tool_choice, **kwargs)
+            create = provider.client.messages.create
+        else:
+            default_model = "gpt-3.5-turbo" if tier == ModelTier.NANO else "deepseek-reasoner"
+            params = self.base._openai_params(
+                tier_key, default_model, messages, max_tokens, temperature, tools, tool_choice, **kwargs
+            )
+            create = provider.client.chat.completions.create
+
+        estimated_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+        stats = provider.stats
+
+        for attempt in range(self.max_retries + 1):
+            # Pause imposée par un Retry-After récent sur ce provider
+            pause = provider.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                stats.throttled_seconds += pause
+
+            stats.throttled_seconds += await provider.limiter.acquire(estimated_tokens)
+
+            async with provider.semaphore:
+                stats.requests += 1
+                stats.in_flight += 1
+                stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+                start = time.perf_counter()
+                try:
+                    raw = await create(**params)
+                except Exception as e:
+                    error = e
+                else:
+                    error = None
+                finally:
+                    stats.in_flight -= 1
+                    stats.latency_total += time.perf_counter() - start
+
+            if error is None:
+                if tier == ModelTier.CLAUDE:
+                    response = self.base._parse_anthropic_response(raw, params["model"])
+                else:
+                    response = self.base._parse_openai_response(raw, tier_key, params["model"])
+                provider.limiter.settle(estimated_tokens, response.tokens_input + response.tokens_output)
+                return response
+
+            if not is_retryable(error) or attempt == self.max_retries:
+                stats.errors += 1
+                raise RuntimeError(f"{label} API error: {error}") from error
+
+            # Hors du sémaphore: la place est libérée pendant l'attente
+            retry_after = retry_after_seconds(error)
+            if retry_after is not None:
+                provider.paused_until = max(provider.paused_until, time.monotonic() + retry_after)
+            stats.retries += 1
+            await asyncio.sleep(retry_delay(attempt, self.retry_base, self.retry_max, retry_after))
+
+    async def complete_many(
+        self,
+        requests: List[Dict[str, Any]],
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        Exécute plusieurs complétions en parallèle (ordre des résultats conservé)
+
+        Args:
+            requests: Liste de kwargs pour complete() (messages, tier, ...)
+            return_exceptions: Retourner les exceptions au lieu de lever la première
+
+        Returns:
+            Liste de LLMResponse (ou d'exceptions)
+        """
+        return await asyncio.gather(
+            *(self.complete(**request) for request in requests),
+            return_exceptions=return_exceptions
+        )
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Statistiques par provider (requêtes, retries, concurrence, latence)"""
+        stats = {}
+        for tier_key, provider in self._providers.items():
+            data = asdict(provider.stats)
+            data["latency_avg"] = data["latency_total"] / data["requests"] if data["requests"] else 0.0
+            stats[tier_key] = data
+        return stats
+
+    async def aclose(self):
+        """Ferme les pools de connexions"""
+        for provider in self._providers.values():
+            await provider.http_client.aclose()
+        self._providers.clear()
+
+
+class SyncLLMClient(LLMClient):
+    """
+    Façade synchrone d'AsyncLLMClient (remplace LLMClient sans autre changement)
+
+    Les appels complete() sont exécutés sur une boucle d'événements dédiée
+    (uvloop si disponible) dans un thread de fond: les pools de connexions
+    et les limites par provider sont partagés par tous les threads appelants.
+    """
+
+    def __init__(self, use_cache: bool = True, limits: Optional[Dict[str, Dict[str, int]]] = None):
+        super().__init__(use_cache=use_cache)
+
+        self._loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True, name="llm-async-loop")
+        self._thread.start()
+
+        self.async_client = AsyncLLMClient(self, limits=limits)
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        tier: ModelTier,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        tools: Optional[List] = None,
+        tool_choice: str = "auto",
+        verbose: bool = False,
+        **kwargs
+    ) -> LLMResponse:
+        """Même contrat que LLMClient.complete (verbose reste sur le chemin synchrone)"""
+        if verbose:
+            return super().complete(messages, tier, max_tokens, temperature, tools, tool_choice, verbose, **kwargs)
+
+        return self._run(self.async_client.complete(
+            messages, tier, max_tokens, temperature, tools, tool_choice, **kwargs
+        ))
+
+    def complete_many(self, requests: List[Dict[str, Any]], return_exceptions: bool = False) -> List[Any]:
+        """Complétions parallèles depuis du code synchrone"""
+        return self._run(self.async_client.complete_many(requests, return_exceptions))
+
+    def close(self):
+        """Ferme les pools et arrête la boucle de fond"""
+        self._run(self.async_client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
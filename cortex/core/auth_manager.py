@@ -10,18 +10,24 @@ Features:
 - Multi-user support with roles
 - Token-based authentication
 - No external services required
+- Shared WAL connections (sqlite_pool) and a short-TTL cache of verified tokens
 """
 
 import sqlite3
 import jwt
 import bcrypt
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
 from enum import Enum
 
+from cortex.core.sqlite_pool import get_sqlite_pool
+
 
 class UserRole(Enum):
     """User roles with different permissions"""
@@ -56,7 +62,9 @@ class AuthManager:
     def __init__(
         self,
         db_path: str = "cortex/data/auth.db",
-        jwt_secret: Optional[str] = None
+        jwt_secret: Optional[str] = None,
+        token_cache_ttl: float = 60.0,
+        token_cache_size: int = 1024
     ):
         """
         Initialize Auth Manager
@@ -64,14 +72,26 @@ class AuthManager:
         Args:
             db_path: Path to SQLite database
             jwt_secret: Secret key for JWT (auto-generated if None)
+            token_cache_ttl: Seconds a verified token is trusted without
+                             re-checking the user (0 disables the cache)
+            token_cache_size: Max cached tokens (LRU)
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = get_sqlite_pool(str(self.db_path))
 
         # JWT secret (persistent across sessions)
         self.jwt_secret_file = self.db_path.parent / ".jwt_secret"
         self.jwt_secret = self._load_or_generate_secret(jwt_secret)
 
+        # Verified tokens: token -> (result, expires_at monotonic)
+        self.token_cache_ttl = token_cache_ttl
+        self.token_cache_size = token_cache_size
+        self._token_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._token_cache_lock = threading.Lock()
+        self.token_cache_hits = 0
+        self.token_cache_misses = 0
+
         # Initialize database
         self._init_db()
 
@@ -99,7 +119,7 @@ class AuthManager:
 
     def _init_db(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
 
             # Users table
@@ -120,8 +140,6 @@ class AuthManager:
             if cursor.fetchone()[0] == 0:
                 self._create_default_admin(cursor)
 
-            conn.commit()
-
     def _create_default_admin(self, cursor):
         """Create default admin user (Cortex/cortex123)"""
         username = "Cortex"
@@ -163,13 +181,12 @@ class AuthManager:
         password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT INTO users (username, password_hash, role, created_at, is_active)
                     VALUES (?, ?, ?, ?, 1)
                 """, (username, password_hash, role.value, datetime.now().isoformat()))
-                conn.commit()
 
                 return {
                     'success': True,
@@ -199,106 +216,113 @@ class AuthManager:
         Returns:
             Dict with token and user info if successful
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, username, password_hash, role, created_at, is_active
-                FROM users
-                WHERE username = ?
-            """, (username,))
+        row = self.db.fetchone("""
+            SELECT id, username, password_hash, role, created_at, is_active
+            FROM users
+            WHERE username = ?
+        """, (username,))
 
-            row = cursor.fetchone()
-
-            if not row:
-                return {
-                    'success': False,
-                    'error': 'Invalid username or password'
-                }
+        if not row:
+            return {
+                'success': False,
+                'error': 'Invalid username or password'
+            }
 
-            user_id, username, password_hash, role, created_at, is_active = row
+        user_id, username, password_hash, role, created_at, is_active = row
 
-            if not is_active:
-                return {
-                    'success': False,
-                    'error': 'User account is disabled'
-                }
+        if not is_active:
+            return {
+                'success': False,
+                'error': 'User account is disabled'
+            }
 
-            # Verify password
-            if not bcrypt.checkpw(password.encode('utf-8'), password_hash):
-                return {
-                    'success': False,
-                    'error': 'Invalid username or password'
-                }
+        # Verify password
+        if not bcrypt.checkpw(password.encode('utf-8'), password_hash):
+            return {
+                'success': False,
+                'error': 'Invalid username or password'
+            }
 
-            # Update last login
-            cursor.execute("""
+        # Update last login
+        with self.db.transaction() as conn:
+            conn.execute("""
                 UPDATE users
                 SET last_login = ?
                 WHERE id = ?
             """, (datetime.now().isoformat(), user_id))
-            conn.commit()
-
-            # Generate JWT token (expires in 7 days)
-            token_payload = {
-                'user_id': user_id,
-                'username': username,
-                'role': role,
-                'exp': datetime.utcnow() + timedelta(days=7)
-            }
-            token = jwt.encode(token_payload, self.jwt_secret, algorithm='HS256')
-
-            user = User(
-                id=user_id,
-                username=username,
-                role=UserRole(role),
-                created_at=created_at,
-                last_login=datetime.now().isoformat()
-            )
 
-            return {
-                'success': True,
-                'token': token,
-                'user': user.to_dict(),
-                'expires_in': '7 days'
-            }
+        # Generate JWT token (expires in 7 days)
+        token_payload = {
+            'user_id': user_id,
+            'username': username,
+            'role': role,
+            'exp': datetime.utcnow() + timedelta(days=7)
+        }
+        token = jwt.encode(token_payload, self.jwt_secret, algorithm='HS256')
+
+        user = User(
+            id=user_id,
+            username=username,
+            role=UserRole(role),
+            created_at=created_at,
+            last_login=datetime.now().isoformat()
+        )
+
+        return {
+            'success': True,
+            'token': token,
+            'user': user.to_dict(),
+            'expires_in': '7 days'
+        }
 
     def verify_token(self, token: str) -> Dict[str, Any]:
         """
         Verify JWT token and return user info
 
+        Successful verifications are cached for token_cache_ttl seconds
+        (never past the token expiry): repeated calls skip the signature
+        check and the user lookup.
+
         Args:
             token: JWT token
 
         Returns:
             Dict with user info if valid
         """
+        if self.token_cache_ttl > 0:
+            with self._token_cache_lock:
+                cached = self._token_cache.get(token)
+                if cached is not None and cached[1] > time.monotonic():
+                    self._token_cache.move_to_end(token)
+                    self.token_cache_hits += 1
+                    return dict(cached[0])
+                self.token_cache_misses += 1
+
         try:
             payload = jwt.decode(token, self.jwt_secret, algorithms=['HS256'])
 
             # Check if user still exists and is active
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT id, username, role, is_active
-                    FROM users
-                    WHERE id = ?
-                """, (payload['user_id'],))
-
-                row = cursor.fetchone()
-
-                if not row or not row[3]:  # Not found or not active
-                    return {
-                        'success': False,
-                        'error': 'Invalid or expired token'
-                    }
+            row = self.db.fetchone("""
+                SELECT id, username, role, is_active
+                FROM users
+                WHERE id = ?
+            """, (payload['user_id'],))
 
+            if not row or not row[3]:  # Not found or not active
                 return {
-                    'success': True,
-                    'user_id': row[0],
-                    'username': row[1],
-                    'role': row[2]
+                    'success': False,
+                    'error': 'Invalid or expired token'
                 }
 
+            result = {
+                'success': True,
+                'user_id': row[0],
+                'username': row[1],
+                'role': row[2]
+            }
+            self._cache_token(token, result, payload.get('exp'))
+            return result
+
         except jwt.ExpiredSignatureError:
             return {
                 'success': False,
@@ -310,51 +334,66 @@ class AuthManager:
                 'error': 'Invalid token'
             }
 
-    def get_user(self, user_id: int) -> Optional[User]:
-        """Get user by ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, username, role, created_at, last_login
-                FROM users
-                WHERE id = ? AND is_active = 1
-            """, (user_id,))
+    def _cache_token(self, token: str, result: Dict[str, Any], exp: Optional[float]):
+        """Remember a successful verification"""
+        if self.token_cache_ttl <= 0:
+            return
 
-            row = cursor.fetchone()
+        ttl = self.token_cache_ttl
+        if exp is not None:
+            ttl = min(ttl, float(exp) - time.time())
+        if ttl <= 0:
+            return
 
-            if not row:
-                return None
+        with self._token_cache_lock:
+            self._token_cache[token] = (dict(result), time.monotonic() + ttl)
+            self._token_cache.move_to_end(token)
+            while len(self._token_cache) > self.token_cache_size:
+                self._token_cache.popitem(last=False)
 
-            return User(
+    def invalidate_token_cache(self):
+        """Forget cached verifications (user disabled, role or password changed)"""
+        with self._token_cache_lock:
+            self._token_cache.clear()
+
+    def get_user(self, user_id: int) -> Optional[User]:
+        """Get user by ID"""
+        row = self.db.fetchone("""
+            SELECT id, username, role, created_at, last_login
+            FROM users
+            WHERE id = ? AND is_active = 1
+        """, (user_id,))
+
+        if not row:
+            return None
+
+        return User(
+            id=row[0],
+            username=row[1],
+            role=UserRole(row[2]),
+            created_at=row[3],
+            last_login=row[4]
+        )
+
+    def list_users(self) -> list:
+        """List all active users"""
+        rows = self.db.fetchall("""
+            SELECT id, username, role, created_at, last_login
+            FROM users
+            WHERE is_active = 1
+            ORDER BY created_at DESC
+        """)
+
+        return [
+            User(
                 id=row[0],
                 username=row[1],
                 role=UserRole(row[2]),
                 created_at=row[3],
                 last_login=row[4]
             )
-
-    def list_users(self) -> list:
-        """List all active users"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, username, role, created_at, last_login
-                FROM users
-                WHERE is_active = 1
-                ORDER BY created_at DESC
-            """)
-
-            users = []
-            for row in cursor.fetchall():
-                users.append(User(
-                    id=row[0],
-                    username=row[1],
-                    role=UserRole(row[2]),
-                    created_at=row[3],
-                    last_login=row[4]
-                ))
-
-            return users
+            for row in rows
+        ]
 
     def change_password(
         self,
@@ -369,41 +408,38 @@ class AuthManager:
                 'error': 'New password must be at least 6 characters'
             }
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT password_hash FROM users WHERE id = ?
-            """, (user_id,))
-
-            row = cursor.fetchone()
+        row = self.db.fetchone("""
+            SELECT password_hash FROM users WHERE id = ?
+        """, (user_id,))
 
-            if not row:
-                return {
-                    'success': False,
-                    'error': 'User not found'
-                }
+        if not row:
+            return {
+                'success': False,
+                'error': 'User not found'
+            }
 
-            # Verify old password
-            if not bcrypt.checkpw(old_password.encode('utf-8'), row[0]):
-                return {
-                    'success': False,
-                    'error': 'Invalid old password'
-                }
+        # Verify old password
+        if not bcrypt.checkpw(old_password.encode('utf-8'), row[0]):
+            return {
+                'success': False,
+                'error': 'Invalid old password'
+            }
 
-            # Hash new password
-            new_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
+        # Hash new password
+        new_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
 
-            cursor.execute("""
+        with self.db.transaction() as conn:
+            conn.execute("""
                 UPDATE users
                 SET password_hash = ?
                 WHERE id = ?
             """, (new_hash, user_id))
-            conn.commit()
+        self.invalidate_token_cache()
 
-            return {
-                'success': True,
-                'message': 'Password changed successfully'
-            }
+        return {
+            'success': True,
+            'message': 'Password changed successfully'
+        }
 
 
 def create_auth_manager(db_path: str = "cortex/data/auth.db") -> AuthManager:
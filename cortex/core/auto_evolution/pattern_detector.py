@@ -117,10 +117,7 @@ class PatternDetector:
 
         # Récupérer requêtes récentes
         cutoff_date = datetime.now() - timedelta(days=self.lookback_days)
-        recent_requests = [
-            req for req in self.optimization.historical_requests
-            if req.timestamp >= cutoff_date
-        ]
+        recent_requests = self.optimization.get_requests_since(cutoff_date)
 
         if not recent_requests:
             return []
@@ -457,9 +454,11 @@ if __name__ == "__main__":
         RequestOutcome
     )
     from datetime import datetime, timedelta
+    from pathlib import Path
+    import tempfile
 
     # Créer knowledge base avec données test
-    knowledge = OptimizationKnowledge()
+    knowledge = OptimizationKnowledge(db_path=str(Path(tempfile.mkdtemp()) / "optimization_knowledge.db"))
 
     # Simuler requêtes répétitives
     print("\n1. Creating test historical requests...")
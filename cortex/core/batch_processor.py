@@ -0,0 +1,592 @@
+"""
+Batch Processor - File de requêtes LLM persistante pour les traitements de masse
+
+Les travaux de nuit (revues de code en masse, résumés de scraping) passaient
+un par un par LLMClient.complete au plein tarif. Ici:
+- BatchQueue: file SQLite (WAL, pool partagé) des requêtes et de leurs résultats
+- BatchWorker: regroupe les requêtes en attente par tier et les envoie
+  - nano (OpenAI) et claude (Anthropic) via les Batch API des providers
+    (tarif réduit, fenêtre de 24h), suivies par polling
+  - deepseek (pas de Batch API) ou repli en cas de refus: AsyncLLMClient,
+    concurrence bornée
+- Chaque résultat est écrit dès son arrivée: un run interrompu reprend où
+  il en était (les batches provider déjà soumis sont re-pollés, pas renvoyés)
+
+Un seul worker à la fois par file.
+
+Usage:
+    queue = BatchQueue()
+    batch_id = queue.submit([{"prompt": "Review this diff...", "tier": "nano"}], name="nightly-review")
+    BatchWorker(queue).run()
+    results = queue.results(batch_id)
+
+CLI: cortex batch submit <requests.jsonl> | batch run | batch status | batch results <batch_id>
+"""
+
+import asyncio
+import io
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from .config_loader import get_config
+from .llm_client import LLMClient, LLMResponse
+from .model_router import ModelTier
+from .sqlite_pool import get_sqlite_pool
+
+try:
+    from openai.types.chat import ChatCompletion
+except ImportError:
+    ChatCompletion = None
+
+
+PENDING = "pending"
+SUBMITTED = "submitted"  # Dans un batch provider en cours
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Statuts terminaux des batches OpenAI (requêtes sans résultat remises en file à la clôture)
+_OPENAI_DONE = {"completed", "failed", "expired", "cancelled"}
+
+# Tier → (clé models.yaml, modèle par défaut)
+_TIER_MODELS = {
+    ModelTier.NANO: ("nano", "gpt-3.5-turbo"),
+    ModelTier.DEEPSEEK: ("deepseek", "deepseek-reasoner"),
+    ModelTier.CLAUDE: ("claude", "claude-sonnet-4-20250514"),
+}
+
+
+@dataclass
+class BatchRequest:
+    """Une requête de la file et son résultat"""
+    id: int
+    batch_id: str
+    custom_id: Optional[str]
+    tier: str
+    payload: Dict[str, Any]  # messages, max_tokens, temperature
+    status: str
+    attempts: int = 0
+    provider_batch_id: Optional[str] = None
+    content: Optional[str] = None
+    tokens_input: int = 0
+    tokens_output: int = 0
+    cost: float = 0.0
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "custom_id": self.custom_id,
+            "tier": self.tier,
+            "status": self.status,
+            "content": self.content,
+            "tokens_input": self.tokens_input,
+            "tokens_output": self.tokens_output,
+            "cost": self.cost,
+            "error": self.error
+        }
+
+
+_COLUMNS = ("id, batch_id, custom_id, tier, payload, status, attempts, provider_batch_id, "
+            "content, tokens_input, tokens_output, cost, error")
+
+
+def _row_to_request(row) -> BatchRequest:
+    return BatchRequest(
+        id=row[0], batch_id=row[1], custom_id=row[2], tier=row[3], payload=json.loads(row[4]),
+        status=row[5], attempts=row[6], provider_batch_id=row[7], content=row[8],
+        tokens_input=row[9] or 0, tokens_output=row[10] or 0, cost=row[11] or 0.0, error=row[12]
+    )
+
+
+class BatchQueue:
+    """File persistante des requêtes batch (SQLite)"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: Base SQLite (défaut: optimization.batch.db_path)
+        """
+        if db_path is None:
+            db_path = get_config().get("optimization.batch.db_path", "cortex/data/batch_queue.db")
+        self.db_path = Path(db_path)
+        self.db = get_sqlite_pool(str(self.db_path))
+        self._init_schema()
+
+    def _init_schema(self):
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS batches (
+                    id TEXT PRIMARY KEY,
+                    name TEXT,
+                    created_at TEXT NOT NULL,
+                    total INTEGER NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS batch_requests (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    batch_id TEXT NOT NULL,
+                    custom_id TEXT,
+                    tier TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    provider_batch_id TEXT,
+                    content TEXT,
+                    tokens_input INTEGER,
+                    tokens_output INTEGER,
+                    cost REAL,
+                    error TEXT,
+                    updated_at TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_batch_requests_status ON batch_requests(status, tier)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_batch_requests_batch ON batch_requests(batch_id)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS provider_batches (
+                    id TEXT PRIMARY KEY,
+                    tier TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    request_count INTEGER NOT NULL,
+                    submitted_at TEXT NOT NULL
+                )
+            """)
+
+    def submit(self, requests: List[Dict[str, Any]], name: str = "", default_tier: str = "nano") -> str:
+        """
+        Ajoute un lot de requêtes à la file
+
+        Args:
+            requests: Dicts avec "prompt" (et "system" optionnel) ou "messages",
+                plus "tier", "max_tokens", "temperature", "custom_id" optionnels
+            name: Libellé du lot
+            default_tier: Tier des requêtes qui n'en précisent pas
+
+        Returns:
+            Identifiant du lot
+        """
+        rows = []
+        for request in requests:
+            messages = request.get("messages")
+            if messages is None:
+                if "prompt" not in request:
+                    raise ValueError("Batch request needs 'prompt' or 'messages'")
+                messages = [{"role": "user", "content": request["prompt"]}]
+                if request.get("system"):
+                    messages.insert(0, {"role": "system", "content": request["system"]})
+            tier = ModelTier(request.get("tier", default_tier))
+            if tier not in _TIER_MODELS:
+                raise ValueError(f"Tier not supported in batch mode: {tier.value}")
+            payload = {
+                "messages": messages,
+                "max_tokens": request.get("max_tokens"),
+                "temperature": request.get("temperature", 0.7)
+            }
+            rows.append((request.get("custom_id"), tier.value, json.dumps(payload)))
+
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        now = datetime.now().isoformat()
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO batches (id, name, created_at, total) VALUES (?, ?, ?, ?)",
+                (batch_id, name, now, len(rows))
+            )
+            conn.executemany(
+                "INSERT INTO batch_requests (batch_id, custom_id, tier, payload, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(batch_id, custom_id, tier, payload, now) for custom_id, tier, payload in rows]
+            )
+        return batch_id
+
+    def pending_by_tier(self, limit: Optional[int] = None) -> Dict[str, List[BatchRequest]]:
+        """Requêtes en attente groupées par tier (ordre de soumission)"""
+        query = f"SELECT {_COLUMNS} FROM batch_requests WHERE status = ? ORDER BY id"
+        params: tuple = (PENDING,)
+        if limit:
+            query += " LIMIT ?"
+            params += (limit,)
+        groups: Dict[str, List[BatchRequest]] = {}
+        for row in self.db.fetchall(query, params):
+            request = _row_to_request(row)
+            groups.setdefault(request.tier, []).append(request)
+        return groups
+
+    def get_requests(self, ids: List[int]) -> Dict[int, BatchRequest]:
+        rows = self.db.fetchall(
+            f"SELECT {_COLUMNS} FROM batch_requests WHERE id IN ({','.join('?' * len(ids))})", ids
+        ) if ids else []
+        return {row[0]: _row_to_request(row) for row in rows}
+
+    def mark_submitted(self, ids: List[int], provider_batch_id: str, tier: str):
+        """Requêtes confiées à un batch provider (enregistré pour la reprise)"""
+        now = datetime.now().isoformat()
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO provider_batches (id, tier, status, request_count, submitted_at) VALUES (?, ?, ?, ?, ?)",
+                (provider_batch_id, tier, "in_progress", len(ids), now)
+            )
+            conn.executemany(
+                "UPDATE batch_requests SET status = ?, provider_batch_id = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                [(SUBMITTED, provider_batch_id, now, request_id) for request_id in ids]
+            )
+
+    def open_provider_batches(self) -> List[Dict[str, Any]]:
+        """Batches provider soumis et pas encore récupérés"""
+        return self.db.fetch_dicts(
+            "SELECT id, tier, request_count, submitted_at FROM provider_batches WHERE status = 'in_progress'"
+        )
+
+    def close_provider_batch(self, provider_batch_id: str, status: str, max_attempts: int):
+        """
+        Clôt un batch provider: ses requêtes sans résultat sont remises en
+        file (si tentatives restantes) ou marquées en échec
+        """
+        now = datetime.now().isoformat()
+        with self.db.transaction() as conn:
+            conn.execute("UPDATE provider_batches SET status = ? WHERE id = ?", (status, provider_batch_id))
+            conn.execute(
+                "UPDATE batch_requests SET status = CASE WHEN attempts < ? THEN ? ELSE ? END, "
+                "error = CASE WHEN attempts < ? THEN error ELSE ? END, provider_batch_id = NULL, updated_at = ? "
+                "WHERE provider_batch_id = ? AND status = ?",
+                (max_attempts, PENDING, FAILED, max_attempts, f"Provider batch {status}", now,
+                 provider_batch_id, SUBMITTED)
+            )
+
+    def store_result(self, request_id: int, response: LLMResponse):
+        with self.db.transaction() as conn:
+            conn.execute(
+                "UPDATE batch_requests SET status = ?, content = ?, tokens_input = ?, tokens_output = ?, "
+                "cost = ?, error = NULL, updated_at = ? WHERE id = ?",
+                (COMPLETED, response.content, response.tokens_input, response.tokens_output,
+                 response.cost, datetime.now().isoformat(), request_id)
+            )
+
+    def store_error(self, request_id: int, error: str, retry: bool = False):
+        """Échec d'une requête (retry=True: remise en file si tentatives restantes)"""
+        with self.db.transaction() as conn:
+            conn.execute(
+                "UPDATE batch_requests SET status = ?, error = ?, provider_batch_id = NULL, updated_at = ? "
+                "WHERE id = ?",
+                (PENDING if retry else FAILED, error, datetime.now().isoformat(), request_id)
+            )
+
+    def increment_attempts(self, ids: List[int]):
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "UPDATE batch_requests SET attempts = attempts + 1 WHERE id = ?", [(i,) for i in ids]
+            )
+
+    def status(self, batch_id: Optional[str] = None) -> Dict[str, Any]:
+        """Compteurs par statut (un lot ou toute la file) et coût cumulé"""
+        where, params = ("WHERE batch_id = ?", (batch_id,)) if batch_id else ("", ())
+        counts = {PENDING: 0, SUBMITTED: 0, COMPLETED: 0, FAILED: 0}
+        cost = 0.0
+        for status, count, status_cost in self.db.fetchall(
+            f"SELECT status, COUNT(*), SUM(cost) FROM batch_requests {where} GROUP BY status", params
+        ):
+            counts[status] = count
+            cost += status_cost or 0.0
+        total = sum(counts.values())
+        return {
+            "batch_id": batch_id,
+            "total": total,
+            **counts,
+            "done": counts[COMPLETED] + counts[FAILED] == total,
+            "cost": cost
+        }
+
+    def list_batches(self) -> List[Dict[str, Any]]:
+        """Lots soumis avec leur avancement"""
+        return self.db.fetch_dicts("""
+            SELECT b.id, b.name, b.created_at, b.total,
+                   SUM(r.status = 'completed') AS completed,
+                   SUM(r.status = 'failed') AS failed,
+                   COALESCE(SUM(r.cost), 0) AS cost
+            FROM batches b JOIN batch_requests r ON r.batch_id = b.id
+            GROUP BY b.id ORDER BY b.created_at
+        """)
+
+    def results(self, batch_id: str) -> List[BatchRequest]:
+        """Requêtes d'un lot avec leurs résultats (ordre de soumission)"""
+        return [
+            _row_to_request(row) for row in self.db.fetchall(
+                f"SELECT {_COLUMNS} FROM batch_requests WHERE batch_id = ? ORDER BY id", (batch_id,)
+            )
+        ]
+
+
+class BatchWorker:
+    """
+    Traite la file: Batch API des providers ou concurrence bornée, par tier
+    """
+
+    def __init__(
+        self,
+        queue: BatchQueue,
+        llm_client: Optional[LLMClient] = None,
+        use_provider_batches: Optional[bool] = None,
+        max_concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_batch_size: Optional[int] = None
+    ):
+        """
+        Args:
+            queue: File à traiter
+            llm_client: Client dont réutiliser clés, URL et tarifs
+            use_provider_batches: Utiliser les Batch API (sinon tout en concurrence bornée)
+            max_concurrency: Appels simultanés par tier hors Batch API
+            poll_interval: Secondes entre deux vérifications des batches provider
+            max_batch_size: Requêtes max par batch provider
+        """
+        config = get_config()
+        self.queue = queue
+        self.llm_client = llm_client or LLMClient(use_cache=False)
+        self.use_provider_batches = (
+            config.get("optimization.batch.provider_batches", True)
+            if use_provider_batches is None else use_provider_batches
+        )
+        self.max_concurrency = max_concurrency or config.get("optimization.batch.max_concurrency", 8)
+        self.poll_interval = (
+            config.get("optimization.batch.poll_interval_seconds", 30)
+            if poll_interval is None else poll_interval
+        )
+        self.max_batch_size = max_batch_size or config.get("optimization.batch.max_batch_size", 10000)
+        self.max_attempts = config.get("optimization.batch.max_attempts", 3)
+        self.provider_discount = config.get("optimization.batch.provider_discount", 0.5)
+        self._batch_unavailable = set()  # Tiers dont la Batch API a refusé la soumission (ce run)
+
+    def run(self, wait: bool = True, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Traite toutes les requêtes en attente
+
+        Args:
+            wait: Attendre la fin des batches provider (sinon: soumettre et rendre la main,
+                un prochain run récupérera les résultats)
+            timeout: Attente max des batches provider (secondes)
+
+        Returns:
+            Compteurs du run: submitted (Batch API), direct (appels, relances comprises),
+            completed, failed, open_batches
+        """
+        report = {"submitted": 0, "direct": 0, "completed": 0, "failed": 0, "open_batches": 0}
+        self._batch_unavailable = set()
+        deadline = time.monotonic() + timeout if timeout else None
+
+        # Reprise: récupérer d'abord les batches provider déjà terminés
+        self._poll_provider_batches(report)
+
+        while True:
+            groups = self.queue.pending_by_tier()
+            if not groups:
+                break
+            for tier_value, requests in groups.items():
+                tier = ModelTier(tier_value)
+                direct = requests
+                if self.use_provider_batches and tier in (ModelTier.NANO, ModelTier.CLAUDE) \
+                        and tier not in self._batch_unavailable:
+                    direct = self._submit_provider_batches(tier, requests, report)
+                if direct:
+                    self._run_direct(tier, direct, report)
+
+        while wait:
+            report["open_batches"] = len(self.queue.open_provider_batches())
+            if not report["open_batches"]:
+                break
+            if deadline and time.monotonic() >= deadline:
+                break
+            time.sleep(self.poll_interval)
+            self._poll_provider_batches(report)
+            # Requêtes remises en file (batch expiré): nouveau passage
+            for tier_value, requests in self.queue.pending_by_tier().items():
+                self._run_direct(ModelTier(tier_value), requests, report)
+
+        report["open_batches"] = len(self.queue.open_provider_batches())
+        return report
+
+    # ------------------------------------------------------------ Batch API
+
+    def _submit_provider_batches(
+        self, tier: ModelTier, requests: List[BatchRequest], report: Dict[str, Any]
+    ) -> List[BatchRequest]:
+        """Soumet par paquets de max_batch_size; retourne les requêtes à traiter en direct"""
+        for start in range(0, len(requests), self.max_batch_size):
+            chunk = requests[start:start + self.max_batch_size]
+            try:
+                if tier == ModelTier.CLAUDE:
+                    provider_batch_id = self._create_anthropic_batch(chunk)
+                else:
+                    provider_batch_id = self._create_openai_batch(tier, chunk)
+            except Exception as e:
+                # Batch API indisponible (endpoint absent, compte non éligible...): mode direct
+                print(f"⚠️  {tier.value} batch submission failed, falling back to direct calls: {e}")
+                self._batch_unavailable.add(tier)
+                return requests[start:]
+            self.queue.mark_submitted([r.id for r in chunk], provider_batch_id, tier.value)
+            report["submitted"] += len(chunk)
+        return []
+
+    def _max_tokens(self, tier: ModelTier, request: BatchRequest) -> int:
+        tier_key, _ = _TIER_MODELS[tier]
+        return request.payload.get("max_tokens") or \
+            self.llm_client.models_config.get(tier_key, {}).get("max_tokens", 8192)
+
+    def _create_openai_batch(self, tier: ModelTier, requests: List[BatchRequest]) -> str:
+        client = self.llm_client.openai_client
+        if client is None:
+            raise RuntimeError("OpenAI client not initialized. Check API key.")
+        tier_key, default_model = _TIER_MODELS[tier]
+
+        lines = []
+        for request in requests:
+            params = self.llm_client._openai_params(
+                tier_key, default_model, self.llm_client._clean_messages(request.payload["messages"]),
+                self._max_tokens(tier, request), 1.0  # NANO: température 1 uniquement
+            )
+            lines.append(json.dumps({
+                "custom_id": str(request.id),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": params
+            }))
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+
+        input_file = client.files.create(file=("batch.jsonl", io.BytesIO(data)), purpose="batch")
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        return batch.id
+
+    def _create_anthropic_batch(self, requests: List[BatchRequest]) -> str:
+        client = self.llm_client.anthropic_client
+        if client is None:
+            raise RuntimeError("Anthropic client not initialized. Check API key.")
+
+        batch = client.messages.batches.create(requests=[
+            {
+                "custom_id": str(request.id),
+                "params": self.llm_client._anthropic_params(
+                    self.llm_client._clean_messages(request.payload["messages"]),
+                    self._max_tokens(ModelTier.CLAUDE, request),
+                    request.payload.get("temperature", 0.7)
+                )
+            }
+            for request in requests
+        ])
+        return batch.id
+
+    def _poll_provider_batches(self, report: Dict[str, Any]):
+        """Récupère les résultats des batches provider terminés"""
+        for provider_batch in self.queue.open_provider_batches():
+            tier = ModelTier(provider_batch["tier"])
+            try:
+                if tier == ModelTier.CLAUDE:
+                    status = self._collect_anthropic_batch(provider_batch["id"], report)
+                else:
+                    status = self._collect_openai_batch(tier, provider_batch["id"], report)
+            except Exception as e:
+                print(f"⚠️  Could not poll {tier.value} batch {provider_batch['id']}: {e}")
+                continue
+            if status is not None:
+                self.queue.close_provider_batch(provider_batch["id"], status, self.max_attempts)
+
+    def _store_batch_response(self, request_id: int, response: LLMResponse, report: Dict[str, Any]):
+        response.cost *= self.provider_discount
+        self.queue.store_result(request_id, response)
+        report["completed"] += 1
+
+    def _collect_openai_batch(self, tier: ModelTier, provider_batch_id: str, report: Dict[str, Any]) -> Optional[str]:
+        """Statut final du batch (résultats stockés), ou None s'il est en cours"""
+        client = self.llm_client.openai_client
+        batch = client.batches.retrieve(provider_batch_id)
+        if batch.status not in _OPENAI_DONE:
+            return None
+
+        tier_key, _ = _TIER_MODELS[tier]
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                request_id = int(item["custom_id"])
+                response = item.get("response") or {}
+                if response.get("status_code") == 200 and ChatCompletion is not None:
+                    body = ChatCompletion.model_validate(response["body"])
+                    self._store_batch_response(
+                        request_id, self.llm_client._parse_openai_response(body, tier_key, body.model), report
+                    )
+                else:
+                    error = item.get("error") or response.get("body", {}).get("error") or response
+                    self.queue.store_error(request_id, json.dumps(error)[:500])
+                    report["failed"] += 1
+
+        return batch.status
+
+    def _collect_anthropic_batch(self, provider_batch_id: str, report: Dict[str, Any]) -> Optional[str]:
+        client = self.llm_client.anthropic_client
+        batch = client.messages.batches.retrieve(provider_batch_id)
+        if batch.processing_status != "ended":
+            return None
+
+        for item in client.messages.batches.results(provider_batch_id):
+            request_id = int(item.custom_id)
+            result = item.result
+            if result.type == "succeeded":
+                self._store_batch_response(
+                    request_id, self.llm_client._parse_anthropic_response(result.message, result.message.model),
+                    report
+                )
+            elif result.type in ("expired", "canceled"):
+                continue  # Remises en file à la clôture du batch
+            else:
+                self.queue.store_error(request_id, str(getattr(result, "error", result.type))[:500])
+                report["failed"] += 1
+        return "ended"
+
+    # -------------------------------------------------------- Appels directs
+
+    def _run_direct(self, tier: ModelTier, requests: List[BatchRequest], report: Dict[str, Any]):
+        """Concurrence bornée (AsyncLLMClient), chaque résultat stocké dès réception"""
+        if not requests:
+            return
+        from .async_llm_client import AsyncLLMClient, is_retryable
+
+        tier_key, _ = _TIER_MODELS[tier]
+        self.queue.increment_attempts([r.id for r in requests])
+
+        async def run_all():
+            client = AsyncLLMClient(self.llm_client, limits={tier_key: {"max_concurrency": self.max_concurrency}})
+
+            async def one(request: BatchRequest):
+                try:
+                    response = await client.complete(
+                        messages=request.payload["messages"],
+                        tier=tier,
+                        max_tokens=request.payload.get("max_tokens"),
+                        temperature=request.payload.get("temperature", 0.7)
+                    )
+                except Exception as e:
+                    cause = e.__cause__ or e
+                    retry = is_retryable(cause) and request.attempts + 1 < self.max_attempts
+                    self.queue.store_error(request.id, str(e)[:500], retry=retry)
+                    if not retry:
+                        report["failed"] += 1
+                    return
+                self.queue.store_result(request.id, response)
+                report["completed"] += 1
+
+            try:
+                await asyncio.gather(*(one(r) for r in requests))
+            finally:
+                await client.aclose()
+
+        report["direct"] += len(requests)
+        asyncio.run(run_all())
@@ -0,0 +1,562 @@
+"""
+Clone Detector - Fonctions quasi dupliquées par empreintes d'AST
+
+Chaque fonction (ou méthode) est réduite à une séquence de nœuds AST
+normalisée: variables réduites à un même jeton, littéraux remplacés par
+leur type, docstring retirée. Deux fonctions qui ne
+diffèrent que par les noms, les constantes ou quelques instructions ont des
+séquences presque identiques.
+
+- empreintes: hachages des k-grammes de nœuds, réduits par winnowing (le
+  minimum de chaque fenêtre de w hachages); tout passage commun d'au moins
+  w + k - 1 nœuds donne une empreinte commune
+- signature MinHash des empreintes, découpée en bandes (LSH): seules les
+  fonctions qui partagent un bucket sont comparées, pas toutes les paires
+- vérification par Jaccard exact des empreintes, puis regroupement des
+  paires en clusters de clones avec leur score
+- index SQLite par fichier (mtime, taille, sha256): seuls les fichiers
+  modifiés sont ré-analysés, en pool de processus s'ils sont nombreux
+
+Les fonctions d'empreinte sont au niveau module et ne manipulent que des
+types simples: elles tournent telles quelles dans un ProcessPoolExecutor.
+
+Usage:
+    detector = CloneDetector(roots=["cortex"])
+    report = detector.sync()
+    for cluster in detector.find_clones(min_similarity=0.8):
+        print(cluster.similarity, [m["symbol"] for m in cluster.members])
+"""
+
+import ast
+import hashlib
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cortex.core.code_chunker import module_name
+from cortex.core.config_loader import get_config
+from cortex.core.sqlite_pool import get_sqlite_pool
+
+
+FINGERPRINT_VERSION = 1  # À incrémenter si la normalisation ou le hachage change
+KGRAM = 8  # Nœuds par k-gramme
+WINDOW = 4  # Fenêtre de winnowing
+NUM_PERM = 64  # Permutations MinHash
+BANDS = 16  # Bandes LSH (NUM_PERM / BANDS lignes par bande)
+MIN_TOKENS = 40  # Nœuds AST minimum (les fonctions triviales ne sont pas comparées)
+MAX_BUCKET = 200  # Au-delà, un bucket n'est comparé qu'à son premier membre
+ESTIMATE_MARGIN = 0.2  # Candidats écartés si Jaccard estimé (MinHash) < seuil - marge (~4 écarts-types)
+POOL_THRESHOLD = 64  # Fichiers modifiés à partir desquels l'analyse passe en pool
+
+SKIPPED_DIRS = {"__pycache__", "node_modules", "venv", "env", "site-packages"}
+
+_PERM_SEEDS = np.random.default_rng(20261016).integers(0, 1 << 63, NUM_PERM, dtype=np.uint64)
+_KGRAM_POWERS = np.array([pow(1000003, KGRAM - 1 - i, 1 << 64) for i in range(KGRAM)], dtype=np.uint64)
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS clone_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS clone_files (
+        path TEXT PRIMARY KEY,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        sha256 TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS clone_functions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        start_line INTEGER NOT NULL,
+        end_line INTEGER NOT NULL,
+        tokens INTEGER NOT NULL,
+        signature BLOB NOT NULL,
+        fingerprints BLOB NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_clone_functions_path ON clone_functions(path)",
+]
+
+# ----------------------------------------------------------------------
+# Empreintes (fonctions de module, utilisables dans un pool de processus)
+# ----------------------------------------------------------------------
+
+class _Normalizer:
+    """
+    Séquence pré-ordre des nœuds d'une fonction
+
+    Variables et paramètres sont réduits à un même jeton (un renommage ou un
+    self/cls en plus ne change rien), les constantes à leur type; les
+    attributs et mots-clés appelés restent littéraux.
+    """
+
+    def __init__(self):
+        self.tokens: List[str] = []
+
+    def visit(self, node: ast.AST):
+        if isinstance(node, (ast.expr_context, ast.type_ignore)) \
+                or isinstance(node, ast.arg) and node.arg in ("self", "cls"):
+            return
+        self.tokens.append(type(node).__name__)
+        if isinstance(node, ast.Attribute):
+            self.tokens.append(node.attr)
+        elif isinstance(node, ast.keyword) and node.arg:
+            self.tokens.append(node.arg)
+        elif isinstance(node, ast.Constant):
+            self.tokens.append(type(node.value).__name__)
+        for child in ast.iter_child_nodes(node):
+            self.visit(child)
+
+    def function(self, node: ast.AST) -> List[str]:
+        body = node.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(getattr(body[0], "value", None), ast.Constant) \
+                and isinstance(body[0].value.value, str):
+            body = body[1:]  # Docstring
+        self.visit(node.args)
+        for statement in body:
+            self.visit(statement)
+        return self.tokens
+
+
+def _token_ids(tokens: List[str], cache: Dict[str, int]) -> np.ndarray:
+    ids = []
+    for token in tokens:
+        value = cache.get(token)
+        if value is None:
+            value = cache[token] = zlib.crc32(token.encode())
+        ids.append(value)
+    return np.array(ids, dtype=np.uint64)
+
+
+def winnow(token_ids: np.ndarray, k: int = KGRAM, window: int = WINDOW) -> np.ndarray:
+    """
+    Empreintes winnowing d'une séquence de jetons
+
+    Returns:
+        Hachages 32 bits distincts (triés)
+    """
+    if len(token_ids) < k:
+        return np.zeros(0, dtype=np.uint32)
+    powers = _KGRAM_POWERS if k == KGRAM else \
+        np.array([pow(1000003, k - 1 - i, 1 << 64) for i in range(k)], dtype=np.uint64)
+    grams = np.lib.stride_tricks.sliding_window_view(token_ids, k)
+    hashes = (grams * powers).sum(axis=1, dtype=np.uint64)  # Polynôme mod 2^64
+    hashes = ((hashes ^ (hashes >> np.uint64(29))) * np.uint64(0xBF58476D1CE4E5B9)) >> np.uint64(32)
+    if len(hashes) > window:
+        windows = np.lib.stride_tricks.sliding_window_view(hashes, window)
+        hashes = windows[np.arange(len(windows)), windows.argmin(axis=1)]
+    return np.unique(hashes).astype(np.uint32)
+
+
+def minhash(fingerprints: np.ndarray) -> np.ndarray:
+    """Signature MinHash (NUM_PERM valeurs 32 bits) d'un ensemble d'empreintes"""
+    if len(fingerprints) == 0:
+        return np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint32)
+    # Une permutation = graine propre + finaliseur splitmix64 (multiplications mod 2^64)
+    h = fingerprints.astype(np.uint64)[None, :] ^ _PERM_SEEDS[:, None]
+    h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    h ^= h >> np.uint64(31)
+    return (h.min(axis=1) >> np.uint64(32)).astype(np.uint32)
+
+
+def _functions(tree: ast.AST, prefix: str = ""):
+    """Fonctions top-level et méthodes (les fonctions imbriquées restent dans leur parent)"""
+    for node in ast.iter_child_nodes(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield prefix + node.name, node
+        elif isinstance(node, ast.ClassDef):
+            yield from _functions(node, f"{prefix}{node.name}.")
+
+
+def fingerprint_source(source: str, relative_path: str, min_tokens: int = MIN_TOKENS) -> List[Tuple]:
+    """
+    Empreintes des fonctions d'un fichier Python
+
+    Returns:
+        [(symbole, ligne début, ligne fin, nb nœuds, signature bytes,
+          empreintes bytes)]; [] si le fichier ne se parse pas
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    module = module_name(relative_path)
+    cache: Dict[str, int] = {}
+    results = []
+    for name, node in _functions(tree):
+        tokens = _Normalizer().function(node)
+        if len(tokens) < min_tokens:
+            continue
+        fingerprints = winnow(_token_ids(tokens, cache))
+        results.append((
+            f"{module}:{name}", node.lineno, getattr(node, "end_lineno", node.lineno), len(tokens),
+            minhash(fingerprints).tobytes(), fingerprints.tobytes()
+        ))
+    return results
+
+
+def fingerprint_job(job: Tuple[str, str, int]) -> List[Tuple]:
+    """fingerprint_source pour ProcessPoolExecutor.map: (source, chemin relatif, min_tokens)"""
+    return fingerprint_source(*job)
+
+
+# ----------------------------------------------------------------------
+# Résultats
+# ----------------------------------------------------------------------
+
+@dataclass
+class CloneCluster:
+    """Groupe de fonctions quasi dupliquées"""
+    members: List[Dict[str, Any]]  # {path, symbol, start_line, end_line, tokens}
+    similarity: float  # Moyenne des paires vérifiées (Jaccard des empreintes)
+    min_similarity: float
+    pairs: int  # Paires vérifiées au-dessus du seuil
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class CloneSyncReport:
+    """Résultat d'une synchronisation incrémentale de l'index"""
+    files_scanned: int = 0
+    files_changed: int = 0
+    files_deleted: int = 0
+    functions_indexed: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _Index:
+    """Signatures chargées en mémoire pour une détection"""
+    ids: np.ndarray
+    signatures: np.ndarray  # (n, NUM_PERM) uint32
+    fingerprints: Dict[int, frozenset] = field(default_factory=dict)
+
+
+# ----------------------------------------------------------------------
+# Détecteur
+# ----------------------------------------------------------------------
+
+class CloneDetector:
+    """Index incrémental des empreintes de fonctions et détection des clones"""
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        roots: Optional[Sequence[str]] = None,
+        db_path: Optional[str] = None,
+        min_tokens: Optional[int] = None,
+        workers: Optional[int] = None
+    ):
+        """
+        Args:
+            root: Racine du projet (défaut: répertoire courant)
+            roots: Dossiers analysés, relatifs à root (défaut: config)
+            db_path: Index SQLite (défaut: agents.harmonization.clone_detection.db_path)
+            min_tokens: Nœuds AST minimum d'une fonction comparée
+            workers: Processus d'analyse (0 = nombre de CPU)
+        """
+        config = get_config()
+        prefix = "agents.harmonization.clone_detection."
+        self.root = Path(root or Path.cwd()).resolve()
+        self.roots = list(roots if roots is not None else config.get(prefix + "roots", ["cortex"]))
+        if db_path is None:
+            db_path = config.get(prefix + "db_path", "cortex/data/clone_index.db")
+        self.db = get_sqlite_pool(str(Path(db_path).resolve()))
+        self.min_tokens = min_tokens if min_tokens is not None else config.get(prefix + "min_tokens", MIN_TOKENS)
+        self.workers = workers if workers is not None else config.get(prefix + "workers", 0)
+        self._init_schema()
+
+    def _init_schema(self):
+        # Schéma idempotent exécuté à chaque instance: un index supprimé ou
+        # remplacé dans le processus est rouvert et recréé
+        self.db.reopen_if_replaced()
+        with self.db.transaction() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+        # Paramètres différents de ceux de l'index: tout est ré-analysé
+        params = f"{FINGERPRINT_VERSION}:{KGRAM}:{WINDOW}:{NUM_PERM}:{self.min_tokens}"
+        row = self.db.fetchone("SELECT value FROM clone_meta WHERE key = 'params'")
+        if row is None or row[0] != params:
+            with self.db.transaction() as conn:
+                conn.execute("DELETE FROM clone_functions")
+                conn.execute("DELETE FROM clone_files")
+                conn.execute("INSERT OR REPLACE INTO clone_meta (key, value) VALUES ('params', ?)", (params,))
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def sync(self, force: bool = False) -> CloneSyncReport:
+        """
+        Met l'index à jour avec les fichiers du projet
+
+        Un fichier dont la taille et le mtime n'ont pas bougé n'est pas
+        relu; un fichier relu dont l'empreinte sha256 est inchangée n'est
+        pas ré-analysé.
+
+        Args:
+            force: Ré-analyse tous les fichiers
+
+        Returns:
+            CloneSyncReport
+        """
+        start = time.perf_counter()
+        report = CloneSyncReport()
+        known = {path: (mtime_ns, size, digest) for path, mtime_ns, size, digest in
+                 self.db.fetchall("SELECT path, mtime_ns, size, sha256 FROM clone_files")}
+        files = self._scan_files()
+        report.files_scanned = len(files)
+
+        touched: List[Tuple[str, int, int, str]] = []  # Contenu identique, stat changée
+        changed: List[Tuple[str, int, int, str, str]] = []
+        for relative_path, (mtime_ns, size) in files.items():
+            entry = known.get(relative_path)
+            if entry and not force and entry[0] == mtime_ns and entry[1] == size:
+                continue
+            try:
+                data = (self.root / relative_path).read_bytes()
+                digest = hashlib.sha256(data).hexdigest()
+                if entry and not force and entry[2] == digest:
+                    touched.append((relative_path, mtime_ns, size, digest))
+                    continue
+                changed.append((relative_path, mtime_ns, size, digest, data.decode("utf-8", errors="ignore")))
+            except OSError as e:
+                print(f"   ⚠️  Error reading {relative_path}: {e}")
+
+        deleted = [path for path in known if path not in files]
+        results = self._fingerprint_files(changed)
+
+        with self.db.transaction() as conn:
+            for path in deleted:
+                conn.execute("DELETE FROM clone_functions WHERE path = ?", (path,))
+                conn.execute("DELETE FROM clone_files WHERE path = ?", (path,))
+            conn.executemany("UPDATE clone_files SET mtime_ns = ?, size = ?, sha256 = ? WHERE path = ?",
+                             [(mtime_ns, size, digest, path) for path, mtime_ns, size, digest in touched])
+            for (path, mtime_ns, size, digest, _), functions in zip(changed, results):
+                conn.execute("DELETE FROM clone_functions WHERE path = ?", (path,))
+                conn.executemany(
+                    "INSERT INTO clone_functions (path, symbol, start_line, end_line, tokens, signature, "
+                    "fingerprints) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(path,) + function for function in functions]
+                )
+                conn.execute("INSERT OR REPLACE INTO clone_files (path, mtime_ns, size, sha256) VALUES (?, ?, ?, ?)",
+                             (path, mtime_ns, size, digest))
+                report.functions_indexed += len(functions)
+
+        report.files_changed = len(changed)
+        report.files_deleted = len(deleted)
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def _scan_files(self) -> Dict[str, Tuple[int, int]]:
+        """{chemin relatif: (mtime_ns, taille)} des fichiers .py sous roots, sans les lire"""
+        files = {}
+        pending = [(str(self.root / root), root.rstrip("/") + "/") for root in self.roots]
+        while pending:
+            directory, prefix = pending.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                relative_path = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIPPED_DIRS:
+                        pending.append((entry.path, relative_path + "/"))
+                elif entry.name.endswith(".py"):
+                    stat = entry.stat()
+                    files[relative_path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def _fingerprint_files(self, changed: List[Tuple]) -> List[List[Tuple]]:
+        """Empreintes des fichiers modifiés (pool de processus s'ils sont nombreux; ast est lié au GIL)"""
+        jobs = [(content, path, self.min_tokens) for path, _, _, _, content in changed]
+        workers = self.workers or os.cpu_count() or 1
+        if workers > 1 and len(jobs) >= POOL_THRESHOLD:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(fingerprint_job, jobs, chunksize=32))
+        return [fingerprint_job(job) for job in jobs]
+
+    # ------------------------------------------------------------------
+    # Détection
+    # ------------------------------------------------------------------
+
+    def find_clones(
+        self,
+        min_similarity: Optional[float] = None,
+        sync: bool = True,
+        paths: Optional[Iterable[str]] = None
+    ) -> List[CloneCluster]:
+        """
+        Clusters de fonctions quasi dupliquées
+
+        Args:
+            min_similarity: Jaccard minimum des empreintes d'une paire
+                (défaut: agents.harmonization.clone_detection.min_similarity)
+            sync: Met l'index à jour avant la détection
+            paths: Ne garder que les clusters touchant ces fichiers
+
+        Returns:
+            Clusters triés par taille puis similarité décroissantes
+        """
+        if min_similarity is None:
+            min_similarity = get_config().get("agents.harmonization.clone_detection.min_similarity", 0.8)
+        if sync:
+            self.sync()
+
+        index = self._load_index()
+        if len(index.ids) < 2:
+            return []
+        pairs = self._candidate_pairs(index.signatures)
+
+        # Collisions de bande fortuites: écartées sur l'estimation MinHash
+        # (vectorisée) avant le Jaccard exact, calculé en Python
+        estimates = np.zeros(len(pairs))
+        for offset in range(0, len(pairs), 200_000):
+            chunk = pairs[offset:offset + 200_000]
+            estimates[offset:offset + len(chunk)] = \
+                (index.signatures[chunk[:, 0]] == index.signatures[chunk[:, 1]]).mean(axis=1)
+        pairs = pairs[estimates >= min_similarity - ESTIMATE_MARGIN]
+
+        # Vérification: Jaccard exact des empreintes des candidats
+        needed = np.unique(pairs)
+        self._load_fingerprints(index, index.ids[needed])
+        edges: List[Tuple[int, int, float]] = []
+        for i, j in pairs.tolist():
+            a, b = index.fingerprints[int(index.ids[i])], index.fingerprints[int(index.ids[j])]
+            union = len(a | b)
+            similarity = len(a & b) / union if union else 0.0
+            if similarity >= min_similarity:
+                edges.append((i, j, similarity))
+
+        clusters = self._clusters(index, edges)
+        if paths is not None:
+            wanted = set(paths)
+            clusters = [c for c in clusters if any(m["path"] in wanted for m in c.members)]
+        return clusters
+
+    def _load_index(self) -> _Index:
+        rows = self.db.fetchall("SELECT id, signature FROM clone_functions ORDER BY id")
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        signatures = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.uint32).reshape(len(rows), NUM_PERM) \
+            if rows else np.zeros((0, NUM_PERM), dtype=np.uint32)
+        return _Index(ids=ids, signatures=signatures)
+
+    def _load_fingerprints(self, index: _Index, ids: np.ndarray):
+        ids = [int(i) for i in ids]
+        for offset in range(0, len(ids), 500):
+            chunk = ids[offset:offset + 500]
+            for function_id, blob in self.db.fetchall(
+                f"SELECT id, fingerprints FROM clone_functions WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+            ):
+                index.fingerprints[function_id] = frozenset(np.frombuffer(blob, dtype=np.uint32).tolist())
+
+    @staticmethod
+    def _candidate_pairs(signatures: np.ndarray) -> np.ndarray:
+        """
+        Paires (i, j), i < j, qui partagent au moins un bucket LSH
+
+        Un bucket de plus de MAX_BUCKET fonctions (code généré identique)
+        n'est comparé qu'à son premier membre: le coût reste linéaire.
+        """
+        n = len(signatures)
+        rows = NUM_PERM // BANDS
+        found = []
+        for band in range(BANDS):
+            keys = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+            keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * rows))).ravel()
+            _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+            inverse = inverse.ravel()
+            shared = counts[inverse] > 1
+            if not shared.any():
+                continue
+            members = np.nonzero(shared)[0]
+            order = members[np.argsort(inverse[members], kind="stable")]
+            buckets = inverse[order]
+            sizes = counts[buckets]
+            group_start = np.searchsorted(buckets, buckets)
+            group_end = group_start + sizes
+
+            star = sizes > MAX_BUCKET
+            if star.any():
+                first = order[group_start[star]]
+                keep = first != order[star]
+                found.append(np.stack([first[keep], order[star][keep]], axis=1))
+            # Paires (k, k + d) d'un même bucket, un décalage d à la fois
+            small = np.nonzero(~star)[0]
+            for d in range(1, int(sizes[small].max()) if len(small) else 1):
+                left = small[small + d < group_end[small]]
+                if not len(left):
+                    break
+                found.append(np.stack([order[left], order[left + d]], axis=1))
+        if not found:
+            return np.zeros((0, 2), dtype=np.int64)
+        pairs = np.concatenate(found).astype(np.int64)
+        pairs.sort(axis=1)
+        keys = np.unique(pairs[:, 0] * n + pairs[:, 1])
+        return np.stack([keys // n, keys % n], axis=1)
+
+    def _clusters(self, index: _Index, edges: List[Tuple[int, int, float]]) -> List[CloneCluster]:
+        """Composantes connexes des paires vérifiées (union-find)"""
+        parent: Dict[int, int] = {}
+
+        def find(x: int) -> int:
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for i, j, _ in edges:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        groups: Dict[int, Dict[str, Any]] = {}
+        for i, j, similarity in edges:
+            group = groups.setdefault(find(i), {"members": set(), "scores": []})
+            group["members"].update((i, j))
+            group["scores"].append(similarity)
+
+        function_ids = sorted({int(index.ids[i]) for group in groups.values() for i in group["members"]})
+        details: Dict[int, Dict[str, Any]] = {}
+        for offset in range(0, len(function_ids), 500):
+            chunk = function_ids[offset:offset + 500]
+            for row in self.db.fetch_dicts(
+                "SELECT id, path, symbol, start_line, end_line, tokens FROM clone_functions "
+                f"WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+            ):
+                details[row.pop("id")] = row
+
+        clusters = [
+            CloneCluster(
+                members=[details[int(index.ids[i])] for i in sorted(group["members"])],
+                similarity=round(sum(group["scores"]) / len(group["scores"]), 4),
+                min_similarity=round(min(group["scores"]), 4),
+                pairs=len(group["scores"])
+            )
+            for group in groups.values()
+        ]
+        clusters.sort(key=lambda c: (len(c.members), c.similarity), reverse=True)
+        return clusters
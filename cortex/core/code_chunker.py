@@ -0,0 +1,216 @@
+"""
+Code Chunker - Découpage AST des fichiers Python par symbole
+
+Un fichier est parsé une seule fois (ast) et produit:
+- un chunk module: docstring, imports et constantes top-level
+- un chunk par classe: en-tête, attributs et signatures des méthodes
+- un chunk par méthode et par fonction top-level
+
+Chaque chunk a un identifiant stable (module:Classe.méthode) et ses
+lignes exactes. Un chunk qui dépasse max_tokens (compte tokenizer réel,
+voir token_counter) est coupé en parties symbole, symbole#2, ...
+
+Les fonctions sont au niveau module et ne manipulent que des types
+simples: elles tournent telles quelles dans un ProcessPoolExecutor.
+"""
+
+import ast
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from cortex.core.token_counter import count_tokens, count_tokens_many
+
+
+@dataclass
+class CodeChunk:
+    """Un symbole Python et ses lignes"""
+    symbol: str  # module:Classe.méthode
+    kind: str  # module, class, method, function
+    name: str  # Classe.méthode
+    start_line: int
+    end_line: int
+    content: str
+    tokens: int
+    parent: Optional[str] = None  # Symbole de la classe englobante
+
+
+def module_name(relative_path: str) -> str:
+    """cortex/core/llm_client.py → cortex.core.llm_client"""
+    parts = relative_path[:-3].split("/") if relative_path.endswith(".py") else relative_path.split("/")
+    if len(parts) > 1 and parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def _start_line(node: ast.AST) -> int:
+    """Première ligne d'un nœud, décorateurs compris"""
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno] + [d.lineno for d in decorators])
+
+
+def _signature_lines(node: ast.AST, lines: List[str]) -> List[str]:
+    """Lignes de la signature (décorateurs compris), sans le corps"""
+    start = _start_line(node)
+    body_start = node.body[0].lineno
+    if body_start <= node.lineno:
+        # def f(): return x  (corps sur la même ligne)
+        return lines[start - 1:node.lineno]
+    return lines[start - 1:body_start - 1]
+
+
+class _Chunker:
+    """Découpage d'un arbre déjà parsé"""
+
+    def __init__(self, source: str, module: str, max_tokens: int):
+        self.lines = source.splitlines()
+        self.module = module
+        self.max_tokens = max_tokens
+        self.chunks: List[CodeChunk] = []
+        self._seen = {}
+
+    def _symbol(self, name: str) -> str:
+        """Symbole unique (un getter et son setter partagent un nom)"""
+        symbol = f"{self.module}:{name}" if name else self.module
+        count = self._seen.get(symbol, 0) + 1
+        self._seen[symbol] = count
+        return symbol if count == 1 else f"{symbol}~{count}"
+
+    def _emit(self, kind: str, name: str, start: int, end: int, lines: List[str], parent: Optional[str] = None):
+        """Ajoute un chunk, découpé en parties si max_tokens est dépassé"""
+        if not any(line.strip() for line in lines):
+            return
+        symbol = self._symbol(name)
+        content = "\n".join(lines)
+        tokens = count_tokens(content)
+
+        if tokens <= self.max_tokens:
+            self.chunks.append(CodeChunk(symbol, kind, name, start, end, content, tokens, parent))
+            return
+
+        for part, (part_start, part_lines, part_tokens) in enumerate(self._split(start, lines), 1):
+            self.chunks.append(CodeChunk(
+                symbol if part == 1 else f"{symbol}#{part}",
+                kind, name, part_start, part_start + len(part_lines) - 1,
+                "\n".join(part_lines), part_tokens, parent
+            ))
+
+    def _split(self, start: int, lines: List[str]) -> List[Tuple[int, List[str], int]]:
+        """Fenêtres de lignes consécutives d'au plus max_tokens"""
+        parts = []
+        current: List[str] = []
+        current_start = start
+        current_tokens = 0
+
+        for offset, (line, tokens) in enumerate(zip(lines, count_tokens_many([l + "\n" for l in lines]))):
+            if current and current_tokens + tokens > self.max_tokens:
+                parts.append((current_start, current, current_tokens))
+                current, current_start, current_tokens = [], start + offset, 0
+            current.append(line)
+            current_tokens += tokens
+
+        if current:
+            parts.append((current_start, current, current_tokens))
+        return parts
+
+    def module_chunk(self, tree: ast.Module):
+        """Docstring, imports et instructions top-level hors définitions"""
+        lines = []
+        end = 0
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            if isinstance(node, ast.If) and _is_main_guard(node):
+                continue
+            lines.extend(self.lines[_start_line(node) - 1:node.end_lineno])
+            end = node.end_lineno
+        if lines:
+            self._emit("module", "", 1, end, lines)
+
+    def function_chunk(self, node: ast.AST, prefix: str = "", parent: Optional[str] = None):
+        """Une fonction ou une méthode, source complète"""
+        start = _start_line(node)
+        self._emit(
+            "method" if parent else "function",
+            prefix + node.name,
+            start, node.end_lineno,
+            self.lines[start - 1:node.end_lineno],
+            parent
+        )
+
+    def class_chunks(self, node: ast.ClassDef, prefix: str = "", parent: Optional[str] = None):
+        """En-tête de classe (méthodes réduites à leur signature) puis ses méthodes"""
+        name = prefix + node.name
+        start = _start_line(node)
+        header = list(_signature_lines(node, self.lines))
+        members = []
+
+        for child in node.body:
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                header.extend(_signature_lines(child, self.lines))
+                indent = len(self.lines[child.lineno - 1]) - len(self.lines[child.lineno - 1].lstrip())
+                docstring = ast.get_docstring(child)
+                if docstring:
+                    header.append(" " * (indent + 4) + '"""' + docstring.split("\n")[0] + '"""')
+                header.append(" " * (indent + 4) + "...")
+                members.append(child)
+            elif isinstance(child, ast.ClassDef):
+                header.extend(_signature_lines(child, self.lines))
+                members.append(child)
+            else:
+                header.extend(self.lines[_start_line(child) - 1:child.end_lineno])
+
+        self._emit("class", name, start, node.end_lineno, header, parent)
+        symbol = f"{self.module}:{name}"
+
+        for child in members:
+            if isinstance(child, ast.ClassDef):
+                self.class_chunks(child, name + ".", symbol)
+            else:
+                self.function_chunk(child, name + ".", symbol)
+
+
+def _is_main_guard(node: ast.If) -> bool:
+    """if __name__ == "__main__": (code de démo, pas de la connaissance)"""
+    test = node.test
+    return (
+        isinstance(test, ast.Compare)
+        and isinstance(test.left, ast.Name) and test.left.id == "__name__"
+        and len(test.comparators) == 1
+        and isinstance(test.comparators[0], ast.Constant) and test.comparators[0].value == "__main__"
+    )
+
+
+def chunk_python_source(source: str, relative_path: str, max_tokens: int = 512) -> List[CodeChunk]:
+    """
+    Découpe un fichier Python par symbole
+
+    Args:
+        source: Contenu du fichier
+        relative_path: Chemin relatif à la racine du projet (posix)
+        max_tokens: Taille maximum d'un chunk
+
+    Returns:
+        Chunks dans l'ordre du fichier. Un fichier qui ne parse pas
+        donne un seul chunk module (découpé par max_tokens).
+    """
+    chunker = _Chunker(source, module_name(relative_path), max_tokens)
+
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        chunker._emit("module", "", 1, len(chunker.lines), chunker.lines)
+        return chunker.chunks
+
+    chunker.module_chunk(tree)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            chunker.class_chunks(node)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            chunker.function_chunk(node)
+
+    return chunker.chunks
+
+
+def chunk_python_job(job: Tuple[str, str, int]) -> List[CodeChunk]:
+    """Point d'entrée picklable pour un pool de processus: (source, chemin, max_tokens)"""
+    return chunk_python_source(*job)
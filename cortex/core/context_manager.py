@@ -5,12 +5,15 @@ Fonctionnalités:
 - Git diff pour capturer changements récents
 - Fusion avec contexte ultra-optimisé
 - Jugement de nécessité du contexte (économie de tokens)
-- Cache par embedding pour recherche sémantique
+- Cache par embedding pour recherche sémantique (index mmap, voir context_store)
 - Affichage visible des recherches de cache
+- Assemblage sous budget par ContextPacker (le diff mis en cache n'est pas
+  injecté deux fois)
 """
 
 import subprocess
 import json
+import uuid
 import numpy as np
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
@@ -19,6 +22,9 @@ from dataclasses import dataclass
 
 from cortex.core.llm_client import LLMClient
 from cortex.core.model_router import ModelTier
+from cortex.core.context_store import ContextStore, migrate_json_cache
+from cortex.core.context_packer import ContextPacker, Snippet
+from cortex.core.embeddings import Embedder, get_embedder
 
 
 @dataclass
@@ -38,62 +44,38 @@ class ContextManager:
     def __init__(
         self,
         llm_client: LLMClient,
-        cache_path: str = "cortex/data/context_cache.json"
+        cache_path: str = "cortex/data/context_cache",
+        max_cached_contexts: int = 100000,
+        embedder: Optional[Embedder] = None
     ):
         """
         Initialize Context Manager
 
         Args:
-            llm_client: Client LLM pour génération d'embeddings
-            cache_path: Chemin du cache de contexte
+            llm_client: Client LLM pour le jugement de nécessité du contexte
+            cache_path: Dossier de l'index de contextes (un ancien
+                        context_cache.json est migré automatiquement)
+            max_cached_contexts: Contextes gardés avant éviction des moins utilisés
+            embedder: Encodeur (défaut: encodeur partagé du processus)
         """
         self.llm_client = llm_client
-        self.cache_path = Path(cache_path)
-        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Cache de contextes avec embeddings
-        self.context_cache: List[CachedContext] = []
-        self._load_cache()
-
-    def _load_cache(self):
-        """Charge le cache depuis le fichier"""
-        if self.cache_path.exists():
-            try:
-                with open(self.cache_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for item in data.get('contexts', []):
-                        self.context_cache.append(CachedContext(
-                            id=item['id'],
-                            content=item['content'],
-                            embedding=item['embedding'],
-                            metadata=item['metadata'],
-                            created_at=item['created_at'],
-                            usage_count=item['usage_count']
-                        ))
-            except Exception as e:
-                print(f"Warning: Failed to load context cache: {e}")
-
-    def _save_cache(self):
-        """Sauvegarde le cache dans le fichier"""
+        self.embedder = embedder or get_embedder()
+
+        # Index vectoriel: matrice mmap + métadonnées SQLite
+        path = Path(cache_path)
+        store_path = path.with_suffix("") if path.suffix == ".json" else path
+        self.store = ContextStore(
+            str(store_path),
+            dimensions=self.embedder.dimensions,
+            model=self.embedder.name,
+            max_entries=max_cached_contexts
+        )
+
+        legacy_path = path if path.suffix == ".json" else path.with_suffix(".json")
         try:
-            data = {
-                'contexts': [
-                    {
-                        'id': ctx.id,
-                        'content': ctx.content,
-                        'embedding': ctx.embedding,
-                        'metadata': ctx.metadata,
-                        'created_at': ctx.created_at,
-                        'usage_count': ctx.usage_count
-                    }
-                    for ctx in self.context_cache
-                ],
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(self.cache_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            migrate_json_cache(legacy_path, self.store, self.embedder.embed_many)
         except Exception as e:
-            print(f"Error: Failed to save context cache: {e}")
+            print(f"Warning: Failed to migrate context cache: {e}")
 
     def get_git_diff(
         self,
@@ -196,36 +178,16 @@ Reply JSON only:
         """
         Crée un embedding pour un texte
 
-        Note: Simulation simple avec hashing pour l'instant
-        Dans production, utiliser OpenAI embeddings API
+        Encodeur local partagé (voir cortex/core/embeddings.py): mémoïsé
+        par empreinte du contenu, un texte déjà vu n'est pas ré-encodé.
 
         Args:
             text: Texte à embedder
 
         Returns:
-            Vecteur d'embedding
+            Vecteur d'embedding (norme 1)
         """
-        # Simulation: créer un embedding basé sur les mots-clés
-        # En production, utiliser: openai.Embedding.create(input=text, model="text-embedding-ada-002")
-
-        keywords = ['function', 'class', 'def', 'import', 'error', 'bug', 'fix', 'add', 'remove', 'update']
-        embedding = []
-
-        text_lower = text.lower()
-        for keyword in keywords:
-            # Compter occurrences normalisées
-            count = text_lower.count(keyword)
-            embedding.append(float(count) / (len(text) + 1))
-
-        # Ajouter longueur normalisée
-        embedding.append(len(text) / 10000.0)
-
-        # Normaliser le vecteur
-        norm = np.linalg.norm(embedding)
-        if norm > 0:
-            embedding = (np.array(embedding) / norm).tolist()
-
-        return embedding
+        return self.embedder.embed(text).tolist()
 
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """Calcule la similarité cosinus entre deux vecteurs"""
@@ -250,6 +212,9 @@ Reply JSON only:
         """
         Recherche dans le cache par similarité d'embedding
 
+        Un seul produit matrice-vecteur sur l'index (lignes pré-normalisées),
+        puis sélection top-k par argpartition.
+
         Args:
             query: Requête de recherche
             top_k: Nombre de résultats à retourner
@@ -258,24 +223,14 @@ Reply JSON only:
         Returns:
             Liste de (context, similarity_score) triée par similarité
         """
-        if not self.context_cache:
-            return []
-
-        # Créer embedding de la requête
-        query_embedding = self.create_embedding(query)
-
-        # Calculer similarités
-        results = []
-        for cached_ctx in self.context_cache:
-            similarity = self.cosine_similarity(query_embedding, cached_ctx.embedding)
-
-            if similarity >= threshold:
-                results.append((cached_ctx, similarity))
-
-        # Trier par similarité décroissante
-        results.sort(key=lambda x: x[1], reverse=True)
+        hits = self.store.search(self.create_embedding(query), top_k=top_k, threshold=threshold)
+        records = self.store.get_rows([row for row, _ in hits])
 
-        return results[:top_k]
+        return [
+            (CachedContext(**records[row]), similarity)
+            for row, similarity in hits
+            if row in records
+        ]
 
     def add_to_cache(
         self,
@@ -292,7 +247,7 @@ Reply JSON only:
         Returns:
             CachedContext créé
         """
-        ctx_id = f"ctx_{len(self.context_cache) + 1}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        ctx_id = f"ctx_{uuid.uuid4().hex[:12]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         embedding = self.create_embedding(content)
 
         cached_ctx = CachedContext(
@@ -304,11 +259,15 @@ Reply JSON only:
             usage_count=0
         )
 
-        self.context_cache.append(cached_ctx)
-        self._save_cache()
+        # Ajout seul: une ligne de matrice + une ligne SQLite
+        self.store.add(ctx_id, content, embedding, cached_ctx.metadata, cached_ctx.created_at)
 
         return cached_ctx
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Statistiques du cache de contextes (taille, usage, plus utilisé)"""
+        return self.store.get_stats()
+
     def build_optimized_context(
         self,
         user_request: str,
@@ -324,9 +283,10 @@ Reply JSON only:
             max_tokens: Budget de tokens maximum
 
         Returns:
-            Dict avec contexte optimisé et métadonnées
+            Dict avec contexte optimisé et métadonnées (manifest: extraits
+            retenus ou écartés par ContextPacker)
         """
-        context_parts = []
+        snippets = []
         metadata = {
             'git_diff_included': False,
             'cache_hits': [],
@@ -348,7 +308,7 @@ Reply JSON only:
 
         # 2. Chercher dans le cache par embedding
         print(f"🔍 Searching cache by embedding similarity...")
-        cache_results = self.search_cache_by_embedding(user_request, top_k=2)
+        cache_results = self.search_cache_by_embedding(user_request, top_k=5)
 
         if cache_results:
             print(f"✓ Found {len(cache_results)} relevant cached contexts:")
@@ -360,14 +320,13 @@ Reply JSON only:
                     'metadata': cached_ctx.metadata
                 })
 
-                # Ajouter au contexte
-                context_parts.append(f"# Cached Context (similarity: {similarity:.2f})")
-                context_parts.append(cached_ctx.content[:500])  # Limiter taille
-
-                # Incrémenter usage
-                cached_ctx.usage_count += 1
-
-            self._save_cache()
+                snippets.append(Snippet(
+                    content=cached_ctx.content,
+                    relevance=similarity,
+                    source=cached_ctx.id,
+                    kind='cache',
+                    header=f"# Cached Context (similarity: {similarity:.2f})"
+                ))
         else:
             print("  No relevant cache found")
 
@@ -378,9 +337,14 @@ Reply JSON only:
 
             if git_diff:
                 print(f"✓ Git diff available ({len(git_diff)} chars)")
-                context_parts.append("# Recent Changes (git diff)")
-                context_parts.append(git_diff[:1000])  # Limiter à 1000 chars
-                metadata['git_diff_included'] = True
+                # Changements en cours: plus pertinents que tout contexte en cache
+                snippets.append(Snippet(
+                    content=git_diff,
+                    relevance=1.0,
+                    source='git_diff',
+                    kind='git_diff',
+                    header="# Recent Changes (git diff)"
+                ))
 
                 # Mettre en cache ce diff
                 self.add_to_cache(
@@ -394,11 +358,17 @@ Reply JSON only:
             else:
                 print("  No git changes detected")
 
-        # 4. Fusionner le contexte
-        final_context = "\n\n".join(context_parts)
+        # 4. Sélection sous budget (extrait max: moitié du budget, pour garder de la variété)
+        packed = ContextPacker(max_snippet_tokens=max_tokens // 2).pack(snippets, max_tokens)
+        included = {entry['source'] for entry in packed.included}
+        metadata['git_diff_included'] = 'git_diff' in included
+        metadata['cache_hits'] = [hit for hit in metadata['cache_hits'] if hit['id'] in included]
+        metadata['tokens'] = packed.tokens
+        metadata['manifest'] = packed.manifest
+        self.store.increment_usage([hit['id'] for hit in metadata['cache_hits']])
 
         return {
-            'context': final_context,
+            'context': packed.text,
             'metadata': metadata,
             'message': 'Context built successfully'
         }
@@ -416,7 +386,7 @@ if __name__ == "__main__":
     print("Testing Context Manager...")
 
     client = LLMClient()
-    ctx_mgr = ContextManager(client, "cortex/data/test_context_cache.json")
+    ctx_mgr = ContextManager(client, "cortex/data/test_context_cache")
 
     # Test 1: Jugement de nécessité
     print("\n1. Testing context necessity judgment...")
@@ -454,7 +424,7 @@ if __name__ == "__main__":
         content="Authentication bug fixed in login.py by adding JWT validation",
         metadata={'type': 'bugfix', 'file': 'login.py'}
     )
-    print(f"✓ Added to cache (total: {len(ctx_mgr.context_cache)} contexts)")
+    print(f"✓ Added to cache (total: {len(ctx_mgr.store)} contexts)")
 
     # Test 4: Recherche par embedding
     print("\n4. Testing cache search...")
@@ -0,0 +1,379 @@
+"""
+Context Packer - Sélection du contexte sous budget de tokens
+
+Partagé par les constructeurs de contexte (SmartContextBuilder,
+ContextManager, ConversationManager, DynamicContextManager):
+- Comptage exact des tokens avec l'encodeur tiktoken du modèle (mis en
+  cache, voir token_counter)
+- Doublons retirés avant sélection: contenu identique, extrait contenu
+  dans un extrait plus pertinent, lignes de recouvrement en début/fin
+  d'extrait (fenêtres glissantes) rognées
+- Sélection = sac à dos 0/1: maximise la pertinence totale sous le budget
+  (programmation dynamique sur les tokens, par pas de budget/resolution)
+  au lieu d'un remplissage glouton dans l'ordre d'arrivée
+- Résultat: texte assemblé dans l'ordre d'entrée + manifeste
+  (un statut par candidat: inclus, rogné, tronqué, doublon, hors budget)
+
+Usage:
+    packer = ContextPacker(model="gpt-4o-mini")
+    packed = packer.pack([
+        Snippet(base_context, required=True),
+        Snippet(code, relevance=0.8, source="cortex/core/llm_client.py", header="[CODE] llm_client.py"),
+    ], budget=900)
+    packed.text, packed.tokens, packed.manifest
+"""
+
+import math
+import re
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from cortex.core.token_counter import (
+    count_tokens, count_tokens_many, encoding_for_model, truncate_to_tokens
+)
+
+
+# Statuts du manifeste
+INCLUDED = "included"
+TRIMMED = "trimmed"          # Inclus, lignes déjà présentes ailleurs retirées
+TRUNCATED = "truncated"      # Inclus, coupé à max_snippet_tokens (ou au budget si requis)
+DUPLICATE = "duplicate"
+OVER_BUDGET = "over_budget"
+LOW_RELEVANCE = "low_relevance"
+
+_SHINGLE_WORDS = 5
+_MIN_OVERLAP_LINE = 16  # Lignes plus courtes ("}", "return x") jamais considérées comme recouvrement
+_WORD = re.compile(r"\w+")
+
+
+@dataclass
+class Snippet:
+    """Un extrait candidat"""
+    content: str
+    relevance: float = 0.5
+    source: str = ""
+    kind: str = ""
+    header: str = ""  # Ligne d'en-tête (comptée dans le budget, ignorée pour les doublons)
+    required: bool = False  # Toujours inclus (tronqué si le budget ne suffit pas)
+    data: Any = None  # Objet d'origine (message, contexte...) rendu tel quel à l'appelant
+
+    def render(self) -> str:
+        return f"{self.header}\n{self.content}" if self.header else self.content
+
+
+@dataclass
+class PackedContext:
+    """Contexte assemblé et manifeste de la sélection"""
+    text: str
+    tokens: int
+    budget: int
+    snippets: List[Snippet]  # Extraits retenus (après rognage), ordre d'entrée
+    manifest: List[Dict[str, Any]] = field(default_factory=list)  # Un par candidat, ordre d'entrée
+
+    @property
+    def included(self) -> List[Dict[str, Any]]:
+        return [entry for entry in self.manifest if entry["included"]]
+
+    @property
+    def dropped(self) -> List[Dict[str, Any]]:
+        return [entry for entry in self.manifest if not entry["included"]]
+
+    @property
+    def relevance(self) -> float:
+        """Pertinence totale retenue"""
+        return sum(entry["relevance"] for entry in self.included)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "included": len(self.included),
+            "dropped": len(self.dropped),
+            "manifest": self.manifest
+        }
+
+
+class _Candidate:
+    __slots__ = ("index", "snippet", "content", "original_tokens", "tokens", "status", "duplicate_of")
+
+    def __init__(self, index: int, snippet: Snippet):
+        self.index = index
+        self.snippet = snippet
+        self.content = snippet.content
+        self.original_tokens = 0
+        self.tokens = 0
+        self.status = INCLUDED
+        self.duplicate_of: Optional[int] = None
+
+    def render(self) -> str:
+        header = self.snippet.header
+        return f"{header}\n{self.content}" if header else self.content
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _shingles(text: str) -> set:
+    """Empreintes des n-grammes de mots (texte court: une seule empreinte)"""
+    words = _WORD.findall(text.lower())
+    if len(words) <= _SHINGLE_WORDS:
+        return {zlib.crc32(" ".join(words).encode())} if words else set()
+    return {
+        zlib.crc32(" ".join(words[i:i + _SHINGLE_WORDS]).encode())
+        for i in range(len(words) - _SHINGLE_WORDS + 1)
+    }
+
+
+class ContextPacker:
+    """Sélectionne et assemble des extraits sous un budget de tokens"""
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        separator: str = "\n\n",
+        max_snippet_tokens: Optional[int] = None,
+        min_relevance: float = 0.0,
+        dedupe_threshold: float = 0.8,
+        resolution: int = 1000,
+        dedupe: bool = True,
+        trim_overlap: bool = True
+    ):
+        """
+        Args:
+            model: Modèle cible (choisit l'encodage tiktoken)
+            separator: Séparateur entre extraits
+            max_snippet_tokens: Taille max d'un extrait non requis (tronqué au-delà)
+            min_relevance: Pertinence minimale d'un extrait non requis
+            dedupe_threshold: Part des n-grammes d'un extrait déjà couverte
+                par un extrait plus pertinent au-delà de laquelle il est écarté
+            resolution: Nombre de pas de la programmation dynamique
+                (poids arrondis au pas supérieur: le budget n'est jamais dépassé)
+            dedupe: Retirer doublons et recouvrements (False pour des messages
+                de conversation, à garder tels quels)
+            trim_overlap: Rogner les lignes de début/fin déjà présentes (False
+                pour des extraits issus d'un même gabarit, dont l'en-tête se répète)
+        """
+        self.encoding = encoding_for_model(model)
+        self.separator = separator
+        self.max_snippet_tokens = max_snippet_tokens
+        self.min_relevance = min_relevance
+        self.dedupe_threshold = dedupe_threshold
+        self.resolution = resolution
+        self.dedupe = dedupe
+        self.trim_overlap = trim_overlap
+
+    def count(self, text: str) -> int:
+        """Nombre de tokens d'un texte pour le modèle du packer"""
+        return count_tokens(text, self.encoding)
+
+    def pack(self, snippets: List[Snippet], budget: int) -> PackedContext:
+        """
+        Sélectionne les extraits maximisant la pertinence totale sous le budget
+
+        Args:
+            snippets: Candidats, dans l'ordre de mise en page voulu
+            budget: Tokens max du texte assemblé (séparateurs compris)
+
+        Returns:
+            PackedContext (texte, tokens, extraits retenus, manifeste)
+        """
+        candidates = [_Candidate(i, snippet) for i, snippet in enumerate(snippets)]
+        for candidate in candidates:
+            if not candidate.snippet.required and candidate.snippet.relevance < self.min_relevance:
+                candidate.status = LOW_RELEVANCE
+
+        if self.dedupe:
+            self._dedupe(candidates)
+        active = [c for c in candidates if c.status in (INCLUDED, TRIMMED)]
+
+        counts = count_tokens_many([c.render() for c in active], self.encoding)
+        for candidate, tokens in zip(active, counts):
+            candidate.original_tokens = candidate.tokens = tokens
+            limit = self.max_snippet_tokens
+            if limit and not candidate.snippet.required and tokens > limit:
+                self._truncate(candidate, limit)
+
+        separator_tokens = self.count(self.separator) if self.separator else 0
+
+        # Extraits requis d'abord (tronqués si le budget ne suffit pas)
+        remaining = budget
+        selected = []
+        for candidate in (c for c in active if c.snippet.required):
+            cost = candidate.tokens + (separator_tokens if selected else 0)
+            if cost > remaining:
+                self._truncate(candidate, max(remaining - (separator_tokens if selected else 0), 0))
+                cost = candidate.tokens + (separator_tokens if selected else 0)
+            if candidate.tokens == 0:
+                candidate.status = OVER_BUDGET
+                continue
+            selected.append(candidate)
+            remaining -= cost
+
+        optional = [c for c in active if not c.snippet.required]
+        weights = [c.tokens + separator_tokens for c in optional]
+
+        # Vérification sur le texte assemblé: les fusions BPE (ou l'arrondi de
+        # l'estimation) aux jonctions peuvent ajouter quelques tokens → on
+        # retire le dépassement de la capacité et on relance la sélection
+        for _ in range(3):
+            chosen = self._knapsack(optional, weights, remaining)
+            ordered = sorted(selected + chosen, key=lambda c: c.index)
+            text = self.separator.join(c.render() for c in ordered)
+            tokens = self.count(text)
+            if tokens <= budget or not chosen:
+                break
+            remaining -= tokens - budget
+
+        for candidate in optional:
+            if candidate not in chosen:
+                candidate.status = OVER_BUDGET
+        selected = ordered
+
+        while tokens > budget:
+            droppable = [c for c in selected if not c.snippet.required]
+            if not droppable:
+                break
+            worst = min(droppable, key=lambda c: c.snippet.relevance / max(c.tokens, 1))
+            worst.status = OVER_BUDGET
+            selected.remove(worst)
+            text = self.separator.join(c.render() for c in selected)
+            tokens = self.count(text)
+
+        kept = set(id(c) for c in selected)
+        manifest = []
+        for candidate in candidates:
+            snippet = candidate.snippet
+            entry = {
+                "index": candidate.index,
+                "source": snippet.source,
+                "kind": snippet.kind,
+                "relevance": round(snippet.relevance, 4),
+                "tokens": candidate.tokens,
+                "original_tokens": candidate.original_tokens,
+                "included": id(candidate) in kept,
+                "status": candidate.status
+            }
+            if candidate.duplicate_of is not None:
+                entry["duplicate_of"] = candidate.duplicate_of
+            manifest.append(entry)
+
+        return PackedContext(
+            text=text,
+            tokens=tokens,
+            budget=budget,
+            snippets=[
+                Snippet(content=c.content, relevance=c.snippet.relevance, source=c.snippet.source,
+                        kind=c.snippet.kind, header=c.snippet.header, required=c.snippet.required,
+                        data=c.snippet.data)
+                for c in selected
+            ],
+            manifest=manifest
+        )
+
+    # ------------------------------------------------------------ Doublons
+
+    def _dedupe(self, candidates: List[_Candidate]):
+        """
+        Écarte les extraits couverts par un extrait plus pertinent et rogne
+        les lignes de recouvrement en début/fin (requis traités en premier)
+        """
+        order = sorted(
+            (c for c in candidates if c.status == INCLUDED),
+            key=lambda c: (not c.snippet.required, -c.snippet.relevance, c.index)
+        )
+        seen_texts: Dict[str, int] = {}
+        shingle_owner: Dict[int, int] = {}
+        seen_lines: set = set()
+
+        for candidate in order:
+            normalized = _normalize(candidate.content)
+            if normalized in seen_texts:
+                candidate.status, candidate.duplicate_of = DUPLICATE, seen_texts[normalized]
+                continue
+
+            shingles = _shingles(candidate.content)
+            if shingles and not candidate.snippet.required:
+                overlap = Counter(shingle_owner[s] for s in shingles if s in shingle_owner)
+                if overlap:
+                    owner, shared = overlap.most_common(1)[0]
+                    if shared / len(shingles) >= self.dedupe_threshold:
+                        candidate.status, candidate.duplicate_of = DUPLICATE, owner
+                        continue
+                if self.trim_overlap:
+                    self._trim_overlap(candidate, seen_lines)
+                if not candidate.content.strip():
+                    candidate.status = DUPLICATE
+                    continue
+
+            seen_texts[normalized] = candidate.index
+            for shingle in _shingles(candidate.content):
+                shingle_owner.setdefault(shingle, candidate.index)
+            seen_lines.update(
+                line.strip() for line in candidate.content.splitlines()
+                if len(line.strip()) >= _MIN_OVERLAP_LINE
+            )
+
+    def _trim_overlap(self, candidate: _Candidate, seen_lines: set):
+        """Retire les lignes de début/fin déjà présentes (chevauchement de fenêtres)"""
+        lines = candidate.content.splitlines()
+
+        def overlapping(line: str) -> bool:
+            stripped = line.strip()
+            return not stripped or (len(stripped) >= _MIN_OVERLAP_LINE and stripped in seen_lines)
+
+        start = 0
+        while start < len(lines) and overlapping(lines[start]):
+            start += 1
+        end = len(lines)
+        while end > start and overlapping(lines[end - 1]):
+            end -= 1
+
+        # Seuls les blancs en bordure: rien à signaler
+        trimmed = [l for l in lines[:start] + lines[end:] if l.strip()]
+        if trimmed:
+            candidate.content = "\n".join(lines[start:end])
+            candidate.status = TRIMMED
+
+    # ----------------------------------------------------------- Sélection
+
+    def _truncate(self, candidate: _Candidate, max_tokens: int):
+        header = candidate.snippet.header
+        header_tokens = self.count(header + "\n") if header else 0
+        candidate.content = truncate_to_tokens(candidate.content, max_tokens - header_tokens, self.encoding)
+        candidate.tokens = self.count(candidate.render()) if candidate.content else 0
+        candidate.status = TRUNCATED
+
+    def _knapsack(self, candidates: List[_Candidate], weights: List[int], capacity: int) -> List[_Candidate]:
+        """Sac à dos 0/1 (valeur = pertinence, poids = tokens)"""
+        items = [(c, w) for c, w in zip(candidates, weights) if 0 < w <= capacity and c.snippet.relevance > 0]
+        if not items or capacity <= 0:
+            return []
+        if sum(w for _, w in items) <= capacity:
+            return [c for c, _ in items]
+
+        unit = max(1, math.ceil(capacity / self.resolution))
+        steps = capacity // unit
+        best = np.zeros(steps + 1)
+        keep = np.zeros((len(items), steps + 1), dtype=bool)
+        quantized = [math.ceil(w / unit) for _, w in items]
+
+        for i, ((candidate, _), w) in enumerate(zip(items, quantized)):
+            if w > steps:
+                continue
+            with_item = best[:steps + 1 - w] + candidate.snippet.relevance
+            better = with_item > best[w:]
+            keep[i, w:] = better
+            best[w:] = np.where(better, with_item, best[w:])
+
+        chosen = []
+        c = int(np.argmax(best))
+        for i in range(len(items) - 1, -1, -1):
+            if keep[i, c]:
+                chosen.append(items[i][0])
+                c -= quantized[i]
+        return chosen
@@ -0,0 +1,463 @@
+"""
+Context Store - Index vectoriel du cache de contextes (ContextManager)
+
+Remplace le fichier JSON réécrit en entier à chaque insertion:
+- Matrice float32 contiguë memory-mappée (vectors.f32), un vecteur par contexte
+- Vecteurs pré-normalisés: cosinus = un produit matrice-vecteur, top-k par
+  argpartition (pas de tri complet, pas d'objet Python par contexte)
+- Insertions en ajout seul: la matrice grandit par doublement de capacité,
+  les métadonnées (contenu, usage) vont dans SQLite
+- Suppressions par pierre tombale, compactées quand elles dépassent une
+  fraction de la matrice
+
+La matrice est stockée par dimension (dimensions × capacité): avec des
+embeddings courts, le produit parcourt des colonnes contiguës et coûte
+deux fois moins qu'en stockage ligne par ligne.
+
+Le vecteur d'une ligne n'est visible qu'une fois sa ligne SQLite validée:
+après un arrêt brutal, les vecteurs écrits sans métadonnées sont ignorés.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class ContextStore:
+    """
+    Matrice d'embeddings mmap + métadonnées SQLite
+
+    Les lignes mortes (supprimées ou évincées) restent dans la matrice
+    jusqu'à la compaction; elles sont exclues des recherches.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dimensions: int,
+        model: str = "",
+        max_entries: int = 100000,
+        compaction_ratio: float = 0.25,
+        initial_capacity: int = 1024
+    ):
+        """
+        Args:
+            path: Dossier de l'index (vectors.f32 + contexts.db)
+            dimensions: Dimensions des embeddings
+            model: Nom du modèle d'embedding (un changement vide l'index)
+            max_entries: Contextes vivants max (au-delà, éviction des moins utilisés)
+            compaction_ratio: Fraction de lignes mortes déclenchant la compaction
+            initial_capacity: Lignes allouées à la création de la matrice
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self.dimensions = dimensions
+        self.model = model
+        self.max_entries = max_entries
+        self.compaction_ratio = compaction_ratio
+        self.initial_capacity = initial_capacity
+
+        self._lock = threading.Lock()
+        self._vectors_path = self.path / "vectors.f32"
+
+        self.db = sqlite3.connect(str(self.path / "contexts.db"), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS contexts (
+                row INTEGER PRIMARY KEY,
+                id TEXT UNIQUE NOT NULL,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                usage_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_contexts_usage ON contexts(usage_count, row)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.db.commit()
+
+        self._open_matrix()
+
+    # ------------------------------------------------------------- stockage
+
+    def _open_matrix(self):
+        """Ouvre la matrice et reconstruit l'état en mémoire depuis SQLite"""
+        stored = dict(self.db.execute("SELECT key, value FROM meta").fetchall())
+        expected = {"dimensions": str(self.dimensions), "model": self.model}
+        row_bytes = self.dimensions * 4
+
+        if stored and stored != expected:
+            # Autre modèle d'embedding: l'index n'est plus comparable
+            self.db.execute("DELETE FROM contexts")
+            if self._vectors_path.exists():
+                self._vectors_path.unlink()
+
+        self.db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", expected.items())
+        self.db.commit()
+
+        if not self._vectors_path.exists() or self._vectors_path.stat().st_size < row_bytes:
+            with open(self._vectors_path, "wb") as f:
+                f.truncate(self.initial_capacity * row_bytes)
+
+        self.capacity = self._vectors_path.stat().st_size // row_bytes
+        self.vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+", shape=(self.dimensions, self.capacity)
+        )
+
+        rows = np.array([r for (r,) in self.db.execute("SELECT row FROM contexts")], dtype=np.int64)
+        self.count = int(rows.max()) + 1 if rows.size else 0
+        self._alive = np.zeros(self.capacity, dtype=bool)
+        self._alive[rows] = True
+        self._refresh_dead()
+
+        self._scores = np.empty(self.capacity, dtype=np.float32)
+
+    def _refresh_dead(self):
+        """Index des lignes mortes parmi les lignes utilisées"""
+        self._dead = np.flatnonzero(~self._alive[:self.count])
+
+    def _grow(self, needed: int):
+        """Double la capacité de la matrice (copie amortie, remplacement atomique)"""
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+
+        tmp_path = self._vectors_path.with_suffix(".f32.tmp")
+        grown = np.memmap(tmp_path, dtype=np.float32, mode="w+", shape=(self.dimensions, capacity))
+        grown[:, :self.count] = self.vectors[:, :self.count]
+        grown.flush()
+        del grown, self.vectors
+        os.replace(tmp_path, self._vectors_path)
+
+        self.vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+", shape=(self.dimensions, capacity)
+        )
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self.capacity] = self._alive
+        self._alive = alive
+        self._scores = np.empty(capacity, dtype=np.float32)
+        self.capacity = capacity
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """Normalise chaque ligne (les vecteurs nuls restent nuls)"""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+    # ---------------------------------------------------------------- écriture
+
+    def add_many(self, items: List[Dict[str, Any]]) -> List[int]:
+        """
+        Ajoute des contextes en une transaction
+
+        Un id présent plusieurs fois dans le lot n'est écrit qu'une fois
+        (la dernière occurrence l'emporte), avant toute écriture de vecteur.
+
+        Args:
+            items: Dicts avec id, content, embedding, metadata, created_at
+                   et usage_count (optionnel)
+
+        Returns:
+            Ligne attribuée à chaque item (même ligne pour un id répété)
+        """
+        if not items:
+            return []
+
+        last = {item["id"]: index for index, item in enumerate(items)}
+        order = list(last.values()) if len(last) < len(items) else None
+        requested = [item["id"] for item in items]
+        if order is not None:
+            items = [items[index] for index in sorted(order)]
+
+        vectors = self._normalize([item["embedding"] for item in items])
+
+        with self._lock:
+            start = self.count
+            end = start + len(items)
+            if end > self.capacity:
+                self._grow(end)
+
+            self.vectors[:, start:end] = vectors.T
+            rows = list(range(start, end))
+
+            with self.db:
+                # Un id réinséré remplace l'ancienne ligne
+                replaced = self._delete_ids([(item["id"],) for item in items])
+                self.db.executemany(
+                    "INSERT INTO contexts VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (row, item["id"], item["content"], json.dumps(item.get("metadata") or {}),
+                         item.get("created_at") or datetime.now().isoformat(), item.get("usage_count", 0))
+                        for row, item in zip(rows, items)
+                    ]
+                )
+
+            self.count = end
+            self._alive[start:end] = True
+            self._alive[replaced] = False
+            self._refresh_dead()
+
+            self._evict_overflow()
+            self._refresh_dead()
+            self._maybe_compact()
+
+        if order is not None:
+            row_of = {item["id"]: row for item, row in zip(items, rows)}
+            rows = [row_of[ctx_id] for ctx_id in requested]
+        return rows
+
+    def add(
+        self,
+        ctx_id: str,
+        content: str,
+        embedding: List[float],
+        metadata: Optional[Dict[str, Any]] = None,
+        created_at: Optional[str] = None
+    ) -> int:
+        """Ajoute un contexte et retourne sa ligne"""
+        return self.add_many([{
+            "id": ctx_id, "content": content, "embedding": embedding,
+            "metadata": metadata, "created_at": created_at
+        }])[0]
+
+    def _delete_ids(self, ids: List[Tuple[str]]) -> List[int]:
+        """Supprime des contextes par id et retourne leurs lignes"""
+        rows = []
+        for (ctx_id,) in ids:
+            found = self.db.execute("SELECT row FROM contexts WHERE id = ?", (ctx_id,)).fetchone()
+            if found:
+                rows.append(found[0])
+                self.db.execute("DELETE FROM contexts WHERE row = ?", found)
+        return rows
+
+    def remove(self, ctx_id: str) -> bool:
+        """Supprime un contexte (pierre tombale jusqu'à la compaction)"""
+        with self._lock:
+            with self.db:
+                rows = self._delete_ids([(ctx_id,)])
+            if not rows:
+                return False
+            self._alive[rows] = False
+            self._refresh_dead()
+            self._maybe_compact()
+        return True
+
+    def increment_usage(self, ctx_ids: List[str]):
+        """Incrémente le compteur d'utilisation des contextes servis"""
+        if not ctx_ids:
+            return
+        with self._lock, self.db:
+            self.db.executemany(
+                "UPDATE contexts SET usage_count = usage_count + 1 WHERE id = ?",
+                [(ctx_id,) for ctx_id in ctx_ids]
+            )
+
+    def _evict_overflow(self):
+        """Évince les contextes les moins utilisés (puis les plus anciens) au-delà de max_entries"""
+        overflow = self.count - len(self._dead) - self.max_entries
+        if overflow <= 0:
+            return
+
+        with self.db:
+            rows = [r for (r,) in self.db.execute(
+                "SELECT row FROM contexts ORDER BY usage_count ASC, row ASC LIMIT ?", (overflow,)
+            )]
+            self.db.executemany("DELETE FROM contexts WHERE row = ?", [(r,) for r in rows])
+        self._alive[rows] = False
+
+    def _maybe_compact(self):
+        """Compacte si la fraction de lignes mortes dépasse le seuil"""
+        if self.count and len(self._dead) > self.compaction_ratio * self.count:
+            self._compact()
+
+    def _compact(self):
+        """
+        Réécrit la matrice sans les lignes mortes
+
+        Les lignes vivantes gardent leur ordre: la renumérotation SQLite en
+        ordre croissant ne crée jamais de collision (nouvelle ligne <= ancienne).
+        """
+        alive_rows = np.flatnonzero(self._alive[:self.count])
+        live = np.array(self.vectors[:, alive_rows])
+
+        with self.db:
+            self.db.executemany(
+                "UPDATE contexts SET row = ? WHERE row = ?",
+                [(new, int(old)) for new, old in enumerate(alive_rows) if new != old]
+            )
+            self.vectors[:, :len(alive_rows)] = live
+            self.vectors[:, len(alive_rows):self.count] = 0
+            self.vectors.flush()
+
+        self.count = len(alive_rows)
+        self._alive[:] = False
+        self._alive[:self.count] = True
+        self._refresh_dead()
+
+    def compact(self):
+        """Force la compaction"""
+        with self._lock:
+            self._compact()
+
+    # ---------------------------------------------------------------- lecture
+
+    def search(
+        self,
+        embedding: List[float],
+        top_k: int = 3,
+        threshold: float = 0.5
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k par similarité cosinus
+
+        Args:
+            embedding: Vecteur de requête (normalisé ici)
+            top_k: Nombre de résultats
+            threshold: Similarité minimum
+
+        Returns:
+            [(ligne, similarité)] triés par similarité décroissante
+        """
+        query = self._normalize(embedding)[0]
+
+        with self._lock:
+            n = self.count
+            if n == 0 or top_k <= 0:
+                return []
+
+            scores = self._scores[:n]
+            np.matmul(query, self.vectors[:, :n], out=scores)
+            if self._dead.size:
+                scores[self._dead] = -np.inf
+
+            # Peu de lignes au-dessus du seuil: sélection parmi elles seulement
+            above = scores >= threshold
+            matches = int(np.count_nonzero(above))
+            if matches * 8 < n:
+                candidates = np.flatnonzero(above)
+                if matches > top_k:
+                    candidates = candidates[np.argpartition(scores[candidates], matches - top_k)[-top_k:]]
+            elif n > top_k:
+                candidates = np.argpartition(scores, n - top_k)[-top_k:]
+            else:
+                candidates = np.arange(n)
+
+            order = np.argsort(-scores[candidates], kind="stable")
+            return [
+                (int(candidates[i]), float(scores[candidates[i]]))
+                for i in order
+                if scores[candidates[i]] >= threshold
+            ]
+
+    def get_rows(self, rows: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Métadonnées des lignes demandées"""
+        if not rows:
+            return {}
+        placeholders = ",".join("?" * len(rows))
+        with self._lock:
+            records = self.db.execute(
+                f"SELECT row, id, content, metadata, created_at, usage_count "
+                f"FROM contexts WHERE row IN ({placeholders})",
+                rows
+            ).fetchall()
+            return {
+                row: {
+                    "id": ctx_id,
+                    "content": content,
+                    "metadata": json.loads(metadata),
+                    "created_at": created_at,
+                    "usage_count": usage_count,
+                    "embedding": self.vectors[:, row].tolist()
+                }
+                for row, ctx_id, content, metadata, created_at, usage_count in records
+            }
+
+    def __len__(self) -> int:
+        return self.count - len(self._dead)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Taille, usage cumulé et contexte le plus utilisé"""
+        with self._lock:
+            total_usage = self.db.execute("SELECT COALESCE(SUM(usage_count), 0) FROM contexts").fetchone()[0]
+            most_used = self.db.execute(
+                "SELECT id, usage_count, metadata FROM contexts ORDER BY usage_count DESC, row ASC LIMIT 1"
+            ).fetchone()
+
+        return {
+            "total_contexts": len(self),
+            "total_usage": total_usage,
+            "dead_rows": int(self._dead.size),
+            "capacity": self.capacity,
+            "most_used": {
+                "id": most_used[0],
+                "usage_count": most_used[1],
+                "metadata": json.loads(most_used[2])
+            } if most_used else None
+        }
+
+    def flush(self):
+        """Force l'écriture de la matrice sur disque"""
+        with self._lock:
+            self.vectors.flush()
+
+    def close(self):
+        """Écrit la matrice et ferme SQLite"""
+        with self._lock:
+            self.vectors.flush()
+            self.db.close()
+
+    def clear(self):
+        """Vide l'index"""
+        with self._lock:
+            with self.db:
+                self.db.execute("DELETE FROM contexts")
+            self.vectors[:, :self.count] = 0
+            self.vectors.flush()
+            self.count = 0
+            self._alive[:] = False
+            self._refresh_dead()
+
+
+def migrate_json_cache(
+    json_path: Path,
+    store: ContextStore,
+    embed_many: Optional[Callable[[List[str]], np.ndarray]] = None
+) -> int:
+    """
+    Importe l'ancien cache JSON (context_cache.json) dans le store
+
+    Le fichier est renommé en .migrated une fois importé.
+
+    Args:
+        json_path: Ancien fichier JSON
+        store: Index cible
+        embed_many: Ré-encode les contenus (embeddings d'un autre modèle);
+                    sans encodeur, seuls les embeddings de bonne dimension sont gardés
+
+    Returns:
+        Nombre de contextes importés
+    """
+    if not json_path.exists():
+        return 0
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        contexts = json.load(f).get("contexts", [])
+
+    if embed_many is not None and contexts:
+        vectors = embed_many([c["content"] for c in contexts])
+        items = [{**c, "embedding": vector} for c, vector in zip(contexts, vectors)]
+    else:
+        items = [c for c in contexts if len(c.get("embedding", [])) == store.dimensions]
+    store.add_many(items)
+    os.replace(json_path, json_path.with_suffix(json_path.suffix + ".migrated"))
+    return len(items)
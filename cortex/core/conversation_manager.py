@@ -1,32 +1,45 @@
 """
 Conversation Manager - Gestion intelligente de l'historique avec résumés
 
-Système de résumé hiérarchique:
-- Sections de 5000 tokens → résumé automatique de section
-- Quand toutes sections atteignent 10k tokens → résumé global + nouvelle section
+Système de résumé hiérarchique et incrémental:
+- Messages → sections de 5000 tokens; une section pleine est close et
+  résumée une seule fois (niveau 1)
+- Quand les sections résumées non encore intégrées totalisent 10k tokens,
+  leurs résumés sont fusionnés dans le résumé global (niveau 2): seul le
+  résumé global précédent et les nouveaux résumés sont relus
 - Garde trace des nouveaux messages non-résumés
+
+Stockage: journal JSONL en ajout seul (un message = une ligne, avec son
+nombre de tokens), jamais réécrit. Les résumés tournent dans un thread de
+fond: add_message ne bloque jamais sur un appel LLM. Un résumé de section en
+échec est re-planifié au message suivant (sinon la fusion globale, qui suit
+l'ordre des sections, resterait bloquée).
 """
 
 import json
-import tiktoken
+import queue
+import threading
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 
 from cortex.core.llm_client import LLMClient
 from cortex.core.model_router import ModelTier
+from cortex.core.context_packer import ContextPacker, Snippet
+from cortex.core.token_counter import count_tokens
 
 
 @dataclass
 class ConversationSection:
     """Une section de conversation avec son résumé"""
     id: str
-    messages: List[Dict[str, str]]  # Messages bruts
+    messages: List[Dict[str, str]]  # Messages bruts (libérés une fois la section résumée)
     summary: Optional[str]  # Résumé de cette section (None si pas encore résumé)
     token_count: int  # Nombre de tokens dans cette section
     created_at: str
     summarized_at: Optional[str] = None
+    message_tokens: List[int] = field(default_factory=list)  # Tokens par message (cache)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convertit en dict pour JSON"""
@@ -44,38 +57,63 @@ class ConversationManager:
 
     Architecture:
     - Sections de ~5000 tokens (nouvelle conversation active)
-    - Quand section atteint 5000 tokens → résumé + nouvelle section
-    - Quand toutes sections totalisent 10k tokens → résumé global
+    - Quand section atteint 5000 tokens → close, résumée en arrière-plan
+    - Quand les sections résumées totalisent 10k tokens → fusion dans le résumé global
     """
 
     SECTION_TOKEN_THRESHOLD = 5000  # Seuil pour résumer une section
     GLOBAL_TOKEN_THRESHOLD = 10000  # Seuil pour résumé global
+    SUMMARY_SHARE = 0.4  # Part max du budget de contexte réservée aux résumés
 
     def __init__(
         self,
         llm_client: LLMClient,
-        storage_path: str = "cortex/data/conversation_history.json"
+        storage_path: str = "cortex/data/conversation_history.jsonl",
+        background: bool = True
     ):
         """
         Initialize Conversation Manager
 
         Args:
             llm_client: Client LLM pour générer les résumés
-            storage_path: Chemin du fichier JSON de stockage
+            storage_path: Journal JSONL (un ancien conversation_history.json
+                          est migré automatiquement)
+            background: Résumés dans un thread de fond (False: dans add_message)
         """
         self.llm_client = llm_client
-        self.storage_path = Path(storage_path)
-        self.sections: List[ConversationSection] = []
+        path = Path(storage_path)
+        self.storage_path = path.with_suffix(".jsonl")
+        self.background = background
+
+        self.sections: List[ConversationSection] = []  # Sections closes, ordre chronologique
         self.current_section: ConversationSection = self._create_new_section()
         self.global_summary: Optional[str] = None
-
-        # Encoder tiktoken pour compter les tokens
-        try:
-            self.encoder = tiktoken.get_encoding("cl100k_base")
-        except Exception:
-            self.encoder = None
-
+        self.global_covers = 0  # Sections [0, global_covers) intégrées au résumé global
+        self._total_tokens = 0
+
+        # Messages rendus un par un et gardés tels quels: ni séparateur ni dédoublonnage
+        self.packer = ContextPacker(separator="", dedupe=False)
+        self.last_manifest: List[Dict[str, Any]] = []
+
+        # État partagé avec le thread de résumé; generation invalide les
+        # résumés en cours lors d'un clear_history
+        self._lock = threading.RLock()
+        self._generation = 0
+        self._jobs: "queue.Queue[Tuple[int, int]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._retry: Set[int] = set()  # Sections dont le résumé a échoué
+
+        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        legacy_path = path if path.suffix == ".json" else path.with_suffix(".json")
+        if legacy_path.exists() and not self.storage_path.exists():
+            self._migrate_json(legacy_path)
         self._load()
+        self._log = open(self.storage_path, 'a', encoding='utf-8')
+
+        # Sections closes sans résumé (arrêt pendant un résumé): reprises
+        for index, section in enumerate(self.sections):
+            if section.summary is None:
+                self._schedule(index)
 
     def _create_new_section(self) -> ConversationSection:
         """Crée une nouvelle section vide"""
@@ -89,12 +127,8 @@ class ConversationManager:
         )
 
     def _count_tokens(self, text: str) -> int:
-        """Compte le nombre de tokens dans un texte"""
-        if self.encoder:
-            return len(self.encoder.encode(text))
-        else:
-            # Fallback: approximation (1 token ≈ 4 caractères)
-            return len(text) // 4
+        """Compte le nombre de tokens dans un texte (encodeur partagé)"""
+        return count_tokens(text)
 
     def _count_messages_tokens(self, messages: List[Dict[str, str]]) -> int:
         """Compte les tokens dans une liste de messages"""
@@ -104,86 +138,193 @@ class ConversationManager:
             total += self._count_tokens(content)
         return total
 
+    # ------------------------------------------------------------ Journal
+
+    def _append(self, record: Dict[str, Any]):
+        """Ajoute une ligne au journal (appelé sous self._lock)"""
+        self._log.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._log.flush()
+
     def _load(self):
-        """Charge l'historique depuis le fichier"""
-        if self.storage_path.exists():
-            try:
-                with open(self.storage_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.sections = [
-                        ConversationSection.from_dict(s)
-                        for s in data.get('sections', [])
-                    ]
-                    self.global_summary = data.get('global_summary')
-
-                    # Charger la section courante
-                    current_data = data.get('current_section')
-                    if current_data:
-                        self.current_section = ConversationSection.from_dict(current_data)
-                    else:
-                        self.current_section = self._create_new_section()
-            except Exception as e:
-                print(f"Warning: Failed to load conversation history: {e}")
-                self.sections = []
-                self.current_section = self._create_new_section()
-        else:
-            # Créer le répertoire si nécessaire
-            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        """Rejoue le journal (tokens lus tels quels, pas de recomptage)"""
+        if not self.storage_path.exists():
+            return
 
-    def _save(self):
-        """Sauvegarde l'historique dans le fichier"""
+        sections: Dict[int, ConversationSection] = {}
+        closed = 0
         try:
-            data = {
-                'sections': [section.to_dict() for section in self.sections],
-                'current_section': self.current_section.to_dict(),
-                'global_summary': self.global_summary,
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(self.storage_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Dernière ligne tronquée (arrêt pendant une écriture)
+
+                    kind = record.get('type')
+                    if kind == 'message':
+                        index = record['section']
+                        section = sections.get(index)
+                        if section is None:
+                            section = sections[index] = ConversationSection(
+                                id=record.get('section_id', f"section_{index + 1}"),
+                                messages=[], summary=None, token_count=0, created_at=record['ts']
+                            )
+                        section.messages.append({"role": record['role'], "content": record['content']})
+                        section.message_tokens.append(record['tokens'])
+                        section.token_count += record['tokens']
+                        self._total_tokens += record['tokens']
+                    elif kind == 'section_close':
+                        closed = max(closed, record['section'] + 1)
+                    elif kind == 'section_summary' and record['section'] in sections:
+                        section = sections[record['section']]
+                        section.summary = record['summary']
+                        section.summarized_at = record['ts']
+                        section.messages = []
+                    elif kind == 'global_summary':
+                        self.global_summary = record['summary']
+                        self.global_covers = record['covers']
+        except Exception as e:
+            print(f"Warning: Failed to load conversation history: {e}")
+
+        self.sections = [sections[i] for i in range(closed) if i in sections]
+        self.current_section = sections.get(closed) or self._create_new_section()
+
+    def _migrate_json(self, legacy_path: Path):
+        """Convertit l'ancien historique JSON (réécrit à chaque message) en journal"""
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         except Exception as e:
-            print(f"Error: Failed to save conversation history: {e}")
+            print(f"Warning: Failed to migrate conversation history: {e}")
+            return
+
+        now = datetime.now().isoformat()
+        old_sections = data.get('sections', [])
+        if data.get('current_section'):
+            old_sections.append(data['current_section'])
+
+        # Résumé global: l'ancien format repartait de zéro après chaque résumé
+        # global; les sections closes déjà résumées y sont intégrées pour que
+        # covers compte exactement les sections couvertes
+        lines = []
+        if data.get('global_summary'):
+            covered = 0
+            for section in old_sections[:-1]:
+                if not section.get('summary'):
+                    break
+                covered += 1
+            summary = "\n\n---\n\n".join(
+                [data['global_summary']]
+                + [f"Section {s['id']}:\n{s['summary']}" for s in old_sections[:covered]]
+            )
+            lines.append({'type': 'global_summary', 'summary': summary, 'covers': covered, 'ts': now})
+        for index, section in enumerate(old_sections):
+            for msg in section.get('messages', []):
+                lines.append({
+                    'type': 'message', 'section': index, 'section_id': section['id'],
+                    'role': msg['role'], 'content': msg['content'],
+                    'tokens': self._count_tokens(msg['content']), 'ts': section['created_at']
+                })
+            if index < len(old_sections) - 1:
+                lines.append({'type': 'section_close', 'section': index, 'ts': now})
+            if section.get('summary'):
+                lines.append({'type': 'section_summary', 'section': index, 'summary': section['summary'],
+                              'ts': section.get('summarized_at') or now})
+
+        with open(self.storage_path, 'w', encoding='utf-8') as f:
+            for record in lines:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    # ------------------------------------------------------------ Messages
 
     def add_message(self, role: str, content: str):
         """
         Ajoute un message à la conversation
-        Déclenche automatiquement les résumés si nécessaire
+        Déclenche automatiquement les résumés si nécessaire (en arrière-plan)
 
         Args:
             role: "user", "assistant", ou "system"
             content: Contenu du message
         """
-        message = {"role": role, "content": content}
-        self.current_section.messages.append(message)
-
-        # Mettre à jour le compteur de tokens
-        self.current_section.token_count = self._count_messages_tokens(
-            self.current_section.messages
-        )
-
-        # Vérifier si on doit résumer la section courante
-        if self.current_section.token_count >= self.SECTION_TOKEN_THRESHOLD:
-            self._summarize_current_section()
-
-        # Vérifier si on doit faire un résumé global
-        total_tokens = self._get_total_tokens()
-        if total_tokens >= self.GLOBAL_TOKEN_THRESHOLD:
-            self._create_global_summary()
+        tokens = self._count_tokens(content)
+
+        with self._lock:
+            index = len(self.sections)
+            section = self.current_section
+            section.messages.append({"role": role, "content": content})
+            section.message_tokens.append(tokens)
+            section.token_count += tokens
+            self._total_tokens += tokens
+            self._append({
+                'type': 'message', 'section': index, 'section_id': section.id,
+                'role': role, 'content': content, 'tokens': tokens, 'ts': datetime.now().isoformat()
+            })
+
+            # Résumés en échec: nouvel essai à chaque message
+            if self._retry:
+                retry, self._retry = sorted(self._retry), set()
+                for failed in retry:
+                    self._schedule(failed)
+
+            # Section pleine: close maintenant, résumée une seule fois
+            if section.token_count >= self.SECTION_TOKEN_THRESHOLD:
+                self.sections.append(section)
+                self.current_section = self._create_new_section()
+                self._append({'type': 'section_close', 'section': index, 'ts': datetime.now().isoformat()})
+                self._schedule(index)
+
+    def _schedule(self, section_index: int):
+        """Planifie le résumé d'une section close"""
+        if not self.background:
+            self._summarize_section(section_index, self._generation)
+            self._maybe_fold_global(self._generation)
+            return
 
-        self._save()
+        self._jobs.put((self._generation, section_index))
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run_jobs, daemon=True, name="conversation-summary")
+            self._worker.start()
 
-    def _summarize_current_section(self):
-        """Résume la section courante et crée une nouvelle section"""
-        if not self.current_section.messages:
-            return
+    def _run_jobs(self):
+        while True:
+            generation, section_index = self._jobs.get()
+            try:
+                self._summarize_section(section_index, generation)
+                self._maybe_fold_global(generation)
+            except Exception as e:
+                print(f"⚠️  Erreur lors du résumé en arrière-plan: {e}")
+            finally:
+                self._jobs.task_done()
 
-        print("\n🔄 Résumé automatique de la section en cours...")
+    def wait_for_summaries(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend la fin des résumés en cours
 
-        # Créer un prompt de résumé
-        messages_text = "\n\n".join([
-            f"{msg['role'].upper()}: {msg['content']}"
-            for msg in self.current_section.messages
-        ])
+        Returns:
+            True si plus aucun résumé n'est en attente
+        """
+        if timeout is None:
+            self._jobs.join()
+            return True
+        deadline = threading.Event()
+        waiter = threading.Thread(target=lambda: (self._jobs.join(), deadline.set()), daemon=True)
+        waiter.start()
+        return deadline.wait(timeout)
+
+    # ------------------------------------------------------------ Résumés
+
+    def _summarize_section(self, section_index: int, generation: int):
+        """Résume une section close (niveau 1), hors verrou pendant l'appel LLM"""
+        with self._lock:
+            if generation != self._generation or section_index >= len(self.sections):
+                return
+            section = self.sections[section_index]
+            if section.summary is not None:
+                return
+            messages_text = "\n\n".join([
+                f"{msg['role'].upper()}: {msg['content']}"
+                for msg in section.messages
+            ])
 
         summary_prompt = f"""Résume cette section de conversation de manière concise mais complète.
 Garde tous les détails techniques importants, les décisions prises, et le contexte nécessaire pour continuer la conversation.
@@ -201,50 +342,51 @@ RÉSUMÉ (format structuré):"""
                 max_tokens=1000,
                 temperature=0.3
             )
-
-            self.current_section.summary = response.content
-            self.current_section.summarized_at = datetime.now().isoformat()
-
-            # Archiver la section
-            self.sections.append(self.current_section)
-
-            # Créer une nouvelle section
-            self.current_section = self._create_new_section()
-
-            print(f"✓ Section résumée ({len(self.sections)} sections totales)")
-
         except Exception as e:
             print(f"⚠️  Erreur lors du résumé de section: {e}")
-
-    def _create_global_summary(self):
-        """Crée un résumé global et réinitialise les sections"""
-        if not self.sections:
+            with self._lock:
+                if generation == self._generation:
+                    self._retry.add(section_index)
             return
 
-        print("\n🔄 Résumé global de toutes les sections...")
-
-        # Collecter tous les résumés de sections
-        section_summaries = []
-        for section in self.sections:
-            if section.summary:
-                section_summaries.append(f"Section {section.id}:\n{section.summary}")
-
-        # Ajouter la section courante si elle a du contenu
-        if self.current_section.messages:
-            messages_text = "\n".join([
-                f"{msg['role']}: {msg['content'][:200]}..."
-                for msg in self.current_section.messages
-            ])
-            section_summaries.append(f"Section courante (non résumée):\n{messages_text}")
-
-        all_summaries = "\n\n---\n\n".join(section_summaries)
-
-        global_prompt = f"""Crée un résumé global ultra-condensé de toute cette conversation.
+        with self._lock:
+            if generation != self._generation:
+                return
+            section.summary = response.content
+            section.summarized_at = datetime.now().isoformat()
+            section.messages = []  # Le journal garde les messages bruts
+            self._append({
+                'type': 'section_summary', 'section': section_index,
+                'summary': section.summary, 'ts': section.summarized_at
+            })
+
+    def _maybe_fold_global(self, generation: int):
+        """
+        Fusionne les résumés de sections récents dans le résumé global (niveau 2)
+        quand ils couvrent GLOBAL_TOKEN_THRESHOLD tokens
+        """
+        with self._lock:
+            if generation != self._generation:
+                return
+            pending = []
+            for section in self.sections[self.global_covers:]:
+                if section.summary is None:
+                    break  # Fusion dans l'ordre: attendre les résumés manquants
+                pending.append(section)
+            if sum(section.token_count for section in pending) < self.GLOBAL_TOKEN_THRESHOLD:
+                return
+            covers = self.global_covers + len(pending)
+            previous = self.global_summary
+
+        new_summaries = "\n\n---\n\n".join(f"Section {s.id}:\n{s.summary}" for s in pending)
+        previous_text = f"RÉSUMÉ GLOBAL PRÉCÉDENT:\n{previous}\n\n" if previous else ""
+
+        global_prompt = f"""Mets à jour le résumé global ultra-condensé de cette conversation.
 Ce résumé sera le contexte de base pour les futures conversations.
-Inclus UNIQUEMENT les informations essentielles et critiques.
+Intègre les nouvelles sections au résumé précédent; inclus UNIQUEMENT les informations essentielles et critiques.
 
-SECTIONS:
-{all_summaries}
+{previous_text}NOUVELLES SECTIONS:
+{new_summaries}
 
 RÉSUMÉ GLOBAL (maximum 500 mots):"""
 
@@ -256,102 +398,134 @@ RÉSUMÉ GLOBAL (maximum 500 mots):"""
                 max_tokens=800,
                 temperature=0.3
             )
-
-            # Combiner avec le résumé global précédent si existe
-            if self.global_summary:
-                self.global_summary = f"{self.global_summary}\n\n---NOUVEAU CYCLE---\n\n{response.content}"
-            else:
-                self.global_summary = response.content
-
-            # Réinitialiser les sections (on garde que le résumé global)
-            self.sections = []
-
-            print(f"✓ Résumé global créé, sections réinitialisées")
-
         except Exception as e:
             print(f"⚠️  Erreur lors du résumé global: {e}")
+            return
+
+        with self._lock:
+            if generation != self._generation:
+                return
+            self.global_summary = response.content
+            self.global_covers = covers
+            self._append({
+                'type': 'global_summary', 'summary': self.global_summary,
+                'covers': covers, 'ts': datetime.now().isoformat()
+            })
 
     def _get_total_tokens(self) -> int:
-        """Calcule le nombre total de tokens de toutes les sections"""
-        total = sum(section.token_count for section in self.sections)
-        total += self.current_section.token_count
-        return total
+        """Nombre total de tokens de la conversation (compteur tenu à jour)"""
+        return self._total_tokens
 
     def get_context_for_llm(self, max_tokens: int = 4000) -> List[Dict[str, str]]:
         """
         Construit le contexte optimal pour un appel LLM
 
-        Priorité:
-        1. Résumé global (si existe)
-        2. Résumés des sections archivées
-        3. Messages bruts de la section courante
+        1. Derniers messages: suffixe contigu (jamais de trou dans les
+           échanges récents), sur le budget moins la place des résumés
+           (au plus SUMMARY_SHARE); le dernier message est toujours inclus
+        2. Le reste du budget est réparti par ContextPacker (pertinence
+           maximale) entre le résumé global, les résumés des 5 dernières
+           sections pas encore intégrées et les messages plus anciens que
+           le suffixe
 
         Args:
             max_tokens: Limite de tokens pour le contexte
 
         Returns:
-            Liste de messages optimisée
+            Liste de messages optimisée (ordre chronologique)
         """
-        context_messages = []
-        token_budget = max_tokens
-
-        # 1. Ajouter le résumé global si existe
-        if self.global_summary:
-            summary_msg = {
-                "role": "system",
-                "content": f"CONTEXTE GLOBAL PRÉCÉDENT:\n{self.global_summary}"
-            }
-            tokens = self._count_tokens(summary_msg['content'])
-            if tokens < token_budget:
-                context_messages.append(summary_msg)
-                token_budget -= tokens
-
-        # 2. Ajouter les résumés de sections (les plus récentes en premier)
-        for section in reversed(self.sections[-5:]):  # Max 5 dernières sections
-            if section.summary and token_budget > 200:
-                section_msg = {
-                    "role": "system",
-                    "content": f"SECTION PRÉCÉDENTE:\n{section.summary}"
-                }
-                tokens = self._count_tokens(section_msg['content'])
-                if tokens < token_budget:
-                    context_messages.insert(1 if self.global_summary else 0, section_msg)
-                    token_budget -= tokens
-
-        # 3. Ajouter les messages bruts de la section courante
-        for msg in self.current_section.messages:
-            tokens = self._count_tokens(msg['content'])
-            if tokens < token_budget:
-                context_messages.append(msg)
-                token_budget -= tokens
-            else:
-                break
+        with self._lock:
+            snippets = []
+            if self.global_summary:
+                snippets.append(Snippet(
+                    f"CONTEXTE GLOBAL PRÉCÉDENT:\n{self.global_summary}", relevance=1.0,
+                    kind="global_summary", data={"role": "system"}
+                ))
+
+            recent = self.sections[self.global_covers:][-5:]
+            summarized = [section for section in recent if section.summary]
+            for i, section in enumerate(summarized):
+                snippets.append(Snippet(
+                    f"SECTION PRÉCÉDENTE:\n{section.summary}", relevance=0.4 + 0.4 * (i + 1) / len(summarized),
+                    source=section.id, kind="section_summary", data={"role": "system"}
+                ))
+
+            # Messages bruts dans l'ordre: sections closes dont le résumé est
+            # en cours, puis section courante
+            raw = []
+            for section in recent:
+                if section.summary is None:
+                    raw.extend((section, msg, tokens) for msg, tokens in self._with_tokens(section))
+            raw.extend((self.current_section, msg, tokens) for msg, tokens in self._with_tokens(self.current_section))
+
+            # Suffixe récent contigu, hors sac à dos
+            summary_tokens = sum(self.packer.count(snippet.content) for snippet in snippets)
+            recent_budget = max_tokens - min(summary_tokens, max_tokens * self.SUMMARY_SHARE)
+            start = len(raw)
+            used = 0
+            while start > 0 and (start == len(raw) or used + raw[start - 1][2] <= recent_budget):
+                start -= 1
+                used += raw[start][2]
+
+            # Plus anciens que le suffixe: moins prioritaires que les résumés
+            for position, (section, msg, _) in enumerate(raw):
+                older = position < start
+                snippets.append(Snippet(
+                    msg['content'], relevance=0.3 * (position + 1) / len(raw), source=section.id,
+                    kind="message" if older else "recent_message", required=not older, data=msg
+                ))
+
+        packed = self.packer.pack(snippets, max_tokens)
+        self.last_manifest = packed.manifest
+        context_messages = [
+            {**snippet.data, "content": snippet.content} for snippet in packed.snippets
+        ]
 
         return context_messages
 
+    def _with_tokens(self, section: ConversationSection) -> List[Tuple[Dict[str, str], int]]:
+        """Messages d'une section avec leur nombre de tokens (cache, sinon recompté)"""
+        if len(section.message_tokens) == len(section.messages):
+            return list(zip(section.messages, section.message_tokens))
+        return [(msg, self._count_tokens(msg.get('content', ''))) for msg in section.messages]
+
     def get_statistics(self) -> Dict[str, Any]:
         """Obtient des statistiques sur l'historique"""
-        return {
-            'total_sections': len(self.sections),
-            'current_section_messages': len(self.current_section.messages),
-            'current_section_tokens': self.current_section.token_count,
-            'total_tokens': self._get_total_tokens(),
-            'has_global_summary': self.global_summary is not None,
-            'section_threshold': self.SECTION_TOKEN_THRESHOLD,
-            'global_threshold': self.GLOBAL_TOKEN_THRESHOLD
-        }
+        with self._lock:
+            return {
+                'total_sections': len(self.sections) - self.global_covers,
+                'current_section_messages': len(self.current_section.messages),
+                'current_section_tokens': self.current_section.token_count,
+                'total_tokens': self._get_total_tokens(),
+                'has_global_summary': self.global_summary is not None,
+                'pending_summaries': sum(1 for section in self.sections if section.summary is None),
+                'section_threshold': self.SECTION_TOKEN_THRESHOLD,
+                'global_threshold': self.GLOBAL_TOKEN_THRESHOLD
+            }
 
     def clear_history(self):
-        """Efface tout l'historique"""
-        self.sections = []
-        self.current_section = self._create_new_section()
-        self.global_summary = None
-        self._save()
+        """Efface tout l'historique (seule opération qui réécrit le journal)"""
+        with self._lock:
+            self._generation += 1
+            self.sections = []
+            self.current_section = self._create_new_section()
+            self.global_summary = None
+            self.global_covers = 0
+            self._total_tokens = 0
+            self._retry = set()
+            self._log.close()
+            self._log = open(self.storage_path, 'w', encoding='utf-8')
+
+    def close(self):
+        """Attend les résumés en cours et ferme le journal"""
+        self.wait_for_summaries()
+        with self._lock:
+            self._log.close()
 
 
 def create_conversation_manager(
     llm_client: LLMClient,
-    storage_path: str = "cortex/data/conversation_history.json"
+    storage_path: str = "cortex/data/conversation_history.jsonl"
 ) -> ConversationManager:
     """Factory function pour créer un ConversationManager"""
     return ConversationManager(llm_client, storage_path)
@@ -364,7 +538,7 @@ if __name__ == "__main__":
     print("Testing Conversation Manager...")
 
     client = LLMClient()
-    manager = ConversationManager(client, "cortex/data/test_conversation.json")
+    manager = ConversationManager(client, "cortex/data/test_conversation.jsonl")
 
     # Test: Ajouter des messages
     print("\n1. Adding messages...")
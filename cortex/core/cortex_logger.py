@@ -1,6 +1,10 @@
 """
 Cortex Logger - Système de logging léger pour auto-analyse et auto-correction
 Conçu spécifiquement pour permettre au système de s'analyser et s'améliorer
+
+Chaque événement est écrit dans la session JSONL (lue par le routeur appris)
+et dans le journal indexé EventStore: les analyses portent sur les derniers
+événements de toutes les sessions, pas seulement ceux gardés en mémoire
 """
 
 from typing import Dict, Any, Optional, List
@@ -10,6 +14,9 @@ from pathlib import Path
 import json
 from enum import Enum
 
+from cortex.core.config_loader import get_config
+from cortex.core.event_store import EventStore, get_event_store
+
 
 class EventType(Enum):
     """Types d'événements loggés"""
@@ -25,6 +32,7 @@ class EventType(Enum):
     WORKFLOW_DECISION = "workflow_decision"
     AGENT_CREATION = "agent_creation"
     SYSTEM_IMPROVEMENT = "system_improvement"
+    ROUTING_OUTCOME = "routing_outcome"  # Tiers essayés et scores d'une escalade (routeur appris)
 
 
 @dataclass
@@ -39,6 +47,9 @@ class LogEntry:
     success: bool = True
     parent_task_id: Optional[str] = None
     task_id: Optional[str] = None
+    tier: Optional[str] = None
+    latency_ms: Optional[float] = None
+    score: Optional[float] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convertit en dictionnaire"""
@@ -46,6 +57,12 @@ class LogEntry:
         result["event_type"] = self.event_type.value
         return result
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LogEntry":
+        data = {key: value for key, value in data.items() if key in cls.__dataclass_fields__}
+        data["event_type"] = EventType(data["event_type"])
+        return cls(**data)
+
 
 class CortexLogger:
     """
@@ -53,7 +70,24 @@ class CortexLogger:
     Optimisé pour l'auto-analyse et l'apprentissage
     """
 
-    def __init__(self, log_dir: Optional[Path] = None, max_memory_entries: int = 1000):
+    def __init__(
+        self,
+        log_dir: Optional[Path] = None,
+        max_memory_entries: int = 1000,
+        store: Optional[EventStore] = None
+    ):
+        """
+        Args:
+            log_dir: Dossier des sessions JSONL (défaut: cortex/logs)
+            max_memory_entries: Taille des logs gardés en mémoire
+            store: Journal indexé (défaut: get_event_store(), ou events.db
+                dans log_dir si log_dir est fourni; aucun si
+                logging.event_store.enabled est faux)
+        """
+        self._store = store
+        self._store_resolved = store is not None
+        self._store_path = Path(log_dir) / "events.db" if log_dir is not None else None
+
         if log_dir is None:
             log_dir = Path(__file__).parent.parent / "logs"
 
@@ -79,6 +113,18 @@ class CortexLogger:
             "agents_used": set()
         }
 
+    @property
+    def store(self) -> Optional[EventStore]:
+        """Journal indexé (ouvert à la première utilisation)"""
+        if not self._store_resolved:
+            self._store_resolved = True
+            if get_config().get("logging.event_store.enabled", True):
+                try:
+                    self._store = EventStore(self._store_path) if self._store_path else get_event_store()
+                except Exception as e:
+                    print(f"Warning: Event store unavailable, using in-memory logs: {e}")
+        return self._store
+
     def log(
         self,
         event_type: EventType,
@@ -88,7 +134,10 @@ class CortexLogger:
         cost: float = 0.0,
         success: bool = True,
         parent_task_id: Optional[str] = None,
-        task_id: Optional[str] = None
+        task_id: Optional[str] = None,
+        tier: Optional[str] = None,
+        latency_ms: Optional[float] = None,
+        score: Optional[float] = None
     ):
         """
         Enregistre un événement
@@ -102,17 +151,24 @@ class CortexLogger:
             success: Si l'opération a réussi
             parent_task_id: ID de la tâche parente (pour traçabilité)
             task_id: ID de la tâche actuelle
+            tier: Tier du modèle (défaut: data["tier"] ou data["final_tier"])
+            latency_ms: Durée de l'opération
+            score: Score qualité (défaut: data["quality_score"])
         """
+        data = data or {}
         entry = LogEntry(
             timestamp=datetime.now().isoformat(),
             event_type=event_type,
             agent=agent,
             message=message,
-            data=data or {},
+            data=data,
             cost=cost,
             success=success,
             parent_task_id=parent_task_id,
-            task_id=task_id
+            task_id=task_id,
+            tier=tier or data.get("tier") or data.get("final_tier"),
+            latency_ms=latency_ms,
+            score=score if score is not None else data.get("quality_score")
         )
 
         # Ajouter en mémoire
@@ -121,8 +177,16 @@ class CortexLogger:
             self.memory_logs.pop(0)
 
         # Écrire sur disque (JSONL pour parsing facile)
+        record = entry.to_dict()
         with open(self.session_file, 'a') as f:
-            f.write(json.dumps(entry.to_dict()) + '\n')
+            f.write(json.dumps(record, default=str) + '\n')
+
+        # Journal indexé (requêtes, agrégats horaires)
+        if self.store is not None:
+            try:
+                self.store.append(record)
+            except Exception as e:
+                print(f"Warning: Could not store event: {e}")
 
         # Mettre à jour les stats
         self._update_stats(entry)
@@ -143,6 +207,23 @@ class CortexLogger:
         elif entry.event_type == EventType.DELEGATION:
             self.stats["total_delegations"] += 1
 
+    def recent_entries(self, last_n: int = 50) -> List[LogEntry]:
+        """N derniers événements (toutes sessions si le journal indexé est actif), ordre chronologique"""
+        if self.store is None:
+            return self.memory_logs[-last_n:] if last_n > 0 else []
+        try:
+            rows = self.store.query(limit=last_n)
+        except Exception as e:
+            print(f"Warning: Could not query events, using in-memory logs: {e}")
+            return self.memory_logs[-last_n:] if last_n > 0 else []
+        entries = []
+        for row in reversed(rows):
+            try:
+                entries.append(LogEntry.from_dict(row))
+            except ValueError:
+                continue  # Type d'événement inconnu de cette version
+        return entries
+
     def analyze_recent_performance(self, last_n: int = 50) -> Dict[str, Any]:
         """
         Analyse les N dernières entrées pour détecter des patterns
@@ -154,7 +235,7 @@ class CortexLogger:
             - Taux d'escalation
             - Problèmes récurrents
         """
-        recent = self.memory_logs[-last_n:]
+        recent = self.recent_entries(last_n)
 
         if not recent:
             return {"error": "No logs available"}
@@ -186,6 +267,7 @@ class CortexLogger:
 
         return {
             "period": f"Last {len(recent)} events",
+            "events": len(recent),
             "success_rate": len(successes) / len(tasks) if tasks else 0,
             "total_tasks": len(tasks),
             "successful_tasks": len(successes),
@@ -206,6 +288,8 @@ class CortexLogger:
         """
         analysis = self.analyze_recent_performance(last_n=100)
         opportunities = []
+        if "error" in analysis:
+            return opportunities
 
         # Taux de succès faible
         if analysis["success_rate"] < 0.8:
@@ -240,7 +324,7 @@ class CortexLogger:
         # Agents sous-utilisés
         if analysis["most_used_agents"]:
             top_agent = analysis["most_used_agents"][0]
-            if top_agent[1] > len(self.memory_logs[-100:]) * 0.5:
+            if top_agent[1] > analysis["events"] * 0.5:
                 opportunities.append({
                     "priority": "low",
                     "category": "load_balancing",
@@ -0,0 +1,419 @@
+"""
+Embeddings - Backend d'embedding local partagé
+
+Un seul encodeur pour tout le Cortex (ContextManager, ProjectKnowledgeBase,
+tier L2 du CacheManager):
+
+- Backends interchangeables:
+  - sentence-transformers (si installé)
+  - ONNX all-MiniLM-L6-v2 via onnxruntime (modèle de ChromaDB)
+  - hashing trick (zéro dépendance, toujours disponible)
+- Encodage par lots
+- Mémo sur disque indexé par empreinte du contenu (SQLite) précédé d'un
+  LRU en mémoire: un texte identique n'est jamais ré-encodé
+
+Les vecteurs retournés sont float32 et de norme 1: la similarité cosinus
+est un simple produit scalaire.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from cortex.core.config_loader import get_config
+
+# Imports optionnels
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+try:
+    from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+except ImportError:
+    ONNXMiniLM_L6_V2 = None
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Normalise chaque ligne en place (les lignes nulles restent nulles)"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def _hashing_features(text: str) -> List[str]:
+    """Unigrammes, bigrammes de mots et trigrammes de caractères"""
+    words = _TOKEN_RE.findall(text.lower())
+
+    features: List[str] = list(words)
+    features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f"<{word}>"
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+def hashing_embedding(text: str, dimensions: int = 512) -> np.ndarray:
+    """
+    Embedding local sans dépendance (hashing trick)
+
+    Combine unigrammes, bigrammes de mots et trigrammes de caractères,
+    projetés par hash signé dans un vecteur de taille fixe puis normalisé.
+
+    Args:
+        text: Texte à embedder
+        dimensions: Taille du vecteur
+
+    Returns:
+        Vecteur float32 de norme 1 (ou nul si texte vide)
+    """
+    return HashingBackend(dimensions).encode([text])[0]
+
+
+class EmbeddingBackend:
+    """Interface d'un modèle d'embedding (encodage par lots)"""
+
+    name: str = "base"
+    dimensions: int = 0
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Encode un lot de textes
+
+        Returns:
+            Matrice float32 (len(texts), dimensions)
+        """
+        raise NotImplementedError
+
+
+class HashingBackend(EmbeddingBackend):
+    """
+    Hashing trick avec TF sous-linéaire
+
+    Les indices signés des features sont mémoïsés: un mot déjà vu ne
+    repasse pas par crc32.
+    """
+
+    def __init__(self, dimensions: int = 512, max_features: int = 500000):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+        self.max_features = max_features
+        self._feature_index: Dict[str, int] = {}
+
+    def _index(self, feature: str) -> int:
+        """Indice signé (+/-(i+1)) d'une feature"""
+        index = self._feature_index.get(feature)
+        if index is None:
+            h = zlib.crc32(feature.encode("utf-8"))
+            index = (h % self.dimensions) + 1
+            if not h & 0x80000000:
+                index = -index
+            if len(self._feature_index) >= self.max_features:
+                self._feature_index.clear()
+            self._feature_index[feature] = index
+        return index
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+
+        rows: List[int] = []
+        indices: List[int] = []
+        for row, text in enumerate(texts):
+            features = _hashing_features(text)
+            rows.extend([row] * len(features))
+            indices.extend(self._index(feature) for feature in features)
+
+        if indices:
+            signed = np.asarray(indices, dtype=np.int64)
+            np.add.at(vectors, (np.asarray(rows), np.abs(signed) - 1), np.sign(signed).astype(np.float32))
+
+        # TF sous-linéaire pour éviter qu'un mot répété domine
+        np.copysign(np.log1p(np.abs(vectors)), vectors, out=vectors)
+        return _normalize_rows(vectors)
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Modèle sentence-transformers sur CPU"""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", batch_size: int = 64):
+        if SentenceTransformer is None:
+            raise ImportError("sentence-transformers required. Install: pip install sentence-transformers")
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = f"st-{model_name}"
+        self.dimensions = self.model.get_sentence_embedding_dimension()
+        self.batch_size = batch_size
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        return self.model.encode(
+            list(texts), batch_size=self.batch_size, normalize_embeddings=True,
+            convert_to_numpy=True, show_progress_bar=False
+        ).astype(np.float32, copy=False)
+
+
+class OnnxMiniLMBackend(EmbeddingBackend):
+    """all-MiniLM-L6-v2 en ONNX (onnxruntime, installé avec ChromaDB)"""
+
+    name = "onnx-all-MiniLM-L6-v2"
+    dimensions = 384
+
+    def __init__(self):
+        if ONNXMiniLM_L6_V2 is None:
+            raise ImportError("onnxruntime + chromadb required. Install: pip install chromadb")
+        self.model = ONNXMiniLM_L6_V2(preferred_providers=["CPUExecutionProvider"])
+        self.model(["warmup"])  # Télécharge le modèle si absent: échoue ici plutôt qu'au premier appel
+
+    @staticmethod
+    def is_downloaded() -> bool:
+        """Modèle déjà présent localement (pas de téléchargement au démarrage)"""
+        if ONNXMiniLM_L6_V2 is None:
+            return False
+        folder = Path(ONNXMiniLM_L6_V2.DOWNLOAD_PATH) / ONNXMiniLM_L6_V2.EXTRACTED_FOLDER_NAME
+        return (folder / "model.onnx").exists()
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        return np.asarray(self.model(list(texts)), dtype=np.float32)
+
+
+def create_backend(backend: str = "auto", model: Optional[str] = None, dimensions: int = 512) -> EmbeddingBackend:
+    """
+    Crée un backend d'embedding
+
+    Args:
+        backend: "auto", "sentence-transformers", "onnx" ou "hashing"
+        model: Nom du modèle sentence-transformers
+        dimensions: Dimensions du backend hashing
+
+    "auto" prend sentence-transformers s'il est installé, sinon le modèle
+    ONNX s'il est déjà téléchargé, sinon le hashing trick.
+    """
+    if backend == "sentence-transformers" or (backend == "auto" and SentenceTransformer is not None):
+        return SentenceTransformerBackend(model or "all-MiniLM-L6-v2")
+    if backend == "onnx" or (backend == "auto" and OnnxMiniLMBackend.is_downloaded()):
+        return OnnxMiniLMBackend()
+    if backend in ("auto", "hashing"):
+        return HashingBackend(dimensions)
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+class EmbeddingMemo:
+    """
+    Mémo disque des embeddings (SQLite), clé = SHA-256 (modèle + texte)
+
+    Args:
+        path: Fichier SQLite
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL) WITHOUT ROWID"
+        )
+        self.db.commit()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, bytes]:
+        """Vecteurs mémoïsés (octets float32) des clés trouvées"""
+        found: Dict[bytes, bytes] = {}
+        for start in range(0, len(keys), 500):  # Limite de paramètres SQLite
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(self.db.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            ).fetchall())
+        return found
+
+    def put_many(self, items: List[tuple]):
+        """Enregistre des (clé, octets float32)"""
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO embeddings VALUES (?, ?)", items)
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM embeddings")
+
+
+class Embedder:
+    """
+    Encodeur partagé: backend + mémo disque + LRU mémoire
+
+    Args:
+        backend: Backend d'embedding
+        memo_path: Fichier du mémo disque (None = pas de mémo disque)
+        batch_size: Taille des lots envoyés au backend
+        memory_entries: Taille du LRU en mémoire
+    """
+
+    def __init__(
+        self,
+        backend: Optional[EmbeddingBackend] = None,
+        memo_path: Optional[str] = None,
+        batch_size: int = 64,
+        memory_entries: int = 10000
+    ):
+        self.backend = backend or HashingBackend()
+        self.memo = EmbeddingMemo(memo_path) if memo_path else None
+        self.batch_size = batch_size
+        self.memory_entries = memory_entries
+
+        self._lru: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._prefix = self.backend.name.encode("utf-8") + b"\0"
+
+        # Statistiques
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.encoded = 0
+        self.encode_seconds = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.backend.name
+
+    @property
+    def dimensions(self) -> int:
+        return self.backend.dimensions
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.sha256(self._prefix + text.encode("utf-8", errors="surrogatepass")).digest()
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embedding d'un texte (vecteur float32 de norme 1)"""
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: Sequence[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Embeddings d'une liste de textes
+
+        Les doublons et les textes déjà mémoïsés ne sont pas ré-encodés;
+        le reste part au backend par lots de batch_size.
+
+        Returns:
+            Matrice float32 (len(texts), dimensions)
+        """
+        result = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        if not texts:
+            return result
+
+        keys = [self._key(text) for text in texts]
+        missing: Dict[bytes, List[int]] = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    result[i] = vector
+                    self.memory_hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+
+        if missing and self.memo is not None:
+            with self._lock:
+                stored = self.memo.get_many(list(missing))
+            for key, blob in stored.items():
+                vector = np.frombuffer(blob, dtype=np.float32)
+                for i in missing.pop(key):
+                    result[i] = vector
+                self._remember(key, vector)
+                self.disk_hits += 1
+
+        if missing:
+            todo = list(missing.items())
+            size = batch_size or self.batch_size
+            for start in range(0, len(todo), size):
+                batch = todo[start:start + size]
+
+                t = time.perf_counter()
+                vectors = _normalize_rows(np.array(
+                    self.backend.encode([texts[positions[0]] for _, positions in batch]),
+                    dtype=np.float32
+                ))
+                self.encode_seconds += time.perf_counter() - t
+                self.encoded += len(batch)
+
+                for (key, positions), vector in zip(batch, vectors):
+                    result[positions] = vector
+                    self._remember(key, vector)
+
+                if self.memo is not None:
+                    with self._lock:
+                        self.memo.put_many([
+                            (key, vector.tobytes()) for (key, _), vector in zip(batch, vectors)
+                        ])
+
+        return result
+
+    def _remember(self, key: bytes, vector: np.ndarray):
+        """Ajoute au LRU mémoire"""
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.memory_entries:
+                self._lru.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hits du mémo et débit d'encodage"""
+        lookups = self.memory_hits + self.disk_hits + self.encoded
+        return {
+            "embedding_backend": self.name,
+            "embedding_dimensions": self.dimensions,
+            "embedding_memory_hits": self.memory_hits,
+            "embedding_disk_hits": self.disk_hits,
+            "embedding_encoded": self.encoded,
+            "embedding_memo_hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "embedding_texts_per_sec": self.encoded / self.encode_seconds if self.encode_seconds else 0.0
+        }
+
+
+# Encodeur partagé par les composants du processus
+_embedder: Optional[Embedder] = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder() -> Embedder:
+    """
+    Retourne l'encodeur du processus (config: embeddings.*)
+
+    Un backend indisponible (dépendance absente, modèle non
+    téléchargeable) retombe sur le hashing trick.
+    """
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            config = get_config()
+            dimensions = config.get("embeddings.dimensions", 512)
+            try:
+                backend = create_backend(
+                    config.get("embeddings.backend", "auto"),
+                    config.get("embeddings.model"),
+                    dimensions
+                )
+            except Exception as e:
+                print(f"Warning: embedding backend unavailable, using hashing: {e}")
+                backend = HashingBackend(dimensions)
+
+            _embedder = Embedder(
+                backend,
+                memo_path=config.get("embeddings.memo_path", "data/cache/embeddings.db"),
+                batch_size=config.get("embeddings.batch_size", 64),
+                memory_entries=config.get("embeddings.memory_entries", 10000)
+            )
+        return _embedder
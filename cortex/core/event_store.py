@@ -0,0 +1,350 @@
+"""
+Event Store - Journal d'événements indexé derrière CortexLogger
+
+Les événements (LogEntry) sont écrits dans une base SQLite:
+- table events indexée sur timestamp, type d'événement, agent et tier;
+  query() pousse filtres et limite dans le SQL (parcours d'index borné,
+  pas de lecture des fichiers session_*.jsonl)
+- agrégats par heure (bucket "YYYY-MM-DDTHH") et totaux depuis l'origine,
+  par (type, agent, tier), mis à jour dans la même transaction que
+  l'insertion: coût, latence, score, échecs. Les tableaux de bord
+  (/costs, métriques qualité) lisent ces agrégats, leur coût ne dépend
+  pas du nombre d'événements
+- prune() supprime les vieux événements; les agrégats sont conservés
+
+Usage:
+    store = get_event_store()
+    store.append(entry.to_dict())
+    failures = store.query(agents=["TriageAgent"], success=False, limit=20)
+    per_hour = store.rollup(group_by=("agent",), since=datetime.now() - timedelta(days=1))
+    per_tier = store.rollup(group_by=("tier",))
+"""
+
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Union
+
+from cortex.core.config_loader import get_config
+from cortex.core.sqlite_pool import get_sqlite_pool
+
+
+TOTALS_BUCKET = "*"  # Bucket des totaux depuis l'origine
+ROLLUP_KEYS = ("event_type", "agent", "tier")
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        ts TEXT NOT NULL,
+        event_type TEXT NOT NULL,
+        agent TEXT NOT NULL,
+        tier TEXT NOT NULL DEFAULT '',
+        message TEXT,
+        cost REAL NOT NULL DEFAULT 0,
+        latency_ms REAL,
+        score REAL,
+        success INTEGER NOT NULL DEFAULT 1,
+        task_id TEXT,
+        parent_task_id TEXT,
+        data TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts)",
+    "CREATE INDEX IF NOT EXISTS idx_events_type ON events(event_type, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_events_agent ON events(agent, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_events_tier ON events(tier, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_events_task ON events(task_id)",
+    """
+    CREATE TABLE IF NOT EXISTS event_rollups (
+        bucket TEXT NOT NULL,
+        event_type TEXT NOT NULL,
+        agent TEXT NOT NULL,
+        tier TEXT NOT NULL,
+        events INTEGER NOT NULL DEFAULT 0,
+        failures INTEGER NOT NULL DEFAULT 0,
+        cost REAL NOT NULL DEFAULT 0,
+        latency_sum REAL NOT NULL DEFAULT 0,
+        latency_count INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0,
+        score_count INTEGER NOT NULL DEFAULT 0,
+        first_ts TEXT,
+        last_ts TEXT,
+        PRIMARY KEY (bucket, event_type, agent, tier)
+    ) WITHOUT ROWID
+    """,
+]
+
+_INSERT_EVENT = """
+    INSERT INTO events (ts, event_type, agent, tier, message, cost, latency_ms, score,
+                        success, task_id, parent_task_id, data)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_UPSERT_ROLLUP = """
+    INSERT INTO event_rollups (bucket, event_type, agent, tier, events, failures, cost,
+                               latency_sum, latency_count, score_sum, score_count, first_ts, last_ts)
+    VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (bucket, event_type, agent, tier) DO UPDATE SET
+        events = events + 1,
+        failures = failures + excluded.failures,
+        cost = cost + excluded.cost,
+        latency_sum = latency_sum + excluded.latency_sum,
+        latency_count = latency_count + excluded.latency_count,
+        score_sum = score_sum + excluded.score_sum,
+        score_count = score_count + excluded.score_count,
+        first_ts = min(first_ts, excluded.first_ts),
+        last_ts = max(last_ts, excluded.last_ts)
+"""
+
+TimeBound = Union[datetime, str, None]
+
+
+def _iso(value: TimeBound) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class EventStore:
+    """Événements CortexLogger dans SQLite (index, requêtes filtrées, agrégats horaires)"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: Base SQLite (défaut: logging.event_store.db_path)
+        """
+        if db_path is None:
+            db_path = get_config().get("logging.event_store.db_path", "cortex/data/events.db")
+        # Chemin absolu: la base ne change pas si le répertoire courant change
+        self.db = get_sqlite_pool(str(Path(db_path).resolve()))
+        self._init_schema()
+
+    def _init_schema(self):
+        # Schéma idempotent exécuté à chaque instance: une base supprimée ou
+        # remplacée dans le processus est rouverte et recréée
+        self.db.reopen_if_replaced()
+        with self.db.transaction() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def append(self, event: Dict[str, Any]):
+        """
+        Enregistre un événement et met à jour ses agrégats
+
+        Args:
+            event: LogEntry.to_dict() (timestamp, event_type, agent, message,
+                data, cost, success, task_id, parent_task_id, tier,
+                latency_ms, score)
+        """
+        self.append_many([event])
+
+    def append_many(self, events: Iterable[Dict[str, Any]]) -> int:
+        """Enregistre plusieurs événements en une transaction"""
+        count = 0
+        with self.db.transaction() as conn:
+            for event in events:
+                ts = event.get("timestamp") or datetime.now().isoformat()
+                event_type = event.get("event_type", "unknown")
+                agent = event.get("agent") or "unknown"
+                tier = event.get("tier") or ""
+                cost = event.get("cost") or 0.0
+                latency = event.get("latency_ms")
+                score = event.get("score")
+                failed = event.get("success", True) is False
+                conn.execute(_INSERT_EVENT, (
+                    ts, event_type, agent, tier, event.get("message"), cost, latency, score,
+                    0 if failed else 1, event.get("task_id"), event.get("parent_task_id"),
+                    json.dumps(event["data"], ensure_ascii=False, default=str) if event.get("data") else None
+                ))
+                rollup = (
+                    event_type, agent, tier, int(failed), cost,
+                    latency or 0.0, int(latency is not None), score or 0.0, int(score is not None), ts, ts
+                )
+                conn.execute(_UPSERT_ROLLUP, (ts[:13],) + rollup)
+                conn.execute(_UPSERT_ROLLUP, (TOTALS_BUCKET,) + rollup)
+                count += 1
+        return count
+
+    def prune(self, before: TimeBound) -> int:
+        """Supprime les événements antérieurs à before (les agrégats restent)"""
+        with self.db.transaction() as conn:
+            return conn.execute("DELETE FROM events WHERE ts < ?", (_iso(before),)).rowcount
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def query(
+        self,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        event_types: Optional[Sequence[str]] = None,
+        agents: Optional[Sequence[str]] = None,
+        tiers: Optional[Sequence[str]] = None,
+        success: Optional[bool] = None,
+        task_id: Optional[str] = None,
+        limit: Optional[int] = 100,
+        newest_first: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Événements filtrés (filtres et limite exécutés par SQLite)
+
+        Args:
+            since: Début inclus (datetime ou ISO)
+            until: Fin exclue
+            event_types: Valeurs de EventType acceptées
+            agents: Agents acceptés
+            tiers: Tiers acceptés
+            success: True/False pour ne garder que les succès/échecs
+            task_id: Événements d'une tâche
+            limit: Nombre maximum d'événements (None = tous)
+            newest_first: Ordre antichronologique (sinon chronologique)
+
+        Returns:
+            Dicts au format LogEntry.to_dict()
+        """
+        where, params = self._filters(event_types, agents, tiers)
+        if since is not None:
+            where.append("ts >= ?")
+            params.append(_iso(since))
+        if until is not None:
+            where.append("ts < ?")
+            params.append(_iso(until))
+        if success is not None:
+            where.append("success = ?")
+            params.append(int(success))
+        if task_id is not None:
+            where.append("task_id = ?")
+            params.append(task_id)
+
+        order = "DESC" if newest_first else "ASC"
+        sql = (
+            "SELECT ts, event_type, agent, tier, message, cost, latency_ms, score, success, "
+            "task_id, parent_task_id, data FROM events"
+            + (" WHERE " + " AND ".join(where) if where else "")
+            + f" ORDER BY ts {order}, seq {order}"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        return [
+            {
+                "timestamp": ts, "event_type": event_type, "agent": agent, "tier": tier or None,
+                "message": message, "cost": cost, "latency_ms": latency, "score": score,
+                "success": bool(ok), "task_id": task, "parent_task_id": parent,
+                "data": json.loads(data) if data else {}
+            }
+            for ts, event_type, agent, tier, message, cost, latency, score, ok, task, parent, data
+            in self.db.fetchall(sql, params)
+        ]
+
+    def rollup(
+        self,
+        group_by: Sequence[str] = ("agent",),
+        since: TimeBound = None,
+        until: TimeBound = None,
+        event_types: Optional[Sequence[str]] = None,
+        agents: Optional[Sequence[str]] = None,
+        tiers: Optional[Sequence[str]] = None,
+        hourly: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Agrégats pré-calculés (coût, latence, score, échecs)
+
+        Sans période ni hourly: totaux depuis l'origine. Avec since/until
+        (granularité: l'heure) ou hourly=True: agrégats horaires, une ligne
+        par heure si hourly, sinon sommés sur la période.
+
+        Args:
+            group_by: Colonnes parmi "event_type", "agent", "tier"
+            since: Heure de début incluse
+            until: Heure de fin exclue
+            event_types, agents, tiers: Filtres
+            hourly: Une ligne par heure (clé "hour")
+
+        Returns:
+            Dicts {clés de group_by, [hour], events, failures, cost,
+            avg_latency_ms, avg_score, first_ts, last_ts}, coût décroissant
+            (chronologique si hourly)
+        """
+        unknown = set(group_by) - set(ROLLUP_KEYS)
+        if unknown:
+            raise ValueError(f"Cannot group events by {sorted(unknown)} (allowed: {ROLLUP_KEYS})")
+
+        where, params = self._filters(event_types, agents, tiers)
+        if since is None and until is None and not hourly:
+            where.append("bucket = ?")
+            params.append(TOTALS_BUCKET)
+        else:
+            where.append("bucket <> ?")
+            params.append(TOTALS_BUCKET)
+            if since is not None:
+                where.append("bucket >= ?")
+                params.append(_iso(since)[:13])
+            if until is not None:
+                where.append("bucket < ?")
+                params.append(_iso(until)[:13])
+
+        keys = (["bucket"] if hourly else []) + list(group_by)
+        select = ", ".join(keys + [
+            "SUM(events)", "SUM(failures)", "SUM(cost)", "SUM(latency_sum)", "SUM(latency_count)",
+            "SUM(score_sum)", "SUM(score_count)", "MIN(first_ts)", "MAX(last_ts)"
+        ])
+        sql = f"SELECT {select} FROM event_rollups WHERE " + " AND ".join(where)
+        if keys:
+            sql += " GROUP BY " + ", ".join(keys)
+        sql += " ORDER BY bucket" if hourly else " ORDER BY SUM(cost) DESC"
+
+        rows = []
+        for row in self.db.fetchall(sql, params):
+            if row[len(keys)] is None:  # Aucun agrégat (SUM sans GROUP BY)
+                continue
+            values = dict(zip(["hour" if key == "bucket" else key for key in keys], row))
+            events, failures, cost, latency_sum, latency_count, score_sum, score_count, first, last = row[len(keys):]
+            values.update({
+                "events": events,
+                "failures": failures,
+                "cost": cost,
+                "avg_latency_ms": latency_sum / latency_count if latency_count else None,
+                "avg_score": score_sum / score_count if score_count else None,
+                "first_ts": first,
+                "last_ts": last
+            })
+            rows.append(values)
+        return rows
+
+    def count(self) -> int:
+        """Nombre d'événements enregistrés depuis l'origine (agrégats, y compris élagués)"""
+        row = self.db.fetchone("SELECT SUM(events) FROM event_rollups WHERE bucket = ?", (TOTALS_BUCKET,))
+        return row[0] or 0
+
+    @staticmethod
+    def _filters(event_types, agents, tiers):
+        where: List[str] = []
+        params: List[Any] = []
+        for column, values in (("event_type", event_types), ("agent", agents), ("tier", tiers)):
+            if values is None:
+                continue
+            values = [value or "" for value in values] if column == "tier" else list(values)
+            where.append(f"{column} IN ({', '.join('?' * len(values))})" if values else "0")
+            params.extend(values)
+        return where, params
+
+
+# Instance globale
+_global_store: Optional[EventStore] = None
+_global_lock = threading.Lock()
+
+
+def get_event_store() -> EventStore:
+    """Récupère le journal d'événements global (logging.event_store.db_path)"""
+    global _global_store
+    with _global_lock:
+        if _global_store is None:
+            _global_store = EventStore()
+        return _global_store
@@ -0,0 +1,73 @@
+"""
+Lazy Components - Composants construits au premier usage
+
+Un objet de premier niveau (CortexCLI) déclare ses agents, managers et
+groupes d'outils comme des fabriques; chacun (et ses imports lourds: openai,
+chromadb, lxml...) n'est construit que lorsqu'on y accède pour la première
+fois, puis mis en cache sur l'instance. Une question ponctuelle ne paie que
+ce qu'elle utilise.
+
+Usage:
+    class CortexCLI:
+        @lazy_component
+        def llm_client(self):
+            from cortex.core.llm_client import LLMClient
+            return LLMClient()
+
+    cli = CortexCLI()          # rien de construit
+    cli.llm_client             # construit ici, une seule fois
+    component_timings(cli)     # {"llm_client": 0.84}
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict
+
+_TIMINGS_ATTR = "_component_timings"
+_build_lock = threading.RLock()
+
+
+class lazy_component:
+    """
+    Descripteur: attribut construit au premier accès puis mis en cache
+
+    Comme functools.cached_property (l'attribut peut être remplacé, par
+    exemple dans les tests), avec en plus:
+    - construction protégée par un verrou (un seul build si deux threads y accèdent)
+    - durée de construction enregistrée (component_timings)
+    """
+
+    def __init__(self, factory: Callable[[Any], Any]):
+        self.factory = factory
+        self.name = factory.__name__
+        self.__doc__ = factory.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        cache = instance.__dict__
+        if self.name in cache:
+            return cache[self.name]
+
+        with _build_lock:
+            if self.name in cache:
+                return cache[self.name]
+            start = time.perf_counter()
+            value = self.factory(instance)
+            # Les dépendances construites pendant la fabrique ont leur propre durée
+            cache.setdefault(_TIMINGS_ATTR, {})[self.name] = time.perf_counter() - start
+            cache[self.name] = value
+            return value
+
+
+def is_loaded(instance: Any, name: str) -> bool:
+    """Le composant a-t-il déjà été construit (ou assigné)?"""
+    return name in instance.__dict__
+
+
+def component_timings(instance: Any) -> Dict[str, float]:
+    """Durée de construction (secondes, dépendances incluses) des composants construits"""
+    return dict(instance.__dict__.get(_TIMINGS_ATTR, {}))
@@ -0,0 +1,453 @@
+"""
+Learned Router - Classifieur de tier appris sur l'historique d'exécution
+
+Les heuristiques de ModelRouter (mots-clés) et la classification NANO de
+AgentFirstRouter devinent la difficulté d'une tâche. Or chaque escalade
+(BaseAgent.execute_with_escalation) journalise déjà dans CortexLogger les
+tiers essayés et leur score qualité: on sait a posteriori quel était le
+tier le moins cher qui passait le seuil.
+
+Ce module entraîne hors ligne une régression logistique multinomiale sur
+des n-grammes hachés (feature hashing, pas de vocabulaire à maintenir):
+- Inférence en process, quelques microsecondes (produit creux ~30 features × 3 tiers)
+- Sous le seuil de confiance, l'appelant garde ses heuristiques
+- Harnais d'évaluation: rejoue l'historique et compte les escalades évitées
+
+Biais de sélection: une fois le routeur en service, les tâches démarrent
+au tier prédit et l'escalade ne fait que monter. Un succès dès un tier de
+départ au-dessus du plus bas ne dit pas si un tier moins cher aurait suffi:
+ces labels (censurés) ont un poids réduit (censored_weight), et BaseAgent
+démarre parfois un tier plus bas que prévu (exploration_rate).
+
+Usage:
+    report = train_from_history()           # ou: cortex_cli.py router train
+    router = get_learned_router()
+    prediction = router.predict("List files in src/")
+    if prediction.confidence >= 0.7:
+        tier = ModelTier(prediction.tier)
+"""
+
+import json
+import math
+import random
+import re
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence
+
+from .config_loader import get_config
+from .cortex_logger import EventType
+
+
+# Échelle d'escalade de BaseAgent, du moins cher au plus cher
+TIER_ORDER = ["nano", "deepseek", "claude"]
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@dataclass
+class RoutingExample:
+    """Une tâche passée et le tier le moins cher qui a passé le seuil"""
+    text: str
+    tier: str  # Label: tier le moins cher suffisant
+    start_tier: str  # Tier de départ effectif (pour rejouer les escalades)
+    cost: float = 0.0
+    timestamp: Optional[str] = None
+    weight: float = 1.0  # Poids à l'entraînement (réduit pour un label censuré)
+
+
+@dataclass
+class RoutingPrediction:
+    """Prédiction du routeur appris"""
+    tier: str
+    confidence: float
+    probabilities: Dict[str, float] = field(default_factory=dict)
+
+
+def extract_features(text: str, n_features: int) -> Dict[int, float]:
+    """
+    Features hachées d'une tâche (normalisées L2)
+
+    Unigrammes et bigrammes de mots, plus la longueur et le nombre de
+    questions en buckets. crc32 plutôt que hash(): stable entre processus.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    grams.append(f"__len_{min(len(tokens).bit_length(), 10)}")
+    grams.append(f"__questions_{min(text.count('?'), 3)}")
+
+    mask = n_features - 1
+    features: Dict[int, float] = {}
+    for gram in grams:
+        index = zlib.crc32(gram.encode("utf-8")) & mask
+        features[index] = features.get(index, 0.0) + 1.0
+
+    norm = math.sqrt(sum(v * v for v in features.values()))
+    return {i: v / norm for i, v in features.items()}
+
+
+def label_outcome(data: Dict[str, Any]) -> Optional[str]:
+    """
+    Tier le moins cher suffisant d'après un événement routing_outcome
+
+    Le premier tier essayé qui passe le seuil (l'escalade ne fait que
+    monter). Si aucun n'a passé, le tier au-dessus du plus haut essayé
+    (borné au dernier de l'échelle).
+    """
+    threshold = data.get("threshold", 6.0)
+    tried = []
+    for attempt in data.get("attempts", []):
+        tier = attempt.get("tier")
+        if tier not in TIER_ORDER:
+            continue
+        score = attempt.get("quality_score")
+        if score is not None and score >= threshold:
+            return tier
+        tried.append(TIER_ORDER.index(tier))
+
+    if not tried:
+        return None
+    return TIER_ORDER[min(max(tried) + 1, len(TIER_ORDER) - 1)]
+
+
+def is_censored(label: str, start_tier: str) -> bool:
+    """Succès dès un tier de départ au-dessus du plus bas: un tier moins cher aurait pu suffire"""
+    return label == start_tier and start_tier in TIER_ORDER and TIER_ORDER.index(start_tier) > 0
+
+
+def load_history(
+    log_dir: Optional[Path] = None,
+    censored_weight: Optional[float] = None
+) -> List[RoutingExample]:
+    """
+    Exemples d'entraînement depuis les sessions CortexLogger (ordre chronologique)
+
+    Args:
+        log_dir: Dossier des session_*.jsonl (défaut: celui de CortexLogger)
+        censored_weight: Poids des labels censurés (défaut: agents.learned_routing.censored_weight)
+    """
+    if log_dir is None:
+        log_dir = Path(__file__).parent.parent / "logs"
+    if censored_weight is None:
+        censored_weight = _settings().get("censored_weight", 0.2)
+
+    examples = []
+    for session_file in sorted(Path(log_dir).glob("session_*.jsonl")):
+        with open(session_file, encoding="utf-8") as f:
+            for line in f:
+                if EventType.ROUTING_OUTCOME.value not in line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("event_type") != EventType.ROUTING_OUTCOME.value:
+                    continue
+
+                data = entry.get("data", {})
+                label = label_outcome(data)
+                if not data.get("task") or label is None:
+                    continue
+                start_tier = data["attempts"][0]["tier"]
+                examples.append(RoutingExample(
+                    text=data["task"],
+                    tier=label,
+                    start_tier=start_tier,
+                    cost=entry.get("cost", 0.0),
+                    timestamp=entry.get("timestamp"),
+                    weight=censored_weight if is_censored(label, start_tier) else 1.0
+                ))
+
+    examples.sort(key=lambda e: e.timestamp or "")
+    return examples
+
+
+class LearnedRouter:
+    """Régression logistique multinomiale sur n-grammes hachés"""
+
+    def __init__(self, n_features: int = 2 ** 18, classes: Sequence[str] = TIER_ORDER):
+        """
+        Args:
+            n_features: Taille de l'espace haché (puissance de 2)
+            classes: Tiers prédits
+        """
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of 2")
+        self.n_features = n_features
+        self.classes = list(classes)
+        self.weights: Dict[int, List[float]] = {}  # Creux: seules les features vues
+        self.bias = [0.0] * len(self.classes)
+        self.trained_examples = 0
+        self.trained_at: Optional[str] = None
+
+    def predict_proba(self, text: str) -> List[float]:
+        """Probabilité de chaque tier (ordre de self.classes)"""
+        scores = list(self.bias)
+        for index, value in extract_features(text, self.n_features).items():
+            row = self.weights.get(index)
+            if row:
+                for k, w in enumerate(row):
+                    scores[k] += w * value
+        top = max(scores)
+        exps = [math.exp(s - top) for s in scores]
+        total = sum(exps)
+        return [e / total for e in exps]
+
+    def predict(self, text: str) -> RoutingPrediction:
+        """Tier le plus probable et sa probabilité (confiance)"""
+        probs = self.predict_proba(text)
+        best = max(range(len(probs)), key=probs.__getitem__)
+        return RoutingPrediction(
+            tier=self.classes[best],
+            confidence=probs[best],
+            probabilities=dict(zip(self.classes, probs))
+        )
+
+    def fit(
+        self,
+        examples: Sequence[RoutingExample],
+        epochs: int = 15,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+        seed: int = 0
+    ) -> "LearnedRouter":
+        """
+        Entraîne par descente de gradient stochastique (repart de zéro)
+
+        La régularisation L2 n'est appliquée qu'aux poids touchés par
+        l'exemple courant (approximation classique en creux). Le gradient
+        d'un exemple est multiplié par son poids (labels censurés).
+        """
+        k = len(self.classes)
+        self.weights = {}
+        self.bias = [0.0] * k
+        data = [
+            (extract_features(e.text, self.n_features), self.classes.index(e.tier), e.weight)
+            for e in examples if e.tier in self.classes and e.weight > 0
+        ]
+        rng = random.Random(seed)
+
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            rate = learning_rate / (1 + epoch * 0.5)
+            for features, label, weight in data:
+                scores = list(self.bias)
+                rows = []
+                for index, value in features.items():
+                    row = self.weights.get(index)
+                    if row is None:
+                        row = self.weights[index] = [0.0] * k
+                    rows.append((row, value))
+                    for c in range(k):
+                        scores[c] += row[c] * value
+                top = max(scores)
+                exps = [math.exp(s - top) for s in scores]
+                total = sum(exps)
+                gradient = [weight * (e / total - (1.0 if c == label else 0.0)) for c, e in enumerate(exps)]
+
+                for c in range(k):
+                    self.bias[c] -= rate * gradient[c]
+                for row, value in rows:
+                    for c in range(k):
+                        row[c] -= rate * (gradient[c] * value + l2 * row[c])
+
+        self.trained_examples = len(data)
+        self.trained_at = datetime.now().isoformat()
+        return self
+
+    def save(self, path: Path):
+        """Sauvegarde JSON (poids creux, arrondis)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": 1,
+            "n_features": self.n_features,
+            "classes": self.classes,
+            "bias": self.bias,
+            "weights": {str(i): [round(w, 6) for w in row] for i, row in self.weights.items()},
+            "trained_examples": self.trained_examples,
+            "trained_at": self.trained_at
+        }
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(payload), encoding="utf-8")
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "LearnedRouter":
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        router = cls(payload["n_features"], payload["classes"])
+        router.bias = payload["bias"]
+        router.weights = {int(i): row for i, row in payload["weights"].items()}
+        router.trained_examples = payload.get("trained_examples", 0)
+        router.trained_at = payload.get("trained_at")
+        return router
+
+
+def _heuristic_tier(model_router, text: str) -> str:
+    """Tier choisi par les heuristiques de ModelRouter (sans rôle)"""
+    tier = model_router._route_by_pattern(text)
+    if tier is None:
+        tier = model_router._route_by_complexity(model_router.analyze_complexity(text))
+    return tier.value if tier.value in TIER_ORDER else TIER_ORDER[-1]
+
+
+def evaluate_router(
+    router: Optional[LearnedRouter],
+    examples: Sequence[RoutingExample],
+    min_confidence: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Rejoue l'historique avec le routeur appris (heuristiques sous le seuil)
+
+    Modèle de rejeu: l'escalade séquentielle monte d'un tier par tentative
+    jusqu'au label. Partir au-dessus du label compte comme sur-provisionné
+    (payé plus cher que nécessaire). Les coûts par tier sont les moyennes
+    observées par tentative dans l'historique.
+
+    Returns:
+        Dict avec accuracy, couverture, escalades (historique vs rejeu),
+        escalades évitées, sur-provisionnements, coûts estimés, latence
+    """
+    from .model_router import ModelRouter
+
+    if min_confidence is None:
+        min_confidence = _settings().get("min_confidence", 0.7)
+    heuristics = ModelRouter()
+    tier_cost = _tier_costs(examples)
+
+    def replay(start: str, label: str):
+        s, t = TIER_ORDER.index(start), TIER_ORDER.index(label)
+        if s > t:
+            return 0, tier_cost[start], 1
+        return t - s, sum(tier_cost[TIER_ORDER[i]] for i in range(s, t + 1)), 0
+
+    report = {
+        "examples": len(examples), "correct": 0, "confident": 0,
+        "history_escalations": 0, "replay_escalations": 0, "heuristic_escalations": 0,
+        "over_provisioned": 0, "heuristic_over_provisioned": 0,
+        "history_cost": 0.0, "replay_cost": 0.0, "heuristic_cost": 0.0
+    }
+    latencies = []
+    for example in examples:
+        heuristic = _heuristic_tier(heuristics, example.text)
+        chosen = heuristic
+        if router is not None:
+            start = time.perf_counter()
+            prediction = router.predict(example.text)
+            latencies.append(time.perf_counter() - start)
+            if prediction.confidence >= min_confidence:
+                chosen = prediction.tier
+                report["confident"] += 1
+        report["correct"] += chosen == example.tier
+
+        for prefix, start_tier in (("history", example.start_tier), ("replay", chosen), ("heuristic", heuristic)):
+            escalations, cost, over = replay(start_tier, example.tier)
+            report[f"{prefix}_escalations"] += escalations
+            report[f"{prefix}_cost"] += cost
+            if prefix != "history":
+                report["over_provisioned" if prefix == "replay" else "heuristic_over_provisioned"] += over
+
+    n = max(len(examples), 1)
+    latencies.sort()
+    report.update({
+        "accuracy": report["correct"] / n,
+        "coverage": report["confident"] / n,
+        "escalations_avoided": report["history_escalations"] - report["replay_escalations"],
+        "inference_us_p50": latencies[len(latencies) // 2] * 1e6 if latencies else 0.0,
+        "inference_us_p99": latencies[int(len(latencies) * 0.99)] * 1e6 if latencies else 0.0,
+        "min_confidence": min_confidence
+    })
+    return report
+
+
+def _tier_costs(examples: Sequence[RoutingExample]) -> Dict[str, float]:
+    """Coût moyen d'une tentative par tier (exemples partis du tier et réussis du premier coup)"""
+    totals = {tier: [0.0, 0] for tier in TIER_ORDER}
+    for example in examples:
+        if example.start_tier == example.tier:
+            totals[example.tier][0] += example.cost
+            totals[example.tier][1] += 1
+    costs = {tier: (s / n if n else 0.0) for tier, (s, n) in totals.items()}
+    # Tiers jamais observés seuls: extrapolés depuis le précédent
+    for i, tier in enumerate(TIER_ORDER):
+        if not costs[tier] and i:
+            costs[tier] = costs[TIER_ORDER[i - 1]] * 10
+    return costs
+
+
+def _settings() -> Dict[str, Any]:
+    return get_config().get("agents.learned_routing", {}) or {}
+
+
+def _model_path() -> Path:
+    path = Path(_settings().get("model_path", "cortex/data/router_model.json"))
+    return path if path.is_absolute() else Path(__file__).parent.parent.parent / path
+
+
+def train_from_history(
+    log_dir: Optional[Path] = None,
+    model_path: Optional[Path] = None,
+    holdout: float = 0.2,
+    min_confidence: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Entraîne sur l'historique, évalue sur les exemples les plus récents, sauvegarde
+
+    L'évaluation porte sur la dernière fraction `holdout` (chronologique)
+    avec un modèle entraîné sur le reste; le modèle sauvegardé est ensuite
+    ré-entraîné sur tout l'historique.
+
+    Returns:
+        Rapport d'évaluation (+ model_path, train/holdout sizes)
+    """
+    global _learned_router, _learned_router_mtime
+
+    examples = load_history(log_dir)
+    if len(examples) < 10:
+        return {"success": False, "error": f"Not enough routing history ({len(examples)} outcomes, need 10)"}
+
+    split = max(1, int(len(examples) * (1 - holdout)))
+    report = evaluate_router(
+        LearnedRouter().fit(examples[:split]), examples[split:], min_confidence
+    )
+
+    router = LearnedRouter().fit(examples)
+    model_path = Path(model_path) if model_path else _model_path()
+    router.save(model_path)
+    _learned_router, _learned_router_mtime = None, None
+
+    report.update({
+        "success": True,
+        "model_path": str(model_path),
+        "train_examples": split,
+        "holdout_examples": len(examples) - split
+    })
+    return report
+
+
+_learned_router: Optional[LearnedRouter] = None
+_learned_router_mtime: Optional[float] = None
+
+
+def get_learned_router() -> Optional[LearnedRouter]:
+    """
+    Routeur appris du processus (None si désactivé ou pas encore entraîné)
+
+    Rechargé si le fichier modèle a changé (ré-entraînement par un autre processus).
+    """
+    global _learned_router, _learned_router_mtime
+
+    if not _settings().get("enabled", True):
+        return None
+    path = _model_path()
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return None
+    if _learned_router is None or mtime != _learned_router_mtime:
+        _learned_router = LearnedRouter.load(path)
+        _learned_router_mtime = mtime
+    return _learned_router
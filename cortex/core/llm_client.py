@@ -4,8 +4,11 @@ Gère OpenAI, DeepSeek, et Anthropic via une interface commune
 """
 
 import os
-from typing import Dict, Any, Optional, List, Union
-from dataclasses import dataclass
+import time
+import asyncio
+import threading
+from typing import Dict, Any, Optional, List, Union, Iterator, AsyncIterator
+from dataclasses import dataclass, replace
 import json
 
 # Imports conditionnels
@@ -21,12 +24,21 @@ except ImportError:
 
 from .config_loader import get_config
 from .model_router import ModelTier
+from .prompt_cache import (
+    arrange_messages,
+    static_system_count,
+    sort_tools,
+    add_anthropic_breakpoints,
+    get_prompt_cache_stats
+)
 
 # Import cache (optionnel)
 try:
     from cortex.cache.cache_manager import CacheManager
+    from cortex.cache.single_flight import get_single_flight
 except ImportError:
     CacheManager = None
+    get_single_flight = None
 
 
 @dataclass
@@ -47,6 +59,57 @@ class LLMResponse:
     cost: float
     finish_reason: str
     tool_calls: Optional[List[ToolCall]] = None
+    tokens_cached: int = 0  # Tokens d'entrée lus depuis le cache du provider (inclus dans tokens_input)
+    tokens_cache_write: int = 0  # Tokens d'entrée écrits dans le cache (Anthropic, inclus dans tokens_input)
+
+
+@dataclass
+class StreamDelta:
+    """
+    Fragment normalisé d'une complétion en streaming
+
+    Types:
+    - "text": fragment de texte (text)
+    - "tool_call": fragment d'appel d'outil (index, id/name au premier fragment, arguments partiels)
+    - "done": fin du stream, response contient la LLMResponse assemblée
+    """
+    type: str
+    text: str = ""
+    tool_call_index: Optional[int] = None
+    tool_call_id: Optional[str] = None
+    tool_name: Optional[str] = None
+    arguments_delta: str = ""
+    response: Optional[LLMResponse] = None
+
+
+class _ToolCallAssembler:
+    """Assemble les fragments d'arguments JSON des tool calls par index"""
+
+    def __init__(self):
+        self.calls: Dict[int, Dict[str, Any]] = {}
+
+    def add(self, index: int, call_id: Optional[str], name: Optional[str], arguments: str):
+        call = self.calls.setdefault(index, {"id": None, "name": None, "arguments": ""})
+        if call_id:
+            call["id"] = call_id
+        if name:
+            call["name"] = name
+        call["arguments"] += arguments or ""
+
+    def build(self) -> Optional[List[ToolCall]]:
+        if not self.calls:
+            return None
+
+        tool_calls = []
+        for index in sorted(self.calls):
+            call = self.calls[index]
+            raw = call["arguments"].strip()
+            tool_calls.append(ToolCall(
+                id=call["id"] or f"call_{index}",
+                name=call["name"] or "",
+                arguments=json.loads(raw) if raw else {}
+            ))
+        return tool_calls
 
 
 class LLMClient:
@@ -69,12 +132,23 @@ class LLMClient:
         if use_cache and CacheManager:
             try:
                 self.cache = CacheManager()
+                self.cache.set_l3_rewriter(self._rewrite_template_response)
             except Exception as e:
                 print(f"Warning: Cache initialization failed: {e}")
                 self.cache = None
         else:
             self.cache = None
 
+        # Déduplication des appels identiques simultanés (partagée par le processus)
+        if get_single_flight and self.config.get("optimization.cache.single_flight", True):
+            self.single_flight = get_single_flight()
+        else:
+            self.single_flight = None
+
+        # Métriques de streaming par tier (TTFT, tokens/sec)
+        self.stream_metrics: Dict[str, Dict[str, Any]] = {}
+        self._metrics_lock = threading.Lock()
+
     def _init_clients(self):
         """Initialise les clients API"""
         # OpenAI (gpt-5-nano)
@@ -106,6 +180,9 @@ class LLMClient:
         """
         Clean messages to remove invalid UTF-8 characters
 
+        Messages that need no cleaning are returned as-is (same objects), so
+        their memoized cache-key digests stay valid across calls.
+
         Args:
             messages: Original messages
 
@@ -114,15 +191,16 @@ class LLMClient:
         """
         cleaned = []
         for msg in messages:
-            cleaned_msg = {}
+            cleaned_msg = None
             for key, value in msg.items():
-                if isinstance(value, str):
+                if isinstance(value, str) and not value.isascii():
                     # Remove surrogate characters and other invalid UTF-8
                     cleaned_value = value.encode('utf-8', errors='ignore').decode('utf-8', errors='ignore')
-                    cleaned_msg[key] = cleaned_value
-                else:
-                    cleaned_msg[key] = value
-            cleaned.append(cleaned_msg)
+                    if cleaned_value != value:
+                        if cleaned_msg is None:
+                            cleaned_msg = dict(msg)
+                        cleaned_msg[key] = cleaned_value
+            cleaned.append(cleaned_msg if cleaned_msg is not None else msg)
         return cleaned
 
     def complete(
@@ -190,7 +268,7 @@ class LLMClient:
                     model=f"{tier.value} (cached from {cache_result.level.value})",
                     tokens_input=0,  # Pas de tokens utilisés
                     tokens_output=0,
-                    cost=0.0,  # Pas de coût
+                    cost=cache_result.cost_spent,  # Non nul seulement si réécriture L3
                     finish_reason="cached"
                 )
 
@@ -205,6 +283,43 @@ class LLMClient:
                 formatted_tools = [tool.to_openai_format() for tool in tools]
 
         # Cache miss - appeler le LLM réel
+        # Des requêtes identiques simultanées partagent un seul appel provider
+        flight_key = self._flight_key(messages, tier, max_tokens, temperature, formatted_tools, tool_choice, kwargs)
+        if flight_key is None:
+            response = self._complete_uncached(messages, tier, max_tokens, temperature, formatted_tools, tool_choice, **kwargs)
+        else:
+            response, shared = self.single_flight.do(
+                flight_key,
+                lambda: self._complete_uncached(messages, tier, max_tokens, temperature, formatted_tools, tool_choice, **kwargs)
+            )
+            if shared:
+                response = self._shared_response(response)
+
+        # Afficher infos APRÈS l'appel si verbose
+        if verbose:
+            print(f"\n{'='*60}")
+            print(f"✅ LLM Response:")
+            print(f"   Model: {response.model}")
+            print(f"   Tokens: {response.tokens_input} in → {response.tokens_output} out")
+            print(f"   Cost: ${response.cost:.6f}")
+            print(f"   Finish reason: {response.finish_reason}")
+            if response.finish_reason == "length":
+                print(f"   ⚠️  TRUNCATED - increase max_tokens!")
+            print(f"{'='*60}\n")
+
+        return response
+
+    def _complete_uncached(
+        self,
+        messages: List[Dict[str, Any]],
+        tier: ModelTier,
+        max_tokens: int,
+        temperature: float,
+        formatted_tools: Optional[List[Dict]] = None,
+        tool_choice: str = "auto",
+        **kwargs
+    ) -> LLMResponse:
+        """Appel provider puis écriture dans le cache (exécuté une fois par vol)"""
         if tier == ModelTier.NANO:
             # NANO model requires temperature=1.0 (force it to avoid API errors)
             response = self._complete_openai(messages, max_tokens, 1.0, formatted_tools, tool_choice, **kwargs)
@@ -221,18 +336,6 @@ class LLMClient:
             print(f"   Consider increasing max_tokens for this call.")
             print(f"   Model: {response.model} | Tokens: {response.tokens_input} in, {response.tokens_output} out")
 
-        # Afficher infos APRÈS l'appel si verbose
-        if verbose:
-            print(f"\n{'='*60}")
-            print(f"✅ LLM Response:")
-            print(f"   Model: {response.model}")
-            print(f"   Tokens: {response.tokens_input} in → {response.tokens_output} out")
-            print(f"   Cost: ${response.cost:.6f}")
-            print(f"   Finish reason: {response.finish_reason}")
-            if response.finish_reason == "length":
-                print(f"   ⚠️  TRUNCATED - increase max_tokens!")
-            print(f"{'='*60}\n")
-
         # Sauvegarder dans le cache
         # NOTE: Ne pas cacher les responses avec tool_calls - elles sont uniques et le cache actuel ne stocke pas les tool_calls
         if self.cache and not response.tool_calls:
@@ -246,6 +349,44 @@ class LLMClient:
 
         return response
 
+    def _flight_key(
+        self,
+        messages: List[Dict[str, Any]],
+        tier: ModelTier,
+        max_tokens: int,
+        temperature: float,
+        formatted_tools: Optional[List[Dict]],
+        tool_choice: str,
+        extra: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        Clé single-flight: clé du cache + paramètres qui changent la réponse
+
+        Returns:
+            Clé, ou None si la déduplication est désactivée
+        """
+        if self.single_flight is None:
+            return None
+
+        params = json.dumps({
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "tools": formatted_tools,
+            "tool_choice": tool_choice,
+            **extra
+        }, sort_keys=True, default=str)
+        return CacheManager._generate_key(messages, f"{tier.value}|{params}")
+
+    @staticmethod
+    def _shared_response(response: LLMResponse) -> LLMResponse:
+        """
+        Réponse obtenue via l'appel d'un autre agent
+
+        Tokens et coût sont à zéro (comme pour un hit de cache): ils ne sont
+        payés qu'une fois, par l'appelant qui a mené l'appel.
+        """
+        return replace(response, tokens_input=0, tokens_output=0, cost=0.0)
+
     def _complete_openai(
         self,
         messages: List[Dict[str, str]],
@@ -259,65 +400,14 @@ class LLMClient:
         if not self.openai_client:
             raise RuntimeError("OpenAI client not initialized. Check API key.")
 
-        model_config = self.models_config.get("nano", {})
-        model_name = model_config.get("name", "gpt-3.5-turbo")  # Fallback à un modèle existant et économique
+        # Fallback à un modèle existant et économique
+        params = self._openai_params(
+            "nano", "gpt-3.5-turbo", messages, max_tokens, temperature, tools, tool_choice, **kwargs
+        )
 
         try:
-            # Préparer les paramètres, exclure temperature=1 (default)
-            params = {
-                "model": model_name,
-                "messages": messages,
-                "max_tokens": max_tokens if model_name == "gpt-3.5-turbo" else None,
-                "max_completion_tokens": max_tokens if model_name != "gpt-3.5-turbo" else None,
-                **kwargs
-            }
-
-            # Ajouter temperature seulement si différent de 1
-            if temperature != 1.0:
-                params["temperature"] = temperature
-
-            # Ajouter tools si fournis
-            if tools:
-                params["tools"] = tools
-                if tool_choice != "auto":
-                    params["tool_choice"] = tool_choice
-
-            # Retirer None values
-            params = {k: v for k, v in params.items() if v is not None}
-
             response = self.openai_client.chat.completions.create(**params)
-
-            content = response.choices[0].message.content
-            tokens_input = response.usage.prompt_tokens
-            tokens_output = response.usage.completion_tokens
-
-            # Extraire les tool calls si présents
-            tool_calls = None
-            if hasattr(response.choices[0].message, 'tool_calls') and response.choices[0].message.tool_calls:
-                tool_calls = []
-                for tc in response.choices[0].message.tool_calls:
-                    tool_calls.append(ToolCall(
-                        id=tc.id,
-                        name=tc.function.name,
-                        arguments=json.loads(tc.function.arguments)
-                    ))
-
-            # Calculer le coût
-            cost = self._calculate_cost(
-                "nano",
-                tokens_input,
-                tokens_output
-            )
-
-            return LLMResponse(
-                content=content,
-                model=model_name,
-                tokens_input=tokens_input,
-                tokens_output=tokens_output,
-                cost=cost,
-                finish_reason=response.choices[0].finish_reason,
-                tool_calls=tool_calls
-            )
+            return self._parse_openai_response(response, "nano", params["model"])
 
         except Exception as e:
             raise RuntimeError(f"OpenAI API error: {e}")
@@ -335,61 +425,14 @@ class LLMClient:
         if not self.deepseek_client:
             raise RuntimeError("DeepSeek client not initialized. Check API key.")
 
-        model_config = self.models_config.get("deepseek", {})
-        model_name = model_config.get("name", "deepseek-reasoner")
+        # deepseek-reasoner ne supporte que temperature=1 (default)
+        params = self._openai_params(
+            "deepseek", "deepseek-reasoner", messages, max_tokens, temperature, tools, tool_choice, **kwargs
+        )
 
         try:
-            params = {
-                "model": model_name,
-                "messages": messages,
-                "max_completion_tokens": max_tokens,
-                **kwargs
-            }
-
-            # Ajouter temperature seulement si différent de 1.0
-            # deepseek-reasoner ne supporte que temperature=1 (default)
-            if temperature != 1.0:
-                params["temperature"] = temperature
-
-            # Ajouter tools si fournis
-            if tools:
-                params["tools"] = tools
-                if tool_choice != "auto":
-                    params["tool_choice"] = tool_choice
-
             response = self.deepseek_client.chat.completions.create(**params)
-
-            content = response.choices[0].message.content
-            tokens_input = response.usage.prompt_tokens
-            tokens_output = response.usage.completion_tokens
-
-            # Extraire les tool calls si présents
-            tool_calls = None
-            if hasattr(response.choices[0].message, 'tool_calls') and response.choices[0].message.tool_calls:
-                tool_calls = []
-                for tc in response.choices[0].message.tool_calls:
-                    tool_calls.append(ToolCall(
-                        id=tc.id,
-                        name=tc.function.name,
-                        arguments=json.loads(tc.function.arguments)
-                    ))
-
-            # Calculer le coût
-            cost = self._calculate_cost(
-                "deepseek",
-                tokens_input,
-                tokens_output
-            )
-
-            return LLMResponse(
-                content=content,
-                model=model_name,
-                tokens_input=tokens_input,
-                tokens_output=tokens_output,
-                cost=cost,
-                finish_reason=response.choices[0].finish_reason,
-                tool_calls=tool_calls
-            )
+            return self._parse_openai_response(response, "deepseek", params["model"])
 
         except Exception as e:
             raise RuntimeError(f"DeepSeek API error: {e}")
@@ -407,97 +450,680 @@ class LLMClient:
         if not self.anthropic_client:
             raise RuntimeError("Anthropic client not initialized. Check API key.")
 
+        params = self._anthropic_params(messages, max_tokens, temperature, tools, tool_choice, **kwargs)
+
+        try:
+            response = self.anthropic_client.messages.create(**params)
+            return self._parse_anthropic_response(response, params["model"])
+
+        except Exception as e:
+            raise RuntimeError(f"Anthropic API error: {e}")
+
+    def _openai_params(
+        self,
+        tier_key: str,
+        default_model: str,
+        messages: List[Dict[str, Any]],
+        max_tokens: int,
+        temperature: float,
+        tools: Optional[List[Dict]] = None,
+        tool_choice: str = "auto",
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Paramètres chat.completions communs à OpenAI et DeepSeek
+
+        Le cache de préfixe est automatique chez ces providers: les messages
+        sont ordonnés (system statique, historique, contexte volatile) et les
+        outils triés pour que le début du prompt reste identique.
+        """
+        model_config = self.models_config.get(tier_key, {})
+        model_name = model_config.get("name", default_model)
+
+        messages, _ = arrange_messages(messages)
+        tools = sort_tools(tools)
+
+        params = {
+            "model": model_name,
+            "messages": messages,
+            **kwargs
+        }
+        if model_name == "gpt-3.5-turbo":
+            params["max_tokens"] = max_tokens
+        else:
+            params["max_completion_tokens"] = max_tokens
+
+        # Ajouter temperature seulement si différent de 1 (default)
+        if temperature != 1.0:
+            params["temperature"] = temperature
+
+        # Ajouter tools si fournis
+        if tools:
+            params["tools"] = tools
+            if tool_choice != "auto":
+                params["tool_choice"] = tool_choice
+
+        return params
+
+    def _parse_openai_response(self, response, tier_key: str, model_name: str) -> LLMResponse:
+        """Convertit une réponse chat.completions en LLMResponse"""
+        message = response.choices[0].message
+        tokens_input, tokens_cached = self._openai_usage(response.usage)
+        tokens_output = response.usage.completion_tokens
+
+        # Extraire les tool calls si présents
+        tool_calls = None
+        if getattr(message, 'tool_calls', None):
+            tool_calls = [
+                ToolCall(
+                    id=tc.id,
+                    name=tc.function.name,
+                    arguments=json.loads(tc.function.arguments)
+                )
+                for tc in message.tool_calls
+            ]
+
+        return self._record_prompt_cache(tier_key, LLMResponse(
+            content=message.content,
+            model=model_name,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output,
+            cost=self._calculate_cost(tier_key, tokens_input, tokens_output, tokens_cached),
+            finish_reason=response.choices[0].finish_reason,
+            tool_calls=tool_calls,
+            tokens_cached=tokens_cached
+        ))
+
+    @staticmethod
+    def _openai_usage(usage) -> tuple:
+        """
+        (tokens d'entrée, tokens lus depuis le cache) d'un usage chat.completions
+
+        OpenAI: prompt_tokens_details.cached_tokens
+        DeepSeek: prompt_cache_hit_tokens
+        """
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or getattr(usage, "prompt_cache_hit_tokens", None) or 0
+        return usage.prompt_tokens, cached
+
+    @staticmethod
+    def _anthropic_usage(usage) -> tuple:
+        """
+        (tokens d'entrée, lus depuis le cache, écrits dans le cache) d'un usage Anthropic
+
+        input_tokens exclut les tokens lus/écrits dans le cache: on les ajoute
+        pour que tokens_input compte tout le prompt, comme chez OpenAI.
+        """
+        cached = getattr(usage, "cache_read_input_tokens", None) or 0
+        written = getattr(usage, "cache_creation_input_tokens", None) or 0
+        return (usage.input_tokens or 0) + cached + written, cached, written
+
+    def _anthropic_params(
+        self,
+        messages: List[Dict[str, Any]],
+        max_tokens: int,
+        temperature: float,
+        tools: Optional[List[Dict]] = None,
+        tool_choice: str = "auto",
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Paramètres de l'API messages d'Anthropic"""
         model_config = self.models_config.get("claude", {})
         model_name = model_config.get("name", "claude-sonnet-4-20250514")
 
-        # Convertir le format des messages pour Anthropic
-        system_message = None
+        # Préfixe stable d'abord, puis conversion au format Anthropic: seul le
+        # system statique va dans le bloc system (et son point de cache)
+        system_count = static_system_count(messages)
+        messages, stable_count = arrange_messages(messages)
+        system_message, anthropic_messages = self._to_anthropic_messages(messages, system_count)
+
+        params = {
+            "model": model_name,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": anthropic_messages,
+            **kwargs
+        }
+        if system_message:
+            params["system"] = system_message
+
+        # Ajouter tools si fournis
+        if tools:
+            params["tools"] = sort_tools(tools)
+            # Anthropic utilise tool_choice différemment
+            if tool_choice != "auto":
+                params["tool_choice"] = {"type": "tool", "name": tool_choice} if tool_choice != "none" else {"type": "auto"}
+
+        # Points de cache explicites (outils, system, historique)
+        if self.config.get("optimization.prompt_cache.anthropic_breakpoints", True):
+            add_anthropic_breakpoints(params, stable_count)
+
+        return params
+
+    def _parse_anthropic_response(self, response, model_name: str) -> LLMResponse:
+        """Convertit une réponse Anthropic en LLMResponse"""
+        # Extraire le contenu (peut être text ou tool_use)
+        content = None
+        tool_calls = None
+
+        for block in response.content:
+            if block.type == "text":
+                content = block.text
+            elif block.type == "tool_use":
+                if tool_calls is None:
+                    tool_calls = []
+                tool_calls.append(ToolCall(
+                    id=block.id,
+                    name=block.name,
+                    arguments=block.input
+                ))
+
+        tokens_input, tokens_cached, tokens_written = self._anthropic_usage(response.usage)
+        tokens_output = response.usage.output_tokens
+
+        return self._record_prompt_cache("claude", LLMResponse(
+            content=content,
+            model=model_name,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output,
+            cost=self._calculate_cost("claude", tokens_input, tokens_output, tokens_cached, tokens_written),
+            finish_reason=response.stop_reason,
+            tool_calls=tool_calls,
+            tokens_cached=tokens_cached,
+            tokens_cache_write=tokens_written
+        ))
+
+    def _to_anthropic_messages(
+        self,
+        messages: List[Dict[str, Any]],
+        system_count: Optional[int] = None
+    ) -> tuple:
+        """
+        Sépare le prompt système et convertit les messages au format Anthropic
+
+        Les messages système de tête forment le system (au plus system_count
+        d'entre eux); un message système placé plus loin (contexte volatile,
+        consigne en cours de conversation) devient un tour utilisateur.
+        """
+        system_parts = []
         anthropic_messages = []
 
         for msg in messages:
             if msg["role"] == "system":
-                system_message = msg["content"]
+                if anthropic_messages or (system_count is not None and len(system_parts) >= system_count):
+                    anthropic_messages.append({"role": "user", "content": msg["content"]})
+                else:
+                    system_parts.append(msg["content"])
             else:
                 anthropic_messages.append({
                     "role": msg["role"],
                     "content": msg["content"]
                 })
 
-        try:
-            params = {
-                "model": model_name,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-                "system": system_message,
-                "messages": anthropic_messages,
-                **kwargs
-            }
-
-            # Ajouter tools si fournis
-            if tools:
-                params["tools"] = tools
-                # Anthropic utilise tool_choice différemment
-                if tool_choice != "auto":
-                    params["tool_choice"] = {"type": "tool", "name": tool_choice} if tool_choice != "none" else {"type": "auto"}
+        system_message = "\n\n".join(system_parts) if system_parts else None
+        return system_message, anthropic_messages
 
-            response = self.anthropic_client.messages.create(**params)
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        tier: ModelTier,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        tools: Optional[List] = None,
+        tool_choice: str = "auto",
+        **kwargs
+    ) -> Iterator[StreamDelta]:
+        """
+        Génère une complétion en streaming
 
-            # Extraire le contenu (peut être text ou tool_use)
-            content = None
-            tool_calls = None
-
-            for block in response.content:
-                if block.type == "text":
-                    content = block.text
-                elif block.type == "tool_use":
-                    if tool_calls is None:
-                        tool_calls = []
-                    tool_calls.append(ToolCall(
-                        id=block.id,
-                        name=block.name,
-                        arguments=block.input
-                    ))
-
-            tokens_input = response.usage.input_tokens
-            tokens_output = response.usage.output_tokens
-
-            # Calculer le coût
-            cost = self._calculate_cost(
-                "claude",
-                tokens_input,
-                tokens_output
-            )
+        Produit des StreamDelta normalisés quel que soit le provider:
+        fragments de texte au fil de l'eau, fragments de tool calls
+        (arguments JSON assemblés incrémentalement), puis un delta "done"
+        portant la LLMResponse complète (coût, tokens, tool calls parsés).
+
+        Args:
+            messages: Liste de messages au format [{"role": "user", "content": "..."}]
+            tier: Tier du modèle (NANO, DEEPSEEK, CLAUDE)
+            max_tokens: Tokens maximum de sortie (si None, utilise models.yaml)
+            temperature: Température (0-1)
+            tools: Liste d'outils StandardTool disponibles pour le LLM
+            tool_choice: "auto", "none", ou nom spécifique d'outil
+            **kwargs: Paramètres additionnels
+
+        Yields:
+            StreamDelta
+        """
+        messages = self._clean_messages(messages)
+
+        if max_tokens is None:
+            model_config = self.models_config.get(tier.value.lower(), {})
+            max_tokens = model_config.get("max_tokens", 8192)
+
+        # Cache hit: un seul fragment, pas de latence réseau
+        if self.cache:
+            cache_result = self.cache.get(messages, tier.value, max_tokens)
+            if cache_result.hit:
+                response = LLMResponse(
+                    content=cache_result.content,
+                    model=f"{tier.value} (cached from {cache_result.level.value})",
+                    tokens_input=0,
+                    tokens_output=0,
+                    cost=cache_result.cost_spent,
+                    finish_reason="cached"
+                )
+                yield StreamDelta(type="text", text=cache_result.content or "")
+                yield StreamDelta(type="done", response=response)
+                return
 
-            return LLMResponse(
-                content=content,
-                model=model_name,
-                tokens_input=tokens_input,
-                tokens_output=tokens_output,
-                cost=cost,
-                finish_reason=response.stop_reason,
-                tool_calls=tool_calls
+        formatted_tools = None
+        if tools:
+            if tier == ModelTier.CLAUDE:
+                formatted_tools = [tool.to_anthropic_format() for tool in tools]
+            else:
+                formatted_tools = [tool.to_openai_format() for tool in tools]
+
+        if tier == ModelTier.NANO:
+            if not self.openai_client:
+                raise RuntimeError("OpenAI client not initialized. Check API key.")
+            deltas = self._stream_openai_compatible(
+                self.openai_client, "nano", "gpt-3.5-turbo",
+                messages, max_tokens, 1.0, formatted_tools, tool_choice, **kwargs
             )
+        elif tier == ModelTier.DEEPSEEK:
+            if not self.deepseek_client:
+                raise RuntimeError("DeepSeek client not initialized. Check API key.")
+            deltas = self._stream_openai_compatible(
+                self.deepseek_client, "deepseek", "deepseek-reasoner",
+                messages, max_tokens, temperature, formatted_tools, tool_choice, **kwargs
+            )
+        elif tier == ModelTier.CLAUDE:
+            if not self.anthropic_client:
+                raise RuntimeError("Anthropic client not initialized. Check API key.")
+            deltas = self._stream_anthropic(
+                messages, max_tokens, temperature, formatted_tools, tool_choice, **kwargs
+            )
+        else:
+            raise ValueError(f"Unknown model tier: {tier}")
+
+        start = time.perf_counter()
+        first_token_at = None
+
+        for delta in deltas:
+            if first_token_at is None and delta.type in ("text", "tool_call"):
+                first_token_at = time.perf_counter()
+
+            if delta.type == "done":
+                response = delta.response
+                end = time.perf_counter()
+                self._record_stream_metrics(
+                    tier.value,
+                    ttft=(first_token_at or end) - start,
+                    generation_time=end - (first_token_at or start),
+                    tokens_output=response.tokens_output
+                )
+
+                if response.finish_reason == "length":
+                    print(f"⚠️  WARNING: Response truncated! Output reached max_tokens limit ({max_tokens})")
+
+                if self.cache and not response.tool_calls and response.content:
+                    self.cache.set(
+                        messages,
+                        tier.value,
+                        response.content,
+                        response.tokens_input + response.tokens_output,
+                        response.cost
+                    )
+
+            yield delta
+
+    async def astream(
+        self,
+        messages: List[Dict[str, str]],
+        tier: ModelTier,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        tools: Optional[List] = None,
+        tool_choice: str = "auto",
+        **kwargs
+    ) -> AsyncIterator[StreamDelta]:
+        """
+        Variante async de stream()
+
+        Le stream synchrone tourne dans un thread dédié et ses fragments
+        sont relayés via une asyncio.Queue: la boucle d'événements n'est
+        jamais bloquée par le réseau.
+
+        Yields:
+            StreamDelta
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        # Levé quand le consommateur s'arrête (aclose, annulation): le
+        # producteur ferme alors le stream provider au lieu de le vider
+        stopped = threading.Event()
+
+        def relay(item):
+            if loop.is_closed():
+                return
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:  # Boucle fermée entre-temps
+                pass
+
+        def produce():
+            deltas = self.stream(messages, tier, max_tokens, temperature, tools, tool_choice, **kwargs)
+            try:
+                for delta in deltas:
+                    if stopped.is_set():
+                        break
+                    relay(delta)
+            except Exception as e:
+                relay(e)
+            finally:
+                deltas.close()
+                relay(finished)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stopped.set()
+
+    def _stream_openai_compatible(
+        self,
+        client,
+        tier_key: str,
+        default_model: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        tools: Optional[List[Dict]] = None,
+        tool_choice: str = "auto",
+        **kwargs
+    ) -> Iterator[StreamDelta]:
+        """Streaming via l'API chat.completions (OpenAI et DeepSeek)"""
+        params = self._openai_params(
+            tier_key, default_model, messages, max_tokens, temperature, tools, tool_choice, **kwargs
+        )
+        params["stream"] = True
+        params["stream_options"] = {"include_usage": True}
+        model_name = params["model"]
+
+        provider = "OpenAI" if tier_key == "nano" else "DeepSeek"
+        text_parts = []
+        assembler = _ToolCallAssembler()
+        finish_reason = None
+        tokens_input = 0
+        tokens_cached = 0
+        tokens_output = 0
+
+        try:
+            with client.chat.completions.create(**params) as chunks:
+                for chunk in chunks:
+                    if getattr(chunk, "usage", None):
+                        tokens_input, tokens_cached = self._openai_usage(chunk.usage)
+                        tokens_output = chunk.usage.completion_tokens
+
+                    if not chunk.choices:
+                        continue
+
+                    choice = chunk.choices[0]
+                    delta = choice.delta
+
+                    if delta is not None and delta.content:
+                        text_parts.append(delta.content)
+                        yield StreamDelta(type="text", text=delta.content)
+
+                    for tc in (getattr(delta, "tool_calls", None) or []):
+                        function = tc.function
+                        name = function.name if function else None
+                        arguments = function.arguments if function else ""
+                        assembler.add(tc.index, tc.id, name, arguments)
+                        yield StreamDelta(
+                            type="tool_call",
+                            tool_call_index=tc.index,
+                            tool_call_id=tc.id,
+                            tool_name=name,
+                            arguments_delta=arguments or ""
+                        )
+
+                    if choice.finish_reason:
+                        finish_reason = choice.finish_reason
+
+            tool_calls = assembler.build()
+
+        except Exception as e:
+            raise RuntimeError(f"{provider} API error: {e}")
+
+        yield StreamDelta(type="done", response=self._record_prompt_cache(tier_key, LLMResponse(
+            content="".join(text_parts) or None,
+            model=model_name,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output,
+            cost=self._calculate_cost(tier_key, tokens_input, tokens_output, tokens_cached),
+            finish_reason=finish_reason or "stop",
+            tool_calls=tool_calls,
+            tokens_cached=tokens_cached
+        )))
+
+    def _stream_anthropic(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        tools: Optional[List[Dict]] = None,
+        tool_choice: str = "auto",
+        **kwargs
+    ) -> Iterator[StreamDelta]:
+        """Streaming via l'API messages d'Anthropic (événements SSE)"""
+        params = self._anthropic_params(messages, max_tokens, temperature, tools, tool_choice, **kwargs)
+        params["stream"] = True
+        model_name = params["model"]
+
+        text_parts = []
+        assembler = _ToolCallAssembler()
+        finish_reason = None
+        tokens_input = 0
+        tokens_cached = 0
+        tokens_written = 0
+        tokens_output = 0
+
+        try:
+            with self.anthropic_client.messages.create(**params) as events:
+                for event in events:
+                    if event.type == "message_start":
+                        tokens_input, tokens_cached, tokens_written = self._anthropic_usage(event.message.usage)
+
+                    elif event.type == "content_block_start":
+                        block = event.content_block
+                        if block.type == "tool_use":
+                            assembler.add(event.index, block.id, block.name, "")
+                            yield StreamDelta(
+                                type="tool_call",
+                                tool_call_index=event.index,
+                                tool_call_id=block.id,
+                                tool_name=block.name
+                            )
+
+                    elif event.type == "content_block_delta":
+                        if event.delta.type == "text_delta":
+                            text_parts.append(event.delta.text)
+                            yield StreamDelta(type="text", text=event.delta.text)
+                        elif event.delta.type == "input_json_delta":
+                            assembler.add(event.index, None, None, event.delta.partial_json)
+                            yield StreamDelta(
+                                type="tool_call",
+                                tool_call_index=event.index,
+                                arguments_delta=event.delta.partial_json
+                            )
+
+                    elif event.type == "message_delta":
+                        finish_reason = event.delta.stop_reason or finish_reason
+                        if event.usage:
+                            tokens_output = event.usage.output_tokens
+
+            tool_calls = assembler.build()
 
         except Exception as e:
             raise RuntimeError(f"Anthropic API error: {e}")
 
+        yield StreamDelta(type="done", response=self._record_prompt_cache("claude", LLMResponse(
+            content="".join(text_parts) or None,
+            model=model_name,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output,
+            cost=self._calculate_cost("claude", tokens_input, tokens_output, tokens_cached, tokens_written),
+            finish_reason=finish_reason or "end_turn",
+            tool_calls=tool_calls,
+            tokens_cached=tokens_cached,
+            tokens_cache_write=tokens_written
+        )))
+
+    def _record_stream_metrics(
+        self,
+        tier: str,
+        ttft: float,
+        generation_time: float,
+        tokens_output: int
+    ):
+        """Enregistre time-to-first-token et débit de génération pour un tier"""
+        with self._metrics_lock:
+            metrics = self.stream_metrics.setdefault(tier, {
+                "streams": 0,
+                "ttft_total": 0.0,
+                "ttft_min": None,
+                "ttft_max": 0.0,
+                "tokens_output": 0,
+                "generation_time": 0.0
+            })
+            metrics["streams"] += 1
+            metrics["ttft_total"] += ttft
+            metrics["ttft_min"] = ttft if metrics["ttft_min"] is None else min(metrics["ttft_min"], ttft)
+            metrics["ttft_max"] = max(metrics["ttft_max"], ttft)
+            metrics["tokens_output"] += tokens_output
+            metrics["generation_time"] += generation_time
+
+    def get_stream_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Statistiques de streaming par tier
+
+        Returns:
+            {tier: {"streams", "ttft_avg", "ttft_min", "ttft_max", "tokens_per_sec"}}
+        """
+        with self._metrics_lock:
+            stats = {}
+            for tier, m in self.stream_metrics.items():
+                stats[tier] = {
+                    "streams": m["streams"],
+                    "ttft_avg": m["ttft_total"] / m["streams"],
+                    "ttft_min": m["ttft_min"],
+                    "ttft_max": m["ttft_max"],
+                    "tokens_per_sec": (
+                        m["tokens_output"] / m["generation_time"]
+                        if m["generation_time"] > 0 else 0.0
+                    )
+                }
+            return stats
+
+    def _rewrite_template_response(
+        self,
+        cached_response: str,
+        old_slots: List[str],
+        new_slots: List[str],
+        request: str
+    ) -> Optional[tuple]:
+        """
+        Adapte une réponse du cache L3 à de nouvelles valeurs de slots (NANO)
+
+        Appelé directement sur le provider pour ne pas repasser par le cache.
+
+        Returns:
+            (contenu, coût) ou None si NANO juge l'adaptation impossible
+        """
+        if not self.openai_client:
+            return None
+
+        substitutions = "\n".join(
+            f"- {old} → {new}" for old, new in zip(old_slots, new_slots) if old != new
+        )
+        prompt = f"""Adapt this answer to a new request that differs only by these values:
+{substitutions}
+
+NEW REQUEST: {request}
+
+ANSWER TO ADAPT:
+{cached_response}
+
+Rewrite the answer for the new values, keeping everything else identical.
+If the answer depends on facts that change with the new values (live data, lookups, computations you cannot redo), reply exactly: CANNOT_ADAPT"""
+
+        try:
+            response = self._complete_openai(
+                [{"role": "user", "content": prompt}],
+                max_tokens=max(256, len(cached_response) // 2),
+                temperature=1.0
+            )
+        except Exception:
+            return None
+
+        if not response.content or "CANNOT_ADAPT" in response.content:
+            return None
+
+        return response.content, response.cost
+
     def _calculate_cost(
         self,
         tier: str,
         tokens_input: int,
-        tokens_output: int
+        tokens_output: int,
+        tokens_cached: int = 0,
+        tokens_cache_write: int = 0
     ) -> float:
-        """Calcule le coût d'un appel"""
+        """
+        Calcule le coût d'un appel
+
+        tokens_input inclut les tokens lus (tokens_cached) et écrits
+        (tokens_cache_write) dans le cache du provider, facturés à leurs
+        tarifs propres (cost_per_1m_cached_input, cost_per_1m_cache_write).
+        """
         model_config = self.models_config.get(tier, {})
 
         cost_per_1m_input = model_config.get("cost_per_1m_input", 0.0)
         cost_per_1m_output = model_config.get("cost_per_1m_output", 0.0)
-
-        input_cost = (tokens_input / 1_000_000) * cost_per_1m_input
+        cost_per_1m_cached = model_config.get("cost_per_1m_cached_input", cost_per_1m_input)
+        cost_per_1m_write = model_config.get("cost_per_1m_cache_write", cost_per_1m_input)
+
+        uncached = max(tokens_input - tokens_cached - tokens_cache_write, 0)
+        input_cost = (
+            uncached * cost_per_1m_input
+            + tokens_cached * cost_per_1m_cached
+            + tokens_cache_write * cost_per_1m_write
+        ) / 1_000_000
         output_cost = (tokens_output / 1_000_000) * cost_per_1m_output
 
         return input_cost + output_cost
 
+    def _record_prompt_cache(self, tier: str, response: LLMResponse) -> LLMResponse:
+        """Enregistre l'usage du cache de préfixe (par agent) et retourne la réponse"""
+        full_price = self._calculate_cost(tier, response.tokens_input, response.tokens_output)
+        get_prompt_cache_stats().record(
+            tier,
+            response.tokens_input,
+            response.tokens_cached,
+            response.tokens_cache_write,
+            cost_saved=full_price - response.cost
+        )
+        return response
+
     def is_available(self, tier: ModelTier) -> bool:
         """Vérifie si un tier de modèle est disponible"""
         if tier == ModelTier.NANO:
@@ -0,0 +1,286 @@
+"""
+Log Reader - Lecture des journaux sans les charger en entier
+
+- tail_lines: dernières lignes d'un fichier, lues à reculons sur un mmap;
+  le coût dépend du nombre de lignes demandées, pas de la taille du fichier
+- LogIngestor: lecture incrémentale des journaux en ajout seul (.log,
+  session_*.jsonl de CortexLogger, historiques JSONL) avec un checkpoint par
+  fichier (offset en octets, inode, premiers octets). Un audit ne lit que ce
+  qui a été écrit depuis le précédent et tient à jour des agrégats
+  (LogAggregates), persistés avec les checkpoints
+- Fichier remplacé, tronqué ou réécrit (clear_history): relu depuis le début
+- Premier passage sur un gros fichier: seuls les max_backfill_bytes derniers
+  octets sont ingérés (le reste est compté dans skipped_bytes)
+
+Usage:
+    lines = tail_lines("cortex/logs/app.log", 200)
+    ingestor = LogIngestor("cortex/data/quality_log_state.json")
+    ingestor.ingest("cortex/logs/app.log", "text")
+    ingestor.save()
+    summary = ingestor.aggregates.summary()
+"""
+
+import json
+import mmap
+import os
+import re
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional
+
+HEAD_BYTES = 64  # Empreinte du début de fichier (détecte les réécritures)
+MAX_DISTINCT_ERRORS = 200  # Messages d'erreur distincts gardés dans les agrégats
+
+_LEVEL_RE = re.compile(rb"\b(CRITICAL|ERROR|WARNING|WARN|INFO|DEBUG)\b")
+_VOLATILE_RE = re.compile(r"0x[0-9a-fA-F]+|\d+")
+
+
+def tail_lines(
+    path,
+    count: int,
+    match: Optional[Callable[[bytes], bool]] = None
+) -> List[str]:
+    """
+    Dernières lignes d'un fichier, sans le lire en entier
+
+    Args:
+        path: Fichier à lire
+        count: Nombre de lignes voulues
+        match: Filtre sur la ligne brute (bytes); seules les lignes
+            acceptées sont comptées
+
+    Returns:
+        Lignes dans l'ordre du fichier, terminées par '\\n' (comme readlines)
+    """
+    if count <= 0:
+        return []
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            lines: List[bytes] = []
+            end = size - 1 if mm[size - 1] == 0x0A else size
+            while end >= 0 and len(lines) < count:
+                start = mm.rfind(b"\n", 0, end) + 1
+                line = mm[start:end]
+                if match is None or match(line):
+                    lines.append(line)
+                end = start - 1
+    return [line.decode('utf-8', errors='ignore') + "\n" for line in reversed(lines)]
+
+
+class LogAggregates:
+    """
+    Agrégats cumulés des journaux ingérés (taille bornée)
+
+    - text: niveaux (ERROR, WARNING...) et messages d'erreur normalisés
+    - events: événements CortexLogger par agent (nombre, échecs, coût) et par type
+    - conversation: messages par rôle
+    - quality: évaluations du contrôle qualité (score moyen, part < 70)
+    """
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        data = data or {}
+        self.since: str = data.get("since") or datetime.now().isoformat()
+        self.entries: int = data.get("entries", 0)
+        self.skipped_bytes: int = data.get("skipped_bytes", 0)
+        self.levels = Counter(data.get("levels", {}))
+        self.errors = Counter(data.get("errors", {}))
+        self.agents: Dict[str, Dict[str, float]] = data.get("agents", {})
+        self.event_types = Counter(data.get("event_types", {}))
+        self.messages = Counter(data.get("messages", {}))
+        self.quality: Dict[str, float] = data.get("quality", {"count": 0, "score_sum": 0.0, "low": 0})
+
+    def add(self, kind: str, line: bytes):
+        """Ajoute une ligne brute d'un journal de type kind"""
+        line = line.strip()
+        if not line:
+            return
+        self.entries += 1
+        if kind == "text":
+            self._add_text(line)
+            return
+        try:
+            record = json.loads(line)
+        except ValueError:
+            self._add_text(line)
+            return
+        if not isinstance(record, dict):
+            return
+        if kind == "events":
+            self._add_event(record)
+        elif kind == "conversation":
+            if record.get("type") == "message":
+                self.messages[record.get("role", "unknown")] += 1
+        elif kind == "quality":
+            self.quality["count"] += 1
+            score = record.get("total_score", 0) or 0
+            self.quality["score_sum"] += score
+            self.quality["low"] += score < 70
+
+    def _add_text(self, line: bytes):
+        level = _LEVEL_RE.search(line)
+        if not level:
+            return
+        name = level.group(1).decode()
+        name = "WARNING" if name == "WARN" else name
+        self.levels[name] += 1
+        if name in ("ERROR", "CRITICAL"):
+            message = line[level.end():].decode('utf-8', errors='ignore').strip(" :-]")
+            self._add_error(message)
+
+    def _add_event(self, record: Dict[str, Any]):
+        agent = self.agents.setdefault(record.get("agent", "unknown"), {"events": 0, "failures": 0, "cost": 0.0})
+        agent["events"] += 1
+        agent["cost"] += record.get("cost", 0.0) or 0.0
+        self.event_types[record.get("event_type", "unknown")] += 1
+        if record.get("success") is False:
+            agent["failures"] += 1
+            self._add_error(str(record.get("message", "")))
+
+    def _add_error(self, message: str):
+        # Identifiants, durées, adresses: mêmes erreurs regroupées
+        self.errors[_VOLATILE_RE.sub("#", message)[:160]] += 1
+        if len(self.errors) > MAX_DISTINCT_ERRORS:
+            self.errors = Counter(dict(self.errors.most_common(MAX_DISTINCT_ERRORS // 2)))
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """Vue compacte pour un prompt ou un rapport"""
+        agents = sorted(self.agents.items(), key=lambda item: item[1]["events"], reverse=True)[:top]
+        count = self.quality["count"]
+        return {
+            "since": self.since,
+            "entries": self.entries,
+            "skipped_bytes": self.skipped_bytes,
+            "levels": dict(self.levels),
+            "top_errors": [{"message": m, "count": c} for m, c in self.errors.most_common(top)],
+            "agents": [
+                {"agent": name, "events": a["events"], "failure_rate": round(a["failures"] / a["events"], 3),
+                 "cost": round(a["cost"], 6)}
+                for name, a in agents
+            ],
+            "event_types": dict(self.event_types.most_common(top)),
+            "messages_by_role": dict(self.messages),
+            "quality": {
+                "evaluations": count,
+                "avg_score": round(self.quality["score_sum"] / count, 1) if count else None,
+                "low_quality_rate": round(self.quality["low"] / count, 3) if count else None
+            }
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "since": self.since, "entries": self.entries, "skipped_bytes": self.skipped_bytes,
+            "levels": dict(self.levels), "errors": dict(self.errors), "agents": self.agents,
+            "event_types": dict(self.event_types), "messages": dict(self.messages), "quality": self.quality
+        }
+
+
+class LogIngestor:
+    """Lecture incrémentale de journaux avec checkpoints persistés"""
+
+    def __init__(
+        self,
+        state_path,
+        max_backfill_bytes: int = 64 * 1024 * 1024,
+        chunk_size: int = 4 * 1024 * 1024
+    ):
+        """
+        Args:
+            state_path: Fichier JSON des checkpoints et agrégats
+            max_backfill_bytes: Octets lus au premier passage sur un fichier
+            chunk_size: Taille des blocs lus
+        """
+        self.state_path = Path(state_path)
+        self.max_backfill_bytes = max_backfill_bytes
+        self.chunk_size = chunk_size
+
+        state: Dict[str, Any] = {}
+        if self.state_path.exists():
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not load log checkpoints, starting over: {e}")
+        self.checkpoints: Dict[str, Dict[str, Any]] = state.get("checkpoints", {})
+        self.aggregates = LogAggregates(state.get("aggregates"))
+
+    def ingest(self, path, kind: str) -> int:
+        """
+        Ingère les lignes complètes écrites depuis le dernier checkpoint
+
+        Args:
+            path: Journal en ajout seul
+            kind: "text", "events", "conversation" ou "quality" (voir LogAggregates)
+
+        Returns:
+            Nombre de nouvelles lignes
+        """
+        key = str(Path(path).resolve())
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            offset = self._resume_offset(key, f, stat)
+            f.seek(0)
+            head = f.read(HEAD_BYTES).hex()
+
+            # Lecture par blocs (mémoire bornée); la dernière ligne incomplète
+            # est laissée pour le prochain passage
+            new_lines = 0
+            pending = b""
+            f.seek(offset)
+            while offset < stat.st_size:
+                chunk = f.read(min(self.chunk_size, stat.st_size - offset))
+                if not chunk:
+                    break
+                offset += len(chunk)
+                chunk = pending + chunk
+                end = chunk.rfind(b"\n")
+                if end < 0:
+                    pending = chunk
+                    continue
+                for line in chunk[:end].split(b"\n"):
+                    self.aggregates.add(kind, line)
+                    new_lines += 1
+                pending = chunk[end + 1:]
+            offset -= len(pending)
+        self.checkpoints[key] = {"offset": offset, "inode": stat.st_ino, "head": head}
+        return new_lines
+
+    def _resume_offset(self, key: str, f, stat: os.stat_result) -> int:
+        """Offset de reprise: checkpoint valide, ou début (borné par max_backfill_bytes)"""
+        size = stat.st_size
+        checkpoint = self.checkpoints.get(key)
+        if checkpoint and checkpoint["inode"] == stat.st_ino and checkpoint["offset"] <= size:
+            offset = checkpoint["offset"]
+            head = bytes.fromhex(checkpoint.get("head", ""))
+            f.seek(0)
+            if f.read(len(head)) == head:
+                f.seek(max(0, offset - 1))
+                if offset == 0 or f.read(1) == b"\n":
+                    return offset
+
+        # Nouveau fichier, remplacé ou réécrit
+        offset = max(0, size - self.max_backfill_bytes)
+        if offset > 0:
+            # Aligné sur un début de ligne
+            f.seek(offset - 1)
+            while offset <= size:
+                block = f.read(64 * 1024)
+                newline = block.find(b"\n")
+                if newline >= 0 or not block:
+                    offset = offset + newline if newline >= 0 else size
+                    break
+                offset += len(block)
+            self.aggregates.skipped_bytes += offset
+        return offset
+
+    def save(self):
+        """Écrit checkpoints et agrégats (remplacement atomique)"""
+        self.checkpoints = {path: cp for path, cp in self.checkpoints.items() if Path(path).exists()}
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"checkpoints": self.checkpoints, "aggregates": self.aggregates.to_dict()}, f)
+        os.replace(tmp_path, self.state_path)
@@ -16,6 +16,7 @@ from enum import Enum
 from dataclasses import dataclass
 
 from .config_loader import get_config
+from .learned_router import LearnedRouter, get_learned_router
 
 
 class ModelTier(Enum):
@@ -50,10 +51,16 @@ class ModelRouter:
     Philosophie: Le moins cher qui peut faire le job
     """
 
-    def __init__(self):
+    def __init__(self, learned_router: Optional[LearnedRouter] = None):
+        """
+        Args:
+            learned_router: Classifieur appris (défaut: modèle entraîné du processus, s'il existe)
+        """
         self.config = get_config()
         self.models_config = self.config.models.get("models", {})
         self.routing_rules = self.config.models.get("routing_rules", {})
+        self.learned_router = learned_router
+        self.min_learned_confidence = self.config.get("agents.learned_routing.min_confidence", 0.7)
 
         # Patterns pour détection rapide
         self._simple_patterns = [
@@ -108,7 +115,18 @@ class ModelRouter:
                         f"Selected by agent role: {agent_role}"
                     )
 
-        # Stratégie 2: Détection rapide par patterns
+        # Stratégie 2: Routeur appris sur l'historique (si assez confiant)
+        learned = self.predict_learned_tier(task)
+        if learned:
+            tier, confidence = learned
+            selection = self._create_selection(
+                tier,
+                f"Selected by learned router (confidence: {confidence:.0%})"
+            )
+            selection.confidence = confidence
+            return selection
+
+        # Stratégie 3: Détection rapide par patterns
         tier_from_pattern = self._route_by_pattern(task)
         if tier_from_pattern:
             return self._create_selection(
@@ -116,7 +134,7 @@ class ModelRouter:
                 "Selected by task pattern matching"
             )
 
-        # Stratégie 3: Analyse de complexité complète
+        # Stratégie 4: Analyse de complexité complète
         complexity = self.analyze_complexity(task)
         tier_from_complexity = self._route_by_complexity(complexity)
 
@@ -125,6 +143,21 @@ class ModelRouter:
             f"Selected by complexity analysis (score: {complexity.score:.1f}/10)"
         )
 
+    def predict_learned_tier(self, task: str) -> Optional[Tuple[ModelTier, float]]:
+        """
+        Tier prédit par le routeur appris, ou None sous le seuil de confiance
+
+        Returns:
+            (tier, confiance) ou None (pas de modèle, confiance insuffisante)
+        """
+        router = self.learned_router or get_learned_router()
+        if router is None:
+            return None
+        prediction = router.predict(task)
+        if prediction.confidence < self.min_learned_confidence:
+            return None
+        return ModelTier(prediction.tier), prediction.confidence
+
     def analyze_complexity(self, task: str) -> TaskComplexity:
         """
         Analyse la complexité d'une tâche (score 0-10)
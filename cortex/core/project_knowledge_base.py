@@ -9,16 +9,27 @@ Permet de maintenir un context ultra-compact du projet entier:
 - Base de données
 
 Le tout accessible en < 1000 tokens via semantic search
+
+Ré-indexation incrémentale: un manifeste par fichier (mtime, taille,
+empreinte du contenu, empreinte de chaque chunk) limite le travail aux
+fichiers modifiés; seuls les chunks nouveaux ou changés sont ré-encodés.
 """
 
 import os
+import re
 import json
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, asdict
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import hashlib
 
+from cortex.core.code_chunker import CodeChunk, chunk_python_source, chunk_python_job, module_name
+from cortex.core.config_loader import get_config
+from cortex.core.embeddings import Embedder, get_embedder
+
 try:
     import chromadb
     from chromadb.utils import embedding_functions
@@ -28,6 +39,49 @@ except ImportError:
     print("⚠️  ChromaDB not installed. Run: pip install chromadb")
 
 
+# Documents markdown découpés en workflows
+WORKFLOW_DOCS = {"README.md", "WORKFLOW.md", "PROCESS.md", "ESCALATION_SYSTEM.md"}
+
+# Dossiers jamais parcourus (en plus des dossiers cachés)
+SKIPPED_DIRS = {"__pycache__", "node_modules", "venv", "env", "site-packages"}
+
+MANIFEST_VERSION = 3
+
+
+if CHROMADB_AVAILABLE:
+    class CortexEmbeddingFunction(embedding_functions.EmbeddingFunction):
+        """Encodeur local partagé du Cortex exposé à ChromaDB (lots + mémo)"""
+
+        def __init__(self, embedder: Optional[Embedder] = None):
+            self._embedder = embedder
+
+        @property
+        def embedder(self) -> Embedder:
+            # Résolu au premier usage: ChromaDB reconstruit la fonction depuis
+            # la config persistée à chaque réouverture de collection
+            if self._embedder is None:
+                self._embedder = get_embedder()
+            return self._embedder
+
+        def __call__(self, input):
+            return list(self.embedder.embed_many(list(input)))
+
+        @staticmethod
+        def name() -> str:
+            return "cortex"
+
+        def get_config(self) -> Dict[str, Any]:
+            return {"model": self.embedder.name}
+
+        @staticmethod
+        def build_from_config(config: Dict[str, Any]) -> "CortexEmbeddingFunction":
+            return CortexEmbeddingFunction()
+
+    # Registre des fonctions d'embedding: ChromaDB >= 1.0 seulement
+    if hasattr(embedding_functions, "register_embedding_function"):
+        embedding_functions.register_embedding_function(CortexEmbeddingFunction)
+
+
 @dataclass
 class KnowledgeChunk:
     """Un chunk de connaissance du projet"""
@@ -38,6 +92,20 @@ class KnowledgeChunk:
     tokens: int
 
 
+@dataclass
+class SyncReport:
+    """Résultat d'une synchronisation incrémentale"""
+    files_scanned: int = 0
+    files_changed: int = 0
+    files_deleted: int = 0
+    chunks_upserted: int = 0
+    chunks_deleted: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
 class ProjectKnowledgeBase:
     """
     Base de connaissance du projet avec embeddings
@@ -45,36 +113,55 @@ class ProjectKnowledgeBase:
     Utilise ChromaDB pour stocker et rechercher via embeddings
     """
 
-    def __init__(self, project_root: Path, use_local_embeddings: bool = False):
+    def __init__(
+        self,
+        project_root: Path,
+        use_local_embeddings: bool = False,
+        embedder: Optional[Embedder] = None
+    ):
         """
         Args:
             project_root: Racine du projet
-            use_local_embeddings: Si True, utilise un modèle local (gratuit mais moins bon)
+            use_local_embeddings: Si True, utilise l'encodeur local partagé
+                                  (gratuit, mémoïsé, voir cortex/core/embeddings.py)
+            embedder: Encodeur local explicite (implique use_local_embeddings)
         """
         self.project_root = Path(project_root)
         self.kb_dir = self.project_root / ".cortex" / "knowledge_base"
         self.kb_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_file = self.kb_dir / "manifest.json"
 
         if not CHROMADB_AVAILABLE:
             raise ImportError("ChromaDB required. Install: pip install chromadb")
 
+        config = get_config()
+        self.embedding_batch_size = config.get("embeddings.index_batch_size", 256)
+        self.embedding_workers = config.get("embeddings.index_workers", 4)
+        self.chunk_max_tokens = config.get("embeddings.chunk_max_tokens", 512)
+        self.chunk_workers = config.get("embeddings.chunk_workers", 0)
+        self.chunk_pool_threshold = config.get("embeddings.chunk_pool_threshold", 64)
+
         # ChromaDB client
         self.client = chromadb.PersistentClient(path=str(self.kb_dir))
 
         # Embedding function
-        if use_local_embeddings:
-            # Utilise un modèle local (gratuit, mais moins performant)
-            self.embed_fn = embedding_functions.DefaultEmbeddingFunction()
+        collection_name = "project_knowledge"
+        if use_local_embeddings or embedder is not None:
+            # Encodeur local partagé avec ContextManager et le cache L2
+            self.embed_fn = CortexEmbeddingFunction(embedder)
+            # Une collection par modèle: des vecteurs d'un autre modèle ne sont pas comparables
+            collection_name += "_" + re.sub(r"[^a-zA-Z0-9_-]", "_", self.embed_fn.embedder.name)
         else:
             # Utilise OpenAI (meilleur, minimal cost)
             self.embed_fn = embedding_functions.OpenAIEmbeddingFunction(
                 model_name="text-embedding-3-small",
                 api_key=os.getenv("OPENAI_API_KEY")
             )
+        self.collection_name = collection_name
 
         # Collection
         self.collection = self.client.get_or_create_collection(
-            name="project_knowledge",
+            name=collection_name,
             embedding_function=self.embed_fn,
             metadata={"description": "Project knowledge base with embeddings"}
         )
@@ -91,183 +178,333 @@ class ProjectKnowledgeBase:
 
     def index_project(self, force_reindex: bool = False, verbose: bool = True):
         """
-        Index tout le projet
+        Index le projet (incrémental, voir sync)
 
         Args:
-            force_reindex: Si True, ré-index même si déjà indexé
+            force_reindex: Si True, ré-encode tous les chunks
             verbose: Afficher le progrès
+
+        Returns:
+            Statistiques de la KB
         """
-        if verbose:
-            print("\n🔍 Indexing project knowledge...")
+        self.sync(force=force_reindex, verbose=verbose)
+        return self.stats
 
-        # Vérifier si déjà indexé
-        if not force_reindex and self.stats["last_indexed"]:
-            if verbose:
-                print(f"   Already indexed on {self.stats['last_indexed']}")
-                print("   Use force_reindex=True to re-index")
-            return self.stats
+    def sync(self, force: bool = False, verbose: bool = False) -> SyncReport:
+        """
+        Synchronise la KB avec le projet
 
-        chunks = []
+        Un fichier dont la taille et le mtime n'ont pas bougé n'est pas
+        relu; un fichier relu dont l'empreinte est inchangée n'est pas
+        re-découpé. Les chunks disparus sont supprimés, les chunks
+        nouveaux ou modifiés sont encodés par lots et upsertés.
 
-        # 1. Index code files
-        if verbose:
-            print("   📄 Indexing code files...")
-        chunks.extend(self._index_code_files())
+        Args:
+            force: Si True, ignore le manifeste et ré-encode tout
+            verbose: Afficher le résumé
 
-        # 2. Index project structure
-        if verbose:
-            print("   📁 Indexing project structure...")
-        chunks.extend(self._index_structure())
+        Returns:
+            SyncReport
+        """
+        start = time.perf_counter()
+        report = SyncReport()
+
+        manifest = self._load_manifest()
+        old_files = manifest["files"] if manifest else {}
+        files = self._scan_files()
+        report.files_scanned = len(files)
+
+        new_files: Dict[str, Dict[str, Any]] = {}
+        upserts: Dict[str, Tuple[KnowledgeChunk, Dict[str, Any]]] = {}
+        stale_ids = set()
+        dirty = manifest is None
+
+        changed: List[Tuple[str, Dict[str, Any], str]] = []
+        for relative_path, (mtime_ns, size) in files.items():
+            entry = old_files.get(relative_path)
+            if entry and not force and entry["mtime_ns"] == mtime_ns and entry["size"] == size:
+                new_files[relative_path] = entry
+                continue
 
-        # 3. Index workflows (from docs)
-        if verbose:
-            print("   🔄 Indexing workflows...")
-        chunks.extend(self._index_workflows())
+            dirty = True
+            file_path = self.project_root / relative_path
+            try:
+                data = file_path.read_bytes()
+                digest = hashlib.sha256(data).hexdigest()
+                if entry and not force and entry["sha256"] == digest:
+                    # Touché mais identique: seul le manifeste change
+                    new_files[relative_path] = {**entry, "mtime_ns": mtime_ns, "size": size}
+                    continue
+                content = data.decode("utf-8")
+            except Exception as e:
+                print(f"   ⚠️  Error reading {file_path}: {e}")
+                if entry:
+                    stale_ids.update(entry["chunks"])
+                continue
 
-        # 4. Index agents (employees)
-        if verbose:
-            print("   🤖 Indexing agents...")
-        chunks.extend(self._index_agents())
+            new_files[relative_path] = {"mtime_ns": mtime_ns, "size": size, "sha256": digest}
+            changed.append((relative_path, entry, content))
 
-        # 5. Index configuration
-        if verbose:
-            print("   ⚙️  Indexing configuration...")
-        chunks.extend(self._index_config())
+        # Découpage des fichiers modifiés (pool de processus si nombreux)
+        for (relative_path, entry, _), chunks in zip(changed, self._chunk_files(changed)):
+            report.files_changed += 1
+            previous = entry["chunks"] if entry else {}
+            new_files[relative_path]["chunks"] = self._diff_chunks(chunks, previous, upserts, stale_ids, force)
+
+        for relative_path in old_files.keys() - files.keys():
+            stale_ids.update(old_files[relative_path]["chunks"])
+            report.files_deleted += 1
+            dirty = True
 
-        # Add to vector DB
-        if chunks:
+        # Structure: recalculée à partir du parcours, sans lecture
+        old_structure = manifest["structure"] if manifest else {}
+        structure = self._diff_chunks(self._index_structure(files), old_structure, upserts, stale_ids, force)
+        dirty = dirty or structure != old_structure
+
+        if not dirty:
+            report.seconds = time.perf_counter() - start
             if verbose:
-                print(f"\n   💾 Storing {len(chunks)} chunks in vector database...")
+                print(f"✅ Knowledge base up to date ({report.files_scanned} files, {report.seconds * 1000:.0f}ms)")
+            return report
 
-            self.collection.add(
-                documents=[c.content for c in chunks],
-                metadatas=[c.metadata for c in chunks],
-                ids=[c.id for c in chunks]
-            )
+        if manifest is None or force:
+            # Pas de manifeste fiable: purger les chunks orphelins de l'ancienne indexation
+            known = set(upserts)
+            for entry in new_files.values():
+                known.update(entry["chunks"])
+            known.update(structure)
+            stale_ids.update(set(self.collection.get(include=[])["ids"]) - known)
 
-            # Update stats
-            self.stats["total_chunks"] = len(chunks)
-            self.stats["total_tokens"] = sum(c.tokens for c in chunks)
-            self.stats["embedding_cost"] = self.stats["total_tokens"] * 0.00002 / 1000  # $0.02 per 1M
-            self.stats["last_indexed"] = datetime.now().isoformat()
-            self._save_stats()
+        # Un chunk déplacé d'un fichier à un autre est upserté, pas supprimé
+        stale_ids -= upserts.keys()
 
         if verbose:
-            print(f"\n✅ Indexing complete!")
-            print(f"   Chunks: {self.stats['total_chunks']}")
+            print(f"\n🔍 Syncing project knowledge: {report.files_changed} changed, "
+                  f"{report.files_deleted} deleted, {len(upserts)} chunks to embed...")
+
+        self._delete_chunks(sorted(stale_ids))
+        self._upsert_chunks(list(upserts.values()))
+        report.chunks_deleted = len(stale_ids)
+        report.chunks_upserted = len(upserts)
+
+        self._save_manifest({
+            "version": MANIFEST_VERSION,
+            "collection": self.collection_name,
+            "files": new_files,
+            "structure": structure
+        })
+
+        # Update stats
+        chunk_tokens = [chunk[1] for entry in new_files.values() for chunk in entry["chunks"].values()]
+        chunk_tokens.extend(chunk[1] for chunk in structure.values())
+        upserted_tokens = sum(chunk.tokens for chunk, _ in upserts.values())
+        self.stats["total_chunks"] = len(chunk_tokens)
+        self.stats["total_tokens"] = sum(chunk_tokens)
+        self.stats["embedding_cost"] += upserted_tokens * 0.00002 / 1000  # $0.02 per 1M
+        self.stats["last_indexed"] = datetime.now().isoformat()
+        self._save_stats()
+
+        report.seconds = time.perf_counter() - start
+        if verbose:
+            print(f"\n✅ Sync complete in {report.seconds:.2f}s")
+            print(f"   Chunks: {self.stats['total_chunks']} "
+                  f"(+{report.chunks_upserted} upserted, -{report.chunks_deleted} deleted)")
             print(f"   Tokens: {self.stats['total_tokens']:,}")
             print(f"   Cost: ${self.stats['embedding_cost']:.4f}")
 
-        return self.stats
+        return report
 
-    def _index_code_files(self) -> List[KnowledgeChunk]:
-        """Index tous les fichiers Python"""
-        chunks = []
+    def _diff_chunks(
+        self,
+        chunks: List[KnowledgeChunk],
+        previous: Dict[str, List],
+        upserts: Dict[str, Tuple[KnowledgeChunk, Dict[str, Any]]],
+        stale_ids: set,
+        force: bool
+    ) -> Dict[str, List]:
+        """
+        Compare des chunks à leur version précédente
 
-        for py_file in self.project_root.rglob("*.py"):
-            # Skip virtual envs and hidden dirs
-            if any(part.startswith('.') or part == '__pycache__' for part in py_file.parts):
-                continue
+        Returns:
+            {chunk_id: [empreinte, tokens]} pour le manifeste
+        """
+        hashes = {}
+        for chunk in chunks:
+            metadata = {**chunk.metadata, "type": chunk.type}
+            digest = hashlib.sha256(
+                (chunk.content + json.dumps(metadata, sort_keys=True)).encode("utf-8")
+            ).hexdigest()
+            hashes[chunk.id] = [digest, chunk.tokens]
+            if force or chunk.id not in previous or previous[chunk.id][0] != digest:
+                upserts[chunk.id] = (chunk, metadata)
+
+        stale_ids.update(previous.keys() - hashes.keys())
+        return hashes
+
+    def _delete_chunks(self, ids: List[str]):
+        """Supprime des chunks par lots"""
+        batch_size = self.client.get_max_batch_size()
+        for start in range(0, len(ids), batch_size):
+            self.collection.delete(ids=ids[start:start + batch_size])
+
+    def _upsert_chunks(self, items: List[Tuple[KnowledgeChunk, Dict[str, Any]]]):
+        """
+        Encode et upserte des chunks
+
+        Les lots sont encodés en parallèle par un pool de workers;
+        chaque lot est écrit dès que ses embeddings sont prêts.
+        """
+        batch_size = min(self.embedding_batch_size, self.client.get_max_batch_size())
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        if not batches:
+            return
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.embedding_workers, len(batches)))) as pool:
+            embedded = pool.map(lambda batch: self.embed_fn([chunk.content for chunk, _ in batch]), batches)
+            for batch, embeddings in zip(batches, embedded):
+                self.collection.upsert(
+                    ids=[chunk.id for chunk, _ in batch],
+                    documents=[chunk.content for chunk, _ in batch],
+                    metadatas=[metadata for _, metadata in batch],
+                    embeddings=embeddings
+                )
+
+    def _scan_files(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Liste les fichiers indexables sans les lire
+
+        Returns:
+            {chemin relatif: (mtime_ns, taille)}
+        """
+        files = {}
+        pending = [(str(self.project_root), "")]
 
+        while pending:
+            directory, prefix = pending.pop()
             try:
-                with open(py_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
 
-                # Chunk par classe/fonction
-                file_chunks = self._chunk_python_file(py_file, content)
-                chunks.extend(file_chunks)
+            for entry in entries:
+                # Skip virtual envs and hidden dirs
+                if entry.name.startswith('.'):
+                    continue
+                relative_path = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIPPED_DIRS:
+                        pending.append((entry.path, relative_path + "/"))
+                elif self._is_indexed(relative_path, entry.name):
+                    stat = entry.stat()
+                    files[relative_path] = (stat.st_mtime_ns, stat.st_size)
+
+        return files
+
+    @staticmethod
+    def _is_indexed(relative_path: str, name: str) -> bool:
+        """Fichiers pris en compte: code, docs de workflow, configuration"""
+        if name.endswith(".py"):
+            return True
+        if name in WORKFLOW_DOCS:
+            return True
+        return name.endswith(".yaml") and relative_path == f"cortex/config/{name}"
+
+    def _chunk_files(self, changed: List[Tuple[str, Any, str]]) -> List[List[KnowledgeChunk]]:
+        """
+        Découpe des fichiers modifiés
 
-            except Exception as e:
-                print(f"   ⚠️  Error reading {py_file}: {e}")
+        Chaque fichier Python n'est parsé qu'une fois; au-delà de
+        chunk_pool_threshold fichiers, le parsing part dans un pool de
+        processus (l'ast est lié au GIL).
+        """
+        python_jobs = [
+            (content, relative_path, self.chunk_max_tokens)
+            for relative_path, _, content in changed if relative_path.endswith(".py")
+        ]
+        workers = self.chunk_workers or os.cpu_count() or 1
+
+        if workers > 1 and len(python_jobs) >= self.chunk_pool_threshold:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                code_chunks = iter(pool.map(chunk_python_job, python_jobs, chunksize=16))
+        else:
+            code_chunks = iter(chunk_python_job(job) for job in python_jobs)
+
+        results = []
+        for relative_path, _, content in changed:
+            file_path = self.project_root / relative_path
+            if relative_path.endswith(".py"):
+                chunks = [self._knowledge_chunk(relative_path, chunk) for chunk in next(code_chunks)]
+                if file_path.name.endswith("_agent.py") and relative_path == f"cortex/agents/{file_path.name}":
+                    chunks.extend(self._chunk_agent(file_path, content))
+            elif file_path.name in WORKFLOW_DOCS:
+                chunks = self._chunk_workflow_doc(file_path, content)
+            else:
+                chunks = self._chunk_config(file_path, content)
+            results.append(chunks)
 
-        return chunks
+        return results
 
     def _chunk_python_file(self, file_path: Path, content: str) -> List[KnowledgeChunk]:
         """
         Découpe un fichier Python en chunks intelligents
 
-        Stratégie: 1 chunk par classe ou fonction top-level
+        Stratégie: 1 chunk par classe (en-tête + signatures), par méthode
+        et par fonction top-level (voir code_chunker)
         """
-        chunks = []
-        relative_path = str(file_path.relative_to(self.project_root))
-
-        # Simple parsing: split by "class" or "def" at start of line
-        lines = content.split('\n')
-        current_chunk = []
-        current_name = None
-
-        for line in lines:
-            stripped = line.strip()
-
-            # Nouvelle classe ou fonction
-            if (stripped.startswith('class ') or
-                (stripped.startswith('def ') and not line.startswith(' '))):
-
-                # Sauvegarder le chunk précédent
-                if current_chunk and current_name:
-                    chunk_content = '\n'.join(current_chunk)
-                    tokens = len(chunk_content) // 4  # Rough estimate
-
-                    # Générer un ID unique avec path + name + line number
-                    unique_id = f"{relative_path}:{current_name}:{len(chunks)}"
-
-                    chunks.append(KnowledgeChunk(
-                        id=hashlib.md5(unique_id.encode()).hexdigest(),
-                        type="code",
-                        content=chunk_content[:2000],  # Max 2000 chars per chunk
-                        metadata={
-                            "file": relative_path,
-                            "name": current_name,
-                            "category": "class" if current_chunk[0].strip().startswith('class') else "function",
-                            "last_modified": datetime.fromtimestamp(file_path.stat().st_mtime).isoformat()
-                        },
-                        tokens=min(tokens, 500)
-                    ))
-
-                # Nouveau chunk
-                current_chunk = [line]
-                current_name = stripped.split('(')[0].split(' ')[1] if '(' in stripped else stripped.split(' ')[1]
-            else:
-                if current_chunk:  # Ajouter à current chunk
-                    current_chunk.append(line)
-
-        # Dernier chunk
-        if current_chunk and current_name:
-            chunk_content = '\n'.join(current_chunk)
-            tokens = len(chunk_content) // 4
-
-            # Générer un ID unique avec path + name + line number
-            unique_id = f"{relative_path}:{current_name}:{len(chunks)}"
-
-            chunks.append(KnowledgeChunk(
-                id=hashlib.md5(unique_id.encode()).hexdigest(),
-                type="code",
-                content=chunk_content[:2000],
-                metadata={
-                    "file": relative_path,
-                    "name": current_name,
-                    "category": "class" if current_chunk[0].strip().startswith('class') else "function",
-                    "last_modified": datetime.fromtimestamp(file_path.stat().st_mtime).isoformat()
-                },
-                tokens=min(tokens, 500)
-            ))
+        relative_path = file_path.relative_to(self.project_root).as_posix()
+        return [
+            self._knowledge_chunk(relative_path, chunk)
+            for chunk in chunk_python_source(content, relative_path, self.chunk_max_tokens)
+        ]
+
+    @staticmethod
+    def _knowledge_chunk(relative_path: str, chunk: CodeChunk) -> KnowledgeChunk:
+        """
+        CodeChunk → KnowledgeChunk
 
-        return chunks
+        L'ID est le chemin du fichier suivi du symbole dans le fichier
+        (app/models.py:User.save): cortex.py et cortex/__init__.py ont le
+        même nom de module, pas le même chemin.
+        """
+        metadata = {
+            "file": relative_path,
+            "name": chunk.name or chunk.symbol,
+            "symbol": chunk.symbol,
+            "category": chunk.kind,
+            "start_line": chunk.start_line,
+            "end_line": chunk.end_line
+        }
+        if chunk.parent:
+            metadata["parent"] = chunk.parent
+
+        return KnowledgeChunk(
+            id=relative_path + chunk.symbol[len(module_name(relative_path)):],
+            type="code",
+            content=chunk.content,
+            metadata=metadata,
+            tokens=chunk.tokens
+        )
 
-    def _index_structure(self) -> List[KnowledgeChunk]:
-        """Index la structure du projet"""
+    def _index_structure(self, files: Dict[str, Tuple[int, int]]) -> List[KnowledgeChunk]:
+        """Index la structure du projet (à partir des fichiers parcourus)"""
         chunks = []
 
+        python_files: Dict[str, List[str]] = {}
+        for relative_path in files:
+            parts = relative_path.split("/")
+            if len(parts) > 1 and parts[-1].endswith(".py"):
+                python_files.setdefault(parts[0], []).append(relative_path)
+
         # Parcourir les dossiers principaux
-        for item in self.project_root.iterdir():
-            if item.is_dir() and not item.name.startswith('.'):
+        for item in sorted(os.scandir(self.project_root), key=lambda e: e.name):
+            if item.is_dir() and not item.name.startswith('.') and item.name not in SKIPPED_DIRS:
                 # Créer un chunk pour ce dossier
-                files = list(item.rglob("*.py"))
+                dir_files = python_files.get(item.name, [])
                 description = f"Directory: {item.name}\n"
-                description += f"Contains {len(files)} Python files\n"
+                description += f"Contains {len(dir_files)} Python files\n"
 
                 # Lister les fichiers principaux
-                main_files = [f.name for f in files if f.parent == item][:10]
+                main_files = sorted(p.split("/")[1] for p in dir_files if p.count("/") == 1)[:10]
                 if main_files:
                     description += "Main files: " + ", ".join(main_files)
 
@@ -277,7 +514,7 @@ class ProjectKnowledgeBase:
                     content=description,
                     metadata={
                         "directory": item.name,
-                        "file_count": len(files),
+                        "file_count": len(dir_files),
                         "category": "structure"
                     },
                     tokens=len(description) // 4
@@ -285,95 +522,62 @@ class ProjectKnowledgeBase:
 
         return chunks
 
-    def _index_workflows(self) -> List[KnowledgeChunk]:
-        """Index les workflows depuis les docs markdown"""
-        chunks = []
-
-        # Chercher les fichiers markdown
-        for md_file in self.project_root.rglob("*.md"):
-            if md_file.name in ["README.md", "WORKFLOW.md", "PROCESS.md", "ESCALATION_SYSTEM.md"]:
-                try:
-                    with open(md_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-
-                    # Chunk par section (##)
-                    sections = content.split('\n## ')
-                    for section in sections:
-                        if len(section) > 100:  # Ignorer sections trop courtes
-                            title = section.split('\n')[0]
-                            chunks.append(KnowledgeChunk(
-                                id=f"workflow_{hashlib.md5(title.encode()).hexdigest()}",
-                                type="workflow",
-                                content=section[:1000],
-                                metadata={
-                                    "file": md_file.name,
-                                    "title": title,
-                                    "category": "workflow"
-                                },
-                                tokens=min(len(section) // 4, 250)
-                            ))
-                except Exception as e:
-                    print(f"   ⚠️  Error reading {md_file}: {e}")
-
-        return chunks
-
-    def _index_agents(self) -> List[KnowledgeChunk]:
-        """Index tous les agents (employees)"""
+    def _chunk_workflow_doc(self, md_file: Path, content: str) -> List[KnowledgeChunk]:
+        """Découpe une doc markdown en workflows (1 chunk par section ##)"""
         chunks = []
+        relative_path = md_file.relative_to(self.project_root).as_posix()
 
-        agents_dir = self.project_root / "cortex" / "agents"
-        if agents_dir.exists():
-            for agent_file in agents_dir.glob("*_agent.py"):
-                try:
-                    with open(agent_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-
-                    # Extraire la docstring de classe
-                    if '"""' in content:
-                        docstring = content.split('"""')[1]
-                        agent_name = agent_file.stem.replace('_agent', '').replace('_', ' ').title()
-
-                        chunks.append(KnowledgeChunk(
-                            id=f"agent_{agent_file.stem}",
-                            type="employee",
-                            content=f"Agent: {agent_name}\n{docstring[:500]}",
-                            metadata={
-                                "name": agent_name,
-                                "file": str(agent_file.relative_to(self.project_root)),
-                                "category": "agent"
-                            },
-                            tokens=len(docstring) // 4
-                        ))
-                except Exception as e:
-                    print(f"   ⚠️  Error reading {agent_file}: {e}")
+        sections = content.split('\n## ')
+        for section in sections:
+            if len(section) > 100:  # Ignorer sections trop courtes
+                title = section.split('\n')[0]
+                chunks.append(KnowledgeChunk(
+                    # Le chemin dans l'ID: deux README peuvent partager un titre
+                    id=f"workflow_{hashlib.md5(f'{relative_path}:{title}'.encode()).hexdigest()}",
+                    type="workflow",
+                    content=section[:1000],
+                    metadata={
+                        "file": md_file.name,
+                        "title": title,
+                        "category": "workflow"
+                    },
+                    tokens=min(len(section) // 4, 250)
+                ))
 
         return chunks
 
-    def _index_config(self) -> List[KnowledgeChunk]:
-        """Index les fichiers de configuration"""
-        chunks = []
-
-        config_dir = self.project_root / "cortex" / "config"
-        if config_dir.exists():
-            for config_file in config_dir.glob("*.yaml"):
-                try:
-                    with open(config_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-
-                    chunks.append(KnowledgeChunk(
-                        id=f"config_{config_file.stem}",
-                        type="configuration",
-                        content=content[:1000],
-                        metadata={
-                            "file": config_file.name,
-                            "category": "configuration"
-                        },
-                        tokens=min(len(content) // 4, 250)
-                    ))
-                except Exception as e:
-                    print(f"   ⚠️  Error reading {config_file}: {e}")
-
-        return chunks
+    def _chunk_agent(self, agent_file: Path, content: str) -> List[KnowledgeChunk]:
+        """Chunk d'un agent (employee) à partir de sa docstring"""
+        if '"""' not in content:
+            return []
+
+        docstring = content.split('"""')[1]
+        agent_name = agent_file.stem.replace('_agent', '').replace('_', ' ').title()
+
+        return [KnowledgeChunk(
+            id=f"agent_{agent_file.stem}",
+            type="employee",
+            content=f"Agent: {agent_name}\n{docstring[:500]}",
+            metadata={
+                "name": agent_name,
+                "file": agent_file.relative_to(self.project_root).as_posix(),
+                "category": "agent"
+            },
+            tokens=len(docstring) // 4
+        )]
+
+    def _chunk_config(self, config_file: Path, content: str) -> List[KnowledgeChunk]:
+        """Chunk d'un fichier de configuration"""
+        return [KnowledgeChunk(
+            id=f"config_{config_file.stem}",
+            type="configuration",
+            content=content[:1000],
+            metadata={
+                "file": config_file.name,
+                "category": "configuration"
+            },
+            tokens=min(len(content) // 4, 250)
+        )]
 
     def search(
         self,
@@ -406,6 +610,31 @@ class ProjectKnowledgeBase:
         """Retourne les statistiques de la KB"""
         return self.stats.copy()
 
+    def _load_manifest(self) -> Optional[Dict[str, Any]]:
+        """
+        Charge le manifeste des fichiers indexés
+
+        Returns:
+            None si absent, illisible ou construit pour une autre collection
+        """
+        if not self.manifest_file.exists():
+            return None
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("collection") != self.collection_name:
+            return None
+        return manifest
+
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        """Sauvegarde le manifeste (écriture atomique)"""
+        tmp_file = self.manifest_file.with_suffix(".json.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(tmp_file, self.manifest_file)
+
     def _load_stats(self):
         """Charge les stats depuis le fichier"""
         stats_file = self.kb_dir / "stats.json"
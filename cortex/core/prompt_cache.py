@@ -0,0 +1,255 @@
+"""
+Prompt Cache - Mise en page des prompts pour le cache côté provider
+
+Les providers facturent moins cher les tokens d'entrée déjà vus, à
+condition que le début du prompt soit identique octet pour octet:
+- Anthropic: points de cache explicites (cache_control), lecture à 0.1x
+- OpenAI / DeepSeek: cache automatique des préfixes identiques
+
+La mise en page place donc le contenu stable en premier:
+
+    [outils triés] → [system statique] → [historique] → [contexte volatile] → [requête]
+
+Un message système peut être marqué volatile (contexte calculé pour la
+requête, mémoire récente...) avec volatile(): il est alors déplacé juste
+avant le dernier message utilisateur au lieu de casser le préfixe. Seuls
+les messages système de tête forment le system statique; un message
+système placé plus loin dans la conversation garde sa position.
+
+Les tokens lus depuis le cache sont suivis par agent (agent_scope) pour
+calculer un taux de hit du préfixe.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Tuple
+
+
+VOLATILE_KEY = "_volatile"
+
+EPHEMERAL = {"type": "ephemeral"}
+
+
+def volatile(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Marque un message système comme volatile (placé après le préfixe stable)"""
+    return {**message, VOLATILE_KEY: True}
+
+
+def _is_user_text(message: Dict[str, Any]) -> bool:
+    """Message utilisateur "humain" (pas un retour d'outil Anthropic)"""
+    return message.get("role") == "user" and isinstance(message.get("content"), str)
+
+
+def _split_messages(
+    messages: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Sépare system statique de tête, messages volatiles et conversation"""
+    static_system = []
+    volatile_messages = []
+    conversation = []
+
+    for message in messages:
+        if message.get(VOLATILE_KEY):
+            stripped = {k: v for k, v in message.items() if k != VOLATILE_KEY}
+            volatile_messages.append(stripped)
+        elif message.get("role") == "system" and not conversation:
+            static_system.append(message)
+        else:
+            conversation.append(message)
+
+    return static_system, volatile_messages, conversation
+
+
+def static_system_count(messages: List[Dict[str, Any]]) -> int:
+    """Nombre de messages système statiques en tête après arrange_messages()"""
+    return len(_split_messages(messages)[0])
+
+
+def arrange_messages(messages: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Ordonne les messages: system statique, historique, volatile, requête
+
+    Seuls les messages système de tête sont regroupés en préfixe; les
+    suivants restent à leur place dans la conversation.
+
+    Args:
+        messages: Messages (éventuellement marqués volatile)
+
+    Returns:
+        (messages ordonnés sans marqueurs, nombre de messages non-système
+        du préfixe stable, c'est-à-dire avant le contexte volatile)
+    """
+    static_system, volatile_messages, conversation = _split_messages(messages)
+
+    # Le contexte volatile précède la dernière requête utilisateur
+    insert_at = len(conversation)
+    for i in range(len(conversation) - 1, -1, -1):
+        if _is_user_text(conversation[i]):
+            insert_at = i
+            break
+
+    arranged = static_system + conversation[:insert_at] + volatile_messages + conversation[insert_at:]
+    return arranged, insert_at
+
+
+def sort_tools(tools: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    """Trie les schémas d'outils par nom (ordre stable d'un appel à l'autre)"""
+    if not tools:
+        return tools
+
+    def name(tool: Dict[str, Any]) -> str:
+        return tool.get("name") or tool.get("function", {}).get("name", "")
+
+    return sorted(tools, key=name)
+
+
+def _with_cache_control(content: Any) -> List[Dict[str, Any]]:
+    """Contenu Anthropic en blocs, avec un point de cache sur le dernier"""
+    if isinstance(content, str):
+        return [{"type": "text", "text": content, "cache_control": EPHEMERAL}]
+
+    blocks = [dict(block) for block in content]
+    if blocks:
+        blocks[-1]["cache_control"] = EPHEMERAL
+    return blocks
+
+
+def add_anthropic_breakpoints(
+    params: Dict[str, Any],
+    stable_count: int
+) -> Dict[str, Any]:
+    """
+    Ajoute les points de cache Anthropic (4 au maximum)
+
+    1. Dernier outil (cache les schémas d'outils)
+    2. Fin du system (cache outils + instructions)
+    3. Fin de l'historique stable (avant le contexte volatile)
+    4. Dernier message, pendant une boucle d'outils (l'itération suivante
+       réutilise tout le préfixe)
+
+    En dessous de la taille minimale cacheable, l'API ignore les points.
+    """
+    if params.get("tools"):
+        tools = list(params["tools"])
+        tools[-1] = {**tools[-1], "cache_control": EPHEMERAL}
+        params["tools"] = tools
+
+    if params.get("system"):
+        params["system"] = _with_cache_control(params["system"])
+
+    messages = list(params.get("messages", []))
+    marked = set()
+    if 0 < stable_count <= len(messages):
+        marked.add(stable_count - 1)
+
+    # Messages après la requête utilisateur: boucle d'outils en cours
+    last_user = max((i for i, m in enumerate(messages) if _is_user_text(m)), default=-1)
+    if messages and last_user < len(messages) - 1:
+        marked.add(len(messages) - 1)
+
+    for i in marked:
+        if messages[i].get("content"):  # Pas de bloc texte vide
+            messages[i] = {**messages[i], "content": _with_cache_control(messages[i]["content"])}
+    params["messages"] = messages
+    return params
+
+
+# ---------------------------------------------------------------- statistiques
+
+_current_agent: ContextVar[str] = ContextVar("cortex_agent", default="default")
+
+
+@contextmanager
+def agent_scope(name: str):
+    """Attribue les appels LLM du bloc à un agent (threads et tâches asyncio)"""
+    token = _current_agent.set(name)
+    try:
+        yield
+    finally:
+        _current_agent.reset(token)
+
+
+def current_agent() -> str:
+    """Agent courant pour l'attribution des appels"""
+    return _current_agent.get()
+
+
+@dataclass
+class PrefixCacheUsage:
+    """Utilisation du cache de préfixe d'un agent"""
+    calls: int = 0
+    calls_with_hit: int = 0
+    tokens_input: int = 0
+    tokens_cached: int = 0
+    tokens_cache_write: int = 0
+    cost_saved: float = 0.0
+
+
+class PromptCacheStats:
+    """Taux de hit du cache de préfixe, par agent et par tier"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._usage: Dict[Tuple[str, str], PrefixCacheUsage] = {}
+
+    def record(
+        self,
+        tier: str,
+        tokens_input: int,
+        tokens_cached: int,
+        tokens_cache_write: int = 0,
+        cost_saved: float = 0.0,
+        agent: Optional[str] = None
+    ):
+        """Enregistre l'usage d'un appel provider"""
+        key = (agent or current_agent(), tier)
+        with self._lock:
+            usage = self._usage.setdefault(key, PrefixCacheUsage())
+            usage.calls += 1
+            usage.calls_with_hit += 1 if tokens_cached else 0
+            usage.tokens_input += tokens_input
+            usage.tokens_cached += tokens_cached
+            usage.tokens_cache_write += tokens_cache_write
+            usage.cost_saved += cost_saved
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Rapport par agent
+
+        Returns:
+            {agent: {"calls", "tokens_input", "tokens_cached", "hit_ratio",
+                     "cost_saved", "tiers": {tier: {...}}}}
+        """
+        with self._lock:
+            items = [(agent, tier, asdict(usage)) for (agent, tier), usage in self._usage.items()]
+
+        report: Dict[str, Dict[str, Any]] = {}
+        for agent, tier, usage in sorted(items):
+            entry = report.setdefault(agent, {
+                "calls": 0, "calls_with_hit": 0, "tokens_input": 0, "tokens_cached": 0,
+                "tokens_cache_write": 0, "cost_saved": 0.0, "tiers": {}
+            })
+            for field in ("calls", "calls_with_hit", "tokens_input", "tokens_cached", "tokens_cache_write", "cost_saved"):
+                entry[field] += usage[field]
+            usage["hit_ratio"] = usage["tokens_cached"] / usage["tokens_input"] if usage["tokens_input"] else 0.0
+            entry["tiers"][tier] = usage
+
+        for entry in report.values():
+            entry["hit_ratio"] = entry["tokens_cached"] / entry["tokens_input"] if entry["tokens_input"] else 0.0
+        return report
+
+    def clear(self):
+        """Remet les compteurs à zéro"""
+        with self._lock:
+            self._usage.clear()
+
+
+# Statistiques partagées par tous les clients LLM du processus
+_prompt_cache_stats = PromptCacheStats()
+
+
+def get_prompt_cache_stats() -> PromptCacheStats:
+    """Retourne les statistiques de cache de préfixe du processus"""
+    return _prompt_cache_stats
@@ -6,6 +6,8 @@ Utilise la Knowledge Base avec embeddings pour créer un context:
 - Pertinent pour la tâche
 - Contenant toute l'information nécessaire
 - Filtrage par similarité adaptative selon la gravité
+- Sélection des extraits sous budget par ContextPacker (tokens exacts,
+  doublons retirés, pertinence maximale)
 """
 
 from typing import Dict, Any, Optional, List, Tuple
@@ -13,11 +15,13 @@ from pathlib import Path
 from enum import Enum
 
 from cortex.core.project_knowledge_base import ProjectKnowledgeBase
+from cortex.core.context_packer import ContextPacker, PackedContext, Snippet
+from cortex.core.token_counter import count_tokens
 
 
-def count_tokens(text: str) -> int:
-    """Estime le nombre de tokens (rough: 4 chars = 1 token)"""
-    return len(text) // 4
+# Priorité des types de résultats (multiplie la pertinence): code > workflow > structure
+TYPE_WEIGHTS = {"code": 1.0, "workflow": 0.9, "structure": 0.8, "employee": 0.7}
+RELEVANT_HEADER = "[RELEVANT CONTEXT]"
 
 
 class TaskSeverity(Enum):
@@ -105,6 +109,8 @@ class SmartContextBuilder:
 
         self.token_budget = 1000
         self.context_quality_report: Optional[Dict[str, Any]] = None
+        self.packer = ContextPacker(max_snippet_tokens=125)  # ~500 caractères par extrait
+        self.last_packed: Optional[PackedContext] = None
 
     def build_context(
         self,
@@ -128,42 +134,28 @@ class SmartContextBuilder:
         if not self.kb:
             return self._build_basic_context()
 
-        context_parts = []
-        tokens_used = 0
-
-        # 1. BASE CONTEXT (200 tokens) - Toujours inclus
-        base = self._get_base_context()
-        context_parts.append(base)
-        tokens_used += count_tokens(base)
-
-        # 2. SEMANTIC SEARCH (600 tokens max) - Dynamique avec filtrage adaptatif
-        remaining_budget = budget - tokens_used
-        relevant, quality_info = self._get_relevant_context(
-            task,
-            budget=remaining_budget,
-            severity=severity
-        )
-
-        if relevant:
-            context_parts.append(relevant)
-            tokens_used += count_tokens(relevant)
-
-        # Sauvegarder le rapport de qualité
+        candidates, quality_info = self._collect_candidates(task, severity)
         self.context_quality_report = quality_info
 
-        # 3. Rapport de qualité si demandé
+        # Base toujours incluse, rapport si demandé, état système si la place le permet
+        snippets = [Snippet(self._get_base_context(), source="base", kind="base", required=True)]
+        if candidates:
+            snippets.append(Snippet(RELEVANT_HEADER, kind="header", required=True))
+        snippets.extend(candidates)
         if include_quality_report and quality_info:
-            report = self._format_quality_report(quality_info, severity)
-            context_parts.append(report)
-            tokens_used += count_tokens(report)
+            snippets.append(Snippet(self._format_quality_report(quality_info, severity),
+                                    source="quality_report", kind="report", required=True))
+        snippets.append(Snippet(self._get_system_state(), relevance=0.05, source="system_state", kind="state"))
 
-        # 4. Optionnel: System state si espace restant
-        remaining = budget - tokens_used
-        if remaining > 100:
-            state = self._get_system_state()
-            context_parts.append(state)
+        packed = self.packer.pack(snippets, budget)
+        if candidates and not any(s.kind in TYPE_WEIGHTS for s in packed.snippets):
+            # Aucun extrait retenu: pas d'en-tête orphelin
+            packed = self.packer.pack([s for s in snippets if s.kind != "header"], budget)
 
-        return "\n\n".join(context_parts)
+        quality_info["manifest"] = packed.manifest
+        quality_info["tokens"] = packed.tokens
+        self.last_packed = packed
+        return packed.text
 
     def _get_base_context(self) -> str:
         """Context de base du projet (200 tokens)"""
@@ -204,9 +196,30 @@ Conventions:
         if not self.kb:
             return "", {"error": "Knowledge base not available"}
 
-        # Recherche multi-type
-        chunks = []
-        current_tokens = 0
+        candidates, quality_info = self._collect_candidates(task, severity)
+        if not candidates:
+            return "", quality_info
+
+        header_tokens = count_tokens(RELEVANT_HEADER + "\n", self.packer.encoding)
+        packed = self.packer.pack(candidates, budget - header_tokens)
+        quality_info["manifest"] = packed.manifest
+        if not packed.snippets:
+            return "", quality_info
+        return RELEVANT_HEADER + "\n" + packed.text, quality_info
+
+    def _collect_candidates(
+        self,
+        task: str,
+        severity: TaskSeverity = TaskSeverity.MEDIUM
+    ) -> Tuple[List[Snippet], Dict[str, Any]]:
+        """
+        Résultats de recherche acceptés par le filtrage adaptatif, en extraits
+        candidats (pertinence = similarité × priorité du type)
+
+        Returns:
+            Tuple (extraits candidats, rapport de qualité)
+        """
+        candidates: List[Snippet] = []
         quality_info = {
             "severity": severity.value,
             "threshold": SimilarityThresholds.get_threshold(severity),
@@ -215,9 +228,10 @@ Conventions:
             "total_count": 0,
             "warnings": []
         }
+        threshold = SimilarityThresholds.get_threshold(severity)
+        min_results = SimilarityThresholds.get_min_results(severity)
 
-        # Priority order: code > workflow > structure
-        for search_type in ["code", "workflow", "structure", "employee"]:
+        for search_type in TYPE_WEIGHTS:
             try:
                 results = self.kb.search(
                     query=task,
@@ -232,54 +246,35 @@ Conventions:
                     "distances": []
                 }
 
-                # Ajouter les résultats pertinents avec filtrage par similarité
                 if results and "documents" in results and results["documents"]:
                     docs = results["documents"][0]
                     metas = results["metadatas"][0]
                     distances = results.get("distances", [[1.0] * len(docs)])[0]
 
-                    threshold = SimilarityThresholds.get_threshold(severity)
-                    min_results = SimilarityThresholds.get_min_results(severity)
-                    accepted_in_type = 0
-
                     for doc, meta, distance in zip(docs, metas, distances):
                         type_quality["found"] += 1
                         quality_info["total_count"] += 1
 
                         # Filtrage par seuil de similarité
                         # Exception: toujours accepter au moins min_results même si faible
-                        accept_result = (
-                            distance <= threshold or
-                            accepted_in_type < min_results
-                        )
-
-                        if accept_result:
-                            chunk_tokens = count_tokens(doc)
-
-                            # Vérifier si on a le budget
-                            if current_tokens + chunk_tokens <= budget:
-                                quality = SimilarityThresholds.assess_quality(distance, severity)
-
-                                chunks.append({
-                                    "type": search_type,
-                                    "content": doc,
-                                    "file": meta.get("file", "N/A"),
-                                    "distance": distance,
-                                    "quality": quality
-                                })
-                                current_tokens += chunk_tokens
-                                accepted_in_type += 1
-                                type_quality["accepted"] += 1
-                                type_quality["distances"].append(distance)
-
-                                # Warning si qualité faible mais accepté (min_results)
-                                if distance > threshold:
-                                    quality_info["warnings"].append(
-                                        f"{search_type}: weak match (d={distance:.2f}) "
-                                        f"accepted to meet minimum ({min_results})"
-                                    )
-                            else:
-                                break  # Budget épuisé
+                        if distance <= threshold or type_quality["accepted"] < min_results:
+                            quality = SimilarityThresholds.assess_quality(distance, severity)
+                            candidates.append(Snippet(
+                                content=doc,
+                                relevance=TYPE_WEIGHTS[search_type] / (1.0 + distance),
+                                source=meta.get("file", "N/A"),
+                                kind=search_type,
+                                header=f"[{search_type.upper()}] {meta.get('file', 'N/A')} [similarity: {quality}]"
+                            ))
+                            type_quality["accepted"] += 1
+                            type_quality["distances"].append(distance)
+
+                            # Warning si qualité faible mais accepté (min_results)
+                            if distance > threshold:
+                                quality_info["warnings"].append(
+                                    f"{search_type}: weak match (d={distance:.2f}) "
+                                    f"accepted to meet minimum ({min_results})"
+                                )
                         else:
                             type_quality["rejected"] += 1
                             quality_info["filtered_count"] += 1
@@ -289,33 +284,8 @@ Conventions:
             except Exception as e:
                 print(f"⚠️  Search error for {search_type}: {e}")
                 quality_info["warnings"].append(f"{search_type}: search error - {e}")
-                continue
-
-            # Stop si budget épuisé
-            if current_tokens >= budget * 0.9:  # 90% du budget
-                break
-
-        # Formater les chunks
-        formatted_context = self._format_chunks(chunks)
-        return formatted_context, quality_info
-
-    def _format_chunks(self, chunks: list) -> str:
-        """Formate les chunks pour le LLM"""
-        if not chunks:
-            return ""
-
-        formatted = ["[RELEVANT CONTEXT]"]
-
-        for chunk in chunks:
-            # Inclure la qualité si disponible
-            quality_tag = ""
-            if "quality" in chunk and "distance" in chunk:
-                quality_tag = f" [similarity: {chunk['quality']}]"
-
-            formatted.append(f"\n[{chunk['type'].upper()}] {chunk['file']}{quality_tag}")
-            formatted.append(chunk['content'][:500])  # Max 500 chars per chunk
 
-        return "\n".join(formatted)
+        return candidates, quality_info
 
     def _format_quality_report(self, quality_info: Dict[str, Any], severity: TaskSeverity) -> str:
         """Formate le rapport de qualité du context"""
@@ -0,0 +1,229 @@
+"""
+SQLite Pool - Connexions SQLite partagées et réutilisées
+
+Ouvrir une connexion par opération coûte un open(), la lecture du schéma
+et la recompilation de chaque requête. Le pool garde une connexion par
+thread et par base, configurée une seule fois:
+- journal WAL: les lecteurs ne bloquent pas l'écrivain (et inversement)
+- synchronous=NORMAL (sûr en WAL), busy_timeout pour les écritures concurrentes
+- cache de requêtes préparées (cached_statements) conservé entre appels
+- bases attachées (ATTACH) pour les jointures entre fichiers
+- connexion fermée quand son thread se termine (workers de courte durée:
+  pas de descripteur ni de lecteur WAL laissé derrière)
+- pool partagé compté par référence: release_sqlite_pool ne ferme les
+  connexions qu'au départ du dernier utilisateur
+- fichier supprimé ou remplacé: reopen_if_replaced rouvre les connexions
+
+Usage:
+    pool = get_sqlite_pool("cortex/data/todo_pool.db", attach={"auth": "cortex/data/auth.db"})
+    rows = pool.fetchall("SELECT ... FROM tasks t JOIN auth.users u ON ...")
+    with pool.transaction() as conn:
+        conn.execute("INSERT ...")
+    release_sqlite_pool(pool)
+"""
+
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+
+class _ThreadConnection:
+    """Porteur de la connexion d'un thread: libéré (et la connexion fermée) à la fin du thread"""
+
+    __slots__ = ("connection", "__weakref__")
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+
+class SQLitePool:
+    """Une connexion par thread vers une base SQLite (WAL, requêtes préparées)"""
+
+    def __init__(
+        self,
+        db_path: str,
+        attach: Optional[Dict[str, str]] = None,
+        statement_cache_size: int = 256,
+        busy_timeout_ms: int = 5000
+    ):
+        """
+        Args:
+            db_path: Chemin de la base
+            attach: {alias: chemin} des bases à attacher à chaque connexion
+            statement_cache_size: Requêtes préparées gardées par connexion
+            busy_timeout_ms: Attente max d'un verrou d'écriture
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.attach = dict(attach or {})
+        self.statement_cache_size = statement_cache_size
+        self.busy_timeout_ms = busy_timeout_ms
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._file_id: Optional[Tuple[int, int]] = None
+        self.connections_opened = 0
+        self.key: Optional[Tuple] = None  # Clé de partage (get_sqlite_pool)
+        self.refs = 0
+
+    def connection(self) -> sqlite3.Connection:
+        """Connexion du thread courant (créée au premier appel)"""
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            conn = sqlite3.connect(
+                str(self.db_path),
+                timeout=self.busy_timeout_ms / 1000,
+                check_same_thread=False,
+                cached_statements=self.statement_cache_size
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            for alias, path in self.attach.items():
+                conn.execute("ATTACH DATABASE ? AS " + alias, (str(path),))
+                conn.execute(f"PRAGMA {alias}.journal_mode=WAL")
+
+            holder = self._local.holder = _ThreadConnection(conn)
+            # Fin du thread: son stockage local est libéré, la connexion avec.
+            # Pas à la sortie du processus: les flush atexit en ont encore besoin
+            weakref.finalize(holder, self._release, conn).atexit = False
+            file_id = self._stat()
+            with self._lock:
+                self._connections.append(conn)
+                self._file_id = file_id
+                self.connections_opened += 1
+        return holder.connection
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        """Identité (device, inode) du fichier, None s'il n'existe pas"""
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return (stat.st_dev, stat.st_ino)
+
+    def reopen_if_replaced(self) -> bool:
+        """
+        Ferme les connexions si le fichier a été supprimé ou remplacé depuis
+        leur ouverture (elles pointeraient encore vers l'ancien fichier)
+
+        Returns:
+            True si les connexions ont été fermées
+        """
+        with self._lock:
+            stale = bool(self._connections) and self._file_id != self._stat()
+        if stale:
+            self.close()
+        return stale
+
+    def _release(self, conn: sqlite3.Connection):
+        """Ferme la connexion d'un thread terminé"""
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.ProgrammingError:
+            pass
+
+    @contextmanager
+    def transaction(self):
+        """Transaction d'écriture (BEGIN IMMEDIATE, commit ou rollback)"""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    @contextmanager
+    def snapshot(self):
+        """Lectures cohérentes sur plusieurs requêtes (BEGIN DEFERRED, ne bloque pas l'écrivain en WAL)"""
+        conn = self.connection()
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.commit()
+
+    def execute(self, query: str, params: Sequence = ()) -> sqlite3.Cursor:
+        """Exécute une requête hors transaction explicite"""
+        return self.connection().execute(query, params)
+
+    def fetchone(self, query: str, params: Sequence = ()) -> Optional[Tuple]:
+        return self.connection().execute(query, params).fetchone()
+
+    def fetchall(self, query: str, params: Sequence = ()) -> List[Tuple]:
+        return self.connection().execute(query, params).fetchall()
+
+    def fetch_dicts(self, query: str, params: Sequence = ()) -> List[Dict[str, Any]]:
+        """Lignes sous forme de dict {colonne: valeur}"""
+        cursor = self.connection().execute(query, params)
+        columns = [desc[0] for desc in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        """Ferme toutes les connexions du pool (tous threads)"""
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "db_path": str(self.db_path),
+            "open_connections": len(self._connections),
+            "connections_opened": self.connections_opened
+        }
+
+
+_pools: Dict[Tuple, SQLitePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_sqlite_pool(db_path: str, attach: Optional[Dict[str, str]] = None) -> SQLitePool:
+    """
+    Pool partagé du processus pour une base (et ses bases attachées)
+
+    Deux composants qui ouvrent le même fichier partagent les connexions.
+    Chaque appel prend une référence, rendue par release_sqlite_pool.
+    """
+    key = (
+        str(Path(db_path).resolve()),
+        tuple(sorted((alias, str(Path(path).resolve())) for alias, path in (attach or {}).items()))
+    )
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = SQLitePool(db_path, attach)
+            pool.key = key
+            _pools[key] = pool
+        pool.refs += 1
+        return pool
+
+
+def release_sqlite_pool(pool: SQLitePool):
+    """
+    Rend une référence prise par get_sqlite_pool
+
+    Le pool n'est fermé (et retiré du partage) qu'au départ de son dernier
+    utilisateur: les autres composants sur la même base restent utilisables.
+    """
+    with _pools_lock:
+        pool.refs -= 1
+        if pool.refs > 0:
+            return
+        if pool.key is not None and _pools.get(pool.key) is pool:
+            del _pools[pool.key]
+    pool.close()
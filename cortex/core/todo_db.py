@@ -5,11 +5,10 @@ Features:
 - Multi-user task pool with ownership
 - Authentication via AuthManager + JWT
 - Role-based permissions (admin/developer/viewer)
-- Persistent SQLite storage
+- Persistent SQLite storage (shared WAL connections, auth database attached)
 - Task assignment and tracking
 """
 
-import sqlite3
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
@@ -17,6 +16,18 @@ from dataclasses import dataclass
 
 from cortex.core.auth_manager import AuthManager, UserRole
 from cortex.core.model_router import ModelTier
+from cortex.core.sqlite_pool import get_sqlite_pool
+
+
+# Colonnes d'une tâche, nom du propriétaire joint depuis auth.users
+# (utilisateur inactif ou supprimé → "User#id", comme AuthManager.get_user)
+TASK_SELECT = """
+    SELECT t.id, t.description, t.context, t.min_tier, t.status, t.owner_id,
+           COALESCE(u.username, 'User#' || t.owner_id),
+           t.created_at, t.updated_at, t.completed_at, t.assigned_to
+    FROM tasks t
+    LEFT JOIN auth.users u ON u.id = t.owner_id AND u.is_active = 1
+"""
 
 
 @dataclass
@@ -72,12 +83,15 @@ class TodoDB:
         # Auth manager (shared auth database)
         self.auth = auth_manager or AuthManager()
 
+        # Connexions partagées; auth.db attachée pour joindre les propriétaires
+        self.db = get_sqlite_pool(str(self.db_path), attach={"auth": str(self.auth.db_path)})
+
         # Initialize database
         self._init_db()
 
     def _init_db(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
 
             # Tasks table
@@ -110,7 +124,9 @@ class TodoDB:
                 )
             """)
 
-            conn.commit()
+            # Filtres et tri de list_tasks
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_created ON tasks(status, created_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_owner ON tasks(owner_id)")
 
     def _check_permission(
         self,
@@ -163,22 +179,19 @@ class TodoDB:
 
         # Check task ownership if task_id provided
         if task_id is not None and user_role != UserRole.ADMIN:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT owner_id FROM tasks WHERE id = ?", (task_id,))
-                row = cursor.fetchone()
+            row = self.db.fetchone("SELECT owner_id FROM tasks WHERE id = ?", (task_id,))
 
-                if not row:
-                    return {
-                        'success': False,
-                        'error': 'Task not found'
-                    }
+            if not row:
+                return {
+                    'success': False,
+                    'error': 'Task not found'
+                }
 
-                if row[0] != user_id:
-                    return {
-                        'success': False,
-                        'error': 'You can only modify your own tasks'
-                    }
+            if row[0] != user_id:
+                return {
+                    'success': False,
+                    'error': 'You can only modify your own tasks'
+                }
 
         return {
             'success': True,
@@ -189,19 +202,34 @@ class TodoDB:
 
     def _log_action(
         self,
+        conn,
         task_id: int,
         user_id: int,
         action: str,
         details: Optional[str] = None
     ):
-        """Log task action to history"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO task_history (task_id, user_id, action, timestamp, details)
-                VALUES (?, ?, ?, ?, ?)
-            """, (task_id, user_id, action, datetime.now().isoformat(), details))
-            conn.commit()
+        """Log task action to history (inside the caller's transaction)"""
+        conn.execute("""
+            INSERT INTO task_history (task_id, user_id, action, timestamp, details)
+            VALUES (?, ?, ?, ?, ?)
+        """, (task_id, user_id, action, datetime.now().isoformat(), details))
+
+    @staticmethod
+    def _row_to_task(row) -> TodoTask:
+        """Row from TASK_SELECT → TodoTask"""
+        return TodoTask(
+            id=row[0],
+            description=row[1],
+            context=row[2],
+            min_tier=row[3],
+            status=row[4],
+            owner_id=row[5],
+            owner_name=row[6],
+            created_at=row[7],
+            updated_at=row[8],
+            completed_at=row[9],
+            assigned_to=row[10]
+        )
 
     def add_task(
         self,
@@ -228,7 +256,7 @@ class TodoDB:
             return perm
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.transaction() as conn:
                 cursor = conn.cursor()
                 now = datetime.now().isoformat()
 
@@ -241,10 +269,9 @@ class TodoDB:
                 """, (description, context, min_tier.value, perm['user_id'], now, now))
 
                 task_id = cursor.lastrowid
-                conn.commit()
 
                 # Log action
-                self._log_action(task_id, perm['user_id'], 'created')
+                self._log_action(conn, task_id, perm['user_id'], 'created')
 
                 return {
                     'success': True,
@@ -264,43 +291,19 @@ class TodoDB:
         if not perm['success']:
             return perm
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM tasks WHERE id = ?
-            """, (task_id,))
-
-            row = cursor.fetchone()
-
-            if not row:
-                return {
-                    'success': False,
-                    'error': 'Task not found'
-                }
-
-            # Get owner name from auth manager
-            owner = self.auth.get_user(row[5])
-            owner_name = owner.username if owner else f"User#{row[5]}"
-
-            task = TodoTask(
-                id=row[0],
-                description=row[1],
-                context=row[2],
-                min_tier=row[3],
-                status=row[4],
-                owner_id=row[5],
-                owner_name=owner_name,
-                created_at=row[6],
-                updated_at=row[7],
-                completed_at=row[8],
-                assigned_to=row[9] if len(row) > 9 else None
-            )
+        row = self.db.fetchone(TASK_SELECT + " WHERE t.id = ?", (task_id,))
 
+        if not row:
             return {
-                'success': True,
-                'task': task.to_dict()
+                'success': False,
+                'error': 'Task not found'
             }
 
+        return {
+            'success': True,
+            'task': self._row_to_task(row).to_dict()
+        }
+
     def list_tasks(
         self,
         token: str,
@@ -322,50 +325,27 @@ class TodoDB:
         if not perm['success']:
             return perm
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        # Build query (owner names joined, no per-row lookup)
+        query = TASK_SELECT + " WHERE 1=1"
+        params = []
 
-            # Build query
-            query = "SELECT * FROM tasks WHERE 1=1"
-            params = []
-
-            if status:
-                query += " AND status = ?"
-                params.append(status)
-
-            if owner_id:
-                query += " AND owner_id = ?"
-                params.append(owner_id)
-
-            query += " ORDER BY created_at DESC"
-
-            cursor.execute(query, params)
-
-            tasks = []
-            for row in cursor.fetchall():
-                # Get owner name from auth manager
-                owner = self.auth.get_user(row[5])
-                owner_name = owner.username if owner else f"User#{row[5]}"
-
-                tasks.append(TodoTask(
-                    id=row[0],
-                    description=row[1],
-                    context=row[2],
-                    min_tier=row[3],
-                    status=row[4],
-                    owner_id=row[5],
-                    owner_name=owner_name,
-                    created_at=row[6],
-                    updated_at=row[7],
-                    completed_at=row[8],
-                    assigned_to=row[9] if len(row) > 9 else None
-                ).to_dict())
+        if status:
+            query += " AND t.status = ?"
+            params.append(status)
 
-            return {
-                'success': True,
-                'tasks': tasks,
-                'count': len(tasks)
-            }
+        if owner_id:
+            query += " AND t.owner_id = ?"
+            params.append(owner_id)
+
+        query += " ORDER BY t.created_at DESC"
+
+        tasks = [self._row_to_task(row).to_dict() for row in self.db.fetchall(query, params)]
+
+        return {
+            'success': True,
+            'tasks': tasks,
+            'count': len(tasks)
+        }
 
     def update_task_status(
         self,
@@ -397,7 +377,7 @@ class TodoDB:
             }
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.transaction() as conn:
                 cursor = conn.cursor()
                 now = datetime.now().isoformat()
 
@@ -415,10 +395,9 @@ class TodoDB:
                     WHERE id = ?
                 """, (new_status, now, update_data.get('completed_at'), task_id))
 
-                conn.commit()
-
                 # Log action
                 self._log_action(
+                    conn,
                     task_id,
                     perm['user_id'],
                     'status_changed',
@@ -442,49 +421,48 @@ class TodoDB:
         if not perm['success']:
             return perm
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        cursor = self.db.connection().cursor()
 
-            # Overall stats
-            cursor.execute("""
-                SELECT
-                    COUNT(*) as total,
-                    SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending,
-                    SUM(CASE WHEN status = 'in_progress' THEN 1 ELSE 0 END) as in_progress,
-                    SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
-                    SUM(CASE WHEN status = 'blocked' THEN 1 ELSE 0 END) as blocked
-                FROM tasks
-            """)
+        # Overall stats
+        cursor.execute("""
+            SELECT
+                COUNT(*) as total,
+                SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending,
+                SUM(CASE WHEN status = 'in_progress' THEN 1 ELSE 0 END) as in_progress,
+                SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
+                SUM(CASE WHEN status = 'blocked' THEN 1 ELSE 0 END) as blocked
+            FROM tasks
+        """)
 
-            row = cursor.fetchone()
+        row = cursor.fetchone()
 
-            # User's own stats
-            cursor.execute("""
-                SELECT
-                    COUNT(*) as my_total,
-                    SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as my_completed
-                FROM tasks
-                WHERE owner_id = ?
-            """, (perm['user_id'],))
+        # User's own stats
+        cursor.execute("""
+            SELECT
+                COUNT(*) as my_total,
+                SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as my_completed
+            FROM tasks
+            WHERE owner_id = ?
+        """, (perm['user_id'],))
 
-            my_row = cursor.fetchone()
+        my_row = cursor.fetchone()
 
-            return {
-                'success': True,
-                'pool_stats': {
-                    'total': row[0],
-                    'pending': row[1],
-                    'in_progress': row[2],
-                    'completed': row[3],
-                    'blocked': row[4],
-                    'completion_rate': (row[3] / row[0] * 100) if row[0] > 0 else 0
-                },
-                'my_stats': {
-                    'total': my_row[0],
-                    'completed': my_row[1],
-                    'completion_rate': (my_row[1] / my_row[0] * 100) if my_row[0] > 0 else 0
-                }
+        return {
+            'success': True,
+            'pool_stats': {
+                'total': row[0],
+                'pending': row[1],
+                'in_progress': row[2],
+                'completed': row[3],
+                'blocked': row[4],
+                'completion_rate': (row[3] / row[0] * 100) if row[0] > 0 else 0
+            },
+            'my_stats': {
+                'total': my_row[0],
+                'completed': my_row[1],
+                'completion_rate': (my_row[1] / my_row[0] * 100) if my_row[0] > 0 else 0
             }
+        }
 
 
 def create_todo_db(
@@ -5,6 +5,8 @@ Features:
 - Affichage temps réel avec checkboxes ☐/☑
 - États: pending, in_progress, completed, failed, blocked
 - Tracking de durée et agent assigné
+- Tâches parallèles: dépendances, plusieurs tâches en cours, annulation
+- Thread-safe (mises à jour depuis les workers du WorkflowEngine)
 - Intégration avec département Maintenance
 
 Usage:
@@ -20,6 +22,7 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 from pathlib import Path
 import json
+import threading
 
 
 class TaskStatus(Enum):
@@ -102,36 +105,45 @@ class TodoListManager:
         self.active_workflow: Optional[str] = None
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
-
-    def create_task_list(self, task_descriptions: List[str], workflow: str) -> List[str]:
+        self._lock = threading.RLock()
+
+    def create_task_list(
+        self,
+        task_descriptions: List[str],
+        workflow: str,
+        dependencies: Optional[List[List[str]]] = None
+    ) -> List[str]:
         """
         Crée une nouvelle liste de tâches
 
         Args:
             task_descriptions: Liste des descriptions de tâches
             workflow: Nom du workflow
+            dependencies: Pour chaque tâche, IDs des tâches dont elle dépend
 
         Returns:
             Liste des IDs de tâches créées
         """
-        self.active_workflow = workflow
-        self.tasks = []
-
-        task_ids = []
-        for i, description in enumerate(task_descriptions):
-            task_id = f"task_{i}"
-            task = TodoTask(
-                id=task_id,
-                description=description,
-                status=TaskStatus.PENDING,
-                created_at=datetime.now(),
-                workflow=workflow
-            )
-            self.tasks.append(task)
-            task_ids.append(task_id)
-
-        self.display()
-        self._save()
+        with self._lock:
+            self.active_workflow = workflow
+            self.tasks = []
+
+            task_ids = []
+            for i, description in enumerate(task_descriptions):
+                task_id = f"task_{i}"
+                task = TodoTask(
+                    id=task_id,
+                    description=description,
+                    status=TaskStatus.PENDING,
+                    created_at=datetime.now(),
+                    workflow=workflow,
+                    dependencies=list(dependencies[i]) if dependencies else []
+                )
+                self.tasks.append(task)
+                task_ids.append(task_id)
+
+            self.display()
+            self._save()
         return task_ids
 
     def start_task(self, task_id: str, agent_name: str):
@@ -142,13 +154,14 @@ class TodoListManager:
             task_id: ID de la tâche
             agent_name: Nom de l'agent qui commence
         """
-        task = self._get_task(task_id)
-        task.status = TaskStatus.IN_PROGRESS
-        task.assigned_to = agent_name
-        task.started_at = datetime.now()
+        with self._lock:
+            task = self._get_task(task_id)
+            task.status = TaskStatus.IN_PROGRESS
+            task.assigned_to = agent_name
+            task.started_at = datetime.now()
 
-        self.display()
-        self._save()
+            self.display()
+            self._save()
 
     def complete_task(self, task_id: str, metadata: Optional[Dict] = None):
         """
@@ -158,19 +171,20 @@ class TodoListManager:
             task_id: ID de la tâche
             metadata: Métadonnées additionnelles
         """
-        task = self._get_task(task_id)
-        task.status = TaskStatus.COMPLETED
-        task.completed_at = datetime.now()
+        with self._lock:
+            task = self._get_task(task_id)
+            task.status = TaskStatus.COMPLETED
+            task.completed_at = datetime.now()
 
-        if task.started_at:
-            duration = (task.completed_at - task.started_at).total_seconds()
-            task.duration_seconds = duration
+            if task.started_at:
+                duration = (task.completed_at - task.started_at).total_seconds()
+                task.duration_seconds = duration
 
-        if metadata:
-            task.metadata.update(metadata)
+            if metadata:
+                task.metadata.update(metadata)
 
-        self.display()
-        self._save()
+            self.display()
+            self._save()
 
         # Notifier département Maintenance (si disponible)
         self._notify_maintenance(task)
@@ -183,17 +197,18 @@ class TodoListManager:
             task_id: ID de la tâche
             error: Message d'erreur
         """
-        task = self._get_task(task_id)
-        task.status = TaskStatus.FAILED
-        task.error = error
-        task.completed_at = datetime.now()
+        with self._lock:
+            task = self._get_task(task_id)
+            task.status = TaskStatus.FAILED
+            task.error = error
+            task.completed_at = datetime.now()
 
-        if task.started_at:
-            duration = (task.completed_at - task.started_at).total_seconds()
-            task.duration_seconds = duration
+            if task.started_at:
+                duration = (task.completed_at - task.started_at).total_seconds()
+                task.duration_seconds = duration
 
-        self.display()
-        self._save()
+            self.display()
+            self._save()
 
     def block_task(self, task_id: str, reason: str, dependencies: List[str] = None):
         """
@@ -204,24 +219,47 @@ class TodoListManager:
             reason: Raison du blocage
             dependencies: IDs des tâches bloquantes
         """
-        task = self._get_task(task_id)
-        task.status = TaskStatus.BLOCKED
-        task.error = reason
+        with self._lock:
+            task = self._get_task(task_id)
+            task.status = TaskStatus.BLOCKED
+            task.error = reason
+
+            if dependencies:
+                task.dependencies.extend(d for d in dependencies if d not in task.dependencies)
 
-        if dependencies:
-            task.dependencies.extend(dependencies)
+            self.display()
+            self._save()
+
+    def cancel_tasks(self, task_ids: List[str], reason: str):
+        """
+        Annule des tâches qui ne s'exécuteront pas (⊘), affichage unique
 
-        self.display()
-        self._save()
+        Args:
+            task_ids: IDs des tâches annulées
+            reason: Raison (ex: dépendance échouée)
+        """
+        if not task_ids:
+            return
+
+        with self._lock:
+            for task_id in task_ids:
+                task = self._get_task(task_id)
+                task.status = TaskStatus.BLOCKED
+                task.error = reason
+                task.metadata["cancelled"] = True
+
+            self.display()
+            self._save()
 
     def unblock_task(self, task_id: str):
         """Débloque une tâche (⊘ → ☐)"""
-        task = self._get_task(task_id)
-        task.status = TaskStatus.PENDING
-        task.error = None
+        with self._lock:
+            task = self._get_task(task_id)
+            task.status = TaskStatus.PENDING
+            task.error = None
 
-        self.display()
-        self._save()
+            self.display()
+            self._save()
 
     def display(self):
         """
@@ -237,21 +275,24 @@ class TodoListManager:
         if not self.active_workflow:
             return
 
-        print(f"\n{'='*60}")
-        print(f"📋 {self.active_workflow}")
-        print(f"{'='*60}\n")
-
-        for task in self.tasks:
-            self._print_task(task)
-
-        # Summary
-        summary = self.get_summary()
-        print(f"\n{'-'*60}")
-        print(f"Progress: {summary['completed']}/{summary['total']} tasks "
-              f"({summary['success_rate']:.1%} success rate)")
-        if summary['total_duration'] > 0:
-            print(f"Total time: {summary['total_duration']:.1f}s")
-        print(f"{'-'*60}\n")
+        with self._lock:
+            print(f"\n{'='*60}")
+            print(f"📋 {self.active_workflow}")
+            print(f"{'='*60}\n")
+
+            for task in self.tasks:
+                self._print_task(task)
+
+            # Summary
+            summary = self.get_summary()
+            print(f"\n{'-'*60}")
+            print(f"Progress: {summary['completed']}/{summary['total']} tasks "
+                  f"({summary['success_rate']:.1%} success rate)")
+            if summary['in_progress'] > 1:
+                print(f"Running in parallel: {summary['in_progress']} tasks")
+            if summary['total_duration'] > 0:
+                print(f"Total time: {summary['total_duration']:.1f}s")
+            print(f"{'-'*60}\n")
 
     def _print_task(self, task: TodoTask):
         """Affiche une tâche individuelle"""
@@ -280,6 +321,14 @@ class TodoListManager:
         if task.status == TaskStatus.IN_PROGRESS:
             print(f"   └─> {task.assigned_to} is working...")
 
+        elif task.status == TaskStatus.PENDING and task.dependencies:
+            waiting = [
+                d for d in task.dependencies
+                if self._get_task(d).status in (TaskStatus.PENDING, TaskStatus.IN_PROGRESS)
+            ]
+            if waiting:
+                print(f"   └─> Waiting for: {', '.join(waiting)}")
+
         elif task.status == TaskStatus.COMPLETED:
             if task.duration_seconds:
                 print(f"   └─> Completed in {task.duration_seconds:.1f}s")
@@ -0,0 +1,87 @@
+"""
+Comptage de tokens partagé
+
+Les encodeurs tiktoken sont chargés une seule fois par encodage
+(le premier get_encoding lit ou télécharge le vocabulaire BPE).
+Les modèles sont associés à leur encodage (gpt-4o/gpt-5: o200k_base);
+les modèles non-OpenAI (Claude, DeepSeek) utilisent cl100k_base comme
+approximation. Sans tiktoken, ou hors ligne, on retombe sur l'estimation
+historique du Cortex: 1 token ≈ 4 caractères.
+"""
+
+from functools import lru_cache
+from typing import List, Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def get_encoder(encoding_name: str = DEFAULT_ENCODING):
+    """
+    Encodeur tiktoken (mis en cache, échec compris)
+
+    Returns:
+        tiktoken.Encoding, ou None si indisponible
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=None)
+def encoding_for_model(model: Optional[str] = None) -> str:
+    """Nom de l'encodage tiktoken d'un modèle (défaut: cl100k_base)"""
+    if not model or tiktoken is None:
+        return DEFAULT_ENCODING
+    try:
+        return tiktoken.encoding_name_for_model(model)
+    except Exception:
+        return DEFAULT_ENCODING
+
+
+def get_model_encoder(model: Optional[str] = None):
+    """Encodeur tiktoken d'un modèle (mis en cache), ou None si indisponible"""
+    return get_encoder(encoding_for_model(model))
+
+
+def count_tokens(text: str, encoding_name: str = DEFAULT_ENCODING) -> int:
+    """Nombre de tokens d'un texte"""
+    encoder = get_encoder(encoding_name)
+    if encoder is None:
+        return len(text) // 4
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def count_tokens_many(texts: List[str], encoding_name: str = DEFAULT_ENCODING) -> List[int]:
+    """Nombre de tokens de plusieurs textes (encodage par lot)"""
+    encoder = get_encoder(encoding_name)
+    if encoder is None:
+        return [len(text) // 4 for text in texts]
+    return [len(tokens) for tokens in encoder.encode_batch(texts, disallowed_special=())]
+
+
+def is_exact(encoding_name: str = DEFAULT_ENCODING) -> bool:
+    """True si les comptes viennent d'un vrai tokenizer"""
+    return get_encoder(encoding_name) is not None
+
+
+def truncate_to_tokens(text: str, max_tokens: int, encoding_name: str = DEFAULT_ENCODING) -> str:
+    """Préfixe d'un texte tenant dans max_tokens"""
+    if max_tokens <= 0:
+        return ""
+    encoder = get_encoder(encoding_name)
+    if encoder is None:
+        return text[:max_tokens * 4]
+    tokens = encoder.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoder.decode(tokens[:max_tokens])
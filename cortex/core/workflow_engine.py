@@ -3,17 +3,21 @@ Workflow Engine - Orchestrateur central qui lie tous les départements
 
 Responsabilités:
 - Exécute workflows avec consultation automatique Optimization
+- Ordonnance les étapes en DAG (dépendances) sur un pool de workers borné
 - Gère TodoList avec checkboxes temps réel
 - Enregistre résultats après chaque action
 - Déclenche Maintenance après changements code
 - Génère rapports CEO automatiquement
 """
 
-from typing import List, Dict, Any, Optional, Callable
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import heapq
 import time
 
+from cortex.core.config_loader import get_config
 from cortex.core.todolist_manager import TodoListManager, TodoTask
 from cortex.core.department_system import DepartmentRegistry
 from cortex.departments.optimization.optimization_knowledge import (
@@ -40,6 +44,12 @@ class WorkflowStep:
     context_requests: List[str] = None  # Contextes dynamiques demandés
     allow_enrichment: bool = True  # Permet injection de contexte dynamique
 
+    # Exécution en DAG: noms des étapes dont celle-ci dépend
+    # None = dépend de l'étape précédente (exécution séquentielle historique)
+    # [] = aucune dépendance, peut démarrer immédiatement
+    depends_on: Optional[List[str]] = None
+    estimated_seconds: float = 1.0  # Poids de l'étape pour l'ordonnancement par chemin critique
+
     def __post_init__(self):
         if self.context_requests is None:
             self.context_requests = []
@@ -56,6 +66,9 @@ class WorkflowResult:
     errors: List[str]
     output: Any
     optimization_advice_used: bool
+    step_durations: Dict[str, float] = field(default_factory=dict)  # Durée murale par étape
+    steps_cancelled: List[str] = field(default_factory=list)  # Annulées suite à un échec en amont
+    speedup: float = 1.0  # Somme des durées d'étapes / durée murale d'exécution
 
 
 class WorkflowEngine:
@@ -76,10 +89,12 @@ class WorkflowEngine:
         roadmap_manager: Optional[RoadmapManager] = None,
         ceo_reporter: Optional[CEOReporter] = None,
         git_processor: Optional[GitDiffProcessor] = None,
-        context_enrichment_agent=None  # Phase 4.1: Optional ContextEnrichmentAgent
+        context_enrichment_agent=None,  # Phase 4.1: Optional ContextEnrichmentAgent
+        max_parallel_steps: Optional[int] = None,
+        todolist_manager: Optional[TodoListManager] = None
     ):
         # Managers
-        self.todolist = TodoListManager()
+        self.todolist = todolist_manager or TodoListManager()
         self.departments = DepartmentRegistry()
 
         # Départements
@@ -91,6 +106,9 @@ class WorkflowEngine:
         # Phase 4.1: Context enrichment (optionnel)
         self.context_enrichment_agent = context_enrichment_agent
 
+        # Étapes indépendantes exécutées simultanément (1 = séquentiel)
+        self.max_parallel_steps = max_parallel_steps or get_config().get("agents.workflow.max_parallel_steps", 4)
+
         # État
         self.current_workflow: Optional[str] = None
         self.current_request: Optional[str] = None
@@ -115,6 +133,9 @@ class WorkflowEngine:
         Returns:
             WorkflowResult avec détails d'exécution
         """
+        # Dépendances validées avant toute exécution (ValueError si invalides)
+        dependencies = self._resolve_dependencies(steps)
+
         self.current_workflow = workflow_name
         self.current_request = request_text
 
@@ -157,86 +178,23 @@ class WorkflowEngine:
         task_names = [step.name for step in steps]
         task_ids = self.todolist.create_task_list(
             task_descriptions=task_names,
-            workflow=workflow_name
+            workflow=workflow_name,
+            dependencies=[[f"task_{j}" for j in deps] for deps in dependencies]
         )
 
         # Afficher TodoList initiale
         self.todolist.display()
 
-        # STEP 2: Exécuter chaque étape
-        steps_completed = 0
-
-        for i, step in enumerate(steps):
-            task_id = task_ids[i]
-
-            try:
-                # Marquer tâche en cours
-                self.todolist.start_task(task_id, agent_name=step.agent_name)
-                print(f"\n🔄 Executing: {step.name}")
-                print(f"   Agent: {step.agent_name} ({step.department})")
-
-                # Phase 4.1: Enrichir contexte si demandé
-                enriched_prompt = None
-                if (step.context_requests and step.allow_enrichment and
-                    self.context_enrichment_agent is not None):
-
-                    # Créer AgentMessage pour enrichissement
-                    from cortex.departments.intelligence.context_enrichment_agent import AgentMessage
-
-                    prev_agent = steps[i-1].agent_name if i > 0 else "User"
-
-                    message = AgentMessage(
-                        from_agent=prev_agent,
-                        to_agent=step.agent_name,
-                        task=step.name,
-                        context_requests=step.context_requests,
-                        metadata={"workflow": workflow_name, "step_index": i}
-                    )
-
-                    # Enrichir
-                    print(f"   🌐 Enriching context with {len(step.context_requests)} request(s)...")
-                    enriched_message = self.context_enrichment_agent.enrich_message(
-                        message,
-                        query=request_text
-                    )
-
-                    if enriched_message.enriched:
-                        print(f"   ✓ Added {len(enriched_message.contexts_added)} dynamic context(s)")
-                        enriched_prompt = enriched_message.task
-
-                # Exécuter action (avec prompt enrichi si disponible)
-                step_start = time.time()
-                if enriched_prompt and hasattr(step.action, '__self__'):
-                    # Si action est une méthode d'agent, passer enriched_prompt
-                    result = step.action(enriched_prompt=enriched_prompt)
-                else:
-                    result = step.action()
-                step_duration = time.time() - step_start
-
-                # Stocker résultat pour steps futurs
-                self.previous_step_results[step.agent_name] = result
-
-                # Marquer tâche complétée
-                self.todolist.complete_task(
-                    task_id,
-                    metadata={"duration": step_duration, "result": str(result)[:100]}
-                )
-
-                output = result
-                steps_completed += 1
-
-                print(f"✅ Completed in {step_duration:.2f}s")
-
-            except Exception as e:
-                error_msg = f"Error in {step.name}: {str(e)}"
-                errors.append(error_msg)
-
-                self.todolist.fail_task(task_id, error=error_msg)
-                print(f"❌ Failed: {error_msg}")
+        # STEP 2: Exécuter le DAG des étapes
+        execution_start = time.time()
+        outputs, step_durations, cancelled = self._run_dag(
+            steps, dependencies, task_ids, workflow_name, request_text, errors
+        )
+        execution_duration = time.time() - execution_start
 
-                if step.required:
-                    # Échec sur étape requise → arrêter workflow
-                    break
+        steps_completed = len(outputs)
+        if outputs:
+            output = outputs[max(outputs)]
 
         # Afficher TodoList finale
         print()
@@ -277,6 +235,9 @@ class WorkflowEngine:
                 source_department="workflow_engine"
             )
 
+        sequential_duration = sum(step_durations.values())
+        speedup = sequential_duration / execution_duration if execution_duration > 0 else 1.0
+
         result = WorkflowResult(
             workflow_name=workflow_name,
             success=success,
@@ -285,16 +246,248 @@ class WorkflowEngine:
             steps_total=len(steps),
             errors=errors,
             output=output,
-            optimization_advice_used=optimization_advice is not None
+            optimization_advice_used=optimization_advice is not None,
+            step_durations={steps[i].name: d for i, d in sorted(step_durations.items())},
+            steps_cancelled=[steps[i].name for i in sorted(cancelled)],
+            speedup=speedup
         )
 
         print(f"\n{'='*70}")
         print(f"{'✅' if success else '❌'} Workflow {workflow_name}: {'SUCCESS' if success else 'FAILED'}")
-        print(f"   Duration: {duration:.2f}s | Steps: {steps_completed}/{len(steps)}")
+        print(f"   Duration: {duration:.2f}s | Steps: {steps_completed}/{len(steps)} | Speedup: x{speedup:.1f}")
         print(f"{'='*70}\n")
 
         return result
 
+    def _resolve_dependencies(self, steps: List[WorkflowStep]) -> List[List[int]]:
+        """
+        Indices des dépendances de chaque étape
+
+        Raises:
+            ValueError: Dépendance inconnue, ambiguë (nom dupliqué) ou cycle
+        """
+        indexes: Dict[str, int] = {}
+        duplicates = set()
+        for i, step in enumerate(steps):
+            if step.name in indexes:
+                duplicates.add(step.name)
+            indexes[step.name] = i
+
+        dependencies = []
+        for i, step in enumerate(steps):
+            if step.depends_on is None:
+                dependencies.append([i - 1] if i > 0 else [])
+                continue
+
+            resolved = []
+            for name in step.depends_on:
+                if name not in indexes:
+                    raise ValueError(f"Step '{step.name}' depends on unknown step '{name}'")
+                if name in duplicates:
+                    raise ValueError(f"Step '{step.name}' depends on ambiguous step name '{name}'")
+                resolved.append(indexes[name])
+            dependencies.append(resolved)
+
+        # Détection de cycle (Kahn)
+        remaining = [len(deps) for deps in dependencies]
+        dependents = self._dependents(dependencies)
+        ready = [i for i, count in enumerate(remaining) if count == 0]
+        visited = 0
+        while ready:
+            i = ready.pop()
+            visited += 1
+            for j in dependents[i]:
+                remaining[j] -= 1
+                if remaining[j] == 0:
+                    ready.append(j)
+        if visited != len(steps):
+            cycle = [steps[i].name for i, count in enumerate(remaining) if count > 0]
+            raise ValueError(f"Workflow steps have a dependency cycle: {', '.join(cycle)}")
+
+        return dependencies
+
+    @staticmethod
+    def _dependents(dependencies: List[List[int]]) -> List[List[int]]:
+        dependents: List[List[int]] = [[] for _ in dependencies]
+        for i, deps in enumerate(dependencies):
+            for j in deps:
+                dependents[j].append(i)
+        return dependents
+
+    @staticmethod
+    def _critical_path(steps: List[WorkflowStep], dependents: List[List[int]]) -> List[float]:
+        """Durée estimée du plus long chemin partant de chaque étape (priorité d'ordonnancement)"""
+        priority: Dict[int, float] = {}
+
+        def visit(i: int) -> float:
+            if i not in priority:
+                tail = max((visit(j) for j in dependents[i]), default=0.0)
+                priority[i] = max(steps[i].estimated_seconds, 0.0) + tail
+            return priority[i]
+
+        return [visit(i) for i in range(len(steps))]
+
+    def _run_dag(
+        self,
+        steps: List[WorkflowStep],
+        dependencies: List[List[int]],
+        task_ids: List[str],
+        workflow_name: str,
+        request_text: str,
+        errors: List[str]
+    ) -> Tuple[Dict[int, Any], Dict[int, float], set]:
+        """
+        Exécute les étapes prêtes sur le pool, chemin critique le plus long d'abord
+
+        Une étape requise qui échoue annule ses dépendants (transitivement);
+        une étape optionnelle qui échoue les laisse s'exécuter.
+
+        Returns:
+            (résultats des étapes réussies, durées par étape, étapes annulées)
+        """
+        outputs: Dict[int, Any] = {}
+        durations: Dict[int, float] = {}
+        cancelled: set = set()
+        if not steps:
+            return outputs, durations, cancelled
+
+        dependents = self._dependents(dependencies)
+        priority = self._critical_path(steps, dependents)
+        remaining = [len(deps) for deps in dependencies]
+        ready = [(-priority[i], i) for i, count in enumerate(remaining) if count == 0]
+        heapq.heapify(ready)
+        running = {}
+
+        workers = max(1, min(self.max_parallel_steps, len(steps)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="workflow") as pool:
+            while ready or running:
+                while ready and len(running) < workers:
+                    _, i = heapq.heappop(ready)
+                    future = pool.submit(
+                        self._execute_step, steps, dependencies, i, task_ids[i], workflow_name, request_text
+                    )
+                    running[future] = i
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    step = steps[i]
+                    result, error, durations[i] = future.result()
+
+                    if error is None:
+                        outputs[i] = result
+                    else:
+                        errors.append(error)
+                        if step.required:
+                            skipped = self._collect_dependents(i, dependents, cancelled)
+                            cancelled.update(skipped)
+                            self.todolist.cancel_tasks(
+                                [task_ids[j] for j in sorted(skipped)],
+                                reason=f"Cancelled: '{step.name}' failed"
+                            )
+                            continue
+
+                    for j in dependents[i]:
+                        remaining[j] -= 1
+                        if remaining[j] == 0 and j not in cancelled:
+                            heapq.heappush(ready, (-priority[j], j))
+
+        return outputs, durations, cancelled
+
+    @staticmethod
+    def _collect_dependents(i: int, dependents: List[List[int]], cancelled: set) -> set:
+        """Dépendants transitifs de i pas encore annulés"""
+        found = set()
+        stack = list(dependents[i])
+        while stack:
+            j = stack.pop()
+            if j in found or j in cancelled:
+                continue
+            found.add(j)
+            stack.extend(dependents[j])
+        return found
+
+    def _execute_step(
+        self,
+        steps: List[WorkflowStep],
+        dependencies: List[List[int]],
+        i: int,
+        task_id: str,
+        workflow_name: str,
+        request_text: str
+    ) -> Tuple[Any, Optional[str], float]:
+        """
+        Exécute une étape (thread du pool)
+
+        Returns:
+            (résultat, message d'erreur ou None, durée murale)
+        """
+        step = steps[i]
+        step_start = time.time()
+
+        try:
+            # Marquer tâche en cours
+            self.todolist.start_task(task_id, agent_name=step.agent_name)
+            print(f"\n🔄 Executing: {step.name}")
+            print(f"   Agent: {step.agent_name} ({step.department})")
+
+            # Phase 4.1: Enrichir contexte si demandé
+            enriched_prompt = None
+            if (step.context_requests and step.allow_enrichment and
+                self.context_enrichment_agent is not None):
+
+                # Créer AgentMessage pour enrichissement
+                from cortex.departments.intelligence.context_enrichment_agent import AgentMessage
+
+                prev_agent = steps[dependencies[i][-1]].agent_name if dependencies[i] else "User"
+
+                message = AgentMessage(
+                    from_agent=prev_agent,
+                    to_agent=step.agent_name,
+                    task=step.name,
+                    context_requests=step.context_requests,
+                    metadata={"workflow": workflow_name, "step_index": i}
+                )
+
+                # Enrichir
+                print(f"   🌐 Enriching context with {len(step.context_requests)} request(s)...")
+                enriched_message = self.context_enrichment_agent.enrich_message(
+                    message,
+                    query=request_text
+                )
+
+                if enriched_message.enriched:
+                    print(f"   ✓ Added {len(enriched_message.contexts_added)} dynamic context(s)")
+                    enriched_prompt = enriched_message.task
+
+            # Exécuter action (avec prompt enrichi si disponible)
+            action_start = time.time()
+            if enriched_prompt and hasattr(step.action, '__self__'):
+                # Si action est une méthode d'agent, passer enriched_prompt
+                result = step.action(enriched_prompt=enriched_prompt)
+            else:
+                result = step.action()
+            action_duration = time.time() - action_start
+
+            # Stocker résultat pour steps futurs
+            self.previous_step_results[step.agent_name] = result
+
+            # Marquer tâche complétée
+            self.todolist.complete_task(
+                task_id,
+                metadata={"duration": action_duration, "result": str(result)[:100]}
+            )
+
+            print(f"✅ Completed in {action_duration:.2f}s")
+            return result, None, time.time() - step_start
+
+        except Exception as e:
+            error_msg = f"Error in {step.name}: {str(e)}"
+
+            self.todolist.fail_task(task_id, error=error_msg)
+            print(f"❌ Failed: {error_msg}")
+            return None, error_msg, time.time() - step_start
+
     def _record_in_optimization(
         self,
         request_text: str,
@@ -65,6 +65,12 @@ class DatabaseManager:
             conn.rollback()
             raise e
 
+    @contextmanager
+    def get_connection(self):
+        """Connexion du thread courant pour les repositories (commit en sortie, rollback si erreur)"""
+        with self.transaction() as conn:
+            yield conn
+
     def _initialize_schema(self):
         """Initialize database schema from schema.sql"""
         schema_file = Path(__file__).parent / "schema.sql"
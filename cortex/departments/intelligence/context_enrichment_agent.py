@@ -64,11 +64,13 @@ class ContextEnrichmentAgent:
         self,
         context_manager: DynamicContextManager,
         registry: XPathSourceRegistry,
-        max_contexts_per_message: int = 3
+        max_contexts_per_message: int = 3,
+        max_context_tokens: int = 1500
     ):
         self.context_manager = context_manager
         self.registry = registry
         self.max_contexts_per_message = max_contexts_per_message
+        self.max_context_tokens = max_context_tokens
 
         # Cache de résultats précédents (pour previous_result)
         self.previous_results: Dict[str, Any] = {}
@@ -101,8 +103,11 @@ class ContextEnrichmentAgent:
         # Filtrer par relevance
         contexts = self._filter_by_relevance(contexts, message.task)
 
-        # Limiter nombre de contextes
+        # Limiter nombre de contextes, puis sélection sous budget de tokens
         contexts = contexts[:self.max_contexts_per_message]
+        packed = self.context_manager.pack_contexts(contexts, self.max_context_tokens)
+        contexts = [snippet.data for snippet in packed.snippets]
+        message.metadata["context_manifest"] = packed.manifest
 
         # Enrichir prompt
         enriched_task = self._inject_contexts(message.task, contexts)
@@ -18,6 +18,7 @@ import json
 import re
 
 from cortex.departments.intelligence.stealth_web_crawler import ScrapedData
+from cortex.core.context_packer import ContextPacker, PackedContext, Snippet
 
 
 @dataclass
@@ -553,6 +554,39 @@ class DynamicContextManager:
 
         return results
 
+    def pack_contexts(
+        self,
+        contexts: List[OptimizedContext],
+        max_tokens: int,
+        model: Optional[str] = None
+    ) -> PackedContext:
+        """
+        Sélectionne les contextes à injecter sous un budget de tokens
+
+        Pertinence d'un contexte = relevance × freshness; les contextes
+        redondants (même source re-scrapée, items identiques) sont écartés.
+
+        Args:
+            contexts: Contextes candidats (ordre d'injection)
+            max_tokens: Budget de tokens
+            model: Modèle cible (encodage tiktoken)
+
+        Returns:
+            PackedContext (snippets[i].data = OptimizedContext retenu)
+        """
+        snippets = [
+            Snippet(
+                content=context.to_prompt_context(include_metadata=False),
+                relevance=context.relevance_score * context.freshness_score,
+                source=context.source_name,
+                kind="dynamic",
+                data=context
+            )
+            for context in contexts
+        ]
+        # Contextes issus du même gabarit: en-têtes répétés, pas de rognage
+        return ContextPacker(model=model, trim_overlap=False).pack(snippets, max_tokens)
+
 
 def create_dynamic_context_manager(storage_dir: str = "cortex/data/scraped_data") -> DynamicContextManager:
     """Factory function"""
@@ -33,6 +33,8 @@ from pathlib import Path
 from cortex.core.llm_client import LLMClient, ModelTier
 from cortex.core.agent_hierarchy import DecisionAgent, AgentRole, AgentResult, EscalationContext
 from cortex.core.agent_memory import get_agent_memory
+from cortex.core.clone_detector import CloneDetector, CloneCluster
+from cortex.core.config_loader import get_config
 
 
 class HarmonizationAgent(DecisionAgent):
@@ -48,6 +50,7 @@ class HarmonizationAgent(DecisionAgent):
         super().__init__(llm_client, specialization="harmonization")
         self.tier = ModelTier.GPT5  # GPT-5 pour décisions architecturales critiques
         self.memory = get_agent_memory('maintenance', 'harmonization')
+        self._clone_detector: Optional[CloneDetector] = None
 
     def can_handle(self, request: str, context: Optional[Dict] = None) -> float:
         """
@@ -447,11 +450,39 @@ class HarmonizationAgent(DecisionAgent):
                         'reason': 'Similar names suggest potential duplication'
                     })
 
-        # Check for overlapping responsibilities
-        # (Simplified - in real implementation would analyze docstrings and code)
+        # Check for duplicated code: near-duplicate functions across the tree
+        for cluster in self._find_code_clones():
+            labels = [f"{m['symbol']} ({m['path']}:{m['start_line']})" for m in cluster.members]
+            others = ", ".join(labels[1:4]) + (f" (+{len(labels) - 4} more)" if len(labels) > 4 else "")
+            duplications.append({
+                'component1': labels[0],
+                'component2': others,
+                'type': 'code_clone',
+                'similarity': cluster.similarity,
+                'reason': f"{len(labels)} near-duplicate functions (AST fingerprints, "
+                          f"lowest pair {cluster.min_similarity:.0%})",
+                'members': cluster.members
+            })
 
         return duplications
 
+    def _find_code_clones(self) -> List[CloneCluster]:
+        """
+        Clusters de fonctions quasi dupliquées (voir cortex/core/clone_detector.py)
+
+        L'index d'empreintes est persistant: seuls les fichiers modifiés
+        depuis le dernier audit sont ré-analysés.
+        """
+        if not get_config().get("agents.harmonization.clone_detection.enabled", True):
+            return []
+        try:
+            if self._clone_detector is None:
+                self._clone_detector = CloneDetector()
+            return self._clone_detector.find_clones()
+        except Exception as e:
+            print(f"   ⚠️  Clone detection failed: {e}")
+            return []
+
     def _check_misattributions(self, architecture: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Vérifie les mauvaises attributions de tâches
@@ -524,6 +555,16 @@ class HarmonizationAgent(DecisionAgent):
 
         # Recommendations for duplications
         for dup in duplications:
+            if dup['type'] == 'code_clone':
+                recommendations.append({
+                    'type': 'duplication',
+                    'priority': 'medium',
+                    'action': 'extract_shared_function',
+                    'components': [m['symbol'] for m in dup['members']],
+                    'description': f"Extract a shared helper for {len(dup['members'])} near-duplicate functions "
+                                   f"({dup['similarity']:.0%} similar), starting with {dup['component1']}"
+                })
+                continue
             recommendations.append({
                 'type': 'duplication',
                 'priority': 'high',
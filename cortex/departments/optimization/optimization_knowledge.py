@@ -8,13 +8,99 @@ Cette base contient TOUT ce qui permet d'apprendre et d'optimiser:
 - Statistiques d'usage des outils
 - Git diff history
 - Métriques de performance
+
+Stockage: base SQLite persistante (optimization.knowledge.db_path), pour que
+WorkflowEngine ait l'historique dès le démarrage d'un nouveau processus:
+- métriques globales et par outil tenues en agrégats (incréments O(1))
+- index inversé token → requêtes pour find_similar_requests; seules les
+  dernières occurrences de chaque token sont examinées, la latence ne
+  dépend pas de la taille de l'historique
+- récurrences d'échecs comptées par type d'erreur
 """
 
-from typing import Dict, List, Any, Optional
+import json
+from collections.abc import Sequence
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Set
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from enum import Enum
 
+from cortex.core.config_loader import get_config
+from cortex.core.sqlite_pool import get_sqlite_pool, release_sqlite_pool
+
+
+CANDIDATES_PER_TOKEN = 2000  # Occurrences récentes examinées par token de la requête
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS optimization_requests (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        request_type TEXT,
+        outcome TEXT NOT NULL,
+        data TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_optimization_requests_timestamp ON optimization_requests(timestamp)",
+    """
+    CREATE TABLE IF NOT EXISTS optimization_request_tokens (
+        token TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        PRIMARY KEY (token, seq)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS optimization_metrics (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        total_requests INTEGER NOT NULL DEFAULT 0,
+        successful_requests INTEGER NOT NULL DEFAULT 0,
+        total_cost REAL NOT NULL DEFAULT 0,
+        total_duration REAL NOT NULL DEFAULT 0,
+        total_failures INTEGER NOT NULL DEFAULT 0,
+        cost_savings REAL NOT NULL DEFAULT 0,
+        time_savings REAL NOT NULL DEFAULT 0
+    )
+    """,
+    "INSERT OR IGNORE INTO optimization_metrics (id) VALUES (1)",
+    """
+    CREATE TABLE IF NOT EXISTS optimization_failures (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL,
+        error_type TEXT NOT NULL,
+        data TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_optimization_failures_type ON optimization_failures(error_type, seq)",
+    """
+    CREATE TABLE IF NOT EXISTS optimization_failure_types (
+        error_type TEXT PRIMARY KEY,
+        occurrences INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS optimization_patterns (
+        id TEXT PRIMARY KEY,
+        data TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS optimization_tool_stats (
+        tool_name TEXT PRIMARY KEY,
+        total_uses INTEGER NOT NULL DEFAULT 0,
+        success_uses INTEGER NOT NULL DEFAULT 0,
+        failure_uses INTEGER NOT NULL DEFAULT 0,
+        total_duration REAL NOT NULL DEFAULT 0,
+        total_cost REAL NOT NULL DEFAULT 0,
+        data TEXT
+    )
+    """,
+]
+
+def _tokens(text: str) -> Set[str]:
+    """Tokens utilisés pour la similarité (mots en minuscules)"""
+    return set(text.lower().split())
+
 
 class RequestOutcome(Enum):
     """Résultat d'une requête"""
@@ -56,6 +142,14 @@ class HistoricalRequest:
         data['outcome'] = self.outcome.value
         return data
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HistoricalRequest':
+        """Reconstruit depuis to_dict()"""
+        data = dict(data)
+        data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+        data['outcome'] = RequestOutcome(data['outcome'])
+        return cls(**data)
+
 
 @dataclass
 class SuccessPattern:
@@ -86,6 +180,13 @@ class SuccessPattern:
         data['last_used'] = self.last_used.isoformat()
         return data
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SuccessPattern':
+        data = dict(data)
+        data['created_at'] = datetime.fromisoformat(data['created_at'])
+        data['last_used'] = datetime.fromisoformat(data['last_used'])
+        return cls(**data)
+
 
 @dataclass
 class FailureAnalysis:
@@ -113,6 +214,12 @@ class FailureAnalysis:
         data['timestamp'] = self.timestamp.isoformat()
         return data
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FailureAnalysis':
+        data = dict(data)
+        data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+        return cls(**data)
+
 
 @dataclass
 class ToolUsageStats:
@@ -145,6 +252,54 @@ class ToolUsageStats:
         return data
 
 
+class _StoredRecords(Sequence):
+    """
+    Vue en lecture seule d'une table d'historique (ordre d'insertion)
+
+    len() lit le compteur agrégé; l'itération lit la table par blocs.
+    Remplace les anciennes listes en mémoire (historical_requests,
+    failure_analyses) sans les charger.
+    """
+
+    _CHUNK = 1000
+
+    def __init__(self, knowledge: 'OptimizationKnowledge', table: str, count_column: str, factory):
+        self._knowledge = knowledge
+        self._table = table
+        self._count_column = count_column
+        self._factory = factory
+
+    def __len__(self) -> int:
+        return self._knowledge._metric(self._count_column)
+
+    def __iter__(self) -> Iterator:
+        last = 0
+        while True:
+            rows = self._knowledge.db.fetchall(
+                f"SELECT seq, data FROM {self._table} WHERE seq > ? ORDER BY seq LIMIT ?",
+                (last, self._CHUNK)
+            )
+            for _, data in rows:
+                yield self._factory(json.loads(data))
+            if len(rows) < self._CHUNK:
+                return
+            last = rows[-1][0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            order, offset = "DESC", -index - 1
+        else:
+            order, offset = "ASC", index
+        row = self._knowledge.db.fetchone(
+            f"SELECT data FROM {self._table} ORDER BY seq {order} LIMIT 1 OFFSET ?", (offset,)
+        )
+        if row is None:
+            raise IndexError(index)
+        return self._factory(json.loads(row[0]))
+
+
 class OptimizationKnowledge:
     """
     Classe centrale de la base de connaissance d'optimisation
@@ -152,102 +307,221 @@ class OptimizationKnowledge:
     Centralise TOUT ce qu'on apprend pour optimiser continuellement
     """
 
-    def __init__(self):
-        # Historique complet
-        self.historical_requests: List[HistoricalRequest] = []
-
-        # Patterns de succès
-        self.success_patterns: Dict[str, SuccessPattern] = {}
+    def __init__(self, db_path: Optional[str] = None, candidates_per_token: Optional[int] = None):
+        """
+        Args:
+            db_path: Base SQLite (défaut: optimization.knowledge.db_path)
+            candidates_per_token: Occurrences récentes examinées par token
+                dans find_similar_requests
+        """
+        config = get_config()
+        if db_path is None:
+            db_path = config.get("optimization.knowledge.db_path", "cortex/data/optimization_knowledge.db")
+        self.db = get_sqlite_pool(db_path)
+        self._closed = False
+        self.candidates_per_token = candidates_per_token or \
+            config.get("optimization.knowledge.candidates_per_token", CANDIDATES_PER_TOKEN)
+        self._init_schema()
+
+        # Historique complet (vue sur la base)
+        self.historical_requests = _StoredRecords(
+            self, "optimization_requests", "total_requests", HistoricalRequest.from_dict
+        )
+
+        # Patterns de succès (peu nombreux: gardés en mémoire, écrits à l'ajout)
+        self.success_patterns: Dict[str, SuccessPattern] = {
+            pattern.id: pattern for pattern in (
+                SuccessPattern.from_dict(json.loads(data))
+                for data, in self.db.fetchall("SELECT data FROM optimization_patterns")
+            )
+        }
 
-        # Analyses d'échecs
-        self.failure_analyses: List[FailureAnalysis] = []
+        # Analyses d'échecs (vue sur la base)
+        self.failure_analyses = _StoredRecords(
+            self, "optimization_failures", "total_failures", FailureAnalysis.from_dict
+        )
 
         # Stats d'usage des outils
-        self.tool_stats: Dict[str, ToolUsageStats] = {}
+        self.tool_stats: Dict[str, ToolUsageStats] = {
+            row[0]: self._tool_stats_from_row(row)
+            for row in self.db.fetchall(
+                "SELECT tool_name, total_uses, success_uses, failure_uses, total_duration, "
+                "total_cost, data FROM optimization_tool_stats"
+            )
+        }
 
         # Git diff history
         self.git_diff_history: List[Dict[str, Any]] = []
 
-        # Métriques globales
-        self.global_metrics = {
-            "total_requests": 0,
-            "success_rate": 0.0,
-            "avg_cost": 0.0,
-            "avg_duration": 0.0,
-            "cost_savings": 0.0,  # Grâce aux optimisations
-            "time_savings": 0.0   # Grâce aux optimisations
+    def _init_schema(self):
+        # Base supprimée ou remplacée depuis l'ouverture du pool: nouvelles connexions.
+        # Schéma idempotent (IF NOT EXISTS): exécuté à chaque instance, pas de cache
+        # par chemin qui survivrait à la suppression du fichier
+        self.db.reopen_if_replaced()
+        with self.db.transaction() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    def _metric(self, column: str):
+        return self.db.fetchone(f"SELECT {column} FROM optimization_metrics WHERE id = 1")[0]
+
+    @property
+    def global_metrics(self) -> Dict[str, Any]:
+        """Métriques globales (depuis les agrégats, sans parcourir l'historique)"""
+        total, successes, total_cost, total_duration, cost_savings, time_savings = self.db.fetchone(
+            "SELECT total_requests, successful_requests, total_cost, total_duration, "
+            "cost_savings, time_savings FROM optimization_metrics WHERE id = 1"
+        )
+        return {
+            "total_requests": total,
+            "success_rate": successes / total if total else 0.0,
+            "avg_cost": total_cost / total if total else 0.0,
+            "avg_duration": total_duration / total if total else 0.0,
+            "cost_savings": cost_savings,  # Grâce aux optimisations
+            "time_savings": time_savings   # Grâce aux optimisations
         }
 
     def record_request(self, request: HistoricalRequest):
         """Enregistre une requête dans l'historique"""
-        self.historical_requests.append(request)
-        self._update_global_metrics()
+        self.record_requests([request])
+
+    def record_requests(self, requests: Iterable[HistoricalRequest]):
+        """Enregistre plusieurs requêtes en une transaction (import d'historique)"""
+        count = successes = 0
+        total_cost = total_duration = 0.0
+        with self.db.transaction() as conn:
+            for request in requests:
+                cursor = conn.execute(
+                    "INSERT INTO optimization_requests (id, timestamp, request_type, outcome, data) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (request.id, request.timestamp.isoformat(), request.request_type,
+                     request.outcome.value, json.dumps(request.to_dict()))
+                )
+                conn.executemany(
+                    "INSERT INTO optimization_request_tokens (token, seq) VALUES (?, ?)",
+                    [(token, cursor.lastrowid) for token in _tokens(request.request_text)]
+                )
+                count += 1
+                successes += request.outcome == RequestOutcome.SUCCESS
+                total_cost += request.cost
+                total_duration += request.duration_seconds
+            conn.execute(
+                "UPDATE optimization_metrics SET total_requests = total_requests + ?, "
+                "successful_requests = successful_requests + ?, total_cost = total_cost + ?, "
+                "total_duration = total_duration + ? WHERE id = 1",
+                (count, successes, total_cost, total_duration)
+            )
+
+    def get_requests_since(self, since: datetime) -> List[HistoricalRequest]:
+        """Requêtes enregistrées depuis une date (index sur timestamp)"""
+        return [
+            HistoricalRequest.from_dict(json.loads(data))
+            for data, in self.db.fetchall(
+                "SELECT data FROM optimization_requests WHERE timestamp >= ? ORDER BY seq",
+                (since.isoformat(),)
+            )
+        ]
 
     def add_success_pattern(self, pattern: SuccessPattern):
         """Ajoute un pattern de succès identifié"""
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO optimization_patterns (id, data) VALUES (?, ?)",
+                (pattern.id, json.dumps(pattern.to_dict()))
+            )
         self.success_patterns[pattern.id] = pattern
 
     def record_failure(self, failure: FailureAnalysis):
         """Enregistre une analyse d'échec"""
-        self.failure_analyses.append(failure)
-
-        # Vérifier si c'est une récurrence
-        similar_failures = [
-            f for f in self.failure_analyses
-            if f.error_type == failure.error_type and f.id != failure.id
-        ]
-        failure.recurrence_count = len(similar_failures)
+        with self.db.transaction() as conn:
+            # Vérifier si c'est une récurrence
+            row = conn.execute(
+                "SELECT occurrences FROM optimization_failure_types WHERE error_type = ?",
+                (failure.error_type,)
+            ).fetchone()
+            failure.recurrence_count = row[0] if row else 0
+
+            conn.execute(
+                "INSERT INTO optimization_failures (id, error_type, data) VALUES (?, ?, ?)",
+                (failure.id, failure.error_type, json.dumps(failure.to_dict()))
+            )
+            conn.execute(
+                "INSERT INTO optimization_failure_types (error_type, occurrences) VALUES (?, 1) "
+                "ON CONFLICT(error_type) DO UPDATE SET occurrences = occurrences + 1",
+                (failure.error_type,)
+            )
+            conn.execute("UPDATE optimization_metrics SET total_failures = total_failures + 1 WHERE id = 1")
 
     def update_tool_stats(self, tool_name: str, success: bool, duration: float, cost: float):
         """Met à jour stats d'usage d'un outil"""
-        if tool_name not in self.tool_stats:
-            self.tool_stats[tool_name] = ToolUsageStats(
-                tool_name=tool_name,
-                total_uses=0,
-                success_uses=0,
-                failure_uses=0,
-                avg_duration=0.0,
-                total_cost=0.0,
-                contexts_used_in=[],
-                common_errors=[],
-                optimization_suggestions=[],
-                last_optimized=None
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO optimization_tool_stats (tool_name) VALUES (?) "
+                "ON CONFLICT(tool_name) DO NOTHING",
+                (tool_name,)
             )
-
-        stats = self.tool_stats[tool_name]
-        stats.total_uses += 1
-
-        if success:
-            stats.success_uses += 1
-        else:
-            stats.failure_uses += 1
-
-        # Mise à jour moyenne durée
-        n = stats.total_uses
-        stats.avg_duration = ((stats.avg_duration * (n - 1)) + duration) / n
-
-        stats.total_cost += cost
+            conn.execute(
+                "UPDATE optimization_tool_stats SET total_uses = total_uses + 1, "
+                "success_uses = success_uses + ?, failure_uses = failure_uses + ?, "
+                "total_duration = total_duration + ?, total_cost = total_cost + ? WHERE tool_name = ?",
+                (int(success), int(not success), duration, cost, tool_name)
+            )
+            row = conn.execute(
+                "SELECT tool_name, total_uses, success_uses, failure_uses, total_duration, "
+                "total_cost, data FROM optimization_tool_stats WHERE tool_name = ?",
+                (tool_name,)
+            ).fetchone()
+        self.tool_stats[tool_name] = self._tool_stats_from_row(row)
+
+    @staticmethod
+    def _tool_stats_from_row(row) -> ToolUsageStats:
+        tool_name, total_uses, success_uses, failure_uses, total_duration, total_cost, data = row
+        extra = json.loads(data) if data else {}
+        last_optimized = extra.get("last_optimized")
+        return ToolUsageStats(
+            tool_name=tool_name,
+            total_uses=total_uses,
+            success_uses=success_uses,
+            failure_uses=failure_uses,
+            avg_duration=total_duration / total_uses if total_uses else 0.0,
+            total_cost=total_cost,
+            contexts_used_in=extra.get("contexts_used_in", []),
+            common_errors=extra.get("common_errors", []),
+            optimization_suggestions=extra.get("optimization_suggestions", []),
+            last_optimized=datetime.fromisoformat(last_optimized) if last_optimized else None
+        )
 
     def find_similar_requests(self, request_text: str, top_k: int = 5) -> List[HistoricalRequest]:
         """
         Trouve des requêtes similaires dans l'historique
 
+        Score: nombre de mots en commun (keyword matching), via l'index
+        inversé. Pour chaque mot, seules les candidates_per_token occurrences
+        les plus récentes sont examinées; à score égal, la plus récente gagne.
+
         TODO: Utiliser embeddings pour meilleure similarité
-        Pour l'instant: simple keyword matching
         """
-        keywords = set(request_text.lower().split())
-
-        scored_requests = []
-        for hist_req in self.historical_requests:
-            hist_keywords = set(hist_req.request_text.lower().split())
-            overlap = len(keywords.intersection(hist_keywords))
-            if overlap > 0:
-                scored_requests.append((overlap, hist_req))
-
-        # Trier par score descendant
-        scored_requests.sort(key=lambda x: x[0], reverse=True)
-
-        return [req for _, req in scored_requests[:top_k]]
+        tokens = sorted(_tokens(request_text))
+        if not tokens:
+            return []
+
+        # Occurrences récentes de chaque mot, comptées par requête dans SQLite
+        postings = " UNION ALL ".join(
+            ["SELECT * FROM (SELECT seq FROM optimization_request_tokens "
+             "WHERE token = ? ORDER BY seq DESC LIMIT ?)"] * len(tokens)
+        )
+        params: List[Any] = []
+        for token in tokens:
+            params += [token, self.candidates_per_token]
+
+        # Trier par score descendant, puis par récence
+        rows = self.db.fetchall(
+            f"SELECT r.data FROM (SELECT seq, COUNT(*) AS overlap FROM ({postings}) "
+            f"GROUP BY seq ORDER BY overlap DESC, seq DESC LIMIT ?) AS best "
+            f"JOIN optimization_requests r ON r.seq = best.seq ORDER BY best.overlap DESC, best.seq DESC",
+            params + [top_k]
+        )
+        return [HistoricalRequest.from_dict(json.loads(data)) for data, in rows]
 
     def get_best_pattern_for_context(self, context: str) -> Optional[SuccessPattern]:
         """
@@ -273,8 +547,11 @@ class OptimizationKnowledge:
     def get_common_failures_for_type(self, error_type: str) -> List[FailureAnalysis]:
         """Récupère les échecs communs d'un type"""
         return [
-            f for f in self.failure_analyses
-            if f.error_type == error_type
+            FailureAnalysis.from_dict(json.loads(data))
+            for data, in self.db.fetchall(
+                "SELECT data FROM optimization_failures WHERE error_type = ? ORDER BY seq",
+                (error_type,)
+            )
         ]
 
     def get_optimization_advice(self, request_text: str, request_type: str) -> Dict[str, Any]:
@@ -320,44 +597,40 @@ class OptimizationKnowledge:
             "avg_cost_similar": sum(r.cost for r in similar) / len(similar) if similar else 0.0
         }
 
-    def _update_global_metrics(self):
-        """Met à jour les métriques globales"""
-        if not self.historical_requests:
-            return
-
-        total = len(self.historical_requests)
-        successes = sum(1 for r in self.historical_requests if r.outcome == RequestOutcome.SUCCESS)
-
-        self.global_metrics["total_requests"] = total
-        self.global_metrics["success_rate"] = successes / total
-        self.global_metrics["avg_cost"] = sum(r.cost for r in self.historical_requests) / total
-        self.global_metrics["avg_duration"] = sum(r.duration_seconds for r in self.historical_requests) / total
-
     def get_metrics_summary(self) -> Dict[str, Any]:
         """Résumé des métriques globales"""
+        most_used = self.db.fetchone(
+            "SELECT tool_name FROM optimization_tool_stats ORDER BY total_uses DESC LIMIT 1"
+        )
         return {
             **self.global_metrics,
             "total_patterns": len(self.success_patterns),
-            "total_failures_analyzed": len(self.failure_analyses),
-            "tools_tracked": len(self.tool_stats),
-            "most_used_tool": max(
-                self.tool_stats.values(),
-                key=lambda t: t.total_uses
-            ).tool_name if self.tool_stats else None
+            "total_failures_analyzed": self._metric("total_failures"),
+            "tools_tracked": self.db.fetchone("SELECT COUNT(*) FROM optimization_tool_stats")[0],
+            "most_used_tool": most_used[0] if most_used else None
         }
 
+    def close(self):
+        """Rend le pool partagé (fermé seulement si plus aucun composant ne l'utilise)"""
+        if not self._closed:
+            self._closed = True
+            release_sqlite_pool(self.db)
+
 
 # Factory function
-def create_optimization_knowledge() -> OptimizationKnowledge:
+def create_optimization_knowledge(db_path: Optional[str] = None) -> OptimizationKnowledge:
     """Crée une base de connaissance d'optimisation"""
-    return OptimizationKnowledge()
+    return OptimizationKnowledge(db_path=db_path)
 
 
 # Test
 if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
     print("Testing Optimization Knowledge...")
 
-    knowledge = create_optimization_knowledge()
+    knowledge = create_optimization_knowledge(str(Path(tempfile.mkdtemp()) / "optimization_knowledge.db"))
 
     # Test 1: Enregistrer requête
     print("\n1. Recording historical request...")
@@ -103,6 +103,31 @@ class ChangeLogRepository:
             columns = [desc[0] for desc in cursor.description]
             return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
+    def get_changes_since(self, start_date: str, limit: int = 100,
+                          impact_levels: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Récupère les changements depuis une date (heure locale ISO), les plus récents d'abord
+
+        Filtre et limite exécutés par SQLite (index sur timestamp); les
+        timestamps du change_log sont en UTC (CURRENT_TIMESTAMP).
+        """
+        query = """
+            SELECT id, change_type, entity_type, entity_id, author, description,
+                   impact_level, timestamp
+            FROM change_log
+            WHERE timestamp >= datetime(?, 'utc')
+        """
+        params: List[Any] = [start_date]
+        if impact_levels:
+            query += f" AND impact_level IN ({', '.join('?' * len(impact_levels))})"
+            params.extend(impact_levels)
+        query += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(limit)
+        with self.db.get_connection() as conn:
+            cursor = conn.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
     def get_change_statistics(self) -> Dict[str, Any]:
         """Récupère les statistiques du change log"""
         with self.db.get_connection() as conn:
@@ -17,6 +17,13 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from cortex.repositories.changelog_repository import get_changelog_repository
 
+IMPACT_LEVELS = {
+    'low': 1,
+    'medium': 2,
+    'high': 3,
+    'critical': 4
+}
+
 
 class LogFilterService:
     """Service de filtrage intelligent des logs"""
@@ -47,19 +54,19 @@ class LogFilterService:
         Returns:
             Liste de logs filtrés et triés par pertinence
         """
-        # Étape 1: Filtrer par time_period
+        # Étape 1: Filtrer par time_period (période, impact et limite exécutés par SQLite)
         if time_period == 'recent':
             # Dernière heure
             start_date = (datetime.now() - timedelta(hours=1)).isoformat()
-            logs = self._get_logs_since(start_date, limit=limit*2)
+            logs = self._get_logs_since(start_date, limit=limit*2, min_impact=min_impact)
         elif time_period == 'today':
             # Aujourd'hui
             start_date = datetime.now().replace(hour=0, minute=0, second=0).isoformat()
-            logs = self._get_logs_since(start_date, limit=limit*2)
+            logs = self._get_logs_since(start_date, limit=limit*2, min_impact=min_impact)
         elif time_period == 'week':
             # Dernière semaine
             start_date = (datetime.now() - timedelta(days=7)).isoformat()
-            logs = self._get_logs_since(start_date, limit=limit*2)
+            logs = self._get_logs_since(start_date, limit=limit*2, min_impact=min_impact)
         else:
             # Tous les logs récents
             logs = self.changelog_repo.get_recent_changes(limit=limit*2, min_impact=None)
@@ -187,25 +194,22 @@ class LogFilterService:
 
         return logs
 
-    def _get_logs_since(self, start_date: str, limit: int = 100) -> List[Dict[str, Any]]:
-        """Récupère les logs depuis une date"""
-        end_date = datetime.now().isoformat()
-        return self.changelog_repo.get_changes_by_date_range(start_date, end_date)
+    def _get_logs_since(self, start_date: str, limit: int = 100,
+                        min_impact: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Récupère les logs depuis une date (les plus récents, au plus limit)"""
+        impact_levels = None
+        if min_impact and IMPACT_LEVELS.get(min_impact, 1) > 1:
+            min_level = IMPACT_LEVELS[min_impact]
+            impact_levels = [name for name, level in IMPACT_LEVELS.items() if level >= min_level]
+        return self.changelog_repo.get_changes_since(start_date, limit=limit, impact_levels=impact_levels)
 
     def _filter_by_impact(self, logs: List[Dict], min_impact: str) -> List[Dict]:
         """Filtre les logs par niveau d'impact minimum"""
-        impact_levels = {
-            'low': 1,
-            'medium': 2,
-            'high': 3,
-            'critical': 4
-        }
-
-        min_level = impact_levels.get(min_impact, 1)
+        min_level = IMPACT_LEVELS.get(min_impact, 1)
 
         return [
             log for log in logs
-            if impact_levels.get(log.get('impact_level', 'low'), 1) >= min_level
+            if IMPACT_LEVELS.get(log.get('impact_level', 'low'), 1) >= min_level
         ]
 
     def _filter_by_context(self, logs: List[Dict], context: Dict[str, Any]) -> List[Dict]:
@@ -32,7 +32,8 @@ from cortex.tools.standard_tool import tool
         "required": ["file_path", "content"]
     },
     category="filesystem",
-    tags=["file", "write", "create"]
+    tags=["file", "write", "create"],
+    exclusive=True
 )
 def create_file(file_path: str, content: str, overwrite: bool = False) -> Dict[str, Any]:
     """
@@ -101,7 +102,8 @@ def create_file(file_path: str, content: str, overwrite: bool = False) -> Dict[s
         "required": ["file_path"]
     },
     category="filesystem",
-    tags=["file", "read"]
+    tags=["file", "read"],
+    read_only=True
 )
 def read_file(file_path: str, max_lines: Optional[int] = None) -> Dict[str, Any]:
     """
@@ -174,7 +176,8 @@ def read_file(file_path: str, max_lines: Optional[int] = None) -> Dict[str, Any]
         "required": ["file_path", "content"]
     },
     category="filesystem",
-    tags=["file", "write", "append"]
+    tags=["file", "write", "append"],
+    exclusive=True
 )
 def append_to_file(file_path: str, content: str) -> Dict[str, Any]:
     """
@@ -239,7 +242,8 @@ def append_to_file(file_path: str, content: str) -> Dict[str, Any]:
         "required": []
     },
     category="filesystem",
-    tags=["file", "directory", "list"]
+    tags=["file", "directory", "list"],
+    read_only=True
 )
 def list_directory(directory: str = ".", recursive: bool = False, pattern: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -320,7 +324,8 @@ def list_directory(directory: str = ".", recursive: bool = False, pattern: Optio
         "required": ["path"]
     },
     category="filesystem",
-    tags=["file", "check"]
+    tags=["file", "check"],
+    read_only=True
 )
 def file_exists(path: str) -> Dict[str, Any]:
     """
@@ -376,7 +381,8 @@ def file_exists(path: str) -> Dict[str, Any]:
         "required": ["path"]
     },
     category="filesystem",
-    tags=["file", "delete", "remove"]
+    tags=["file", "delete", "remove"],
+    exclusive=True
 )
 def delete_file(path: str, recursive: bool = False) -> Dict[str, Any]:
     """
@@ -462,7 +468,8 @@ def delete_file(path: str, recursive: bool = False) -> Dict[str, Any]:
         "required": []
     },
     category="system",
-    tags=["roadmap", "architecture", "structure", "show", "display"]
+    tags=["roadmap", "architecture", "structure", "show", "display"],
+    read_only=True
 )
 def show_roadmap() -> Dict[str, Any]:
     """
@@ -273,7 +273,8 @@ def get_all_forbes_tools() -> List[StandardTool]:
                 "required": []
             },
             function=lambda n=10: get_top_billionaires(n),
-            category="data"
+            category="data",
+            read_only=True
         ),
         StandardTool(
             name="forbes_get_billionaire_rank",
@@ -289,7 +290,8 @@ def get_all_forbes_tools() -> List[StandardTool]:
                 "required": ["rank"]
             },
             function=get_billionaire_by_rank,
-            category="data"
+            category="data",
+            read_only=True
         ),
         StandardTool(
             name="forbes_search_billionaire",
@@ -310,6 +312,7 @@ def get_all_forbes_tools() -> List[StandardTool]:
                 "required": ["name"]
             },
             function=lambda name, max_results=10: search_billionaire(name, max_results),
-            category="data"
+            category="data",
+            read_only=True
         )
     ]
@@ -27,7 +27,8 @@ from cortex.tools.standard_tool import tool
         "required": []
     },
     category="git",
-    tags=["git", "status", "version-control"]
+    tags=["git", "status", "version-control"],
+    read_only=True
 )
 def git_status(directory: str = ".") -> Dict[str, Any]:
     """Get git status"""
@@ -73,7 +74,8 @@ def git_status(directory: str = ".") -> Dict[str, Any]:
         "required": ["files"]
     },
     category="git",
-    tags=["git", "add", "stage"]
+    tags=["git", "add", "stage"],
+    exclusive=True
 )
 def git_add(files: str, directory: str = ".") -> Dict[str, Any]:
     """Add files to staging area"""
@@ -121,7 +123,8 @@ def git_add(files: str, directory: str = ".") -> Dict[str, Any]:
         "required": ["message"]
     },
     category="git",
-    tags=["git", "commit", "save"]
+    tags=["git", "commit", "save"],
+    exclusive=True
 )
 def git_commit(message: str, directory: str = ".") -> Dict[str, Any]:
     """Create a git commit"""
@@ -173,7 +176,8 @@ def git_commit(message: str, directory: str = ".") -> Dict[str, Any]:
         "required": []
     },
     category="git",
-    tags=["git", "push", "remote", "sync"]
+    tags=["git", "push", "remote", "sync"],
+    exclusive=True
 )
 def git_push(remote: str = "origin", branch: Optional[str] = None, directory: str = ".") -> Dict[str, Any]:
     """Push commits to remote"""
@@ -229,7 +233,8 @@ def git_push(remote: str = "origin", branch: Optional[str] = None, directory: st
         "required": []
     },
     category="git",
-    tags=["git", "pull", "remote", "sync"]
+    tags=["git", "pull", "remote", "sync"],
+    exclusive=True
 )
 def git_pull(remote: str = "origin", branch: Optional[str] = None, directory: str = ".") -> Dict[str, Any]:
     """Pull changes from remote"""
@@ -281,7 +286,8 @@ def git_pull(remote: str = "origin", branch: Optional[str] = None, directory: st
         "required": []
     },
     category="git",
-    tags=["git", "log", "history"]
+    tags=["git", "log", "history"],
+    read_only=True
 )
 def git_log(max_count: int = 10, directory: str = ".") -> Dict[str, Any]:
     """Show git commit log"""
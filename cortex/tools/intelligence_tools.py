@@ -279,7 +279,8 @@ def get_all_intelligence_tools() -> List[StandardTool]:
                 "required": ["url", "xpath"]
             },
             function=scrape_xpath,
-            category="intelligence"
+            category="intelligence",
+            read_only=True
         ),
         StandardTool(
             name="validate_xpath",
@@ -299,7 +300,8 @@ def get_all_intelligence_tools() -> List[StandardTool]:
                 "required": ["url", "xpath"]
             },
             function=validate_xpath,
-            category="intelligence"
+            category="intelligence",
+            read_only=True
         ),
         StandardTool(
             name="add_web_source",
@@ -30,7 +30,8 @@ from cortex.tools.standard_tool import tool
         "required": ["package"]
     },
     category="python",
-    tags=["pip", "install", "package", "dependency"]
+    tags=["pip", "install", "package", "dependency"],
+    exclusive=True
 )
 def pip_install(package: str, upgrade: bool = False) -> Dict[str, Any]:
     """Install a Python package"""
@@ -86,7 +87,8 @@ def pip_install(package: str, upgrade: bool = False) -> Dict[str, Any]:
         "required": ["package"]
     },
     category="python",
-    tags=["pip", "uninstall", "remove", "package"]
+    tags=["pip", "uninstall", "remove", "package"],
+    exclusive=True
 )
 def pip_uninstall(package: str) -> Dict[str, Any]:
     """Uninstall a Python package"""
@@ -129,7 +131,8 @@ def pip_uninstall(package: str) -> Dict[str, Any]:
         "required": []
     },
     category="python",
-    tags=["pip", "list", "packages", "installed"]
+    tags=["pip", "list", "packages", "installed"],
+    read_only=True
 )
 def pip_list(outdated: bool = False) -> Dict[str, Any]:
     """List installed packages"""
@@ -176,7 +179,8 @@ def pip_list(outdated: bool = False) -> Dict[str, Any]:
         "required": ["package"]
     },
     category="python",
-    tags=["pip", "show", "info", "package"]
+    tags=["pip", "show", "info", "package"],
+    read_only=True
 )
 def pip_show(package: str) -> Dict[str, Any]:
     """Show package information"""
@@ -214,7 +218,8 @@ def pip_show(package: str) -> Dict[str, Any]:
         "required": []
     },
     category="python",
-    tags=["pip", "freeze", "requirements", "export"]
+    tags=["pip", "freeze", "requirements", "export"],
+    read_only=True
 )
 def pip_freeze() -> Dict[str, Any]:
     """Export installed packages in requirements format"""
@@ -19,6 +19,14 @@ class StandardTool:
     - Anthropic Tool Use
     - LangChain Tools
     - Tout LLM supportant JSON Schema
+
+    Métadonnées d'exécution (utilisées par ToolExecutor):
+    - read_only: sans effet de bord, peut s'exécuter en parallèle
+    - ordered: un seul à la fois dans l'ordre des appels, en parallèle des read_only
+    - exclusive: s'exécute seul, après les appels précédents et avant les suivants
+      (mode des tools qui ne déclarent rien)
+    - timeout: durée max en secondes des tools read_only (None = défaut de
+      l'exécuteur); les autres sont toujours attendus jusqu'au bout
     """
 
     name: str
@@ -27,11 +35,20 @@ class StandardTool:
     function: Callable
     category: str = "general"
     tags: List[str] = None
+    read_only: bool = False
+    ordered: bool = False
+    exclusive: bool = False
+    timeout: Optional[float] = None
 
     def __post_init__(self):
         if self.tags is None:
             self.tags = []
 
+    @property
+    def runs_alone(self) -> bool:
+        """Exclusif, déclaré ou par défaut (ni read_only ni ordered)"""
+        return self.exclusive or not (self.read_only or self.ordered)
+
     def to_openai_format(self) -> Dict[str, Any]:
         """
         Format OpenAI Function Calling
@@ -151,7 +168,11 @@ def tool(
     description: str,
     parameters: Optional[Dict[str, Any]] = None,
     category: str = "general",
-    tags: Optional[List[str]] = None
+    tags: Optional[List[str]] = None,
+    read_only: bool = False,
+    ordered: bool = False,
+    exclusive: bool = False,
+    timeout: Optional[float] = None
 ):
     """
     Décorateur pour créer facilement des tools standards
@@ -184,7 +205,11 @@ def tool(
             parameters=params,
             function=func,
             category=category,
-            tags=tags or []
+            tags=tags or [],
+            read_only=read_only,
+            ordered=ordered,
+            exclusive=exclusive,
+            timeout=timeout
         )
 
     return decorator
@@ -6,15 +6,20 @@ Provides comprehensive tools for Cortex to manage its own tasks:
 - Subtask management
 - Analytics and insights
 - ML training data collection
+
+AsyncTaskManager exposes the same operations to asyncio callers.
 """
 
+import asyncio
 import json
-import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 
+from cortex.core.sqlite_pool import get_sqlite_pool
+
 
 @dataclass
 class TaskMetrics:
@@ -54,6 +59,9 @@ class TaskManager:
         if not self.db_path.exists():
             raise FileNotFoundError(f"TodoDB not found: {db_path}")
 
+        # Connexions WAL partagées (une par thread, requêtes préparées réutilisées)
+        self.db = get_sqlite_pool(str(self.db_path))
+
     def create_task(
         self,
         description: str,
@@ -82,7 +90,7 @@ class TaskManager:
             Dict with task_id and success status
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.transaction() as conn:
                 cursor = conn.cursor()
                 now = datetime.now().isoformat()
 
@@ -107,7 +115,6 @@ class TaskManager:
                 ))
 
                 task_id = cursor.lastrowid
-                conn.commit()
 
                 return {
                     'success': True,
@@ -141,7 +148,7 @@ class TaskManager:
             Dict with subtask_id and success status
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.transaction() as conn:
                 cursor = conn.cursor()
 
                 # Get parent task info
@@ -188,7 +195,6 @@ class TaskManager:
                     VALUES (?, ?, 'subtask')
                 """, (parent_task_id, subtask_id))
 
-                conn.commit()
 
                 return {
                     'success': True,
@@ -213,7 +219,7 @@ class TaskManager:
             Dict with task details
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.snapshot() as conn:
                 cursor = conn.cursor()
 
                 cursor.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
@@ -272,7 +278,7 @@ class TaskManager:
             Dict with success status
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.transaction() as conn:
                 cursor = conn.cursor()
                 now = datetime.now().isoformat()
 
@@ -312,7 +318,6 @@ class TaskManager:
 
                 query = f"UPDATE tasks SET {', '.join(updates)} WHERE id = ?"
                 cursor.execute(query, values)
-                conn.commit()
 
                 return {
                     'success': True,
@@ -337,7 +342,7 @@ class TaskManager:
             Dict with success status
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.transaction() as conn:
                 cursor = conn.cursor()
 
                 # Soft delete by updating status and adding reason to context
@@ -351,7 +356,6 @@ class TaskManager:
                     WHERE id = ?
                 """, (now, reason or "No reason provided", now, task_id))
 
-                conn.commit()
 
                 return {
                     'success': True,
@@ -388,7 +392,7 @@ class TaskManager:
             Dict with task list
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.snapshot() as conn:
                 cursor = conn.cursor()
 
                 query = "SELECT * FROM tasks WHERE 1=1"
@@ -458,7 +462,7 @@ class TaskManager:
             Dict with next task or None
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.snapshot() as conn:
                 cursor = conn.cursor()
 
                 query = """
@@ -519,7 +523,7 @@ class TaskManager:
             Dict with success status
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.transaction() as conn:
                 cursor = conn.cursor()
                 now = datetime.now().isoformat()
 
@@ -564,7 +568,6 @@ class TaskManager:
                         WHERE id = ?
                     """, (now, now, success_score, task_id))
 
-                conn.commit()
 
                 return {
                     'success': True,
@@ -597,7 +600,7 @@ class TaskManager:
             Dict with statistics
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.snapshot() as conn:
                 cursor = conn.cursor()
 
                 # Default to last 7 days
@@ -661,7 +664,7 @@ class TaskManager:
             Dict with task tree
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.snapshot() as conn:
                 cursor = conn.cursor()
 
                 # Get root task
@@ -703,8 +706,67 @@ class TaskManager:
             }
 
 
-# Create global instance
-task_manager = TaskManager()
+class AsyncTaskManager:
+    """
+    Async variant of TaskManager for event-loop callers
+
+    Each call runs on a bounded thread pool; every worker thread keeps its
+    own pooled WAL connection, so concurrent reads proceed in parallel
+    while writes are serialized by SQLite.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "cortex/data/todo_pool.db",
+        max_workers: int = 8,
+        task_manager: Optional[TaskManager] = None
+    ):
+        """
+        Args:
+            db_path: Path to TodoDB database
+            max_workers: Max concurrent database calls
+            task_manager: Existing TaskManager to wrap (optional)
+        """
+        self.sync = task_manager or TaskManager(db_path)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task-db")
+
+    async def _run(self, method, *args, **kwargs) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: method(*args, **kwargs))
+
+    async def create_task(self, description: str, **kwargs) -> Dict[str, Any]:
+        return await self._run(self.sync.create_task, description, **kwargs)
+
+    async def create_subtask(self, parent_task_id: int, description: str, **kwargs) -> Dict[str, Any]:
+        return await self._run(self.sync.create_subtask, parent_task_id, description, **kwargs)
+
+    async def read_task(self, task_id: int) -> Dict[str, Any]:
+        return await self._run(self.sync.read_task, task_id)
+
+    async def update_task(self, task_id: int, **kwargs) -> Dict[str, Any]:
+        return await self._run(self.sync.update_task, task_id, **kwargs)
+
+    async def delete_task(self, task_id: int, reason: str = None) -> Dict[str, Any]:
+        return await self._run(self.sync.delete_task, task_id, reason)
+
+    async def list_tasks(self, **kwargs) -> Dict[str, Any]:
+        return await self._run(self.sync.list_tasks, **kwargs)
+
+    async def get_next_task(self, tier_filter: str = None) -> Dict[str, Any]:
+        return await self._run(self.sync.get_next_task, tier_filter)
+
+    async def mark_task_complete(self, task_id: int, **kwargs) -> Dict[str, Any]:
+        return await self._run(self.sync.mark_task_complete, task_id, **kwargs)
+
+    async def get_task_stats(self, **kwargs) -> Dict[str, Any]:
+        return await self._run(self.sync.get_task_stats, **kwargs)
+
+    async def get_task_tree(self, task_id: int) -> Dict[str, Any]:
+        return await self._run(self.sync.get_task_tree, task_id)
+
+    def close(self):
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=True)
 
 
 # Test
@@ -712,6 +774,8 @@ if __name__ == "__main__":
     print("Testing Task Management Tools...")
     print()
 
+    task_manager = TaskManager()
+
     # Create task
     print("1. Creating task...")
     result = task_manager.create_task(
@@ -1,11 +1,30 @@
 """
 Tool Executor - Exécute automatiquement les tools demandés par le LLM
+
+Les tool calls d'un même tour LLM s'exécutent en parallèle selon les
+métadonnées de StandardTool:
+- read_only: en parallèle dans le pool de threads, avec timeout
+- ordered: un seul à la fois, dans l'ordre des appels (en parallèle des read_only)
+- exclusive, ou aucun mode déclaré: seul, une fois les appels précédents terminés
+Un thread Python ne s'interrompt pas: seuls les tools read_only ont un
+timeout (leur thread abandonné n'a pas d'effet de bord), compté à partir
+de leur démarrage effectif et non de leur mise en file. Les tools ordered
+et exclusive sont attendus jusqu'au bout, sinon un git_push ou un
+pip_install abandonné chevaucherait les appels suivants.
+Les résultats sont toujours renvoyés dans l'ordre des appels.
 """
 
-from typing import List, Dict, Any, Optional
+import atexit
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Any, Optional, Callable
 from dataclasses import dataclass
 
 from cortex.tools.standard_tool import StandardTool
+from cortex.core.config_loader import get_config
 from cortex.core.llm_client import LLMClient, LLMResponse, ModelTier, ToolCall
 
 
@@ -17,6 +36,103 @@ class ExecutionResult:
     success: bool
     result: Any
     error: Optional[str] = None
+    duration: float = 0.0
+
+
+class ToolPool:
+    """
+    Pool de threads démons pour les tools read_only
+
+    Même contrat que ThreadPoolExecutor (submit, shutdown), mais un tool
+    abandonné après son timeout ne bloque pas la sortie de l'interpréteur:
+    ThreadPoolExecutor attend ses threads avant même les hooks atexit.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = "tool"):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._threads: List[threading.Thread] = []
+        self._idle = threading.Semaphore(0)
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self, fn: Callable, *args) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new calls after shutdown")
+            self._queue.put((future, fn, args))
+            if not self._idle.acquire(blocking=False) and len(self._threads) < self.max_workers:
+                thread = threading.Thread(
+                    target=self._work, daemon=True,
+                    name=f"{self.thread_name_prefix}_{len(self._threads)}"
+                )
+                thread.start()
+                self._threads.append(thread)
+        return future
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args = item
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+            self._idle.release()
+
+    def shutdown(self, cancel_futures: bool = False):
+        """Arrête les threads une fois la file vidée (appels en file annulés si demandé)"""
+        with self._lock:
+            self._shutdown = True
+            if cancel_futures:
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not None:
+                        item[0].cancel()
+            for _ in self._threads:
+                self._queue.put(None)
+
+
+class _PooledCall:
+    """Tool call soumis au pool: son timeout court depuis son démarrage"""
+
+    def __init__(self, pool: ToolPool, fn: Callable, *args):
+        self.started = threading.Event()
+        self.started_at = 0.0
+        self.future = pool.submit(self._run, fn, *args)
+
+    def _run(self, fn: Callable, *args):
+        self.started_at = time.perf_counter()
+        self.started.set()
+        return fn(*args)
+
+    def result(self, timeout: float):
+        # Attente en file hors budget: seul le temps d'exécution est borné
+        while not self.started.wait(0.05):
+            if self.future.done():
+                return self.future.result()
+        remaining = timeout - (time.perf_counter() - self.started_at)
+        return self.future.result(timeout=max(0.0, remaining))
+
+
+# Exécuteurs vivants, fermés à la sortie (appels en file annulés)
+_live_executors: "weakref.WeakSet[ToolExecutor]" = weakref.WeakSet()
+
+
+def _close_all():
+    for executor in list(_live_executors):
+        executor.close()
+
+
+atexit.register(_close_all)
 
 
 class ToolExecutor:
@@ -30,10 +146,27 @@ class ToolExecutor:
     4. Répéter jusqu'à réponse finale
     """
 
-    def __init__(self, llm_client: Optional[LLMClient] = None):
+    def __init__(
+        self,
+        llm_client: Optional[LLMClient] = None,
+        max_parallel: Optional[int] = None,
+        default_timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            llm_client: Client LLM
+            max_parallel: Tool calls simultanés max (1 = exécution série)
+            default_timeout: Durée max d'un tool sans timeout propre (secondes)
+        """
+        config = get_config()
         self.llm_client = llm_client or LLMClient()
         self.tools: Dict[str, StandardTool] = {}
         self.max_iterations = 10  # Protection contre boucles infinies
+        self.max_parallel = max_parallel or config.get("tools.execution.max_parallel", 8)
+        self.default_timeout = default_timeout or config.get("tools.execution.default_timeout", 120)
+        self._pool: Optional[ToolPool] = None
+        self._pool_lock = threading.Lock()  # Exécuteur partagé par les tentatives en course
+        _live_executors.add(self)
 
     def register_tool(self, tool: StandardTool):
         """Enregistre un tool disponible"""
@@ -51,7 +184,10 @@ class ToolExecutor:
         max_tokens: Optional[int] = None,
         temperature: float = 1.0,
         tools: Optional[List[StandardTool]] = None,
-        verbose: bool = False
+        verbose: bool = False,
+        on_text: Optional[Callable[[str], None]] = None,
+        checkpoint: Optional[Callable[[], None]] = None,
+        on_tool_turn: Optional[Callable[[List[ToolCall]], None]] = None
     ) -> LLMResponse:
         """
         Exécute une requête avec support automatique des tools
@@ -63,6 +199,14 @@ class ToolExecutor:
             temperature: Température
             tools: Tools à utiliser (si None, utilise tous les tools enregistrés)
             verbose: Afficher les étapes intermédiaires
+            on_text: Si fourni, les appels LLM sont streamés et chaque fragment
+                de texte est passé à ce callback dès sa réception
+            checkpoint: Appelé avant chaque appel LLM et chaque exécution de
+                tools; peut lever une exception pour interrompre la boucle
+            on_tool_turn: Appelé avec les tool calls quand un tour se termine
+                par des tools: le texte déjà passé à on_text pour ce tour
+                (préambule) n'est pas la réponse finale, qui ne viendra qu'au
+                dernier tour
 
         Returns:
             Réponse finale du LLM
@@ -72,11 +216,12 @@ class ToolExecutor:
 
         if not available_tools:
             # Pas de tools, appel direct
-            return self.llm_client.complete(
+            return self._call_llm(
                 messages=messages,
                 tier=tier,
                 max_tokens=max_tokens,
-                temperature=temperature
+                temperature=temperature,
+                on_text=on_text
             )
 
         # Conversation avec tools
@@ -85,6 +230,8 @@ class ToolExecutor:
 
         while iteration < self.max_iterations:
             iteration += 1
+            if checkpoint:
+                checkpoint()
 
             if verbose:
                 if iteration == 1:
@@ -93,12 +240,13 @@ class ToolExecutor:
                     print(f"  🤖 Iteration {iteration}: Generating final response from tool results...")
 
             # Appeler le LLM avec les tools
-            response = self.llm_client.complete(
+            response = self._call_llm(
                 messages=conversation_messages,
                 tier=tier,
                 max_tokens=max_tokens,
                 temperature=temperature,
-                tools=available_tools
+                tools=available_tools,
+                on_text=on_text
             )
 
             # Si pas de tool calls, c'est la réponse finale
@@ -107,14 +255,16 @@ class ToolExecutor:
                     print(f"  ✅ Completed: Final response ready")
                 return response
 
+            if on_tool_turn:
+                on_tool_turn(response.tool_calls)
+
             # Exécuter les tools demandés
+            if checkpoint:
+                checkpoint()
             if verbose:
                 print(f"  🔧 Executing {len(response.tool_calls)} tool(s)...")
 
-            tool_results = []
-            for tool_call in response.tool_calls:
-                result = self._execute_tool_call(tool_call, verbose)
-                tool_results.append(result)
+            tool_results = self.execute_tool_calls(response.tool_calls, verbose)
 
             # Ajouter les résultats à la conversation
             # Format différent selon le provider
@@ -183,8 +333,167 @@ class ToolExecutor:
         # Si on arrive ici, on a dépassé max_iterations
         raise RuntimeError(f"Max iterations ({self.max_iterations}) reached")
 
+    def _call_llm(
+        self,
+        messages: List[Dict[str, Any]],
+        tier: ModelTier,
+        max_tokens: Optional[int],
+        temperature: float,
+        tools: Optional[List[StandardTool]] = None,
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> LLMResponse:
+        """Appel LLM bloquant, ou streamé si un callback de texte est fourni"""
+        if on_text is None:
+            return self.llm_client.complete(
+                messages=messages,
+                tier=tier,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                tools=tools
+            )
+
+        response = None
+        for delta in self.llm_client.stream(
+            messages=messages,
+            tier=tier,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            tools=tools
+        ):
+            if delta.type == "text" and delta.text:
+                on_text(delta.text)
+            elif delta.type == "done":
+                response = delta.response
+
+        return response
+
+    def execute_tool_calls(self, tool_calls: List[ToolCall], verbose: bool = False) -> List[ExecutionResult]:
+        """
+        Exécute les tool calls d'un tour, en parallèle quand c'est sûr
+
+        Les appels sont découpés en segments par les tools exclusifs (ou sans
+        mode déclaré). Dans un segment, les tools read_only partent dans le
+        pool et les tools ordered s'exécutent un par un dans l'ordre; un
+        segment se termine avant que le suivant commence. La latence d'un tour tend vers celle du tool
+        le plus lent au lieu de la somme.
+
+        Returns:
+            Un ExecutionResult par appel, dans l'ordre des appels
+        """
+        if self.max_parallel <= 1 or len(tool_calls) <= 1:
+            return [self._run_with_timeout(None, tc, verbose) for tc in tool_calls]
+
+        results: List[Optional[ExecutionResult]] = [None] * len(tool_calls)
+        segment: List[int] = []
+
+        for index, tool_call in enumerate(tool_calls):
+            tool = self.tools.get(tool_call.name)
+            if tool is not None and tool.runs_alone:
+                self._run_segment(tool_calls, segment, results, verbose)
+                segment = []
+                results[index] = self._execute_tool_call(tool_call, verbose)
+            else:
+                segment.append(index)
+        self._run_segment(tool_calls, segment, results, verbose)
+
+        return results
+
+    def _run_segment(
+        self,
+        tool_calls: List[ToolCall],
+        indexes: List[int],
+        results: List[Optional[ExecutionResult]],
+        verbose: bool
+    ):
+        """Read_only en parallèle, tools ordered en série dans l'ordre (en parallèle des read_only)"""
+        if not indexes:
+            return
+
+        pool = self._get_pool()
+        calls = {}
+        ordered = []
+        for index in indexes:
+            tool = self.tools.get(tool_calls[index].name)
+            if tool is None or tool.read_only:
+                calls[index] = _PooledCall(pool, self._execute_tool_call, tool_calls[index], verbose)
+            else:
+                ordered.append(index)
+
+        for index in ordered:
+            results[index] = self._execute_tool_call(tool_calls[index], verbose)
+
+        for index, call in calls.items():
+            timeout = self._timeout_for(tool_calls[index])
+            try:
+                results[index] = call.result(timeout)
+            except FutureTimeoutError:
+                results[index] = self._timeout_result(tool_calls[index], timeout)
+
+    def _run_with_timeout(
+        self,
+        pool: Optional[ToolPool],
+        tool_call: ToolCall,
+        verbose: bool
+    ) -> ExecutionResult:
+        """
+        Exécute un tool call seul
+
+        Read_only: le thread appelant attend au plus son timeout. Les autres
+        s'exécutent dans le thread appelant, jusqu'au bout.
+        """
+        tool = self.tools.get(tool_call.name)
+        if tool is not None and not tool.read_only:
+            return self._execute_tool_call(tool_call, verbose)
+        if pool is None:
+            pool = self._get_pool()
+        timeout = self._timeout_for(tool_call)
+        call = _PooledCall(pool, self._execute_tool_call, tool_call, verbose)
+        try:
+            return call.result(timeout)
+        except FutureTimeoutError:
+            return self._timeout_result(tool_call, timeout)
+
+    def _timeout_for(self, tool_call: ToolCall) -> float:
+        tool = self.tools.get(tool_call.name)
+        if tool is not None and tool.timeout:
+            return tool.timeout
+        return self.default_timeout
+
+    def _timeout_result(self, tool_call: ToolCall, timeout: float) -> ExecutionResult:
+        # Un thread Python ne s'interrompt pas: le tool finit en arrière-plan, son résultat est ignoré
+        error_msg = f"Timeout after {timeout:.0f}s"
+        print(f"    ❌ TIMEOUT: {tool_call.name} ({error_msg})")
+        return ExecutionResult(
+            tool_name=tool_call.name,
+            tool_call_id=tool_call.id,
+            success=False,
+            result=None,
+            error=error_msg,
+            duration=timeout
+        )
+
+    def _get_pool(self) -> ToolPool:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ToolPool(max_workers=self.max_parallel, thread_name_prefix="tool")
+            return self._pool
+
+    def close(self):
+        """Libère le pool (appels en file annulés, tools en cours finis en arrière-plan)"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
     def _execute_tool_call(self, tool_call: ToolCall, verbose: bool = False) -> ExecutionResult:
-        """Exécute un tool call"""
+        """Exécute un tool call et mesure sa durée"""
+        started = time.perf_counter()
+        result = self._invoke_tool(tool_call, verbose)
+        result.duration = time.perf_counter() - started
+        return result
+
+    def _invoke_tool(self, tool_call: ToolCall, verbose: bool = False) -> ExecutionResult:
+        """Valide et exécute un tool call"""
         tool_name = tool_call.name
 
         print(f"  🔧 Executing tool: {tool_name}")
@@ -25,7 +25,8 @@ from cortex.tools.standard_tool import tool
         "required": ["query"]
     },
     category="web",
-    tags=["search", "web", "real-time"]
+    tags=["search", "web", "real-time"],
+    read_only=True
 )
 def web_search(query: str, max_results: int = 5) -> Dict[str, Any]:
     """
@@ -118,7 +119,8 @@ def web_search(query: str, max_results: int = 5) -> Dict[str, Any]:
         "required": ["url"]
     },
     category="web",
-    tags=["fetch", "web", "content"]
+    tags=["fetch", "web", "content"],
+    read_only=True
 )
 def web_fetch(url: str, max_length: int = 5000) -> Dict[str, Any]:
     """
@@ -187,7 +189,8 @@ def web_fetch(url: str, max_length: int = 5000) -> Dict[str, Any]:
         "required": ["city"]
     },
     category="weather",
-    tags=["weather", "real-time", "temperature"]
+    tags=["weather", "real-time", "temperature"],
+    read_only=True
 )
 def get_weather(city: str, format: str = "short") -> Dict[str, Any]:
     """
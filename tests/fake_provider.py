@@ -0,0 +1,529 @@
+"""
+Fake LLM provider - serveur HTTP local compatible OpenAI/DeepSeek et Anthropic
+
+Permet de tester le streaming et les appels concurrents sans clé API:
+- POST /chat/completions (ou /v1/chat/completions): format OpenAI, stream ou non
+- POST /v1/messages: format Anthropic, stream (SSE) ou non
+- Batch API OpenAI (/v1/files, /v1/batches) et Anthropic (/v1/messages/batches):
+  les batches se terminent batch_delay secondes après leur création
+
+Usage:
+    with FakeProvider(text="Hello world", tool_calls=[...]) as provider:
+        client = OpenAI(api_key="test", base_url=provider.openai_url)
+        client_anthropic = Anthropic(api_key="test", base_url=provider.anthropic_url)
+"""
+
+import json
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional, Callable
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Handler HTTP: délègue au FakeProvider propriétaire"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # Silencieux pendant les tests
+
+    def do_POST(self):
+        provider: "FakeProvider" = self.server.provider
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length)
+
+        if self.path.endswith("/files") or self.path.endswith("/batches"):
+            self._batch_post(provider, raw)
+            return
+
+        body = json.loads(raw or b"{}")
+
+        with provider.lock:
+            provider.requests.append({"path": self.path, "body": body})
+            provider.in_flight += 1
+            provider.max_in_flight = max(provider.max_in_flight, provider.in_flight)
+
+        try:
+            settings = provider.settings(self.path, body)
+
+            if provider.fail_first > 0:
+                with provider.lock:
+                    provider.fail_first -= 1
+                self._send_json(429, {"error": {"message": "rate limited", "type": "rate_limit"}},
+                                headers={"Retry-After": str(provider.retry_after)})
+                return
+
+            if settings["error"]:
+                self._send_json(500, {"error": {"message": settings["error"], "type": "server_error"}})
+                return
+
+            if settings["latency"]:
+                time.sleep(settings["latency"])
+
+            if self.path.endswith("/messages"):
+                self._anthropic(provider, body, settings)
+            else:
+                self._openai(provider, body, settings)
+        except (BrokenPipeError, ConnectionResetError):
+            # Le client a fermé le stream (ex: tentative annulée)
+            with provider.lock:
+                provider.disconnects += 1
+            self.close_connection = True
+        finally:
+            with provider.lock:
+                provider.in_flight -= 1
+
+    def do_GET(self):
+        provider: "FakeProvider" = self.server.provider
+        parts = self.path.split("?")[0].strip("/").split("/")
+
+        if not provider.batch_api:
+            self._send_json(404, {"error": {"message": "Not found", "type": "not_found"}})
+        elif parts[1:2] == ["batches"] and len(parts) == 3:
+            self._send_json(200, provider.openai_batch(parts[2]))
+        elif parts[1:2] == ["files"] and parts[-1] == "content":
+            self._send_bytes(provider.files.get(parts[2], b""))
+        elif parts[1:3] == ["messages", "batches"] and len(parts) == 4:
+            self._send_json(200, provider.anthropic_batch(parts[3]))
+        elif parts[1:3] == ["messages", "batches"] and parts[-1] == "results":
+            self._send_bytes(provider.anthropic_results(parts[3]))
+        else:
+            self._send_json(404, {"error": {"message": "Not found", "type": "not_found"}})
+
+    def _batch_post(self, provider: "FakeProvider", raw: bytes):
+        """Upload de fichier (multipart) ou création de batch"""
+        if not provider.batch_api:
+            self._send_json(404, {"error": {"message": "Batch API not available", "type": "not_found"}})
+            return
+
+        if self.path.endswith("/files"):
+            message = BytesParser(policy=default_policy).parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + raw
+            )
+            data = next(
+                part.get_payload(decode=True) for part in message.iter_parts()
+                if part.get_param("name", header="content-disposition") == "file"
+            )
+            self._send_json(200, provider.create_file(data))
+        elif self.path.endswith("/messages/batches"):
+            self._send_json(200, provider.create_anthropic_batch(json.loads(raw)["requests"]))
+        else:
+            self._send_json(200, provider.create_openai_batch(json.loads(raw)))
+
+    # ------------------------------------------------------------------ utils
+
+    def _send_bytes(self, data: bytes):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _start_sse(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+    def _sse(self, payload: Dict[str, Any], event: Optional[str] = None):
+        line = ""
+        if event:
+            line += f"event: {event}\n"
+        line += f"data: {json.dumps(payload)}\n\n"
+        self.wfile.write(line.encode())
+        self.wfile.flush()
+
+    # ----------------------------------------------------------------- OpenAI
+
+    def _openai(self, provider: "FakeProvider", body: Dict[str, Any], settings: Dict[str, Any]):
+        model = body.get("model", "fake-model")
+        chunks = provider.chunks(settings["text"])
+        usage = {
+            "prompt_tokens": provider.tokens_input,
+            "completion_tokens": len(chunks),
+            "total_tokens": provider.tokens_input + len(chunks),
+            "prompt_tokens_details": {"cached_tokens": provider.tokens_cached}
+        }
+        finish = "tool_calls" if settings["tool_calls"] else "stop"
+
+        if not body.get("stream"):
+            self._send_json(200, provider.openai_completion(body, settings))
+            return
+
+        base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": 0, "model": model}
+
+        self._start_sse()
+        if settings["first_token_delay"]:
+            time.sleep(settings["first_token_delay"])
+
+        for chunk in chunks:
+            self._sse({**base, "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]})
+            if settings["chunk_delay"]:
+                time.sleep(settings["chunk_delay"])
+
+        for i, tc in enumerate(settings["tool_calls"]):
+            arguments = json.dumps(tc["arguments"])
+            half = len(arguments) // 2
+            self._sse({**base, "choices": [{"index": 0, "delta": {"tool_calls": [{
+                "index": i, "id": f"call_{i}", "type": "function",
+                "function": {"name": tc["name"], "arguments": arguments[:half]}
+            }]}, "finish_reason": None}]})
+            self._sse({**base, "choices": [{"index": 0, "delta": {"tool_calls": [{
+                "index": i, "function": {"arguments": arguments[half:]}
+            }]}, "finish_reason": None}]})
+
+        self._sse({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": finish}]})
+        self._sse({**base, "choices": [], "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    # -------------------------------------------------------------- Anthropic
+
+    def _anthropic(self, provider: "FakeProvider", body: Dict[str, Any], settings: Dict[str, Any]):
+        model = body.get("model", "fake-claude")
+        chunks = provider.chunks(settings["text"])
+        stop_reason = "tool_use" if settings["tool_calls"] else "end_turn"
+        # input_tokens exclut les tokens lus depuis le cache chez Anthropic
+        input_usage = {
+            "input_tokens": provider.tokens_input - provider.tokens_cached,
+            "cache_read_input_tokens": provider.tokens_cached
+        }
+
+        if not body.get("stream"):
+            self._send_json(200, provider.anthropic_message(body, settings))
+            return
+
+        self._start_sse()
+        self._sse({"type": "message_start", "message": {
+            "id": "msg_fake", "type": "message", "role": "assistant", "model": model,
+            "content": [], "stop_reason": None, "stop_sequence": None,
+            "usage": {**input_usage, "output_tokens": 0}
+        }}, event="message_start")
+
+        if settings["first_token_delay"]:
+            time.sleep(settings["first_token_delay"])
+
+        index = 0
+        if chunks:
+            self._sse({"type": "content_block_start", "index": index,
+                       "content_block": {"type": "text", "text": ""}}, event="content_block_start")
+            for chunk in chunks:
+                self._sse({"type": "content_block_delta", "index": index,
+                           "delta": {"type": "text_delta", "text": chunk}}, event="content_block_delta")
+                if settings["chunk_delay"]:
+                    time.sleep(settings["chunk_delay"])
+            self._sse({"type": "content_block_stop", "index": index}, event="content_block_stop")
+            index += 1
+
+        for i, tc in enumerate(settings["tool_calls"]):
+            arguments = json.dumps(tc["arguments"])
+            half = len(arguments) // 2
+            self._sse({"type": "content_block_start", "index": index, "content_block": {
+                "type": "tool_use", "id": f"toolu_{i}", "name": tc["name"], "input": {}
+            }}, event="content_block_start")
+            for part in (arguments[:half], arguments[half:]):
+                self._sse({"type": "content_block_delta", "index": index,
+                           "delta": {"type": "input_json_delta", "partial_json": part}}, event="content_block_delta")
+            self._sse({"type": "content_block_stop", "index": index}, event="content_block_stop")
+            index += 1
+
+        self._sse({"type": "message_delta", "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                   "usage": {"output_tokens": len(chunks)}}, event="message_delta")
+        self._sse({"type": "message_stop"}, event="message_stop")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Tests de charge: beaucoup de connexions simultanées
+
+
+class FakeProvider:
+    """
+    Serveur LLM factice sur un port local éphémère
+
+    Args:
+        text: Réponse texte (découpée en fragments par mot pour le streaming)
+        tool_calls: Liste de {"name": ..., "arguments": {...}}
+        latency: Délai avant de répondre (secondes)
+        first_token_delay: Délai avant le premier fragment en streaming
+        chunk_delay: Délai entre fragments en streaming
+        tokens_input: Tokens d'entrée rapportés dans l'usage
+        tokens_cached: Part des tokens d'entrée servie par le cache de préfixe
+        fail_first: Nombre de requêtes initiales rejetées en 429
+        retry_after: Valeur de l'en-tête Retry-After des 429 (secondes)
+        responder: Callable (path, body) -> dict qui surcharge par requête
+            text, tool_calls, latency, first_token_delay, chunk_delay
+            ou error (requête de batch en échec)
+        batch_delay: Durée de traitement d'un batch (secondes)
+        batch_api: False pour répondre 404 aux endpoints batch
+    """
+
+    def __init__(
+        self,
+        text: str = "Hello from the fake provider",
+        tool_calls: Optional[List[Dict[str, Any]]] = None,
+        latency: float = 0.0,
+        first_token_delay: float = 0.0,
+        chunk_delay: float = 0.0,
+        tokens_input: int = 10,
+        tokens_cached: int = 0,
+        fail_first: int = 0,
+        retry_after: float = 0.0,
+        responder: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None,
+        batch_delay: float = 0.0,
+        batch_api: bool = True
+    ):
+        self.text = text
+        self.tool_calls = tool_calls or []
+        self.latency = latency
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+        self.tokens_input = tokens_input
+        self.tokens_cached = tokens_cached
+        self.fail_first = fail_first
+        self.retry_after = retry_after
+        self.responder = responder
+        self.batch_delay = batch_delay
+        self.batch_api = batch_api
+
+        self.lock = threading.Lock()
+        self.requests: List[Dict[str, Any]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.disconnects = 0
+
+        # Batch API: fichiers, batches, requêtes traitées en batch
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.batch_requests: List[Dict[str, Any]] = []
+        self.batch_polls = 0
+
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def settings(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Réglages de la réponse à une requête (défauts + surcharges du responder)"""
+        settings = {
+            "text": self.text,
+            "tool_calls": self.tool_calls,
+            "latency": self.latency,
+            "first_token_delay": self.first_token_delay,
+            "chunk_delay": self.chunk_delay,
+            "error": None
+        }
+        if self.responder:
+            settings.update(self.responder(path, body))
+        return settings
+
+    def chunks(self, text: Optional[str] = None) -> List[str]:
+        """Fragments de streaming (un par mot, espaces conservés)"""
+        text = self.text if text is None else text
+        if not text:
+            return []
+        words = text.split(" ")
+        return [w if i == 0 else f" {w}" for i, w in enumerate(words)]
+
+    # ------------------------------------------------------ Réponses JSON
+
+    def openai_completion(self, body: Dict[str, Any], settings: Dict[str, Any]) -> Dict[str, Any]:
+        """Réponse chat.completion non streamée"""
+        completion_tokens = len(self.chunks(settings["text"]))
+        message = {"role": "assistant", "content": settings["text"] or None}
+        if settings["tool_calls"]:
+            message["tool_calls"] = [{
+                "id": f"call_{i}",
+                "type": "function",
+                "function": {"name": tc["name"], "arguments": json.dumps(tc["arguments"])}
+            } for i, tc in enumerate(settings["tool_calls"])]
+        return {
+            "id": "chatcmpl-fake", "object": "chat.completion", "created": 0,
+            "model": body.get("model", "fake-model"),
+            "choices": [{"index": 0, "message": message,
+                         "finish_reason": "tool_calls" if settings["tool_calls"] else "stop"}],
+            "usage": {
+                "prompt_tokens": self.tokens_input,
+                "completion_tokens": completion_tokens,
+                "total_tokens": self.tokens_input + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": self.tokens_cached}
+            }
+        }
+
+    def anthropic_message(self, body: Dict[str, Any], settings: Dict[str, Any]) -> Dict[str, Any]:
+        """Réponse messages non streamée (input_tokens hors tokens lus en cache)"""
+        content = []
+        if settings["text"]:
+            content.append({"type": "text", "text": settings["text"]})
+        for i, tc in enumerate(settings["tool_calls"]):
+            content.append({"type": "tool_use", "id": f"toolu_{i}", "name": tc["name"], "input": tc["arguments"]})
+        return {
+            "id": "msg_fake", "type": "message", "role": "assistant",
+            "model": body.get("model", "fake-claude"),
+            "content": content,
+            "stop_reason": "tool_use" if settings["tool_calls"] else "end_turn",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": self.tokens_input - self.tokens_cached,
+                "cache_read_input_tokens": self.tokens_cached,
+                "output_tokens": len(self.chunks(settings["text"]))
+            }
+        }
+
+    # ---------------------------------------------------------- Batch API
+
+    def create_file(self, data: bytes) -> Dict[str, Any]:
+        with self.lock:
+            file_id = f"file-{len(self.files) + 1}"
+            self.files[file_id] = data
+        return {"id": file_id, "object": "file", "bytes": len(data), "created_at": 0,
+                "filename": "batch.jsonl", "purpose": "batch", "status": "processed"}
+
+    def _new_batch(self, kind: str, requests: List[Dict[str, Any]], **extra) -> str:
+        with self.lock:
+            prefix = "msgbatch" if kind == "anthropic" else "batch"
+            batch_id = f"{prefix}_{len(self.batches) + 1}"
+            self.batches[batch_id] = {
+                "kind": kind, "requests": requests, "created": time.monotonic(), "results": None, **extra
+            }
+        return batch_id
+
+    def _batch_results(self, batch_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Résultats {custom_id, path, body, settings} une fois batch_delay écoulé"""
+        with self.lock:
+            self.batch_polls += 1
+            batch = self.batches[batch_id]
+            if time.monotonic() - batch["created"] < self.batch_delay:
+                return None
+            if batch["results"] is None:
+                batch["results"] = []
+                for request in batch["requests"]:
+                    settings = self.settings(request["path"], request["body"])
+                    self.batch_requests.append({"batch_id": batch_id, **request})
+                    batch["results"].append({**request, "settings": settings})
+            return batch["results"]
+
+    def create_openai_batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        lines = self.files[body["input_file_id"]].decode().splitlines()
+        requests = [
+            {"custom_id": item["custom_id"], "path": item["url"], "body": item["body"]}
+            for item in map(json.loads, filter(None, lines))
+        ]
+        batch_id = self._new_batch("openai", requests, input_file_id=body["input_file_id"])
+        return self.openai_batch(batch_id, poll=False)
+
+    def openai_batch(self, batch_id: str, poll: bool = True) -> Dict[str, Any]:
+        batch = self.batches[batch_id]
+        results = self._batch_results(batch_id) if poll else None
+        payload = {
+            "id": batch_id, "object": "batch", "endpoint": "/v1/chat/completions",
+            "input_file_id": batch["input_file_id"], "completion_window": "24h", "created_at": 0,
+            "status": "in_progress", "output_file_id": None, "error_file_id": None,
+            "request_counts": {"total": len(batch["requests"]), "completed": 0, "failed": 0}
+        }
+        if results is None:
+            return payload
+
+        if "output_file_id" not in batch:
+            output, errors = [], []
+            for result in results:
+                settings = result["settings"]
+                if settings["error"]:
+                    errors.append({"id": "req", "custom_id": result["custom_id"], "response": {
+                        "status_code": 500, "body": {"error": {"message": settings["error"], "type": "server_error"}}
+                    }, "error": None})
+                else:
+                    output.append({"id": "req", "custom_id": result["custom_id"], "response": {
+                        "status_code": 200, "body": self.openai_completion(result["body"], settings)
+                    }, "error": None})
+            batch["output_file_id"] = self.create_file(
+                "".join(json.dumps(o) + "\n" for o in output).encode())["id"] if output else None
+            batch["error_file_id"] = self.create_file(
+                "".join(json.dumps(e) + "\n" for e in errors).encode())["id"] if errors else None
+            batch["counts"] = (len(output), len(errors))
+
+        payload.update({
+            "status": "completed",
+            "output_file_id": batch["output_file_id"],
+            "error_file_id": batch["error_file_id"],
+            "request_counts": {"total": len(batch["requests"]),
+                               "completed": batch["counts"][0], "failed": batch["counts"][1]}
+        })
+        return payload
+
+    def create_anthropic_batch(self, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        batch_id = self._new_batch("anthropic", [
+            {"custom_id": r["custom_id"], "path": "/v1/messages", "body": r["params"]} for r in requests
+        ])
+        return self.anthropic_batch(batch_id, poll=False)
+
+    def anthropic_batch(self, batch_id: str, poll: bool = True) -> Dict[str, Any]:
+        batch = self.batches[batch_id]
+        ended = poll and self._batch_results(batch_id) is not None
+        total = len(batch["requests"])
+        return {
+            "id": batch_id, "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {"processing": 0 if ended else total, "succeeded": total if ended else 0,
+                               "errored": 0, "canceled": 0, "expired": 0},
+            "created_at": "2025-01-01T00:00:00Z", "expires_at": "2025-01-02T00:00:00Z",
+            "ended_at": "2025-01-01T00:01:00Z" if ended else None,
+            "cancel_initiated_at": None, "archived_at": None,
+            "results_url": f"{self.url}/v1/messages/batches/{batch_id}/results" if ended else None
+        }
+
+    def anthropic_results(self, batch_id: str) -> bytes:
+        lines = []
+        for result in self.batches[batch_id]["results"] or []:
+            settings = result["settings"]
+            if settings["error"]:
+                outcome = {"type": "errored", "error": {"type": "error", "error": {
+                    "type": "api_error", "message": settings["error"]}}}
+            else:
+                outcome = {"type": "succeeded", "message": self.anthropic_message(result["body"], settings)}
+            lines.append(json.dumps({"custom_id": result["custom_id"], "result": outcome}))
+        return ("\n".join(lines) + "\n").encode()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openai_url(self) -> str:
+        return f"{self.url}/v1"
+
+    @property
+    def anthropic_url(self) -> str:
+        return self.url
+
+    def start(self) -> "FakeProvider":
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.provider = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self) -> "FakeProvider":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
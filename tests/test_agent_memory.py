@@ -0,0 +1,258 @@
+"""
+Tests de la mémoire des agents (cortex/core/agent_memory.py)
+
+Teste:
+- API historique: get_recent_executions / get_metrics / patterns / état / notes
+- Écriture différée: rien sur disque avant le lot, flush explicite ou à la lecture
+- Historique borné, métriques en agrégats
+- Plusieurs processus écrivant la même mémoire
+- Deux instances d'un même agent dans un processus: pas de lecture périmée
+- Import de l'ancien memory.json
+- Base verrouillée: l'agent n'échoue pas, le lot est réécrit ensuite
+- Base supprimée puis recréée dans le même processus
+"""
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from cortex.core.agent_memory import AgentMemory, HISTORY_LIMIT, get_agent_memory
+from cortex.core.config_loader import get_config
+from cortex.core.sqlite_pool import get_sqlite_pool
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def temp_db() -> str:
+    return str(Path(tempfile.mkdtemp()) / "agent_memory.db")
+
+
+def stored_executions(db_path: str) -> int:
+    return get_sqlite_pool(db_path).fetchone("SELECT COUNT(*) FROM agent_executions")[0]
+
+
+def test_api_compatibility():
+    """Test: même API et mêmes formats que l'ancien stockage JSON"""
+    print_section("TEST: API Compatibility")
+
+    memory = AgentMemory("maintenance", "test_api", db_path=temp_db(), flush_batch_size=1)
+    for i in range(5):
+        memory.record_execution(f"request {i}", {"success": i != 2}, duration=float(i), cost=0.01)
+    memory.add_pattern("frequent_file_type", {"file_type": ".py"})
+    memory.add_pattern("frequent_file_type", {"file_type": ".md"})
+    memory.update_state({"last_plan_id": "ADR-1", "active": True})
+    memory.add_note("first note")
+
+    recent = memory.get_recent_executions(2)
+    assert [e["request"] for e in recent] == ["request 3", "request 4"]
+    assert recent[-1]["success"] is True and recent[-1]["result_summary"] == "{'success': True}"
+    metrics = memory.get_metrics()
+    assert metrics == {"total_executions": 5, "successful_executions": 4, "failed_executions": 1,
+                       "avg_execution_time": 2.0, "total_cost": 0.05}, metrics
+    pattern = memory.get_pattern("frequent_file_type")
+    assert pattern["occurrences"] == 2 and pattern["data"][-1]["data"] == {"file_type": ".md"}
+    assert memory.get_state("last_plan_id") == "ADR-1" and memory.get_state() == {"last_plan_id": "ADR-1", "active": True}
+    assert memory.load()["notes"][0]["note"] == "first note"
+    print(f"✓ {memory}: recent executions, metrics, patterns, state, notes")
+
+    memory.clear_history()
+    assert memory.get_recent_executions() == [] and memory.get_metrics()["total_executions"] == 5
+    memory.reset()
+    assert memory.get_metrics()["total_executions"] == 0 and memory.get_patterns() == {}
+    print("✓ clear_history keeps metrics, reset clears everything")
+
+
+def test_write_behind():
+    """Test: opérations gardées en mémoire puis écrites par lots"""
+    print_section("TEST: Write-behind")
+
+    db_path = temp_db()
+    memory = AgentMemory("maintenance", "test_flush", db_path=db_path, flush_interval=3600, flush_batch_size=10)
+    for i in range(9):
+        memory.record_execution(f"request {i}", {"success": True}, duration=1.0)
+    assert stored_executions(db_path) == 0
+    memory.record_execution("request 9", {"success": True}, duration=1.0)
+    assert stored_executions(db_path) == 10
+    print("✓ Nothing written before the batch is full, one transaction per batch")
+
+    memory.record_execution("request 10", {"success": True}, duration=1.0)
+    assert memory.get_metrics()["total_executions"] == 11, "Reads flush pending operations"
+    print("✓ Reads see pending operations")
+
+
+def test_bounded_history():
+    """Test: historique borné à HISTORY_LIMIT, métriques sur toutes les exécutions"""
+    print_section("TEST: Bounded History")
+
+    db_path = temp_db()
+    memory = AgentMemory("maintenance", "test_bounded", db_path=db_path, flush_batch_size=37)
+    for i in range(HISTORY_LIMIT * 3):
+        memory.record_execution(f"request {i}", {"success": i % 3 != 0}, duration=0.5, cost=0.001)
+    memory.flush()
+    assert stored_executions(db_path) == HISTORY_LIMIT
+    recent = memory.get_recent_executions(HISTORY_LIMIT * 2)
+    assert len(recent) == HISTORY_LIMIT and recent[-1]["request"] == f"request {HISTORY_LIMIT * 3 - 1}"
+    metrics = memory.get_metrics()
+    assert metrics["total_executions"] == HISTORY_LIMIT * 3 and metrics["failed_executions"] == HISTORY_LIMIT
+    assert abs(metrics["avg_execution_time"] - 0.5) < 1e-9
+    print(f"✓ {stored_executions(db_path)} rows kept, metrics over {metrics['total_executions']} executions")
+
+
+def _record_many(db_path: str, count: int):
+    os.chdir(tempfile.mkdtemp())  # Pas d'ancien memory.json
+    memory = AgentMemory("maintenance", "shared", db_path=db_path, flush_batch_size=7)
+    for i in range(count):
+        memory.record_execution(f"pid {os.getpid()} #{i}", {"success": True}, duration=1.0, cost=0.5)
+    memory.flush()
+
+
+def test_multiprocess():
+    """Test: écritures concurrentes de plusieurs processus sans perte"""
+    print_section("TEST: Multi-process")
+
+    db_path = temp_db()
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_record_many, args=(db_path, 60)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    memory = AgentMemory("maintenance", "shared", db_path=db_path)
+    metrics = memory.get_metrics()
+    assert metrics["total_executions"] == 240 and metrics["total_cost"] == 120.0, metrics
+    assert len(memory.get_recent_executions(HISTORY_LIMIT)) == HISTORY_LIMIT
+    print(f"✓ 4 processes x 60 executions: {metrics['total_executions']} counted")
+
+
+def test_two_instances_same_process():
+    """Test: une écriture d'une instance invalide le cache de l'autre (même connexion du pool)"""
+    print_section("TEST: Two Instances, One Process")
+
+    db_path = temp_db()
+    reader = AgentMemory("maintenance", "twin", db_path=db_path, flush_batch_size=1)
+    writer = AgentMemory("maintenance", "twin", db_path=db_path, flush_batch_size=1)
+
+    assert reader.get_metrics()["total_executions"] == 0
+    assert reader.get_state("phase") is None
+    writer.record_execution("task", {"success": True}, duration=1.0)
+    writer.update_state({"phase": "done"})
+    assert reader.get_metrics()["total_executions"] == 1
+    assert reader.get_state("phase") == "done"
+    assert [e["request"] for e in reader.get_recent_executions()] == ["task"]
+    print("✓ Reader sees the writer's commits on the shared pooled connection")
+
+    writer.clear_history()
+    assert reader.get_recent_executions() == []
+    print("✓ clear_history invalidates the other instance")
+
+    # Base par défaut redirigée: get_agent_memory n'écrit pas dans cortex/data
+    settings = get_config().config.setdefault("memory", {}).setdefault("agent_memory", {})
+    previous = settings.get("db_path")
+    settings["db_path"] = temp_db()
+    try:
+        assert get_agent_memory("maintenance", "twin_factory") is get_agent_memory("maintenance", "twin_factory")
+    finally:
+        settings["db_path"] = previous
+    print("✓ get_agent_memory returns one instance per agent")
+
+
+def test_legacy_migration():
+    """Test: l'ancien memory.json est importé une seule fois"""
+    print_section("TEST: Legacy Migration")
+
+    workdir = Path(tempfile.mkdtemp())
+    legacy = workdir / "cortex/departments/maintenance/agents/legacy/memory.json"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text(json.dumps({
+        "version": "1.0.0",
+        "last_updated": "2025-10-17T09:24:06",
+        "execution_history": [{"timestamp": "2025-10-17T09:24:06", "request": "old", "success": True,
+                               "duration": 2.5, "cost": 0.01, "result_summary": "{}"}],
+        "learned_patterns": {"p": {"first_detected": "t0", "occurrences": 3,
+                                   "data": [{"timestamp": "t0", "data": {"x": 1}}], "last_detected": "t1"}},
+        "performance_metrics": {"total_executions": 4, "successful_executions": 3, "failed_executions": 1,
+                                "avg_execution_time": 2.0, "total_cost": 0.04},
+        "state": {"active": True},
+        "notes": [{"timestamp": "t0", "note": "hello"}]
+    }))
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        db_path = temp_db()
+        memory = AgentMemory("maintenance", "legacy", db_path=db_path, flush_batch_size=1)
+        memory.record_execution("new", {"success": True}, duration=4.0)
+        metrics = memory.get_metrics()
+        assert metrics["total_executions"] == 5 and abs(metrics["avg_execution_time"] - 2.4) < 1e-9
+        assert [e["request"] for e in memory.get_recent_executions()] == ["old", "new"]
+        assert memory.get_pattern("p")["occurrences"] == 3 and memory.get_state("active") is True
+
+        again = AgentMemory("maintenance", "legacy", db_path=db_path)
+        assert again.get_metrics()["total_executions"] == 5, "Imported once"
+    finally:
+        os.chdir(cwd)
+    print("✓ memory.json imported once, new executions added on top")
+
+
+def test_locked_database_does_not_fail_agent():
+    """Test: une erreur SQLite à l'écriture est signalée, pas propagée; lot réessayé"""
+    print_section("TEST: Locked Database")
+
+    db_path = temp_db()
+    memory = AgentMemory("maintenance", "locked", db_path=db_path, flush_batch_size=1)
+    memory.db.execute("PRAGMA busy_timeout=50")  # Échec rapide au lieu d'attendre 5s
+
+    locker = sqlite3.connect(db_path, isolation_level=None)
+    locker.execute("BEGIN EXCLUSIVE")
+    try:
+        memory.record_execution("task", {"success": True}, duration=1.0)
+        assert not memory.flush()
+    finally:
+        locker.execute("ROLLBACK")
+        locker.close()
+    print("✓ record_execution survives a locked database")
+
+    assert memory.flush()
+    assert memory.get_metrics()["total_executions"] == 1
+    assert stored_executions(db_path) == 1
+    print("✓ Pending execution written once the lock is released")
+
+
+def test_recreated_database():
+    """Test: base supprimée pendant que le pool est ouvert, nouvelle instance sur un fichier vierge"""
+    print_section("TEST: Recreated Database")
+
+    db_path = temp_db()
+    memory = AgentMemory("maintenance", "recreated", db_path=db_path, flush_batch_size=1)
+    memory.record_execution("before", {"success": True}, duration=1.0)
+    for suffix in ("", "-wal", "-shm"):
+        Path(db_path + suffix).unlink(missing_ok=True)
+
+    fresh = AgentMemory("maintenance", "recreated", db_path=db_path, flush_batch_size=1)
+    assert fresh.get_metrics()["total_executions"] == 0
+    fresh.record_execution("after", {"success": True}, duration=1.0)
+    assert Path(db_path).exists() and stored_executions(db_path) == 1
+    assert [e["request"] for e in memory.get_recent_executions()] == ["after"]
+    print("✓ Schema recreated on the new file, other instance sees it")
+
+
+if __name__ == "__main__":
+    test_api_compatibility()
+    test_write_behind()
+    test_bounded_history()
+    test_multiprocess()
+    test_two_instances_same_process()
+    test_legacy_migration()
+    test_locked_database_does_not_fail_agent()
+    test_recreated_database()
+    print("\n✅ All agent memory tests passed")
@@ -0,0 +1,192 @@
+"""
+Tests de l'AsyncLLMClient
+
+Teste contre un provider local factice (tests/fake_provider.py):
+- Concurrence bornée par provider (sémaphore)
+- Retries qui respectent Retry-After
+- Seau à jetons RPM
+- Façade synchrone
+- Single-flight: prompts identiques simultanés → un seul appel provider
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openai import OpenAI
+from anthropic import Anthropic
+
+from cortex.core.async_llm_client import AsyncLLMClient, SyncLLMClient, TokenBucket, retry_delay
+from cortex.core.llm_client import LLMClient, ModelTier
+from tests.fake_provider import FakeProvider
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def attach(client: LLMClient, provider: FakeProvider) -> LLMClient:
+    """Branche les clients synchrones sur le provider factice"""
+    client.openai_client = OpenAI(api_key="test", base_url=provider.openai_url, max_retries=0)
+    client.deepseek_client = OpenAI(api_key="test", base_url=provider.openai_url, max_retries=0)
+    client.anthropic_client = Anthropic(api_key="test", base_url=provider.anthropic_url, max_retries=0)
+    return client
+
+
+def request(i: int, tier: ModelTier = ModelTier.DEEPSEEK):
+    return {"messages": [{"role": "user", "content": f"Request {i}"}], "tier": tier, "max_tokens": 50}
+
+
+def test_bounded_concurrency():
+    """Test: le sémaphore borne les requêtes simultanées par provider"""
+    print_section("TEST: Bounded Concurrency")
+
+    with FakeProvider(text="ok", latency=0.05) as provider:
+        client = AsyncLLMClient(
+            attach(LLMClient(use_cache=False), provider),
+            limits={"deepseek": {"max_concurrency": 5}, "claude": {"max_concurrency": 3}}
+        )
+
+        async def run():
+            requests = [request(i) for i in range(20)] + [request(i, ModelTier.CLAUDE) for i in range(9)]
+            responses = await client.complete_many(requests)
+            await client.aclose()
+            return responses
+
+        start = time.perf_counter()
+        responses = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+
+        assert len(responses) == 29
+        assert all(r.content == "ok" for r in responses)
+        stats = client.get_stats()
+        assert stats == {}, "aclose() should release providers"
+        assert provider.max_in_flight <= 8, f"At most 5 + 3 in flight, got {provider.max_in_flight}"
+        assert provider.max_in_flight >= 5, "Requests should overlap"
+        print(f"✓ 29 requests in {elapsed:.2f}s, max in flight: {provider.max_in_flight}")
+
+
+def test_retry_after():
+    """Test: un 429 avec Retry-After est retenté après le délai imposé"""
+    print_section("TEST: Retry-After")
+
+    with FakeProvider(text="ok", fail_first=2, retry_after=0.2) as provider:
+        client = AsyncLLMClient(attach(LLMClient(use_cache=False), provider))
+        client.retry_base = 0.01
+
+        async def run():
+            return await client.complete(**request(0))
+
+        start = time.perf_counter()
+        response = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+
+        assert response.content == "ok"
+        stats = client.get_stats()["deepseek"]
+        assert stats["retries"] == 2
+        assert stats["requests"] == 3
+        assert elapsed >= 0.4, f"Two Retry-After waits of 0.2s expected, took {elapsed:.2f}s"
+        print(f"✓ Succeeded after {stats['retries']} retries in {elapsed:.2f}s")
+
+    # Backoff exponentiel borné, Retry-After comme minimum
+    assert all(retry_delay(10, 0.5, 2.0) <= 2.0 for _ in range(100))
+    assert all(retry_delay(0, 0.5, 2.0, retry_after=3.0) >= 3.0 for _ in range(100))
+    print("✓ Jittered backoff capped, Retry-After honoured")
+
+
+def test_token_bucket():
+    """Test: le seau RPM étale les requêtes au-delà de la capacité"""
+    print_section("TEST: Token Bucket")
+
+    async def run():
+        bucket = TokenBucket(rate_per_minute=600)  # 10/s
+        bucket.tokens = 0
+        start = time.perf_counter()
+        for _ in range(3):
+            await bucket.acquire(1)
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+    assert 0.25 <= elapsed < 0.6, f"3 tokens at 10/s should take ~0.3s, took {elapsed:.2f}s"
+    print(f"✓ 3 acquisitions at 10/s took {elapsed:.2f}s")
+
+
+def test_sync_facade():
+    """Test: SyncLLMClient garde l'interface de LLMClient"""
+    print_section("TEST: Sync Facade")
+
+    with FakeProvider(text="Hello facade", latency=0.05) as provider:
+        client = attach(SyncLLMClient(use_cache=False), provider)
+
+        response = client.complete([{"role": "user", "content": "hi"}], ModelTier.NANO, max_tokens=20)
+        assert response.content == "Hello facade"
+        assert response.cost > 0
+        print(f"✓ complete(): {response.content!r}")
+
+        start = time.perf_counter()
+        responses = client.complete_many([request(i) for i in range(10)])
+        elapsed = time.perf_counter() - start
+        assert [r.content for r in responses] == ["Hello facade"] * 10
+        assert elapsed < 0.4, f"10 parallel calls at 50ms should not be serialized ({elapsed:.2f}s)"
+        print(f"✓ complete_many(): 10 calls in {elapsed:.2f}s")
+
+        client.close()
+
+
+def test_single_flight_llm_calls():
+    """Test: threads et tâches avec le même prompt partagent un appel"""
+    print_section("TEST: Single-Flight LLM Calls")
+
+    with FakeProvider(text="judged", latency=0.2) as provider:
+        sync_client = attach(LLMClient(use_cache=False), provider)
+        async_client = AsyncLLMClient(sync_client)
+        messages = [{"role": "user", "content": "Is context needed for: fix the login bug?"}]
+
+        thread_responses = []
+        threads = [
+            threading.Thread(target=lambda: thread_responses.append(
+                sync_client.complete(messages, ModelTier.DEEPSEEK, max_tokens=50)
+            ))
+            for _ in range(4)
+        ]
+
+        async def run():
+            for t in threads:
+                t.start()
+            responses = await asyncio.gather(*(
+                async_client.complete(messages, ModelTier.DEEPSEEK, max_tokens=50) for _ in range(4)
+            ))
+            await asyncio.to_thread(lambda: [t.join() for t in threads])
+            await async_client.aclose()
+            return responses
+
+        before = sync_client.single_flight.coalesced
+        task_responses = asyncio.run(run())
+        responses = thread_responses + list(task_responses)
+
+        assert len(provider.requests) == 1, f"Expected 1 provider call, got {len(provider.requests)}"
+        assert all(r.content == "judged" for r in responses)
+        assert sum(1 for r in responses if r.cost > 0) == 1, "Cost should be paid once"
+        assert sync_client.single_flight.coalesced - before == 7
+        print("✓ 8 identical calls (4 threads + 4 tasks) → 1 provider request")
+
+        # Paramètres différents → appels distincts
+        sync_client.complete(messages, ModelTier.DEEPSEEK, max_tokens=51)
+        assert len(provider.requests) == 2
+        print("✓ Different parameters are not coalesced")
+
+
+if __name__ == "__main__":
+    test_bounded_concurrency()
+    test_retry_after()
+    test_token_bucket()
+    test_sync_facade()
+    test_single_flight_llm_calls()
+    print("\n✅ All async client tests passed")
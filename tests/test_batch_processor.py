@@ -0,0 +1,173 @@
+"""
+Tests du traitement batch (cortex/core/batch_processor.py)
+
+Teste contre un provider local factice:
+- Batch API OpenAI (nano) et Anthropic (claude): résultats stockés, coût remisé
+- deepseek: appels directs en concurrence bornée
+- Reprise: un nouveau worker récupère les batches soumis sans les renvoyer
+- Batch API indisponible: repli sur les appels directs
+- Échecs: erreurs de batch enregistrées, erreurs transitoires relancées
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openai import OpenAI
+from anthropic import Anthropic
+
+from cortex.core.llm_client import LLMClient
+from cortex.core.batch_processor import BatchQueue, BatchWorker, COMPLETED, FAILED
+from tests.fake_provider import FakeProvider
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def make_client(provider) -> LLMClient:
+    client = LLMClient(use_cache=False)
+    client.openai_client = OpenAI(api_key="test", base_url=provider.openai_url, max_retries=0)
+    client.deepseek_client = OpenAI(api_key="test", base_url=provider.openai_url, max_retries=0)
+    client.anthropic_client = Anthropic(api_key="test", base_url=provider.anthropic_url, max_retries=0, timeout=30)
+    return client
+
+
+def make_queue() -> BatchQueue:
+    return BatchQueue(db_path=str(Path(tempfile.mkdtemp()) / "batch.db"))
+
+
+def echo(path, body):
+    """Répond avec le contenu du dernier message utilisateur"""
+    return {"text": f"reviewed: {body['messages'][-1]['content']}"}
+
+
+def test_provider_batches():
+    """Test: nano via OpenAI Batch API, claude via Anthropic Message Batches"""
+    print_section("TEST: Provider Batch APIs")
+
+    with FakeProvider(responder=echo, tokens_input=100) as provider:
+        queue = make_queue()
+        batch_id = queue.submit(
+            [{"prompt": f"diff {i}", "custom_id": f"nano-{i}"} for i in range(5)]
+            + [{"prompt": f"design {i}", "tier": "claude", "system": "Be brief."} for i in range(3)],
+            name="nightly-review"
+        )
+        assert queue.status(batch_id)["pending"] == 8
+
+        report = BatchWorker(queue, make_client(provider), poll_interval=0.05).run(timeout=10)
+        assert report["submitted"] == 8 and report["direct"] == 0, report
+        assert report["completed"] == 8 and report["open_batches"] == 0
+        assert len(provider.batches) == 2 and not provider.requests, "No per-request calls"
+        print(f"✓ 8 requests in {len(provider.batches)} provider batches, no direct calls")
+
+        results = queue.results(batch_id)
+        assert [r.status for r in results] == [COMPLETED] * 8
+        assert results[0].custom_id == "nano-0" and results[0].content == "reviewed: diff 0"
+        assert results[5].content == "reviewed: design 0"
+        claude_body = next(r["body"] for r in provider.batch_requests if r["path"] == "/v1/messages")
+        assert claude_body["system"][0]["text"] == "Be brief."
+        print("✓ Results stored in submission order, system prompt forwarded")
+
+        client = make_client(provider)
+        full_price = client._calculate_cost("nano", results[0].tokens_input, results[0].tokens_output)
+        assert abs(results[0].cost - full_price * 0.5) < 1e-12
+        status = queue.status(batch_id)
+        assert status["done"] and status["completed"] == 8
+        print(f"✓ Batch discount applied, total ${status['cost']:.6f}")
+
+
+def test_deepseek_bounded_concurrency():
+    """Test: deepseek n'a pas de Batch API → appels directs, concurrence bornée"""
+    print_section("TEST: Direct Calls")
+
+    with FakeProvider(responder=echo, latency=0.05) as provider:
+        queue = make_queue()
+        batch_id = queue.submit([{"prompt": f"summary {i}"} for i in range(12)], default_tier="deepseek")
+
+        report = BatchWorker(queue, make_client(provider), max_concurrency=3).run()
+        assert report["direct"] == 12 and report["submitted"] == 0 and report["completed"] == 12
+        assert provider.max_in_flight <= 3, provider.max_in_flight
+        assert not provider.batches
+        assert all(r.status == COMPLETED for r in queue.results(batch_id))
+        print(f"✓ 12 direct calls, at most {provider.max_in_flight} in flight")
+
+
+def test_resume_after_interruption():
+    """Test: soumission sans attente, reprise par un autre worker sans renvoi"""
+    print_section("TEST: Resume")
+
+    with FakeProvider(responder=echo, batch_delay=0.3) as provider:
+        queue = make_queue()
+        batch_id = queue.submit([{"prompt": f"page {i}"} for i in range(4)])
+
+        report = BatchWorker(queue, make_client(provider)).run(wait=False)
+        assert report["submitted"] == 4 and report["open_batches"] == 1
+        assert queue.status(batch_id)["submitted"] == 4
+        print("✓ Worker stopped with the provider batch still running")
+
+        # Le processus "redémarre": nouvelle file sur la même base, nouveau worker
+        queue = BatchQueue(db_path=str(queue.db_path))
+        report = BatchWorker(queue, make_client(provider), poll_interval=0.05).run(timeout=10)
+        assert report["submitted"] == 0 and report["completed"] == 4
+        assert len(provider.batches) == 1, "Nothing resubmitted"
+        assert queue.status(batch_id)["done"]
+        print(f"✓ Results collected after restart ({provider.batch_polls} polls)")
+
+
+def test_fallback_without_batch_api():
+    """Test: endpoint batch absent → repli sur les appels directs"""
+    print_section("TEST: Fallback")
+
+    with FakeProvider(responder=echo, batch_api=False) as provider:
+        queue = make_queue()
+        batch_id = queue.submit([{"prompt": "a"}, {"prompt": "b", "tier": "claude"}])
+
+        report = BatchWorker(queue, make_client(provider)).run()
+        assert report["submitted"] == 0 and report["direct"] == 2 and report["completed"] == 2
+        assert len(provider.requests) == 2
+        assert [r.content for r in queue.results(batch_id)] == ["reviewed: a", "reviewed: b"]
+        print("✓ Both tiers fell back to direct calls")
+
+
+def test_errors():
+    """Test: erreurs par requête dans un batch, relance des erreurs transitoires"""
+    print_section("TEST: Errors")
+
+    def failing(path, body):
+        content = body["messages"][-1]["content"]
+        return {"text": "ok", "error": "invalid request" if content == "bad" else None}
+
+    with FakeProvider(responder=failing) as provider:
+        queue = make_queue()
+        batch_id = queue.submit([{"prompt": "good"}, {"prompt": "bad"}, {"prompt": "bad", "tier": "claude"}])
+        report = BatchWorker(queue, make_client(provider), poll_interval=0.05).run(timeout=10)
+        assert report["completed"] == 1 and report["failed"] == 2, report
+        results = queue.results(batch_id)
+        assert [r.status for r in results] == [COMPLETED, FAILED, FAILED]
+        assert "invalid request" in results[1].error and "invalid request" in results[2].error
+        print("✓ Failed batch entries recorded with their error")
+
+    with FakeProvider(responder=echo, fail_first=2, retry_after=0) as provider:
+        queue = make_queue()
+        batch_id = queue.submit([{"prompt": "x", "tier": "deepseek"}])
+        report = BatchWorker(queue, make_client(provider)).run()
+        assert queue.results(batch_id)[0].status == COMPLETED
+        print("✓ Transient 429s retried on the direct path")
+
+    assert json.loads(json.dumps(queue.list_batches()))[0]["completed"] == 1
+
+
+if __name__ == "__main__":
+    test_provider_batches()
+    test_deepseek_bounded_concurrency()
+    test_resume_after_interruption()
+    test_fallback_without_batch_api()
+    test_errors()
+    print("\n✅ All batch processor tests passed")
@@ -0,0 +1,390 @@
+"""
+Tests du cache multi-niveaux
+
+Teste:
+- L2: index sémantique mmap (hit sur reformulation, portée par tier, LRU)
+- L3: templates à slots (extraction, vérification, re-remplissage, réécriture)
+- Single-flight: déduplication des appels identiques simultanés
+- Clés de cache: empreintes chaînées par préfixe, mémoïsées
+- CacheManager: tiers L1/L2 dans un dossier temporaire
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from cortex.cache.semantic_cache import SemanticCache
+from cortex.cache.template_cache import TemplateCache, TemplateExtractor
+from cortex.cache.single_flight import SingleFlight
+from cortex.cache.message_hash import PrefixHasher
+from cortex.cache.cache_manager import CacheManager, CacheLevel
+from cortex.core.embeddings import Embedder, HashingBackend
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def local_embedder() -> Embedder:
+    """Encodeur sans mémo disque (l'encodeur partagé écrit dans data/cache)"""
+    return Embedder(HashingBackend())
+
+
+def test_l2_semantic_cache():
+    """Test: hit sémantique sur reformulation, isolé par portée"""
+    print_section("TEST: L2 Semantic Cache")
+
+    cache = SemanticCache(path=tempfile.mkdtemp(), embedder=local_embedder(), max_entries=100)
+
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": "Explain the difference between a list and a tuple in Python"}
+    ]
+    scope, text = SemanticCache.extract_query(messages, "nano")
+    cache.add(scope, text, {"content": "Lists are mutable.", "tokens": 120, "cost": 0.0001})
+
+    # Reformulation légère → hit
+    entry = cache.lookup(scope, "explain the difference between a list and a tuple in python?")
+    assert entry is not None, "Paraphrase should hit L2"
+    assert entry["content"] == "Lists are mutable."
+    print(f"✓ Paraphrase hit (similarity: {entry['similarity']:.3f})")
+
+    # Autre tier → miss
+    other_scope, _ = SemanticCache.extract_query(messages, "claude")
+    assert cache.lookup(other_scope, text) is None, "Different tier must not hit"
+    print("✓ Scoped by model tier")
+
+    # Question différente → miss
+    assert cache.lookup(scope, "What is the weather in Paris tomorrow?") is None
+    print("✓ Unrelated request misses")
+
+    # Multi-tours → non éligible
+    multi_turn = messages + [
+        {"role": "assistant", "content": "..."},
+        {"role": "user", "content": "And sets?"}
+    ]
+    assert SemanticCache.extract_query(multi_turn, "nano") is None
+    print("✓ Multi-turn conversations are not eligible")
+
+    stats = cache.get_stats()
+    assert stats["l2_lookups"] == 3
+    assert abs(stats["l2_hit_rate"] - 1 / 3) < 1e-9
+    print(f"✓ Stats: {stats}")
+
+
+def test_l2_slot_guard():
+    """Test: une requête qui ne diffère que par une entité ou un nombre ne hit pas"""
+    print_section("TEST: L2 Slot Guard")
+
+    cache = SemanticCache(path=tempfile.mkdtemp(), embedder=local_embedder(), max_entries=100)
+    capital = "What is the capital of {}? Answer with the city name only and explain briefly why it became the capital."
+    trip = "Write a detailed travel itinerary for visiting Rome for {} days, including museums, restaurants and transport tips."
+    value = {"tokens": 50, "cost": 0.0001}
+    cache.add("nano:x", capital.format("France"), {**value, "content": "Paris."})
+    cache.add("nano:x", trip.format("three"), {**value, "content": "Day 1..3"})
+    cache.add("nano:x", trip.format("4"), {**value, "content": "Day 1..4"})
+
+    for text in (capital.format("Japan"), trip.format("seven"), trip.format("5")):
+        similarity = float(max(cache.vectors[:3] @ cache.embedder.embed(text)))
+        assert similarity >= cache.similarity_threshold, (text, similarity)
+        assert cache.lookup("nano:x", text) is None, text
+        print(f"✓ Miss despite similarity {similarity:.3f}: {text[:60]}...")
+
+    entry = cache.lookup("nano:x", capital.format("france").lower())
+    assert entry is not None and entry["content"] == "Paris."
+    assert cache.lookup("nano:x", trip.format("4"))["content"] == "Day 1..4"
+    assert cache.get_stats()["l2_slot_mismatches"] >= 3
+    print("✓ Same entity (case-insensitive) still hits")
+
+
+def test_l2_lru_eviction_and_persistence():
+    """Test: éviction LRU à capacité et rechargement depuis le disque"""
+    print_section("TEST: L2 LRU Eviction & Persistence")
+
+    path = tempfile.mkdtemp()
+    embedder = local_embedder()
+    cache = SemanticCache(path=path, embedder=embedder, max_entries=2)
+
+    cache.add("nano:x", "first request about databases", {"content": "a", "tokens": 1, "cost": 0.0})
+    cache.add("nano:x", "second request about networking", {"content": "b", "tokens": 1, "cost": 0.0})
+    # Toucher la première pour que la seconde devienne LRU
+    assert cache.lookup("nano:x", "first request about databases") is not None
+    cache.add("nano:x", "third request about compilers", {"content": "c", "tokens": 1, "cost": 0.0})
+
+    assert len(cache) == 2
+    assert cache.lookup("nano:x", "second request about networking") is None
+    print("✓ Least recently used entry evicted")
+
+    cache.flush()
+    reloaded = SemanticCache(path=path, embedder=embedder, max_entries=2)
+    entry = reloaded.lookup("nano:x", "third request about compilers")
+    assert entry is not None and entry["content"] == "c"
+    print("✓ Index reloaded from disk")
+
+
+def test_l3_template_extraction():
+    """Test: normalisation des nombres, chaînes, chemins, URLs et entités"""
+    print_section("TEST: L3 Template Extraction")
+
+    extractor = TemplateExtractor()
+
+    weather_a = extractor.extract("Get the weather in Granby for 3 days")
+    weather_b = extractor.extract("Get the weather in New York City for 10 days")
+    assert weather_a.signature == weather_b.signature
+    assert weather_a.slots == ["Granby", "3"]
+    assert weather_b.slots == ["New York City", "10"]
+    print(f"✓ {weather_a.text}")
+
+    scrape = extractor.extract('Scrape source "forbes" from https://forbes.com/billionaires/')
+    assert scrape.slots == ['"forbes"', "https://forbes.com/billionaires/"]
+    print(f"✓ {scrape.text}")
+
+    path = extractor.extract("Read the file cortex/core/todo_db.py")
+    assert path.slots == ["cortex/core/todo_db.py"]
+    print(f"✓ {path.text}")
+
+    # Le premier mot d'une phrase n'est pas une entité
+    assert extractor.extract("What is the capital of France?").slots == ["France"]
+    print("✓ Sentence-initial capitals are not entities")
+
+
+def test_l3_template_cache():
+    """Test: un template vérifié est servi en re-remplissant les slots"""
+    print_section("TEST: L3 Template Cache")
+
+    cache = TemplateCache()
+    scope = "nano:todo"
+
+    cache.add(scope, 'Add task 12 titled "Buy milk"',
+              {"content": 'Task 12 "Buy milk" created.', "tokens": 80, "cost": 0.001})
+    # Une seule observation: pas encore vérifié, et pas de réécrivain
+    assert cache.lookup(scope, 'Add task 13 titled "Call Bob"') is None
+    print("✓ Unverified template is not served")
+
+    cache.add(scope, 'Add task 13 titled "Call Bob"',
+              {"content": 'Task 13 "Call Bob" created.', "tokens": 80, "cost": 0.001})
+    entry = cache.lookup(scope, 'Add task 99 titled "Walk the dog"')
+    assert entry is not None
+    assert entry["content"] == 'Task 99 "Walk the dog" created.'
+    print(f"✓ Slots re-filled: {entry['content']}")
+
+    # Réponse dépendante des données: le template est invalidé
+    cache.add(scope, 'Add task 14 titled "Read"',
+              {"content": "Duplicate title, nothing created.", "tokens": 80, "cost": 0.001})
+    assert cache.lookup(scope, 'Add task 15 titled "Cook"') is None
+    print("✓ Inconsistent observation resets verification")
+
+    stats = cache.get_stats()
+    assert stats["l3_templates"] == 1
+    assert stats["l3_top_templates"][0]["hits"] == 1
+    print(f"✓ Per-template counters: {stats['l3_top_templates']}")
+
+
+def test_l3_slot_free_answer_not_verified():
+    """Test: même réponse sans slot pour deux entités → jamais servie pour une troisième"""
+    print_section("TEST: L3 Slot-Free Answer")
+
+    cache = TemplateCache()
+    scope = "nano:facts"
+
+    cache.add(scope, "Is Paris in Europe?", {"content": "Yes", "tokens": 20, "cost": 0.001})
+    cache.add(scope, "Is Berlin in Europe?", {"content": "Yes", "tokens": 20, "cost": 0.001})
+    assert cache.lookup(scope, "Is Tokyo in Europe?") is None
+    assert cache.get_stats()["l3_verified_templates"] == 0
+    print("✓ Identical slot-free answers do not verify the template")
+
+
+def test_l3_nano_rewrite():
+    """Test: réécriture NANO pour un template non vérifié"""
+    print_section("TEST: L3 NANO Rewrite")
+
+    calls = []
+
+    def rewriter(response, old_slots, new_slots, request):
+        calls.append((old_slots, new_slots))
+        if new_slots == ["Tokyo"]:
+            return None  # CANNOT_ADAPT
+        return response.replace(old_slots[0], new_slots[0]), 0.0001
+
+    cache = TemplateCache(rewriter=rewriter)
+    cache.add("nano:x", "Translate hello into Spanish",
+              {"content": "In Spanish: hola", "tokens": 40, "cost": 0.001})
+
+    entry = cache.lookup("nano:x", "Translate hello into German")
+    assert entry["rewritten"] and entry["cost_spent"] == 0.0001
+    assert entry["content"] == "In German: hola"
+    assert cache.lookup("nano:x", "Translate hello into Tokyo") is None
+    assert len(calls) == 2
+    print("✓ Rewrite used only for unverified templates, refusal is a miss")
+
+
+def test_single_flight():
+    """Test: appels identiques simultanés (threads et tâches) → une exécution"""
+    print_section("TEST: Single-Flight")
+
+    group = SingleFlight()
+    executions = []
+
+    def slow_call():
+        executions.append(1)
+        time.sleep(0.1)
+        return "shared result"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(group.do("key", slow_call)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(executions) == 1
+    assert all(value == "shared result" for value, _ in results)
+    assert sum(1 for _, shared in results if shared) == 7
+    print("✓ 8 threads, 1 execution, 7 coalesced")
+
+    # Tâches asyncio, plus un thread qui rejoint le même vol
+    async def slow_async():
+        executions.append(1)
+        await asyncio.sleep(0.1)
+        return "async result"
+
+    async def run():
+        thread_result = []
+        tasks = [asyncio.create_task(group.do_async("akey", slow_async)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        joiner = threading.Thread(target=lambda: thread_result.append(group.do("akey", slow_call)))
+        joiner.start()
+        values = await asyncio.gather(*tasks)
+        await asyncio.to_thread(joiner.join)
+        return values, thread_result
+
+    values, thread_result = asyncio.run(run())
+    assert len(executions) == 2
+    assert [v for v, _ in values] == ["async result"] * 5
+    assert thread_result == [("async result", True)]
+    print("✓ 5 tasks + 1 thread share one async execution")
+
+    # Une erreur est propagée à tous, puis la clé est libérée
+    def failing():
+        time.sleep(0.05)
+        raise RuntimeError("provider down")
+
+    errors = []
+
+    def call_failing():
+        try:
+            group.do("fail", failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call_failing) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == ["provider down"] * 3
+    assert group.in_flight() == 0
+
+    stats = group.get_stats()
+    assert stats["single_flight_coalesced"] == 7 + 5 + 2
+    print(f"✓ Errors shared, stats: {stats['single_flight_executions']} executions, "
+          f"{stats['single_flight_coalesced']} coalesced")
+
+
+def test_prefix_chained_keys():
+    """Test: clés incrémentales, stables et comparables par préfixe"""
+    print_section("TEST: Prefix-Chained Keys")
+
+    hasher = PrefixHasher()
+    conversation = [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": "List the files"},
+        {"role": "assistant", "content": "", "tool_calls": [{"id": "c1", "function": {"name": "ls"}}]},
+    ]
+
+    chains = hasher.chain(conversation)
+    assert hasher.hashed == 3
+
+    # Ajout d'un message à une copie de la liste: un seul nouveau hachage
+    extended = conversation + [{"role": "tool", "tool_call_id": "c1", "content": "a.py b.py"}]
+    extended_chains = hasher.chain(extended)
+    assert hasher.hashed == 4
+    assert extended_chains[:3] == chains, "Prefix digests must be shared"
+    print("✓ Appending one message hashes one message")
+
+    # Contenu identique, objets différents → même empreinte
+    copy = [dict(m) for m in extended]
+    assert PrefixHasher().chain(copy) == extended_chains
+    assert hasher.chain([conversation[1]]) != chains[:1], "Position in the chain matters"
+
+    # Modification sur place détectée, même à longueur égale
+    conversation[1]["content"] = "List the files in src"
+    assert hasher.chain(conversation)[1] != chains[1]
+    conversation[1]["content"] = "List the tiles"
+    assert hasher.chain(conversation)[1] == PrefixHasher().chain(conversation)[1] != chains[1]
+    conversation[2]["tool_calls"][0]["id"] = "c2"
+    assert hasher.chain(conversation)[2] == PrefixHasher().chain(conversation)[2]
+    print("✓ Digests depend on content and position, in-place edits detected (same length too)")
+
+    # Mémoïsation bornée, sans référence aux messages
+    bounded = PrefixHasher(max_entries=10, max_bytes=500)
+    bounded.chain([{"role": "user", "content": f"message {i} " * 5} for i in range(50)])
+    stats = bounded.get_stats()
+    assert 0 < stats["key_memo_entries"] <= 10 and stats["key_memo_bytes"] <= 500
+    print(f"✓ Memo bounded: {stats['key_memo_entries']} entries, {stats['key_memo_bytes']} bytes")
+
+    key = CacheManager._generate_key(extended, "nano")
+    assert key == CacheManager._generate_key([dict(m) for m in extended], "nano")
+    assert key != CacheManager._generate_key(extended, "deepseek")
+    print(f"✓ Cache key stable across copies ({key[:16]}...)")
+
+
+def test_cache_manager_temp_dir():
+    """Test: CacheManager(cache_dir=...) n'écrit rien sous data/"""
+    print_section("TEST: CacheManager Cache Dir")
+
+    cache_dir = tempfile.mkdtemp()
+    workdir = tempfile.mkdtemp()
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        cache = CacheManager(cache_dir=cache_dir, embedder=local_embedder())
+        messages = [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": "Explain the difference between a list and a tuple in Python"}
+        ]
+        cache.set(messages, "nano", "Lists are mutable.", tokens_used=120, cost=0.0001)
+
+        result = cache.get(messages, "nano")
+        assert result.hit and result.level == CacheLevel.L1_EXACT
+        paraphrase = [messages[0], {"role": "user", "content": messages[1]["content"].lower() + "?"}]
+        result = cache.get(paraphrase, "nano")
+        assert result.hit and result.level == CacheLevel.L2_SEMANTIC
+        print("✓ L1 and L2 hits served from the temporary directory")
+
+        assert os.listdir(os.path.join(cache_dir, "l2"))
+        assert not os.path.exists("data"), "Nothing written to the relative data/cache path"
+        print(f"✓ Cache files under {cache_dir}, none under data/")
+    finally:
+        os.chdir(previous_cwd)
+
+
+if __name__ == "__main__":
+    test_l2_semantic_cache()
+    test_l2_slot_guard()
+    test_l2_lru_eviction_and_persistence()
+    test_l3_template_extraction()
+    test_l3_template_cache()
+    test_l3_slot_free_answer_not_verified()
+    test_l3_nano_rewrite()
+    test_single_flight()
+    test_prefix_chained_keys()
+    test_cache_manager_temp_dir()
@@ -0,0 +1,261 @@
+"""
+Tests de la détection de clones (cortex/core/clone_detector.py)
+
+Teste:
+- Normalisation: renommages, constantes et docstrings n'empêchent pas la détection
+- Quasi-doublons: une instruction ajoutée baisse le score sans casser le cluster
+- LSH: mêmes paires qu'une comparaison de toutes les paires
+- Index incrémental: seuls les fichiers modifiés sont ré-analysés, index
+  supprimé reconstruit dans le même processus
+- HarmonizationAgent: clusters de clones dans _find_duplications
+"""
+
+import itertools
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from cortex.core.clone_detector import CloneDetector, fingerprint_source
+
+ORIGINAL = '''
+def load_orders(path, limit=100):
+    """Charge les commandes"""
+    orders = []
+    with open(path) as f:
+        for line in f:
+            fields = line.strip().split(",")
+            if len(fields) < 3:
+                continue
+            orders.append({"id": fields[0], "amount": float(fields[2])})
+            if len(orders) >= limit:
+                break
+    return orders
+'''
+
+RENAMED = '''
+class Importer:
+    def read_items(self, filename, maximum=50):
+        items = []
+        with open(filename) as handle:
+            for row in handle:
+                parts = row.strip().split(";")
+                if len(parts) < 4:
+                    continue
+                items.append({"key": parts[1], "value": float(parts[3])})
+                if len(items) >= maximum:
+                    break
+        return items
+'''
+
+EDITED = '''
+def load_orders_logged(path, limit=100):
+    orders = []
+    with open(path) as f:
+        for line in f:
+            fields = line.strip().split(",")
+            if len(fields) < 3:
+                continue
+            orders.append({"id": fields[0], "amount": float(fields[2])})
+            print("loaded", fields[0])
+            if len(orders) >= limit:
+                break
+    return orders
+'''
+
+UNRELATED = '''
+def retry(call, attempts=3, delay=0.5):
+    for attempt in range(attempts):
+        try:
+            return call()
+        except Exception as error:
+            if attempt == attempts - 1:
+                raise error
+            time.sleep(delay * 2 ** attempt)
+    return None
+'''
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def temp_project(files) -> Path:
+    root = Path(tempfile.mkdtemp())
+    for relative_path, source in files.items():
+        path = root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+    return root
+
+
+def detector(root: Path, **kwargs) -> CloneDetector:
+    return CloneDetector(root=root, roots=["cortex"], db_path=str(root / "clone_index.db"), **kwargs)
+
+
+def symbols(cluster):
+    return sorted(m["symbol"] for m in cluster.members)
+
+
+def test_normalization():
+    """Test: renommage d'identifiants, constantes et docstring ignorés"""
+    print_section("TEST: Normalization")
+
+    root = temp_project({
+        "cortex/orders.py": ORIGINAL,
+        "cortex/generated/importer.py": RENAMED,
+        "cortex/utils.py": UNRELATED,
+    })
+    clusters = detector(root).find_clones(min_similarity=0.8)
+    assert len(clusters) == 1
+    assert symbols(clusters[0]) == ["cortex.generated.importer:Importer.read_items", "cortex.orders:load_orders"]
+    assert clusters[0].similarity == 1.0 and clusters[0].pairs == 1
+    member = next(m for m in clusters[0].members if m["path"] == "cortex/orders.py")
+    assert (member["start_line"], member["end_line"]) == (2, 13)
+    print(f"✓ Renamed method detected as a clone of the function: {symbols(clusters[0])}")
+
+    assert fingerprint_source("def f(:\n", "cortex/broken.py") == []
+    assert fingerprint_source("def tiny(x):\n    return x\n", "cortex/tiny.py") == []
+    print("✓ Unparsable files and trivial functions are skipped")
+
+
+def test_near_duplicates():
+    """Test: une instruction ajoutée garde le clone au-dessus du seuil avec un score < 1"""
+    print_section("TEST: Near Duplicates")
+
+    root = temp_project({"cortex/orders.py": ORIGINAL, "cortex/orders_logged.py": EDITED})
+    clusters = detector(root).find_clones(min_similarity=0.6)
+    assert len(clusters) == 1 and 0.6 <= clusters[0].similarity < 1.0
+    print(f"✓ Edited copy found, similarity {clusters[0].similarity:.2f}")
+    assert detector(root).find_clones(min_similarity=0.99) == []
+    print("✓ Excluded above its similarity")
+
+
+def test_lsh_matches_all_pairs():
+    """Test: les buckets LSH retrouvent les paires d'une comparaison exhaustive"""
+    print_section("TEST: LSH vs All Pairs")
+
+    rng = random.Random(11)
+    statements = [
+        "total += {v}[{i}] * 2", "if {v} is None:\n        return []", "{v}.append(len({v}))",
+        "for item in {v}:\n        print(item)", "{v} = sorted({v}, reverse=True)",
+        "data = dict(zip({v}, range({i})))", "while {v}:\n        {v}.pop()", "result = [x + {i} for x in {v}]",
+        "try:\n        open({v})\n    except OSError:\n        pass", "assert isinstance({v}, list)",
+    ]
+
+    def body(seed_statements):
+        return "\n".join("    " + s.format(v=rng.choice("abcxyz"), i=rng.randint(1, 9)) for s in seed_statements)
+
+    files = {}
+    for family in range(30):
+        base = [rng.choice(statements) for _ in range(12)]
+        for copy in range(rng.randint(1, 3)):
+            variant = list(base)
+            if copy:
+                variant[rng.randrange(len(variant))] = rng.choice(statements)
+            files[f"cortex/f{family}_{copy}.py"] = f"def fn_{family}_{copy}(a, b, c, x, y, z):\n" \
+                                                  f"    total = 0\n{body(variant)}\n    return total\n"
+    root = temp_project(files)
+    found = detector(root)
+    found.sync()
+
+    index = found._load_index()
+    found._load_fingerprints(index, index.ids)
+    expected = set()
+    for i, j in itertools.combinations(range(len(index.ids)), 2):
+        a, b = index.fingerprints[int(index.ids[i])], index.fingerprints[int(index.ids[j])]
+        if len(a & b) / len(a | b) >= 0.8:
+            expected.add((i, j))
+    candidates = {tuple(pair) for pair in found._candidate_pairs(index.signatures).tolist()}
+    recall = len(expected & candidates) / len(expected)
+    total_pairs = len(index.ids) * (len(index.ids) - 1) // 2
+    assert expected and recall >= 0.95, recall
+    assert len(candidates) < total_pairs / 4
+    print(f"✓ Recall {recall:.0%} of {len(expected)} pairs, {len(candidates)}/{total_pairs} pairs compared")
+
+    clustered = {tuple(symbols(c)) for c in found.find_clones(min_similarity=0.8, sync=False)}
+    assert all(len({s.split(":")[1].rsplit("_", 1)[0] for s in c}) == 1 for c in clustered)
+    print(f"✓ {len(clustered)} clusters, each within one planted family")
+
+
+def test_incremental_sync():
+    """Test: seuls les fichiers modifiés sont ré-analysés"""
+    print_section("TEST: Incremental Sync")
+
+    root = temp_project({
+        "cortex/orders.py": ORIGINAL,
+        "cortex/importer.py": RENAMED,
+        "cortex/utils.py": UNRELATED,
+        "cortex/__pycache__/skip.py": ORIGINAL,
+    })
+    index = detector(root)
+    first = index.sync()
+    assert (first.files_scanned, first.files_changed, first.functions_indexed) == (3, 3, 3)
+    assert detector(root).sync().files_changed == 0
+    print("✓ Second sync (new instance) reads nothing")
+
+    os.utime(root / "cortex/utils.py", ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert index.sync().files_changed == 0
+    print("✓ Touched but identical file is not re-fingerprinted (sha256)")
+
+    (root / "cortex/utils.py").write_text(UNRELATED + ORIGINAL.replace("load_orders", "load_again"))
+    report = index.sync()
+    assert report.files_changed == 1 and report.functions_indexed == 2
+    assert symbols(index.find_clones(0.8, sync=False)[0]) == [
+        "cortex.importer:Importer.read_items", "cortex.orders:load_orders", "cortex.utils:load_again"
+    ]
+    (root / "cortex/importer.py").unlink()
+    report = index.sync()
+    assert report.files_deleted == 1
+    assert symbols(index.find_clones(0.8, sync=False)[0]) == ["cortex.orders:load_orders", "cortex.utils:load_again"]
+    print("✓ Modified file re-fingerprinted alone, deleted file removed from clusters")
+
+    assert len(index.find_clones(0.8, paths=["cortex/orders.py"])) == 1
+    assert index.find_clones(0.8, paths=["cortex/other.py"]) == []
+
+    rebuilt = detector(root, min_tokens=10)  # Paramètres différents: index reconstruit
+    assert rebuilt.sync().files_changed == 2
+    print("✓ Parameter change rebuilds the index")
+
+    for suffix in ("", "-wal", "-shm"):
+        Path(str(root / "clone_index.db") + suffix).unlink(missing_ok=True)
+    assert detector(root).sync().files_changed == 2
+    assert (root / "clone_index.db").exists()
+    print("✓ Deleted index recreated and refilled in the same process")
+
+
+def test_harmonizer_duplications():
+    """Test: _find_duplications rapporte les clusters de clones"""
+    print_section("TEST: HarmonizationAgent Clones")
+
+    from cortex.departments.maintenance.agents.harmonizer.harmonization_agent import HarmonizationAgent
+
+    root = temp_project({"cortex/agents/generated/orders_agent.py": ORIGINAL,
+                         "cortex/tools/generated/importer_tools.py": RENAMED})
+    previous_cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        agent = HarmonizationAgent(llm_client=None)
+        duplications = agent._find_duplications(agent._scan_architecture())
+        clones = [d for d in duplications if d['type'] == 'code_clone']
+        assert len(clones) == 1 and clones[0]['similarity'] == 1.0
+        assert "load_orders" in clones[0]['component1'] + clones[0]['component2']
+        recommendations = agent._generate_recommendations(agent._scan_architecture(), duplications, [], 90)
+        assert recommendations[0]['action'] == 'extract_shared_function'
+        assert (root / "cortex/data/clone_index.db").exists()
+        print(f"✓ {clones[0]['reason']}")
+    finally:
+        os.chdir(previous_cwd)
+
+
+if __name__ == "__main__":
+    test_normalization()
+    test_near_duplicates()
+    test_lsh_matches_all_pairs()
+    test_incremental_sync()
+    test_harmonizer_duplications()
+    print("\n✅ All clone detector tests passed")
@@ -0,0 +1,130 @@
+"""
+Tests du découpage AST (code_chunker)
+
+Teste:
+- Un chunk par classe (en-tête + signatures), méthode et fonction
+- IDs stables module:Classe.méthode et lignes exactes
+- Découpage en parties au-delà de max_tokens
+- Fichier invalide: un seul chunk module
+"""
+
+import textwrap
+
+from cortex.core.code_chunker import chunk_python_source, module_name
+from cortex.core.token_counter import count_tokens
+
+
+SOURCE = textwrap.dedent('''
+    """Billing helpers"""
+
+    import math
+
+    RATE = 0.2
+
+
+    class Invoice:
+        """An invoice"""
+
+        currency = "EUR"
+
+        def __init__(self, amount):
+            self.amount = amount
+
+        @property
+        def total(self):
+            """Amount with taxes"""
+            return math.ceil(self.amount * (1 + RATE))
+
+        @total.setter
+        def total(self, value):
+            self.amount = value / (1 + RATE)
+
+        class Line:
+            def price(self):
+                return 1
+
+
+    async def send(invoice):
+        return invoice.total
+
+
+    if __name__ == "__main__":
+        print(send(Invoice(10)))
+''').lstrip()
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def test_symbols_and_spans():
+    """Test: symboles stables, lignes exactes, en-tête de classe compact"""
+    print_section("TEST: Symbols + Spans")
+
+    assert module_name("cortex/core/llm_client.py") == "cortex.core.llm_client"
+    assert module_name("cortex/agents/__init__.py") == "cortex.agents"
+
+    chunks = chunk_python_source(SOURCE, "billing/invoice.py")
+    by_symbol = {c.symbol: c for c in chunks}
+    assert list(by_symbol) == [
+        "billing.invoice",
+        "billing.invoice:Invoice",
+        "billing.invoice:Invoice.__init__",
+        "billing.invoice:Invoice.total",
+        "billing.invoice:Invoice.total~2",
+        "billing.invoice:Invoice.Line",
+        "billing.invoice:Invoice.Line.price",
+        "billing.invoice:send",
+    ]
+
+    lines = SOURCE.splitlines()
+    for chunk in chunks:
+        if chunk.kind in ("method", "function"):
+            assert chunk.content == "\n".join(lines[chunk.start_line - 1:chunk.end_line]), chunk.symbol
+
+    total = by_symbol["billing.invoice:Invoice.total"]
+    assert total.content.startswith("    @property") and total.kind == "method"
+    assert total.parent == "billing.invoice:Invoice"
+    assert by_symbol["billing.invoice:Invoice.Line.price"].parent == "billing.invoice:Invoice.Line"
+    print("✓ 8 symbols with exact line spans")
+
+    header = by_symbol["billing.invoice:Invoice"]
+    assert 'currency = "EUR"' in header.content
+    assert "def total(self):" in header.content and '"""Amount with taxes"""' in header.content
+    assert "math.ceil" not in header.content, "Method bodies are not repeated in the class header"
+    assert (header.start_line, header.end_line) == (8, 27)
+
+    module = by_symbol["billing.invoice"]
+    assert "import math" in module.content and "RATE = 0.2" in module.content
+    assert "__main__" not in module.content
+    assert all(c.tokens == count_tokens(c.content) for c in chunks)
+    print("✓ Class header keeps attributes and signatures only")
+
+
+def test_token_cap_and_invalid_source():
+    """Test: parties ≤ max_tokens et contiguës, fichier invalide"""
+    print_section("TEST: Token Cap + Invalid Source")
+
+    body = "\n".join(f"    value_{i} = compute_something(value_{i - 1}, factor={i})" for i in range(1, 200))
+    source = f"def big(value_0):\n{body}\n    return value_199\n"
+    chunks = chunk_python_source(source, "big.py", max_tokens=200)
+
+    assert len(chunks) > 3
+    assert [c.symbol for c in chunks[:3]] == ["big:big", "big:big#2", "big:big#3"]
+    assert all(c.tokens <= 200 for c in chunks)
+    assert chunks[0].start_line == 1 and chunks[-1].end_line == 201
+    assert all(a.end_line + 1 == b.start_line for a, b in zip(chunks, chunks[1:]))
+    print(f"✓ 201-line function split into {len(chunks)} parts")
+
+    broken = chunk_python_source("def broken(:\n    pass\n", "broken.py")
+    assert [(c.symbol, c.kind) for c in broken] == [("broken", "module")]
+    print("✓ Unparseable file indexed as one module chunk")
+
+
+if __name__ == "__main__":
+    test_symbols_and_spans()
+    test_token_cap_and_invalid_source()
+    print("\n✅ All code chunker tests passed")
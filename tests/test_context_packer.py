@@ -0,0 +1,188 @@
+"""
+Tests du packer de contexte (cortex/core/context_packer.py)
+
+Teste:
+- Encodage par modèle (mis en cache), troncature au nombre de tokens
+- Sélection optimale (sac à dos) vs remplissage glouton, budget respecté
+- Doublons: identiques, contenus, recouvrements de fenêtres rognés
+- Extraits requis, troncature, manifeste
+- Intégrations: SmartContextBuilder, ConversationManager
+"""
+
+import itertools
+import random
+import tempfile
+from pathlib import Path
+
+from cortex.core.token_counter import (
+    count_tokens, encoding_for_model, get_model_encoder, truncate_to_tokens, DEFAULT_ENCODING
+)
+from cortex.core.context_packer import (
+    ContextPacker, Snippet, DUPLICATE, INCLUDED, OVER_BUDGET, TRIMMED, TRUNCATED
+)
+from cortex.core import global_context
+from cortex.core.global_context import GlobalContextManager
+from cortex.core.smart_context_builder import SmartContextBuilder
+from cortex.core.conversation_manager import ConversationManager
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def code_lines(start: int, end: int) -> str:
+    return "\n".join(f"def handler_{i}(request):\n    return dispatch_request(request, route={i})"
+                     for i in range(start, end))
+
+
+def test_model_encoders():
+    """Test: encodage par modèle, repli cl100k_base, encodeur partagé"""
+    print_section("TEST: Model Encoders")
+
+    assert encoding_for_model("claude-sonnet-4-20250514") == DEFAULT_ENCODING
+    assert encoding_for_model(None) == DEFAULT_ENCODING
+    assert encoding_for_model("gpt-4o-mini") in ("o200k_base", DEFAULT_ENCODING)
+    assert get_model_encoder("gpt-3.5-turbo") is get_model_encoder("gpt-3.5-turbo")
+    print(f"✓ gpt-4o-mini → {encoding_for_model('gpt-4o-mini')}, claude → {DEFAULT_ENCODING}")
+
+    text = "word " * 500
+    truncated = truncate_to_tokens(text, 50)
+    assert count_tokens(truncated) <= 50 and text.startswith(truncated)
+    assert truncate_to_tokens("short", 50) == "short"
+    print("✓ Truncation keeps a prefix within the token limit")
+
+
+def test_knapsack_selection():
+    """Test: pertinence totale optimale (force brute), budget jamais dépassé"""
+    print_section("TEST: Knapsack Selection")
+
+    rng = random.Random(3)
+    packer = ContextPacker(separator="", resolution=10_000)
+    for trial in range(30):
+        snippets = [
+            Snippet(" ".join(f"t{trial}w{i}x{j}" for j in range(rng.randint(5, 80))),
+                    relevance=round(rng.random(), 3), source=str(i))
+            for i in range(8)
+        ]
+        budget = rng.randint(50, 300)
+        packed = packer.pack(snippets, budget)
+        assert packed.tokens <= budget
+
+        # Optimum par force brute, au budget moins une marge d'un token par
+        # jonction (le texte assemblé peut compter un peu plus que ses parties)
+        weights = [packer.count(s.content) for s in snippets]
+        best = max(
+            sum(snippets[i].relevance for i in combo)
+            for r in range(len(snippets) + 1)
+            for combo in itertools.combinations(range(len(snippets)), r)
+            if sum(weights[i] for i in combo) <= budget - len(snippets)
+        )
+        assert packed.relevance >= best - 1e-6, (trial, packed.relevance, best)
+    print("✓ Optimal total relevance on 30 random instances")
+
+    # Glouton: le gros extrait le plus pertinent bloque deux petits meilleurs ensemble
+    big = Snippet("alpha " * 90, relevance=0.9, source="big")
+    small = [Snippet(f"beta{i} " * 45, relevance=0.6, source=f"small{i}") for i in range(2)]
+    packed = ContextPacker(separator="").pack([big] + small, packer.count(big.content) + 5)
+    assert [e["source"] for e in packed.included] == ["small0", "small1"]
+    print("✓ Two smaller snippets beat one larger, more relevant one")
+
+
+def test_dedupe():
+    """Test: doublons identiques, contenus, recouvrements rognés"""
+    print_section("TEST: Dedupe")
+
+    snippets = [
+        Snippet(code_lines(0, 20), relevance=0.9, source="window-1"),
+        Snippet(code_lines(15, 35), relevance=0.7, source="window-2"),
+        Snippet(code_lines(0, 20), relevance=0.5, source="same-chunk-other-type"),
+        Snippet(code_lines(2, 12), relevance=0.8, source="contained"),
+    ]
+    packed = ContextPacker().pack(snippets, 10_000)
+    status = {e["source"]: e["status"] for e in packed.manifest}
+    assert status == {"window-1": INCLUDED, "window-2": TRIMMED,
+                      "same-chunk-other-type": DUPLICATE, "contained": DUPLICATE}, status
+    assert packed.manifest[2]["duplicate_of"] == 0
+    assert packed.text.count("route=15)") == 1 and "route=34)" in packed.text
+    print("✓ Identical and contained snippets dropped, overlapping window trimmed")
+
+    assert ContextPacker(dedupe=False).pack(snippets, 10_000).text.count("route=15)") == 3
+    print("✓ Dedupe can be disabled")
+
+
+def test_required_and_manifest():
+    """Test: requis toujours inclus (tronqués si besoin), extraits tronqués, manifeste"""
+    print_section("TEST: Required + Manifest")
+
+    packer = ContextPacker(max_snippet_tokens=40)
+    packed = packer.pack([
+        Snippet("base project context", required=True, source="base"),
+        Snippet("lorem " * 200, relevance=0.9, source="long", header="[CODE] long.py"),
+        Snippet("unrelated " * 200, relevance=0.1, source="noise"),
+    ], budget=60)
+    status = {e["source"]: e["status"] for e in packed.manifest}
+    assert status == {"base": INCLUDED, "long": TRUNCATED, "noise": OVER_BUDGET}, status
+    assert packed.text.startswith("base project context\n\n[CODE] long.py\nlorem")
+    assert packed.tokens <= 60 and packed.manifest[1]["original_tokens"] > 40 >= packed.manifest[1]["tokens"]
+    assert [s.source for s in packed.snippets] == ["base", "long"]
+    print(f"✓ {packed.tokens}/60 tokens, manifest: {status}")
+
+    packed = packer.pack([Snippet("x " * 500, required=True)], budget=20)
+    assert packed.tokens <= 20 and packed.manifest[0]["status"] == TRUNCATED
+    print("✓ Required snippet truncated to the budget")
+
+
+class FakeKnowledgeBase:
+    """Recherche factice: le même chunk remonte sous plusieurs types"""
+
+    def search(self, query, n_results=5, filter_type=None):
+        docs = [code_lines(0, 10), code_lines(40, 50), "Workflow: run tests then deploy " * 3]
+        files = ["cortex/core/router.py", "cortex/core/handlers.py", "docs/workflow.md"]
+        return {
+            "documents": [docs],
+            "metadatas": [[{"file": f} for f in files]],
+            "distances": [[0.3, 0.9, 1.4]]
+        }
+
+
+def test_integrations():
+    """Test: SmartContextBuilder et ConversationManager passent par le packer"""
+    print_section("TEST: Integrations")
+
+    # Projet et état système temporaires: cortex/data/global_context.json reste intact
+    workdir = Path(tempfile.mkdtemp())
+    previous = global_context._global_context_manager
+    global_context._global_context_manager = GlobalContextManager(workdir / "global_context.json")
+    try:
+        builder = SmartContextBuilder(workdir, knowledge_base=FakeKnowledgeBase())
+        context = builder.build_context("fix the router", budget=400)
+    finally:
+        global_context._global_context_manager = previous
+    assert count_tokens(context) <= 400
+    assert context.count("route=0)") == 1, "Same chunk found under 4 types is injected once"
+    assert "[RELEVANT CONTEXT]" in context and context.startswith("[PROJECT CONTEXT]")
+    duplicates = [e for e in builder.get_last_quality_report()["manifest"] if e["status"] == DUPLICATE]
+    assert len(duplicates) >= 3
+    print(f"✓ SmartContextBuilder: {count_tokens(context)} tokens, {len(duplicates)} duplicates dropped")
+
+    manager = ConversationManager(llm_client=None, storage_path=str(Path(tempfile.mkdtemp()) / "history.json"))
+    for i in range(20):
+        manager.add_message("user" if i % 2 == 0 else "assistant", f"message {i} " + "detail " * 30)
+    messages = manager.get_context_for_llm(max_tokens=200)
+    assert messages[-1]["content"].startswith("message 19")
+    assert sum(count_tokens(m["content"]) for m in messages) <= 200
+    kept = [int(m["content"].split()[1]) for m in messages]
+    assert kept == sorted(kept) and min(kept) > 10, kept
+    print(f"✓ ConversationManager keeps the most recent messages: {kept}")
+
+
+if __name__ == "__main__":
+    test_model_encoders()
+    test_knapsack_selection()
+    test_dedupe()
+    test_required_and_manifest()
+    test_integrations()
+    print("\n✅ All context packer tests passed")
@@ -0,0 +1,171 @@
+"""
+Tests de l'index de contextes (ContextStore / ContextManager)
+
+Teste:
+- Top-k exact (comparé à une recherche brute force)
+- Croissance de la matrice en ajout seul, persistance à la réouverture
+- Suppression, éviction et compaction (les ids restent cohérents)
+- Ids répétés dans un lot: la dernière occurrence l'emporte, aucun vecteur orphelin
+- Migration de l'ancien context_cache.json
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from cortex.core.context_store import ContextStore
+from cortex.core.context_manager import ContextManager
+from cortex.core.embeddings import Embedder, HashingBackend
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def random_items(n: int, dimensions: int, seed: int = 0, prefix: str = "ctx"):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dimensions)).astype(np.float32)
+    return [
+        {"id": f"{prefix}_{i}", "content": f"content {i}", "embedding": vectors[i], "metadata": {"i": i}}
+        for i in range(n)
+    ], vectors
+
+
+def test_exact_top_k():
+    """Test: le top-k vectorisé correspond à la recherche brute force"""
+    print_section("TEST: Exact Top-K")
+
+    store = ContextStore(tempfile.mkdtemp(), dimensions=16, initial_capacity=8)
+    items, vectors = random_items(500, 16)
+    store.add_many(items[:200])
+    for item in items[200:]:
+        store.add(item["id"], item["content"], item["embedding"], item["metadata"])
+
+    assert len(store) == 500
+    assert store.capacity >= 500, "Matrix should grow by doubling"
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    query = np.random.default_rng(1).standard_normal(16).astype(np.float32)
+    expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+
+    hits = store.search(query, top_k=5, threshold=-1.0)
+    assert [row for row, _ in hits] == expected.tolist()
+    assert all(a[1] >= b[1] for a, b in zip(hits, hits[1:]))
+
+    records = store.get_rows([row for row, _ in hits])
+    assert records[hits[0][0]]["id"] == f"ctx_{expected[0]}"
+    print("✓ Top-5 over 500 contexts matches brute force")
+
+    # Seuil: aucun résultat sous la similarité minimum
+    assert store.search(query, top_k=5, threshold=1.01) == []
+    print("✓ Threshold filters results")
+
+
+def test_persistence_and_compaction():
+    """Test: pierres tombales, compaction, éviction, réouverture"""
+    print_section("TEST: Persistence + Compaction")
+
+    path = tempfile.mkdtemp()
+    store = ContextStore(path, dimensions=8, max_entries=1000, compaction_ratio=0.25)
+    items, _ = random_items(100, 8)
+    store.add_many(items)
+
+    # Suppression sous le seuil de compaction → pierres tombales
+    for i in range(20):
+        assert store.remove(f"ctx_{i}")
+    assert len(store) == 80
+    assert store.count == 100
+    assert all(store.get_rows([row])[row]["id"] != "ctx_0" for row, _ in store.search(items[0]["embedding"], 3, -1.0))
+    print("✓ Removed contexts are excluded from search")
+
+    # Au-delà de 25% de lignes mortes → compaction
+    for i in range(20, 30):
+        store.remove(f"ctx_{i}")
+    assert store.count == 74, "Compaction at the 26th dead row, 4 tombstones since"
+    store.compact()
+    assert store.count == len(store) == 70
+    row, similarity = store.search(items[50]["embedding"], top_k=1, threshold=-1.0)[0]
+    assert store.get_rows([row])[row]["id"] == "ctx_50"
+    assert similarity > 0.999
+    print("✓ Compaction keeps ids and vectors aligned")
+
+    store.increment_usage(["ctx_50", "ctx_50", "ctx_60"])
+    store.close()
+
+    reopened = ContextStore(path, dimensions=8, max_entries=75)
+    assert len(reopened) == 70
+    stats = reopened.get_stats()
+    assert stats["most_used"]["id"] == "ctx_50" and stats["most_used"]["usage_count"] == 2
+    print("✓ Reopened index keeps contexts and usage counts")
+
+    # Éviction: les moins utilisés partent en premier
+    extra, _ = random_items(10, 8, seed=2, prefix="new")
+    reopened.add_many(extra)
+    assert len(reopened) == 75
+    kept = {record["id"] for record in reopened.get_rows(list(range(reopened.count))).values()}
+    assert {"ctx_50", "ctx_60"} <= kept
+    print("✓ Least used contexts evicted beyond max_entries")
+
+
+def test_duplicate_ids_in_batch():
+    """Test: add_many avec un id répété n'écrit qu'une ligne (dernière occurrence)"""
+    print_section("TEST: Duplicate Ids In Batch")
+
+    path = tempfile.mkdtemp()
+    store = ContextStore(path, dimensions=8)
+    items, vectors = random_items(3, 8)
+    batch = [items[0], items[1], dict(items[2], id="ctx_0", content="latest")]
+    rows = store.add_many(batch)
+
+    assert rows[0] == rows[2] != rows[1]
+    assert len(store) == store.count == 2, "No vector written for the overridden occurrence"
+    assert store.get_rows([rows[0]])[rows[0]]["content"] == "latest"
+    row, similarity = store.search(vectors[2], top_k=1, threshold=-1.0)[0]
+    assert row == rows[0] and similarity > 0.999
+    print(f"✓ Rows {rows}: last occurrence wins, vectors and rows aligned")
+    store.close()
+
+    reopened = ContextStore(path, dimensions=8)
+    assert len(reopened) == reopened.count == 2
+    print("✓ Reopened store has no orphaned rows")
+
+
+def test_context_manager_migration():
+    """Test: ContextManager migre (et ré-encode) le JSON puis cherche dans l'index"""
+    print_section("TEST: ContextManager Migration")
+
+    directory = Path(tempfile.mkdtemp())
+    legacy = directory / "context_cache.json"
+    legacy.write_text(json.dumps({"contexts": [{
+        "id": "ctx_1_legacy", "content": "Fixed the authentication bug in the login function with JWT validation",
+        "embedding": [0.1] * 11, "metadata": {"type": "bugfix"},
+        "created_at": "2025-01-01T00:00:00", "usage_count": 3
+    }]}))
+
+    manager = ContextManager(None, str(legacy), embedder=Embedder(HashingBackend(256)))
+    assert not legacy.exists() and legacy.with_suffix(".json.migrated").exists()
+    assert len(manager.store) == 1, "Legacy keyword embeddings are re-encoded"
+
+    manager.add_to_cache("What is the weather today?", {"type": "chat"})
+    results = manager.search_cache_by_embedding("fix the authentication bug in the login function", top_k=1)
+    assert results and results[0][0].id == "ctx_1_legacy"
+    assert results[0][0].usage_count == 3
+    print(f"✓ Legacy context migrated and found (similarity: {results[0][1]:.2f})")
+
+    # Autre modèle d'embedding: l'index repart de zéro
+    other = ContextManager(None, str(directory / "context_cache"), embedder=Embedder(HashingBackend(128)))
+    assert len(other.store) == 0
+    print("✓ Index reset when the embedding model changes")
+
+
+if __name__ == "__main__":
+    test_exact_top_k()
+    test_persistence_and_compaction()
+    test_duplicate_ids_in_batch()
+    test_context_manager_migration()
+    print("\n✅ All context store tests passed")
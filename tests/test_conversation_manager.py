@@ -0,0 +1,283 @@
+"""
+Tests du gestionnaire de conversation (cortex/core/conversation_manager.py)
+
+Teste:
+- Journal JSONL en ajout seul (jamais réécrit), tokens par message en cache
+- Résumés en arrière-plan: add_message ne bloque pas sur le LLM
+- Résumé global incrémental: seuls les nouveaux résumés sont relus
+- Contexte LLM: suffixe contigu des derniers messages, sac à dos sur le reste
+- Rechargement après redémarrage, migration de l'ancien JSON
+"""
+
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from cortex.core import conversation_manager as cm
+from cortex.core.conversation_manager import ConversationManager
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+class FakeLLM:
+    """Client LLM factice: latence configurable, prompts enregistrés"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.prompts = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def complete(self, messages, **kwargs):
+        self.release.wait()
+        time.sleep(self.latency)
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        label = "GLOBAL" if "RÉSUMÉ GLOBAL" in prompt else "SECTION"
+        return SimpleNamespace(content=f"{label} summary #{len(self.prompts)}")
+
+
+def temp_path(name: str = "history.jsonl") -> str:
+    return str(Path(tempfile.mkdtemp()) / name)
+
+
+def fill(manager, count: int, words: int = 100):
+    for i in range(count):
+        manager.add_message("user" if i % 2 == 0 else "assistant", f"message {i} " + "detail " * words)
+
+
+def test_append_only_log():
+    """Test: chaque message ajoute une ligne, les lignes existantes ne changent pas"""
+    print_section("TEST: Append-only Log")
+
+    path = temp_path()
+    manager = ConversationManager(FakeLLM(), storage_path=path, background=False)
+    manager.add_message("user", "first")
+    before = Path(path).read_bytes()
+    manager.add_message("assistant", "second")
+    after = Path(path).read_bytes()
+    assert after.startswith(before) and len(after.splitlines()) == 2
+    record = json.loads(after.splitlines()[1])
+    assert record["type"] == "message" and record["role"] == "assistant" and record["tokens"] > 0
+    print(f"✓ {len(after)} bytes, one line per message")
+
+    manager.clear_history()
+    assert Path(path).read_bytes() == b"" and manager.get_statistics()["total_tokens"] == 0
+    print("✓ clear_history truncates the log")
+    manager.close()
+
+
+def test_token_counts_cached(monkeypatch=None):
+    """Test: total tenu à jour, rechargement sans recompter les messages"""
+    print_section("TEST: Cached Token Counts")
+
+    path = temp_path()
+    manager = ConversationManager(None, storage_path=path)
+    fill(manager, 10, words=20)
+    total = manager.get_statistics()["total_tokens"]
+    assert total == sum(manager.current_section.message_tokens)
+    manager.close()
+
+    calls = []
+    original = cm.count_tokens
+    cm.count_tokens = lambda text, *a, **k: calls.append(text) or original(text, *a, **k)
+    try:
+        reloaded = ConversationManager(None, storage_path=path)
+    finally:
+        cm.count_tokens = original
+    assert calls == [], "Reload reads token counts from the log"
+    assert reloaded.get_statistics()["total_tokens"] == total
+    assert len(reloaded.current_section.messages) == 10
+    print(f"✓ {total} tokens restored without recounting")
+    reloaded.close()
+
+
+def test_background_summaries():
+    """Test: un LLM lent ne bloque pas add_message; les sections sont résumées une fois"""
+    print_section("TEST: Background Summaries")
+
+    llm = FakeLLM(latency=0.2)
+    manager = ConversationManager(llm, storage_path=temp_path())
+    manager.SECTION_TOKEN_THRESHOLD = 500
+    start = time.perf_counter()
+    fill(manager, 13)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.2, f"add_message waited on the LLM ({elapsed:.2f}s)"
+    assert manager.get_statistics()["pending_summaries"] >= 1
+    print(f"✓ 13 messages added in {elapsed * 1000:.1f}ms with a 200ms LLM")
+
+    # Résumé en attente: les messages bruts de la section close restent disponibles
+    contents = [m["content"] for m in manager.get_context_for_llm(max_tokens=5000)]
+    assert any(c.startswith("message 0 ") for c in contents)
+
+    assert manager.wait_for_summaries(timeout=5)
+    stats = manager.get_statistics()
+    assert stats["pending_summaries"] == 0 and len(llm.prompts) == len(manager.sections)
+    assert all(s.summary and not s.messages for s in manager.sections)
+    context = manager.get_context_for_llm(max_tokens=5000)
+    assert context[0]["content"].startswith("SECTION PRÉCÉDENTE") and context[-1]["content"].startswith("message 12")
+    print(f"✓ {len(manager.sections)} sections summarized once each, raw messages released")
+    manager.close()
+
+
+def test_incremental_global_summary():
+    """Test: la fusion relit le résumé global précédent + les nouveaux résumés seulement"""
+    print_section("TEST: Incremental Global Summary")
+
+    llm = FakeLLM()
+    manager = ConversationManager(llm, storage_path=temp_path(), background=False)
+    manager.SECTION_TOKEN_THRESHOLD = 300
+    manager.GLOBAL_TOKEN_THRESHOLD = 600
+    fill(manager, 24)
+
+    global_prompts = [p for p in llm.prompts if "RÉSUMÉ GLOBAL" in p]
+    assert len(global_prompts) >= 2
+    first, second = global_prompts[0], global_prompts[1]
+    assert "RÉSUMÉ GLOBAL PRÉCÉDENT" not in first
+    assert "RÉSUMÉ GLOBAL PRÉCÉDENT" in second
+    # Les sections déjà intégrées ne sont pas relues
+    first_sections = {line for line in first.splitlines() if line.startswith("Section ")}
+    second_sections = {line for line in second.splitlines() if line.startswith("Section ")}
+    assert first_sections and not (first_sections & second_sections)
+    assert manager.global_covers > 0 and manager.global_summary.startswith("GLOBAL")
+    print(f"✓ {len(global_prompts)} folds, {manager.global_covers} sections covered, no section re-read")
+
+    context = manager.get_context_for_llm(max_tokens=5000)
+    assert context[0]["content"].startswith("CONTEXTE GLOBAL PRÉCÉDENT")
+    manager.close()
+
+
+def test_failed_summary_retried():
+    """Test: un résumé de section en échec est repris au message suivant, la fusion repart"""
+    print_section("TEST: Failed Summary Retried")
+
+    class FlakyLLM(FakeLLM):
+        def __init__(self):
+            super().__init__()
+            self.failures = 1
+
+        def complete(self, messages, **kwargs):
+            if self.failures and "RÉSUMÉ GLOBAL" not in messages[0]["content"]:
+                self.failures -= 1
+                raise ConnectionError("provider unavailable")
+            return super().complete(messages, **kwargs)
+
+    llm = FlakyLLM()
+    manager = ConversationManager(llm, storage_path=temp_path(), background=False)
+    manager.SECTION_TOKEN_THRESHOLD = 300
+    manager.GLOBAL_TOKEN_THRESHOLD = 600
+    fill(manager, 2)  # Section close, résumé en échec
+    assert manager.sections[0].summary is None and llm.failures == 0
+
+    fill(manager, 12)
+    assert all(section.summary for section in manager.sections)
+    assert manager.global_covers > 0, "Global fold no longer waits on the failed section"
+    print(f"✓ Failed section re-summarized, {manager.global_covers} sections folded")
+    manager.close()
+
+
+def test_recent_suffix_contiguous():
+    """Test: un long message récent n'est pas sauté au profit de messages plus anciens"""
+    print_section("TEST: Contiguous Recent Suffix")
+
+    manager = ConversationManager(None, storage_path=temp_path(), background=False)
+    for i in range(10):
+        manager.add_message("user" if i % 2 == 0 else "assistant",
+                            f"message {i} " + "detail " * (100 if i == 7 else 15))
+    sizes = manager.current_section.message_tokens
+    budget = sum(sizes[4:]) + sizes[0] // 2  # Le sac à dos préférerait 8 petits messages sans le 7
+
+    context = manager.get_context_for_llm(max_tokens=budget)
+    numbers = [int(m["content"].split()[1]) for m in context]
+    assert numbers == [4, 5, 6, 7, 8, 9], numbers
+    assert sum(manager.packer.count(m["content"]) for m in context) <= budget
+    recent = [e for e in manager.last_manifest if e["kind"] == "recent_message"]
+    assert len(recent) == 6 and all(e["included"] for e in recent)
+    print(f"✓ Messages {numbers}: long message 7 kept, suffix contiguous")
+
+    # Avec des résumés, le suffixe leur laisse de la place
+    manager.global_summary = "decisions " * 20
+    context = manager.get_context_for_llm(max_tokens=budget)
+    assert context[0]["content"].startswith("CONTEXTE GLOBAL PRÉCÉDENT")
+    numbers = [int(m["content"].split()[1]) for m in context[1:]]
+    assert numbers == list(range(numbers[0], 10)) and numbers[0] > 4, numbers
+    print(f"✓ With a global summary: summary + messages {numbers}")
+
+    manager.global_summary = None
+    context = manager.get_context_for_llm(max_tokens=40)
+    assert [m["content"].split()[1] for m in context] == ["9"]
+    print("✓ Small budget keeps the last message")
+    manager.close()
+
+
+def test_reload_and_migration():
+    """Test: état restauré depuis le journal; ancien JSON migré une fois"""
+    print_section("TEST: Reload + Migration")
+
+    path = temp_path()
+    manager = ConversationManager(FakeLLM(), storage_path=path, background=False)
+    manager.SECTION_TOKEN_THRESHOLD = 300
+    fill(manager, 8)
+    stats = manager.get_statistics()
+    manager.close()
+
+    reloaded = ConversationManager(FakeLLM(), storage_path=path, background=False)
+    reloaded.SECTION_TOKEN_THRESHOLD = 300
+    assert reloaded.get_statistics() == stats
+    assert [s.summary for s in reloaded.sections] == [s.summary for s in manager.sections]
+    reloaded.close()
+    print(f"✓ Restored {stats['total_sections']} sections, {stats['total_tokens']} tokens")
+
+    legacy = Path(temp_path("conversation_history.json"))
+    legacy.write_text(json.dumps({
+        "sections": [{"id": "section_1", "messages": [{"role": "user", "content": "old question"}],
+                      "summary": "old summary", "token_count": 2, "created_at": "2025-01-01T00:00:00"}],
+        "current_section": {"id": "section_2", "messages": [{"role": "assistant", "content": "old answer"}],
+                            "summary": None, "token_count": 2, "created_at": "2025-01-01T00:01:00"},
+        "global_summary": None
+    }))
+    migrated = ConversationManager(FakeLLM(), storage_path=str(legacy))
+    assert migrated.storage_path.suffix == ".jsonl" and migrated.storage_path.exists()
+    assert migrated.sections[0].summary == "old summary"
+    assert migrated.current_section.messages == [{"role": "assistant", "content": "old answer"}]
+    migrated.close()
+    print("✓ Legacy JSON history migrated to the log")
+
+    legacy = Path(temp_path("conversation_history.json"))
+    legacy.write_text(json.dumps({
+        "sections": [{"id": f"section_{i}", "messages": [], "summary": f"old summary {i}", "token_count": 400,
+                      "created_at": "2025-01-01T00:00:00"} for i in (1, 2)],
+        "current_section": {"id": "section_3", "messages": [{"role": "user", "content": "old question"}],
+                            "summary": None, "token_count": 2, "created_at": "2025-01-01T00:01:00"},
+        "global_summary": "old global"
+    }))
+    llm = FakeLLM()
+    migrated = ConversationManager(llm, storage_path=str(legacy), background=False)
+    assert migrated.global_covers == 2
+    assert "old global" in migrated.global_summary and "old summary 2" in migrated.global_summary
+    migrated.SECTION_TOKEN_THRESHOLD = 300
+    migrated.GLOBAL_TOKEN_THRESHOLD = 600
+    fill(migrated, 12)
+    folds = [p for p in llm.prompts if "RÉSUMÉ GLOBAL" in p]
+    assert folds and not any("old summary" in p.split("NOUVELLES SECTIONS:")[1] for p in folds)
+    migrated.close()
+    print("✓ Migrated global summary covers the legacy sections it contains")
+
+
+if __name__ == "__main__":
+    test_append_only_log()
+    test_token_counts_cached()
+    test_background_summaries()
+    test_incremental_global_summary()
+    test_failed_summary_retried()
+    test_recent_suffix_contiguous()
+    test_reload_and_migration()
+    print("\n✅ All conversation manager tests passed")
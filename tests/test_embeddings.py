@@ -0,0 +1,115 @@
+"""
+Tests de l'encodeur d'embeddings partagé
+
+Teste:
+- Backend hashing: vecteurs normalisés, textes proches plus similaires
+- Encodage par lots (taille de lot respectée, doublons encodés une fois)
+- Mémo disque: un texte identique n'est jamais ré-encodé, même après redémarrage
+- Partage: le cache L2 et ContextManager utilisent l'encodeur fourni
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from cortex.core.embeddings import Embedder, EmbeddingBackend, HashingBackend, hashing_embedding
+from cortex.core.context_manager import ContextManager
+from cortex.cache.semantic_cache import SemanticCache
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+class CountingBackend(EmbeddingBackend):
+    """Backend hashing qui enregistre les lots reçus"""
+
+    def __init__(self):
+        self.inner = HashingBackend(64)
+        self.name = "counting-64"
+        self.dimensions = 64
+        self.batches = []
+
+    def encode(self, texts):
+        self.batches.append(list(texts))
+        return self.inner.encode(texts)
+
+
+def test_hashing_backend():
+    """Test: vecteurs de norme 1, paraphrase plus proche qu'un texte sans rapport"""
+    print_section("TEST: Hashing Backend")
+
+    backend = HashingBackend(512)
+    vectors = backend.encode([
+        "Fix the authentication bug in login.py",
+        "fix authentication bug in the login module",
+        "What is the weather in Paris tomorrow?",
+        ""
+    ])
+    assert vectors.shape == (4, 512) and vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1.0, atol=1e-5)
+    assert not vectors[3].any(), "Empty text gives a null vector"
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2] + 0.3
+    assert np.allclose(hashing_embedding("Fix the authentication bug in login.py"), vectors[0])
+    print(f"✓ Paraphrase {vectors[0] @ vectors[1]:.2f} vs unrelated {vectors[0] @ vectors[2]:.2f}")
+
+
+def test_batching_and_memo():
+    """Test: lots bornés, doublons dédupliqués, mémo disque persistant"""
+    print_section("TEST: Batching + Memo")
+
+    memo_path = str(Path(tempfile.mkdtemp()) / "embeddings.db")
+    backend = CountingBackend()
+    embedder = Embedder(backend, memo_path=memo_path, batch_size=4)
+
+    texts = [f"document number {i}" for i in range(10)] + ["document number 0"] * 5
+    vectors = embedder.embed_many(texts)
+
+    assert vectors.shape == (15, 64)
+    assert [len(b) for b in backend.batches] == [4, 4, 2], "10 unique texts in batches of 4"
+    assert np.array_equal(vectors[10], vectors[0])
+    print(f"✓ 15 texts → {sum(len(b) for b in backend.batches)} encoded in {len(backend.batches)} batches")
+
+    # Même processus: LRU mémoire
+    embedder.embed_many(texts[:3])
+    assert len(backend.batches) == 3
+    assert embedder.get_stats()["embedding_memory_hits"] >= 3
+
+    # Nouveau processus: mémo disque, aucun ré-encodage
+    restarted_backend = CountingBackend()
+    restarted = Embedder(restarted_backend, memo_path=memo_path)
+    again = restarted.embed_many(texts + ["a brand new document"])
+    assert restarted_backend.batches == [["a brand new document"]]
+    assert np.array_equal(again[:15], vectors)
+    assert restarted.get_stats()["embedding_disk_hits"] == 10
+    print("✓ Restarted embedder served 10 texts from the disk memo")
+
+
+def test_shared_embedder():
+    """Test: cache L2 et ContextManager encodent avec le même encodeur"""
+    print_section("TEST: Shared Embedder")
+
+    backend = CountingBackend()
+    embedder = Embedder(backend)
+
+    cache = SemanticCache(path=tempfile.mkdtemp(), embedder=embedder, max_entries=10, similarity_threshold=0.9)
+    assert cache.dimensions == 64
+    cache.add("nano:x", "explain python decorators", {"content": "answer", "tokens": 10, "cost": 0.0})
+
+    manager = ContextManager(None, tempfile.mkdtemp(), embedder=embedder)
+    assert len(manager.create_embedding("explain python decorators")) == 64
+    assert sum(len(b) for b in backend.batches) == 1, "Second consumer hits the shared memo"
+
+    assert cache.lookup("nano:x", "explain python decorators")["content"] == "answer"
+    print("✓ L2 cache and ContextManager share encodings")
+
+
+if __name__ == "__main__":
+    test_hashing_backend()
+    test_batching_and_memo()
+    test_shared_embedder()
+    print("\n✅ All embedding tests passed")
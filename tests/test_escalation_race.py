@@ -0,0 +1,215 @@
+"""
+Tests de l'escalade en course (BaseAgent.execute_with_escalation mode="race")
+
+Teste contre un provider local factice:
+- Tâche facile: nano gagne, le stream deepseek est fermé sans évaluation
+- Tâche difficile: hedge claude après le délai, première réponse valide gagne
+- Plafond de coût: pas de tentative supplémentaire au-delà du budget
+- Tools: pas de course avec des tools à effets de bord; un perdant en
+  boucle de tools read_only s'arrête dès que la course est décidée
+"""
+
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openai import OpenAI
+from anthropic import Anthropic
+
+from cortex.core import cortex_logger
+from cortex.core.cortex_logger import CortexLogger
+from cortex.core.llm_client import LLMClient
+from cortex.core.model_router import ModelTier
+from cortex.agents.base_agent import AgentConfig, BaseAgent
+from cortex.tools.standard_tool import tool
+from tests.fake_provider import FakeProvider
+
+
+RANK = {"easy": 0, "medium": 1, "hard": 2, "nano": 0, "deepseek": 1, "claude": 2}
+# (délai premier token, délai entre mots): deepseek génère lentement
+PROFILES = {"nano": (0.05, 0.004), "deepseek": (0.1, 0.02), "claude": (0.1, 0.004)}
+
+
+_previous_logger = None
+
+
+def setup_module(module=None):
+    """Journalise les résultats de routage dans un dossier temporaire"""
+    global _previous_logger
+    _previous_logger = cortex_logger._global_logger
+    cortex_logger._global_logger = CortexLogger(log_dir=Path(tempfile.mkdtemp()))
+
+
+def teardown_module(module=None):
+    cortex_logger._global_logger = _previous_logger
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def responder(path, body):
+    text = json.dumps(body.get("messages", []))
+    if "quality assessor" in text:
+        difficulty = re.search(r"difficulty=(\w+)", text).group(1)
+        tier = re.search(r"answer from (\w+)", text).group(1)
+        score = 8.0 if RANK[tier] >= RANK[difficulty] else 3.0
+        return {"text": json.dumps({"score": score, "confidence": 0.9, "suggested_tier": None}),
+                "first_token_delay": 0, "chunk_delay": 0}
+
+    tier = "claude" if path.endswith("/messages") else ("deepseek" if "deepseek" in body.get("model", "") else "nano")
+    words = " ".join(f"w{i}" for i in range(60))
+    first_token, per_word = PROFILES[tier]
+    return {"text": f"answer from {tier} {words}", "first_token_delay": first_token, "chunk_delay": per_word}
+
+
+def make_agent(provider, **settings):
+    client = LLMClient(use_cache=False)
+    client.openai_client = OpenAI(api_key="test", base_url=provider.openai_url, max_retries=0)
+    client.deepseek_client = OpenAI(api_key="test", base_url=provider.openai_url, max_retries=0)
+    client.anthropic_client = Anthropic(api_key="test", base_url=provider.anthropic_url, max_retries=0, timeout=30)
+    agent = BaseAgent(
+        AgentConfig(name="RaceAgent", role="Test", description="", base_prompt="Answer.",
+                    tier_preference=ModelTier.NANO),
+        llm_client=client,
+        print_updates=False
+    )
+    agent.escalation_settings.update({
+        "race_tiers": ["nano", "deepseek"], "hedge_tier": "claude",
+        "hedge_delay_seconds": 0.6, "race_cost_cap": 1.0, **settings
+    })
+    return agent
+
+
+def evaluations(provider):
+    return sum("quality assessor" in json.dumps(r["body"].get("messages", [])) for r in provider.requests)
+
+
+def test_easy_task_cancels_slower_tier():
+    """Test: nano passe le seuil, deepseek est annulé et jamais évalué"""
+    print_section("TEST: Easy Task")
+
+    with FakeProvider(responder=responder, tokens_input=500) as provider:
+        # Hedge lointain: nano doit gagner même à froid (imports, tokenizer)
+        agent = make_agent(provider, hedge_delay_seconds=5.0)
+        result = agent.execute_with_escalation("Task difficulty=easy", use_tools=False, mode="race")
+        assert agent.drain_race_attempts(timeout=10)
+
+        assert result["success"] and result["final_tier"] == "nano"
+        assert result["race_cancelled"] == ["deepseek"]
+        assert evaluations(provider) == 1, "Only the winner is evaluated"
+        deadline = time.time() + 2
+        while provider.disconnects == 0 and time.time() < deadline:
+            time.sleep(0.02)
+        assert provider.disconnects == 1, "The losing stream is closed early"
+        assert not any(r["path"].endswith("/messages") for r in provider.requests), "No hedge needed"
+        assert agent.total_cost > result["cost"], "Cancelled attempt cost settled afterwards"
+        print(f"✓ nano won in {result['latency']:.2f}s, deepseek stream cancelled")
+
+
+def test_hard_task_hedges_to_claude():
+    """Test: nano échoue, deepseek toujours en cours: hedge claude après le délai"""
+    print_section("TEST: Hard Task Hedge")
+
+    with FakeProvider(responder=responder, tokens_input=500) as provider:
+        agent = make_agent(provider)
+        start = time.perf_counter()
+        result = agent.execute_with_escalation("Task difficulty=hard", use_tools=False, mode="race")
+        elapsed = time.perf_counter() - start
+
+        assert result["final_tier"] == "claude" and result["quality_score"] == 8.0
+        assert [a["tier"] for a in result["escalation_history"]] == ["nano", "claude"]
+        assert result["race_cancelled"] == ["deepseek"]
+        claude = result["escalation_history"][-1]
+        assert 0.6 <= claude["started_at"] < 0.8, "Hedge starts after hedge_delay"
+        print(f"✓ claude hedge won in {elapsed:.2f}s after {len(result['escalation_history'])} attempts")
+
+        sequential = make_agent(provider)
+        start = time.perf_counter()
+        baseline = sequential.execute_with_escalation("Task difficulty=hard", use_tools=False, mode="sequential")
+        assert baseline["final_tier"] == "claude"
+        print(f"  sequential: {time.perf_counter() - start:.2f}s")
+
+
+def test_cost_cap_limits_extra_attempts():
+    """Test: plafond nul → seul le premier tier part, hedge compris"""
+    print_section("TEST: Cost Cap")
+
+    with FakeProvider(responder=responder, tokens_input=500) as provider:
+        agent = make_agent(provider, race_cost_cap=0.0)
+        result = agent.execute_with_escalation("Task difficulty=medium", use_tools=False, mode="race")
+
+        assert result["race_skipped"] == ["deepseek", "claude"]
+        assert result["final_tier"] == "nano" and "warning" in result
+        assert len([r for r in provider.requests if "quality assessor" not in json.dumps(r["body"])]) == 1
+        print("✓ Extra tiers skipped when their estimate exceeds the cap")
+
+
+def test_tools_in_race():
+    """Test: effets de bord → séquentiel; perdant read_only arrêté entre deux tours de tools"""
+    print_section("TEST: Tools in Race Mode")
+
+    calls = {"write_note": 0, "search": 0}
+
+    @tool(name="write_note", description="Write a note")
+    def write_note() -> str:
+        calls["write_note"] += 1
+        return "written"
+
+    @tool(name="search", description="Search", read_only=True)
+    def search() -> str:
+        calls["search"] += 1
+        return "found"
+
+    def with_tools(path, body):
+        text = json.dumps(body.get("messages", []))
+        if "quality assessor" in text:
+            return responder(path, body)
+        tier = "deepseek" if "deepseek" in body.get("model", "") else "nano"
+        if tier == "deepseek":  # Tours sans texte: des appels de tools à l'infini
+            return {"text": "", "tool_calls": [{"name": "search", "arguments": {}}],
+                    "first_token_delay": 0.1, "chunk_delay": 0}
+        if "written" not in text and '"tool"' not in text and "tool_result" not in text \
+                and any(t["function"]["name"] == "write_note" for t in body.get("tools", [])):
+            return {"text": "", "tool_calls": [{"name": "write_note", "arguments": {}}]}
+        return responder(path, body)
+
+    with FakeProvider(responder=with_tools, tokens_input=500) as provider:
+        agent = make_agent(provider)
+        agent.register_tools([write_note, search])
+        result = agent.execute_with_escalation("Task difficulty=easy", mode="race", max_tier=ModelTier.NANO)
+        assert result.get("mode") != "race" and result["final_tier"] == "nano"
+        assert calls["write_note"] == 1
+        print("✓ Side-effect tool registered: sequential escalation, write_note ran once")
+
+        racer = make_agent(provider, hedge_delay_seconds=None)
+        racer.register_tool(search)
+        before = len(provider.requests)
+        result = racer.execute_with_escalation("Task difficulty=easy", mode="race")
+        assert result["mode"] == "race" and result["final_tier"] == "nano"
+        assert racer.drain_race_attempts(timeout=10)
+        deepseek_turns = sum("deepseek" in r["body"].get("model", "") for r in provider.requests[before:])
+        assert deepseek_turns < racer.tool_executor.max_iterations, deepseek_turns
+        assert calls["search"] <= deepseek_turns
+        print(f"✓ Losing tool loop stopped after {deepseek_turns} turns "
+              f"(max_iterations {racer.tool_executor.max_iterations})")
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_easy_task_cancels_slower_tier()
+        test_hard_task_hedges_to_claude()
+        test_cost_cap_limits_extra_attempts()
+        test_tools_in_race()
+    finally:
+        teardown_module()
+    print("\n✅ All race escalation tests passed")
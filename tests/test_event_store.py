@@ -0,0 +1,284 @@
+"""
+Tests du journal d'événements indexé (cortex/core/event_store.py)
+
+Teste:
+- query: filtres et limite poussés dans SQLite, mêmes résultats qu'un filtrage Python
+- rollup: agrégats horaires et totaux identiques à un recalcul, conservés après prune
+- CortexLogger: analyse des derniers événements de toutes les sessions (pas seulement la mémoire)
+- QualityControlAgent: métriques lues dans les agrégats, reprise de l'historique JSONL
+- LogFilterService: période, impact et limite exécutés par SQLite
+- Base supprimée puis recréée dans le même processus
+"""
+
+import json
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from cortex.core import cortex_logger
+from cortex.core.cortex_logger import CortexLogger, EventType
+from cortex.core.event_store import EventStore
+
+AGENTS = ["TriageAgent", "PlannerAgent", "ToolerAgent"]
+TIERS = ["nano", "deepseek", "claude", None]
+TYPES = [EventType.TASK_COMPLETE.value, EventType.TASK_FAIL.value, EventType.ESCALATION.value]
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def temp_dir() -> Path:
+    return Path(tempfile.mkdtemp())
+
+
+def make_events(count: int, seed: int = 5):
+    rng = random.Random(seed)
+    start = datetime(2026, 10, 1, 8, 0)
+    events = []
+    for i in range(count):
+        event_type = rng.choice(TYPES)
+        events.append({
+            "timestamp": (start + timedelta(minutes=7 * i)).isoformat(),
+            "event_type": event_type,
+            "agent": rng.choice(AGENTS),
+            "tier": rng.choice(TIERS),
+            "message": f"event {i}",
+            "cost": round(rng.uniform(0, 0.01), 6),
+            "latency_ms": rng.uniform(50, 900) if rng.random() < 0.8 else None,
+            "score": rng.uniform(40, 100) if rng.random() < 0.3 else None,
+            "success": event_type != EventType.TASK_FAIL.value,
+            "task_id": f"task_{i % 40}",
+            "data": {"i": i}
+        })
+    return events
+
+
+def test_query_pushdown():
+    """Test: query() rend ce qu'un filtrage Python rendrait, via les index"""
+    print_section("TEST: Query Pushdown")
+
+    events = make_events(600)
+    store = EventStore(str(temp_dir() / "events.db"))
+    assert store.append_many(events) == 600
+
+    cases = [
+        {},
+        {"agents": ["TriageAgent"]},
+        {"tiers": ["deepseek", "claude"], "success": True},
+        {"event_types": [EventType.TASK_FAIL.value], "since": events[100]["timestamp"]},
+        {"since": datetime.fromisoformat(events[200]["timestamp"]), "until": events[260]["timestamp"]},
+        {"task_id": "task_3"},
+        {"tiers": [None]},
+    ]
+    for filters in cases:
+        def keep(e):
+            return (
+                ("agents" not in filters or e["agent"] in filters["agents"])
+                and ("tiers" not in filters or e["tier"] in filters["tiers"])
+                and ("event_types" not in filters or e["event_type"] in filters["event_types"])
+                and ("success" not in filters or e["success"] == filters["success"])
+                and ("task_id" not in filters or e["task_id"] == filters["task_id"])
+                and e["timestamp"] >= str(filters.get("since", "")).replace(" ", "T")
+                and ("until" not in filters or e["timestamp"] < filters["until"])
+            )
+        expected = [e["message"] for e in reversed(events) if keep(e)][:25]
+        assert [e["message"] for e in store.query(limit=25, **filters)] == expected, filters
+    print(f"✓ {len(cases)} filter combinations match a Python scan (limit 25, newest first)")
+
+    oldest = store.query(agents=["ToolerAgent"], limit=3, newest_first=False)
+    assert [e["message"] for e in oldest] == [e["message"] for e in events if e["agent"] == "ToolerAgent"][:3]
+    assert oldest[0]["data"]["i"] == int(oldest[0]["message"].split()[1])
+    assert store.query(agents=[]) == []
+    print("✓ Chronological order, data round-trip, empty filter")
+
+    for filters, index in (({"agents": ["TriageAgent"]}, "idx_events_agent"),
+                           ({"tiers": ["nano"]}, "idx_events_tier"),
+                           ({"event_types": [EventType.ESCALATION.value]}, "idx_events_type")):
+        column, values = next(iter(filters.items()))
+        column = {"agents": "agent", "tiers": "tier", "event_types": "event_type"}[column]
+        plan = store.db.fetchall(
+            f"EXPLAIN QUERY PLAN SELECT * FROM events WHERE {column} IN (?) ORDER BY ts DESC, seq DESC LIMIT 10",
+            values
+        )
+        assert any(index in row[-1] for row in plan), plan
+    print("✓ Filters use the agent/tier/event_type indexes")
+
+
+def test_rollups():
+    """Test: agrégats tenus à l'insertion = recalcul complet"""
+    print_section("TEST: Rollups")
+
+    events = make_events(500, seed=9)
+    store = EventStore(str(temp_dir() / "events.db"))
+    for event in events[:250]:
+        store.append(event)
+    store.append_many(events[250:])
+
+    for row in store.rollup(group_by=("agent", "tier")):
+        group = [e for e in events if e["agent"] == row["agent"] and (e["tier"] or "") == row["tier"]]
+        latencies = [e["latency_ms"] for e in group if e["latency_ms"] is not None]
+        assert row["events"] == len(group)
+        assert row["failures"] == sum(not e["success"] for e in group)
+        assert abs(row["cost"] - sum(e["cost"] for e in group)) < 1e-9
+        assert abs(row["avg_latency_ms"] - sum(latencies) / len(latencies)) < 1e-6
+    print("✓ Totals by (agent, tier) match a full recomputation")
+
+    hourly = store.rollup(group_by=("agent",), hourly=True, agents=["PlannerAgent"])
+    hours = {}
+    for e in events:
+        if e["agent"] == "PlannerAgent":
+            hours.setdefault(e["timestamp"][:13], []).append(e)
+    assert [row["hour"] for row in hourly] == sorted(hours)
+    assert all(row["events"] == len(hours[row["hour"]]) for row in hourly)
+    print(f"✓ {len(hourly)} hourly buckets for PlannerAgent")
+
+    since = datetime.fromisoformat(events[100]["timestamp"]).replace(minute=0)
+    window = store.rollup(group_by=(), since=since, until=events[300]["timestamp"][:13])
+    expected = [e for e in events if since.isoformat()[:13] <= e["timestamp"][:13] < events[300]["timestamp"][:13]]
+    assert window[0]["events"] == len(expected)
+    assert store.rollup(group_by=(), since="2030-01-01") == []
+    print(f"✓ Window since/until summed over hours: {window[0]['events']} events")
+
+    deleted = store.prune(events[400]["timestamp"])
+    assert deleted == 400 and len(store.query(limit=None)) == 100
+    assert store.count() == 500 and store.rollup(group_by=())[0]["events"] == 500
+    print("✓ prune() drops old events, rollups are kept")
+
+    try:
+        store.rollup(group_by=("message",))
+        assert False, "ValueError expected"
+    except ValueError:
+        pass
+
+
+def test_logger_reads_store():
+    """Test: l'analyse voit les événements des sessions précédentes"""
+    print_section("TEST: CortexLogger Backed by the Store")
+
+    log_dir = temp_dir()
+    first = CortexLogger(log_dir=log_dir)
+    for i in range(30):
+        first.log(EventType.TASK_START, "Worker", f"task {i}", task_id=f"t{i}")
+        if i % 3 == 0:
+            first.log(EventType.TASK_FAIL, "Worker", "failed", {"error": "Timeout"}, success=False, task_id=f"t{i}")
+        else:
+            first.log(EventType.TASK_COMPLETE, "Worker", "done", {"final_tier": "deepseek"},
+                      cost=0.002, latency_ms=300.0, task_id=f"t{i}")
+
+    second = CortexLogger(log_dir=log_dir)  # Nouvelle session, mémoire vide
+    assert second.memory_logs == []
+    analysis = second.analyze_recent_performance(last_n=60)
+    assert analysis["total_tasks"] == 60 and analysis["failed_tasks"] == 10
+    assert analysis["recurring_issues"] == [("Timeout", 10)]
+    opportunities = second.identify_improvement_opportunities()
+    assert any(o["category"] == "reliability" for o in opportunities)
+    print(f"✓ New session analyses {analysis['period']}: {analysis['failed_tasks']} failures")
+
+    entries = second.recent_entries(5)
+    assert [e.task_id for e in entries] == ["t27", "t28", "t28", "t29", "t29"]
+    assert entries[-1].tier == "deepseek" and entries[-1].latency_ms == 300.0
+    per_tier = second.store.rollup(group_by=("tier",), event_types=[EventType.TASK_COMPLETE.value])
+    assert per_tier[0]["tier"] == "deepseek" and per_tier[0]["events"] == 20
+    print(f"✓ Tier taken from data['final_tier'], avg latency {per_tier[0]['avg_latency_ms']:.0f}ms")
+
+    lines = first.session_file.read_text().splitlines()
+    assert len(lines) == 60 and json.loads(lines[-1])["tier"] == "deepseek"
+    print("✓ Session JSONL still written (learned router training data)")
+
+
+def test_quality_metrics_from_store():
+    """Test: show_quality_metrics lit les agrégats; l'historique JSONL est repris une fois"""
+    print_section("TEST: Quality Metrics from Rollups")
+
+    from cortex.agents.quality_control_agent import QualityControlAgent
+
+    workdir = temp_dir()
+    previous_cwd = os.getcwd()
+    previous_logger = cortex_logger._global_logger
+    os.chdir(workdir)
+    try:
+        cortex_logger._global_logger = CortexLogger(log_dir=workdir / "logs")
+        (workdir / "cortex/data").mkdir(parents=True)
+        (workdir / "cortex/data/quality_history.jsonl").write_text("".join(
+            json.dumps({"timestamp": f"2026-10-0{1 + i // 10}T10:00:0{i % 10}", "total_score": 50 + i,
+                        "grade": "C"}) + "\n"
+            for i in range(20)
+        ))
+
+        agent = QualityControlAgent(llm_client=None)
+        agent.analyze_request({"user_request": "list files", "response": "done", "tier": "nano"})
+        metrics = agent.show_quality_metrics()
+        assert metrics["success"] and metrics["total_evaluations"] == 21, metrics
+        assert metrics["recent_scores"][:-1] == list(range(61, 70))
+        expected_all = (sum(range(50, 70)) + metrics["recent_scores"][-1]) / 21
+        assert abs(metrics["avg_score_all"] - expected_all) < 1e-9
+        print(f"✓ 20 migrated + 1 new evaluation, avg {metrics['avg_score_all']:.1f}")
+
+        again = QualityControlAgent(llm_client=None).show_quality_metrics()
+        assert again["total_evaluations"] == 21
+        tiers = cortex_logger._global_logger.store.rollup(group_by=("tier",), agents=["QualityControlAgent"])
+        assert {row["tier"]: row["events"] for row in tiers} == {"nano": 1, "": 20}
+        print("✓ History migrated once, new evaluations carry their tier")
+    finally:
+        os.chdir(previous_cwd)
+        cortex_logger._global_logger = previous_logger
+
+
+def test_log_filter_pushdown():
+    """Test: _get_logs_since filtre et limite dans SQLite"""
+    print_section("TEST: LogFilterService Pushdown")
+
+    from cortex.database.database_manager import DatabaseManager
+    from cortex.services.log_filter_service import LogFilterService
+
+    db = DatabaseManager(str(temp_dir() / "cortex.db"))
+    with db.transaction() as conn:
+        for i, (hours_ago, impact) in enumerate([(30, "high"), (3, "low"), (2, "high"), (0.5, "critical"),
+                                                  (0.2, "low"), (0.1, "medium")]):
+            conn.execute(
+                "INSERT INTO change_log (change_type, entity_type, author, description, impact_level, timestamp) "
+                "VALUES ('agent_decision', 'agent', 'TriageAgent', ?, ?, datetime('now', ?))",
+                (f"change {i}", impact, f"-{int(hours_ago * 3600)} seconds")
+            )
+
+    service = LogFilterService()
+    service.changelog_repo.db = db
+    recent = service.get_pertinent_logs(time_period='recent', min_impact='low', limit=50)
+    assert sorted(log["description"] for log in recent) == ["change 3", "change 4", "change 5"]
+    important = service._get_logs_since((datetime.now() - timedelta(hours=6)).isoformat(), limit=2,
+                                        min_impact='high')
+    assert [log["description"] for log in important] == ["change 3", "change 2"]
+    print("✓ Exact time window (local time vs UTC timestamps), impact and limit pushed down")
+
+
+def test_recreated_db():
+    """Test: base supprimée pendant que le pool est ouvert, nouvelle instance utilisable"""
+    print_section("TEST: Recreated Database")
+
+    db_path = temp_dir() / "events.db"
+    store = EventStore(str(db_path))
+    store.append_many(make_events(5))
+    for suffix in ("", "-wal", "-shm"):
+        Path(str(db_path) + suffix).unlink(missing_ok=True)
+
+    recreated = EventStore(str(db_path))
+    assert recreated.count() == 0
+    recreated.append_many(make_events(3))
+    assert db_path.exists() and EventStore(str(db_path)).count() == 3
+    print("✓ Schema recreated on the new file, events written to it")
+
+
+if __name__ == "__main__":
+    test_query_pushdown()
+    test_rollups()
+    test_logger_reads_store()
+    test_quality_metrics_from_store()
+    test_log_filter_pushdown()
+    test_recreated_db()
+    print("\n✅ All event store tests passed")
@@ -0,0 +1,187 @@
+"""
+Tests de la synchronisation incrémentale de ProjectKnowledgeBase
+
+Teste:
+- Indexation initiale (code, agents, workflows, configuration, structure)
+- Sync sans changement: aucun fichier relu, aucun embedding
+- Fichier modifié: seuls ses chunks changés sont ré-encodés
+- Fichier supprimé: ses chunks disparaissent de la collection
+- Sans manifeste: les chunks orphelins d'une ancienne indexation sont purgés
+- app.py et app/__init__.py (même nom de module): chunks distincts
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+from cortex.core.embeddings import Embedder, EmbeddingBackend, HashingBackend
+from cortex.core.project_knowledge_base import ProjectKnowledgeBase
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+class CountingBackend(EmbeddingBackend):
+    """Backend hashing qui compte les textes encodés"""
+
+    def __init__(self):
+        self.inner = HashingBackend(64)
+        self.name = "counting-64"
+        self.dimensions = 64
+        self.encoded = 0
+
+    def encode(self, texts):
+        self.encoded += len(texts)
+        return self.inner.encode(texts)
+
+
+def make_project() -> Path:
+    root = Path(tempfile.mkdtemp())
+    (root / "app").mkdir()
+    (root / "app" / "models.py").write_text(
+        "class User:\n    \"\"\"A user\"\"\"\n    name = ''\n\n\n"
+        "def validate_user(user):\n    return bool(user.name)\n"
+    )
+    (root / "app" / "views.py").write_text("def index():\n    return 'home'\n")
+    (root / "cortex" / "agents").mkdir(parents=True)
+    (root / "cortex" / "agents" / "billing_agent.py").write_text(
+        '"""\nBilling agent: tracks invoices and payments\n"""\n\n\nclass BillingAgent:\n    pass\n'
+    )
+    (root / "cortex" / "config").mkdir()
+    (root / "cortex" / "config" / "config.yaml").write_text("system:\n  name: test\n")
+    (root / "README.md").write_text(
+        "# Project\n\n## Deployment workflow\n" + "Build, test and deploy the application. " * 5
+    )
+    # Jamais indexés
+    (root / ".venv").mkdir()
+    (root / ".venv" / "lib.py").write_text("def hidden():\n    pass\n")
+    (root / "app" / "__pycache__").mkdir()
+    return root
+
+
+def collection_ids(kb: ProjectKnowledgeBase) -> set:
+    return set(kb.collection.get(include=[])["ids"])
+
+
+def test_initial_and_noop_sync():
+    """Test: indexation complète puis sync sans changement"""
+    print_section("TEST: Initial + No-op Sync")
+
+    root = make_project()
+    backend = CountingBackend()
+    kb = ProjectKnowledgeBase(root, embedder=Embedder(backend))
+
+    report = kb.sync()
+    assert report.files_scanned == 5, "3 Python files, README, config"
+    assert report.files_changed == 5
+    assert kb.collection.count() == report.chunks_upserted == kb.get_stats()["total_chunks"]
+    assert not any(m["file"] == "lib.py" for m in kb.collection.get()["metadatas"] if "file" in m)
+    print(f"✓ Indexed {report.chunks_upserted} chunks from {report.files_scanned} files")
+
+    # Le type est dans les métadonnées: le filtre de recherche fonctionne
+    results = kb.search("validate user", n_results=2, filter_type="employee")
+    assert [m["name"] for m in results["metadatas"][0]] == ["Billing"]
+    print("✓ Search filter_type matches chunk types")
+
+    encoded = backend.encoded
+    noop = kb.sync()
+    assert noop.files_changed == noop.chunks_upserted == noop.chunks_deleted == 0
+    assert backend.encoded == encoded
+    assert noop.seconds < 0.5
+    print(f"✓ No-op sync in {noop.seconds * 1000:.1f}ms")
+
+    # Touché sans modification: manifeste mis à jour, rien à encoder
+    os.utime(root / "app" / "views.py", ns=(1, 1))
+    touched = kb.sync()
+    assert touched.files_changed == touched.chunks_upserted == 0
+
+    # Nouvelle instance: le manifeste persiste
+    reopened = ProjectKnowledgeBase(root, embedder=Embedder(backend))
+    assert reopened.sync().chunks_upserted == 0
+    assert backend.encoded == encoded
+    print("✓ Manifest persists across instances")
+
+
+def test_changed_and_deleted_files():
+    """Test: seuls les chunks modifiés sont ré-encodés, les supprimés disparaissent"""
+    print_section("TEST: Changed + Deleted Files")
+
+    root = make_project()
+    kb = ProjectKnowledgeBase(root, embedder=Embedder(CountingBackend()))
+    kb.sync()
+    before = collection_ids(kb)
+
+    models = root / "app" / "models.py"
+    models.write_text(models.read_text().replace("bool(user.name)", "bool(user.name.strip())"))
+    report = kb.sync()
+    assert report.files_changed == 1
+    assert report.chunks_upserted == 1, "Only validate_user changed"
+    assert report.chunks_deleted == 0
+    assert collection_ids(kb) == before
+    changed = kb.collection.get(ids=["app/models.py:validate_user"])
+    assert "strip()" in changed["documents"][0]
+    assert changed["metadatas"][0]["start_line"] == 6
+    print("✓ One modified function → one chunk re-embedded")
+
+    (root / "app" / "views.py").unlink()
+    report = kb.sync()
+    assert report.files_deleted == 1
+    removed = before - collection_ids(kb)
+    assert len(removed) == report.chunks_deleted == 1
+    # La structure de app/ a changé (1 fichier Python de moins)
+    assert report.chunks_upserted == 1
+    assert "Contains 1 Python files" in kb.collection.get(ids=["structure_app"])["documents"][0]
+    assert kb.get_stats()["total_chunks"] == kb.collection.count()
+    print("✓ Deleted file chunks removed, structure updated")
+
+
+def test_orphans_purged_without_manifest():
+    """Test: sans manifeste, les chunks inconnus d'une ancienne indexation sont supprimés"""
+    print_section("TEST: Orphan Purge")
+
+    root = make_project()
+    kb = ProjectKnowledgeBase(root, embedder=Embedder(CountingBackend()))
+    kb.collection.add(ids=["workflow_legacy"], documents=["old section"], embeddings=[[0.0] * 63 + [1.0]])
+    kb.sync()
+    assert "workflow_legacy" not in collection_ids(kb)
+
+    kb.manifest_file.unlink()
+    report = kb.sync()
+    assert report.chunks_deleted == 0 and report.files_changed == 5
+    assert kb.sync(force=True).chunks_upserted == kb.collection.count()
+    print("✓ Legacy chunks purged, forced sync re-embeds everything")
+
+
+def test_module_and_package_with_same_name():
+    """Test: app.py et app/__init__.py ne partagent pas d'ID de chunk"""
+    print_section("TEST: Module vs Package")
+
+    root = make_project()
+    (root / "app.py").write_text("def main():\n    return 'module'\n")
+    (root / "app" / "__init__.py").write_text("def main():\n    return 'package'\n")
+    kb = ProjectKnowledgeBase(root, embedder=Embedder(CountingBackend()))
+    kb.sync()
+
+    ids = collection_ids(kb)
+    assert {"app.py:main", "app/__init__.py:main"} <= ids
+    assert kb.get_stats()["total_chunks"] == kb.collection.count()
+    print("✓ Both main() chunks indexed")
+
+    (root / "app.py").unlink()
+    report = kb.sync()
+    assert report.chunks_deleted == 1  # main() de app.py
+    remaining = kb.collection.get(ids=["app/__init__.py:main"])
+    assert "package" in remaining["documents"][0]
+    print("✓ Deleting app.py keeps app/__init__.py chunks")
+
+
+if __name__ == "__main__":
+    test_initial_and_noop_sync()
+    test_changed_and_deleted_files()
+    test_orphans_purged_without_manifest()
+    test_module_and_package_with_same_name()
+    print("\n✅ All knowledge base sync tests passed")
@@ -0,0 +1,136 @@
+"""
+Tests du démarrage paresseux du CLI
+
+Teste:
+- lazy_component: construit une fois, au premier accès, durée enregistrée
+- cortex.core: exports chargés à la demande, plus de cycle d'import avec les agents
+- CortexCLI: aucun agent, LLMClient ni outil construit avant le prompt
+- cortex --profile-startup
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from cortex.core.lazy_components import lazy_component, component_timings, is_loaded
+
+ROOT = Path(__file__).parent.parent
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def run_cortex(args) -> subprocess.CompletedProcess:
+    """Lance un interpréteur neuf (sys.modules vierge) depuis un dossier temporaire:
+    les bases relatives (cortex/data/auth.db, todo_pool.db, .jwt_secret) n'atterrissent pas dans le dépôt"""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True,
+                          cwd=tempfile.mkdtemp(), env=env, timeout=120)
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    """Exécute du code dans un interpréteur neuf (sys.modules vierge)"""
+    return run_cortex(["-c", code])
+
+
+class Service:
+    builds = 0
+
+    @lazy_component
+    def client(self):
+        Service.builds += 1
+        time.sleep(0.05)
+        return object()
+
+    @lazy_component
+    def agent(self):
+        return ("agent", self.client)
+
+
+def test_lazy_component():
+    """Test: construction unique au premier accès, durées, remplacement"""
+    print_section("TEST: lazy_component")
+
+    Service.builds = 0
+    service = Service()
+    assert not is_loaded(service, "client") and component_timings(service) == {}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.client)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert Service.builds == 1 and all(r is results[0] for r in results)
+    assert service.agent == ("agent", results[0])
+    timings = component_timings(service)
+    assert set(timings) == {"client", "agent"} and timings["client"] >= 0.05
+    print(f"✓ Built once across 4 threads, timings: { {k: round(v, 3) for k, v in timings.items()} }")
+
+    other = Service()
+    other.client = "stub"
+    assert other.agent == ("agent", "stub") and Service.builds == 1
+    print("✓ Components can be replaced before first use")
+
+
+def test_core_imports():
+    """Test: cortex.core ne charge plus tout à l'import; cortex.agents importable en premier"""
+    print_section("TEST: cortex.core Imports")
+
+    result = run_python(
+        "import sys, cortex.core.config_loader\n"
+        "print(sorted(m for m in ('openai', 'anthropic', 'chromadb', 'cortex.core.workflow_engine') if m in sys.modules))"
+    )
+    assert result.returncode == 0 and result.stdout.strip() == "[]", result.stderr
+    print("✓ import cortex.core.config_loader loads no LLM SDK")
+
+    result = run_python("import cortex.agents\nfrom cortex.core import LLMClient, WorkflowEngine\nprint('ok')")
+    assert result.returncode == 0 and result.stdout.strip() == "ok", result.stderr[-500:]
+    print("✓ cortex.agents imports before cortex.core (no circular import)")
+
+
+def test_cli_startup_is_lazy():
+    """Test: jusqu'au prompt, seuls les composants nécessaires sont construits"""
+    print_section("TEST: CLI Startup")
+
+    result = run_python(
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "from cortex.cli.cortex_cli import startup_probe\n"
+        "probe = startup_probe(start)\n"
+        "probe['heavy'] = sorted(m for m in ('openai', 'anthropic', 'chromadb', 'cortex.agents', "
+        "'cortex.tools.intelligence_tools', 'cortex.core.llm_client') if m in sys.modules)\n"
+        "print(json.dumps(probe))"
+    )
+    assert result.returncode == 0, result.stderr[-1000:]
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert probe["heavy"] == [], probe["heavy"]
+    assert set(probe["components"]) <= {"task_manager", "auto_task_manager"}, probe["components"]
+    print(f"✓ To prompt in {probe['total_ms']:.0f} ms, built: {list(probe['components'])}")
+
+
+def test_profile_startup_command():
+    """Test: cortex --profile-startup affiche phases et imports"""
+    print_section("TEST: --profile-startup")
+
+    result = run_cortex([str(ROOT / "cortex" / "cli" / "cortex_cli.py"), "--profile-startup"])
+    assert result.returncode == 0, result.stderr[-1000:]
+    assert "To prompt:" in result.stdout and "prompt_toolkit" in result.stdout
+    print(result.stdout)
+
+
+if __name__ == "__main__":
+    test_lazy_component()
+    test_core_imports()
+    test_cli_startup_is_lazy()
+    test_profile_startup_command()
+    print("\n✅ All lazy startup tests passed")
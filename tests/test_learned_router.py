@@ -0,0 +1,223 @@
+"""
+Tests du routeur appris (cortex/core/learned_router.py)
+
+Teste:
+- Labels: tier le moins cher ayant passé le seuil, d'après les événements CortexLogger
+- Entraînement + évaluation par rejeu: escalades évitées, inférence en microsecondes
+- Repli sur les heuristiques sous le seuil de confiance (ModelRouter, AgentFirstRouter)
+- Labels censurés (succès dès un tier de départ relevé) sous-pondérés
+- BaseAgent: tier de départ relevé, exploration un tier plus bas, résultats d'escalade journalisés
+"""
+
+import random
+import tempfile
+from pathlib import Path
+
+from cortex.core import cortex_logger
+from cortex.core.cortex_logger import CortexLogger, EventType
+from cortex.core.learned_router import (
+    LearnedRouter, RoutingExample, label_outcome, load_history, train_from_history
+)
+from cortex.core.llm_client import LLMClient
+from cortex.core.model_router import ModelRouter, ModelTier
+from cortex.core.agent_first_router import AgentFirstRouter
+from cortex.core.agent_hierarchy import AgentRole
+from cortex.agents.base_agent import AgentConfig, BaseAgent
+
+
+TEMPLATES = {
+    "nano": ["list the files in {x}", "show the status of {x}", "count lines in {x}", "read the {x} config"],
+    "deepseek": ["implement the {x} endpoint with validation", "refactor the {x} module",
+                 "find why {x} deadlocks under load", "write unit tests for {x}"],
+    "claude": ["design the architecture for {x} across services", "decide the migration strategy for {x}",
+               "list tradeoffs and choose a storage engine for {x}"]
+}
+SUBJECTS = ["billing", "auth", "search", "cache", "scheduler", "exporter", "gateway", "inbox"]
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def write_history(log_dir: Path, count: int, seed: int = 0):
+    """Escalades séquentielles depuis nano jusqu'au tier nécessaire"""
+    rng = random.Random(seed)
+    logger = CortexLogger(log_dir=log_dir)
+    tiers = list(TEMPLATES)
+    for _ in range(count):
+        tier = rng.choice(tiers)
+        task = rng.choice(TEMPLATES[tier]).format(x=rng.choice(SUBJECTS))
+        attempts = [{"tier": t, "quality_score": 3.0, "cost": 0.001}
+                    for t in tiers[:tiers.index(tier)]]
+        attempts.append({"tier": tier, "quality_score": 8.0, "cost": 0.001})
+        logger.log(EventType.ROUTING_OUTCOME, "Agent", "outcome",
+                   data={"task": task, "attempts": attempts, "threshold": 6.0}, cost=0.001 * len(attempts))
+    logger.log(EventType.TASK_COMPLETE, "Agent", "not a routing outcome")
+
+
+def test_labels_from_logs():
+    """Test: label = premier tier au-dessus du seuil, sinon tier suivant"""
+    print_section("TEST: Labels")
+
+    assert label_outcome({"threshold": 6, "attempts": [
+        {"tier": "nano", "quality_score": 4}, {"tier": "deepseek", "quality_score": 7}]}) == "deepseek"
+    assert label_outcome({"threshold": 6, "attempts": [{"tier": "nano", "quality_score": 6.5}]}) == "nano"
+    assert label_outcome({"threshold": 6, "attempts": [{"tier": "nano", "error": "timeout"}]}) == "deepseek"
+    assert label_outcome({"threshold": 6, "attempts": [{"tier": "claude", "quality_score": 2}]}) == "claude"
+    print("✓ Cheapest passing tier, or the next tier when nothing passed")
+
+    log_dir = Path(tempfile.mkdtemp())
+    write_history(log_dir, 30)
+    examples = load_history(log_dir)
+    assert len(examples) == 30 and all(e.start_tier == "nano" for e in examples)
+    assert all(e.weight == 1.0 for e in examples)
+    print(f"✓ {len(examples)} routing outcomes read back, other events ignored")
+
+
+def test_censored_labels():
+    """Test: un succès dès un tier de départ relevé pèse peu et ne fige pas le routeur"""
+    print_section("TEST: Censored Labels")
+
+    log_dir = Path(tempfile.mkdtemp())
+    logger = CortexLogger(log_dir=log_dir)
+    outcomes = [
+        ("refactor the billing module", [("deepseek", 8.0)]),                  # Censuré
+        ("refactor the auth module", [("nano", 3.0), ("deepseek", 8.0)]),      # Exact
+        ("design the architecture for search", [("deepseek", 3.0), ("claude", 8.0)]),  # Exact
+        ("list the files in inbox", [("nano", 8.0)]),                          # Tier le plus bas
+    ]
+    for task, attempts in outcomes:
+        logger.log(EventType.ROUTING_OUTCOME, "Agent", "outcome", data={
+            "task": task, "threshold": 6.0,
+            "attempts": [{"tier": t, "quality_score": q} for t, q in attempts]
+        })
+    examples = load_history(log_dir, censored_weight=0.2)
+    assert [(e.tier, e.weight) for e in examples] == [
+        ("deepseek", 0.2), ("deepseek", 1.0), ("claude", 1.0), ("nano", 1.0)
+    ]
+    print("✓ Only first-attempt successes above the lowest tier are down-weighted")
+
+    # Historique biaisé: 60 succès nano exacts, 60 succès censurés en deepseek sur les mêmes tâches
+    texts = [f"show the status of {x} now" for x in SUBJECTS]
+    history = [RoutingExample(text=t, tier="nano", start_tier="nano") for t in texts * 8] + \
+              [RoutingExample(text=t, tier="deepseek", start_tier="deepseek") for t in texts * 8]
+    unweighted = LearnedRouter().fit(history).predict(texts[0])
+    for example in history[len(history) // 2:]:
+        example.weight = 0.2
+    weighted = LearnedRouter().fit(history).predict(texts[0])
+    assert weighted.tier == "nano" and weighted.probabilities["nano"] > unweighted.probabilities["nano"] + 0.2
+    print(f"✓ P(nano) {unweighted.probabilities['nano']:.2f} → {weighted.probabilities['nano']:.2f} "
+          f"once censored labels are down-weighted")
+
+
+def test_train_and_replay():
+    """Test: entraînement, escalades évitées au rejeu, sauvegarde/rechargement"""
+    print_section("TEST: Train + Replay")
+
+    log_dir = Path(tempfile.mkdtemp())
+    model_path = log_dir / "router_model.json"
+    write_history(log_dir, 400)
+
+    report = train_from_history(log_dir, model_path=model_path, min_confidence=0.7)
+    assert report["success"] and model_path.exists()
+    assert report["accuracy"] >= 0.9, report
+    assert report["escalations_avoided"] > 0
+    assert report["replay_escalations"] < report["heuristic_escalations"]
+    assert report["inference_us_p50"] < 500, report["inference_us_p50"]
+    print(f"✓ Holdout accuracy {report['accuracy']:.0%}, "
+          f"{report['escalations_avoided']} escalations avoided, "
+          f"{report['inference_us_p50']:.0f}µs per prediction")
+
+    router = LearnedRouter.load(model_path)
+    assert router.predict("decide the migration strategy for billing").tier == "claude"
+    assert router.predict("list the files in auth").tier == "nano"
+    print("✓ Saved model reloads with the same predictions")
+
+    assert not train_from_history(Path(tempfile.mkdtemp()), model_path=model_path)["success"]
+    print("✓ Training refused without history")
+
+
+def test_confidence_fallback():
+    """Test: confiant → routeur appris; sinon heuristiques (et pas d'appel LLM)"""
+    print_section("TEST: Confidence Fallback")
+
+    log_dir = Path(tempfile.mkdtemp())
+    write_history(log_dir, 400)
+    router = LearnedRouter().fit(load_history(log_dir))
+    model_router = ModelRouter(learned_router=router)
+
+    selection = model_router.select_model("list tradeoffs and choose a storage engine for search")
+    assert selection.tier == ModelTier.CLAUDE and "learned router" in selection.reasoning
+    assert selection.confidence >= 0.7
+    print(f"✓ Learned route: {selection.reasoning}")
+
+    selection = model_router.select_model("zzqx")
+    assert "learned" not in selection.reasoning
+    print(f"✓ Unknown wording falls back: {selection.reasoning}")
+
+    agent_first = AgentFirstRouter(llm_client=None, model_router=model_router)
+    decision = agent_first._classify_request("find why cache deadlocks under load")
+    assert decision.start_role == AgentRole.EXPERT and decision.reasoning.startswith("Learned")
+    assert agent_first.total_cost == 0.0
+    print("✓ AgentFirstRouter skips the nano classification call")
+
+
+def test_agent_starting_tier_and_recording():
+    """Test: BaseAgent démarre au tier prédit et journalise ses escalades"""
+    print_section("TEST: BaseAgent Integration")
+
+    log_dir = Path(tempfile.mkdtemp())
+    write_history(log_dir, 400)
+    router = LearnedRouter().fit(load_history(log_dir))
+    agent = BaseAgent(
+        AgentConfig(name="RouterAgent", role="Test", description="", base_prompt="",
+                    tier_preference=ModelTier.NANO),
+        llm_client=LLMClient(use_cache=False),
+        model_router=ModelRouter(learned_router=router),
+        print_updates=False
+    )
+
+    task = "design the architecture for inbox across services"
+    agent.routing_exploration = 0.0
+    assert agent._starting_tier(task, ModelTier.CLAUDE) == ModelTier.CLAUDE
+    assert agent._starting_tier(task, ModelTier.DEEPSEEK) == ModelTier.DEEPSEEK
+    assert agent._starting_tier("list the files in inbox", ModelTier.CLAUDE) == ModelTier.NANO
+    print("✓ Starting tier raised to the prediction, capped by max_tier")
+
+    agent.routing_exploration = 1.0
+    assert agent._starting_tier(task, ModelTier.CLAUDE) == ModelTier.DEEPSEEK
+    assert agent._starting_tier(task, ModelTier.DEEPSEEK) == ModelTier.NANO
+    assert agent._starting_tier("list the files in inbox", ModelTier.CLAUDE) == ModelTier.NANO
+    agent.routing_exploration = 0.1
+    starts = [agent._starting_tier(task, ModelTier.CLAUDE) for _ in range(1000)]
+    assert 50 <= starts.count(ModelTier.DEEPSEEK) <= 150
+    print(f"✓ Exploration starts one tier lower ({starts.count(ModelTier.DEEPSEEK)}/1000 at rate 0.1)")
+
+    previous = cortex_logger._global_logger
+    cortex_logger._global_logger = CortexLogger(log_dir=Path(tempfile.mkdtemp()))
+    try:
+        agent._record_routing_outcome("refactor the auth module", 6.0, {
+            "final_tier": "deepseek", "quality_score": 7.5, "total_cost": 0.002,
+            "escalation_history": [
+                {"tier": "nano", "quality_score": 4.0, "execution_cost": 0.0001},
+                {"tier": "deepseek", "quality_score": 7.5, "execution_cost": 0.0019}
+            ]
+        })
+        recorded = load_history(cortex_logger._global_logger.log_dir)
+    finally:
+        cortex_logger._global_logger = previous
+
+    assert [(e.text, e.start_tier, e.tier) for e in recorded] == [("refactor the auth module", "nano", "deepseek")]
+    print("✓ Escalation outcome recorded for the next retrain")
+
+
+if __name__ == "__main__":
+    test_labels_from_logs()
+    test_censored_labels()
+    test_train_and_replay()
+    test_confidence_fallback()
+    test_agent_starting_tier_and_recording()
+    print("\n✅ All learned router tests passed")
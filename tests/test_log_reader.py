@@ -0,0 +1,162 @@
+"""
+Tests de la lecture des journaux (cortex/core/log_reader.py)
+
+Teste:
+- tail_lines: mêmes lignes que readlines()[-n:], filtre, cas limites
+- LogIngestor: seules les nouvelles lignes sont lues d'un audit à l'autre,
+  ligne incomplète reprise, fichier réécrit ou remplacé, premier passage borné
+- QualityControlAgent: agrégats incrémentaux transmis au prompt d'analyse
+"""
+
+import json
+import os
+import random
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from cortex.core import cortex_logger
+from cortex.core.cortex_logger import CortexLogger
+from cortex.core.log_reader import LogIngestor, tail_lines
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def temp_dir() -> Path:
+    return Path(tempfile.mkdtemp())
+
+
+def test_tail_lines():
+    """Test: identique à readlines()[-n:] sans lire tout le fichier"""
+    print_section("TEST: tail_lines")
+
+    rng = random.Random(3)
+    path = temp_dir() / "app.log"
+    lines = [f"{i} INFO " + "x" * rng.randint(0, 120) + "\n" for i in range(5000)]
+    lines[1234] = "\n"
+    path.write_text("".join(lines))
+    for n in (1, 7, 500, 4999, 5000, 9000):
+        assert tail_lines(path, n) == lines[-n:], n
+    print("✓ Same lines as readlines()[-n:] for n in 1..9000")
+
+    errors = tail_lines(path, 3, match=lambda line: line.startswith(b"12"))
+    assert errors == [l for l in lines if l.startswith("12")][-3:]
+    print(f"✓ Filtered tail: {[l.split()[0] for l in errors]}")
+
+    path.write_text("first\nlast without newline")
+    assert tail_lines(path, 5) == ["first\n", "last without newline\n"]
+    path.write_text("")
+    assert tail_lines(path, 5) == [] and tail_lines(path, 0) == []
+    print("✓ Missing final newline, empty file")
+
+
+def test_incremental_ingest():
+    """Test: un audit ne lit que ce qui a été écrit depuis le précédent"""
+    print_section("TEST: Incremental Ingest")
+
+    workdir = temp_dir()
+    log = workdir / "app.log"
+    state = workdir / "state.json"
+    log.write_text("".join(f"2026-01-01 ERROR job {i} failed\n" for i in range(100)) + "2026-01-01 INFO ok\n")
+
+    ingestor = LogIngestor(state)
+    assert ingestor.ingest(log, "text") == 101
+    ingestor.save()
+    assert LogIngestor(state).ingest(log, "text") == 0
+    print("✓ Second audit reads nothing when the log did not change")
+
+    with open(log, "a") as f:
+        f.write("2026-01-02 WARNING disk at 91%\n2026-01-02 ERROR job 7 fail")  # Ligne incomplète
+    ingestor = LogIngestor(state)
+    assert ingestor.ingest(log, "text") == 1
+    with open(log, "a") as f:
+        f.write("ed\n")
+    assert ingestor.ingest(log, "text") == 1
+    ingestor.save()
+    aggregates = LogIngestor(state).aggregates
+    assert aggregates.levels == {"ERROR": 101, "INFO": 1, "WARNING": 1}
+    assert aggregates.errors.most_common(1) == [("job # failed", 101)]
+    print(f"✓ Appended lines only, incomplete line resumed: {dict(aggregates.levels)}")
+
+    log.write_text("2026-01-03 ERROR after clear\n")  # Réécrit en place (même inode)
+    assert ingestor.ingest(log, "text") == 1
+    replacement = workdir / "rotated.log"
+    replacement.write_text("2026-01-03 INFO a\n2026-01-03 INFO b\n2026-01-03 INFO c\n")
+    os.replace(replacement, log)
+    assert ingestor.ingest(log, "text") == 3
+    print("✓ Rewritten and replaced files are read from the start")
+
+    big = workdir / "big.log"
+    big.write_text("".join(f"line {i:06d} INFO\n" for i in range(10000)))  # 17 octets par ligne
+    capped = LogIngestor(workdir / "capped.json", max_backfill_bytes=170 + 5)
+    assert capped.ingest(big, "text") == 10
+    assert capped.aggregates.skipped_bytes == 17 * 9990
+    print("✓ First pass over a large log is bounded by max_backfill_bytes")
+
+
+def test_quality_control_aggregates():
+    """Test: analyze_agent_logs alimente le prompt avec les agrégats incrémentaux"""
+    print_section("TEST: QualityControlAgent Log Aggregates")
+
+    from cortex.agents.quality_control_agent import QualityControlAgent
+
+    prompts = []
+
+    class RecordingClient:
+        def chat_completion(self, messages, **kwargs):
+            prompts.append(messages[-1]["content"])
+            content = json.dumps({"quality_score": 80, "confidence": 0.9, "agent_scores": [],
+                                  "issues": [], "recommendations": [], "summary": "ok"})
+            return SimpleNamespace(content=content, model="recorder", cost=0.0,
+                                   tokens_input=0, tokens_output=0)
+
+    workdir = temp_dir()
+    previous_cwd = os.getcwd()
+    previous_logger = cortex_logger._global_logger
+    os.chdir(workdir)
+    try:
+        (workdir / "cortex/logs").mkdir(parents=True)
+        # Sessions et journal indexé hors du dépôt (défaut: cortex/logs du package)
+        cortex_logger._global_logger = CortexLogger(log_dir=temp_dir())
+        (workdir / "cortex/data").mkdir(parents=True)
+        events = workdir / "cortex/logs/session_1.jsonl"
+        events.write_text("".join(
+            json.dumps({"timestamp": "t", "event_type": "task_fail" if i % 4 == 0 else "task_complete",
+                        "agent": "TriageAgent", "message": f"task {i} timed out", "cost": 0.001,
+                        "success": i % 4 != 0}) + "\n"
+            for i in range(40)
+        ))
+        (workdir / "cortex/data/conversation_history.jsonl").write_text(
+            json.dumps({"type": "message", "role": "user", "content": "hello", "ts": "t"}) + "\n"
+        )
+
+        agent = QualityControlAgent(RecordingClient())
+        agent.analyze_request({"user_request": "list files", "response": "done", "tier": "nano"})
+        result = agent.analyze_agent_logs(max_lines=100)
+        assert result["success"] and result["logs_analyzed"] > 0
+        assert "AGGREGATES (all 42 log entries" in prompts[-1], prompts[-1][:300]
+        assert '"failure_rate": 0.25' in prompts[-1]
+
+        with open(events, "a") as f:
+            f.write(json.dumps({"event_type": "task_complete", "agent": "PlannerAgent", "success": True}) + "\n")
+        data = agent._load_agent_logs(100)
+        assert data["new_entries"] == 1 and data["aggregates"]["entries"] == 43
+        assert data["aggregates"]["quality"]["evaluations"] == 1
+        assert len(agent._load_quality_history()) == 1
+        print(f"✓ Second audit ingested {data['new_entries']} new entry, "
+              f"{data['aggregates']['entries']} entries aggregated")
+    finally:
+        cortex_logger._global_logger = previous_logger
+        os.chdir(previous_cwd)
+
+
+if __name__ == "__main__":
+    test_tail_lines()
+    test_incremental_ingest()
+    test_quality_control_aggregates()
+    print("\n✅ All log reader tests passed")
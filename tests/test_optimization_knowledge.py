@@ -0,0 +1,225 @@
+"""
+Tests de la base de connaissance d'optimisation (SQLite)
+
+Teste:
+- Métriques globales et stats d'outils en agrégats
+- Historique persistant: nouvelle instance, nouveau processus (WorkflowEngine)
+- find_similar_requests via l'index inversé: mêmes résultats qu'un parcours complet
+- Récurrences d'échecs, échecs par type
+- historical_requests: len, index, itération, get_requests_since
+- close() ne casse pas les autres instances sur la même base, base recréée
+"""
+
+import json
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from cortex.departments.optimization.optimization_knowledge import (
+    OptimizationKnowledge,
+    HistoricalRequest,
+    FailureAnalysis,
+    RequestOutcome,
+)
+
+ROOT = Path(__file__).parent.parent
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def temp_db() -> str:
+    return str(Path(tempfile.mkdtemp()) / "optimization_knowledge.db")
+
+
+def make_request(i: int, text: str, outcome=RequestOutcome.SUCCESS, days_ago: int = 0,
+                 tools=None, errors=None) -> HistoricalRequest:
+    return HistoricalRequest(
+        id=f"req_{i}",
+        timestamp=datetime.now() - timedelta(days=days_ago),
+        request_text=text,
+        request_type="code_development",
+        outcome=outcome,
+        workflow_used="CODE_DEVELOPMENT",
+        agents_involved=["CodeWriterAgent"],
+        duration_seconds=float(i),
+        cost=0.01 * i,
+        files_modified=[],
+        lines_added=0,
+        lines_removed=0,
+        tools_used=tools or [],
+        patterns_applied=[],
+        errors_encountered=errors or []
+    )
+
+
+def test_metrics_and_persistence():
+    """Test: agrégats corrects et conservés par une nouvelle instance"""
+    print_section("TEST: Metrics & Persistence")
+
+    db_path = temp_db()
+    knowledge = OptimizationKnowledge(db_path=db_path)
+    for i in range(1, 5):
+        outcome = RequestOutcome.FAILURE if i == 4 else RequestOutcome.SUCCESS
+        knowledge.record_request(make_request(i, f"add logging to module {i}", outcome))
+    knowledge.update_tool_stats("pytest", True, 2.0, 0.01)
+    knowledge.update_tool_stats("pytest", False, 4.0, 0.03)
+    knowledge.update_tool_stats("grep", True, 1.0, 0.0)
+
+    metrics = knowledge.global_metrics
+    assert metrics["total_requests"] == 4 and metrics["success_rate"] == 0.75
+    assert abs(metrics["avg_cost"] - 0.025) < 1e-9 and metrics["avg_duration"] == 2.5
+    stats = knowledge.tool_stats["pytest"]
+    assert (stats.total_uses, stats.success_uses, stats.avg_duration) == (2, 1, 3.0)
+    assert abs(stats.total_cost - 0.04) < 1e-9
+    print(f"✓ Running aggregates: {metrics}")
+
+    reopened = OptimizationKnowledge(db_path=db_path)
+    assert reopened.global_metrics == metrics
+    assert reopened.tool_stats["pytest"] == stats
+    summary = reopened.get_metrics_summary()
+    assert summary["tools_tracked"] == 2 and summary["most_used_tool"] == "pytest"
+    assert reopened.historical_requests[-1].request_text == "add logging to module 4"
+    print("✓ New instance sees history, metrics and tool stats")
+
+
+def test_fresh_process_advice():
+    """Test: WorkflowEngine d'un nouveau processus a l'historique pour ses conseils"""
+    print_section("TEST: Advice in a Fresh Process")
+
+    db_path = temp_db()
+    knowledge = OptimizationKnowledge(db_path=db_path)
+    knowledge.record_request(make_request(1, "Add OAuth2 authentication", tools=["code_validator.sh"]))
+    knowledge.record_request(make_request(2, "Add payment integration", RequestOutcome.FAILURE,
+                                          errors=["Missing API timeout"]))
+
+    result = subprocess.run([sys.executable, "-c", (
+        "import json\n"
+        "from cortex.core.workflow_engine import WorkflowEngine\n"
+        "from cortex.departments.optimization.optimization_knowledge import OptimizationKnowledge\n"
+        f"engine = WorkflowEngine(optimization_knowledge=OptimizationKnowledge(db_path={db_path!r}))\n"
+        "print(json.dumps(engine.optimization.get_optimization_advice('Add authentication', 'code')))"
+    )], capture_output=True, text=True, cwd=ROOT, timeout=120)
+    assert result.returncode == 0, result.stderr[-1000:]
+    advice = json.loads(result.stdout.strip().splitlines()[-1])
+    assert advice["similar_requests_count"] == 2
+    assert advice["recommended_tools"] == [{"tool": "code_validator.sh", "uses": 1}]
+    assert advice["warnings"] == ["Missing API timeout"]
+    print(f"✓ Fresh process advice: {advice['similar_requests_count']} similar, "
+          f"tools {advice['recommended_tools']}, warnings {advice['warnings']}")
+
+
+def test_similarity_index():
+    """Test: l'index inversé classe comme un parcours complet (overlap de mots)"""
+    print_section("TEST: Similarity Index")
+
+    rng = random.Random(7)
+    vocabulary = [f"word{i}" for i in range(40)]
+    knowledge = OptimizationKnowledge(db_path=temp_db())
+    requests = [make_request(i, " ".join(rng.sample(vocabulary, 6))) for i in range(300)]
+    knowledge.record_requests(requests)
+
+    for _ in range(20):
+        query = " ".join(rng.sample(vocabulary, 4))
+        keywords = set(query.split())
+        expected = sorted(
+            ((len(keywords & set(r.request_text.split())), seq) for seq, r in enumerate(requests)),
+            reverse=True
+        )
+        expected = [requests[seq].id for overlap, seq in expected[:5] if overlap > 0]
+        assert [r.id for r in knowledge.find_similar_requests(query)] == expected
+    assert knowledge.find_similar_requests("nothing matches") == []
+    print("✓ Same top 5 as a full scan (ties broken by recency)")
+
+    bounded = OptimizationKnowledge(db_path=str(knowledge.db.db_path), candidates_per_token=10)
+    similar = bounded.find_similar_requests("word1 word2", top_k=50)
+    latest = {r.id for word in ("word1", "word2")
+              for r in [r for r in requests if word in r.request_text.split()][-10:]}
+    assert 0 < len(similar) <= 20 and {r.id for r in similar} <= latest
+    print(f"✓ candidates_per_token bounds the scan ({len(similar)} candidates for 2 words)")
+
+
+def test_failures():
+    """Test: récurrences par type d'erreur, échecs par type"""
+    print_section("TEST: Failures")
+
+    knowledge = OptimizationKnowledge(db_path=temp_db())
+    for i, error_type in enumerate(["timeout", "planning_missing", "timeout", "timeout"]):
+        failure = FailureAnalysis(
+            id=f"fail_{i}", timestamp=datetime.now(), request_id=f"req_{i}", error_type=error_type,
+            error_message="failed", root_cause="?", impact="minor", fix_applied=None,
+            prevention_strategy="retry", recurrence_count=0
+        )
+        knowledge.record_failure(failure)
+    assert failure.recurrence_count == 2
+    timeouts = knowledge.get_common_failures_for_type("timeout")
+    assert [f.id for f in timeouts] == ["fail_0", "fail_2", "fail_3"]
+    assert [f.recurrence_count for f in timeouts] == [0, 1, 2]
+    assert len(knowledge.failure_analyses) == 4
+    assert knowledge.get_metrics_summary()["total_failures_analyzed"] == 4
+    print("✓ Recurrence counts 0, 1, 2 for repeated timeouts")
+
+
+def test_history_view():
+    """Test: historical_requests se comporte comme l'ancienne liste"""
+    print_section("TEST: History View")
+
+    knowledge = OptimizationKnowledge(db_path=temp_db())
+    knowledge.record_requests(make_request(i, f"request {i}", days_ago=max(0, 30 - i)) for i in range(2500))
+
+    history = knowledge.historical_requests
+    assert len(history) == 2500
+    assert history[0].id == "req_0" and history[-1].id == "req_2499" and history[1200].id == "req_1200"
+    assert [r.id for r in history][1999:2001] == ["req_1999", "req_2000"]
+    assert [r.id for r in history[-2:]] == ["req_2498", "req_2499"]
+    recent = knowledge.get_requests_since(datetime.now() - timedelta(days=3, hours=1))
+    assert [r.id for r in recent][-1] == "req_2499" and len(recent) == 2500 - 27
+    print(f"✓ len/index/iteration over {len(history)} stored requests, {len(recent)} since cutoff")
+
+
+def test_close_and_recreated_db():
+    """Test: close() rend le pool partagé, base supprimée puis recréée dans le processus"""
+    print_section("TEST: Close + Recreated Database")
+
+    db_path = temp_db()
+    first = OptimizationKnowledge(db_path=db_path)
+    second = OptimizationKnowledge(db_path=db_path)
+    first.record_request(make_request(1, "add caching"))
+    first.close()
+    first.close()
+    assert second.db.get_stats()["open_connections"] == 1
+    second.record_request(make_request(2, "add retries"))
+    assert len(second.historical_requests) == 2
+    print("✓ Closing one instance leaves the other usable")
+
+    second.close()
+    assert second.db.get_stats()["open_connections"] == 0
+    print("✓ Last close releases the pool connections")
+
+    keeper = OptimizationKnowledge(db_path=db_path)
+    keeper.historical_requests[0]
+    for suffix in ("", "-wal", "-shm"):
+        Path(db_path + suffix).unlink(missing_ok=True)
+    recreated = OptimizationKnowledge(db_path=db_path)
+    assert len(recreated.historical_requests) == 0
+    recreated.record_request(make_request(3, "fresh start"))
+    assert Path(db_path).exists()
+    assert [r.id for r in OptimizationKnowledge(db_path=db_path).historical_requests] == ["req_3"]
+    print("✓ Deleted database recreated with its schema in the same process")
+
+
+if __name__ == "__main__":
+    test_metrics_and_persistence()
+    test_fresh_process_advice()
+    test_similarity_index()
+    test_failures()
+    test_history_view()
+    test_close_and_recreated_db()
+    print("\n✅ All optimization knowledge tests passed")
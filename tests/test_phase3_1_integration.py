@@ -13,6 +13,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from datetime import datetime
+import tempfile
 import time
 
 from cortex.core.department_system import Department, DepartmentRegistry
@@ -33,6 +34,11 @@ def print_section(title: str):
     print(f"{'='*70}\n")
 
 
+def temp_path(name: str) -> str:
+    """Chemin dans un dossier temporaire: les tests n'écrivent pas dans cortex/data"""
+    return str(Path(tempfile.mkdtemp()) / name)
+
+
 def test_department_system():
     """Test 1: Système de départements"""
     print_section("TEST 1: Department System with Knowledge Sharing")
@@ -189,7 +195,7 @@ def test_optimization_knowledge():
     """Test 3: Optimization Knowledge - Apprentissage de l'historique"""
     print_section("TEST 3: Optimization Knowledge Base - Learning from History")
 
-    knowledge = OptimizationKnowledge()
+    knowledge = OptimizationKnowledge(db_path=temp_path("optimization_knowledge.db"))
 
     # Simuler historique de requêtes
     print("📝 Recording historical requests...\n")
@@ -372,7 +378,7 @@ def test_integrated_workflow():
     dev_dept = registry.create_department("development", "Development department")
     opt_dept = registry.create_department("optimization", "Optimization department")
 
-    knowledge = OptimizationKnowledge()
+    knowledge = OptimizationKnowledge(db_path=temp_path("optimization_knowledge.db"))
     todo_manager = TodoListManager()
 
     # Étape 1: Consulter l'optimisation
@@ -0,0 +1,191 @@
+"""
+Tests du cache de préfixe côté provider
+
+Teste contre un provider local factice (tests/fake_provider.py):
+- Mise en page: system statique, historique, contexte volatile, requête
+- Points cache_control Anthropic
+- Préfixe octet pour octet identique entre deux appels (DeepSeek/OpenAI)
+- Coût des tokens lus depuis le cache
+- Taux de hit par agent
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openai import OpenAI
+from anthropic import Anthropic
+
+from cortex.core.llm_client import LLMClient, ModelTier
+from cortex.tools.standard_tool import tool
+from cortex.core.prompt_cache import (
+    arrange_messages,
+    sort_tools,
+    volatile,
+    agent_scope,
+    get_prompt_cache_stats
+)
+from tests.fake_provider import FakeProvider
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def make_client(provider: FakeProvider) -> LLMClient:
+    """LLMClient sans cache branché sur le provider factice"""
+    client = LLMClient(use_cache=False)
+    client.openai_client = OpenAI(api_key="test", base_url=provider.openai_url, max_retries=0)
+    client.deepseek_client = OpenAI(api_key="test", base_url=provider.openai_url, max_retries=0)
+    client.anthropic_client = Anthropic(api_key="test", base_url=provider.anthropic_url, max_retries=0)
+    return client
+
+
+def conversation(context: str, question: str):
+    """Conversation avec un contexte volatile inséré avant l'historique"""
+    return [
+        {"role": "system", "content": "You are a coding assistant."},
+        volatile({"role": "system", "content": f"APPLICATION CONTEXT:\n{context}"}),
+        {"role": "user", "content": "List the files"},
+        {"role": "assistant", "content": "main.py, utils.py"},
+        {"role": "user", "content": question}
+    ]
+
+
+@tool(name="write_file", description="Write a file", parameters={"type": "object", "properties": {}})
+def write_file():
+    return {"success": True}
+
+
+@tool(name="read_file", description="Read a file", parameters={"type": "object", "properties": {}})
+def read_file():
+    return {"success": True}
+
+
+TOOLS = [write_file, read_file]
+
+
+def test_arrange_messages():
+    """Test: le contexte volatile passe après l'historique, sans marqueur"""
+    print_section("TEST: Arrange Messages")
+
+    arranged, stable_count = arrange_messages(conversation("ctx A", "Open main.py"))
+
+    assert [m["role"] for m in arranged] == ["system", "user", "assistant", "system", "user"]
+    assert arranged[3]["content"] == "APPLICATION CONTEXT:\nctx A"
+    assert all("_volatile" not in m for m in arranged)
+    assert stable_count == 2, "Stable prefix = system + first exchange"
+    print("✓ Static system → history → volatile context → request")
+
+    midway = [{"role": "system", "content": "You are a coding assistant."},
+              {"role": "user", "content": "List the files"},
+              {"role": "system", "content": "Answer in French from now on."},
+              {"role": "user", "content": "Open main.py"}]
+    arranged, _ = arrange_messages(midway)
+    assert arranged == midway, "A system message inside the conversation keeps its position"
+    print("✓ Only the leading system messages form the static prefix")
+
+    names = [t["function"]["name"] for t in sort_tools([t.to_openai_format() for t in TOOLS])]
+    assert names == ["read_file", "write_file"]
+    print("✓ Tools sorted by name")
+
+
+def test_stable_openai_prefix():
+    """Test: deux requêtes au contexte différent partagent le même préfixe"""
+    print_section("TEST: Byte-Stable Prefix (DeepSeek)")
+
+    with FakeProvider(text="ok") as provider:
+        client = make_client(provider)
+        client.complete(conversation("ctx A", "Open main.py"), ModelTier.DEEPSEEK, max_tokens=20, tools=TOOLS)
+        client.complete(conversation("ctx B", "Open utils.py"), ModelTier.DEEPSEEK, max_tokens=20, tools=list(reversed(TOOLS)))
+
+        first, second = (r["body"] for r in provider.requests)
+        prefix = lambda body: json.dumps({"tools": body["tools"], "messages": body["messages"][:3]})
+        assert prefix(first) == prefix(second)
+        assert first["messages"][3] != second["messages"][3]
+        print("✓ Tools + system + history identical byte for byte")
+
+
+def test_anthropic_breakpoints():
+    """Test: system concaténé, volatile en tour utilisateur, points cache_control"""
+    print_section("TEST: Anthropic Breakpoints")
+
+    with FakeProvider(text="ok") as provider:
+        client = make_client(provider)
+        messages = [{"role": "system", "content": "Rules part 1"}, {"role": "system", "content": "Rules part 2"}]
+        messages += conversation("ctx A", "Open main.py")[1:]
+        client.complete(messages, ModelTier.CLAUDE, max_tokens=20, tools=TOOLS)
+
+        body = provider.requests[0]["body"]
+        assert body["system"][0]["text"] == "Rules part 1\n\nRules part 2", "Both system messages kept"
+        assert body["system"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert body["tools"][-1]["name"] == "write_file"
+        assert body["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+
+        roles = [m["role"] for m in body["messages"]]
+        assert roles == ["user", "assistant", "user", "user"]
+        assert body["messages"][1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert body["messages"][2]["content"] == "APPLICATION CONTEXT:\nctx A"
+        print("✓ Breakpoints on tools, system and stable history")
+
+
+def test_anthropic_volatile_without_history():
+    """Test: sans historique, le contexte volatile reste hors du system caché"""
+    print_section("TEST: Anthropic Volatile Without History")
+
+    with FakeProvider(text="ok") as provider:
+        client = make_client(provider)
+        messages = [conversation("ctx A", "Open main.py")[i] for i in (0, 1, 4)]
+        client.complete(messages, ModelTier.CLAUDE, max_tokens=20)
+
+        body = provider.requests[0]["body"]
+        assert [b["text"] for b in body["system"]] == ["You are a coding assistant."]
+        assert body["system"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert [m["role"] for m in body["messages"]] == ["user", "user"]
+        assert body["messages"][0]["content"] == "APPLICATION CONTEXT:\nctx A"
+        print("✓ Volatile context sent as a user turn after the system breakpoint")
+
+
+def test_cached_cost_and_agent_report():
+    """Test: tokens cachés facturés au tarif réduit, taux de hit par agent"""
+    print_section("TEST: Cached Cost + Agent Report")
+
+    stats = get_prompt_cache_stats()
+    stats.clear()
+
+    with FakeProvider(text="ok", tokens_input=10000, tokens_cached=8000) as provider:
+        client = make_client(provider)
+
+        with agent_scope("Planner"):
+            response = client.complete([{"role": "user", "content": "hi"}], ModelTier.DEEPSEEK, max_tokens=20)
+        assert response.tokens_input == 10000
+        assert response.tokens_cached == 8000
+        full = client._calculate_cost("deepseek", 10000, response.tokens_output)
+        assert response.cost < full
+        print(f"✓ DeepSeek: ${response.cost:.6f} instead of ${full:.6f}")
+
+        with agent_scope("Reviewer"):
+            response = client.complete([{"role": "user", "content": "hi"}], ModelTier.CLAUDE, max_tokens=20)
+        assert response.tokens_input == 10000, "Anthropic input includes cache reads"
+        assert response.tokens_cached == 8000
+
+    report = stats.report()
+    assert set(report) == {"Planner", "Reviewer"}
+    assert abs(report["Planner"]["hit_ratio"] - 0.8) < 1e-9
+    assert report["Reviewer"]["cost_saved"] > 0
+    print(f"✓ Hit ratio per agent: { {a: r['hit_ratio'] for a, r in report.items()} }")
+    stats.clear()
+
+
+if __name__ == "__main__":
+    test_arrange_messages()
+    test_stable_openai_prefix()
+    test_anthropic_breakpoints()
+    test_anthropic_volatile_without_history()
+    test_cached_cost_and_agent_report()
+    print("\n✅ All prompt cache tests passed")
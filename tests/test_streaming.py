@@ -0,0 +1,218 @@
+"""
+Tests du streaming LLM
+
+Teste contre un provider local factice (tests/fake_provider.py):
+- Fragments de texte normalisés (NANO, DeepSeek, Claude)
+- Assemblage incrémental des arguments de tool calls
+- Boucle de tools streamée: préambule d'un tour à tool calls séparé de la réponse
+- Variante async (astream), arrêt anticipé du consommateur
+- Métriques TTFT / tokens par seconde
+"""
+
+import asyncio
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openai import OpenAI
+from anthropic import Anthropic
+
+from cortex.cli.terminal_ui import StreamPrinter, TerminalUI
+from cortex.core.llm_client import LLMClient, ModelTier
+from cortex.tools.standard_tool import tool
+from cortex.tools.tool_executor import ToolExecutor
+from tests.fake_provider import FakeProvider
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def make_client(provider: FakeProvider) -> LLMClient:
+    """LLMClient sans cache branché sur le provider factice"""
+    client = LLMClient(use_cache=False)
+    client.openai_client = OpenAI(api_key="test", base_url=provider.openai_url, max_retries=0)
+    client.deepseek_client = OpenAI(api_key="test", base_url=provider.openai_url, max_retries=0)
+    client.anthropic_client = Anthropic(api_key="test", base_url=provider.anthropic_url, max_retries=0)
+    return client
+
+
+@tool(
+    name="get_weather",
+    description="Get the weather for a city",
+    parameters={
+        "type": "object",
+        "properties": {"city": {"type": "string", "description": "City name"}},
+        "required": ["city"]
+    }
+)
+def get_weather(city: str) -> str:
+    return f"Sunny in {city}"
+
+
+def test_stream_text_all_tiers():
+    """Test: fragments de texte puis réponse finale, pour chaque provider"""
+    print_section("TEST: Stream Text")
+
+    messages = [{"role": "user", "content": "Say hello"}]
+
+    with FakeProvider(text="Hello from the fake provider", tokens_input=7) as provider:
+        client = make_client(provider)
+
+        for tier in (ModelTier.NANO, ModelTier.DEEPSEEK, ModelTier.CLAUDE):
+            deltas = list(client.stream(messages, tier, max_tokens=100))
+
+            texts = [d.text for d in deltas if d.type == "text"]
+            assert len(texts) > 1, f"{tier.value}: expected several fragments"
+            assert "".join(texts) == "Hello from the fake provider"
+
+            done = deltas[-1]
+            assert done.type == "done"
+            assert done.response.content == "Hello from the fake provider"
+            assert done.response.tokens_input == 7
+            assert done.response.tokens_output == len(texts)
+            print(f"✓ {tier.value}: {len(texts)} fragments, finish={done.response.finish_reason}")
+
+
+def test_stream_tool_calls():
+    """Test: les arguments JSON fragmentés sont réassemblés"""
+    print_section("TEST: Stream Tool Calls")
+
+    messages = [{"role": "user", "content": "Weather in Granby?"}]
+    tool_calls = [{"name": "get_weather", "arguments": {"city": "Granby"}}]
+
+    with FakeProvider(text="", tool_calls=tool_calls) as provider:
+        client = make_client(provider)
+
+        for tier in (ModelTier.DEEPSEEK, ModelTier.CLAUDE):
+            deltas = list(client.stream(messages, tier, max_tokens=100, tools=[get_weather]))
+
+            fragments = [d for d in deltas if d.type == "tool_call"]
+            assert len(fragments) >= 2, "Arguments should arrive in several fragments"
+
+            response = deltas[-1].response
+            assert len(response.tool_calls) == 1
+            assert response.tool_calls[0].name == "get_weather"
+            assert response.tool_calls[0].arguments == {"city": "Granby"}
+            print(f"✓ {tier.value}: tool call assembled from {len(fragments)} fragments")
+
+
+def test_stream_tool_loop():
+    """Test: le texte d'un tour à tool calls est signalé, la réponse finale vient seule"""
+    print_section("TEST: Streamed Tool Loop")
+
+    def responder(path, body):
+        if any(m.get("role") == "tool" for m in body.get("messages", [])):
+            return {"text": "Sunny in Granby today", "tool_calls": []}
+        return {"text": "Let me check the weather.", "tool_calls": [
+            {"name": "get_weather", "arguments": {"city": "Granby"}}
+        ]}
+
+    with FakeProvider(responder=responder) as provider:
+        executor = ToolExecutor(make_client(provider))
+        executor.register_tool(get_weather)
+
+        events = []
+        response = executor.execute_with_tools(
+            [{"role": "user", "content": "Weather in Granby?"}], tier=ModelTier.DEEPSEEK,
+            on_text=lambda text: events.append(("text", text)),
+            on_tool_turn=lambda calls: events.append(("tools", [tc.name for tc in calls]))
+        )
+        marker = events.index(("tools", ["get_weather"]))
+        assert "".join(text for _, text in events[:marker]) == "Let me check the weather."
+        assert "".join(text for _, text in events[marker + 1:]) == response.content == "Sunny in Granby today"
+        print("✓ Preamble and final answer delivered on either side of the tool turn")
+
+        output = io.StringIO()
+        printer = StreamPrinter(TerminalUI(use_colors=False))
+        with contextlib.redirect_stdout(output):
+            executor.execute_with_tools(
+                [{"role": "user", "content": "Weather in Granby?"}], tier=ModelTier.DEEPSEEK,
+                on_text=printer.write, on_tool_turn=printer.tool_turn
+            )
+            printer.finish()
+        text = output.getvalue()
+        assert text.index("Let me check the weather.") < text.index("🔧 Calling tools: get_weather") \
+            < text.index("Sunny in Granby today")
+        print("✓ StreamPrinter closes the preamble with a tool marker")
+        executor.close()
+
+
+def test_astream_and_metrics():
+    """Test: variante async et statistiques TTFT par tier"""
+    print_section("TEST: Async Stream + Metrics")
+
+    messages = [{"role": "user", "content": "Say hello"}]
+
+    with FakeProvider(text="one two three four", first_token_delay=0.05, chunk_delay=0.01) as provider:
+        client = make_client(provider)
+
+        async def collect():
+            return [delta async for delta in client.astream(messages, ModelTier.DEEPSEEK, max_tokens=100)]
+
+        deltas = asyncio.run(collect())
+        assert "".join(d.text for d in deltas if d.type == "text") == "one two three four"
+        assert deltas[-1].type == "done"
+        print("✓ astream yields the same deltas")
+
+        stats = client.get_stream_stats()["deepseek"]
+        assert stats["streams"] == 1
+        assert stats["ttft_avg"] >= 0.05, "TTFT should include the first token delay"
+        assert stats["tokens_per_sec"] > 0
+        print(f"✓ TTFT: {stats['ttft_avg']*1000:.0f}ms, {stats['tokens_per_sec']:.0f} tokens/s")
+
+
+def test_astream_early_exit_closes_provider_stream():
+    """Test: consommateur arrêté (aclose, annulation) → stream provider fermé"""
+    print_section("TEST: Async Stream Early Exit")
+
+    messages = [{"role": "user", "content": "Count"}]
+    words = " ".join(f"w{i}" for i in range(400))  # ~4s de stream complet
+
+    with FakeProvider(text=words, first_token_delay=0.01, chunk_delay=0.01) as provider:
+        client = make_client(provider)
+
+        async def wait_disconnects(expected):
+            # Vérifié boucle encore ouverte: le producteur doit réagir à l'arrêt
+            deadline = time.time() + 1
+            while provider.disconnects < expected and time.time() < deadline:
+                await asyncio.sleep(0.02)
+            return provider.disconnects
+
+        async def consume():
+            async for _ in client.astream(messages, ModelTier.NANO, max_tokens=1000):
+                pass
+
+        async def main():
+            stream = client.astream(messages, ModelTier.DEEPSEEK, max_tokens=1000)
+            async for delta in stream:
+                if delta.type == "text":
+                    break
+            await stream.aclose()
+            assert await wait_disconnects(1) == 1, "Provider stream left open after aclose"
+
+            task = asyncio.ensure_future(consume())
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+            assert await wait_disconnects(2) == 2, "Provider stream left open after cancellation"
+
+        asyncio.run(main())
+        print("✓ Provider stream closed after aclose and after cancellation")
+
+
+if __name__ == "__main__":
+    test_stream_text_all_tiers()
+    test_stream_tool_calls()
+    test_stream_tool_loop()
+    test_astream_and_metrics()
+    test_astream_early_exit_closes_provider_stream()
+    print("\n✅ All streaming tests passed")
@@ -0,0 +1,165 @@
+"""
+Tests de la couche SQLite partagée (TodoDB, AuthManager, TaskManager)
+
+Teste:
+- Connexions réutilisées par thread, journal WAL, fermées à la fin du thread
+- list_tasks en une seule requête (propriétaires joints, plus de N+1)
+- Cache TTL des tokens vérifiés
+- AsyncTaskManager: lectures et écritures concurrentes
+"""
+
+import asyncio
+import importlib
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+from cortex.core.auth_manager import AuthManager, UserRole
+from cortex.core.model_router import ModelTier
+from cortex.core.sqlite_pool import SQLitePool
+from cortex.core.todo_db import TodoDB
+from cortex.tools.task_management_tools import AsyncTaskManager
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def make_db(**auth_kwargs):
+    directory = Path(tempfile.mkdtemp())
+    auth = AuthManager(str(directory / "auth.db"), jwt_secret="test-secret-" * 4, **auth_kwargs)
+    return auth, TodoDB(str(directory / "todo_pool.db"), auth)
+
+
+def test_join_and_connection_reuse():
+    """Test: propriétaires joints en une requête, une connexion par thread"""
+    print_section("TEST: JOIN + Connection Reuse")
+
+    auth, todo = make_db()
+    admin = auth.login("Cortex", "cortex123")["token"]
+    auth.register_user("alice", "alice123", UserRole.DEVELOPER)
+    alice = auth.login("alice", "alice123")["token"]
+
+    for i in range(20):
+        todo.add_task(admin if i % 2 else alice, f"task {i}", "ctx", ModelTier.NANO)
+
+    assert todo.db.fetchone("PRAGMA journal_mode")[0] == "wal"
+    assert todo.db.connections_opened == 1 and auth.db.connections_opened == 1
+    print("✓ One WAL connection per database after 20 inserts")
+
+    statements = []
+    todo.db.connection().set_trace_callback(statements.append)
+    auth.db.connection().set_trace_callback(statements.append)
+    result = todo.list_tasks(alice)
+    todo.db.connection().set_trace_callback(None)
+    auth.db.connection().set_trace_callback(None)
+
+    assert result["count"] == 20
+    assert {t["owner_name"] for t in result["tasks"]} == {"Cortex", "alice"}
+    assert len(statements) == 1 and "JOIN auth.users" in statements[0], statements
+    print(f"✓ list_tasks of 20 tasks = {len(statements)} statement (token cached, owners joined)")
+
+    # Utilisateur désactivé: même libellé qu'avant (User#id)
+    with auth.db.transaction() as conn:
+        conn.execute("UPDATE users SET is_active = 0 WHERE username = 'alice'")
+    task = todo.list_tasks(admin, owner_id=2)["tasks"][0]
+    assert task["owner_name"] == "User#2"
+    assert todo.get_task(admin, task["id"])["task"]["owner_name"] == "User#2"
+    print("✓ Inactive owners shown as User#id")
+
+
+def test_thread_connections_closed():
+    """Test: la connexion d'un thread de courte durée est fermée à sa fin"""
+    print_section("TEST: Short-Lived Thread Connections")
+
+    pool = SQLitePool(str(Path(tempfile.mkdtemp()) / "workers.db"))
+    assert pool.fetchone("SELECT 1")[0] == 1
+    opened = []
+
+    def worker():
+        opened.append(pool.connection())
+        pool.fetchone("SELECT 1")
+
+    for _ in range(20):
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+    assert pool.connections_opened == 21
+    assert pool.get_stats()["open_connections"] == 1, "Only the main thread connection stays open"
+    try:
+        opened[0].execute("SELECT 1")
+    except sqlite3.ProgrammingError:
+        pass
+    else:
+        raise AssertionError("Worker connection left open")
+    assert pool.fetchone("SELECT 1")[0] == 1
+    print("✓ 20 worker threads, connections closed as each one exits")
+    pool.close()
+
+
+def test_token_cache():
+    """Test: token vérifié mis en cache, invalidation, cache désactivable"""
+    print_section("TEST: Token Cache")
+
+    auth, _ = make_db(token_cache_ttl=60)
+    token = auth.login("Cortex", "cortex123")["token"]
+
+    first = auth.verify_token(token)
+    second = auth.verify_token(token)
+    assert first == second and first["success"]
+    assert (auth.token_cache_misses, auth.token_cache_hits) == (1, 1)
+    assert not auth.verify_token(token + "x")["success"], "Bad signatures are never cached"
+
+    auth.invalidate_token_cache()
+    auth.verify_token(token)
+    assert auth.token_cache_misses == 3
+    print("✓ Verified tokens served from cache until invalidated")
+
+    uncached, _ = make_db(token_cache_ttl=0)
+    token = uncached.login("Cortex", "cortex123")["token"]
+    uncached.verify_token(token)
+    uncached.verify_token(token)
+    assert uncached.token_cache_hits == 0
+    print("✓ token_cache_ttl=0 disables the cache")
+
+
+def test_async_task_manager():
+    """Test: lectures et écritures concurrentes via AsyncTaskManager"""
+    print_section("TEST: AsyncTaskManager")
+
+    _, todo = make_db()
+    migration = importlib.import_module("cortex.core.migrations.001_add_ml_fields")
+    assert migration.migrate(str(todo.db_path))
+
+    manager = AsyncTaskManager(str(todo.db_path), max_workers=4)
+
+    async def scenario():
+        created = await asyncio.gather(*[
+            manager.create_task(f"async task {i}", priority=i % 5 + 1, category="test")
+            for i in range(20)
+        ])
+        assert all(r["success"] for r in created), created
+        listed = await asyncio.gather(*[manager.list_tasks(status="pending", limit=100) for _ in range(10)])
+        next_task = await manager.get_next_task()
+        return listed, next_task
+
+    listed, next_task = asyncio.run(scenario())
+    manager.close()
+
+    assert all(r["count"] == 20 for r in listed)
+    assert next_task["task"]["priority"] == 1
+    assert manager.sync.db.connections_opened <= 4
+    print(f"✓ 20 concurrent writes + 10 concurrent reads on {manager.sync.db.connections_opened} connections")
+
+
+if __name__ == "__main__":
+    test_join_and_connection_reuse()
+    test_thread_connections_closed()
+    test_token_cache()
+    test_async_task_manager()
+    print("\n✅ All TodoDB tests passed")
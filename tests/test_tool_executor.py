@@ -0,0 +1,237 @@
+"""
+Tests de l'exécution parallèle des tool calls (ToolExecutor)
+
+Teste:
+- Tools read_only en parallèle: latence ≈ tool le plus lent
+- Tools ordered dans l'ordre, exclusifs (ou sans mode déclaré) seuls
+- Timeout des tools read_only, exclusifs attendus jusqu'au bout
+- Résultats dans l'ordre des appels
+- Pool: unique malgré des accès concurrents, timeout compté au démarrage,
+  appels en file annulés à la fermeture, sortie de l'interpréteur non bloquée
+- Boucle execute_with_tools complète avec un client LLM factice
+"""
+
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from cortex.core.llm_client import LLMResponse, ModelTier, ToolCall
+from cortex.tools.standard_tool import StandardTool
+from cortex.tools.tool_executor import ToolExecutor, ToolPool
+
+ROOT = Path(__file__).parent.parent
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+class ScriptedClient:
+    """Client LLM factice: demande des tool calls, puis répond"""
+
+    def __init__(self, tool_calls):
+        self.tool_calls = tool_calls
+        self.calls = []
+
+    def complete(self, messages, tier, max_tokens=None, temperature=1.0, tools=None):
+        self.calls.append(messages)
+        tool_calls = self.tool_calls if len(self.calls) == 1 else None
+        return LLMResponse(
+            content="done", model="fake", tokens_input=10, tokens_output=5, cost=0.0,
+            finish_reason="tool_calls" if tool_calls else "stop", tool_calls=tool_calls
+        )
+
+
+def make_tool(name, log, delay=0.0, **flags):
+    def run(value: str = ""):
+        log.append(("start", name, value, time.perf_counter()))
+        time.sleep(delay)
+        log.append(("end", name, value, time.perf_counter()))
+        return {"success": True, "data": f"{name}:{value}"}
+
+    return StandardTool(
+        name=name,
+        description=name,
+        parameters={"type": "object", "properties": {"value": {"type": "string"}}, "required": []},
+        function=run,
+        **flags
+    )
+
+
+def make_executor(log, max_parallel=8):
+    executor = ToolExecutor(ScriptedClient([]), max_parallel=max_parallel, default_timeout=5)
+    executor.register_tools([
+        make_tool("fetch", log, delay=0.2, read_only=True),
+        make_tool("write", log, delay=0.05, ordered=True),
+        make_tool("commit", log, delay=0.01, exclusive=True),
+        make_tool("hang", log, delay=2.0, read_only=True, timeout=0.2),
+        make_tool("push", log, delay=0.4, exclusive=True, timeout=0.1),
+        make_tool("legacy", log, delay=0.1),
+    ])
+    return executor
+
+
+def test_parallel_read_only_calls():
+    """Test: 5 fetch read_only ≈ 1 fetch, résultats dans l'ordre"""
+    print_section("TEST: Parallel Read-Only Calls")
+
+    log = []
+    executor = make_executor(log)
+    calls = [ToolCall(id=f"c{i}", name="fetch", arguments={"value": str(i)}) for i in range(5)]
+
+    start = time.perf_counter()
+    results = executor.execute_tool_calls(calls)
+    elapsed = time.perf_counter() - start
+
+    assert [r.tool_call_id for r in results] == ["c0", "c1", "c2", "c3", "c4"]
+    assert [r.result["data"] for r in results] == [f"fetch:{i}" for i in range(5)]
+    assert all(r.success and r.duration >= 0.2 for r in results)
+    assert elapsed < 0.5, elapsed
+    print(f"✓ 5 × 200ms fetch in {elapsed * 1000:.0f}ms")
+
+    serial = make_executor([], max_parallel=1)
+    start = time.perf_counter()
+    serial.execute_tool_calls(calls)
+    assert time.perf_counter() - start >= 1.0
+    print("✓ max_parallel=1 keeps serial execution")
+    executor.close()
+    serial.close()
+
+
+def test_ordering_and_exclusive():
+    """Test: écritures ordonnées, exclusif sans chevauchement, timeout"""
+    print_section("TEST: Ordering + Exclusive + Timeout")
+
+    log = []
+    executor = make_executor(log)
+    names = ["write", "fetch", "write", "commit", "fetch", "write", "hang"]
+    calls = [ToolCall(id=f"c{i}", name=name, arguments={"value": str(i)}) for i, name in enumerate(names)]
+
+    results = executor.execute_tool_calls(calls)
+    assert [r.tool_call_id for r in results] == [f"c{i}" for i in range(len(names))]
+
+    events = {(kind, value): t for kind, _, value, t in log}
+    writes = [("0", "2"), ("2", "5")]
+    for before, after in writes:
+        assert events[("end", before)] <= events[("start", after)], "Writes keep call order"
+    assert events[("start", "1")] < events[("end", "0")], "Read-only fetch overlaps the first write"
+
+    commit_start, commit_end = events[("start", "3")], events[("end", "3")]
+    assert all(events[("end", v)] <= commit_start for v in ("0", "1", "2"))
+    assert all(events[("start", v)] >= commit_end for v in ("4", "5"))
+    print("✓ Writes ordered, exclusive commit runs alone")
+
+    hang = results[-1]
+    assert not hang.success and "Timeout" in hang.error
+    assert all(r.success for r in results[:-1])
+    print("✓ Per-tool timeout reported without blocking the turn")
+    executor.close()
+
+
+def test_side_effect_tools_not_abandoned():
+    """Test: un exclusif lent n'est pas abandonné, un tool sans mode s'exécute seul"""
+    print_section("TEST: Exclusive Past Timeout + Undeclared Mode")
+
+    log = []
+    executor = make_executor(log)
+    names = ["fetch", "push", "write", "legacy", "fetch"]
+    calls = [ToolCall(id=f"c{i}", name=name, arguments={"value": str(i)}) for i, name in enumerate(names)]
+
+    results = executor.execute_tool_calls(calls)
+    assert all(r.success for r in results), [r.error for r in results]
+    events = {(kind, value): t for kind, _, value, t in log}
+    assert events[("end", "1")] <= events[("start", "2")], "Push finishes before the next call"
+    assert events[("end", "0")] <= events[("start", "1")]
+    print("✓ Exclusive push past its timeout completes before the next segment")
+
+    assert events[("end", "2")] <= events[("start", "3")] and events[("end", "3")] <= events[("start", "4")]
+    print("✓ Tool without declared mode runs alone")
+
+    serial = make_executor(log, max_parallel=1)
+    result = serial.execute_tool_calls([ToolCall(id="s", name="push", arguments={"value": "s"})])[0]
+    assert result.success and result.duration >= 0.4
+    print("✓ Serial path waits for the exclusive tool too")
+    executor.close()
+    serial.close()
+
+
+def test_execute_with_tools_loop():
+    """Test: boucle complète, messages tool dans l'ordre des appels"""
+    print_section("TEST: execute_with_tools")
+
+    log = []
+    executor = make_executor(log)
+    calls = [ToolCall(id=f"c{i}", name="fetch", arguments={"value": str(i)}) for i in range(3)]
+    executor.llm_client = ScriptedClient(calls)
+
+    response = executor.execute_with_tools([{"role": "user", "content": "go"}], tier=ModelTier.NANO)
+    assert response.content == "done"
+
+    second_turn = executor.llm_client.calls[1]
+    tool_messages = [m for m in second_turn if m["role"] == "tool"]
+    assert [m["tool_call_id"] for m in tool_messages] == ["c0", "c1", "c2"]
+    assert [m["content"] for m in tool_messages] == ["fetch:0", "fetch:1", "fetch:2"]
+    executor.close()
+    print("✓ Tool results appended in call order")
+
+
+def test_pool_lifecycle():
+    """Test: pool unique, attente en file hors timeout, fermeture et sortie non bloquées"""
+    print_section("TEST: Pool Lifecycle")
+
+    log = []
+    executor = make_executor(log, max_parallel=2)
+    pools = []
+    threads = [threading.Thread(target=lambda: pools.append(executor._get_pool())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(p is pools[0] for p in pools)
+    print("✓ One pool created under concurrent access")
+
+    executor.register_tool(make_tool("slow", log, delay=0.3, read_only=True, timeout=0.45))
+    calls = [ToolCall(id=f"c{i}", name="slow", arguments={"value": str(i)}) for i in range(3)]
+    results = executor.execute_tool_calls(calls)
+    assert all(r.success for r in results), [r.error for r in results]
+    print("✓ Time spent queued does not count against the tool timeout")
+    executor.close()
+
+    pool = ToolPool(max_workers=1)
+    release = threading.Event()
+    running = pool.submit(release.wait)
+    queued = pool.submit(time.sleep, 0)
+    pool.shutdown(cancel_futures=True)
+    assert queued.cancelled() and not running.cancelled()
+    release.set()
+    assert running.result(timeout=1)
+    print("✓ Queued calls cancelled on shutdown")
+
+    script = (
+        "from cortex.core.llm_client import ToolCall\n"
+        "from tests.test_tool_executor import make_executor, make_tool\n"
+        "executor = make_executor([])\n"
+        "executor.register_tool(make_tool('stuck', [], delay=10, read_only=True, timeout=0.1))\n"
+        "result = executor.execute_tool_calls([ToolCall(id='s', name='stuck', arguments={})])[0]\n"
+        "assert not result.success\n"
+    )
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, timeout=30)
+    elapsed = time.perf_counter() - start
+    assert result.returncode == 0, result.stderr[-1000:]
+    assert "Timeout" in result.stdout and elapsed < 8, elapsed
+    print(f"✓ Interpreter exits in {elapsed:.2f}s despite an abandoned tool")
+
+
+if __name__ == "__main__":
+    test_parallel_read_only_calls()
+    test_ordering_and_exclusive()
+    test_side_effect_tools_not_abandoned()
+    test_execute_with_tools_loop()
+    test_pool_lifecycle()
+    print("\n✅ All tool executor tests passed")
@@ -0,0 +1,196 @@
+"""
+Tests de l'exécution en DAG du WorkflowEngine
+
+Teste:
+- Étapes indépendantes en parallèle, dépendances respectées, speedup
+- Ordonnancement par chemin critique quand le pool est saturé
+- Échec d'une étape requise: dépendants annulés, branches indépendantes exécutées
+- Workflows sans dépendances déclarées: exécution séquentielle historique
+- Dépendances invalides (inconnue, cycle)
+"""
+
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from cortex.core.todolist_manager import TaskStatus, TodoListManager
+from cortex.core.workflow_engine import WorkflowEngine, WorkflowStep
+from cortex.departments.communication.ceo_reporter import CEOReporter
+from cortex.departments.maintenance.roadmap_manager import RoadmapManager
+from cortex.departments.optimization.optimization_knowledge import OptimizationKnowledge
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+def temp_path(name: str) -> str:
+    """Chemin dans un dossier temporaire: les tests n'écrivent pas dans cortex/data"""
+    return str(Path(tempfile.mkdtemp()) / name)
+
+
+def make_engine(max_parallel_steps: int) -> WorkflowEngine:
+    """WorkflowEngine dont la base d'optimisation, le roadmap, les rapports et les todolists sont temporaires"""
+    return WorkflowEngine(
+        optimization_knowledge=OptimizationKnowledge(db_path=temp_path("optimization_knowledge.db")),
+        roadmap_manager=RoadmapManager(temp_path("roadmap.json")),
+        ceo_reporter=CEOReporter(temp_path("ceo_reports")),
+        todolist_manager=TodoListManager(temp_path("todolists")),
+        max_parallel_steps=max_parallel_steps
+    )
+
+
+class Recorder:
+    """Actions d'étapes qui journalisent début/fin"""
+
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+
+    def action(self, name, delay=0.1, fail=False):
+        def run():
+            with self.lock:
+                self.events.append(("start", name, time.perf_counter()))
+            time.sleep(delay)
+            with self.lock:
+                self.events.append(("end", name, time.perf_counter()))
+            if fail:
+                raise RuntimeError(f"{name} broke")
+            return f"{name} done"
+        return run
+
+    def time(self, kind, name):
+        return next(t for k, n, t in self.events if k == kind and n == name)
+
+    def started(self, name):
+        return any(k == "start" and n == name for k, n, _ in self.events)
+
+
+def step(recorder, name, depends_on=None, delay=0.1, **kwargs):
+    fail = kwargs.pop("fail", False)
+    return WorkflowStep(
+        name=name,
+        action=recorder.action(name, delay, fail),
+        department="analysis",
+        agent_name=f"{name}Agent",
+        consult_optimization=False,
+        depends_on=depends_on,
+        **kwargs
+    )
+
+
+def test_parallel_dag():
+    """Test: branches indépendantes en parallèle, jointure après ses dépendances"""
+    print_section("TEST: Parallel DAG")
+
+    rec = Recorder()
+    engine = make_engine(4)
+    steps = [
+        step(rec, "analyze", depends_on=[]),
+        step(rec, "enrich_docs", depends_on=[]),
+        step(rec, "enrich_web", depends_on=[]),
+        step(rec, "plan_tests", depends_on=["analyze"]),
+        step(rec, "implement", depends_on=["analyze", "enrich_docs", "enrich_web"]),
+        step(rec, "report", depends_on=["plan_tests", "implement"]),
+    ]
+    result = engine.execute_workflow("dag", "parallel steps", steps, request_type="analysis")
+
+    assert result.success and result.steps_completed == 6
+    assert result.output == "report done"
+    for before, after in [("analyze", "plan_tests"), ("enrich_web", "implement"),
+                          ("implement", "report"), ("plan_tests", "report")]:
+        assert rec.time("end", before) <= rec.time("start", after), (before, after)
+    assert rec.time("start", "enrich_web") < rec.time("end", "analyze")
+
+    assert set(result.step_durations) == {s.name for s in steps}
+    assert all(d >= 0.1 for d in result.step_durations.values())
+    assert result.speedup > 1.5, result.speedup
+    print(f"✓ 6 steps × 100ms on 3 levels, speedup x{result.speedup:.1f}")
+
+    tasks = engine.todolist.get_all_tasks()
+    assert tasks[5].dependencies == ["task_3", "task_4"]
+    assert all(t.status == TaskStatus.COMPLETED for t in tasks)
+    print("✓ TodoList tracks dependencies")
+
+
+def test_critical_path_ordering():
+    """Test: avec 1 worker, la branche la plus longue démarre d'abord"""
+    print_section("TEST: Critical Path Ordering")
+
+    rec = Recorder()
+    engine = make_engine(1)
+    steps = [
+        step(rec, "short", depends_on=[], delay=0.01, estimated_seconds=1),
+        step(rec, "long_head", depends_on=[], delay=0.01, estimated_seconds=1),
+        step(rec, "long_tail", depends_on=["long_head"], delay=0.01, estimated_seconds=5),
+    ]
+    result = engine.execute_workflow("critical", "critical path", steps, request_type="analysis")
+
+    order = [n for k, n, _ in rec.events if k == "start"]
+    assert result.success and order == ["long_head", "long_tail", "short"], order
+    print(f"✓ Start order: {order}")
+
+
+def test_failure_cancels_dependents():
+    """Test: échec requis → dépendants annulés; optionnel → dépendants exécutés"""
+    print_section("TEST: Failure Cancels Dependents")
+
+    rec = Recorder()
+    engine = make_engine(2)
+    steps = [
+        step(rec, "fetch", depends_on=[], fail=True),
+        step(rec, "parse", depends_on=["fetch"]),
+        step(rec, "summarize", depends_on=["parse"]),
+        step(rec, "lint", depends_on=[], fail=True, required=False),
+        step(rec, "format", depends_on=["lint"]),
+    ]
+    result = engine.execute_workflow("failing", "failure", steps, request_type="analysis")
+
+    assert not result.success
+    assert result.steps_cancelled == ["parse", "summarize"]
+    assert not rec.started("parse") and not rec.started("summarize")
+    assert rec.started("format"), "Optional failure does not cancel dependents"
+    assert result.steps_completed == 1 and len(result.errors) == 2
+
+    tasks = engine.todolist.get_all_tasks()
+    assert tasks[1].status == TaskStatus.BLOCKED and "fetch" in tasks[1].error
+    print(f"✓ Cancelled: {result.steps_cancelled}")
+
+
+def test_sequential_default_and_validation():
+    """Test: sans depends_on, ordre historique; dépendances invalides refusées"""
+    print_section("TEST: Sequential Default + Validation")
+
+    rec = Recorder()
+    engine = make_engine(4)
+    steps = [step(rec, name, delay=0.02) for name in ("one", "two", "three")]
+    steps[1].action = rec.action("two", 0.02, fail=True)
+    result = engine.execute_workflow("legacy", "sequential", steps, request_type="analysis")
+
+    assert [n for k, n, _ in rec.events if k == "start"] == ["one", "two"]
+    assert result.steps_cancelled == ["three"] and result.steps_completed == 1
+    print("✓ Steps without depends_on run in order and stop on required failure")
+
+    for bad, message in [
+        ([step(rec, "a", depends_on=["missing"])], "unknown"),
+        ([step(rec, "a", depends_on=["b"]), step(rec, "b", depends_on=["a"])], "cycle"),
+    ]:
+        try:
+            engine.execute_workflow("invalid", "invalid", bad)
+        except ValueError as e:
+            assert message in str(e)
+        else:
+            raise AssertionError(f"{message} dependency accepted")
+    print("✓ Unknown dependencies and cycles rejected")
+
+
+if __name__ == "__main__":
+    test_parallel_dag()
+    test_critical_path_ordering()
+    test_failure_cancels_dependents()
+    test_sequential_default_and_validation()
+    print("\n✅ All workflow DAG tests passed")